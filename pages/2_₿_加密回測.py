@@ -13,11 +13,14 @@ from src.config import CRYPTO_CATEGORIES, EXCHANGE_OPTIONS, STRATEGY_LABELS
 from src.core import get_orchestrator
 from src.data.integrity import validate_ohlcv
 from src.ui_backtest import (
+    chart_window,
     render_equity_curves,
     render_kline_chart,
     render_performance_table,
     render_summary_line,
     render_trade_details,
+    session_chart_key,
+    session_results,
 )
 from src.ui_common import apply_theme, breadcrumb, check_session, sidebar_user_nav
 from src.ui_strategy_params import (
@@ -160,8 +163,9 @@ if run_btn and since_ms < until_ms:
 
         _bar.progress(100, text="✅ 完成")
         _elapsed = _time_mod.time() - _t0
-        st.session_state["crypto_results"] = results
-        st.session_state["crypto_rows"] = rows
+        # session 只留精簡結果與圖表鍵，完整曲線 / K 線放在 ChartLOD 的降採樣金字塔
+        st.session_state["crypto_results"] = session_results(results)
+        st.session_state["crypto_rows"] = session_chart_key(rows)
         st.markdown(f'<div class="success-banner">🎉 完成！{_elapsed:.1f}s</div>', unsafe_allow_html=True)
 
         # 保存歷史
@@ -175,14 +179,15 @@ if run_btn and since_ms < until_ms:
 
 if "crypto_results" in st.session_state:
     results = st.session_state["crypto_results"]
-    rows = st.session_state.get("crypto_rows", [])
+    rows = st.session_state.get("crypto_rows")
     best, valid = render_summary_line(results)
     if valid:
         tab1, tab2 = st.tabs(["🕯️ 圖表", "📊 績效"])
         with tab1:
+            window = chart_window(rows, "crypto_chart_window") if rows else None
             if rows:
-                render_kline_chart(rows, best)
-            render_equity_curves(results, initial_equity)
+                render_kline_chart(rows, best, window)
+            render_equity_curves(results, initial_equity, window)
         with tab2:
             render_performance_table(results)
             with st.expander("📝 交易明細", expanded=False):
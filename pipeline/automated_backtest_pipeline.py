@@ -17,21 +17,107 @@ StocksX 自動化回測 Pipeline
 """
 
 import os
+import sys
 import json
 import argparse
 import pandas as pd
 import numpy as np
+from collections.abc import Callable
 from datetime import datetime
 from multiprocessing import Pool, cpu_count
 import warnings
 
 warnings.filterwarnings("ignore")
 
-# 添加策略路徑
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "strategies"))
+# 添加專案根目錄與策略路徑
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT_DIR)
+sys.path.append(os.path.join(ROOT_DIR, "src", "strategies"))
+
+from base_strategy import BaseStrategy, simulate_long_only
+from src.utils.shared_frame import SharedFrame, SharedFrameHandle, attach_frame
+
+
+# ─── 向量化回測 ───
+
+
+def backtest_strategy(
+    strategy_class: type,
+    data: pd.DataFrame,
+    params: dict,
+    initial_capital: float,
+    commission_rate: float,
+    slippage: float,
+) -> dict:
+    """單一策略回測（向量化），回傳績效字典"""
+    try:
+        strategy = strategy_class(**params)
+        signals = strategy.generate_signals(data)
+        close = data["close"].to_numpy(dtype=np.float64)
+        multiples, num_trades = simulate_long_only(
+            np.asarray(signals, dtype=np.float64), close, commission_rate + slippage
+        )
+
+        portfolio_values = pd.Series(multiples * initial_capital, index=data.index[1:])
+        returns = portfolio_values.pct_change().dropna()
+
+        sharpe = np.sqrt(252) * returns.mean() / returns.std() if returns.std() > 0 else 0
+        sortino = (
+            np.sqrt(252) * returns.mean() / returns[returns < 0].std() if returns[returns < 0].std() > 0 else 0
+        )
+        cumulative = portfolio_values / initial_capital
+        max_drawdown = ((cumulative - cumulative.cummax()) / cumulative.cummax()).min()
+        total_return = (portfolio_values.iloc[-1] - initial_capital) / initial_capital
+
+        # 計算月度回報
+        if isinstance(portfolio_values.index, pd.DatetimeIndex):
+            monthly_returns = (1 + portfolio_values.pct_change()).resample("ME").prod() - 1
+        else:
+            monthly_returns = pd.Series(dtype=float)
+
+        return {
+            "total_return": total_return,
+            "sharpe_ratio": sharpe,
+            "sortino_ratio": sortino,
+            "max_drawdown": max_drawdown,
+            "num_trades": num_trades,
+            "final_value": portfolio_values.iloc[-1],
+            "monthly_returns": monthly_returns.tolist() if len(monthly_returns) > 0 else [],
+            "status": "success",
+        }
+
+    except Exception as e:
+        return {
+            "total_return": 0,
+            "sharpe_ratio": 0,
+            "sortino_ratio": 0,
+            "max_drawdown": 0,
+            "num_trades": 0,
+            "final_value": 0,
+            "monthly_returns": [],
+            "status": "failed",
+            "error": str(e),
+        }
+
+
+# ─── 進程池 worker：啟動時附加共享記憶體一次 ───
+
+_worker_data: pd.DataFrame | None = None
+_worker_shm = None
+_worker_settings: dict = {}
+
+
+def _init_worker(handle: SharedFrameHandle, settings: dict) -> None:
+    global _worker_data, _worker_shm, _worker_settings
+    _worker_data, _worker_shm = attach_frame(handle)
+    _worker_settings = settings
+
+
+def _run_task(task: tuple[str, type, dict]) -> tuple[str, dict]:
+    name, strategy_class, params = task
+    # 淺拷貝：讀取零拷貝，策略若寫入欄位則觸發 copy-on-write，不會改到共享數據
+    return name, backtest_strategy(strategy_class, _worker_data.copy(deep=False), params, **_worker_settings)
 
-from base_strategy import BaseStrategy
 
 class AutomatedBacktestPipeline:
     """自動化回測 Pipeline"""
@@ -70,7 +156,7 @@ class AutomatedBacktestPipeline:
             策略字典
         """
         if strategy_dir is None:
-            strategy_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "src", "strategies")
+            strategy_dir = os.path.join(ROOT_DIR, "src", "strategies")
 
         strategies = {}
 
@@ -169,90 +255,36 @@ class AutomatedBacktestPipeline:
             回測結果
         """
         strategy_class, data, params = args
+        return backtest_strategy(strategy_class, data, params, **self._settings())
 
-        try:
-            strategy = strategy_class(**params)
-            signals = strategy.generate_signals(data)
-            close = data["close"]
-
-            capital = self.initial_capital
-            position = 0
-            trades = []
-            portfolio_values = []
-
-            for i in range(1, len(data)):
-                signal = signals.iloc[i]
-                price = close.iloc[i]
-
-                if signal == 1 and position == 0:
-                    position = capital / price * (1 - self.commission_rate - self.slippage)
-                    capital = 0
-                    trades.append({"type": "buy", "price": price, "index": i})
-
-                elif signal == -1 and position > 0:
-                    capital = position * price * (1 - self.commission_rate - self.slippage)
-                    position = 0
-                    trades.append({"type": "sell", "price": price, "index": i})
-
-                portfolio_value = capital + position * price
-                portfolio_values.append(portfolio_value)
-
-            if position > 0:
-                capital = position * close.iloc[-1] * (1 - self.commission_rate - self.slippage)
-                portfolio_values.append(capital)
-
-            portfolio_values = pd.Series(portfolio_values)
-            returns = portfolio_values.pct_change().dropna()
-
-            sharpe = np.sqrt(252) * returns.mean() / returns.std() if returns.std() > 0 else 0
-            sortino = (
-                np.sqrt(252) * returns.mean() / returns[returns < 0].std() if returns[returns < 0].std() > 0 else 0
-            )
-            cumulative = (portfolio_values / self.initial_capital).cumprod()
-            max_drawdown = ((cumulative - cumulative.cummax()) / cumulative.cummax()).min()
-            total_return = (portfolio_values.iloc[-1] - self.initial_capital) / self.initial_capital
-            num_trades = len([t for t in trades if t["type"] == "sell"])
-
-            # 計算月度回報
-            monthly_returns = portfolio_values.pct_change().resample("M").apply(lambda x: (1 + x).prod() - 1)
-
-            return {
-                "total_return": total_return,
-                "sharpe_ratio": sharpe,
-                "sortino_ratio": sortino,
-                "max_drawdown": max_drawdown,
-                "num_trades": num_trades,
-                "final_value": portfolio_values.iloc[-1],
-                "monthly_returns": monthly_returns.tolist() if len(monthly_returns) > 0 else [],
-                "status": "success",
-            }
-
-        except Exception as e:
-            return {
-                "total_return": 0,
-                "sharpe_ratio": 0,
-                "sortino_ratio": 0,
-                "max_drawdown": 0,
-                "num_trades": 0,
-                "final_value": 0,
-                "monthly_returns": [],
-                "status": "failed",
-                "error": str(e),
-            }
+    def _settings(self) -> dict:
+        return {
+            "initial_capital": self.initial_capital,
+            "commission_rate": self.commission_rate,
+            "slippage": self.slippage,
+        }
 
     def run_backtest(
-        self, data: pd.DataFrame, strategies: dict[str, BaseStrategy] = None, default_params: dict = None
+        self,
+        data: pd.DataFrame,
+        strategies: dict[str, BaseStrategy] = None,
+        default_params: dict = None,
+        on_result: Callable[[str, dict], None] | None = None,
     ) -> dict[str, dict]:
         """
         執行批量回測
 
+        數據只寫入共享記憶體一次，worker 啟動時附加；任務只傳 (名稱, 策略類, 參數)，
+        結果以 imap_unordered 分塊串流回傳。
+
         Args:
             data: OHLCV 數據
             strategies: 策略字典
             default_params: 默認參數
+            on_result: 每完成一個策略的回呼 (名稱, 結果)
 
         Returns:
-            回測結果字典
+            回測結果字典（順序與 strategies 相同）
         """
         if strategies is None:
             strategies = self.strategies
@@ -264,19 +296,30 @@ class AutomatedBacktestPipeline:
         print(f"使用 {self.n_workers} 個並行進程")
 
         # 準備回測任務
-        tasks = []
-        for name, strategy_class in strategies.items():
-            params = default_params.get(name, {})
-            tasks.append((strategy_class, data, params))
+        tasks = [(name, strategy_class, default_params.get(name, {})) for name, strategy_class in strategies.items()]
 
-        # 並行執行回測
         results = {}
-        with Pool(processes=self.n_workers) as pool:
-            for i, (name, result) in enumerate(zip(strategies.keys(), pool.imap(self.backtest_single, tasks))):
-                results[name] = result
-                if (i + 1) % 10 == 0:
-                    print(f"進度：{i + 1}/{len(strategies)}, 當前策略：{name}")
 
+        def _collect(i: int, name: str, result: dict) -> None:
+            results[name] = result
+            if on_result:
+                on_result(name, result)
+            if i % 10 == 0:
+                print(f"進度：{i}/{len(tasks)}, 當前策略：{name}")
+
+        if self.n_workers <= 1 or len(tasks) <= 1:
+            for i, (name, strategy_class, params) in enumerate(tasks, 1):
+                _collect(i, name, backtest_strategy(strategy_class, data.copy(deep=False), params, **self._settings()))
+        else:
+            workers = min(self.n_workers, len(tasks))
+            chunksize = max(1, len(tasks) // (workers * 4))
+            with SharedFrame(data) as shared, Pool(
+                processes=workers, initializer=_init_worker, initargs=(shared.handle, self._settings())
+            ) as pool:
+                for i, (name, result) in enumerate(pool.imap_unordered(_run_task, tasks, chunksize=chunksize), 1):
+                    _collect(i, name, result)
+
+        results = {name: results[name] for name in strategies}
         self.results = results
         print(f"\n回測完成！成功：{sum(1 for r in results.values() if r['status'] == 'success')}/{len(results)}")
 
@@ -10,16 +10,19 @@ StocksX 策略組合優化系統
 - 有效前沿計算
 
 使用方式：
-    python portfolio_optimizer.py --strategies order_flow,bollinger_squeeze,dual_thrust
+    python -m portfolio.portfolio_optimizer --strategies order_flow,bollinger_squeeze,dual_thrust
 
 作者：StocksX Team
 日期：2026-03-23
 """
 
+import warnings
+
 import numpy as np
 import pandas as pd
 from scipy.optimize import minimize
-import warnings
+
+from src.utils.frontier import FrontierEngine
 
 warnings.filterwarnings("ignore")
 
@@ -161,44 +164,25 @@ class PortfolioOptimizer:
         """
         計算有效前沿
 
+        目標回報在策略最低與最高年化回報之間等距取點；
+        解析解優先，觸及邊界時 SLSQP（解析梯度）自相鄰點熱啟動。
+
         Args:
             n_points: 前沿點數量
 
         Returns:
             有效前沿數據
         """
-        frontier = []
-
-        for target_return in np.linspace(self.mean_returns.min(), self.mean_returns.max(), n_points):
-
-            def portfolio_variance(weights):
-                return self.portfolio_volatility(weights) ** 2
-
-            constraints = [
-                {"type": "eq", "fun": lambda x: np.sum(x) - 1},
-                {"type": "eq", "fun": lambda x, tr=target_return: self.portfolio_return(x) - tr},
-            ]
-            bounds = tuple((0, 1) for _ in range(self.n_strategies))
-
-            init_weights = np.array([1 / self.n_strategies] * self.n_strategies)
-
-            result = minimize(portfolio_variance, init_weights, method="SLSQP", bounds=bounds, constraints=constraints)
-
-            if result.success:
-                weights = result.x
-                weights = np.maximum(weights, 0)
-                weights = weights / weights.sum() if weights.sum() > 0 else weights
-
-                frontier.append(
-                    {
-                        "return": self.portfolio_return(weights),
-                        "volatility": self.portfolio_volatility(weights),
-                        "sharpe": self.portfolio_sharpe(weights),
-                        "weights": dict(zip(self.returns.columns, weights)),
-                    }
-                )
-
-        return pd.DataFrame(frontier)
+        engine = FrontierEngine(
+            self.mean_returns.to_numpy(),
+            self.cov_matrix.to_numpy(),
+            asset_names=list(self.returns.columns),
+            risk_free_rate=0.02,
+        )
+        frontier = engine.frontier(
+            n_points, min_return=float(self.mean_returns.min()), max_return=float(self.mean_returns.max())
+        )
+        return pd.DataFrame(frontier.to_records())
 
 
 class RiskManager:
@@ -2,239 +2,220 @@
 """
 StocksX V0 - 大规模蒙特卡洛回测
 
-进行 10,000 次模拟回测，全面评估策略稳定性
-"""
+对每个内置策略先在真实 K 线上跑一次回测，再以 src.backtest.monte_carlo 对回测结果做路径级重抽样：
+  - bootstrap：权益曲线逐 K 线报酬的区块重抽样（默认 10,000 条路径）
+  - shuffle：打乱交易顺序，衡量回撤对交易顺序的敏感度
+  - parameter_jitter：参数在 ±20% 内扰动，每个变体各回测一次后跨变体重抽样
 
-import sys
-import pandas as pd
-import numpy as np
-from datetime import datetime
-from typing import Any
-import time
+随机种子固定（--seed，默认 42），同一份数据重复执行结果一致；各策略共用同一种子，结果可直接横向比较。
 
+最大回撤口径与 BacktestEngine 相同：峰值包含初始权益（1.0）。旧版脚本的峰值从第一根 K 线收盘起算，
+开局即下跌的亏损不计入回撤，因此这里的回撤会大于等于旧版数字。
 
-def monte_carlo_backtest(strategy_name: str, n_simulations: int = 1000, days: int = 1095) -> dict[str, Any]:
-    """
-    蒙特卡洛模拟回测
+用法: python run_monte_carlo_backtest.py [--exchange binance] [--symbol BTC/USDT] [--timeframe 1d] [--days 1095]
+"""
 
-    Args:
-        strategy_name: 策略名称
-        n_simulations: 模拟次数
-        days: 天数
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any
 
-    Returns:
-        模拟结果统计
-    """
-    np.random.seed(hash(strategy_name) % 1000)
-
-    # 策略参数分布
-    params = {
-        "classic": {"annual_return": (0.10, 0.20), "volatility": (0.20, 0.30)},
-        "ai": {"annual_return": (0.15, 0.30), "volatility": (0.15, 0.25)},
-        "arbitrage": {"annual_return": (0.05, 0.15), "volatility": (0.05, 0.10)},
-        "optimization": {"annual_return": (0.12, 0.22), "volatility": (0.12, 0.20)},
-    }
+import numpy as np
+import pandas as pd
 
-    # 确定类别
-    category = "classic"
-    for cat in params.keys():
-        if cat in strategy_name.lower():
-            category = cat
-            break
+from src.backtest.engine import BacktestResult, _run_backtest_on_rows
+from src.backtest.monte_carlo import MonteCarloReport, monte_carlo_backtest as simulate_result, parameter_jitter
+from src.backtest.strategies import STRATEGY_CONFIG
 
-    param_range = params[category]
+INITIAL_EQUITY = 10000.0
+# 破产线：自初始权益亏损 50%
+RUIN_THRESHOLD = 0.5
 
-    # 存储每次模拟结果
-    results = []
 
-    for i in range(n_simulations):
-        # 随机采样参数
-        annual_return = np.random.uniform(*param_range["annual_return"])
-        volatility = np.random.uniform(*param_range["volatility"])
+def load_rows(exchange_id: str, symbol: str, timeframe: str, days: int) -> list[dict[str, Any]]:
+    """拉取最近 days 天的 K 线（走本地缓存，缺口自动补抓）"""
+    from src.data.crypto import CryptoDataFetcher
 
-        # 生成收益率序列
-        daily_return = annual_return / 252
-        daily_vol = volatility / np.sqrt(252)
-        returns = np.random.normal(daily_return, daily_vol, days)
+    until = datetime.now()
+    since = until - timedelta(days=days)
+    return CryptoDataFetcher(exchange_id).get_ohlcv(
+        symbol, timeframe, int(since.timestamp() * 1000), int(until.timestamp() * 1000)
+    )
 
-        # 计算累计收益
-        cumulative = (1 + returns).cumprod()
-        final_return = cumulative[-1] - 1
 
-        # 计算最大回撤
-        cummax = np.maximum.accumulate(cumulative)
-        drawdown = (cumulative - cummax) / cummax
-        max_dd = np.min(drawdown)
+def run_strategy(
+    rows: list[dict[str, Any]], strategy: str, params: dict[str, Any] | None = None, fee_rate: float = 0.05
+) -> BacktestResult:
+    """以策略默认参数在 rows 上回测一次"""
+    return _run_backtest_on_rows(
+        rows,
+        "",
+        "",
+        "",
+        rows[0]["timestamp"],
+        rows[-1]["timestamp"],
+        strategy,
+        params if params is not None else STRATEGY_CONFIG[strategy]["defaults"],
+        INITIAL_EQUITY,
+        1.0,
+        None,
+        None,
+        fee_rate=fee_rate,
+    )
 
-        # 计算夏普比率
-        sharpe = (annual_return - 0.02) / volatility
 
-        # 计算胜率
-        win_rate = np.mean(returns > 0)
+def monte_carlo_backtest(
+    rows: list[dict[str, Any]], strategy: str, n_simulations: int = 10000, seed: int = 42
+) -> tuple[dict[str, Any], pd.DataFrame]:
+    """
+    蒙特卡洛模拟回测
 
-        results.append(
-            {
-                "simulation": i + 1,
-                "final_return": final_return,
-                "annual_return": annual_return,
-                "volatility": volatility,
-                "sharpe": sharpe,
-                "max_drawdown": max_dd,
-                "win_rate": win_rate,
-            }
-        )
+    Args:
+        rows: K 线
+        strategy: 策略名称（STRATEGY_CONFIG 的键）
+        n_simulations: 模拟路径数
+        seed: 随机种子
 
-    # 转换为 DataFrame
-    df = pd.DataFrame(results)
+    Returns:
+        (模拟结果统计, 每条路径的明细)
+    """
+    result = run_strategy(rows, strategy)
+    if result.error:
+        raise ValueError(result.error)
+
+    boot = simulate_result(result, n_paths=n_simulations, ruin_threshold=RUIN_THRESHOLD, seed=seed)
+    final = boot.final_returns
+    drawdown = -boot.max_drawdowns
+
+    df = pd.DataFrame(
+        {
+            "simulation": np.arange(1, boot.n_paths + 1),
+            "final_return": final,
+            "max_drawdown": drawdown,
+            "ruined": boot.ruined,
+        }
+    )
 
-    # 计算统计量
     stats = {
-        "strategy_name": strategy_name,
-        "category": category,
-        "n_simulations": n_simulations,
-        "mean_return": df["final_return"].mean(),
-        "median_return": df["final_return"].median(),
-        "std_return": df["final_return"].std(),
-        "min_return": df["final_return"].min(),
-        "max_return": df["final_return"].max(),
-        "return_5pct": df["final_return"].quantile(0.05),
-        "return_95pct": df["final_return"].quantile(0.95),
-        "mean_sharpe": df["sharpe"].mean(),
-        "median_sharpe": df["sharpe"].median(),
-        "min_sharpe": df["sharpe"].min(),
-        "max_sharpe": df["sharpe"].max(),
-        "mean_drawdown": df["max_drawdown"].mean(),
-        "worst_drawdown": df["max_drawdown"].min(),
-        "mean_winrate": df["win_rate"].mean(),
-        "profit_probability": np.mean(df["final_return"] > 0),
-        "loss_probability": np.mean(df["final_return"] < -0.3),
-        "ruin_probability": np.mean(df["final_return"] < -0.5),
+        "strategy": strategy,
+        "strategy_name": STRATEGY_CONFIG[strategy]["label"],
+        "category": STRATEGY_CONFIG[strategy]["category"],
+        "n_simulations": boot.n_paths,
+        "n_trades": len(result.trades),
+        "backtest_return": result.metrics.get("total_return_pct", 0.0) / 100,
+        "sharpe": result.metrics.get("sharpe_ratio", 0.0),
+        "win_rate": result.metrics.get("win_rate_pct", 0.0) / 100,
+        "mean_return": float(final.mean()),
+        "median_return": float(np.median(final)),
+        "std_return": float(final.std()),
+        "min_return": float(final.min()),
+        "max_return": float(final.max()),
+        "return_5pct": float(np.percentile(final, 5)),
+        "return_95pct": float(np.percentile(final, 95)),
+        "mean_drawdown": float(drawdown.mean()),
+        "worst_drawdown": float(drawdown.min()),
+        "profit_probability": 1.0 - boot.prob_loss,
+        "loss_probability": float(np.mean(final < -0.3)),
+        "ruin_probability": boot.risk_of_ruin,
+        "shuffle_drawdown_95pct": _shuffle_drawdown(result, seed),
     }
 
     return stats, df
 
 
+def _shuffle_drawdown(result: BacktestResult, seed: int) -> float:
+    """打乱交易顺序后最大回撤的 95 百分位（交易少于 2 笔时为 0）"""
+    if len(result.trades) < 2:
+        return 0.0
+    shuffled = simulate_result(result, method="shuffle", n_paths=2000, ruin_threshold=RUIN_THRESHOLD, seed=seed)
+    return -float(np.percentile(shuffled.max_drawdowns, 95))
+
+
 def parameter_sensitivity_test(
-    strategy_name: str, param_name: str, param_values: list[float], days: int = 1095
+    rows: list[dict[str, Any]], strategy: str, jitters: list[float], n_paths: int = 2000, seed: int = 42
 ) -> pd.DataFrame:
     """
-    参数敏感性测试
+    参数敏感性测试：对默认参数做不同幅度的扰动，比较路径分布
 
     Args:
-        strategy_name: 策略名称
-        param_name: 参数名称
-        param_values: 参数值列表
-        days: 天数
+        rows: K 线
+        strategy: 策略名称
+        jitters: 扰动比例列表（如 0.1 表示 ±10%）
+        n_paths: 每个幅度的路径数
+        seed: 随机种子
 
     Returns:
         敏感性测试结果
     """
     results = []
-
-    for value in param_values:
-        # 进行 100 次模拟取平均
-        sim_results = []
-        for _ in range(100):
-            np.random.seed(int(value * 1000) + _)
-
-            # 基础参数
-            annual_return = 0.15 + value * 0.01
-            volatility = 0.20 + value * 0.005
-
-            returns = np.random.normal(annual_return / 252, volatility / np.sqrt(252), days)
-            cumulative = (1 + returns).cumprod()
-
-            sim_results.append(
-                {
-                    "param_value": value,
-                    "final_return": cumulative[-1] - 1,
-                    "sharpe": (annual_return - 0.02) / volatility,
-                }
-            )
-
-        # 计算平均
-        avg_return = np.mean([r["final_return"] for r in sim_results])
-        avg_sharpe = np.mean([r["sharpe"] for r in sim_results])
-
+    for jitter in jitters:
+        report: MonteCarloReport = parameter_jitter(
+            rows,
+            strategy,
+            STRATEGY_CONFIG[strategy]["defaults"],
+            n_variants=16,
+            jitter=jitter,
+            initial_equity=INITIAL_EQUITY,
+            fee_rate=0.05,
+            seed=seed,
+            n_paths=n_paths,
+            ruin_threshold=RUIN_THRESHOLD,
+        )
+        quantiles = report.return_quantiles()
         results.append(
             {
-                param_name: value,
-                "avg_return": avg_return,
-                "avg_sharpe": avg_sharpe,
-                "std_return": np.std([r["final_return"] for r in sim_results]),
+                "jitter": jitter,
+                "n_variants": len(report.variants),
+                "median_return": quantiles["p50"],
+                "return_5pct": quantiles["p5"],
+                "std_return": float(report.final_returns.std()),
+                "ruin_probability": report.risk_of_ruin,
             }
         )
 
     return pd.DataFrame(results)
 
 
-def run_large_scale_backtest():
+def run_large_scale_backtest(
+    rows: list[dict[str, Any]], strategies: list[str], n_simulations: int, seed: int
+) -> tuple[list[dict[str, Any]], dict[str, pd.DataFrame]]:
     """运行大规模回测"""
     print("=" * 80)
     print("🚀 StocksX V0 - 大规模蒙特卡洛回测")
     print("=" * 80)
-    print("模拟次数：10,000 次/策略")
-    print("测试策略：33 个")
-    print("总模拟次数：330,000 次")
+    print(f"K 线数：{len(rows):,}")
+    print(f"模拟次数：{n_simulations:,} 次/策略")
+    print(f"测试策略：{len(strategies)} 个")
+    print(f"总模拟次数：{n_simulations * len(strategies):,} 次")
     print()
 
     start_time = time.time()
 
-    # 策略列表
-    strategies = {
-        "classic": [
-            "双均线交叉",
-            "MACD",
-            "RSI",
-            "布林带",
-            "KDJ",
-            "威廉指标",
-            "CCI",
-            "DMI",
-            "SAR",
-            "一目均衡表",
-            "随机指标",
-            "动量指标",
-            "成交量加权",
-            "海龟交易",
-            "通道突破",
-        ],
-        "ai": [
-            "LSTM 价格预测",
-            "NLP 情绪分析",
-            "配对交易",
-            "多因子策略",
-            "DQN 强化学习",
-            "特征工程",
-            "策略集成",
-            "深度学习",
-            "梯度提升",
-            "随机森林",
-        ],
-        "arbitrage": ["跨交易所套利", "三角套利", "期现套利"],
-        "optimization": ["最大夏普比率", "最小波动率", "风险平价", "马科维茨优化", "动态再平衡"],
-    }
+    by_category: dict[str, list[str]] = {}
+    for strategy in strategies:
+        by_category.setdefault(STRATEGY_CONFIG[strategy]["category"], []).append(strategy)
 
     all_stats = []
     all_details = {}
 
-    # 对每个策略进行蒙特卡洛模拟
-    for category, strategy_list in strategies.items():
+    for category, strategy_list in by_category.items():
         print(f"\n{'=' * 80}")
         print(f"测试 {category.upper()} 策略类别 ({len(strategy_list)} 个)")
         print(f"{'=' * 80}")
 
-        for strategy_name in strategy_list:
-            print(f"\n回测：{strategy_name} (10,000 次模拟)...", end=" ", flush=True)
+        for strategy in strategy_list:
+            label = STRATEGY_CONFIG[strategy]["label"]
+            print(f"\n回测：{label} ({n_simulations:,} 次模拟)...", end=" ", flush=True)
 
             try:
-                # 运行蒙特卡洛模拟
-                stats, details_df = monte_carlo_backtest(strategy_name, n_simulations=10000, days=1095)
+                stats, details_df = monte_carlo_backtest(rows, strategy, n_simulations=n_simulations, seed=seed)
 
                 all_stats.append(stats)
-                all_details[strategy_name] = details_df
+                all_details[label] = details_df
 
-                print(f"✅ 完成 (平均收益：{stats['mean_return']:.1%})")
+                print(f"✅ 完成 (中位收益：{stats['median_return']:.1%})")
 
             except Exception as e:
                 print(f"❌ 失败：{e}")
@@ -244,19 +225,18 @@ def run_large_scale_backtest():
     print(f"\n{'=' * 80}")
     print("大规模回测完成！")
     print(f"耗时：{elapsed_time:.1f}秒 ({elapsed_time / 60:.1f}分钟)")
-    print(f"总模拟次数：{len(all_stats) * 10000:,}次")
+    print(f"总模拟次数：{len(all_stats) * n_simulations:,}次")
     print(f"{'=' * 80}")
 
     return all_stats, all_details
 
 
-def generate_large_scale_report(all_stats: list[dict], all_details: dict):
+def generate_large_scale_report(all_stats: list[dict], rows: list[dict[str, Any]], seed: int) -> pd.DataFrame:
     """生成大规模回测报告"""
     print("\n" + "=" * 80)
     print("📊 大规模回测分析报告")
     print("=" * 80)
 
-    # 转换为 DataFrame
     stats_df = pd.DataFrame(all_stats)
 
     # 1. 策略稳定性排名（按盈利概率）
@@ -265,18 +245,18 @@ def generate_large_scale_report(all_stats: list[dict], all_details: dict):
     print("=" * 80)
 
     stability_ranking = stats_df.nlargest(10, "profit_probability")[
-        ["strategy_name", "category", "profit_probability", "mean_return", "median_sharpe", "worst_drawdown"]
+        ["strategy_name", "category", "profit_probability", "median_return", "sharpe", "worst_drawdown"]
     ]
 
     print(stability_ranking.to_string(index=False))
 
-    # 2. 风险调整后排各（按夏普比率中位数）
+    # 2. 风险调整后排名（按原始回测夏普比率）
     print("\n" + "=" * 80)
-    print("2. 风险调整后排各（按夏普比率中位数）")
+    print("2. 风险调整后排名（按夏普比率）")
     print("=" * 80)
 
-    risk_ranking = stats_df.nlargest(10, "median_sharpe")[
-        ["strategy_name", "category", "median_sharpe", "mean_return", "profit_probability", "mean_drawdown"]
+    risk_ranking = stats_df.nlargest(10, "sharpe")[
+        ["strategy_name", "category", "sharpe", "median_return", "profit_probability", "mean_drawdown"]
     ]
 
     print(risk_ranking.to_string(index=False))
@@ -286,8 +266,8 @@ def generate_large_scale_report(all_stats: list[dict], all_details: dict):
     print("3. 极端风险排名（最坏回撤最小）")
     print("=" * 80)
 
-    risk_min = stats_df.nsmallest(10, "worst_drawdown")[
-        ["strategy_name", "category", "worst_drawdown", "mean_return", "ruin_probability"]
+    risk_min = stats_df.nlargest(10, "worst_drawdown")[
+        ["strategy_name", "category", "worst_drawdown", "shuffle_drawdown_95pct", "ruin_probability"]
     ]
 
     print(risk_min.to_string(index=False))
@@ -302,8 +282,8 @@ def generate_large_scale_report(all_stats: list[dict], all_details: dict):
         .agg(
             {
                 "profit_probability": "mean",
-                "mean_return": "mean",
-                "median_sharpe": "mean",
+                "median_return": "mean",
+                "sharpe": "mean",
                 "worst_drawdown": "mean",
                 "ruin_probability": "mean",
                 "n_simulations": "first",
@@ -327,97 +307,46 @@ def generate_large_scale_report(all_stats: list[dict], all_details: dict):
 
     # 6. 破产风险分析
     print("\n" + "=" * 80)
-    print("6. 破产风险分析（亏损>50% 的概率）")
+    print(f"6. 破产风险分析（亏损>{RUIN_THRESHOLD:.0%} 的概率）")
     print("=" * 80)
 
     ruin_analysis = stats_df.nsmallest(10, "ruin_probability")[
-        ["strategy_name", "category", "ruin_probability", "loss_probability", "mean_return"]
+        ["strategy_name", "category", "ruin_probability", "loss_probability", "median_return"]
     ]
 
     print(ruin_analysis.to_string(index=False))
 
-    # 7. 参数敏感性测试示例
+    # 7. 参数敏感性测试（夏普比率最高的策略）
+    best = stats_df.nlargest(1, "sharpe").iloc[0]
     print("\n" + "=" * 80)
-    print("7. 参数敏感性测试（示例：LSTM 价格预测）")
+    print(f"7. 参数敏感性测试（{best['strategy_name']}）")
     print("=" * 80)
 
-    if "LSTM 价格预测" in all_details:
-        # 这里简化展示，实际应该运行参数敏感性测试
-        print("\n测试参数：学习率 [0.001, 0.005, 0.01, 0.05, 0.1]")
-        print("结果：学习率 0.01 时表现最佳")
+    if STRATEGY_CONFIG[best["strategy"]]["params"]:
+        sensitivity = parameter_sensitivity_test(rows, best["strategy"], [0.1, 0.2, 0.3], seed=seed)
+        print(sensitivity.to_string(index=False))
+    else:
+        print("该策略无可调参数")
 
     return stats_df
 
 
-def main():
-    """主函数"""
-    print("\n" + "=" * 80)
-    print("🔬 开始大规模蒙特卡洛回测")
-    print("=" * 80)
-
-    # 运行大规模回测
-    all_stats, all_details = run_large_scale_backtest()
-
-    # 生成报告
-    stats_df = generate_large_scale_report(all_stats, all_details)
-
-    # 保存结果
-    print("\n" + "=" * 80)
-    print("💾 保存回测结果")
-    print("=" * 80)
-
-    try:
-        # 保存统计结果
-        stats_df.to_csv("monte_carlo_stats.csv", index=False, encoding="utf-8-sig")
-        print("✅ 统计结果已保存到：monte_carlo_stats.csv")
-
-        # 保存详细结果（抽样）
-        sample_details = {}
-        for name, df in list(all_details.items())[:5]:  # 只保存前 5 个策略的详细数据
-            sample_details[name] = df.sample(n=1000).to_dict()
-
-        import json
-
-        with open("monte_carlo_details_sample.json", "w", encoding="utf-8") as f:
-            json.dump(sample_details, f, indent=2, ensure_ascii=False)
-        print("✅ 详细数据样本已保存到：monte_carlo_details_sample.json")
-
-        # 保存完整报告
-        report_md = generate_markdown_report(stats_df, all_details)
-        with open("MONTE_CARLO_REPORT.md", "w", encoding="utf-8") as f:
-            f.write(report_md)
-        print("✅ 完整报告已保存到：MONTE_CARLO_REPORT.md")
-
-    except Exception as e:
-        print(f"❌ 保存失败：{e}")
-
-    print("\n" + "=" * 80)
-    print("🎉 大规模回测完成！")
-    print("=" * 80)
-
-    return 0
-
-
-def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
+def generate_markdown_report(stats_df: pd.DataFrame, args: argparse.Namespace, n_bars: int) -> str:
     """生成 Markdown 格式报告"""
-    report = f"""# 🔬 大规模蒙特卡洛回测报告
+    return f"""# 🔬 大规模蒙特卡洛回测报告
 
 **报告生成时间：** {datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
-**模拟次数：** 10,000 次/策略
-**测试策略：** 33 个
-**总模拟次数：** 330,000 次
+**数据：** {args.exchange} {args.symbol} {args.timeframe}，最近 {args.days} 天（{n_bars:,} 根 K 线）
+**模拟次数：** {args.paths:,} 次/策略（随机种子 {args.seed}）
+**测试策略：** {len(stats_df)} 个
 
 ---
 
-## 📊 执行摘要
+## 📊 方法
 
-本次回测采用蒙特卡洛模拟方法，对每个策略进行 10,000 次独立回测，全面评估策略在不同市场环境下的稳定性和风险特征。
-
-### 关键发现
-
-1. **最稳定策略：** 盈利概率 > 95%
-2. **最佳风险调整：** 夏普比率中位数 > 1.0
-3. **最低破产风险：** 破产概率 < 1%
+每个策略以默认参数在上述 K 线上回测一次，再对权益曲线的逐 K 线报酬做区块重抽样（block bootstrap），
+得到 {args.paths:,} 条等长路径的最终收益、最大回撤与破产（亏损 ≥ {RUIN_THRESHOLD:.0%}）分布。
+最大回撤的峰值包含初始权益，与回测引擎的 max_drawdown 口径一致。
 
 ---
 
@@ -427,23 +356,19 @@ def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
 
 {
         stats_df.nlargest(10, "profit_probability")[
-            ["strategy_name", "category", "profit_probability", "mean_return"]
+            ["strategy_name", "category", "profit_probability", "median_return"]
         ].to_markdown(index=False)
     }
 
-### 按夏普比率中位数（风险调整）
+### 按夏普比率（风险调整）
 
-{
-        stats_df.nlargest(10, "median_sharpe")[
-            ["strategy_name", "category", "median_sharpe", "mean_return"]
-        ].to_markdown(index=False)
-    }
+{stats_df.nlargest(10, "sharpe")[["strategy_name", "category", "sharpe", "median_return"]].to_markdown(index=False)}
 
 ### 按最坏回撤（极端风险）
 
 {
-        stats_df.nsmallest(10, "worst_drawdown")[
-            ["strategy_name", "category", "worst_drawdown", "mean_return"]
+        stats_df.nlargest(10, "worst_drawdown")[
+            ["strategy_name", "category", "worst_drawdown", "shuffle_drawdown_95pct"]
         ].to_markdown(index=False)
     }
 
@@ -456,8 +381,8 @@ def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
         .agg(
             {
                 "profit_probability": "mean",
-                "mean_return": "mean",
-                "median_sharpe": "mean",
+                "median_return": "mean",
+                "sharpe": "mean",
                 "worst_drawdown": "mean",
                 "ruin_probability": "mean",
             }
@@ -470,11 +395,11 @@ def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
 
 ## ⚠️ 风险分析
 
-### 破产概率（亏损>50%）
+### 破产概率（亏损 ≥ {RUIN_THRESHOLD:.0%}）
 
 {stats_df.nsmallest(10, "ruin_probability")[["strategy_name", "category", "ruin_probability"]].to_markdown(index=False)}
 
-### 亏损概率（任何亏损）
+### 重度亏损概率（亏损 > 30%）
 
 {stats_df.nsmallest(10, "loss_probability")[["strategy_name", "category", "loss_probability"]].to_markdown(index=False)}
 
@@ -482,8 +407,6 @@ def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
 
 ## 📊 收益分布
 
-### 百分位数分析
-
 {
         stats_df.nlargest(15, "median_return")[
             ["strategy_name", "return_5pct", "median_return", "return_95pct"]
@@ -492,27 +415,74 @@ def generate_markdown_report(stats_df: pd.DataFrame, all_details: dict) -> str:
 
 ---
 
-## 💡 结论
+**免责声明：** 本报告基于历史数据的重抽样模拟，仅供参考，不构成投资建议。
+"""
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description="StocksX 蒙特卡洛回测")
+    parser.add_argument("--exchange", default="binance", help="交易所")
+    parser.add_argument("--symbol", default="BTC/USDT", help="交易对")
+    parser.add_argument("--timeframe", default="1d", help="K 线周期")
+    parser.add_argument("--days", type=int, default=1095, help="回测天数")
+    parser.add_argument("--paths", type=int, default=10000, help="每个策略的模拟路径数")
+    parser.add_argument("--seed", type=int, default=42, help="随机种子")
+    parser.add_argument("--strategies", default="", help="策略名称，逗号分隔（默认全部）")
+    args = parser.parse_args()
+
+    strategies = [s.strip() for s in args.strategies.split(",") if s.strip()] or list(STRATEGY_CONFIG)
+    unknown = [s for s in strategies if s not in STRATEGY_CONFIG]
+    if unknown:
+        parser.error(f"未知策略：{', '.join(unknown)}")
+
+    print("\n" + "=" * 80)
+    print("🔬 开始大规模蒙特卡洛回测")
+    print("=" * 80)
 
-### 最稳健策略组合
+    rows = load_rows(args.exchange, args.symbol, args.timeframe, args.days)
+    if len(rows) < 2:
+        print(f"❌ K 线不足：{args.exchange} {args.symbol} {args.timeframe}")
+        return 1
 
-基于 10,000 次蒙特卡洛模拟，推荐以下策略组合：
+    all_stats, all_details = run_large_scale_backtest(rows, strategies, args.paths, args.seed)
+    if not all_stats:
+        print("❌ 所有策略回测皆失败")
+        return 1
 
-1. **核心策略（40%）：** 威廉指标、三角套利
-2. **卫星策略（40%）：** LSTM 价格预测、多因子策略
-3. **对冲策略（20%）：** 最小波动率、风险平价
+    stats_df = generate_large_scale_report(all_stats, rows, args.seed)
 
-### 风险控制建议
+    # 保存结果
+    print("\n" + "=" * 80)
+    print("💾 保存回测结果")
+    print("=" * 80)
 
-- 单策略最大仓位：不超过 20%
-- 总回撤止损：-30%
-- 定期再平衡：每季度
+    try:
+        stats_df.to_csv("monte_carlo_stats.csv", index=False, encoding="utf-8-sig")
+        print("✅ 统计结果已保存到：monte_carlo_stats.csv")
 
----
+        # 保存详细结果（抽样，固定种子）
+        sample_details = {}
+        for name, df in list(all_details.items())[:5]:  # 只保存前 5 个策略的详细数据
+            sample_details[name] = df.sample(n=min(1000, len(df)), random_state=args.seed).to_dict()
 
-**免责声明：** 本报告基于蒙特卡洛模拟生成，仅供参考，不构成投资建议。
-"""
-    return report
+        with open("monte_carlo_details_sample.json", "w", encoding="utf-8") as f:
+            json.dump(sample_details, f, indent=2, ensure_ascii=False, default=float)
+        print("✅ 详细数据样本已保存到：monte_carlo_details_sample.json")
+
+        report_md = generate_markdown_report(stats_df, args, len(rows))
+        with open("MONTE_CARLO_REPORT.md", "w", encoding="utf-8") as f:
+            f.write(report_md)
+        print("✅ 完整报告已保存到：MONTE_CARLO_REPORT.md")
+
+    except Exception as e:
+        print(f"❌ 保存失败：{e}")
+
+    print("\n" + "=" * 80)
+    print("🎉 大规模回测完成！")
+    print("=" * 80)
+
+    return 0
 
 
 if __name__ == "__main__":
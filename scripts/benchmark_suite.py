@@ -0,0 +1,364 @@
+#!/usr/bin/env python3
+"""
+StocksX 基準測試套件
+涵蓋信號生成、三個回測引擎、績效指標、儲存讀取、缺口補齊、參數網格與 WebSocket 廣播，
+在多個數據規模下量測耗時（perf_counter + 暖身）與峰值記憶體，並與上一次的基準比對。
+
+用法:
+    python scripts/benchmark_suite.py                          # 1k / 100k / 1M 根，與上次比對，無回歸時更新基準
+    python scripts/benchmark_suite.py --sizes 1000,100000 --groups engine,metrics
+    python scripts/benchmark_suite.py --only sma --threshold 0.3 --no-save
+    python scripts/benchmark_suite.py --update-baseline         # 確認變慢是預期的（如換機器），強制以本次為基準
+
+有項目比基準慢超過門檻時以結束碼 1 離開（可接 CI），且不更新基準，避免回歸在下一次比對時消失。
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.benchmark import (  # noqa: E402
+    DEFAULT_SIZES,
+    DEFAULT_THRESHOLD,
+    BenchmarkCase,
+    BenchmarkResult,
+    compare,
+    load_baseline,
+    run_suite,
+    save_baseline,
+)
+from src.strategies.conformance import synthetic_ohlcv, synthetic_rows  # noqa: E402
+
+DEFAULT_BASELINE = PROJECT_ROOT / "data" / "benchmarks" / "baseline.json"
+
+SINCE = 1_700_000_000_000
+
+TF_MS = 3_600_000
+
+SIGNAL_STRATEGIES = ("sma_cross", "macd_cross", "rsi_signal", "bollinger_signal", "supertrend")
+
+WS_SIZES = (100, 1_000, 10_000)
+
+
+# ════════════════════════════════════════════════════════════
+# 測試數據
+# ════════════════════════════════════════════════════════════
+
+
+def make_rows(n: int, seed: int = 42) -> list[dict[str, Any]]:
+    """小時線隨機漫步 K 線（與回測引擎使用的 rows 格式相同）"""
+    return synthetic_rows(n, seed, 0.01, start=pd.Timestamp(SINCE, unit="ms"), freq=pd.Timedelta(TF_MS, unit="ms"))
+
+
+def _until(rows: list[dict[str, Any]]) -> int:
+    return rows[-1]["timestamp"]
+
+
+def _backtest_args(rows: list[dict[str, Any]], params: dict[str, Any]) -> dict[str, Any]:
+    """回測引擎共用的關鍵字參數（sma_cross、1 倍槓桿、無止盈止損）"""
+    return {
+        "rows": rows,
+        "exchange_id": "binance",
+        "symbol": "BTC/USDT",
+        "timeframe": "1h",
+        "since_ms": SINCE,
+        "until_ms": _until(rows),
+        "strategy": "sma_cross",
+        "strategy_params": params,
+        "initial_equity": 10000.0,
+        "leverage": 1.0,
+        "take_profit_pct": None,
+        "stop_loss_pct": None,
+    }
+
+
+def _defaults(strategy: str) -> dict[str, Any]:
+    from src.backtest.strategies import STRATEGY_CONFIG
+
+    return dict(STRATEGY_CONFIG[strategy].get("defaults") or {})
+
+
+# ════════════════════════════════════════════════════════════
+# 基準測試項目
+# ════════════════════════════════════════════════════════════
+
+
+def signal_cases() -> list[BenchmarkCase]:
+    from src.backtest.strategies import get_signal
+
+    cases = []
+    for name in SIGNAL_STRATEGIES:
+        params = _defaults(name)
+        cases.append(
+            BenchmarkCase(
+                name=f"signals.{name}",
+                group="signals",
+                setup=make_rows,
+                run=lambda rows, name=name, params=params: get_signal(name, rows, **params),
+            )
+        )
+    return cases
+
+
+def strategy_class_cases() -> list[BenchmarkCase]:
+    """src/strategies 的 BaseStrategy 類（DataFrame 介面）"""
+    from src.strategies.trend.advanced_trend_strategies import KAMA
+    from src.strategies.trend.trend_complete import MACDCross, SMACross, Supertrend
+
+    return [
+        BenchmarkCase(
+            name=f"strategies.{cls.__name__}",
+            group="strategies",
+            setup=lambda n, cls=cls: (cls(), synthetic_ohlcv(n)),
+            run=lambda state: state[0].generate_signals(state[1]),
+        )
+        for cls in (SMACross, MACDCross, Supertrend, KAMA)
+    ]
+
+
+def engine_cases() -> list[BenchmarkCase]:
+    from src.backtest.engine import _run_backtest_on_rows
+    from src.backtest.engine_vec import _run_backtest_vectorized
+    from src.backtest.strategies import get_signal
+    from src.core.backtest import BacktestEngine
+
+    params = _defaults("sma_cross")
+
+    def run_rows_engine(engine):
+        def run(rows):
+            return engine(**_backtest_args(rows, params))
+
+        return run
+
+    def setup_core(n: int):
+        rows = make_rows(n)
+        return rows, get_signal("sma_cross", rows, **params)
+
+    return [
+        BenchmarkCase("engine.loop", "engine", make_rows, run_rows_engine(_run_backtest_on_rows)),
+        BenchmarkCase("engine.vectorized", "engine", make_rows, run_rows_engine(_run_backtest_vectorized)),
+        BenchmarkCase(
+            "engine.core",
+            "engine",
+            setup_core,
+            lambda state: BacktestEngine().run(state[0], state[1], SINCE, _until(state[0])),
+        ),
+    ]
+
+
+def metrics_cases() -> list[BenchmarkCase]:
+    from src.backtest.engine import _compute_metrics
+    from src.backtest.engine_vec import _run_backtest_vectorized
+
+    def setup(n: int):
+        rows = make_rows(n)
+        res = _run_backtest_vectorized(**_backtest_args(rows, _defaults("sma_cross")))
+        return res.equity_curve, res.trades, _until(rows)
+
+    return [
+        BenchmarkCase(
+            "metrics.compute_metrics",
+            "metrics",
+            setup,
+            lambda state: _compute_metrics(state[0], state[1], 10000.0, SINCE, state[2]),
+        )
+    ]
+
+
+def storage_cases() -> list[BenchmarkCase]:
+    from src.data.storage.sqlite_storage import SQLiteMarketDataStorage
+
+    def setup(n: int):
+        tmp = tempfile.mkdtemp(prefix="stocksx-bench-")
+        storage = SQLiteMarketDataStorage(os.path.join(tmp, "bench.db"))
+        rows = [
+            {**r, "exchange": "binance", "symbol": "BTC/USDT", "timeframe": "1h", "filled": 0, "is_outlier": 0}
+            for r in make_rows(n)
+        ]
+        storage.save_ohlcv(rows)
+        return tmp, storage, _until(rows)
+
+    def teardown(state) -> None:
+        state[1]._conn.close()
+        shutil.rmtree(state[0], ignore_errors=True)
+
+    return [
+        BenchmarkCase(
+            "storage.load_ohlcv",
+            "storage",
+            setup,
+            lambda state: state[1].load_ohlcv("binance", "BTC/USDT", "1h", SINCE, state[2]),
+            teardown=teardown,
+        )
+    ]
+
+
+def data_cases() -> list[BenchmarkCase]:
+    from src.core.pipeline import ohlcv_clean_pipeline
+    from src.data.crypto.service import CryptoMarketDataService
+
+    def gappy_rows(n: int) -> list[dict[str, Any]]:
+        rows = make_rows(n)
+        keep = np.random.default_rng(0).random(n) > 0.1
+        keep[0] = keep[-1] = True
+        return [r for r, k in zip(rows, keep) if k]
+
+    def setup_gap_fill(n: int):
+        # _fill_gaps 只用到 _exchange_id；略過 __init__ 以免建立交易所連線
+        service = object.__new__(CryptoMarketDataService)
+        service._exchange_id = "binance"
+        return service, gappy_rows(n)
+
+    def run_gap_fill(state):
+        service, rows = state
+        return service._fill_gaps(rows, "BTC/USDT", "1h", rows[0]["timestamp"], rows[-1]["timestamp"], TF_MS)
+
+    pipeline = ohlcv_clean_pipeline()
+    return [
+        BenchmarkCase("data.gap_fill", "data", setup_gap_fill, run_gap_fill),
+        BenchmarkCase("data.clean_pipeline", "data", gappy_rows, lambda rows: pipeline.run(list(rows))),
+    ]
+
+
+def optimizer_cases() -> list[BenchmarkCase]:
+    """參數網格：與 find_optimal 抓完 K 線後的評估迴圈相同（不含交易所 I/O）"""
+    from src.backtest.engine import _run_backtest_on_rows
+    from src.backtest.optimizer import _param_grid_to_list
+    from src.backtest.strategies import STRATEGY_CONFIG
+
+    combos = _param_grid_to_list(STRATEGY_CONFIG["sma_cross"]["param_grid"])
+
+    def run(rows):
+        return [_run_backtest_on_rows(**_backtest_args(rows, params)) for params in combos]
+
+    return [BenchmarkCase("optimizer.grid_sma_cross", "optimizer", make_rows, run, max_size=100_000)]
+
+
+class _NullWebSocket:
+    """只計數、不做 I/O 的 WebSocket，量測的是 ConnectionManager 自身的廣播開銷"""
+
+    def __init__(self) -> None:
+        self.sent = 0
+
+    async def send_json(self, message: dict) -> None:
+        self.sent += 1
+
+
+def websocket_cases() -> list[BenchmarkCase]:
+    from src.websocket_server import ConnectionManager
+
+    message = {"type": "ticker", "symbol": "BTC/USDT", "price": 65000.0, "change_pct": 1.2}
+
+    def setup(n: int):
+        manager = ConnectionManager()
+        for i in range(n):
+            manager.active_connections[i] = {"BTC/USDT": {"ws": _NullWebSocket(), "last_pong": 0.0}}
+        return manager, asyncio.new_event_loop()
+
+    return [
+        BenchmarkCase(
+            "websocket.broadcast",
+            "websocket",
+            setup,
+            lambda state: state[1].run_until_complete(state[0].broadcast(message)),
+            sizes=WS_SIZES,
+            teardown=lambda state: state[1].close(),
+        )
+    ]
+
+
+CASE_GROUPS = {
+    "signals": signal_cases,
+    "strategies": strategy_class_cases,
+    "engine": engine_cases,
+    "metrics": metrics_cases,
+    "storage": storage_cases,
+    "data": data_cases,
+    "optimizer": optimizer_cases,
+    "websocket": websocket_cases,
+}
+
+
+def build_cases(groups: list[str] | None = None, only: str | None = None) -> list[BenchmarkCase]:
+    cases: list[BenchmarkCase] = []
+    for group in groups or list(CASE_GROUPS):
+        if group not in CASE_GROUPS:
+            raise SystemExit(f"未知的分組: {group}（可用: {', '.join(CASE_GROUPS)}）")
+        cases.extend(CASE_GROUPS[group]())
+    if only:
+        cases = [c for c in cases if only in c.name]
+    return cases
+
+
+# ════════════════════════════════════════════════════════════
+# CLI
+# ════════════════════════════════════════════════════════════
+
+
+def _format(result: BenchmarkResult) -> str:
+    if result.error:
+        return f"  {result.key:<40s} ❌ {result.error}"
+    return (
+        f"  {result.key:<40s} median {result.median_s * 1e3:>10.2f}ms  "
+        f"min {result.min_s * 1e3:>10.2f}ms  peak {result.peak_bytes / 1e6:>8.1f}MB"
+    )
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="StocksX 基準測試套件")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="K 線數量，逗號分隔")
+    parser.add_argument("--groups", default="", help=f"分組，逗號分隔（{', '.join(CASE_GROUPS)}）")
+    parser.add_argument("--only", default="", help="只跑名稱包含此字串的項目")
+    parser.add_argument("--repeat", type=int, default=5, help="每項計時次數")
+    parser.add_argument("--warmup", type=int, default=1, help="每項暖身次數")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基準檔路徑（上一次的結果）")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="耗時回歸門檻（0.2 = 慢 20%%）")
+    parser.add_argument("--memory-threshold", type=float, default=None, help="峰值記憶體回歸門檻（預設不比對）")
+    parser.add_argument("--no-save", action="store_true", help="不以本次結果更新基準檔")
+    parser.add_argument("--update-baseline", action="store_true", help="有回歸時仍以本次結果更新基準檔")
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    groups = [g.strip() for g in args.groups.split(",") if g.strip()] or None
+    cases = build_cases(groups, args.only or None)
+
+    print("=" * 80)
+    print(f"⚡ StocksX 基準測試：{len(cases)} 項，規模 {sizes}，repeat={args.repeat}，warmup={args.warmup}")
+    print("=" * 80)
+    run = run_suite(cases, sizes, repeat=args.repeat, warmup=args.warmup, on_result=lambda r: print(_format(r)))
+
+    baseline = load_baseline(args.baseline)
+    regressions = compare(run, baseline, threshold=args.threshold, memory_threshold=args.memory_threshold)
+    if baseline is None:
+        print(f"\n📝 無可比對的基準（{args.baseline}）")
+    elif regressions:
+        print(f"\n🐢 {len(regressions)} 項回歸（相對 {baseline.created_at}）:")
+        for reg in regressions:
+            print(f"  {reg.describe()}")
+    else:
+        print(f"\n✅ 無回歸（相對 {baseline.created_at}，門檻 {args.threshold:.0%}）")
+
+    if not args.no_save:
+        if regressions and not args.update_baseline:
+            print("⏸️ 有回歸，基準未更新（確認後以 --update-baseline 覆寫）")
+        else:
+            save_baseline(run, args.baseline)
+            print(f"💾 基準已更新：{args.baseline}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
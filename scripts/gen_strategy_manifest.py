@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+StocksX 策略 manifest 產生器
+載入全部策略分類，將 名稱 → "模組:類別" 寫入 src/strategies/_manifest.py，
+讓 StrategyFactory 在 import 時不必載入任何分類模組。
+
+用法:
+    python scripts/gen_strategy_manifest.py           # 重新產生
+    python scripts/gen_strategy_manifest.py --check   # 與現有檔案不同時以結束碼 1 離開（可接 CI）
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.strategies.strategy_factory import build_manifest  # noqa: E402
+
+MANIFEST_PATH = PROJECT_ROOT / "src" / "strategies" / "_manifest.py"
+
+HEADER = '''"""
+策略 manifest — 由 scripts/gen_strategy_manifest.py 產生，請勿手動編輯
+名稱 → "模組:類別"，供 StrategyFactory 延遲載入
+"""
+
+STRATEGY_MANIFEST: dict[str, str] = {
+'''
+
+
+def render(manifest: dict[str, str]) -> str:
+    body = "".join(f'    "{name}": "{path}",\n' for name, path in manifest.items())
+    return HEADER + body + "}\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="StocksX 策略 manifest 產生器")
+    parser.add_argument("--check", action="store_true", help="只比對，不寫檔")
+    args = parser.parse_args()
+
+    manifest = build_manifest()
+    content = render(manifest)
+    current = MANIFEST_PATH.read_text(encoding="utf-8") if MANIFEST_PATH.exists() else ""
+    if args.check:
+        if content != current:
+            print(f"{MANIFEST_PATH.relative_to(PROJECT_ROOT)} 已過期，請執行 python scripts/gen_strategy_manifest.py")
+            return 1
+        print("manifest 為最新")
+        return 0
+
+    MANIFEST_PATH.write_text(content, encoding="utf-8")
+    print(f"已寫入 {MANIFEST_PATH.relative_to(PROJECT_ROOT)}（{len(manifest)} 個策略）")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+StocksX 追蹤報告
+讀取 STOCKSX_TRACE_FILE 產生的 JSON Lines，輸出各 span 耗時摘要與摺疊堆疊（flamegraph.pl / speedscope）。
+
+用法:
+    STOCKSX_TRACE_FILE=/tmp/trace.jsonl python your_job.py
+    python scripts/trace_report.py /tmp/trace.jsonl                        # 依總耗時排序的摘要
+    python scripts/trace_report.py /tmp/trace.jsonl --folded trace.folded  # 另寫出摺疊堆疊
+    flamegraph.pl trace.folded > trace.svg
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from src.utils.tracing import load_spans, write_collapsed  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="StocksX 追蹤報告")
+    parser.add_argument("path", help="FileExporter 輸出的 JSON Lines 檔")
+    parser.add_argument("--folded", help="寫出摺疊堆疊檔（flamegraph.pl / speedscope）")
+    parser.add_argument("--top", type=int, default=20, help="摘要顯示的 span 名稱數")
+    args = parser.parse_args()
+
+    spans = load_spans(args.path)
+    if not spans:
+        print(f"{args.path} 沒有 span")
+        return 1
+
+    totals: dict[str, list[int]] = defaultdict(list)
+    for s in spans:
+        totals[s.name].append(s.duration_ns)
+    rows = sorted(totals.items(), key=lambda kv: sum(kv[1]), reverse=True)[: args.top]
+
+    print(f"{len(spans)} 個 span，{len({s.trace_id for s in spans})} 條 trace")
+    print(f"{'span':<40} {'次數':>8} {'總計 ms':>12} {'平均 ms':>10} {'最大 ms':>10}")
+    for name, durations in rows:
+        total, worst = sum(durations) / 1e6, max(durations) / 1e6
+        print(f"{name:<40} {len(durations):>8} {total:>12.2f} {total / len(durations):>10.3f} {worst:>10.3f}")
+
+    if args.folded:
+        write_collapsed(spans, args.folded)
+        print(f"摺疊堆疊已寫入 {args.folded}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
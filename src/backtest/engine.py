@@ -2,12 +2,13 @@
 from __future__ import annotations
 
 import math
+import time
 from dataclasses import dataclass, field
 from typing import Any
 
 import numpy as np
 
-from src.data.crypto import CryptoDataFetcher
+from src.utils import metrics, profiler, tracing
 
 from . import strategies
 
@@ -21,6 +22,7 @@ class BacktestResult:
     metrics: dict[str, Any] = field(default_factory=dict)
     raw_ohlcv: list[dict[str, Any]] = field(default_factory=list)
     error: str | None = None
+    profile: dict[str, Any] | None = None  # 取樣剖析摘要（profile=True 時，見 src.utils.profiler）
 
 
 def _compute_metrics(
@@ -139,7 +141,7 @@ def _compute_metrics(
         "omega_ratio": omega,
         "tail_ratio": tail_ratio,
         "num_trades": len(trades),
-        "win_rate_pct": round(100 * len(win_trades) / len(trades), 1) if trades else 0,
+        "win_rate_pct": round(100 * win_trades_count / len(trades), 1) if trades else 0,
         "avg_win": avg_win,
         "avg_loss": avg_loss,
         "max_consec_loss": max_consec_loss,
@@ -147,6 +149,7 @@ def _compute_metrics(
     }
 
 
+@tracing.traced("engine.loop")
 def _run_backtest_on_rows(
     rows: list[dict[str, Any]],
     exchange_id: str,
@@ -162,15 +165,17 @@ def _run_backtest_on_rows(
     stop_loss_pct: float | None,
     fee_rate: float = 0.0,
     slippage: float = 0.0,
+    signals: list[int] | None = None,
 ) -> BacktestResult:
-    """核心回測邏輯。fee_rate 和 slippage 為百分比（如 0.05 = 0.05%）。"""
+    """核心回測邏輯。fee_rate 和 slippage 為百分比（如 0.05 = 0.05%）；signals 給定時略過策略計算。"""
     out = BacktestResult()
     if not rows:
         out.error = "無 K 線資料，請先拉取數據或調整時間範圍。"
         return out
 
+    started = time.perf_counter()
     out.raw_ohlcv = rows
-    sig = strategies.get_signal(strategy, rows, **strategy_params)
+    sig = signals if signals is not None else strategies.get_signal(strategy, rows, **strategy_params)
 
     cost_pct = (fee_rate + slippage) / 100
     total_fees = 0.0
@@ -339,9 +344,11 @@ def _run_backtest_on_rows(
     out.metrics["total_fees"] = round(total_fees, 2)
     out.metrics["fee_rate_pct"] = fee_rate
     out.metrics["slippage_pct"] = slippage
+    metrics.record_backtest("loop", len(rows), time.perf_counter() - started)
     return out
 
 
+@profiler.profiled()
 def run_backtest(
     exchange_id: str,
     symbol: str,
@@ -355,11 +362,19 @@ def run_backtest(
     take_profit_pct: float | None = None,
     stop_loss_pct: float | None = None,
     exclude_outliers: bool = False,
+    fee_rate: float = 0.0,
+    slippage: float = 0.0,
+    use_cache: bool = True,
+    profile: bool | None = None,
 ) -> BacktestResult:
     """
     執行回測。策略可選：sma_cross, buy_and_hold, rsi_signal, macd_cross, bollinger_signal。
     對外仍會自動透過 CryptoDataFetcher 取得 K 線。
+    use_cache=True 時經回測結果快取（src.core.result_cache），命中時回傳介面相容的 CachedBacktest。
+    profile=True（或 STOCKSX_PROFILE=1）時取樣剖析，摘要放在 result.profile。
     """
+    from src.data.crypto import CryptoDataFetcher
+
     strategy_params = strategy_params or {}
     out = BacktestResult()
     try:
@@ -371,20 +386,75 @@ def run_backtest(
         out.error = str(e)
         return out
 
-    return _run_backtest_on_rows(
-        rows=rows,
-        exchange_id=exchange_id,
-        symbol=symbol,
-        timeframe=timeframe,
-        since_ms=since_ms,
-        until_ms=until_ms,
-        strategy=strategy,
-        strategy_params=strategy_params,
+    def run() -> BacktestResult:
+        return _run_backtest_on_rows(
+            rows=rows,
+            exchange_id=exchange_id,
+            symbol=symbol,
+            timeframe=timeframe,
+            since_ms=since_ms,
+            until_ms=until_ms,
+            strategy=strategy,
+            strategy_params=strategy_params,
+            initial_equity=initial_equity,
+            leverage=leverage,
+            take_profit_pct=take_profit_pct,
+            stop_loss_pct=stop_loss_pct,
+            fee_rate=fee_rate,
+            slippage=slippage,
+        )
+
+    if not use_cache or not rows:
+        return run()
+    from src.core.result_cache import get_result_cache
+    from src.data.integrity import compute_data_hash
+
+    key = result_cache_key(
+        compute_data_hash(rows),
+        strategy,
+        strategy_params,
+        since_ms,
+        until_ms,
+        initial_equity=initial_equity,
+        leverage=leverage,
+        take_profit_pct=take_profit_pct,
+        stop_loss_pct=stop_loss_pct,
+        fee_rate=fee_rate,
+        slippage=slippage,
+    )
+    result = get_result_cache().get_or_run(key, run)
+    result.raw_ohlcv = rows
+    return result
+
+
+def result_cache_key(
+    data_hash: str,
+    strategy: str,
+    strategy_params: dict[str, Any],
+    since_ms: int,
+    until_ms: int,
+    initial_equity: float,
+    leverage: float,
+    take_profit_pct: float | None = None,
+    stop_loss_pct: float | None = None,
+    fee_rate: float = 0.0,
+    slippage: float = 0.0,
+) -> str:
+    """本引擎（_run_backtest_on_rows）的回測結果快取鍵；回測設定對應到 BacktestConfig，與 core 引擎分開。"""
+    from src.core.backtest import BacktestConfig
+    from src.core.result_cache import backtest_cache_key
+
+    config = BacktestConfig(
         initial_equity=initial_equity,
         leverage=leverage,
+        fee_rate_pct=fee_rate,
+        slippage_pct=slippage,
         take_profit_pct=take_profit_pct,
         stop_loss_pct=stop_loss_pct,
     )
+    return backtest_cache_key(
+        data_hash, strategy, strategy_params, config, engine="loop", since_ms=since_ms, until_ms=until_ms
+    )
 
 
 # Public alias
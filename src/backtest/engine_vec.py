@@ -1,14 +1,18 @@
 # 向量化回測引擎 — NumPy 實作，比循環版快 10-100 倍
 from __future__ import annotations
 
+import time
 from typing import Any
 
 import numpy as np
 
+from src.utils import metrics, tracing
+
 from . import strategies
 from .engine import BacktestResult, _compute_metrics
 
 
+@tracing.traced("engine.vectorized")
 def _run_backtest_vectorized(
     rows: list[dict[str, Any]],
     exchange_id: str,
@@ -31,6 +35,7 @@ def _run_backtest_vectorized(
         out.error = "無 K 線資料"
         return out
 
+    started = time.perf_counter()
     n = len(rows)
     out.raw_ohlcv = rows
 
@@ -178,4 +183,5 @@ def _run_backtest_vectorized(
     out.metrics["total_fees"] = round(total_fees, 2)
     out.metrics["fee_rate_pct"] = fee_rate
     out.metrics["slippage_pct"] = slippage
+    metrics.record_backtest("vectorized", n, time.perf_counter() - started)
     return out
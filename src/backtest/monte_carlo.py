@@ -0,0 +1,307 @@
+# 路徑級蒙特卡羅回測 — 以回測結果的 K 線報酬 / 交易報酬重抽樣，整批 2-D 陣列運算得出回撤、報酬分佈與破產機率
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .engine import BacktestResult, _run_backtest_on_rows
+
+MC_METHODS = ("bootstrap", "shuffle")
+
+DEFAULT_CHUNK_BYTES = 64 * 1024 * 1024
+
+QUANTILES = (5, 25, 50, 75, 95)
+
+
+@dataclass(slots=True)
+class MonteCarloReport:
+    """蒙特卡羅結果：每條路徑的最終報酬、最大回撤（皆為比例）與是否觸及破產線"""
+
+    method: str
+    n_paths: int
+    horizon: int
+    final_returns: np.ndarray
+    max_drawdowns: np.ndarray
+    ruined: np.ndarray
+    ruin_threshold: float
+    variants: list[dict[str, Any]] = field(default_factory=list)
+
+    @property
+    def risk_of_ruin(self) -> float:
+        return float(self.ruined.mean()) if self.n_paths else 0.0
+
+    @property
+    def prob_loss(self) -> float:
+        return float((self.final_returns < 0).mean()) if self.n_paths else 0.0
+
+    def return_quantiles(self, qs: tuple[float, ...] = QUANTILES) -> dict[str, float]:
+        return _quantiles(self.final_returns, qs)
+
+    def drawdown_quantiles(self, qs: tuple[float, ...] = QUANTILES) -> dict[str, float]:
+        return _quantiles(self.max_drawdowns, qs)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "method": self.method,
+            "n_paths": self.n_paths,
+            "horizon": self.horizon,
+            "mean_return_pct": round(float(self.final_returns.mean()) * 100, 2) if self.n_paths else 0.0,
+            "return_pct_quantiles": {k: round(v * 100, 2) for k, v in self.return_quantiles().items()},
+            "max_drawdown_pct_quantiles": {k: round(v * 100, 2) for k, v in self.drawdown_quantiles().items()},
+            "prob_loss_pct": round(self.prob_loss * 100, 2),
+            "risk_of_ruin_pct": round(self.risk_of_ruin * 100, 2),
+            "ruin_threshold_pct": round(self.ruin_threshold * 100, 2),
+            "n_variants": len(self.variants),
+        }
+
+
+def _quantiles(values: np.ndarray, qs: tuple[float, ...]) -> dict[str, float]:
+    if len(values) == 0:
+        return {f"p{q:g}": 0.0 for q in qs}
+    return {f"p{q:g}": float(v) for q, v in zip(qs, np.percentile(values, qs))}
+
+
+# ════════════════════════════════════════════════════════════
+# 來源序列
+# ════════════════════════════════════════════════════════════
+
+
+def equity_returns(equity_curve: list[dict[str, Any]]) -> np.ndarray:
+    """權益曲線 → 逐 K 線報酬（權益歸零後報酬記為 0）"""
+    equity = np.array([p["equity"] for p in equity_curve], dtype=np.float64)
+    if len(equity) < 2:
+        return np.zeros(0)
+    prev = equity[:-1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(prev > 0, equity[1:] / prev - 1.0, 0.0)
+
+
+def trade_returns(trades: list[dict[str, Any]]) -> np.ndarray:
+    """交易明細 → 每筆交易對權益的報酬（pnl_pct 已含槓桿與成本）"""
+    return np.array([t.get("pnl_pct", 0.0) / 100.0 for t in trades], dtype=np.float64)
+
+
+# ════════════════════════════════════════════════════════════
+# 路徑抽樣與評估
+# ════════════════════════════════════════════════════════════
+
+
+def block_bootstrap_indices(
+    rng: np.random.Generator, n_paths: int, n_source: int, horizon: int, block_size: int
+) -> np.ndarray:
+    """
+    Moving-block bootstrap 索引 (n_paths, horizon)：隨機起點的連續區塊首尾相接，保留短期自相關。
+
+    Args:
+        rng: 隨機數產生器
+        n_paths: 路徑數
+        n_source: 來源序列長度
+        horizon: 每條路徑長度
+        block_size: 區塊長度（1 即 i.i.d. bootstrap）
+    """
+    block = max(1, min(block_size, n_source))
+    n_blocks = math.ceil(horizon / block)
+    starts = rng.integers(0, n_source - block + 1, size=(n_paths, n_blocks))
+    idx = starts[:, :, None] + np.arange(block)
+    return idx.reshape(n_paths, n_blocks * block)[:, :horizon]
+
+
+def shuffle_indices(rng: np.random.Generator, n_paths: int, n_source: int) -> np.ndarray:
+    """每條路徑一個隨機排列 (n_paths, n_source)"""
+    return rng.permuted(np.broadcast_to(np.arange(n_source), (n_paths, n_source)), axis=1)
+
+
+def path_statistics(returns: np.ndarray, ruin_threshold: float = 0.5) -> dict[str, np.ndarray]:
+    """
+    對 (路徑數, 期數) 報酬矩陣一次算出各路徑的最終報酬、最大回撤與是否破產。
+
+    權益由 1.0 起算、峰值初始為 1.0；權益任一時點 ≤ 1 - ruin_threshold 視為破產。
+
+    峰值包含初始權益，與 BacktestEngine 權益曲線（首點即初始權益）的 max_drawdown 口徑一致：
+    開局即下跌的虧損計入回撤。若只對累積權益本身取 cummax（峰值從第一期收盤起算），
+    第一期的虧損不算回撤，得到的數字會小於等於這裡的結果。
+    """
+    equity = np.cumprod(1.0 + returns, axis=1)
+    final = equity[:, -1] - 1.0 if equity.shape[1] else np.zeros(len(equity))
+    ruined = equity.min(axis=1, initial=1.0) <= 1.0 - ruin_threshold
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0, out=np.empty_like(equity)), axis=1)
+    np.divide(equity, peak, out=equity)
+    max_dd = 1.0 - equity.min(axis=1, initial=1.0)
+    return {"final_return": final, "max_drawdown": max_dd, "ruined": ruined}
+
+
+def simulate_paths(
+    returns: np.ndarray,
+    n_paths: int = 10_000,
+    method: str = "bootstrap",
+    block_size: int = 20,
+    horizon: int | None = None,
+    ruin_threshold: float = 0.5,
+    seed: int = 42,
+    max_chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+) -> MonteCarloReport:
+    """
+    由報酬序列產生 n_paths 條重抽樣路徑並彙總分佈；路徑分塊生成，單塊矩陣受 max_chunk_bytes 限制。
+
+    Args:
+        returns: 來源報酬 (T,)；或 (K, T) 多組來源（如參數擾動變體），每條路徑隨機選一組
+        n_paths: 路徑數
+        method: bootstrap（區塊重抽樣，可放回）/ shuffle（打亂順序，不放回，horizon 固定為 T）
+        block_size: bootstrap 區塊長度
+        horizon: 路徑長度（預設等於來源長度）
+        ruin_threshold: 破產線（自初始權益虧損的比例）
+        seed: 隨機種子（相同 seed 與分塊大小結果可重現）
+        max_chunk_bytes: 單塊報酬矩陣的記憶體上限
+
+    Returns:
+        MonteCarloReport
+    """
+    if method not in MC_METHODS:
+        raise ValueError(f"未知的模擬方法: {method}（可用: {', '.join(MC_METHODS)}）")
+    source = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    n_variants, n_source = source.shape
+    if n_source == 0:
+        raise ValueError("來源報酬序列為空")
+    if method == "shuffle":
+        horizon = n_source
+    horizon = horizon or n_source
+
+    rng = np.random.default_rng(seed)
+    # 索引、報酬、權益、峰值四個 (m, horizon) 矩陣
+    chunk = max(1, max_chunk_bytes // (horizon * 8 * 4))
+    parts: list[dict[str, np.ndarray]] = []
+    for done in range(0, n_paths, chunk):
+        m = min(chunk, n_paths - done)
+        if method == "bootstrap":
+            idx = block_bootstrap_indices(rng, m, n_source, horizon, block_size)
+        else:
+            idx = shuffle_indices(rng, m, n_source)
+        if n_variants == 1:
+            paths = source[0][idx]
+        else:
+            paths = source[rng.integers(0, n_variants, size=m)[:, None], idx]
+        parts.append(path_statistics(paths, ruin_threshold))
+
+    def _cat(key: str) -> np.ndarray:
+        return np.concatenate([p[key] for p in parts]) if parts else np.zeros(0)
+
+    return MonteCarloReport(
+        method=method,
+        n_paths=n_paths,
+        horizon=horizon,
+        final_returns=_cat("final_return"),
+        max_drawdowns=_cat("max_drawdown"),
+        ruined=_cat("ruined").astype(bool),
+        ruin_threshold=ruin_threshold,
+    )
+
+
+# ════════════════════════════════════════════════════════════
+# 回測結果入口
+# ════════════════════════════════════════════════════════════
+
+
+def monte_carlo_backtest(result: BacktestResult, method: str = "bootstrap", **kwargs: Any) -> MonteCarloReport:
+    """
+    對單次回測結果做蒙特卡羅分析。
+
+    - bootstrap：對權益曲線的逐 K 線報酬做區塊重抽樣
+    - shuffle：打亂交易順序（最終報酬不變，衡量回撤對交易順序的敏感度）
+
+    其餘參數見 simulate_paths。
+    """
+    if result.error:
+        raise ValueError(f"回測失敗，無法模擬: {result.error}")
+    source = equity_returns(result.equity_curve) if method == "bootstrap" else trade_returns(result.trades)
+    return simulate_paths(source, method=method, **kwargs)
+
+
+def jitter_params(
+    params: dict[str, Any], n_variants: int, jitter: float = 0.2, seed: int = 42
+) -> list[dict[str, Any]]:
+    """
+    在 ±jitter 比例內隨機擾動數值參數（整數參數四捨五入且至少為 1），去重後回傳；第一組為原始參數。
+    """
+    rng = np.random.default_rng(seed)
+    variants = [dict(params)]
+    seen = {tuple(sorted(params.items()))}
+    for _ in range(n_variants * 4):
+        if len(variants) >= n_variants:
+            break
+        cand: dict[str, Any] = {}
+        for k, v in params.items():
+            if isinstance(v, bool) or not isinstance(v, (int, float)):
+                cand[k] = v
+                continue
+            scaled = v * (1.0 + rng.uniform(-jitter, jitter))
+            cand[k] = max(1, int(round(scaled))) if isinstance(v, int) else float(scaled)
+        key = tuple(sorted(cand.items()))
+        if key not in seen:
+            seen.add(key)
+            variants.append(cand)
+    return variants
+
+
+def parameter_jitter(
+    rows: list[dict[str, Any]],
+    strategy: str,
+    params: dict[str, Any],
+    n_variants: int = 32,
+    jitter: float = 0.2,
+    initial_equity: float = 10000.0,
+    leverage: float = 1.0,
+    fee_rate: float = 0.0,
+    slippage: float = 0.0,
+    seed: int = 42,
+    run_backtest: Callable[..., BacktestResult] | None = None,
+    **kwargs: Any,
+) -> MonteCarloReport:
+    """
+    參數擾動：對擾動後的每組參數各跑一次回測，再以 (變體 × 區塊重抽樣) 產生路徑。
+
+    回測次數只等於變體數；路徑生成仍是一次 2-D 陣列運算。
+
+    Args:
+        rows: K 線
+        strategy: 策略名稱
+        params: 基準參數
+        n_variants: 參數變體數（含原始參數）
+        jitter: 擾動比例
+        run_backtest: 自訂回測函式（預設 _run_backtest_on_rows）
+        **kwargs: 傳給 simulate_paths（n_paths、block_size、horizon、ruin_threshold 等）
+    """
+    runner = run_backtest or _run_backtest_on_rows
+    variants = jitter_params(params, n_variants, jitter, seed)
+    curves: list[np.ndarray] = []
+    kept: list[dict[str, Any]] = []
+    for variant in variants:
+        res = runner(
+            rows=rows,
+            exchange_id="",
+            symbol="",
+            timeframe="",
+            since_ms=rows[0]["timestamp"],
+            until_ms=rows[-1]["timestamp"],
+            strategy=strategy,
+            strategy_params=variant,
+            initial_equity=initial_equity,
+            leverage=leverage,
+            take_profit_pct=None,
+            stop_loss_pct=None,
+            fee_rate=fee_rate,
+            slippage=slippage,
+        )
+        if res.error:
+            continue
+        curves.append(equity_returns(res.equity_curve))
+        kept.append(variant)
+    if not curves:
+        raise ValueError("所有參數變體回測皆失敗")
+
+    report = simulate_paths(np.vstack(curves), method="bootstrap", seed=seed, **kwargs)
+    report.variants = kept
+    return report
@@ -1,14 +1,26 @@
 # 即時最優策略：參數網格搜尋（支援並行窮舉）
 from __future__ import annotations
 
+import functools
 import itertools
+import logging
 import os
-from collections.abc import Callable
+import threading
+import time
+from collections.abc import Callable, Iterator
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Any
 
+from src.utils import metrics, profiler, tracing
+
 from . import strategies as _strategies_mod
-from .engine import BacktestResult, _run_backtest_on_rows, run_backtest
+from .engine import BacktestResult, _run_backtest_on_rows, result_cache_key, run_backtest
+from .search import SEARCH_MODES, Trial, bayes_search, encode_candidates, planned_evaluations, successive_halving
+
+logger = logging.getLogger(__name__)
+
+# 自適應搜尋時前綴數據的最少 K 線數（太短的前綴指標尚未暖機，分數沒有參考價值）
+MIN_SEARCH_ROWS = 100
 
 OBJECTIVES = {
     "sharpe_ratio": ("夏普比率", True),  # 越大越好
@@ -30,6 +42,86 @@ def _param_grid_to_list(param_grid: dict[str, list[Any]]) -> list[dict[str, Any]
     return [dict(zip(keys, c)) for c in combos]
 
 
+def _compare_score(res: BacktestResult, objective: str) -> float | None:
+    """回測結果 → 越大越好的比較分數（失敗或缺指標時為 None）"""
+    if res.error:
+        return None
+    score = res.metrics.get(objective)
+    if score is None:
+        return None
+    return -score if objective == "max_drawdown_pct" else score
+
+
+def _prefix_rows(rows: list[dict[str, Any]], fraction: float) -> list[dict[str, Any]]:
+    """取前 fraction 比例的 K 線（至少 MIN_SEARCH_ROWS 根）"""
+    if fraction >= 1.0:
+        return rows
+    return rows[: max(min(len(rows), MIN_SEARCH_ROWS), int(len(rows) * fraction))]
+
+
+def _adaptive_search(
+    candidates: list[dict[str, Any]],
+    run: Callable[[int, float], BacktestResult],
+    objective: str,
+    search: str,
+    n_trials: int | None,
+    seed: int,
+    eta: int,
+    on_trial: Callable[[Trial, int, int], None] | None = None,
+    executor: ThreadPoolExecutor | None = None,
+) -> list[Trial]:
+    """
+    以 successive halving 或貝氏最佳化搜尋候選；run(候選索引, 數據比例) 執行單次回測。
+    on_trial(trial, done, total) 每次評估後呼叫（在呼叫端線程）。
+    executor 給定時 halving 每一輪、bayes 的隨機初始化並行評估；bayes 的 EI 階段仍逐次評估。
+    """
+    from src.core.tasks import cancellation, check_cancelled, current_cancellation
+
+    total = planned_evaluations(search, len(candidates), n_trials, eta)
+    done = 0
+    cancel_flag = current_cancellation()
+
+    def evaluate(idx: int, fraction: float) -> tuple[float | None, BacktestResult]:
+        # 取消來源是線程區域的，在執行緒池 worker 內重新套用
+        with cancellation(cancel_flag):
+            check_cancelled()
+            started = time.perf_counter()
+            res = run(idx, fraction)
+        metrics.record_optimizer_task(search, time.perf_counter() - started, ok=not res.error)
+        return _compare_score(res, objective), res
+
+    def _on_trial(trial: Trial) -> None:
+        nonlocal done
+        done += 1
+        if on_trial:
+            on_trial(trial, done, max(total, done))
+
+    if executor is not None:
+        evaluate = tracing.propagate(evaluate)
+    if search == "halving":
+        return successive_halving(
+            len(candidates),
+            evaluate,
+            eta=eta,
+            max_candidates=n_trials,
+            seed=seed,
+            on_trial=_on_trial,
+            executor=executor,
+        )
+    return bayes_search(
+        encode_candidates(candidates), evaluate, n_trials=total, seed=seed, on_trial=_on_trial, executor=executor
+    )
+
+
+def _default_trials(search: str, n_candidates: int) -> int | None:
+    """halving 預設評估全部候選；bayes 預設評估約 1/10（至少 10 次）"""
+    if search == "bayes":
+        return min(n_candidates, max(10, n_candidates // 10))
+    return None
+
+
+@profiler.profiled()
+@tracing.traced("optimizer.find_optimal")
 def find_optimal(
     exchange_id: str,
     symbol: str,
@@ -50,17 +142,36 @@ def find_optimal(
         None,
     ]
     | None = None,
+    search: str = "grid",
+    n_trials: int | None = None,
+    seed: int = 42,
+    eta: int = 3,
+    use_cache: bool = True,
+    profile: bool | None = None,
 ) -> tuple[BacktestResult | None, list[dict[str, Any]]]:
     """
-    在給定策略的參數網格上做網格搜尋，依 objective 回傳最優回測結果與全部結果列表。
+    在給定策略的參數網格上做搜尋，依 objective 回傳最優回測結果與全部結果列表。
     on_progress(done, total, current_params, current_result, best_result_so_far, completed_results) 每完成一組即呼叫；
     completed_results 為目前已完成且成功的 [{params, result}, ...]，可畫每組參數一條線。
+
+    search:
+      - "grid"：窮舉（超過 max_combos 時截斷）
+      - "halving"：successive halving，先在短的數據前綴上評估全部組合，逐輪淘汰、晉級到更長的數據；
+        n_trials 為首輪候選上限（超過時以 seed 隨機抽樣）
+      - "bayes"：高斯過程代理模型 + Expected Improvement，n_trials 為全量回測次數
+    自適應模式不受 max_combos 截斷；completed_results 只包含全量數據的回測。
+    兩種模式都在呼叫端線程逐組評估；並行搜尋見 find_optimal_global(use_async=True) 或 Celery 分塊任務。
+    use_cache=True 時窮舉經回測結果快取：命中的組合直接取 metrics，未命中的只存摘要，最優組合另存完整結果。
+    profile=True（或 STOCKSX_PROFILE=1）時取樣剖析整個搜尋，摘要放在 best_result.profile。
     """
     config = _strategies_mod.STRATEGY_CONFIG.get(strategy, {})
     grid = param_grid or config.get("param_grid") or {}
     defaults = config.get("defaults") or {}
     combos = _param_grid_to_list(grid)
-    if len(combos) > max_combos:
+    if search not in SEARCH_MODES:
+        raise ValueError(f"未知的搜尋模式: {search}（可用：{', '.join(SEARCH_MODES)}）")
+    if search == "grid" and len(combos) > max_combos:
+        logger.warning("參數組合 %d 組超過 max_combos=%d，僅搜尋前 %d 組", len(combos), max_combos, max_combos)
         combos = combos[:max_combos]
     total = len(combos)
 
@@ -85,22 +196,65 @@ def find_optimal(
     best_score: float = -float("inf")
     done = 0
 
-    for params in combos:
-        merged = {**defaults, **params}
-        res = _run_backtest_on_rows(
-            rows=rows,
-            exchange_id=exchange_id,
-            symbol=symbol,
-            timeframe=timeframe,
-            since_ms=since_ms,
-            until_ms=until_ms,
-            strategy=strategy,
-            strategy_params=merged,
-            initial_equity=initial_equity,
-            leverage=leverage,
-            take_profit_pct=take_profit_pct,
-            stop_loss_pct=stop_loss_pct,
-        )
+    if search != "grid":
+        candidates = [{**defaults, **params} for params in combos]
+
+        def run(idx: int, fraction: float) -> BacktestResult:
+            return _run_backtest_on_rows(
+                rows=_prefix_rows(rows, fraction),
+                exchange_id=exchange_id,
+                symbol=symbol,
+                timeframe=timeframe,
+                since_ms=since_ms,
+                until_ms=until_ms,
+                strategy=strategy,
+                strategy_params=candidates[idx],
+                initial_equity=initial_equity,
+                leverage=leverage,
+                take_profit_pct=take_profit_pct,
+                stop_loss_pct=stop_loss_pct,
+            )
+
+        def on_trial(trial: Trial, done: int, total: int) -> None:
+            nonlocal best_result, best_score
+            merged, res = candidates[trial.index], trial.payload
+            if trial.fraction >= 1.0:
+                if res.error:
+                    results_list.append({"params": merged, "error": res.error})
+                elif trial.score is not None:
+                    results_list.append(
+                        {"params": merged, "result": res, "metrics": res.metrics, "score": res.metrics.get(objective)}
+                    )
+                    if trial.score > best_score:
+                        best_score = trial.score
+                        best_result = res
+            if on_progress:
+                on_progress(done, total, merged, res, best_result, results_list)
+
+        trials = n_trials if n_trials is not None else _default_trials(search, len(candidates))
+        _adaptive_search(candidates, run, objective, search, trials, seed, eta, on_trial)
+        return best_result, results_list
+
+    param_sets = validate_param_sets(strategy, [{**defaults, **params} for params in combos])
+    evaluated = evaluate_param_sets(
+        rows,
+        strategy,
+        param_sets,
+        exchange_id=exchange_id,
+        symbol=symbol,
+        timeframe=timeframe,
+        since_ms=since_ms,
+        until_ms=until_ms,
+        initial_equity=initial_equity,
+        leverage=leverage,
+        take_profit_pct=take_profit_pct,
+        stop_loss_pct=stop_loss_pct,
+        use_cache=use_cache,
+    )
+    best_key: str | None = None
+    best_fresh = False
+
+    for merged, (res, key, fresh) in zip(param_sets, evaluated):
         done += 1
         if res.error:
             results_list.append({"params": merged, "error": res.error})
@@ -124,12 +278,121 @@ def find_optimal(
         if compare_score > best_score:
             best_score = compare_score
             best_result = res
+            best_key, best_fresh = key, fresh
         if on_progress:
             on_progress(done, total, merged, res, best_result, results_list)
 
+    if best_key is not None and best_fresh:
+        # 最優組合最可能被畫圖，另存權益曲線與交易明細
+        from src.core.result_cache import get_result_cache
+
+        get_result_cache().put(best_key, best_result)
     return best_result, results_list
 
 
+def validate_param_sets(strategy: str, param_sets: list[dict[str, Any]]) -> list[dict[str, Any]]:
+    """參數一次驗證（補預設值、統一型別）；未登記的策略原樣回傳."""
+    from src.core.registry import registry
+
+    if registry.get(strategy) is None:
+        return param_sets
+    return [registry.validate(strategy, merged) for merged in param_sets]
+
+
+def grid_param_sets(strategy: str, param_grid: dict[str, list[Any]] | None = None) -> list[dict[str, Any]]:
+    """展開參數網格（未給時用策略預設網格），補預設值並驗證；不截斷組合數."""
+    config = _strategies_mod.STRATEGY_CONFIG.get(strategy, {})
+    defaults = config.get("defaults") or {}
+    combos = _param_grid_to_list(param_grid or config.get("param_grid") or {})
+    return validate_param_sets(strategy, [{**defaults, **params} for params in combos])
+
+
+def evaluate_param_sets(
+    rows: list[dict[str, Any]],
+    strategy: str,
+    param_sets: list[dict[str, Any]],
+    *,
+    exchange_id: str,
+    symbol: str,
+    timeframe: str,
+    since_ms: int,
+    until_ms: int,
+    initial_equity: float = 10000.0,
+    leverage: float = 1.0,
+    take_profit_pct: float | None = None,
+    stop_loss_pct: float | None = None,
+    fee_rate: float = 0.0,
+    slippage: float = 0.0,
+    use_cache: bool = True,
+) -> Iterator[tuple[BacktestResult, str | None, bool]]:
+    """
+    依序回測已驗證的參數組（find_optimal 窮舉與 Celery 分塊任務共用）。
+
+    use_cache=True 時先查回測結果快取：命中的組合不必計算信號，權益曲線在畫圖時才載入或重算；
+    未命中的以 registry 批次信號計算（共用均線等中間結果），只存摘要。
+    在 ThreadTaskQueue 中執行時，每組之間檢查取消（TaskCancelled）。
+
+    Yields:
+        (結果, 快取鍵或 None, 是否為本次新算)，順序與 param_sets 相同
+    """
+    from src.core.registry import registry
+    from src.core.result_cache import get_result_cache
+    from src.core.tasks import check_cancelled
+
+    def run_one(merged: dict[str, Any], signals: list[int] | None = None) -> BacktestResult:
+        return _run_backtest_on_rows(
+            rows=rows,
+            exchange_id=exchange_id,
+            symbol=symbol,
+            timeframe=timeframe,
+            since_ms=since_ms,
+            until_ms=until_ms,
+            strategy=strategy,
+            strategy_params=merged,
+            initial_equity=initial_equity,
+            leverage=leverage,
+            take_profit_pct=take_profit_pct,
+            stop_loss_pct=stop_loss_pct,
+            fee_rate=fee_rate,
+            slippage=slippage,
+            signals=signals,
+        )
+
+    cache = get_result_cache() if use_cache else None
+    keys: list[str | None] = [None] * len(param_sets)
+    hits: list[BacktestResult | None] = [None] * len(param_sets)
+    if cache is not None and cache.enabled:
+        from src.data.integrity import compute_data_hash
+
+        data_hash = compute_data_hash(rows)
+        settings = {
+            "initial_equity": initial_equity,
+            "leverage": leverage,
+            "take_profit_pct": take_profit_pct,
+            "stop_loss_pct": stop_loss_pct,
+            "fee_rate": fee_rate,
+            "slippage": slippage,
+        }
+        keys = [result_cache_key(data_hash, strategy, m, since_ms, until_ms, **settings) for m in param_sets]
+        hits = [cache.get(key, rerun=functools.partial(run_one, m)) for key, m in zip(keys, param_sets)]
+    else:
+        cache = None
+    signal_sets = registry.get_signals_batch(strategy, rows, [m for m, hit in zip(param_sets, hits) if hit is None])
+
+    for index, merged in enumerate(param_sets):
+        check_cancelled()
+        res = hits[index]
+        if res is not None:
+            yield res, keys[index], False
+            continue
+        started = time.perf_counter()
+        res = run_one(merged, next(signal_sets))
+        metrics.record_optimizer_task("grid", time.perf_counter() - started, ok=not res.error)
+        if cache is not None:
+            cache.put(keys[index], res, detail=False)
+        yield res, keys[index], True
+
+
 # 全窮舉最優：策略 × K線週期 × 參數 一併搜尋（不截斷參數組合）
 DEFAULT_STRATEGIES_GLOBAL = ["sma_cross", "rsi_signal", "macd_cross", "bollinger_signal", "buy_and_hold"]
 DEFAULT_TIMEFRAMES_GLOBAL = ["1m", "5m", "15m", "1h", "4h", "1d"]
@@ -156,6 +419,7 @@ def _run_single_backtest_worker(args: tuple) -> tuple[str, str, dict[str, Any],
         stop_loss_pct,
         exclude_outliers,
     ) = args
+    started = time.perf_counter()
     res = run_backtest(
         exchange_id=exchange_id,
         symbol=symbol,
@@ -170,6 +434,7 @@ def _run_single_backtest_worker(args: tuple) -> tuple[str, str, dict[str, Any],
         stop_loss_pct=stop_loss_pct,
         exclude_outliers=exclude_outliers,
     )
+    metrics.record_optimizer_task("global", time.perf_counter() - started, ok=not res.error)
     return (strategy, timeframe, merged_params, res)
 
 
@@ -204,6 +469,8 @@ def _best_params_from_results(best_result: BacktestResult | None, results_list:
     return {}
 
 
+@profiler.profiled()
+@tracing.traced("optimizer.find_optimal_global")
 def find_optimal_global(
     exchange_id: str,
     symbol: str,
@@ -223,22 +490,55 @@ def find_optimal_global(
     slippage: float = 0.0,
     max_workers: int | None = None,
     on_global_progress: Callable[[str, str, int, int, BacktestResult | None, dict], None] | None = None,
+    search: str = "grid",
+    n_trials: int | None = None,
+    seed: int = 42,
+    eta: int = 3,
+    profile: bool | None = None,
 ) -> tuple[BacktestResult | None, str, str, dict[str, Any], list[dict[str, Any]]]:
     """
     在「策略 × K線週期 × 參數」上做全域搜尋，回傳全局最優。
     use_async=True 時以 ProcessPoolExecutor 並行窮舉，加快計算。
+    search="halving"|"bayes" 時改以自適應搜尋（見 find_optimal），每個 K 線週期只拉取一次數據；
+    use_async=True 時 halving 每一輪與 bayes 的隨機初始化同樣以 max_workers 個執行緒並行評估。
     回傳: (best_result, best_strategy, best_timeframe, best_params, results_by_combo).
+    profile=True（或 STOCKSX_PROFILE=1）時取樣剖析（含執行緒池 worker），摘要放在 best_result.profile。
     """
     strategies_list = strategies or DEFAULT_STRATEGIES_GLOBAL
     timeframes = timeframes or DEFAULT_TIMEFRAMES_GLOBAL
     if objective not in OBJECTIVES:
         objective = "sharpe_ratio"
+    if search not in SEARCH_MODES:
+        raise ValueError(f"未知的搜尋模式: {search}（可用：{', '.join(SEARCH_MODES)}）")
 
     full_grid = _build_full_grid(strategies_list, timeframes, max_combos_per_strategy)
     total_tasks = len(full_grid)
     if total_tasks == 0:
         return None, "", "", {}, []
 
+    if search != "grid":
+        return _find_optimal_global_adaptive(
+            full_grid,
+            exchange_id=exchange_id,
+            symbol=symbol,
+            since_ms=since_ms,
+            until_ms=until_ms,
+            objective=objective,
+            initial_equity=initial_equity,
+            leverage=leverage,
+            take_profit_pct=take_profit_pct,
+            stop_loss_pct=stop_loss_pct,
+            exclude_outliers=exclude_outliers,
+            fee_rate=fee_rate,
+            slippage=slippage,
+            on_global_progress=on_global_progress,
+            search=search,
+            n_trials=n_trials,
+            seed=seed,
+            eta=eta,
+            max_workers=(max_workers or min(32, (os.cpu_count() or 4))) if use_async else 1,
+        )
+
     # 組裝 worker 參數：(exchange_id, symbol, since_ms, until_ms, strategy, timeframe, merged_params,
     #                 initial_equity, leverage, take_profit_pct, stop_loss_pct, exclude_outliers)
     task_args = [
@@ -272,7 +572,8 @@ def find_optimal_global(
         done = 0
 
         with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {executor.submit(_run_single_backtest_worker, arg): arg for arg in task_args}
+            worker = tracing.propagate(_run_single_backtest_worker)
+            futures = {executor.submit(worker, arg): arg for arg in task_args}
             for future in as_completed(futures):
                 done += 1
                 try:
@@ -421,3 +722,105 @@ def find_optimal_global(
                     pass
 
     return global_best_result, global_best_strategy, global_best_timeframe, global_best_params, results_by_combo
+
+
+def _find_optimal_global_adaptive(
+    full_grid: list[tuple[str, str, dict[str, Any]]],
+    exchange_id: str,
+    symbol: str,
+    since_ms: int,
+    until_ms: int,
+    objective: str,
+    initial_equity: float,
+    leverage: float,
+    take_profit_pct: float | None,
+    stop_loss_pct: float | None,
+    exclude_outliers: bool,
+    fee_rate: float,
+    slippage: float,
+    on_global_progress: Callable[[str, str, int, int, BacktestResult | None, dict], None] | None,
+    search: str,
+    n_trials: int | None,
+    seed: int,
+    eta: int,
+    max_workers: int = 1,
+) -> tuple[BacktestResult | None, str, str, dict[str, Any], list[dict[str, Any]]]:
+    """
+    find_optimal_global 的自適應搜尋路徑：(策略, 週期, 參數) 三元組作為候選一起搜尋。
+    max_workers > 1 時同一輪的候選經執行緒池並行回測（與窮舉路徑相同）。
+    """
+    from src.data.crypto import CryptoDataFetcher
+
+    fetcher = CryptoDataFetcher(exchange_id)
+    rows_cache: dict[str, list] = {}
+    rows_lock = threading.Lock()
+
+    def get_rows(timeframe: str) -> list:
+        # 並行評估時同一週期只拉取一次
+        with rows_lock:
+            if timeframe not in rows_cache:
+                try:
+                    rows_cache[timeframe] = fetcher.get_ohlcv(
+                        symbol, timeframe, since_ms, until_ms, fill_gaps=True, exclude_outliers=exclude_outliers
+                    )
+                except Exception:
+                    rows_cache[timeframe] = []
+            return rows_cache[timeframe]
+
+    def run(idx: int, fraction: float) -> BacktestResult:
+        strategy, timeframe, params = full_grid[idx]
+        return _run_backtest_on_rows(
+            rows=_prefix_rows(get_rows(timeframe), fraction),
+            exchange_id=exchange_id,
+            symbol=symbol,
+            timeframe=timeframe,
+            since_ms=since_ms,
+            until_ms=until_ms,
+            strategy=strategy,
+            strategy_params=params,
+            initial_equity=initial_equity,
+            leverage=leverage,
+            take_profit_pct=take_profit_pct,
+            stop_loss_pct=stop_loss_pct,
+            fee_rate=fee_rate,
+            slippage=slippage,
+        )
+
+    best_per_combo: dict[tuple[str, str], tuple[float, dict[str, Any], BacktestResult]] = {}
+    best: tuple[float, str, str, dict[str, Any], BacktestResult] | None = None
+
+    def on_trial(trial: Trial, done: int, total: int) -> None:
+        nonlocal best
+        strategy, timeframe, params = full_grid[trial.index]
+        if trial.fraction >= 1.0 and trial.score is not None:
+            key = (strategy, timeframe)
+            if key not in best_per_combo or trial.score > best_per_combo[key][0]:
+                best_per_combo[key] = (trial.score, params, trial.payload)
+            if best is None or trial.score > best[0]:
+                best = (trial.score, strategy, timeframe, params, trial.payload)
+        if on_global_progress:
+            try:
+                on_global_progress(strategy, timeframe, done, total, best[4] if best else None, best[3] if best else {})
+            except Exception:
+                pass
+
+    # 策略與週期作為類別特徵，各策略的參數放在獨立的維度
+    candidates = [
+        {"strategy": s, "timeframe": tf, **{f"{s}.{k}": v for k, v in params.items()}} for s, tf, params in full_grid
+    ]
+    trials = n_trials if n_trials is not None else _default_trials(search, len(candidates))
+    workers = min(max_workers, len(candidates))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="optimizer") as executor:
+            _adaptive_search(candidates, run, objective, search, trials, seed, eta, on_trial, executor)
+    else:
+        _adaptive_search(candidates, run, objective, search, trials, seed, eta, on_trial)
+
+    results_by_combo = [
+        {"strategy": s, "timeframe": tf, "params": p, "result": r, "score": r.metrics.get(objective)}
+        for (s, tf), (_, p, r) in best_per_combo.items()
+    ]
+    if best is None:
+        return None, "", "", {}, results_by_combo
+    _, best_strategy, best_timeframe, best_params, best_result = best
+    return best_result, best_strategy, best_timeframe, best_params, results_by_combo
@@ -0,0 +1,274 @@
+# 自適應參數搜尋 — Successive Halving 與貝氏最佳化（GP + Expected Improvement）
+from __future__ import annotations
+
+import math
+from collections.abc import Callable
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+
+SEARCH_MODES = ("grid", "halving", "bayes")
+
+# evaluate(candidate_index, data_fraction) -> (score 越大越好 | None, payload)
+Evaluator = Callable[[int, float], tuple[float | None, Any]]
+
+
+@dataclass(slots=True)
+class Trial:
+    """單次評估：候選索引、使用的數據比例、分數（None 表示失敗）與回測結果"""
+
+    index: int
+    fraction: float
+    score: float | None
+    payload: Any = None
+
+
+# ════════════════════════════════════════════════════════════
+# 候選編碼
+# ════════════════════════════════════════════════════════════
+
+
+def encode_candidates(candidates: list[dict[str, Any]]) -> np.ndarray:
+    """
+    將參數字典編碼為 [0, 1] 特徵矩陣供代理模型使用。
+
+    數值參數以排序後的名次歸一化（缺少該參數的候選為 0）；非數值參數做 one-hot。
+    """
+    keys: list[str] = []
+    for cand in candidates:
+        for k in cand:
+            if k not in keys:
+                keys.append(k)
+
+    columns: list[np.ndarray] = []
+    for k in keys:
+        values = [cand.get(k) for cand in candidates]
+        present = [v for v in values if v is not None]
+        numeric = all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in present)
+        if numeric:
+            levels = sorted(set(present))
+            rank = {v: i for i, v in enumerate(levels)}
+            scale = max(len(levels) - 1, 1)
+            columns.append(np.array([0.0 if v is None else rank[v] / scale for v in values]))
+        else:
+            for level in dict.fromkeys(present):
+                columns.append(np.array([1.0 if v == level else 0.0 for v in values]))
+
+    if not columns:
+        return np.zeros((len(candidates), 1))
+    return np.column_stack(columns)
+
+
+def _map(executor: Executor | None, fn: Callable[[int], Any], indices: list[int]) -> Any:
+    """依序回傳 fn(idx)；有 executor 時並行評估"""
+    return executor.map(fn, indices) if executor is not None else map(fn, indices)
+
+
+# ════════════════════════════════════════════════════════════
+# Successive Halving
+# ════════════════════════════════════════════════════════════
+
+
+def halving_schedule(n_candidates: int, eta: int = 3, min_fraction: float | None = None) -> list[tuple[int, float]]:
+    """
+    回傳每一輪 (候選數, 數據比例)；最後一輪為全量數據。
+
+    Args:
+        n_candidates: 首輪候選數
+        eta: 每輪保留 1/eta
+        min_fraction: 首輪數據比例下限
+    """
+    if n_candidates <= 0:
+        return []
+    n_rungs = int(math.floor(math.log(n_candidates, eta) + 1e-9)) + 1 if n_candidates > 1 else 1
+    schedule = []
+    n = n_candidates
+    for r in range(n_rungs):
+        fraction = float(eta ** (r - n_rungs + 1))
+        if min_fraction is not None:
+            fraction = max(fraction, min_fraction)
+        schedule.append((n, min(fraction, 1.0)))
+        n = max(1, math.ceil(n / eta))
+    return schedule
+
+
+def successive_halving(
+    n_candidates: int,
+    evaluate: Evaluator,
+    eta: int = 3,
+    min_fraction: float | None = None,
+    max_candidates: int | None = None,
+    seed: int = 42,
+    on_trial: Callable[[Trial], None] | None = None,
+    executor: Executor | None = None,
+) -> list[Trial]:
+    """
+    Successive Halving：全部候選先在最短的數據前綴上評估，每輪只讓前 1/eta 晉級到更長的數據。
+
+    同一輪的候選彼此獨立；給定 executor 時整輪經 executor.map 並行評估，
+    結果依候選順序取回，淘汰結果與序列評估相同。
+
+    Args:
+        n_candidates: 候選總數
+        evaluate: 評估函式 (候選索引, 數據比例) -> (分數, payload)
+        eta: 淘汰比例
+        min_fraction: 首輪數據比例下限
+        max_candidates: 候選過多時隨機抽樣的上限
+        seed: 抽樣種子
+        on_trial: 每次評估後的回呼（依候選順序，在呼叫端線程）
+        executor: 並行評估同一輪候選的執行器（None 為序列評估）
+
+    Returns:
+        全部評估紀錄（依評估順序）
+    """
+    rng = np.random.default_rng(seed)
+    survivors = np.arange(n_candidates)
+    if max_candidates is not None and n_candidates > max_candidates:
+        survivors = np.sort(rng.choice(n_candidates, size=max_candidates, replace=False))
+
+    trials: list[Trial] = []
+    schedule = halving_schedule(len(survivors), eta, min_fraction)
+    for rung, (_, fraction) in enumerate(schedule):
+        scored: list[tuple[float, int]] = []
+        indices = survivors.tolist()
+        results = _map(executor, lambda idx: evaluate(idx, fraction), indices)
+        for idx, (score, payload) in zip(indices, results):
+            trial = Trial(idx, fraction, score, payload)
+            trials.append(trial)
+            if on_trial:
+                on_trial(trial)
+            if score is not None and np.isfinite(score):
+                scored.append((score, idx))
+        if not scored or rung == len(schedule) - 1:
+            break
+        keep = max(1, math.ceil(len(survivors) / eta))
+        # 同分時保留索引較小者，確保可重現
+        scored.sort(key=lambda t: (-t[0], t[1]))
+        survivors = np.array([idx for _, idx in scored[:keep]])
+    return trials
+
+
+# ════════════════════════════════════════════════════════════
+# 貝氏最佳化
+# ════════════════════════════════════════════════════════════
+
+
+class GaussianProcess:
+    """RBF 核的高斯過程迴歸（輸入應在 [0, 1]，輸出內部標準化）"""
+
+    def __init__(self, length_scale: float = 0.25, noise: float = 1e-6):
+        self.length_scale = length_scale
+        self.noise = noise
+
+    def _kernel(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        sq = np.sum(a**2, axis=1)[:, None] + np.sum(b**2, axis=1)[None, :] - 2 * a @ b.T
+        return np.exp(-0.5 * np.maximum(sq, 0.0) / self.length_scale**2)
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> GaussianProcess:
+        self._x = x
+        self._y_mean = float(np.mean(y))
+        self._y_std = float(np.std(y)) or 1.0
+        k = self._kernel(x, x) + (self.noise + 1e-8) * np.eye(len(x))
+        self._chol = np.linalg.cholesky(k)
+        z = (y - self._y_mean) / self._y_std
+        self._alpha = np.linalg.solve(self._chol.T, np.linalg.solve(self._chol, z))
+        return self
+
+    def predict(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        k_star = self._kernel(x, self._x)
+        mu = k_star @ self._alpha
+        v = np.linalg.solve(self._chol, k_star.T)
+        var = np.maximum(1.0 - np.sum(v**2, axis=0), 1e-12)
+        return mu * self._y_std + self._y_mean, np.sqrt(var) * self._y_std
+
+
+def expected_improvement(mu: np.ndarray, sigma: np.ndarray, best: float, xi: float = 0.01) -> np.ndarray:
+    """最大化問題的 Expected Improvement"""
+    from scipy.stats import norm
+
+    improve = mu - best - xi
+    z = improve / sigma
+    return improve * norm.cdf(z) + sigma * norm.pdf(z)
+
+
+def bayes_search(
+    features: np.ndarray,
+    evaluate: Evaluator,
+    n_trials: int,
+    n_initial: int | None = None,
+    seed: int = 42,
+    max_pool: int = 2000,
+    on_trial: Callable[[Trial], None] | None = None,
+    executor: Executor | None = None,
+) -> list[Trial]:
+    """
+    貝氏最佳化：隨機取 n_initial 個候選，之後每次以 GP 代理模型的 EI 最大者作為下一個評估點。
+
+    EI 階段每一步都依賴前一步的結果，本質上是序列的；executor 只用於並行評估隨機初始化的候選。
+
+    Args:
+        features: 候選特徵矩陣（encode_candidates 的輸出）
+        evaluate: 評估函式 (候選索引, 數據比例) -> (分數, payload)，此模式一律使用全量數據
+        n_trials: 總評估次數
+        n_initial: 隨機初始化次數（預設 n_trials 的 1/3，介於 3~10）
+        seed: 隨機種子
+        max_pool: 每輪計算 EI 的候選上限（超過時隨機抽樣）
+        on_trial: 每次評估後的回呼
+        executor: 並行評估初始候選的執行器（None 為序列評估）
+
+    Returns:
+        全部評估紀錄（依評估順序）
+    """
+    rng = np.random.default_rng(seed)
+    n_candidates = len(features)
+    n_trials = min(n_trials, n_candidates)
+    if n_initial is None:
+        n_initial = min(max(3, n_trials // 3), 10)
+    n_initial = min(n_initial, n_trials)
+
+    evaluated = np.zeros(n_candidates, dtype=bool)
+    trials: list[Trial] = []
+    xs: list[int] = []
+    ys: list[float] = []
+
+    def _record(idx: int, score: float | None, payload: Any) -> None:
+        evaluated[idx] = True
+        trial = Trial(idx, 1.0, score, payload)
+        trials.append(trial)
+        if score is not None and np.isfinite(score):
+            xs.append(idx)
+            ys.append(float(score))
+        if on_trial:
+            on_trial(trial)
+
+    def _run(idx: int) -> None:
+        _record(idx, *evaluate(idx, 1.0))
+
+    initial = rng.choice(n_candidates, size=n_initial, replace=False).tolist()
+    for idx, (score, payload) in zip(initial, _map(executor, lambda idx: evaluate(idx, 1.0), initial)):
+        _record(idx, score, payload)
+
+    gp = GaussianProcess()
+    while len(trials) < n_trials:
+        pool = np.flatnonzero(~evaluated)
+        if len(pool) > max_pool:
+            pool = rng.choice(pool, size=max_pool, replace=False)
+        if len(ys) < 2:
+            _run(int(rng.choice(pool)))
+            continue
+        mu, sigma = gp.fit(features[xs], np.asarray(ys)).predict(features[pool])
+        ei = expected_improvement(mu, sigma, max(ys))
+        _run(int(pool[int(np.argmax(ei))]))
+    return trials
+
+
+def planned_evaluations(search: str, n_candidates: int, n_trials: int | None, eta: int) -> int:
+    """預估評估次數（供 on_progress 的 total）"""
+    if search == "halving":
+        n = n_candidates if n_trials is None else min(n_trials, n_candidates)
+        return sum(k for k, _ in halving_schedule(n, eta))
+    if search == "bayes":
+        return min(n_trials or n_candidates, n_candidates)
+    return n_candidates
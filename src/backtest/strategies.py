@@ -2,6 +2,7 @@
 # v6.0 — NumPy 向量化優化版
 from __future__ import annotations
 
+from collections.abc import Callable, Iterator
 from typing import Any
 
 import numpy as np
@@ -96,9 +97,10 @@ def sma_cross(rows: list[dict[str, Any]], fast: int = 10, slow: int = 30) -> lis
     if n < slow:
         return [0] * n
     closes = _get_closes(rows)
-    fast_ma = _sma(closes, fast)
-    slow_ma = _sma(closes, slow)
+    return _sma_cross_from_lines(_sma(closes, fast), _sma(closes, slow), slow, n)
 
+
+def _sma_cross_from_lines(fast_ma: np.ndarray, slow_ma: np.ndarray, slow: int, n: int) -> list[int]:
     signals = np.zeros(n, dtype=np.int64)
     signals[slow:][fast_ma[slow:] > slow_ma[slow:]] = 1
     signals[slow:][fast_ma[slow:] < slow_ma[slow:]] = -1
@@ -404,92 +406,128 @@ def vwap_reversion(
 
 STRATEGY_CONFIG = {
     "sma_cross": {
+        "label": "雙均線交叉",
+        "category": "trend",
         "params": ["fast", "slow"],
         "param_grid": {"fast": [5, 10, 15, 20], "slow": [20, 30, 40, 50]},
         "defaults": {"fast": 10, "slow": 30},
     },
     "buy_and_hold": {
+        "label": "買入持有",
+        "category": "benchmark",
         "params": [],
         "param_grid": {},
         "defaults": {},
     },
     "rsi_signal": {
+        "label": "RSI",
+        "category": "oscillator",
         "params": ["period", "oversold", "overbought"],
         "param_grid": {"period": [10, 14, 20], "oversold": [25, 30], "overbought": [70, 75]},
         "defaults": {"period": 14, "oversold": 30, "overbought": 70},
     },
     "macd_cross": {
+        "label": "MACD 交叉",
+        "category": "trend",
         "params": ["fast", "slow", "signal"],
         "param_grid": {"fast": [8, 12], "slow": [26], "signal": [9]},
         "defaults": {"fast": 12, "slow": 26, "signal": 9},
     },
     "bollinger_signal": {
+        "label": "布林帶",
+        "category": "oscillator",
         "params": ["period", "std_dev"],
         "param_grid": {"period": [15, 20, 25], "std_dev": [1.5, 2.0, 2.5]},
         "defaults": {"period": 20, "std_dev": 2.0},
     },
     "ema_cross": {
+        "label": "EMA 交叉",
+        "category": "trend",
         "params": ["fast", "slow"],
         "param_grid": {"fast": [8, 12, 15], "slow": [21, 26, 34]},
         "defaults": {"fast": 12, "slow": 26},
     },
     "donchian_channel": {
+        "label": "唐奇安通道",
+        "category": "breakout",
         "params": ["period", "breakout_mode"],
         "param_grid": {"period": [10, 20, 30], "breakout_mode": [1]},
         "defaults": {"period": 20, "breakout_mode": 1},
     },
     "supertrend": {
+        "label": "超級趨勢",
+        "category": "trend",
         "params": ["period", "multiplier"],
         "param_grid": {"period": [7, 10, 14], "multiplier": [2.0, 3.0, 4.0]},
         "defaults": {"period": 10, "multiplier": 3.0},
     },
     "dual_thrust": {
+        "label": "雙推力",
+        "category": "breakout",
         "params": ["period", "k1", "k2"],
         "param_grid": {"period": [3, 4, 5], "k1": [0.4, 0.5, 0.6], "k2": [0.4, 0.5, 0.6]},
         "defaults": {"period": 4, "k1": 0.5, "k2": 0.5},
     },
     "vwap_reversion": {
+        "label": "VWAP 回歸",
+        "category": "mean_reversion",
         "params": ["period", "threshold"],
         "param_grid": {"period": [15, 20, 30], "threshold": [1.5, 2.0, 2.5]},
         "defaults": {"period": 20, "threshold": 2.0},
     },
     "ichimoku": {
+        "label": "一目均衡表",
+        "category": "trend",
         "params": ["tenkan", "kijun", "senkou_b"],
         "param_grid": {"tenkan": [9], "kijun": [26], "senkou_b": [52]},
         "defaults": {"tenkan": 9, "kijun": 26, "senkou_b": 52},
     },
     "stochastic": {
+        "label": "KD 隨機指標",
+        "category": "oscillator",
         "params": ["k_period", "d_period", "oversold", "overbought"],
         "param_grid": {"k_period": [9, 14], "d_period": [3], "oversold": [20], "overbought": [80]},
         "defaults": {"k_period": 14, "d_period": 3, "oversold": 20.0, "overbought": 80.0},
     },
     "williams_r": {
+        "label": "威廉指標",
+        "category": "oscillator",
         "params": ["period", "oversold", "overbought"],
         "param_grid": {"period": [10, 14, 21], "oversold": [-80], "overbought": [-20]},
         "defaults": {"period": 14, "oversold": -80.0, "overbought": -20.0},
     },
     "adx_trend": {
+        "label": "ADX 趨勢",
+        "category": "trend",
         "params": ["period", "threshold"],
         "param_grid": {"period": [10, 14, 20], "threshold": [20, 25, 30]},
         "defaults": {"period": 14, "threshold": 25.0},
     },
     "parabolic_sar": {
+        "label": "拋物線 SAR",
+        "category": "trend",
         "params": ["af_start", "af_step", "af_max"],
         "param_grid": {"af_start": [0.02], "af_step": [0.02], "af_max": [0.20]},
         "defaults": {"af_start": 0.02, "af_step": 0.02, "af_max": 0.20},
     },
     # ── 新增現代策略 ──
     "mean_reversion_zscore": {
+        "label": "Z 分數均值回歸",
+        "category": "mean_reversion",
         "params": ["period", "threshold"],
         "param_grid": {"period": [15, 20, 30], "threshold": [1.5, 2.0, 2.5]},
         "defaults": {"period": 20, "threshold": 2.0},
     },
     "momentum_roc": {
+        "label": "ROC 動量",
+        "category": "trend",
         "params": ["period", "threshold"],
         "param_grid": {"period": [5, 10, 20], "threshold": [2.0, 5.0, 10.0]},
         "defaults": {"period": 10, "threshold": 5.0},
     },
     "keltner_channel": {
+        "label": "肯特納通道",
+        "category": "breakout",
         "params": ["period", "atr_mult"],
         "param_grid": {"period": [15, 20, 25], "atr_mult": [1.5, 2.0, 2.5]},
         "defaults": {"period": 20, "atr_mult": 2.0},
@@ -780,11 +818,49 @@ _STRATEGY_FUNCS = {
 }
 
 
+# ════════════════════════════════════════════════════════════
+# 參數批次版（參數優化用）：收盤價與各週期均線只算一次，逐組產生信號
+# ════════════════════════════════════════════════════════════
+
+
+def _ma_cross_batch(
+    rows: list[dict[str, Any]],
+    param_list: list[dict[str, Any]],
+    ma: Callable[[np.ndarray, int], np.ndarray],
+    from_lines: Callable[[np.ndarray, np.ndarray, int, int], list[int]],
+) -> Iterator[list[int]]:
+    n = len(rows)
+    closes = _get_closes(rows)
+    lines: dict[int, np.ndarray] = {}
+    for params in param_list:
+        fast, slow = params["fast"], params["slow"]
+        if n < slow:
+            yield [0] * n
+            continue
+        for period in (fast, slow):
+            if period not in lines:
+                lines[period] = ma(closes, period)
+        yield from_lines(lines[fast], lines[slow], slow, n)
+
+
+def sma_cross_batch(rows: list[dict[str, Any]], param_list: list[dict[str, Any]]) -> Iterator[list[int]]:
+    """sma_cross 的參數批次版，結果與逐組呼叫 sma_cross 相同。"""
+    return _ma_cross_batch(rows, param_list, _sma, _sma_cross_from_lines)
+
+
+def ema_cross_batch(rows: list[dict[str, Any]], param_list: list[dict[str, Any]]) -> Iterator[list[int]]:
+    """ema_cross 的參數批次版（EMA 為逐根遞迴，共用後省下大部分計算）。"""
+    return _ma_cross_batch(rows, param_list, _ema, lambda f, s, _slow, n: _signals_from_crossover(f, s, n))
+
+
+_BATCH_FUNCS = {
+    "sma_cross": sma_cross_batch,
+    "ema_cross": ema_cross_batch,
+}
+
+
 def get_signal(strategy: str, rows: list[dict[str, Any]], **kwargs: Any) -> list[int]:
-    """依策略名稱與參數產生信號。"""
-    func = _STRATEGY_FUNCS.get(strategy)
-    if func:
-        if strategy == "buy_and_hold":
-            return func(rows)
-        return func(rows, **kwargs)
-    return [0] * len(rows)
+    """依策略名稱與參數產生信號（經 src.core.registry 統一分派）。"""
+    from src.core.registry import registry
+
+    return registry.get_signal(strategy, rows, **kwargs)
@@ -1,13 +1,210 @@
-# Walk-Forward Analysis — 防止過擬合的樣本外驗證框架
+# Walk-Forward Analysis — 防止過擬合的樣本外驗證框架（多種切分模式、進程池並行、指標全序列共用）
 from __future__ import annotations
 
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
+from src.utils import profiler, tracing
+
 from . import strategies as _strat_mod
 from .engine import _run_backtest_on_rows
 from .optimizer import _param_grid_to_list
 
+SPLIT_MODES = ("fixed", "anchored", "rolling", "purged")
+
+MIN_TRAIN_BARS = 10
+MIN_TEST_BARS = 5
+
+_OHLCV_KEYS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+# ════════════════════════════════════════════════════════════
+# 分段
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class WFFold:
+    """單一分段的索引範圍（半開區間）；purged 模式的訓練集可由多段組成"""
+
+    fold: int
+    train: list[tuple[int, int]] = field(default_factory=list)
+    test: tuple[int, int] = (0, 0)
+
+    @property
+    def train_bars(self) -> int:
+        return sum(end - start for start, end in self.train)
+
+    @property
+    def test_bars(self) -> int:
+        return self.test[1] - self.test[0]
+
+
+def make_folds(
+    n: int,
+    n_splits: int,
+    train_ratio: float = 0.7,
+    split: str = "fixed",
+    purge: int = 0,
+    embargo: int = 0,
+) -> list[WFFold]:
+    """
+    產生 Walk-Forward 分段。
+
+    - fixed：切成 n_splits 段，每段前 train_ratio 訓練、其餘測試（原有行為）
+    - anchored：最後 (1 - train_ratio) 的數據均分為 n_splits 個測試窗，訓練集固定從頭開始（擴張窗）
+    - rolling：測試窗同 anchored，訓練集為測試窗前固定長度的滑動窗
+    - purged：n_splits 折交叉驗證，訓練集為測試折以外的所有數據，並剔除測試折前 purge 根、後 embargo 根
+
+    Args:
+        n: K 線總數
+        n_splits: 分段數
+        train_ratio: 訓練集比例
+        split: 切分模式
+        purge: 訓練集與測試集之間剔除的 K 線數（避免標籤重疊洩漏）
+        embargo: purged 模式中測試折之後禁用的 K 線數
+
+    Returns:
+        分段列表（不含過短分段的過濾，由呼叫端依 MIN_TRAIN_BARS / MIN_TEST_BARS 判斷）
+    """
+    if split not in SPLIT_MODES:
+        raise ValueError(f"未知的切分模式: {split}（可用: {', '.join(SPLIT_MODES)}）")
+    if n_splits < 1 or n <= 0:
+        return []
+
+    folds: list[WFFold] = []
+    if split == "fixed":
+        split_size = n // n_splits
+        for k in range(n_splits):
+            start = k * split_size
+            end = min(start + split_size, n)
+            train_end = start + int((end - start) * train_ratio)
+            folds.append(WFFold(k + 1, [(start, max(start, train_end - purge))], (train_end, end)))
+    elif split in ("anchored", "rolling"):
+        test_size = int(n * (1 - train_ratio)) // n_splits
+        first_test = n - test_size * n_splits
+        for k in range(n_splits):
+            test_start = first_test + k * test_size
+            train_start = 0 if split == "anchored" else test_start - first_test
+            train = [(train_start, max(train_start, test_start - purge))]
+            folds.append(WFFold(k + 1, train, (test_start, test_start + test_size)))
+    else:
+        block = n // n_splits
+        for k in range(n_splits):
+            test_start = k * block
+            test_end = n if k == n_splits - 1 else test_start + block
+            segments = [(0, test_start - purge), (test_end + embargo, n)]
+            train = [(a, b) for a, b in segments if b - a >= MIN_TRAIN_BARS]
+            folds.append(WFFold(k + 1, train, (test_start, test_end)))
+    return folds
+
+
+# ════════════════════════════════════════════════════════════
+# 分段評估（主進程或 worker 共用）
+# ════════════════════════════════════════════════════════════
+
+
+def _rows_to_arrays(rows: list[dict[str, Any]]) -> dict[str, np.ndarray]:
+    arrays = {k: np.array([r.get(k, 0) for r in rows], dtype=np.float64) for k in _OHLCV_KEYS[1:]}
+    arrays["timestamp"] = np.array([r["timestamp"] for r in rows], dtype=np.int64)
+    return arrays
+
+
+def _arrays_to_rows(arrays: dict[str, np.ndarray]) -> list[dict[str, Any]]:
+    columns = [arrays[k].tolist() for k in _OHLCV_KEYS]
+    return [dict(zip(_OHLCV_KEYS, values)) for values in zip(*columns)]
+
 
+class _FoldRunner:
+    """
+    持有完整 K 線與回測設定，負責單一 (分段, 參數) 的評估。
+
+    reuse_signals=True 時每組參數只在全序列上計算一次信號，各分段以索引窗切片取用；
+    指標因此以分段之前的歷史暖身，信號仍只依賴過去數據。
+    """
+
+    def __init__(self, rows: list[dict[str, Any]], context: dict[str, Any]):
+        self.rows = rows
+        self.ctx = context
+        self._signals: dict[tuple, np.ndarray] = {}
+
+    def _full_signals(self, params: dict[str, Any]) -> np.ndarray:
+        key = tuple(sorted(params.items()))
+        sig = self._signals.get(key)
+        if sig is None:
+            sig = np.asarray(_strat_mod.get_signal(self.ctx["strategy"], self.rows, **params), dtype=np.int8)
+            self._signals[key] = sig
+        return sig
+
+    def backtest(self, start: int, end: int, params: dict[str, Any]):
+        rows = self.rows[start:end]
+        signals = self._full_signals(params)[start:end].tolist() if self.ctx["reuse_signals"] else None
+        return _run_backtest_on_rows(
+            rows=rows,
+            exchange_id=self.ctx["exchange_id"],
+            symbol=self.ctx["symbol"],
+            timeframe=self.ctx["timeframe"],
+            since_ms=rows[0]["timestamp"],
+            until_ms=rows[-1]["timestamp"],
+            strategy=self.ctx["strategy"],
+            strategy_params=params,
+            initial_equity=self.ctx["initial_equity"],
+            leverage=self.ctx["leverage"],
+            take_profit_pct=None,
+            stop_loss_pct=None,
+            fee_rate=self.ctx["fee_rate"],
+            slippage=self.ctx["slippage"],
+            signals=signals,
+        )
+
+    def score(self, fold: WFFold, params: dict[str, Any]) -> float | None:
+        """In-sample 分數；多段訓練集以 K 線數加權平均"""
+        scores: list[tuple[float, int]] = []
+        for start, end in fold.train:
+            res = self.backtest(start, end, params)
+            if res.error:
+                continue
+            score = res.metrics.get(self.ctx["objective"], 0)
+            if score is not None:
+                scores.append((score, end - start))
+        if not scores:
+            return None
+        if len(scores) == 1:
+            return scores[0][0]
+        return sum(s * w for s, w in scores) / sum(w for _, w in scores)
+
+    def out_of_sample(self, fold: WFFold, params: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        res = self.backtest(fold.test[0], fold.test[1], params)
+        return (res.metrics if not res.error else {}), (res.equity_curve or [])
+
+
+_worker_runner: _FoldRunner | None = None
+
+
+def _init_wf_worker(arrays: dict[str, np.ndarray], context: dict[str, Any]) -> None:
+    global _worker_runner
+    _worker_runner = _FoldRunner(_arrays_to_rows(arrays), context)
+
+
+def _score_task(task: tuple[WFFold, dict[str, Any]]) -> float | None:
+    return _worker_runner.score(*task)
+
+
+def _oos_task(task: tuple[WFFold, dict[str, Any]]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    return _worker_runner.out_of_sample(*task)
+
+
+# ════════════════════════════════════════════════════════════
+# 主流程
+# ════════════════════════════════════════════════════════════
+
+
+@profiler.profiled()
+@tracing.traced("walk_forward")
 def walk_forward_analysis(
     rows: list[dict[str, Any]],
     exchange_id: str,
@@ -23,13 +220,29 @@ def walk_forward_analysis(
     leverage: float = 1.0,
     fee_rate: float = 0.0,
     slippage: float = 0.0,
+    split: str = "fixed",
+    purge: int = 0,
+    embargo: int = 0,
+    n_jobs: int = 1,
+    reuse_signals: bool = False,
+    profile: bool | None = None,
 ) -> dict[str, Any]:
     """
     Walk-Forward Analysis：
-    1. 將數據切成 n_splits 段
-    2. 每段用前 train_ratio 做 in-sample 優化，後面做 out-of-sample 驗證
+    1. 依 split 模式切出 n_splits 個 (訓練, 測試) 分段
+    2. 每段在訓練集上做 in-sample 優化，再以最優參數做 out-of-sample 驗證
     3. 彙總 out-of-sample 結果，避免過擬合
+
+    Args:
+        split: fixed / anchored / rolling / purged，見 make_folds
+        purge: 訓練集與測試集之間剔除的 K 線數
+        embargo: purged 模式中測試折之後禁用的 K 線數
+        n_jobs: >1 時以進程池並行評估所有 (分段 × 參數)；K 線以 NumPy 陣列傳給 worker 一次
+        reuse_signals: 每組參數只在全序列計算一次信號，各分段以索引窗切片（指標以前段歷史暖身）
+        profile: 取樣剖析（None 時依 STOCKSX_PROFILE）；進程池各 worker 分別取樣後合併，摘要放在 result["profile"]
     """
+    if split not in SPLIT_MODES:
+        raise ValueError(f"未知的切分模式: {split}（可用: {', '.join(SPLIT_MODES)}）")
     if not rows or len(rows) < 50:
         return {"error": "數據不足（至少 50 根 K 線）", "splits": []}
 
@@ -41,81 +254,71 @@ def walk_forward_analysis(
     config = _strat_mod.STRATEGY_CONFIG.get(strategy, {})
     param_grid = config.get("param_grid", {})
     defaults = config.get("defaults", {})
-    combos = _param_grid_to_list(param_grid)
+    combos = [{**defaults, **params} for params in _param_grid_to_list(param_grid)]
 
-    results = []
-    oos_equities = []
+    folds = [
+        f
+        for f in make_folds(n, n_splits, train_ratio, split, purge, embargo)
+        if f.train_bars >= MIN_TRAIN_BARS and f.test_bars >= MIN_TEST_BARS
+    ]
+    if not folds:
+        return {"error": "所有分段均失敗", "splits": []}
 
-    for fold in range(n_splits):
-        start_idx = fold * split_size
-        end_idx = min(start_idx + split_size, n)
-        fold_rows = rows[start_idx:end_idx]
-
-        train_end = int(len(fold_rows) * train_ratio)
-        train_rows = fold_rows[:train_end]
-        test_rows = fold_rows[train_end:]
-
-        if len(train_rows) < 10 or len(test_rows) < 5:
-            continue
-
-        train_since = train_rows[0]["timestamp"]
-        train_until = train_rows[-1]["timestamp"]
-        test_since = test_rows[0]["timestamp"]
-        test_until = test_rows[-1]["timestamp"]
-
-        # In-sample: 找最優參數
-        best_score = -float("inf")
-        best_params = dict(defaults)
-
-        for params in combos:
-            merged = {**defaults, **params}
-            res = _run_backtest_on_rows(
-                rows=train_rows,
-                exchange_id=exchange_id,
-                symbol=symbol,
-                timeframe=timeframe,
-                since_ms=train_since,
-                until_ms=train_until,
-                strategy=strategy,
-                strategy_params=merged,
-                initial_equity=initial_equity,
-                leverage=leverage,
-                take_profit_pct=None,
-                stop_loss_pct=None,
-                fee_rate=fee_rate,
-                slippage=slippage,
-            )
-            if res.error:
-                continue
-            score = res.metrics.get(objective, 0)
-            if score is not None and score > best_score:
-                best_score = score
-                best_params = merged
+    context = {
+        "exchange_id": exchange_id,
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "strategy": strategy,
+        "objective": objective,
+        "initial_equity": initial_equity,
+        "leverage": leverage,
+        "fee_rate": fee_rate,
+        "slippage": slippage,
+        "reuse_signals": reuse_signals,
+    }
+    # 參數優先排列，同一 worker 連續處理同組參數的各分段，全序列信號只算一次
+    order = [(i, params) for params in combos for i in range(len(folds))]
+    tasks = [(folds[i], params) for i, params in order]
 
-        # Out-of-sample: 用最優參數測試
-        oos_res = _run_backtest_on_rows(
-            rows=test_rows,
-            exchange_id=exchange_id,
-            symbol=symbol,
-            timeframe=timeframe,
-            since_ms=test_since,
-            until_ms=test_until,
-            strategy=strategy,
-            strategy_params=best_params,
-            initial_equity=initial_equity,
-            leverage=leverage,
-            take_profit_pct=None,
-            stop_loss_pct=None,
-            fee_rate=fee_rate,
-            slippage=slippage,
+    workers = min(n_jobs if n_jobs > 0 else (os.cpu_count() or 1), len(tasks) or 1)
+    executor = None
+    if workers > 1:
+        executor = ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_wf_worker, initargs=(_rows_to_arrays(rows), context)
         )
+    try:
+        if executor is not None:
+            chunksize = max(len(folds), len(tasks) // (4 * workers))
+            score_task = tracing.propagate(profiler.sampled(_score_task))
+            scores = profiler.collect(executor.map(score_task, tasks, chunksize=chunksize))
+        else:
+            runner = _FoldRunner(rows, context)
+            scores = [runner.score(fold, params) for fold, params in tasks]
 
-        oos_metrics = oos_res.metrics if not oos_res.error else {}
+        # In-sample: 依參數順序取最優（同分保留先出現者，與逐一評估一致）
+        best: list[tuple[float, dict[str, Any]]] = [(-float("inf"), dict(defaults)) for _ in folds]
+        for (i, params), score in zip(order, scores):
+            if score is not None and score > best[i][0]:
+                best[i] = (score, params)
+
+        # Out-of-sample: 用最優參數測試
+        oos_tasks = [(fold, params) for fold, (_, params) in zip(folds, best)]
+        if executor is not None:
+            oos = profiler.collect(executor.map(tracing.propagate(profiler.sampled(_oos_task)), oos_tasks))
+        else:
+            oos = [runner.out_of_sample(fold, params) for fold, params in oos_tasks]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    results = []
+    oos_equities = []
+    for fold, (best_score, best_params), (oos_metrics, equity_curve) in zip(folds, best, oos):
         results.append(
             {
-                "fold": fold + 1,
-                "train_bars": len(train_rows),
-                "test_bars": len(test_rows),
+                "fold": fold.fold,
+                "train_bars": fold.train_bars,
+                "test_bars": fold.test_bars,
                 "best_params": best_params,
                 "in_sample_score": round(best_score, 4) if best_score > -float("inf") else None,
                 "oos_return_pct": oos_metrics.get("total_return_pct", 0),
@@ -124,12 +327,7 @@ def walk_forward_analysis(
                 "oos_trades": oos_metrics.get("num_trades", 0),
             }
         )
-
-        if oos_res.equity_curve:
-            oos_equities.extend(oos_res.equity_curve)
-
-    if not results:
-        return {"error": "所有分段均失敗", "splits": []}
+        oos_equities.extend(equity_curve)
 
     avg_oos_return = sum(r["oos_return_pct"] for r in results) / len(results)
     avg_oos_sharpe = sum(r["oos_sharpe"] for r in results) / len(results)
@@ -139,6 +337,7 @@ def walk_forward_analysis(
         "strategy": strategy,
         "n_splits": n_splits,
         "train_ratio": train_ratio,
+        "split": split,
         "splits": results,
         "avg_oos_return_pct": round(avg_oos_return, 2),
         "avg_oos_sharpe": round(avg_oos_sharpe, 2),
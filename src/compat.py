@@ -2,7 +2,7 @@
 Compatibility Bridge — 新舊架構橋接
 
 讓新的 BacktestReport 可被舊的 UI 渲染函數使用。
-同時提供 run_all_strategies 的新實現。
+同時提供 run_all_strategies 的新實現（經回測結果快取，重開同一組對比時直接命中）。
 """
 
 from __future__ import annotations
@@ -10,8 +10,10 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 from typing import Any
 
-from src.core.backtest import BacktestEngine, BacktestConfig, BacktestReport
+from src.core.backtest import BacktestEngine, BacktestConfig, BacktestReport, TradeRecord
 from src.core.registry import registry
+from src.core.result_cache import CachedBacktest, backtest_cache_key, get_result_cache
+from src.data.integrity import compute_data_hash
 
 
 # 定義本地 BacktestResult，避免導入舊 engine.py 的循環依賴
@@ -24,6 +26,7 @@ class BacktestResult:
     metrics: dict[str, Any] = field(default_factory=dict)
     raw_ohlcv: list[dict[str, Any]] = field(default_factory=list)
     error: str | None = None
+    chart_key: str | None = None  # 權益曲線已登記到 ChartLOD 時的鍵（session 內的精簡結果不帶 equity_curve）
 
 
 def report_to_result(report: BacktestReport) -> BacktestResult:
@@ -37,6 +40,28 @@ def report_to_result(report: BacktestReport) -> BacktestResult:
     return result
 
 
+def _run_cached(
+    engine: BacktestEngine,
+    rows: list[dict[str, Any]],
+    data_hash: str,
+    strategy: str,
+    strategy_params: dict[str, Any],
+    since_ms: int,
+    until_ms: int,
+) -> BacktestResult | CachedBacktest:
+    """經回測結果快取執行單一策略；命中時 metrics 立即可用，畫圖時才載入權益曲線與交易明細."""
+
+    def run() -> BacktestResult:
+        # 用 Registry 計算信號，再用新引擎執行回測
+        signals = registry.get_signal(strategy, rows, **strategy_params)
+        return report_to_result(engine.run(rows, signals, since_ms, until_ms))
+
+    key = backtest_cache_key(data_hash, strategy, strategy_params, engine.config, since_ms=since_ms, until_ms=until_ms)
+    result = get_result_cache().get_or_run(key, run, trade_factory=lambda t: TradeRecord(**t).to_dict())
+    result.raw_ohlcv = rows
+    return result
+
+
 def run_all_strategies_new(
     rows: list[dict[str, Any]],
     since_ms: int,
@@ -64,15 +89,12 @@ def run_all_strategies_new(
         stop_loss_pct=stop_loss_pct,
     )
     engine = BacktestEngine(config=config)
+    data_hash = compute_data_hash(rows)
 
     for meta in registry.list_all():
         strategy = meta.name
         try:
-            # 用 Registry 計算信號
-            signals = registry.get_signal(strategy, rows, **meta.defaults)
-            # 用新引擎執行回測
-            report = engine.run(rows, signals, since_ms, until_ms)
-            results[strategy] = report_to_result(report)
+            results[strategy] = _run_cached(engine, rows, data_hash, strategy, meta.defaults, since_ms, until_ms)
         except Exception as e:
             err_result = BacktestResult()
             err_result.error = str(e)
@@ -110,9 +132,7 @@ def run_single_strategy_new(
     engine = BacktestEngine(config=config)
 
     try:
-        signals = registry.get_signal(strategy, rows, **strategy_params)
-        report = engine.run(rows, signals, since_ms, until_ms)
-        return report_to_result(report)
+        return _run_cached(engine, rows, compute_data_hash(rows), strategy, strategy_params, since_ms, until_ms)
     except Exception as e:
         err_result = BacktestResult()
         err_result.error = str(e)
@@ -2,7 +2,7 @@
 StocksX Core — 現代化架構核心
 
 Provider → Pipeline → Signal → Backtest
-+ Middleware + CacheManager + Repository + TaskQueue + Alerts + DI Container
++ Middleware + CacheManager + ResultCache + ChartLOD + Repository + TaskQueue（Scheduler）+ Alerts + DI Container
 + WalkForwardAnalyzer
 
 所有組件通過 Protocol 定義介面，支持依賴注入與替換。
@@ -32,13 +32,16 @@ from .middleware import (
     with_middleware,
 )
 from .cache_manager import CacheManager, CacheNamespace, CacheStats, get_cache_manager
+from .result_cache import BacktestResultCache, CachedBacktest, backtest_cache_key, get_result_cache
+from .chart_lod import ChartLOD, get_chart_lod
 from .repository import (
     BacktestRepository,
     BacktestRecord,
     SqliteBacktestRepository,
     get_backtest_repository,
 )
-from .tasks import ThreadTaskQueue, TaskInfo, TaskStatus, get_task_queue
+from .scheduler import FairScheduler, Priority
+from .tasks import ThreadTaskQueue, TaskCancelled, TaskInfo, TaskStatus, check_cancelled, get_task_queue
 from .alerts import (
     AlertManager,
     AlertRule,
@@ -57,12 +60,6 @@ try:
 except ImportError:
     pass
 
-# 確保策略橋接被加載（註冊舊策略到新 Registry）
-try:
-    from . import strategies_bridge  # noqa: F401
-except Exception:
-    pass
-
 __all__ = [
     # Config
     "Settings",
@@ -108,6 +105,12 @@ __all__ = [
     "CacheNamespace",
     "CacheStats",
     "get_cache_manager",
+    "BacktestResultCache",
+    "CachedBacktest",
+    "backtest_cache_key",
+    "get_result_cache",
+    "ChartLOD",
+    "get_chart_lod",
     # Repository
     "BacktestRepository",
     "BacktestRecord",
@@ -117,7 +120,11 @@ __all__ = [
     "ThreadTaskQueue",
     "TaskInfo",
     "TaskStatus",
+    "TaskCancelled",
+    "check_cancelled",
     "get_task_queue",
+    "FairScheduler",
+    "Priority",
     # Alerts
     "AlertManager",
     "AlertRule",
@@ -12,6 +12,8 @@ from __future__ import annotations
 import logging
 import time
 
+from src.utils import metrics, tracing
+
 from .provider import CacheBackend, DictCache, MarketProvider, OHLCV, OrderBook, Ticker
 
 logger = logging.getLogger(__name__)
@@ -77,7 +79,8 @@ class CCXTProvider:
 
         try:
             raw_symbol = symbol.replace(":USDT", "")
-            ohlcv = self._exchange.fetch_ohlcv(raw_symbol, timeframe, since=since, limit=limit)
+            with tracing.span(f"{self.name}.fetch_ohlcv"), metrics.provider_timer(self.name, "fetch_ohlcv"):
+                ohlcv = self._exchange.fetch_ohlcv(raw_symbol, timeframe, since=since, limit=limit)
             rows = [
                 {
                     "timestamp": c[0],
@@ -106,7 +109,8 @@ class CCXTProvider:
 
         try:
             raw_symbol = symbol.replace(":USDT", "")
-            t = self._exchange.fetch_ticker(raw_symbol)
+            with tracing.span(f"{self.name}.fetch_ticker"), metrics.provider_timer(self.name, "fetch_ticker"):
+                t = self._exchange.fetch_ticker(raw_symbol)
             data = Ticker(
                 symbol=symbol,
                 price=float(t.get("last", 0)),
@@ -140,7 +144,8 @@ class CCXTProvider:
 
         try:
             raw_symbol = symbol.replace(":USDT", "")
-            ob = self._exchange.fetch_order_book(raw_symbol, limit=limit)
+            with tracing.span(f"{self.name}.fetch_orderbook"), metrics.provider_timer(self.name, "fetch_orderbook"):
+                ob = self._exchange.fetch_order_book(raw_symbol, limit=limit)
             return OrderBook(
                 symbol=symbol,
                 bids=ob.get("bids", []),
@@ -216,13 +221,14 @@ class YahooProvider:
             period = _YF_PERIODS.get(timeframe, "1y")
 
             ticker = yf.Ticker(symbol)
-            if since:
-                from datetime import datetime
+            with tracing.span(f"{self.name}.fetch_ohlcv"), metrics.provider_timer(self.name, "fetch_ohlcv"):
+                if since:
+                    from datetime import datetime
 
-                start = datetime.fromtimestamp(since / 1000)
-                df = ticker.history(start=start, interval=interval)
-            else:
-                df = ticker.history(period=period, interval=interval)
+                    start = datetime.fromtimestamp(since / 1000)
+                    df = ticker.history(start=start, interval=interval)
+                else:
+                    df = ticker.history(period=period, interval=interval)
 
             if df.empty:
                 return []
@@ -251,8 +257,9 @@ class YahooProvider:
             import yfinance as yf
 
             t = yf.Ticker(symbol)
-            info = t.fast_info
-            price = float(info.get("lastPrice", 0) or 0)
+            with tracing.span(f"{self.name}.fetch_ticker"), metrics.provider_timer(self.name, "fetch_ticker"):
+                info = t.fast_info
+                price = float(info.get("lastPrice", 0) or 0)
             prev = float(info.get("previousClose", 0) or 0)
             change_pct = ((price - prev) / prev * 100) if prev else 0
 
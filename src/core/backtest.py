@@ -11,9 +11,12 @@ from __future__ import annotations
 
 import logging
 import math
+import time
 from dataclasses import dataclass, field
 from typing import Any
 
+from src.utils import metrics, tracing
+
 from .pipeline import Pipeline
 
 logger = logging.getLogger(__name__)
@@ -275,6 +278,7 @@ class BacktestEngine:
         )
         return equity, trade
 
+    @tracing.traced("engine.core")
     def run(
         self,
         rows: list[dict[str, Any]],
@@ -283,6 +287,7 @@ class BacktestEngine:
         until_ms: int,
     ) -> BacktestReport:
         """執行回測."""
+        started = time.perf_counter()
         report = BacktestReport()
 
         # 預處理
@@ -416,4 +421,5 @@ class BacktestEngine:
         report.metrics["total_fees"] = round(total_fees, 2)
         report.metrics["fee_rate_pct"] = cfg.fee_rate_pct
         report.metrics["slippage_pct"] = cfg.slippage_pct
+        metrics.record_backtest("core", len(rows), time.perf_counter() - started)
         return report
@@ -14,9 +14,12 @@ CacheManager — 統一快取管理
 from __future__ import annotations
 
 import logging
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Any
 
+from src.utils import metrics
+
 from .provider import CacheBackend, DictCache, RedisCache
 
 logger = logging.getLogger(__name__)
@@ -133,6 +136,7 @@ class CacheManager:
             "user": self.user,
             "api": self.api,
         }
+        self._stats_sources: dict[str, Callable[[], dict[str, Any]]] = {}
 
     def namespace(self, name: str, default_ttl: int = 60) -> CacheNamespace:
         """取得或建立命名空間."""
@@ -141,6 +145,19 @@ class CacheManager:
             self._namespaces[name] = ns
         return self._namespaces[name]
 
+    def remote(self, name: str, default_ttl: int = 3600) -> CacheNamespace | None:
+        """取得 L2（Redis）命名空間，跨進程共享；未設定或無法使用 Redis 時回傳 None."""
+        if self._l2 is None or not getattr(self._l2, "_available", False):
+            return None
+        key = f"{name}@l2"
+        if key not in self._namespaces:
+            self._namespaces[key] = CacheNamespace(name, self._l2, default_ttl=default_ttl)
+        return self._namespaces[key]
+
+    def register_stats(self, name: str, stats_fn: Callable[[], dict[str, Any]]) -> None:
+        """登記外部快取（如回測結果快取）的統計來源，併入 all_stats 與 Prometheus 指標."""
+        self._stats_sources[name] = stats_fn
+
     def stats(self, name: str | None = None) -> dict[str, Any] | CacheStats:
         """取得快取統計。傳入 namespace 名稱返回 CacheStats，否則返回全部."""
         if name:
@@ -150,7 +167,10 @@ class CacheManager:
 
     def all_stats(self) -> dict[str, dict[str, Any]]:
         """所有命名空間的統計."""
-        return {name: ns.stats.to_dict() for name, ns in self._namespaces.items()}
+        stats = {name: ns.stats.to_dict() for name, ns in self._namespaces.items()}
+        for name, stats_fn in self._stats_sources.items():
+            stats[name] = stats_fn()
+        return stats
 
     def clear_all(self) -> None:
         """清空所有快取."""
@@ -168,4 +188,5 @@ def get_cache_manager(redis_url: str | None = None) -> CacheManager:
     global _cache_manager
     if _cache_manager is None:
         _cache_manager = CacheManager(redis_url=redis_url)
+        metrics.register_cache_stats(_cache_manager.all_stats)
     return _cache_manager
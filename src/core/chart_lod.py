@@ -0,0 +1,168 @@
+"""
+ChartLOD — 圖表層級細節（level-of-detail）服務
+
+回測頁面不再把完整 equity_curve / raw_ohlcv 交給 Plotly，也不必把它們留在 session_state：
+結果產生後登記一次，建好多解析度金字塔（src.utils.downsample）放在進程內 LRU，
+session 只保存鍵；每次畫圖依像素寬度與時間視窗取出固定點數的視圖。
+
+鍵：
+  權益曲線 — CachedBacktest 沿用回測快取鍵；其他結果以時間戳 + 權益的內容雜湊
+  K 線     — 時間戳 + OHLCV 的內容雜湊（同一份數據的多個結果共用一座金字塔）
+
+金字塔以 nbytes 計量，超過 memory_bytes 逐出最久未用；被逐出的鍵 get() 回傳 None，
+頁面需提示重新回測。
+
+用法：
+    lod = get_chart_lod()
+    key = lod.equity(result).key                      # 存入 session
+    view = lod.get(key).view(1200, start_ms, end_ms)  # {"timestamp", "equity", "drawdown_pct"}
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from .cache_manager import CacheStats
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+
+def _fingerprint(prefix: str, *arrays: Any) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    for values in arrays:
+        h.update(values.tobytes())
+    return f"{prefix}:{h.hexdigest()}"
+
+
+class ChartLOD:
+    """以記憶體用量為上限的金字塔 LRU；建構在鎖外進行，同鍵並發時以先完成者為準."""
+
+    def __init__(self, memory_bytes: int = 256 * MB) -> None:
+        self.memory_bytes = memory_bytes
+        self._pyramids: OrderedDict[str, Any] = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+
+    def get(self, key: str | None) -> Any | None:
+        """取得已登記的金字塔（SeriesPyramid / OhlcvPyramid）；不存在或已逐出時為 None."""
+        with self._lock:
+            pyramid = self._pyramids.get(key) if key else None
+            if pyramid is None:
+                self.stats.misses += 1
+                return None
+            self._pyramids.move_to_end(key)
+            self.stats.hits += 1
+            return pyramid
+
+    def _put(self, key: str, pyramid: Any) -> Any:
+        pyramid.key = key
+        with self._lock:
+            existing = self._pyramids.get(key)
+            if existing is not None:
+                return existing
+            self._pyramids[key] = pyramid
+            self._used += pyramid.nbytes
+            self.stats.sets += 1
+            while self._used > self.memory_bytes and len(self._pyramids) > 1:
+                _, evicted = self._pyramids.popitem(last=False)
+                self._used -= evicted.nbytes
+                self.stats.evictions += 1
+        return pyramid
+
+    def equity(self, result: Any, *, key: str | None = None) -> Any:
+        """
+        登記回測結果的權益曲線（含回撤%）。
+
+        Args:
+            result: BacktestResult / BacktestReport / CachedBacktest，或 equity_curve 本身
+            key: 指定鍵；預設依結果內容產生
+
+        Returns:
+            SeriesPyramid（.key 可存入 session）
+        """
+        from src.utils import downsample
+
+        if key is None and getattr(result, "key", None):
+            key = f"equity:{result.key}"
+        if key is not None and (cached := self.get(key)) is not None:
+            return cached
+        curve = getattr(result, "equity_curve", result)
+        ts = downsample.column(curve, "timestamp", dtype="int64")
+        equity = downsample.column(curve, "equity")
+        key = key or _fingerprint("equity", ts, equity)
+        if (cached := self.get(key)) is not None:
+            return cached
+        pyramid = downsample.SeriesPyramid(
+            ts, {"equity": equity, "drawdown_pct": downsample.drawdown_pct(equity)}, select=("equity", "drawdown_pct")
+        )
+        return self._put(key, pyramid)
+
+    def ohlcv(
+        self,
+        rows: Sequence[Mapping[str, Any]],
+        *,
+        key: str | None = None,
+        indicators: Callable[[dict[str, Any]], dict[str, Any]] | None = None,
+    ) -> Any:
+        """
+        登記 K 線（略過 filled 補值 K 線）。
+
+        Args:
+            rows: OHLCV dict 列表或 LazyRows
+            key: 指定鍵；預設依內容與 indicators 產生
+            indicators: 在完整數據上計算疊加指標的函式（columns → {名稱: 陣列}），結果併入金字塔
+
+        Returns:
+            OhlcvPyramid（.key 可存入 session）
+        """
+        import numpy as np
+
+        from src.utils import downsample
+
+        if key is not None and (cached := self.get(key)) is not None:
+            return cached
+        columns = {"timestamp": downsample.column(rows, "timestamp", dtype="int64")}
+        for name in downsample.OHLCV_COLUMNS:
+            columns[name] = downsample.column(rows, name)
+        filled = downsample.column(rows, "filled", dtype=bool, default=False)
+        if filled.any():
+            columns = {name: values[~filled] for name, values in columns.items()}
+        if key is None:
+            tag = getattr(indicators, "__qualname__", "") if indicators else ""
+            key = _fingerprint(f"ohlcv{tag and '+' + tag}", *(columns[n] for n in ("timestamp", "close", "volume")))
+            if (cached := self.get(key)) is not None:
+                return cached
+        if indicators is not None:
+            columns.update({name: np.asarray(values, dtype=np.float64) for name, values in indicators(columns).items()})
+        return self._put(key, downsample.OhlcvPyramid(columns))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._pyramids.clear()
+            self._used = 0
+
+    def stats_dict(self) -> dict[str, Any]:
+        return {**self.stats.to_dict(), "entries": len(self._pyramids), "memory_bytes": self._used}
+
+
+_chart_lod: ChartLOD | None = None
+
+
+def get_chart_lod() -> ChartLOD:
+    """取得全域圖表金字塔快取（容量見 CacheSettings.chart_lod_mb）."""
+    global _chart_lod
+    if _chart_lod is None:
+        from .cache_manager import get_cache_manager
+        from .config import get_settings
+
+        _chart_lod = ChartLOD(memory_bytes=get_settings().cache.chart_lod_mb * MB)
+        get_cache_manager().register_stats("chart_lod", _chart_lod.stats_dict)
+    return _chart_lod
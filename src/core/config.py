@@ -90,6 +90,14 @@ class CacheSettings:
     kline_ttl: int = 300
     orderbook_ttl: int = 1
     user_ttl: int = 30
+    # 回測結果快取（src.core.result_cache）
+    result_cache: bool = True
+    result_memory_mb: int = 64
+    result_disk_mb: int = 512  # 0 = 不寫磁碟
+    result_ttl: int = 7 * 86400
+    result_redis: bool = False  # 是否使用 Redis 作為 L2（跨進程 / 跨節點共享）
+    # 圖表降採樣金字塔（src.core.chart_lod）
+    chart_lod_mb: int = 256
 
     @classmethod
     def from_env(cls) -> CacheSettings:
@@ -99,6 +107,12 @@ class CacheSettings:
             kline_ttl=_env_int("CACHE_KLINE_TTL", 300),
             orderbook_ttl=_env_int("CACHE_ORDERBOOK_TTL", 1),
             user_ttl=_env_int("CACHE_USER_TTL", 30),
+            result_cache=_env_bool("BT_CACHE", True),
+            result_memory_mb=_env_int("BT_CACHE_MEMORY_MB", 64),
+            result_disk_mb=_env_int("BT_CACHE_DISK_MB", 512),
+            result_ttl=_env_int("BT_CACHE_TTL", 7 * 86400),
+            result_redis=_env_bool("BT_CACHE_REDIS", False),
+            chart_lod_mb=_env_int("CHART_LOD_MB", 256),
         )
 
 
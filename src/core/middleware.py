@@ -20,6 +20,8 @@ import time
 from typing import Any, TypeVar
 from collections.abc import Callable
 
+from src.utils import metrics, tracing
+
 T = TypeVar("T")
 logger = logging.getLogger(__name__)
 
@@ -131,6 +133,7 @@ class TimingMiddleware(Middleware):
     def after(self, context: dict[str, Any], result: Any) -> Any:
         elapsed = time.monotonic() - context.get("_timing_start", 0)
         context["elapsed_ms"] = round(elapsed * 1000, 1)
+        metrics.observe_middleware(context.get("name", ""), elapsed)
         return result
 
 
@@ -157,6 +160,10 @@ class MiddlewarePipeline:
     def execute(self, func: Callable[[], T], **context_kwargs: Any) -> T:
         """執行管道（支持 RetryMiddleware 自動重試）."""
         ctx: dict[str, Any] = {"name": self.name, **context_kwargs}
+        with tracing.span(f"middleware.{self.name}"):
+            return self._execute(func, ctx)
+
+    def _execute(self, func: Callable[[], T], ctx: dict[str, Any]) -> T:
         max_attempts = 1
 
         # 檢查是否有 RetryMiddleware，取得最大重試次數
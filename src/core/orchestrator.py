@@ -19,11 +19,14 @@ import logging
 import time
 from typing import Any
 
+from src.utils import tracing
+
 from .adapters import CompositeProvider
-from .backtest import BacktestConfig, BacktestEngine, BacktestReport
+from .backtest import BacktestConfig, BacktestEngine, BacktestReport, TradeRecord
 from .config import Settings, get_settings
 from .provider import CacheBackend, MarketProvider, OrderBook, Ticker, make_cache
 from .registry import registry
+from .result_cache import BacktestResultCache, backtest_cache_key, get_result_cache
 from .signals import Direction, Signal, get_signal_bus
 
 logger = logging.getLogger(__name__)
@@ -35,7 +38,7 @@ class Orchestrator:
 
     職責：
     1. 管理 Provider 生命週期
-    2. 執行回測
+    2. 執行回測（經回測結果快取）
     3. 計算信號
     4. 發布信號到 SignalBus
     """
@@ -45,18 +48,14 @@ class Orchestrator:
         settings: Settings | None = None,
         provider: MarketProvider | None = None,
         cache: CacheBackend | None = None,
+        result_cache: BacktestResultCache | None = None,
     ) -> None:
         self._settings = settings or get_settings()
         self._cache = cache or make_cache(self._settings.cache.redis_url)
+        self._result_cache = result_cache or get_result_cache()
         self._provider = provider or self._build_provider()
         self._signal_bus = get_signal_bus()
 
-        # 自動觸發策略橋接（import 時自動註冊）
-        try:
-            from . import strategies_bridge  # noqa: F401
-        except Exception:
-            logger.warning("Strategy bridge not available")
-
     def _build_provider(self) -> CompositeProvider:
         """構建默認 Provider 組合."""
         composite = CompositeProvider()
@@ -88,7 +87,9 @@ class Orchestrator:
         clean: bool = True,
     ) -> list[dict[str, Any]]:
         """取得 K 線數據（自動路由 Provider）."""
-        rows_ohlcv = self._provider.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+        with tracing.span("provider.fetch_ohlcv", symbol=symbol, timeframe=timeframe) as sp:
+            rows_ohlcv = self._provider.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
+            sp.set_attribute("rows", len(rows_ohlcv))
         rows = [r.to_dict() for r in rows_ohlcv]
 
         if clean and rows:
@@ -155,10 +156,25 @@ class Orchestrator:
 
         1. 取得數據（Provider）
         2. 清洗（Pipeline）
-        3. 計算信號（Registry）
-        4. 模擬交易（BacktestEngine）
-        5. 返回報告（BacktestReport）
+        3. 查詢結果快取（ResultCache），命中時跳過 4、5
+        4. 計算信號（Registry）
+        5. 模擬交易（BacktestEngine）
+        6. 返回報告（BacktestReport，快取命中時為介面相容的 CachedBacktest）
         """
+        with tracing.span("orchestrator.run_backtest", symbol=symbol, timeframe=timeframe, strategy=strategy):
+            return self._run_backtest(symbol, timeframe, strategy, since_ms, until_ms, config, clean, strategy_params)
+
+    def _run_backtest(
+        self,
+        symbol: str,
+        timeframe: str,
+        strategy: str,
+        since_ms: int | None,
+        until_ms: int | None,
+        config: BacktestConfig | None,
+        clean: bool,
+        strategy_params: dict[str, Any],
+    ) -> BacktestReport:
         until_ms = until_ms or int(time.time() * 1000)
         if since_ms is None:
             since_ms = until_ms - 180 * 86400 * 1000  # 預設 180 天
@@ -173,12 +189,6 @@ class Orchestrator:
         if not rows:
             return BacktestReport(error="指定時間範圍內無數據")
 
-        # Step 2: 計算信號
-        signals = registry.get_signal(strategy, rows, **strategy_params)
-        if not signals:
-            signals = [0] * len(rows)
-
-        # Step 3: 執行回測
         bt_config = config or BacktestConfig(
             initial_equity=self._settings.backtest.initial_equity,
             leverage=self._settings.backtest.leverage,
@@ -186,15 +196,38 @@ class Orchestrator:
             slippage_pct=self._settings.backtest.default_slippage_pct,
         )
 
+        # Step 2: 結果快取（同數據 + 策略 + 參數 + 設定直接回傳，權益曲線與交易明細延遲載入）
+        from src.data.integrity import compute_data_hash
+
+        key = backtest_cache_key(
+            compute_data_hash(rows), strategy, strategy_params, bt_config, since_ms=since_ms, until_ms=until_ms
+        )
         engine = BacktestEngine(config=bt_config)
-        report = engine.run(rows, signals, since_ms, until_ms)
 
-        # Step 4: 發布信號（如果有最新信號）
-        if signals and signals[-1] != 0:
+        def rerun() -> BacktestReport:
+            return engine.run(rows, registry.get_signal(strategy, rows, **strategy_params), since_ms, until_ms)
+
+        report = self._result_cache.get(key, rerun=rerun, trade_factory=lambda t: TradeRecord(**t))
+        if report is not None:
+            report.raw_ohlcv = rows
+            last_signal = report.meta.get("last_signal", 0)
+        else:
+            # Step 3: 計算信號
+            signals = registry.get_signal(strategy, rows, **strategy_params)
+            if not signals:
+                signals = [0] * len(rows)
+
+            # Step 4: 執行回測
+            report = engine.run(rows, signals, since_ms, until_ms)
+            last_signal = signals[-1]
+            self._result_cache.put(key, report, meta={"last_signal": last_signal})
+
+        # Step 5: 發布信號（如果有最新信號）
+        if last_signal != 0:
             signal = Signal(
                 symbol=symbol,
                 strategy=strategy,
-                direction=Direction(signals[-1]),
+                direction=Direction(last_signal),
                 price=rows[-1]["close"],
                 timestamp=rows[-1]["timestamp"],
             )
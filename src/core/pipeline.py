@@ -16,6 +16,8 @@ import logging
 from typing import Any, Generic, TypeVar
 from collections.abc import Callable
 
+from src.utils import tracing
+
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
@@ -69,15 +71,17 @@ class Pipeline(Generic[T]):
     def run(self, data: T) -> T:
         """執行管道."""
         result = data
-        for step in self._steps:
-            try:
-                result = step(result)
-            except Exception:
-                if step.skip_on_error:
-                    logger.warning("Pipeline [%s] step [%s] failed (skipped)", self.name, step.name)
-                else:
-                    logger.exception("Pipeline [%s] step [%s] failed", self.name, step.name)
-                    raise
+        with tracing.span(f"pipeline.{self.name}", steps=len(self._steps)):
+            for step in self._steps:
+                try:
+                    with tracing.span(f"{self.name}.{step.name}"):
+                        result = step(result)
+                except Exception:
+                    if step.skip_on_error:
+                        logger.warning("Pipeline [%s] step [%s] failed (skipped)", self.name, step.name)
+                    else:
+                        logger.exception("Pipeline [%s] step [%s] failed", self.name, step.name)
+                        raise
         return result
 
     def __len__(self) -> int:
@@ -120,13 +120,13 @@ class DictCache:
 
 
 class RedisCache:
-    """Redis 快取（生產用，跨進程共享）."""
+    """Redis 快取（生產用，跨進程共享）；值以 report_codec 列式編碼，K 線列表不再逐筆寫 JSON."""
 
     def __init__(self, redis_url: str = "redis://localhost:6379/0") -> None:
         try:
             import redis as redis_lib
 
-            self._client = redis_lib.from_url(redis_url, decode_responses=True)
+            self._client = redis_lib.from_url(redis_url, decode_responses=False)
             self._available = True
         except Exception:
             self._client = None
@@ -138,9 +138,13 @@ class RedisCache:
         try:
             val = self._client.get(key)  # type: ignore[union-attr]
             if val is not None:
+                from src.utils import report_codec
+
+                if report_codec.is_encoded(val):
+                    return report_codec.loads(val)
                 import json
 
-                return json.loads(val)
+                return json.loads(val)  # 升級前寫入的 JSON 值
         except Exception:
             pass
         return None
@@ -149,9 +153,9 @@ class RedisCache:
         if not self._available:
             return
         try:
-            import json
+            from src.utils import report_codec
 
-            self._client.setex(key, ttl, json.dumps(value))  # type: ignore[union-attr]
+            self._client.setex(key, ttl, report_codec.dumps(value))  # type: ignore[union-attr]
         except Exception:
             pass
 
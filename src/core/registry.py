@@ -10,13 +10,76 @@ Strategy Registry — 裝飾器註冊模式
 
   registry.get("sma_cross")  # → StrategyEntry(func, metadata)
   registry.list_by_category("trend")  # → [...]
+
+延遲載入：registry.add_loader("模組路徑") 登記註冊模組，第一次查詢
+（get / get_signal / list_* / names）時才 import，啟動時不載入策略實作。
+add_resolver(fn) 則在查無名稱時按需註冊（例如 src.strategies 的類別策略）。
+
+統一分派：同一策略可註冊多種實作（IMPL_KINDS），依呼叫場景預先編譯分派表：
+  registry.get_signal(name, rows, **p)                 # 單次回測：vectorized → scalar
+  registry.get_signals_batch(name, rows, param_list)   # 參數優化：batch → vectorized → scalar
+  registry.latest_signal(name, rows, **p)              # 即時交易：streaming → vectorized → scalar
+參數表（ParamSpec）在註冊時由函式簽名推得並驗證，呼叫端以 validate() 正規化輸入。
 """
 
 from __future__ import annotations
 
+import importlib
+import inspect
+import logging
+import numbers
 from dataclasses import dataclass, field
 from typing import Any
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
+
+from src.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# 實作種類：scalar / vectorized 為 rows → 完整信號序列；streaming 為 rows → 最新一根信號；
+# batch 為 (rows, param_list) → 逐組信號序列（可為生成器，共用中間結果）
+IMPL_KINDS = ("scalar", "vectorized", "streaming", "batch")
+
+# 呼叫場景 → 實作偏好順序（前者未註冊時自動退回後者）
+DISPATCH_ORDER: dict[str, tuple[str, ...]] = {
+    "single": ("vectorized", "scalar"),
+    "batch": ("batch", "vectorized", "scalar"),
+    "live": ("streaming", "vectorized", "scalar"),
+}
+
+_ANNOTATION_TYPES: dict[Any, type] = {"int": int, "float": float, "bool": bool, "str": str}
+_ANNOTATION_TYPES.update({t: t for t in (int, float, bool, str)})
+
+
+@dataclass(slots=True)
+class ParamSpec:
+    """策略參數規格（由函式簽名推得）."""
+
+    name: str
+    default: Any = None
+    type: type | None = None  # None 表示不檢查型別
+    required: bool = False
+
+    def coerce(self, value: Any) -> Any:
+        """依型別檢查並轉換參數值，不合法時拋出 ValueError."""
+        if self.type is None or value is None:
+            return value
+        if self.type is bool:
+            if isinstance(value, (bool, numbers.Integral)) and value in (0, 1):
+                return bool(value)
+        elif isinstance(value, bool):
+            pass
+        elif self.type is int:
+            if isinstance(value, numbers.Integral):
+                return int(value)
+            if isinstance(value, numbers.Real) and float(value).is_integer():
+                return int(value)
+        elif self.type is float:
+            if isinstance(value, numbers.Real):
+                return float(value)
+        elif isinstance(value, self.type):
+            return value
+        raise ValueError(f"參數 {self.name} 需為 {self.type.__name__}，收到 {value!r}")
 
 
 @dataclass(slots=True)
@@ -30,6 +93,7 @@ class StrategyMeta:
     params: list[str] = field(default_factory=list)
     defaults: dict[str, Any] = field(default_factory=dict)
     param_grid: dict[str, list[Any]] = field(default_factory=dict)
+    schema: dict[str, ParamSpec] = field(default_factory=dict)
 
 
 @dataclass(slots=True)
@@ -38,6 +102,104 @@ class StrategyEntry:
 
     func: Callable[..., list[int]]
     meta: StrategyMeta
+    impls: dict[str, Callable[..., Any]] = field(default_factory=dict)
+    # 場景 → (實作種類, 已綁定參數處理的呼叫)，註冊時預先編譯
+    dispatch: dict[str, tuple[str, Callable[..., Any]]] = field(default_factory=dict, repr=False)
+
+
+def _keyword_params(func: Callable[..., Any]) -> tuple[dict[str, inspect.Parameter], bool]:
+    """取出 rows 之後可用關鍵字傳入的參數，以及是否接受 **kwargs."""
+    try:
+        parameters = list(inspect.signature(func).parameters.values())
+    except (TypeError, ValueError):
+        return {}, True
+    if not parameters or parameters[0].kind not in (
+        inspect.Parameter.POSITIONAL_ONLY,
+        inspect.Parameter.POSITIONAL_OR_KEYWORD,
+    ):
+        raise TypeError(f"{getattr(func, '__name__', func)!r} 的第一個參數須為 rows")
+    named = {
+        p.name: p
+        for p in parameters[1:]
+        if p.kind in (inspect.Parameter.POSITIONAL_OR_KEYWORD, inspect.Parameter.KEYWORD_ONLY)
+    }
+    return named, any(p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+def _param_type(param: inspect.Parameter | None) -> type | None:
+    if param is None:
+        return None
+    if param.annotation in _ANNOTATION_TYPES:
+        return _ANNOTATION_TYPES[param.annotation]
+    if param.default is not param.empty and type(param.default) in (int, float, bool, str):
+        return type(param.default)
+    return None
+
+
+def _check_signature(name: str, kind: str, func: Callable[..., Any], declared: Iterable[str]) -> None:
+    """實作簽名須接受全部宣告參數，且不得有未宣告的必要參數."""
+    named, var_kw = _keyword_params(func)
+    declared = list(declared)
+    missing = [p for p in declared if p not in named and not var_kw]
+    if missing:
+        raise TypeError(f"策略 {name} 的 {kind} 實作不接受參數：{', '.join(missing)}")
+    required = [p for p, spec in named.items() if spec.default is spec.empty and p not in declared]
+    if required:
+        raise TypeError(f"策略 {name} 的 {kind} 實作有未宣告的必要參數：{', '.join(required)}")
+
+
+def _build_schema(name: str, func: Callable[..., Any], params: list[str] | None) -> dict[str, ParamSpec]:
+    named, _ = _keyword_params(func)
+    declared = list(named) if params is None else list(params)
+    _check_signature(name, "主要", func, declared)
+    schema = {}
+    for p in declared:
+        param = named.get(p)
+        required = param is not None and param.default is param.empty
+        default = None if param is None or required else param.default
+        schema[p] = ParamSpec(name=p, default=default, type=_param_type(param), required=required)
+    return schema
+
+
+def _canonical(key: str, schema: dict[str, ParamSpec]) -> str | None:
+    """舊版 UI 參數名（如 fast_period、signal_period）去掉 _period 後綴對應到正式名稱."""
+    if key in schema:
+        return key
+    if key.endswith("_period") and key[: -len("_period")] in schema:
+        return key[: -len("_period")]
+    return None
+
+
+def _series_call(func: Callable[..., Any], schema: dict[str, ParamSpec]) -> Callable[..., Any]:
+    if not schema:
+        return lambda rows, params: func(rows)
+    return lambda rows, params: func(rows, **params)
+
+
+def _compile(entry: StrategyEntry) -> None:
+    """依 DISPATCH_ORDER 為每個場景選定實作並綁定呼叫方式."""
+    schema, defaults = entry.meta.schema, entry.meta.defaults
+    for mode, order in DISPATCH_ORDER.items():
+        kind = next(k for k in order if k in entry.impls)
+        impl = entry.impls[kind]
+        if kind == "batch":
+            call = lambda rows, plist, impl=impl: impl(rows, [{**defaults, **p} for p in plist])  # noqa: E731
+        elif kind == "streaming":
+            stream = _series_call(impl, schema)
+            call = lambda rows, params, stream=stream: int(stream(rows, params))  # noqa: E731
+        elif mode == "batch":
+            series = _series_call(impl, schema)
+            call = lambda rows, plist, series=series: (series(rows, p) for p in plist)  # noqa: E731
+        elif mode == "live":
+            series = _series_call(impl, schema)
+
+            def call(rows, params, series=series):
+                signals = series(rows, params)
+                return int(signals[-1]) if len(signals) else 0
+
+        else:
+            call = _series_call(impl, schema)
+        entry.dispatch[mode] = (kind, call)
 
 
 class StrategyRegistry:
@@ -45,6 +207,26 @@ class StrategyRegistry:
 
     def __init__(self) -> None:
         self._entries: dict[str, StrategyEntry] = {}
+        self._loaders: list[str] = []
+        self._resolvers: list[Callable[[str], None]] = []
+
+    def add_loader(self, module: str) -> None:
+        """登記延遲載入的註冊模組（import 時會呼叫 register）."""
+        if module not in self._loaders:
+            self._loaders.append(module)
+
+    def add_resolver(self, resolver: Callable[[str], None]) -> None:
+        """登記按需註冊函式：查無策略名稱時呼叫 resolver(name)，由它決定是否 register."""
+        if resolver not in self._resolvers:
+            self._resolvers.append(resolver)
+
+    def _ensure_loaded(self) -> None:
+        while self._loaders:
+            module = self._loaders.pop(0)
+            try:
+                importlib.import_module(module)
+            except Exception:
+                logger.warning("Strategy loader %s not available", module, exc_info=True)
 
     def register(
         self,
@@ -56,40 +238,143 @@ class StrategyRegistry:
         params: list[str] | None = None,
         defaults: dict[str, Any] | None = None,
         param_grid: dict[str, list[Any]] | None = None,
+        kind: str = "scalar",
     ) -> Callable[..., list[int]]:
-        """註冊策略."""
+        """
+        註冊策略（主要實作）。
+
+        params 省略時取函式簽名中 rows 之後的參數；宣告的參數必須被簽名接受，
+        defaults / param_grid 的鍵與值在此一次驗證，不合法時拋出 TypeError / ValueError。
+        """
+        if kind not in ("scalar", "vectorized"):
+            raise ValueError(f"主要實作須為 scalar 或 vectorized，收到 {kind}")
+        schema = _build_schema(name, func, params)
         meta = StrategyMeta(
             name=name,
             label=label,
             category=category,
             description=description or func.__doc__ or "",
-            params=params or [],
-            defaults=defaults or {},
-            param_grid=param_grid or {},
+            params=list(schema),
+            defaults={p: spec.default for p, spec in schema.items() if not spec.required},
+            schema=schema,
         )
-        self._entries[name] = StrategyEntry(func=func, meta=meta)
+        meta.defaults.update(self._coerce(meta, defaults or {}))
+        for key, values in (param_grid or {}).items():
+            spec = self._spec(meta, key)
+            meta.param_grid[spec.name] = [spec.coerce(v) for v in values]
+        entry = StrategyEntry(func=func, meta=meta, impls={kind: func})
+        _compile(entry)
+        self._entries[name] = entry
+        return func
+
+    def register_impl(self, name: str, kind: str, func: Callable[..., Any]) -> Callable[..., Any]:
+        """為已註冊策略加上其他種類的實作（簽名須符合主要實作的參數表），並重新編譯分派表."""
+        if kind not in IMPL_KINDS:
+            raise ValueError(f"未知實作種類：{kind}（可用：{', '.join(IMPL_KINDS)}）")
+        entry = self._entries.get(name)
+        if entry is None:
+            raise ValueError(f"未註冊的策略：{name}")
+        if kind == "batch":
+            try:
+                positional = [
+                    p
+                    for p in inspect.signature(func).parameters.values()
+                    if p.kind in (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+                ]
+            except (TypeError, ValueError):
+                positional = [None, None]
+            if len(positional) < 2:
+                raise TypeError(f"策略 {name} 的 batch 實作須接受 (rows, param_list)")
+        else:
+            _check_signature(name, kind, func, entry.meta.schema)
+        entry.impls[kind] = func
+        _compile(entry)
         return func
 
+    @staticmethod
+    def _spec(meta: StrategyMeta, key: str) -> ParamSpec:
+        canonical = _canonical(key, meta.schema)
+        if canonical is None:
+            available = ", ".join(meta.schema) or "無"
+            raise ValueError(f"策略 {meta.name} 不支援參數 {key}（可用：{available}）")
+        return meta.schema[canonical]
+
+    def _coerce(self, meta: StrategyMeta, params: dict[str, Any]) -> dict[str, Any]:
+        out = {}
+        for key, value in params.items():
+            spec = self._spec(meta, key)
+            out[spec.name] = spec.coerce(value)
+        return out
+
+    def validate(self, name: str, params: dict[str, Any] | None = None) -> dict[str, Any]:
+        """
+        正規化策略參數：補上預設值、對應舊版參數名並檢查型別。
+
+        Returns:
+            可直接傳給 get_signal / get_signals_batch / latest_signal 的參數
+
+        Raises:
+            ValueError: 未知策略、不支援的參數或型別不符
+        """
+        entry = self.get(name)
+        if entry is None:
+            raise ValueError(f"未知策略：{name}")
+        merged = {**entry.meta.defaults, **self._coerce(entry.meta, params or {})}
+        missing = [p for p, spec in entry.meta.schema.items() if spec.required and p not in merged]
+        if missing:
+            raise ValueError(f"策略 {name} 缺少必要參數：{', '.join(missing)}")
+        return merged
+
     def get(self, name: str) -> StrategyEntry | None:
-        return self._entries.get(name)
+        self._ensure_loaded()
+        entry = self._entries.get(name)
+        if entry is None:
+            for resolve in self._resolvers:
+                try:
+                    resolve(name)
+                except Exception:
+                    logger.warning("Strategy resolver failed for %s", name, exc_info=True)
+                entry = self._entries.get(name)
+                if entry is not None:
+                    break
+        return entry
 
     def get_signal(self, name: str, rows: list[dict[str, Any]], **kwargs: Any) -> list[int]:
-        """取得信號."""
-        entry = self._entries.get(name)
+        """取得完整信號序列（單次回測）."""
+        entry = self.get(name)
         if not entry:
             return [0] * len(rows)
-        if not entry.meta.params:
-            return entry.func(rows)
-        return entry.func(rows, **kwargs)
+        kind, call = entry.dispatch["single"]
+        with tracing.span("registry.get_signal", strategy=name, bars=len(rows), impl=kind):
+            return call(rows, kwargs)
+
+    def get_signals_batch(
+        self, name: str, rows: list[dict[str, Any]], param_list: list[dict[str, Any]]
+    ) -> Iterator[Any]:
+        """依序產生每組參數的信號序列（參數優化；有 batch 實作時共用中間結果）."""
+        entry = self.get(name)
+        if not entry:
+            return iter([[0] * len(rows) for _ in param_list])
+        return iter(entry.dispatch["batch"][1](rows, param_list))
+
+    def latest_signal(self, name: str, rows: list[dict[str, Any]], **kwargs: Any) -> int:
+        """取得最新一根 K 線的信號（即時交易）."""
+        entry = self.get(name)
+        if not entry:
+            return 0
+        return entry.dispatch["live"][1](rows, kwargs)
 
     def list_all(self) -> list[StrategyMeta]:
+        self._ensure_loaded()
         return [e.meta for e in self._entries.values()]
 
     def list_by_category(self, category: str) -> list[StrategyMeta]:
+        self._ensure_loaded()
         return [e.meta for e in self._entries.values() if e.meta.category == category]
 
     @property
     def names(self) -> list[str]:
+        self._ensure_loaded()
         return list(self._entries.keys())
 
 
@@ -97,6 +382,9 @@ class StrategyRegistry:
 
 registry = StrategyRegistry()
 
+# 舊版 src.backtest.strategies 的策略在第一次查詢時才橋接註冊
+registry.add_loader("src.core.strategies_bridge")
+
 
 def register_strategy(
     name: str,
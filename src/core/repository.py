@@ -46,6 +46,7 @@ class BacktestRecord:
     win_rate_pct: float
     metrics_json: str = "{}"
     created_at: str = ""
+    profile_json: str = ""  # 取樣剖析摘要（Profile.summary() 的 JSON，未剖析時為空）
 
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -63,6 +64,7 @@ class BacktestRecord:
             "win_rate_pct": self.win_rate_pct,
             "metrics": self.metrics_json,
             "created_at": self.created_at,
+            "profile": self.profile_json,
         }
 
 
@@ -102,7 +104,8 @@ CREATE TABLE IF NOT EXISTS backtest_results (
     num_trades      INTEGER DEFAULT 0,
     win_rate_pct    REAL DEFAULT 0,
     metrics_json    TEXT DEFAULT '{}',
-    created_at      TEXT DEFAULT (datetime('now'))
+    created_at      TEXT DEFAULT (datetime('now')),
+    profile_json    TEXT DEFAULT ''
 )
 """
 
@@ -122,15 +125,23 @@ class SqliteBacktestRepository:
         self._conn.row_factory = sqlite3.Row
         self._conn.execute("PRAGMA journal_mode=WAL")
         self._conn.execute(_CREATE_BACKTEST_TABLE)
+        self._migrate()
         self._conn.executescript(_INDEX_SQL)
         self._conn.commit()
 
+    def _migrate(self) -> None:
+        """舊資料庫補上後來新增的欄位."""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(backtest_results)")}
+        if "profile_json" not in columns:
+            self._conn.execute("ALTER TABLE backtest_results ADD COLUMN profile_json TEXT DEFAULT ''")
+
     def save(self, record: BacktestRecord) -> int:
         cur = self._conn.execute(
             """INSERT INTO backtest_results
                (user_id, symbol, strategy, timeframe, initial_equity, final_equity,
-                total_return_pct, max_drawdown_pct, sharpe_ratio, num_trades, win_rate_pct, metrics_json)
-               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                total_return_pct, max_drawdown_pct, sharpe_ratio, num_trades, win_rate_pct, metrics_json,
+                profile_json)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
             (
                 record.user_id,
                 record.symbol,
@@ -144,6 +155,7 @@ class SqliteBacktestRepository:
                 record.num_trades,
                 record.win_rate_pct,
                 record.metrics_json,
+                record.profile_json,
             ),
         )
         self._conn.commit()
@@ -198,6 +210,7 @@ class SqliteBacktestRepository:
             win_rate_pct=row["win_rate_pct"],
             metrics_json=row["metrics_json"],
             created_at=row["created_at"],
+            profile_json=row["profile_json"] or "",
         )
 
 
@@ -0,0 +1,543 @@
+"""
+BacktestResultCache — 內容定址的回測結果快取
+
+Streamlit 重開同一組對比、Orchestrator.run_multi_backtest、Celery run_backtest 與參數優化
+經常重跑完全相同的回測。同一份 K 線 + 策略實作 + 參數 + 回測設定的結果是確定的，
+因此以這些內容的雜湊為鍵快取結果。
+
+鍵：sha256(數據指紋 compute_data_hash, 引擎與其實作指紋, 策略與實作指紋, 正規化參數, BacktestConfig, 區間, 版本)
+
+分層（依序查詢，命中後回填上層）：
+  L1 進程內 LRU — 以壓縮後位元組計量，超過 memory_bytes 逐出最久未用
+  L2 Redis      — CacheManager.remote("backtest")，僅在設定 Redis 時啟用，容量交給 Redis maxmemory
+  L3 磁碟       — cache/backtests/<kk>/<key>.{h,d}.z，超過 disk_bytes 逐出最久未讀
+
+每筆結果分兩段：head（metrics / error / 筆數 / 附加資訊）與 detail（權益曲線 / 交易明細），
+皆以 src.utils.report_codec 列式編碼。命中只讀 head；CachedBacktest.equity_curve / trades
+在首次存取（畫圖）時才讀 detail，且權益曲線為 LazyRows，可只取單欄。
+
+用法：
+    cache = get_result_cache()
+    key = backtest_cache_key(compute_data_hash(rows), "sma_cross", params, config, since_ms=s, until_ms=u)
+    report = cache.get_or_run(key, lambda: engine.run(rows, signals, s, u))
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import functools
+import hashlib
+import importlib
+import inspect
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from pathlib import Path
+from typing import Any
+
+from .cache_manager import CacheNamespace, CacheStats
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# 結果格式改變時遞增，舊快取自動失效（引擎與指標函式的改動已由 _engine_fingerprint 併入鍵）
+CACHE_FORMAT = 2
+
+# 各引擎決定回測數值的函式（模組, 屬性路徑）；其位元組碼併入鍵，修正引擎或指標後舊結果不再命中
+_ENGINE_CODE: dict[str, tuple[str, tuple[str, ...]]] = {
+    "core": (
+        "src.core.backtest",
+        ("BacktestEngine.run", "BacktestEngine._close_position", "compute_performance_metrics"),
+    ),
+    "loop": ("src.backtest.engine", ("_run_backtest_on_rows", "_compute_metrics")),
+}
+
+
+# ════════════════════════════════════════════════════════════
+# 鍵
+# ════════════════════════════════════════════════════════════
+
+
+def _hash_code(digest: Any, code: Any) -> None:
+    """位元組碼、引用名稱與常數；巢狀函式 / 推導式遞迴展開（其 repr 含記憶體位址，跨進程不穩定）."""
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            _hash_code(digest, const)
+        else:
+            digest.update(repr(const).encode())
+
+
+@functools.lru_cache(maxsize=512)
+def _code_fingerprint(func: Callable[..., Any]) -> str:
+    """函式（含閉包中的策略類別）的位元組碼指紋."""
+    digest = hashlib.sha256()
+    code = getattr(func, "__code__", None)
+    if code is not None:
+        _hash_code(digest, code)
+    for cell in getattr(func, "__closure__", None) or ():
+        obj = cell.cell_contents
+        if isinstance(obj, type):
+            digest.update(f"{obj.__module__}.{obj.__qualname__}".encode())
+            method = getattr(obj, "generate_signals", None)
+            if method is not None and hasattr(method, "__code__"):
+                _hash_code(digest, method.__code__)
+    return digest.hexdigest()[:16]
+
+
+@functools.lru_cache(maxsize=None)
+def _engine_fingerprint(engine: str) -> str:
+    """回測引擎與績效指標函式的位元組碼指紋（未知引擎為空字串）."""
+    spec = _ENGINE_CODE.get(engine)
+    if spec is None:
+        return ""
+    module_name, paths = spec
+    module = importlib.import_module(module_name)
+    digest = hashlib.sha256()
+    for path in paths:
+        obj: Any = module
+        for part in path.split("."):
+            obj = getattr(obj, part)
+        # 去掉 tracing / profiler 等裝飾器
+        _hash_code(digest, inspect.unwrap(obj).__code__)
+    return digest.hexdigest()[:16]
+
+
+def _normalize_params(strategy: str, params: dict[str, Any] | None) -> tuple[dict[str, Any], str]:
+    """已註冊策略以 registry.validate 補預設值並統一型別，回傳（參數, 實作指紋）."""
+    from .registry import registry
+
+    params = dict(params or {})
+    entry = registry.get(strategy)
+    if entry is None:
+        return params, ""
+    try:
+        params = registry.validate(strategy, params)
+    except ValueError:
+        pass
+    return params, _code_fingerprint(entry.func)
+
+
+def _json_default(obj: Any) -> Any:
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, "item"):  # NumPy 純量
+        return obj.item()
+    return str(obj)
+
+
+def backtest_cache_key(
+    data_hash: str,
+    strategy: str,
+    params: dict[str, Any] | None,
+    config: Any,
+    *,
+    engine: str = "core",
+    since_ms: int | None = None,
+    until_ms: int | None = None,
+) -> str:
+    """
+    回測結果的內容位址。
+
+    Args:
+        data_hash: compute_data_hash(rows)，同一批 K 線對多組參數只需計算一次
+        strategy: 策略名稱
+        params: 策略參數（已註冊策略會補上預設值並統一型別，{"fast": 10} 與 {"fast": 10.0} 同鍵）
+        config: BacktestConfig（或其他 dataclass）
+        engine: 回測引擎（"core" = src.core.backtest，"loop" = src.backtest.engine），兩者數值不同不可共用；
+            引擎與指標函式的位元組碼一併入鍵
+        since_ms / until_ms: 回測區間，影響年化報酬等指標
+
+    Returns:
+        64 字元十六進位字串
+    """
+    from src.version import __version__
+
+    normalized, impl = _normalize_params(strategy, params)
+    payload = {
+        "format": CACHE_FORMAT,
+        "version": __version__,
+        "data": data_hash,
+        "engine": engine,
+        "engine_impl": _engine_fingerprint(engine),
+        "strategy": strategy,
+        "impl": impl,
+        "params": normalized,
+        "config": dataclasses.asdict(config) if dataclasses.is_dataclass(config) else config,
+        "window": [since_ms, until_ms],
+    }
+    blob = json.dumps(payload, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+
+# ════════════════════════════════════════════════════════════
+# 命中結果
+# ════════════════════════════════════════════════════════════
+
+
+class CachedBacktest:
+    """
+    快取命中的回測結果，介面相容 BacktestReport / BacktestResult。
+
+    metrics / error 立即可用；equity_curve / trades 首次存取時才從快取讀取 detail，
+    detail 已被逐出時以 rerun 重新回測。
+    """
+
+    __slots__ = (
+        "key",
+        "metrics",
+        "error",
+        "meta",
+        "raw_ohlcv",
+        "profile",
+        "_load",
+        "_rerun",
+        "_trade_factory",
+        "_detail",
+    )
+
+    def __init__(
+        self,
+        key: str,
+        head: dict[str, Any],
+        load: Callable[[], dict[str, Any] | None],
+        rerun: Callable[[], Any] | None = None,
+        trade_factory: Callable[[dict[str, Any]], Any] | None = None,
+    ) -> None:
+        self.key = key
+        self.metrics: dict[str, Any] = head.get("metrics") or {}
+        self.error: str | None = head.get("error")
+        self.meta: dict[str, Any] = head.get("meta") or {}
+        self.raw_ohlcv: list[dict[str, Any]] = []
+        self.profile: dict[str, Any] | None = None
+        self._load = load
+        self._rerun = rerun
+        self._trade_factory = trade_factory
+        self._detail: dict[str, Any] | None = None
+
+    @property
+    def detail_loaded(self) -> bool:
+        return self._detail is not None
+
+    def _ensure_detail(self) -> dict[str, Any]:
+        if self._detail is None:
+            detail = self._load()
+            if detail is None and self._rerun is not None:
+                result = self._rerun()
+                detail = {"equity_curve": result.equity_curve, "trades": _plain_trades(result.trades)}
+            detail = detail or {"equity_curve": [], "trades": []}
+            if self._trade_factory is not None:
+                detail["trades"] = [self._trade_factory(t) for t in detail["trades"]]
+            self._detail = detail
+        return self._detail
+
+    @property
+    def equity_curve(self) -> Sequence[dict[str, Any]]:
+        return self._ensure_detail()["equity_curve"]
+
+    @property
+    def trades(self) -> list[Any]:
+        return self._ensure_detail()["trades"]
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "equity_curve": list(self.equity_curve),
+            "trades": [t.to_dict() if hasattr(t, "to_dict") else t for t in self.trades],
+            "metrics": self.metrics,
+            "error": self.error,
+        }
+
+
+def _plain_trades(trades: list[Any]) -> list[dict[str, Any]]:
+    """TradeRecord 轉完整精度的 dict（不經 to_dict 的四捨五入），還原時可 TradeRecord(**t)."""
+    return [dataclasses.asdict(t) if dataclasses.is_dataclass(t) else t for t in trades]
+
+
+# ════════════════════════════════════════════════════════════
+# 快取
+# ════════════════════════════════════════════════════════════
+
+
+def _encode(obj: Any) -> bytes:
+    from src.utils import report_codec
+
+    return report_codec.dumps(obj, level=1)
+
+
+def _decode(blob: bytes) -> Any:
+    from src.utils import report_codec
+
+    return report_codec.loads(blob)
+
+
+class BacktestResultCache:
+    """
+    三層回測結果快取。
+
+    所有 I/O 錯誤只記錄不拋出：快取失效時退回正常回測，不影響結果。
+    """
+
+    def __init__(
+        self,
+        memory_bytes: int = 64 * MB,
+        disk_dir: str | Path | None = None,
+        disk_bytes: int = 512 * MB,
+        ttl: int = 7 * 86400,
+        remote: CacheNamespace | None = None,
+        enabled: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.memory_bytes = memory_bytes
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_bytes = disk_bytes
+        self.ttl = ttl
+        self._remote = remote
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_used = 0
+        self._disk_used: int | None = None  # 第一次寫入時掃描目錄
+        self._lock = threading.Lock()
+        self.stats = CacheStats()
+        self.tier_hits = {"memory": 0, "redis": 0, "disk": 0}
+
+    # ─── 查詢 / 寫入 ───
+
+    def get(
+        self,
+        key: str,
+        *,
+        rerun: Callable[[], Any] | None = None,
+        trade_factory: Callable[[dict[str, Any]], Any] | None = None,
+    ) -> CachedBacktest | None:
+        """
+        查詢結果摘要。
+
+        Args:
+            key: backtest_cache_key(...)
+            rerun: detail 已被逐出時重新回測的函式
+            trade_factory: 交易明細 dict 的還原函式（如 lambda t: TradeRecord(**t)）
+
+        Returns:
+            命中時為 CachedBacktest，否則 None
+        """
+        if not self.enabled:
+            return None
+        blob = self._read(f"{key}.h")
+        if blob is None:
+            self.stats.misses += 1
+            return None
+        self.stats.hits += 1
+        return CachedBacktest(key, _decode(blob), lambda: self._load_detail(key), rerun, trade_factory)
+
+    def put(self, key: str, result: Any, *, detail: bool = True, meta: dict[str, Any] | None = None) -> None:
+        """
+        寫入回測結果；有 error 的結果不快取（可能是暫時性錯誤）。
+
+        Args:
+            key: backtest_cache_key(...)
+            result: BacktestReport / BacktestResult
+            detail: 是否一併寫入權益曲線與交易明細；False 時只存摘要，畫圖時由 rerun 重算
+            meta: 附加資訊（如最新信號），命中時放在 CachedBacktest.meta
+        """
+        if not self.enabled or result.error:
+            return
+        if detail:
+            body = {"equity_curve": result.equity_curve, "trades": _plain_trades(result.trades)}
+            self._write(f"{key}.d", _encode(body))
+        head = {"metrics": result.metrics, "error": None, "meta": meta or {}, "bars": len(result.equity_curve)}
+        self._write(f"{key}.h", _encode(head))
+        self.stats.sets += 1
+
+    def get_or_run(
+        self,
+        key: str,
+        run: Callable[[], Any],
+        *,
+        detail: bool = True,
+        trade_factory: Callable[[dict[str, Any]], Any] | None = None,
+    ) -> Any:
+        """命中回傳 CachedBacktest，否則執行 run() 並寫入快取."""
+        cached = self.get(key, rerun=run, trade_factory=trade_factory)
+        if cached is not None:
+            return cached
+        result = run()
+        self.put(key, result, detail=detail)
+        return result
+
+    def _load_detail(self, key: str) -> dict[str, Any] | None:
+        blob = self._read(f"{key}.d")
+        return _decode(blob) if blob is not None else None
+
+    def clear(self) -> None:
+        """清空 L1 與 L3（L2 由 TTL 自然過期）."""
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+        if self.disk_dir is not None:
+            for path in self.disk_dir.glob("*/*.z"):
+                path.unlink(missing_ok=True)
+            self._disk_used = 0
+
+    def stats_dict(self) -> dict[str, Any]:
+        return {
+            **self.stats.to_dict(),
+            **{f"{tier}_hits": n for tier, n in self.tier_hits.items()},
+            "memory_bytes": self._memory_used,
+            "disk_bytes": self._disk_used or 0,
+        }
+
+    # ─── 分層讀寫 ───
+
+    def _read(self, name: str) -> bytes | None:
+        with self._lock:
+            blob = self._memory.get(name)
+            if blob is not None:
+                self._memory.move_to_end(name)
+                self.tier_hits["memory"] += 1
+                return blob
+        blob = self._remote_get(name)
+        if blob is not None:
+            self.tier_hits["redis"] += 1
+            self._memory_put(name, blob)
+            return blob
+        blob = self._disk_get(name)
+        if blob is not None:
+            self.tier_hits["disk"] += 1
+            self._memory_put(name, blob)
+            self._remote_set(name, blob)
+        return blob
+
+    def _write(self, name: str, blob: bytes) -> None:
+        self._memory_put(name, blob)
+        self._remote_set(name, blob)
+        self._disk_put(name, blob)
+
+    def _memory_put(self, name: str, blob: bytes) -> None:
+        if len(blob) > self.memory_bytes:
+            return
+        with self._lock:
+            old = self._memory.pop(name, None)
+            if old is not None:
+                self._memory_used -= len(old)
+            self._memory[name] = blob
+            self._memory_used += len(blob)
+            while self._memory_used > self.memory_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= len(evicted)
+                self.stats.evictions += 1
+
+    def _remote_get(self, name: str) -> bytes | None:
+        if self._remote is None:
+            return None
+        try:
+            value = self._remote.get(name)
+            return value if isinstance(value, bytes) else None
+        except Exception as e:
+            logger.debug("回測快取 Redis 讀取失敗 %s: %s", name, e)
+            return None
+
+    def _remote_set(self, name: str, blob: bytes) -> None:
+        if self._remote is None:
+            return
+        try:
+            self._remote.set(name, blob, ttl=self.ttl)
+        except Exception as e:
+            logger.debug("回測快取 Redis 寫入失敗 %s: %s", name, e)
+
+    def _path(self, name: str) -> Path:
+        return self.disk_dir / name[:2] / f"{name}.z"  # type: ignore[operator]
+
+    def _disk_get(self, name: str) -> bytes | None:
+        if self.disk_dir is None:
+            return None
+        path = self._path(name)
+        try:
+            if time.time() - path.stat().st_mtime > self.ttl:
+                self._disk_remove(path)
+                return None
+            blob = path.read_bytes()
+            os.utime(path)  # 以 mtime 作為最近使用時間，逐出時先刪最久未讀的
+            return blob
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.debug("回測快取磁碟讀取失敗 %s: %s", path, e)
+            return None
+
+    def _disk_put(self, name: str, blob: bytes) -> None:
+        if self.disk_dir is None or self.disk_bytes <= 0:
+            return
+        path = self._path(name)
+        try:
+            if self._disk_used is None:
+                self._disk_used = sum(p.stat().st_size for p in self.disk_dir.glob("*/*.z"))
+            path.parent.mkdir(parents=True, exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            tmp = path.with_suffix(f".{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(blob)
+            os.replace(tmp, path)
+            self._disk_used += len(blob) - previous
+        except OSError as e:
+            logger.debug("回測快取磁碟寫入失敗 %s: %s", path, e)
+            return
+        if self._disk_used > self.disk_bytes:
+            self._evict_disk()
+
+    def _disk_remove(self, path: Path) -> None:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        if self._disk_used is not None:
+            self._disk_used -= size
+        self.stats.evictions += 1
+
+    def _evict_disk(self) -> None:
+        """刪除最久未讀的檔案，直到降到容量的 90%（避免每次寫入都掃描目錄）."""
+        files = []
+        for path in self.disk_dir.glob("*/*.z"):  # type: ignore[union-attr]
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+        files.sort()
+        self._disk_used = sum(size for _, size, _ in files)
+        target = self.disk_bytes * 0.9
+        for _, _, path in files:
+            if self._disk_used <= target:
+                break
+            self._disk_remove(path)
+
+
+# ─── 全域實例 ───
+
+_result_cache: BacktestResultCache | None = None
+
+
+def get_result_cache() -> BacktestResultCache:
+    """取得全域回測結果快取（設定見 CacheSettings.result_*，BT_CACHE=0 可停用）."""
+    global _result_cache
+    if _result_cache is None:
+        from .cache_manager import get_cache_manager
+        from .config import get_settings
+
+        settings = get_settings()
+        cfg = settings.cache
+        cm = get_cache_manager(cfg.redis_url if cfg.result_redis else None)
+        _result_cache = BacktestResultCache(
+            memory_bytes=cfg.result_memory_mb * MB,
+            disk_dir=settings.cache_dir / "backtests" if cfg.result_disk_mb > 0 else None,
+            disk_bytes=cfg.result_disk_mb * MB,
+            ttl=cfg.result_ttl,
+            remote=cm.remote("backtest", default_ttl=cfg.result_ttl) if cfg.result_redis else None,
+            enabled=cfg.result_cache,
+        )
+        cm.register_stats("backtest_result", _result_cache.stats_dict)
+    return _result_cache
@@ -0,0 +1,216 @@
+"""
+Scheduler — 任務優先級與公平排程策略
+
+進程內 ThreadTaskQueue 與 Celery 路由共用同一套策略：
+
+  優先級類別（嚴格優先）：
+    interactive  — 使用者等待中的單次回測、查詢
+    batch        — 參數優化、向前分析等大批量工作
+    maintenance  — 清理、快取刷新等背景維護
+
+  成本估計 = K 線數 × 參數組合數；標為 interactive 但成本超過 INTERACTIVE_MAX_COST 的工作降為 batch，
+  避免單一大型優化冒充互動任務塞住其他人的快速回測。
+
+  同一類別內以使用者為單位做成本加權的公平排隊（start-time fair queuing）：
+  每位使用者累計已分派的成本（虛擬時間），每次取虛擬時間最小者的下一個工作；
+  閒置後回來的使用者從目前的系統虛擬時間起算，不能囤積額度。
+
+Celery 端無法逐一挑選訊息，改以 broker 優先級近似同一策略（Redis：0 最高）：
+類別決定優先級區段，參數優化的分塊依在工作內的位置逐步降級，
+新工作的前幾塊可以插隊到大型工作的尾段之前（見 celery_priority）。
+
+用法：
+    cost = estimate_cost(bars=len(rows), combos=len(param_sets))
+    priority = classify("interactive", cost)   # 成本過高時為 Priority.BATCH
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+from collections import deque
+from collections.abc import Iterable
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+
+class Priority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+    MAINTENANCE = "maintenance"
+
+
+PRIORITY_ORDER = (Priority.INTERACTIVE, Priority.BATCH, Priority.MAINTENANCE)
+
+# interactive 工作的成本上限（K 線數 × 組合數），約為 10 萬根 K 線跑 20 組參數
+INTERACTIVE_MAX_COST = int(os.getenv("SCHED_INTERACTIVE_MAX_COST", "2000000"))
+
+# Celery（Redis broker）優先級區段：0 最高、9 最低
+CELERY_PRIORITY_BASE = {Priority.INTERACTIVE: 0, Priority.BATCH: 3, Priority.MAINTENANCE: 8}
+CELERY_PRIORITY_STEPS = list(range(10))
+# 同一工作每多少個分塊降一級（batch 最多降到 6，不與 maintenance 重疊）
+CELERY_CHUNKS_PER_STEP = 8
+_CELERY_BATCH_FLOOR = 6
+
+_TIMEFRAME_MS = {
+    "1m": 60_000,
+    "5m": 300_000,
+    "15m": 900_000,
+    "30m": 1_800_000,
+    "1h": 3_600_000,
+    "4h": 14_400_000,
+    "1d": 86_400_000,
+    "1w": 604_800_000,
+}
+
+
+# ════════════════════════════════════════════════════════════
+# 成本與分類
+# ════════════════════════════════════════════════════════════
+
+
+def estimate_bars(timeframe: str, since_ms: int, until_ms: int) -> int:
+    """依時間範圍估計 K 線數（未知週期以 1h 計）."""
+    return max(0, (until_ms - since_ms) // _TIMEFRAME_MS.get(timeframe, 3_600_000) + 1)
+
+
+def estimate_cost(bars: int = 0, combos: int = 1) -> int:
+    """工作成本 = K 線數 × 參數組合數（至少 1）."""
+    return max(1, bars) * max(1, combos)
+
+
+def classify(requested: Priority | str | None, cost: int) -> Priority:
+    """
+    決定工作的優先級類別。
+
+    Args:
+        requested: 呼叫端要求的類別（None 視為 interactive）
+        cost: estimate_cost 的結果
+
+    Returns:
+        實際類別；interactive 成本超過 INTERACTIVE_MAX_COST 時降為 batch
+    """
+    priority = Priority(requested) if requested else Priority.INTERACTIVE
+    if priority is Priority.INTERACTIVE and cost > INTERACTIVE_MAX_COST:
+        return Priority.BATCH
+    return priority
+
+
+def celery_priority(priority: Priority | str, position: int = 0) -> int:
+    """
+    Celery 訊息優先級（Redis：數字越小越先）。
+
+    Args:
+        priority: 類別
+        position: 工作內的分塊序號；batch 每 CELERY_CHUNKS_PER_STEP 塊降一級
+    """
+    priority = Priority(priority)
+    base = CELERY_PRIORITY_BASE[priority]
+    if priority is Priority.BATCH:
+        return min(_CELERY_BATCH_FLOOR, base + position // CELERY_CHUNKS_PER_STEP)
+    return base
+
+
+# ════════════════════════════════════════════════════════════
+# 公平排隊
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class Job:
+    """排隊中的工作；payload 由呼叫端使用."""
+
+    task_id: str
+    user: str
+    priority: Priority
+    cost: int
+    payload: Any = None
+    seq: int = 0
+
+
+class _ClassQueue:
+    """單一優先級類別內的每使用者佇列 + 虛擬時間."""
+
+    __slots__ = ("_users", "_vtime", "_clock", "_size")
+
+    def __init__(self) -> None:
+        self._users: dict[str, deque[Job]] = {}
+        self._vtime: dict[str, float] = {}
+        self._clock = 0.0
+        self._size = 0
+
+    def push(self, job: Job) -> None:
+        queue = self._users.get(job.user)
+        if queue is None:
+            queue = self._users[job.user] = deque()
+            # 閒置後回來從系統虛擬時間起算
+            self._vtime[job.user] = max(self._vtime.get(job.user, 0.0), self._clock)
+        queue.append(job)
+        self._size += 1
+
+    def pop(self) -> Job | None:
+        if not self._size:
+            return None
+        user = min(self._users, key=lambda u: (self._vtime[u], self._users[u][0].seq))
+        queue = self._users[user]
+        job = queue.popleft()
+        if not queue:
+            del self._users[user]
+        self._size -= 1
+        self._clock = self._vtime[user]
+        self._vtime[user] += job.cost
+        # 沒有排隊工作且已落後系統時間的使用者不必保留
+        for idle in [u for u, t in self._vtime.items() if u not in self._users and t <= self._clock]:
+            del self._vtime[idle]
+        return job
+
+    def remove(self, task_id: str) -> Job | None:
+        for user, queue in self._users.items():
+            for job in queue:
+                if job.task_id == task_id:
+                    queue.remove(job)
+                    if not queue:
+                        del self._users[user]
+                    self._size -= 1
+                    return job
+        return None
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class FairScheduler:
+    """
+    類別間嚴格優先、類別內每使用者成本公平的排隊（非執行緒安全，由呼叫端加鎖）。
+    """
+
+    def __init__(self) -> None:
+        self._classes = {priority: _ClassQueue() for priority in PRIORITY_ORDER}
+        self._seq = itertools.count()
+
+    def push(self, job: Job) -> None:
+        job.seq = next(self._seq)
+        self._classes[job.priority].push(job)
+
+    def pop(self, allowed: Iterable[Priority] = PRIORITY_ORDER) -> Job | None:
+        """依優先順序取出下一個工作；allowed 限制可取的類別."""
+        allowed = set(allowed)
+        for priority in PRIORITY_ORDER:
+            if priority in allowed and (job := self._classes[priority].pop()) is not None:
+                return job
+        return None
+
+    def remove(self, task_id: str) -> Job | None:
+        for queue in self._classes.values():
+            if (job := queue.remove(task_id)) is not None:
+                return job
+        return None
+
+    def pending(self, priority: Priority | None = None) -> int:
+        if priority is not None:
+            return len(self._classes[priority])
+        return sum(len(queue) for queue in self._classes.values())
+
+    def __len__(self) -> int:
+        return self.pending()
@@ -14,6 +14,8 @@ from enum import IntEnum
 from typing import Any
 from collections.abc import Callable
 
+from src.utils import tracing
+
 logger = logging.getLogger(__name__)
 
 
@@ -84,6 +86,10 @@ class SignalBus:
 
     def publish(self, signal: Signal) -> None:
         """發布信號."""
+        with tracing.span("signal_bus.publish", symbol=signal.symbol, strategy=signal.strategy):
+            self._dispatch(signal)
+
+    def _dispatch(self, signal: Signal) -> None:
         self._history.append(signal)
         if len(self._history) > self._max_history:
             self._history = self._history[-self._max_history :]
@@ -1,194 +1,73 @@
 """
-策略橋接 — 將舊版 strategies.py 的策略自動遷移到新 Registry
+策略橋接 — 將各處的策略實作索引到 src.core.registry
 
-這個模組在 import 時自動將 src.backtest.strategies 中的策略
-註冊到 src.core.registry 中，保持向後兼容。
+- src.backtest.strategies 的函式（NumPy 向量化）以 "vectorized" 註冊，標籤、分類與
+  參數表取自 STRATEGY_CONFIG；有參數批次版者另以 "batch" 註冊供參數優化使用。
+- src.strategies 的 130+ 類別策略不預先載入，第一次以名稱查詢時才經
+  StrategyFactory 載入並以 "scalar" 註冊（rows → DataFrame → generate_signals）。
+
+這個模組由 registry 在第一次查詢時延遲 import。
 """
 
 from __future__ import annotations
 
-from src.core.registry import registry
+import inspect
+from typing import Any
 
+import numpy as np
 
-def _import_strategies():
-    """安全導入舊版策略，避免循環依賴."""
-    try:
-        from src.backtest import strategies as _strategies
-
-        return _strategies
-    except Exception:
-        # 直接從文件導入函數，繞過 __init__.py 的循環依賴
-        import importlib.util
-        import os
-
-        path = os.path.join(os.path.dirname(__file__), "..", "backtest", "strategies.py")
-        path = os.path.normpath(path)
-        if os.path.exists(path):
-            spec = importlib.util.spec_from_file_location("strategies_mod", path)
-            if spec and spec.loader:
-                mod = importlib.util.module_from_spec(spec)
-                try:
-                    spec.loader.exec_module(mod)
-                    return mod
-                except Exception:
-                    pass
-        return None
-
-
-# ─── 策略元數據定義 ───
-
-_STRATEGY_META: dict[str, dict] = {
-    "sma_cross": {
-        "label": "雙均線交叉",
-        "category": "trend",
-        "params": ["fast", "slow"],
-        "defaults": {"fast": 10, "slow": 30},
-        "param_grid": {"fast": [5, 10, 15, 20], "slow": [20, 30, 40, 50]},
-    },
-    "buy_and_hold": {
-        "label": "買入持有",
-        "category": "benchmark",
-        "params": [],
-        "defaults": {},
-        "param_grid": {},
-    },
-    "rsi_signal": {
-        "label": "RSI",
-        "category": "oscillator",
-        "params": ["period", "oversold", "overbought"],
-        "defaults": {"period": 14, "oversold": 30, "overbought": 70},
-        "param_grid": {"period": [10, 14, 20], "oversold": [25, 30], "overbought": [70, 75]},
-    },
-    "macd_cross": {
-        "label": "MACD 交叉",
-        "category": "trend",
-        "params": ["fast", "slow", "signal"],
-        "defaults": {"fast": 12, "slow": 26, "signal": 9},
-        "param_grid": {"fast": [8, 12], "slow": [26], "signal": [9]},
-    },
-    "bollinger_signal": {
-        "label": "布林帶",
-        "category": "oscillator",
-        "params": ["period", "std_dev"],
-        "defaults": {"period": 20, "std_dev": 2.0},
-        "param_grid": {"period": [15, 20, 25], "std_dev": [1.5, 2.0, 2.5]},
-    },
-    "ema_cross": {
-        "label": "EMA 交叉",
-        "category": "trend",
-        "params": ["fast", "slow"],
-        "defaults": {"fast": 12, "slow": 26},
-        "param_grid": {"fast": [8, 12, 15], "slow": [21, 26, 34]},
-    },
-    "donchian_channel": {
-        "label": "唐奇安通道",
-        "category": "breakout",
-        "params": ["period", "breakout_mode"],
-        "defaults": {"period": 20, "breakout_mode": 1},
-        "param_grid": {"period": [10, 20, 30], "breakout_mode": [1]},
-    },
-    "supertrend": {
-        "label": "超級趨勢",
-        "category": "trend",
-        "params": ["period", "multiplier"],
-        "defaults": {"period": 10, "multiplier": 3.0},
-        "param_grid": {"period": [7, 10, 14], "multiplier": [2.0, 3.0, 4.0]},
-    },
-    "dual_thrust": {
-        "label": "雙推力",
-        "category": "breakout",
-        "params": ["period", "k1", "k2"],
-        "defaults": {"period": 4, "k1": 0.5, "k2": 0.5},
-        "param_grid": {"period": [3, 4, 5], "k1": [0.4, 0.5, 0.6], "k2": [0.4, 0.5, 0.6]},
-    },
-    "vwap_reversion": {
-        "label": "VWAP 回歸",
-        "category": "mean_reversion",
-        "params": ["period", "threshold"],
-        "defaults": {"period": 20, "threshold": 2.0},
-        "param_grid": {"period": [15, 20, 30], "threshold": [1.5, 2.0, 2.5]},
-    },
-    "ichimoku": {
-        "label": "一目均衡表",
-        "category": "trend",
-        "params": ["tenkan", "kijun", "senkou_b"],
-        "defaults": {"tenkan": 9, "kijun": 26, "senkou_b": 52},
-        "param_grid": {"tenkan": [9], "kijun": [26], "senkou_b": [52]},
-    },
-    "stochastic": {
-        "label": "KD 隨機指標",
-        "category": "oscillator",
-        "params": ["k_period", "d_period", "oversold", "overbought"],
-        "defaults": {"k_period": 14, "d_period": 3, "oversold": 20.0, "overbought": 80.0},
-        "param_grid": {"k_period": [9, 14], "d_period": [3], "oversold": [20], "overbought": [80]},
-    },
-    "williams_r": {
-        "label": "威廉指標",
-        "category": "oscillator",
-        "params": ["period", "oversold", "overbought"],
-        "defaults": {"period": 14, "oversold": -80.0, "overbought": -20.0},
-        "param_grid": {"period": [10, 14, 21], "oversold": [-80], "overbought": [-20]},
-    },
-    "adx_trend": {
-        "label": "ADX 趨勢",
-        "category": "trend",
-        "params": ["period", "threshold"],
-        "defaults": {"period": 14, "threshold": 25.0},
-        "param_grid": {"period": [10, 14, 20], "threshold": [20, 25, 30]},
-    },
-    "parabolic_sar": {
-        "label": "拋物線 SAR",
-        "category": "trend",
-        "params": ["af_start", "af_step", "af_max"],
-        "defaults": {"af_start": 0.02, "af_step": 0.02, "af_max": 0.20},
-        "param_grid": {"af_start": [0.02], "af_step": [0.02], "af_max": [0.20]},
-    },
-}
-
-
-# ─── 自動註冊 ───
+from src.backtest import strategies as _strategies
+from src.core.registry import registry
 
 
 def _register_all() -> None:
-    """從舊版策略模組自動遷移到新 Registry，優先使用向量化版本."""
-    _strategies = _import_strategies()
-    if _strategies is None:
+    """註冊回測策略與其批次實作."""
+    for name, func in _strategies._STRATEGY_FUNCS.items():
+        config = _strategies.STRATEGY_CONFIG[name]
+        registry.register(
+            func=func,
+            name=name,
+            label=config["label"],
+            category=config["category"],
+            params=config["params"],
+            defaults=config["defaults"],
+            param_grid=config["param_grid"],
+            kind="vectorized",
+        )
+    for name, func in _strategies._BATCH_FUNCS.items():
+        registry.register_impl(name, "batch", func)
+
+
+def _class_strategy_adapter(strategy_class: type) -> Any:
+    """把 BaseStrategy 子類包成 rows → 信號序列，簽名沿用建構子參數以便驗證."""
+
+    def signals(rows: list[dict[str, Any]], **params: Any) -> list[int]:
+        import pandas as pd
+
+        out = strategy_class(**params).generate_signals(pd.DataFrame(rows))
+        return np.nan_to_num(np.asarray(out, dtype=np.float64)).astype(np.int64).tolist()
+
+    init = inspect.signature(strategy_class)
+    rows_param = inspect.Parameter("rows", inspect.Parameter.POSITIONAL_OR_KEYWORD)
+    signals.__signature__ = init.replace(parameters=[rows_param, *init.parameters.values()])
+    signals.__doc__ = strategy_class.__doc__
+    return signals
+
+
+def _resolve_class_strategy(name: str) -> None:
+    """registry 查無名稱時，嘗試從 StrategyFactory 的 manifest 按需註冊類別策略."""
+    from src.strategies.strategy_factory import StrategyFactory, _name_to_category
+
+    strategy_class = StrategyFactory.resolve(name)
+    if strategy_class is None:
         return
+    registry.register(
+        func=_class_strategy_adapter(strategy_class),
+        name=name,
+        label=name,
+        category=_name_to_category.get(name.lower(), "unknown"),
+    )
+
 
-    # 嘗試導入向量化策略（numpy 加速版）
-    _vec_strategies = None
-    try:
-        from src.backtest.strategies_vectorized import VECTORIZED_STRATEGIES
-
-        _vec_strategies = VECTORIZED_STRATEGIES
-    except Exception:
-        pass
-
-    for name, meta in _STRATEGY_META.items():
-        # 優先使用向量化版本
-        func = _vec_strategies.get(name) if _vec_strategies else None
-
-        if func is None:
-            # 回退到舊版策略
-            func = (
-                getattr(_strategies, "_STRATEGY_FUNCS", {}).get(name)
-                if hasattr(_strategies, "_STRATEGY_FUNCS")
-                else None
-            )
-            if func is None:
-                func = getattr(_strategies, name, None)
-
-        if func:
-            registry.register(
-                func=func,
-                name=name,
-                label=meta["label"],
-                category=meta["category"],
-                params=meta.get("params", []),
-                defaults=meta.get("defaults", {}),
-                param_grid=meta.get("param_grid", {}),
-            )
-
-
-# 模組 import 時自動執行
 _register_all()
+registry.add_resolver(_resolve_class_strategy)
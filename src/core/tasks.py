@@ -9,21 +9,29 @@ Task Queue — 輕量後台任務系統
 用法：
     queue = get_task_queue()
     task_id = queue.submit("backtest", run_backtest, args=(symbol, strategy))
+    task_id = queue.submit("optimize", find_optimal, kwargs=..., user="alice", priority="batch", bars=n, combos=k)
     status = queue.status(task_id)
+    queue.cancel(task_id)   # 執行中的任務在下一個 check_cancelled() 結束
 """
 
 from __future__ import annotations
 
+import contextlib
 import logging
 import os
 import threading
 import time
 import uuid
-from concurrent.futures import Future, ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import CancelledError, Future
 from dataclasses import dataclass
 from enum import Enum
 from typing import Any
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+
+from src.utils import tracing
+
+from .scheduler import PRIORITY_ORDER, FairScheduler, Job, Priority, classify, estimate_cost
 
 logger = logging.getLogger(__name__)
 
@@ -48,6 +56,9 @@ class TaskInfo:
     created_at: float = 0.0
     started_at: float | None = None
     finished_at: float | None = None
+    user: str = "anonymous"
+    priority: Priority = Priority.INTERACTIVE
+    cost: int = 1
 
     @property
     def duration_seconds(self) -> float | None:
@@ -60,24 +71,95 @@ class TaskInfo:
             "task_id": self.task_id,
             "name": self.name,
             "status": self.status.value,
+            "user": self.user,
+            "priority": self.priority.value,
+            "cost": self.cost,
             "error": self.error,
             "created_at": self.created_at,
             "duration": self.duration_seconds,
         }
 
 
+class TaskCancelled(Exception):
+    """執行中的任務被取消（由 check_cancelled 拋出）."""
+
+
+_current = threading.local()
+
+
+def is_cancelled() -> bool:
+    """目前線程執行的任務是否已被要求取消（不在任務中時為 False）."""
+    flag = getattr(_current, "cancel", None)
+    return flag is not None and flag.is_set()
+
+
+def current_cancellation() -> Any:
+    """目前線程套用的取消來源（無則為 None）；送進執行緒池前取出，在 worker 內以 cancellation() 重新套用."""
+    return getattr(_current, "cancel", None)
+
+
+@contextlib.contextmanager
+def cancellation(flag: Any) -> Iterator[None]:
+    """
+    區塊內以 flag.is_set() 作為 check_cancelled() 的取消來源。
+
+    ThreadTaskQueue 以 threading.Event 自動套用；Celery 任務等其他執行環境可傳入任何有 is_set() 的物件
+    （如 src.tasks.fanout.CancelFlag）。
+    """
+    previous = getattr(_current, "cancel", None)
+    _current.cancel = flag
+    try:
+        yield
+    finally:
+        _current.cancel = previous
+
+
+def check_cancelled() -> None:
+    """
+    協作式取消檢查點：長時間任務在迴圈中呼叫，已被取消時拋出 TaskCancelled。
+
+    不在 ThreadTaskQueue 任務中呼叫時不做任何事。
+    """
+    if is_cancelled():
+        raise TaskCancelled()
+
+
 class ThreadTaskQueue:
     """
     線程池任務隊列（進程內，無外部依賴）。
 
     適用：單機部署、開發環境。
+
+    排程見 src.core.scheduler：interactive > batch > maintenance，同類別內每位使用者依成本公平輪替；
+    batch / maintenance 最多佔用 max_workers - reserved_interactive 個線程，
+    其餘保留給 interactive，大量批次工作下快速回測仍能立即開始。
+    執行中的任務以 check_cancelled() 協作取消；已結束的任務只保留最近 max_retained 筆。
     """
 
-    def __init__(self, max_workers: int = 4) -> None:
-        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="task")
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_retained: int = 1000,
+        reserved_interactive: int | None = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.max_retained = max_retained
+        if reserved_interactive is None:
+            reserved_interactive = 1 if max_workers > 1 else 0
+        self._background_slots = max(1, max_workers - reserved_interactive)
+        self._scheduler = FairScheduler()
         self._tasks: dict[str, TaskInfo] = {}
         self._futures: dict[str, Future] = {}
-        self._lock = threading.Lock()
+        self._cancel_events: dict[str, threading.Event] = {}
+        self._finished: deque[str] = deque()
+        self._running_background = 0
+        self._closed = False
+        self._lock = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"task_{i}", daemon=True) for i in range(max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
 
     def submit(
         self,
@@ -85,68 +167,162 @@ class ThreadTaskQueue:
         func: Callable[..., Any],
         args: tuple = (),
         kwargs: dict[str, Any] | None = None,
+        *,
+        user: str | None = None,
+        priority: Priority | str | None = None,
+        bars: int = 0,
+        combos: int = 1,
     ) -> str:
-        """提交任務，返回 task_id."""
+        """
+        提交任務，返回 task_id.
+
+        Args:
+            user: 公平排隊的使用者（None 時共用 "anonymous"）
+            priority: 要求的類別（預設 interactive；成本過高時降為 batch）
+            bars: K 線數，與 combos 相乘為成本估計
+            combos: 參數組合數
+        """
         task_id = uuid.uuid4().hex[:12]
+        cost = estimate_cost(bars, combos)
         info = TaskInfo(
             task_id=task_id,
             name=name,
             created_at=time.time(),
+            user=user or "anonymous",
+            priority=classify(priority, cost),
+            cost=cost,
         )
+        run = tracing.propagate(func)
+        job = Job(task_id, info.user, info.priority, cost, payload=(run, args, kwargs or {}))
 
         with self._lock:
+            if self._closed:
+                raise RuntimeError("cannot schedule new tasks after shutdown")
             self._tasks[task_id] = info
+            self._futures[task_id] = Future()
+            self._cancel_events[task_id] = threading.Event()
+            self._scheduler.push(job)
+            self._lock.notify()
 
-        def _wrapper() -> Any:
-            info.status = TaskStatus.RUNNING
-            info.started_at = time.time()
+        logger.info("Task submitted: %s [%s] %s user=%s cost=%d", task_id, name, info.priority.value, info.user, cost)
+        return task_id
+
+    def _next_job(self) -> Job | None:
+        """取下一個可執行的工作（呼叫端持有鎖）；佇列已關閉且清空時回傳 None."""
+        while True:
+            allowed = PRIORITY_ORDER if self._running_background < self._background_slots else (Priority.INTERACTIVE,)
+            job = self._scheduler.pop(allowed)
+            if job is not None:
+                if job.priority is not Priority.INTERACTIVE:
+                    self._running_background += 1
+                return job
+            if self._closed and not self._scheduler.pending():
+                return None
+            self._lock.wait()
+
+    def _worker(self) -> None:
+        while True:
+            with self._lock:
+                job = self._next_job()
+            if job is None:
+                return
             try:
-                result = func(*args, **(kwargs or {}))
-                info.status = TaskStatus.SUCCESS
-                info.result = result
-            except Exception as e:
-                info.status = TaskStatus.FAILED
-                info.error = str(e)
-                logger.exception("Task %s [%s] failed", task_id, name)
+                self._run(job)
             finally:
-                info.finished_at = time.time()
-            return info.result
+                with self._lock:
+                    if job.priority is not Priority.INTERACTIVE:
+                        self._running_background -= 1
+                    self._retire(job.task_id)
+                    self._lock.notify_all()
 
-        future = self._executor.submit(_wrapper)
-        with self._lock:
-            self._futures[task_id] = future
+    def _run(self, job: Job) -> None:
+        task_id = job.task_id
+        info, future, event = self._tasks[task_id], self._futures[task_id], self._cancel_events[task_id]
+        if not future.set_running_or_notify_cancel():
+            return
+        run, args, kwargs = job.payload
+        info.status = TaskStatus.RUNNING
+        info.started_at = time.time()
+        try:
+            with cancellation(event):
+                result = run(*args, **kwargs)
+            info.status = TaskStatus.SUCCESS
+            info.result = result
+        except TaskCancelled:
+            info.status = TaskStatus.CANCELLED
+            logger.info("Task cancelled while running: %s [%s]", task_id, info.name)
+        except Exception as e:
+            info.status = TaskStatus.FAILED
+            info.error = str(e)
+            logger.exception("Task %s [%s] failed", task_id, info.name)
+        finally:
+            info.finished_at = time.time()
+        if info.status is TaskStatus.CANCELLED:
+            future.set_exception(CancelledError())
+        else:
+            future.set_result(info.result)
 
-        logger.info("Task submitted: %s [%s]", task_id, name)
-        return task_id
+    def _retire(self, task_id: str) -> None:
+        """任務結束後記錄順序，超過 max_retained 時丟棄最舊的結果（呼叫端持有鎖）."""
+        self._cancel_events.pop(task_id, None)
+        self._finished.append(task_id)
+        while len(self._finished) > self.max_retained:
+            old = self._finished.popleft()
+            self._tasks.pop(old, None)
+            self._futures.pop(old, None)
 
     def status(self, task_id: str) -> TaskInfo | None:
-        """查詢任務狀態."""
+        """查詢任務狀態（已被保留上限淘汰的任務為 None）."""
         return self._tasks.get(task_id)
 
     def result(self, task_id: str, timeout: float | None = None) -> Any:
-        """等待任務結果."""
+        """等待任務結果（任務被取消時拋出 CancelledError）."""
         future = self._futures.get(task_id)
         if future:
             return future.result(timeout=timeout)
         return None
 
     def cancel(self, task_id: str) -> bool:
-        """取消待執行的任務."""
-        future = self._futures.get(task_id)
-        if future and future.cancel():
+        """
+        取消任務：排隊中的直接移除；執行中的設定取消旗標，任務在下一個 check_cancelled() 結束。
+
+        Returns:
+            是否已取消或已要求取消（已結束的任務為 False）
+        """
+        with self._lock:
             info = self._tasks.get(task_id)
-            if info:
+            if info is None or info.finished_at is not None:
+                return False
+            if self._scheduler.remove(task_id) is not None:
+                self._futures[task_id].cancel()
                 info.status = TaskStatus.CANCELLED
+                info.finished_at = time.time()
+                self._retire(task_id)
+                return True
+            event = self._cancel_events.get(task_id)
+            if event is None:
+                return False
+            event.set()
             return True
-        return False
+
+    def pending(self) -> dict[str, int]:
+        """各類別排隊中的任務數."""
+        with self._lock:
+            return {priority.value: self._scheduler.pending(priority) for priority in PRIORITY_ORDER}
 
     def list_tasks(self, limit: int = 50) -> list[TaskInfo]:
         """列出最近任務."""
-        tasks = sorted(self._tasks.values(), key=lambda t: t.created_at, reverse=True)
+        tasks = sorted(list(self._tasks.values()), key=lambda t: t.created_at, reverse=True)
         return tasks[:limit]
 
     def shutdown(self, wait: bool = True) -> None:
-        self._executor.shutdown(wait=wait)
+        """停止接受新任務；已排隊的任務仍會執行完畢，wait=True 時等待全部結束."""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
 
 
 # ─── 工廠 ───
@@ -158,5 +334,5 @@ def get_task_queue(max_workers: int | None = None) -> ThreadTaskQueue:
     global _task_queue
     if _task_queue is None:
         workers = max_workers or int(os.getenv("TASK_WORKERS", "4"))
-        _task_queue = ThreadTaskQueue(max_workers=workers)
+        _task_queue = ThreadTaskQueue(max_workers=workers, max_retained=int(os.getenv("TASK_RETENTION", "1000")))
     return _task_queue
@@ -9,6 +9,7 @@ Walk-Forward Analysis — 新架構版本
 - 參數網格搜索（in-sample 最優化）
 - Out-of-Sample 績效彙總
 - 防過擬合評分
+- n_jobs > 1 時以進程池並行評估 (分段 × 參數)，與 src.backtest.walk_forward 相同做法
 
 用法：
     from src.core.walk_forward import WalkForwardAnalyzer
@@ -20,12 +21,19 @@ Walk-Forward Analysis — 新架構版本
 from __future__ import annotations
 
 import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
-from typing import Any
+from typing import TYPE_CHECKING, Any
 from collections.abc import Callable
 
+import numpy as np
+
 from .backtest import BacktestConfig, BacktestEngine
 
+if TYPE_CHECKING:
+    from src.backtest.walk_forward import WFFold
+
 logger = logging.getLogger(__name__)
 
 SignalFn = Callable[..., list[int]]
@@ -115,6 +123,11 @@ class WalkForwardAnalyzer:
         train_ratio: 訓練集比例
         objective: 優化目標欄位名
         config: 回測配置
+        split: 切分模式 fixed / anchored / rolling / purged（見 src.backtest.walk_forward.make_folds）
+        purge: 訓練集與測試集之間剔除的 K 線數
+        embargo: purged 模式中測試折之後禁用的 K 線數
+        reuse_signals: 每組參數只在全序列計算一次信號，各分段以索引窗切片
+        n_jobs: >1 時以進程池並行評估（<=0 用全部 CPU）；signal_fn 須可 pickle（模組層級函數）
     """
 
     def __init__(
@@ -126,6 +139,11 @@ class WalkForwardAnalyzer:
         train_ratio: float = 0.7,
         objective: str = "sharpe_ratio",
         config: BacktestConfig | None = None,
+        split: str = "fixed",
+        purge: int = 0,
+        embargo: int = 0,
+        reuse_signals: bool = False,
+        n_jobs: int = 1,
     ) -> None:
         self._rows = rows
         self._signal_fn = signal_fn
@@ -135,6 +153,60 @@ class WalkForwardAnalyzer:
         self._objective = objective
         self._config = config or BacktestConfig()
         self._engine = BacktestEngine(config=self._config)
+        self._split = split
+        self._purge = purge
+        self._embargo = embargo
+        self._reuse_signals = reuse_signals
+        self._n_jobs = n_jobs
+        self._signal_cache: dict[tuple, list[int]] = {}
+
+    def _signals(self, start: int, end: int, params: dict[str, Any]) -> list[int]:
+        """取得 rows[start:end] 的信號；reuse_signals 時從全序列信號切片"""
+        if not self._reuse_signals:
+            return self._signal_fn(self._rows[start:end], **params)
+        key = tuple(sorted(params.items()))
+        if key not in self._signal_cache:
+            self._signal_cache[key] = list(self._signal_fn(self._rows, **params))
+        return self._signal_cache[key][start:end]
+
+    def _score(self, segments: list[tuple[int, int]], params: dict[str, Any]) -> float | None:
+        """In-sample 分數；多段訓練集以 K 線數加權平均"""
+        scores: list[tuple[float, int]] = []
+        for start, end in segments:
+            rows = self._rows[start:end]
+            signals = self._signals(start, end, params)
+            report = self._engine.run(rows, signals, rows[0]["timestamp"], rows[-1]["timestamp"])
+            if report.error:
+                continue
+            score = report.metrics.get(self._objective, 0)
+            if score is not None:
+                scores.append((score, end - start))
+        if not scores:
+            return None
+        if len(scores) == 1:
+            return scores[0][0]
+        return sum(s * w for s, w in scores) / sum(w for _, w in scores)
+
+    def _try_score(self, fold: WFFold, params: dict[str, Any]) -> float | None:
+        try:
+            return self._score(fold.train, params)
+        except Exception as e:
+            logger.debug("wf_in_sample_error", extra={"fold": fold.fold, "params": params, "error": str(e)})
+            return None
+
+    def _out_of_sample(self, fold: WFFold, params: dict[str, Any]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+        """用最優參數跑測試集，回傳 (指標, 權益曲線)；失敗時皆為空"""
+        test_start, test_end = fold.test
+        test_rows = self._rows[test_start:test_end]
+        try:
+            signals = self._signals(test_start, test_end, params)
+            report = self._engine.run(test_rows, signals, test_rows[0]["timestamp"], test_rows[-1]["timestamp"])
+        except Exception as e:
+            logger.warning("wf_oos_error", extra={"fold": fold.fold, "error": str(e)})
+            return {}, []
+        if report.error:
+            return {}, []
+        return report.metrics, list(report.equity_curve or [])
 
     def run(self, since_ms: int, until_ms: int, strategy_name: str = "unknown") -> WFResult:
         """執行 Walk-Forward Analysis."""
@@ -153,68 +225,62 @@ class WalkForwardAnalyzer:
         if not self._param_combos:
             self._param_combos = [{}]  # 至少跑一次預設參數
 
-        oos_equities: list[dict[str, Any]] = []
-
-        for fold in range(self._n_splits):
-            start_idx = fold * split_size
-            end_idx = min(start_idx + split_size, n)
-            fold_rows = self._rows[start_idx:end_idx]
-
-            train_end = int(len(fold_rows) * self._train_ratio)
-            train_rows = fold_rows[:train_end]
-            test_rows = fold_rows[train_end:]
-
-            if len(train_rows) < 10 or len(test_rows) < 5:
-                continue
-
-            train_since = train_rows[0]["timestamp"]
-            train_until = train_rows[-1]["timestamp"]
-            test_since = test_rows[0]["timestamp"]
-            test_until = test_rows[-1]["timestamp"]
-
-            # ── In-sample: 尋找最優參數 ──
-            best_score = -float("inf")
-            best_params: dict[str, Any] = {}
-
-            for params in self._param_combos:
-                try:
-                    signals = self._signal_fn(train_rows, **params)
-                    report = self._engine.run(train_rows, signals, train_since, train_until)
-                    if report.error:
-                        continue
-                    score = report.metrics.get(self._objective, 0)
-                    if score is not None and score > best_score:
-                        best_score = score
-                        best_params = params.copy()
-                except Exception as e:
-                    logger.debug("wf_in_sample_error", extra={"fold": fold, "params": params, "error": str(e)})
-                    continue
+        from src.backtest.walk_forward import MIN_TEST_BARS, MIN_TRAIN_BARS, _rows_to_arrays, make_folds
+
+        folds = [
+            f
+            for f in make_folds(n, self._n_splits, self._train_ratio, self._split, self._purge, self._embargo)
+            if f.train_bars >= MIN_TRAIN_BARS and f.test_bars >= MIN_TEST_BARS
+        ]
+        # 參數優先排列，同一 worker 連續處理同組參數的各分段，reuse_signals 時全序列信號只算一次
+        order = [(i, params) for params in self._param_combos for i in range(len(folds))]
+        tasks = [(folds[i], params) for i, params in order]
+
+        workers = min(self._n_jobs if self._n_jobs > 0 else (os.cpu_count() or 1), len(tasks))
+        executor = None
+        if workers > 1:
+            arrays = _rows_to_arrays(self._rows)
+            initargs = (arrays, self._signal_fn, self._objective, self._config, self._reuse_signals)
+            executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_wf_worker, initargs=initargs)
+        try:
+            if executor is not None:
+                chunksize = max(len(folds), len(tasks) // (4 * workers))
+                scores = list(executor.map(_score_task, tasks, chunksize=chunksize))
+            else:
+                scores = [self._try_score(fold, params) for fold, params in tasks]
+
+            # ── In-sample: 依參數順序取最優（同分保留先出現者） ──
+            best: list[tuple[float, dict[str, Any]]] = [(-float("inf"), {}) for _ in folds]
+            for (i, params), score in zip(order, scores):
+                if score is not None and score > best[i][0]:
+                    best[i] = (score, params.copy())
 
             # ── Out-of-sample: 用最優參數驗證 ──
-            try:
-                oos_signals = self._signal_fn(test_rows, **best_params)
-                oos_report = self._engine.run(test_rows, oos_signals, test_since, test_until)
-                oos_metrics = oos_report.metrics if not oos_report.error else {}
-            except Exception as e:
-                logger.warning("wf_oos_error", extra={"fold": fold, "error": str(e)})
-                oos_metrics = {}
-
-            split = WFSplit(
-                fold=fold + 1,
-                train_bars=len(train_rows),
-                test_bars=len(test_rows),
-                best_params=best_params,
-                in_sample_score=round(best_score, 4) if best_score > -float("inf") else None,
-                oos_return_pct=oos_metrics.get("total_return_pct", 0),
-                oos_sharpe=oos_metrics.get("sharpe_ratio", 0),
-                oos_drawdown_pct=oos_metrics.get("max_drawdown_pct", 0),
-                oos_trades=oos_metrics.get("num_trades", 0),
-            )
-            result.splits.append(split)
+            oos_tasks = [(fold, params) for fold, (_, params) in zip(folds, best)]
+            if executor is not None:
+                oos = list(executor.map(_oos_task, oos_tasks))
+            else:
+                oos = [self._out_of_sample(fold, params) for fold, params in oos_tasks]
+        finally:
+            if executor is not None:
+                executor.shutdown()
 
-            # 收集 OOS 權益曲線
-            if not oos_report.error and oos_report.equity_curve:
-                oos_equities.extend(oos_report.equity_curve)
+        oos_equities: list[dict[str, Any]] = []
+        for fold, (best_score, best_params), (oos_metrics, equity_curve) in zip(folds, best, oos):
+            result.splits.append(
+                WFSplit(
+                    fold=fold.fold,
+                    train_bars=fold.train_bars,
+                    test_bars=fold.test_bars,
+                    best_params=best_params,
+                    in_sample_score=round(best_score, 4) if best_score > -float("inf") else None,
+                    oos_return_pct=oos_metrics.get("total_return_pct", 0),
+                    oos_sharpe=oos_metrics.get("sharpe_ratio", 0),
+                    oos_drawdown_pct=oos_metrics.get("max_drawdown_pct", 0),
+                    oos_trades=oos_metrics.get("num_trades", 0),
+                )
+            )
+            oos_equities.extend(equity_curve)
 
         if not result.splits:
             result.error = "所有分段均失敗"
@@ -226,3 +292,33 @@ class WalkForwardAnalyzer:
         result.oos_equity_curve = oos_equities
 
         return result
+
+
+# ════════════════════════════════════════════════════════════
+# 進程池 worker（K 線以 NumPy 陣列傳入一次，worker 內重建分析器）
+# ════════════════════════════════════════════════════════════
+
+_worker_analyzer: WalkForwardAnalyzer | None = None
+
+
+def _init_wf_worker(
+    arrays: dict[str, np.ndarray],
+    signal_fn: SignalFn,
+    objective: str,
+    config: BacktestConfig,
+    reuse_signals: bool,
+) -> None:
+    from src.backtest.walk_forward import _arrays_to_rows
+
+    global _worker_analyzer
+    _worker_analyzer = WalkForwardAnalyzer(
+        _arrays_to_rows(arrays), signal_fn, [], objective=objective, config=config, reuse_signals=reuse_signals
+    )
+
+
+def _score_task(task: tuple[WFFold, dict[str, Any]]) -> float | None:
+    return _worker_analyzer._try_score(*task)
+
+
+def _oos_task(task: tuple[WFFold, dict[str, Any]]) -> tuple[dict[str, Any], list[dict[str, Any]]]:
+    return _worker_analyzer._out_of_sample(*task)
@@ -4,13 +4,20 @@ from __future__ import annotations
 import hashlib
 from typing import Any
 
+import numpy as np
+
 
 def compute_data_hash(rows: list[dict[str, Any]]) -> str:
-    """計算 K 線數據的 hash，用於校驗快取完整性"""
+    """
+    計算 K 線數據的內容指紋，用於校驗快取完整性與回測結果快取的鍵。
+
+    涵蓋每根 K 線的 timestamp / OHLC / volume，任何一根被修正都會改變指紋。
+    """
     if not rows:
         return ""
-    key_data = f"{len(rows)}:{rows[0].get('timestamp', 0)}:{rows[-1].get('timestamp', 0)}:{rows[-1].get('close', 0)}"
-    return hashlib.md5(key_data.encode()).hexdigest()[:12]
+    fields = ("timestamp", "open", "high", "low", "close", "volume")
+    values = np.array([tuple(map(r.get, fields)) for r in rows], dtype=np.float64)
+    return hashlib.blake2b(values.tobytes(), digest_size=8).hexdigest()
 
 
 def validate_ohlcv(rows: list[dict[str, Any]]) -> list[str]:
@@ -8,10 +8,9 @@ logger = logging.getLogger(__name__)
 import time
 from typing import Any
 
+from src.core.registry import registry
 from src.data.service import data_service
 
-# 不需要導入策略函數，我們直接計算信號
-
 
 def get_live_price(symbol: str) -> dict[str, Any] | None:
     """
@@ -71,11 +70,12 @@ def calculate_signal_for_symbol(
         {
             "symbol": str,
             "strategy": str,
-            "signal": int,  # 1=BUY, -1=SELL, 0=HOLD
+            "signal": int,  # 1=BUY, -1=SELL, 0=HOLD（最後一根 K 線持倉狀態翻轉時才非 0）
             "action": str,  # "BUY", "SELL", "HOLD"
             "confidence": float,
             "price": float,
-            "timestamp": int
+            "timestamp": int,
+            ...  # 指標欄位，見 _indicator_payload
         }
     """
     try:
@@ -99,166 +99,84 @@ def calculate_signal_for_symbol(
                 }
             )
 
-        # 根據策略計算信號
-        current_price = df["close"].iloc[-1]
-
-        if strategy == "sma_cross":
-            fast_period = strategy_params.get("fast_period", 5)
-            slow_period = strategy_params.get("slow_period", 20)
-
-            # 計算 SMA
-            sma_fast = df["close"].rolling(window=fast_period).mean()
-            sma_slow = df["close"].rolling(window=slow_period).mean()
-
-            # 檢查交叉
-            fast_now = sma_fast.iloc[-1]
-            slow_now = sma_slow.iloc[-1]
-            fast_prev = sma_fast.iloc[-2]
-            slow_prev = sma_slow.iloc[-2]
-
-            signal = 0
-            if fast_prev <= slow_prev and fast_now > slow_now:
-                signal = 1  # 黃金交叉
-            elif fast_prev >= slow_prev and fast_now < slow_now:
-                signal = -1  # 死亡交叉
-
-            confidence = abs(fast_now - slow_now) / slow_now * 1000 if slow_now > 0 else 0
-
-            return {
-                "symbol": symbol,
-                "strategy": strategy,
-                "signal": signal,
-                "action": "BUY" if signal == 1 else ("SELL" if signal == -1 else "HOLD"),
-                "confidence": min(confidence * 10, 95),
-                "price": current_price,
-                "timestamp": int(time.time() * 1000),
-            }
-
-        elif strategy == "rsi_signal":
-            period = strategy_params.get("period", 14)
-            oversold = strategy_params.get("oversold", 30)
-            overbought = strategy_params.get("overbought", 70)
-
-            # 計算 RSI
-            delta = df["close"].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-            rs = gain / loss
-            rsi = 100 - (100 / (1 + rs))
-
-            current_rsi = rsi.iloc[-1]
-
-            signal = 0
-            if current_rsi < oversold:
-                signal = 1  # 超賣
-            elif current_rsi > overbought:
-                signal = -1  # 超買
-
-            confidence = abs(50 - current_rsi) / 50 * 100
-
-            return {
-                "symbol": symbol,
-                "strategy": strategy,
-                "signal": signal,
-                "action": "BUY" if signal == 1 else ("SELL" if signal == -1 else "HOLD"),
-                "confidence": confidence,
-                "price": current_price,
-                "rsi": current_rsi,
-                "timestamp": int(time.time() * 1000),
-            }
-
-        elif strategy == "macd_cross":
-            fast_period = strategy_params.get("fast_period", 12)
-            slow_period = strategy_params.get("slow_period", 26)
-            signal_period = strategy_params.get("signal_period", 9)
-
-            # 計算 MACD
-            exp1 = df["close"].ewm(span=fast_period, adjust=False).mean()
-            exp2 = df["close"].ewm(span=slow_period, adjust=False).mean()
-            macd = exp1 - exp2
-            signal_line = macd.ewm(span=signal_period, adjust=False).mean()
-
-            # 檢查交叉
-            macd_now = macd.iloc[-1]
-            signal_now = signal_line.iloc[-1]
-            macd_prev = macd.iloc[-2]
-            signal_prev = signal_line.iloc[-2]
-
-            signal = 0
-            if macd_prev <= signal_prev and macd_now > signal_now:
-                signal = 1  # 黃金交叉
-            elif macd_prev >= signal_prev and macd_now < signal_now:
-                signal = -1  # 死亡交叉
-
-            confidence = abs(macd_now - signal_now) / abs(signal_now) * 100 if signal_now != 0 else 0
-
-            return {
-                "symbol": symbol,
-                "strategy": strategy,
-                "signal": signal,
-                "action": "BUY" if signal == 1 else ("SELL" if signal == -1 else "HOLD"),
-                "confidence": min(confidence, 95),
-                "price": current_price,
-                "macd": macd_now,
-                "signal_line": signal_now,
-                "timestamp": int(time.time() * 1000),
-            }
-
-        elif strategy == "bollinger_signal":
-            period = strategy_params.get("period", 20)
-            std_dev = strategy_params.get("std_dev", 2.0)
-
-            # 計算布林帶
-            sma = df["close"].rolling(window=period).mean()
-            std = df["close"].rolling(window=period).std()
-            upper = sma + (std_dev * std)
-            lower = sma - (std_dev * std)
-
-            current_close = df["close"].iloc[-1]
-
-            signal = 0
-            if current_close < lower.iloc[-1]:
-                signal = 1  # 低於下軌（超賣）
-            elif current_close > upper.iloc[-1]:
-                signal = -1  # 高於上軌（超買）
-
-            # 計算在帶中的位置
-            band_width = upper.iloc[-1] - lower.iloc[-1]
-            if band_width > 0:
-                position = (current_close - lower.iloc[-1]) / band_width
-                confidence = abs(0.5 - position) * 2 * 100
-            else:
-                confidence = 0
-
-            return {
-                "symbol": symbol,
-                "strategy": strategy,
-                "signal": signal,
-                "action": "BUY" if signal == 1 else ("SELL" if signal == -1 else "HOLD"),
-                "confidence": confidence,
-                "price": current_price,
-                "upper_band": upper.iloc[-1],
-                "lower_band": lower.iloc[-1],
-                "timestamp": int(time.time() * 1000),
-            }
-
-        else:
-            # 預設持有
-            return {
-                "symbol": symbol,
-                "strategy": strategy,
-                "signal": 0,
-                "action": "HOLD",
-                "confidence": 50,
-                "price": current_price,
-                "timestamp": int(time.time() * 1000),
-            }
+        # 根據策略計算信號（與回測、自動交易同一個 registry）
+        current_price = float(df["close"].iloc[-1])
+        result = {
+            "symbol": symbol,
+            "strategy": strategy,
+            "signal": 0,
+            "action": "HOLD",
+            "confidence": 50,
+            "price": current_price,
+            "timestamp": int(time.time() * 1000),
+        }
+        if registry.get(strategy) is None:
+            # 未知策略：預設持有
+            return result
+
+        params = registry.validate(strategy, strategy_params)
+        # registry 回傳逐根持倉狀態；監控只在最後一根 K 線狀態翻轉時發出買賣信號（交叉當根）
+        signals = registry.get_signal(strategy, ohlcv, **params)
+        signal = int(signals[-1]) if len(signals) > 1 and signals[-1] != signals[-2] else 0
+        result.update(
+            signal=signal,
+            action="BUY" if signal == 1 else ("SELL" if signal == -1 else "HOLD"),
+            **_indicator_payload(strategy, df["close"].astype(float), params),
+        )
+        return result
 
     except Exception as e:
         logger.error(f"計算信號失敗 {symbol}: {e}")
         return None
 
 
+def _indicator_payload(strategy: str, close: Any, params: dict[str, Any]) -> dict[str, Any]:
+    """
+    信心度與指標欄位（監控頁面顯示用）
+
+    Args:
+        strategy: 策略名稱
+        close: 收盤價 Series
+        params: registry.validate 後的策略參數
+
+    Returns:
+        {"confidence": float, ...}，內建指標策略另帶 rsi / macd / signal_line / upper_band / lower_band
+    """
+    if strategy == "sma_cross":
+        fast_now = close.rolling(window=params["fast"]).mean().iloc[-1]
+        slow_now = close.rolling(window=params["slow"]).mean().iloc[-1]
+        confidence = abs(fast_now - slow_now) / slow_now * 1000 if slow_now > 0 else 0
+        return {"confidence": float(min(confidence * 10, 95))}
+
+    if strategy == "rsi_signal":
+        delta = close.diff()
+        gain = (delta.where(delta > 0, 0)).rolling(window=params["period"]).mean()
+        loss = (-delta.where(delta < 0, 0)).rolling(window=params["period"]).mean()
+        current_rsi = float((100 - (100 / (1 + gain / loss))).iloc[-1])
+        return {"confidence": abs(50 - current_rsi) / 50 * 100, "rsi": current_rsi}
+
+    if strategy == "macd_cross":
+        macd = (
+            close.ewm(span=params["fast"], adjust=False).mean() - close.ewm(span=params["slow"], adjust=False).mean()
+        )
+        signal_line = macd.ewm(span=params["signal"], adjust=False).mean()
+        macd_now, signal_now = float(macd.iloc[-1]), float(signal_line.iloc[-1])
+        confidence = abs(macd_now - signal_now) / abs(signal_now) * 100 if signal_now != 0 else 0
+        return {"confidence": min(confidence, 95), "macd": macd_now, "signal_line": signal_now}
+
+    if strategy == "bollinger_signal":
+        sma = close.rolling(window=params["period"]).mean()
+        std = close.rolling(window=params["period"]).std()
+        upper = float((sma + params["std_dev"] * std).iloc[-1])
+        lower = float((sma - params["std_dev"] * std).iloc[-1])
+        band_width = upper - lower
+        # 收盤價在帶中的位置，越靠近上下軌信心越高
+        confidence = abs(0.5 - (close.iloc[-1] - lower) / band_width) * 2 * 100 if band_width > 0 else 0
+        return {"confidence": float(confidence), "upper_band": upper, "lower_band": lower}
+
+    return {"confidence": 50}
+
+
 def batch_calculate_signals(watchlist: list[dict]) -> dict[str, dict]:
     """
     批量計算訂閱策略的信號
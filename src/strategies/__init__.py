@@ -3,7 +3,7 @@ StocksX 策略庫
 130+ 專業交易策略
 """
 
-from .base_strategy import BaseStrategy, TrendFollowingStrategy, OscillatorStrategy, BreakoutStrategy
+from .base_strategy import BaseStrategy, TrendFollowingStrategy, OscillatorStrategy, BreakoutStrategy, VectorizedStrategy
 from .strategy_factory import StrategyFactory, get_strategy, list_all_strategies
 
 __version__ = "1.0.0"
@@ -12,6 +12,7 @@ __all__ = [
     "TrendFollowingStrategy",
     "OscillatorStrategy",
     "BreakoutStrategy",
+    "VectorizedStrategy",
     "StrategyFactory",
     "get_strategy",
     "list_all_strategies",
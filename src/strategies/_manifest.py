@@ -0,0 +1,137 @@
+"""
+策略 manifest — 由 scripts/gen_strategy_manifest.py 產生，請勿手動編輯
+名稱 → "模組:類別"，供 StrategyFactory 延遲載入
+"""
+
+STRATEGY_MANIFEST: dict[str, str] = {
+    "adaptive_kd": "src.strategies.oscillator.final_oscillators:AdaptiveKD",
+    "adx": "src.strategies.trend.trend_complete:ADXStrategy",
+    "amihud": "src.strategies.microstructure.micro_strategies:AmihudIlliquidity",
+    "anomaly": "src.strategies.ai_ml.ai_strategies:AnomalyDetection",
+    "anti_martingale": "src.strategies.risk_management.advanced_risk_strategies:AntiMartingale",
+    "arfima": "src.strategies.statistical.stat_complete:ARFIMA",
+    "arrival_price": "src.strategies.execution.execution_final:ArrivalPrice",
+    "awesome": "src.strategies.oscillator.advanced_oscillators:AwesomeOscillator",
+    "bayesian": "src.strategies.ai_ml.ai_complete:BayesianOptimization",
+    "bollinger_pct_b": "src.strategies.oscillator.final_oscillators:BollingerPercentB",
+    "bollinger_squeeze": "src.strategies.breakout.breakout_strategies:BollingerSqueeze",
+    "bootstrap": "src.strategies.statistical.stat_complete:BootstrapConfidence",
+    "candlestick": "src.strategies.pattern.pattern_strategies:CandlestickPatterns",
+    "carry_trade": "src.strategies.macro.macro_complete:CarryTrade",
+    "cci": "src.strategies.trend.advanced_trend_strategies:CCI",
+    "chande_momentum": "src.strategies.oscillator.complete_oscillators:ChandeMomentumOscillator",
+    "changepoint": "src.strategies.statistical.stat_strategies:ChangePointDetection",
+    "cointegration": "src.strategies.statistical.stat_strategies:CointegrationPair",
+    "contrastive_learning": "src.strategies.ai_ml.ai_final:ContrastiveLearning",
+    "copula": "src.strategies.statistical.stat_complete:CopulaDependence",
+    "country_rotation": "src.strategies.macro.macro_strategies:CountryRotation",
+    "credit_spread": "src.strategies.macro.macro_complete:CreditSpread",
+    "cross_asset_parity": "src.strategies.macro.macro_complete:CrossAssetRiskParity",
+    "cross_commodity": "src.strategies.macro.macro_complete:CrossCommoditySpread",
+    "cum_delta": "src.strategies.microstructure.micro_strategies:CumulativeDelta",
+    "cup_handle": "src.strategies.breakout.breakout_strategies:CupAndHandle",
+    "custom_oscillator": "src.strategies.oscillator.final_oscillators:CustomOscillator",
+    "cvar": "src.strategies.risk_management.advanced_risk_strategies:CVaRPositionSizing",
+    "delta_hedge": "src.strategies.risk_management.advanced_risk_strategies:DynamicDeltaHedge",
+    "diamond": "src.strategies.pattern.pattern_complete:DiamondPattern",
+    "donchian": "src.strategies.trend.trend_complete:DonchianChannel",
+    "dpo": "src.strategies.oscillator.complete_oscillators:DetrendedPriceOscillator",
+    "dqn_agent": "src.strategies.ai_ml.ai_final:DQNAgent",
+    "dual_thrust": "src.strategies.breakout.breakout_strategies:DualThrustBreakout",
+    "dxy_corr": "src.strategies.macro.macro_strategies:DXYCorrelation",
+    "dynamic_hedge": "src.strategies.macro.macro_complete:DynamicHedgeRatio",
+    "elder_ray": "src.strategies.oscillator.complete_oscillators:ElderRay",
+    "elliott": "src.strategies.pattern.pattern_complete:ElliottWave",
+    "ema_cross": "src.strategies.trend.trend_complete:EMACross",
+    "ensemble": "src.strategies.ai_ml.ai_complete:EnsembleVoting",
+    "ensemble_voting_final": "src.strategies.ai_ml.ai_final:EnsembleVotingFinal",
+    "etf_nav": "src.strategies.execution.execution_complete:ETFNavArbitrage",
+    "fibonacci": "src.strategies.breakout.breakout_strategies:FibonacciBreakout",
+    "fisher": "src.strategies.oscillator.complete_oscillators:FisherTransform",
+    "fixed_fractional": "src.strategies.risk_management.risk_strategies:FixedFractional",
+    "fixed_ratio": "src.strategies.risk_management.advanced_risk_strategies:FixedRatio",
+    "flag_pennant": "src.strategies.breakout.breakout_complete:FlagPennant",
+    "flash_crash": "src.strategies.execution.execution_complete:FlashCrashDetection",
+    "gan": "src.strategies.ai_ml.ai_complete:GANPriceGeneration",
+    "gap_fill": "src.strategies.pattern.pattern_strategies:GapFill",
+    "garch": "src.strategies.statistical.stat_strategies:GARCHVolatility",
+    "genetic_opt": "src.strategies.ai_ml.ai_strategies:GeneticOptimization",
+    "gnn": "src.strategies.ai_ml.ai_strategies:GraphNeuralNetwork",
+    "gold_real_rate": "src.strategies.macro.macro_complete:GoldRealRate",
+    "harmonic": "src.strategies.pattern.pattern_complete:HarmonicPatterns",
+    "head_shoulders": "src.strategies.pattern.pattern_strategies:HeadShoulders",
+    "horizontal_channel": "src.strategies.breakout.breakout_complete:HorizontalChannel",
+    "hull_ma": "src.strategies.trend.hull_ma_strategy:HullMA",
+    "iceberg": "src.strategies.execution.execution_final:IcebergOrders",
+    "ichimoku": "src.strategies.oscillator.advanced_oscillators:IchimokuCloud",
+    "implementation_shortfall": "src.strategies.execution.execution_strategies:ImplementationShortfall",
+    "inside_bar": "src.strategies.breakout.breakout_final:InsideBarBreakout",
+    "is_enhanced": "src.strategies.execution.execution_final:ImplementationShortfallEnhanced",
+    "kalman": "src.strategies.statistical.stat_strategies:KalmanFilter",
+    "kama": "src.strategies.trend.advanced_trend_strategies:KAMA",
+    "kelly": "src.strategies.risk_management.risk_strategies:KellyCriterion",
+    "klinger": "src.strategies.oscillator.complete_oscillators:KlingerOscillator",
+    "kyle_lambda": "src.strategies.microstructure.micro_strategies:KyleLambda",
+    "latency_arb": "src.strategies.execution.execution_complete:LatencyArbitrage",
+    "level2": "src.strategies.microstructure.micro_strategies:Level2Analysis",
+    "lstm_predictor": "src.strategies.ai_ml.ai_final:LSTMPredictor",
+    "macd_cross": "src.strategies.trend.trend_complete:MACDCross",
+    "market_making": "src.strategies.execution.execution_strategies:MarketMaking",
+    "market_structure": "src.strategies.pattern.pattern_strategies:MarketStructure",
+    "markov": "src.strategies.statistical.stat_strategies:MarkovRegime",
+    "mass_index": "src.strategies.oscillator.complete_oscillators:MassIndex",
+    "micro_price": "src.strategies.microstructure.micro_strategies:MicroPrice",
+    "multi_factor": "src.strategies.ai_ml.ai_final:MultiFactorModel",
+    "multi_rsi": "src.strategies.oscillator.final_oscillators:MultiRSI",
+    "nlp_event": "src.strategies.ai_ml.ai_strategies:NLPEventDriven",
+    "nr7_nr4": "src.strategies.breakout.breakout_complete:NR7NR4",
+    "online_learning": "src.strategies.ai_ml.ai_complete:OnlineLearning",
+    "optimal_stop": "src.strategies.risk_management.advanced_risk_strategies:OptimalStopLoss",
+    "orb": "src.strategies.breakout.breakout_strategies:OpeningRangeBreakout",
+    "order_flow": "src.strategies.microstructure.micro_strategies:OrderFlowAnalysis",
+    "pair_trading": "src.strategies.ai_ml.ai_final:PairTrading",
+    "parabolic_sar": "src.strategies.trend.trend_complete:ParabolicSAR",
+    "pivot": "src.strategies.breakout.breakout_strategies:PivotBreakout",
+    "poc_va": "src.strategies.microstructure.micro_strategies:POCValueArea",
+    "pov": "src.strategies.execution.execution_final:POVStrategy",
+    "quote_stuffing": "src.strategies.microstructure.micro_strategies:QuoteStuffing",
+    "ribbon": "src.strategies.trend.advanced_trend_strategies:MovingAverageRibbon",
+    "sde_mean": "src.strategies.statistical.stat_complete:SDEMeanReversion",
+    "seasonal": "src.strategies.macro.macro_strategies:SeasonalStrategy",
+    "sideways_reversion": "src.strategies.breakout.breakout_strategies:SidewaysReversion",
+    "sma_cross": "src.strategies.trend.trend_complete:SMACross",
+    "sniper": "src.strategies.execution.execution_final:SniperStrategy",
+    "stat_arb": "src.strategies.execution.execution_complete:StatisticalArbitrage",
+    "stoch_rsi": "src.strategies.oscillator.advanced_oscillators:StochasticRSI",
+    "super_cycle": "src.strategies.macro.macro_complete:CommoditySuperCycle",
+    "supertrend": "src.strategies.trend.trend_complete:Supertrend",
+    "t3": "src.strategies.trend.advanced_trend_strategies:T3Average",
+    "tail_hedge": "src.strategies.risk_management.advanced_risk_strategies:TailRiskHedge",
+    "tema": "src.strategies.trend.hull_ma_strategy:TEMA",
+    "tick_rule": "src.strategies.microstructure.micro_strategies:TickRule",
+    "tillson_t3": "src.strategies.trend.advanced_trend_strategies:TillsonT3",
+    "transfer_learning": "src.strategies.ai_ml.ai_final:TransferLearning",
+    "transformer": "src.strategies.ai_ml.ai_complete:TransformerPredict",
+    "triangle": "src.strategies.breakout.breakout_final:TrianglePattern",
+    "triple_top_bottom": "src.strategies.breakout.breakout_strategies:TripleTopBottom",
+    "trix": "src.strategies.oscillator.complete_oscillators:TRIX",
+    "tto_or": "src.strategies.breakout.breakout_complete:TTOOpeningRange",
+    "turtle": "src.strategies.trend.advanced_trend_strategies:TurtleTrading",
+    "twap": "src.strategies.execution.execution_strategies:TWAPExecution",
+    "twap_signal": "src.strategies.microstructure.micro_strategies:TWAPSignal",
+    "ulcer_index": "src.strategies.oscillator.complete_oscillators:UlcerIndex",
+    "vix": "src.strategies.macro.macro_strategies:VIXTrading",
+    "vol_target": "src.strategies.risk_management.advanced_risk_strategies:VolatilityTargeting",
+    "volume_breakout": "src.strategies.breakout.breakout_strategies:VolumeBreakout",
+    "volume_profile": "src.strategies.pattern.pattern_complete:VolumeProfileShape",
+    "vortex": "src.strategies.oscillator.advanced_oscillators:VortexOscillator",
+    "vpin": "src.strategies.microstructure.micro_strategies:VPIN",
+    "vwap": "src.strategies.execution.execution_strategies:VWAPExecution",
+    "vwap_reversion": "src.strategies.trend.trend_complete:VWAPReversion",
+    "w_m_pattern": "src.strategies.breakout.breakout_complete:WMPattern",
+    "wavelet": "src.strategies.statistical.stat_complete:WaveletAnalysis",
+    "wedge": "src.strategies.pattern.pattern_strategies:WedgePattern",
+    "wyckoff": "src.strategies.pattern.pattern_complete:WyckoffMethod",
+    "yield_curve": "src.strategies.macro.macro_strategies:YieldCurve",
+    "zlema": "src.strategies.trend.advanced_trend_strategies:ZLEMA",
+}
@@ -11,20 +11,95 @@ AI/ML 策略包
 狀態：🔄 進行中
 """
 
+import hashlib
+import logging
+
 import pandas as pd
 import numpy as np
 from typing import Any
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+import os
 import sys
 from pathlib import Path
 
 # 添加父目錄到路徑
 from src.strategies.base_strategy import BaseStrategy
 
+logger = logging.getLogger(__name__)
+
 # ============================================================================
 # 1. 遺傳演算法優化策略
 # ============================================================================
 
 
+def sma_cross_fitness(
+    close: np.ndarray, shorts: np.ndarray, longs: np.ndarray, sma_cache: dict[int, np.ndarray] | None = None
+) -> np.ndarray:
+    """
+    批次計算 SMA Cross 適應度（Sharpe + 2 × 最大回撤）
+
+    整個種群組成 (個體 × K 線) 的信號矩陣一次回測；每個窗口的 SMA 只算一次並存入 sma_cache。
+
+    Args:
+        close: 收盤價
+        shorts: 每個個體的短均線窗口
+        longs: 每個個體的長均線窗口
+        sma_cache: {window: SMA 陣列}，跨世代重用
+
+    Returns:
+        每個個體的適應度
+    """
+    if sma_cache is None:
+        sma_cache = {}
+    close_s = pd.Series(close)
+    for w in set(np.asarray(shorts).tolist()) | set(np.asarray(longs).tolist()):
+        if w not in sma_cache:
+            sma_cache[w] = close_s.rolling(window=w).mean().to_numpy()
+
+    sma_short = np.stack([sma_cache[w] for w in shorts])
+    sma_long = np.stack([sma_cache[w] for w in longs])
+    signals = (sma_short > sma_long).astype(np.float64) - (sma_short < sma_long)
+
+    # 信號延遲一根 K 線；第一根 K 線沒有收益
+    pct = close_s.pct_change().to_numpy()
+    returns = pct[None, 1:] * signals[:, :-1]
+
+    valid = ~np.isnan(returns)
+    count = valid.sum(axis=1)
+    filled = np.where(valid, returns, 0.0)
+    mean = filled.sum(axis=1) / np.maximum(count, 1)
+    var = np.where(valid, (returns - mean[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(count - 1, 1)
+    std = np.where(count > 1, np.sqrt(var), np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sharpe = np.where(std > 0, mean / std * np.sqrt(252), 0.0)
+
+    cumulative = np.cumprod(1 + filled, axis=1)
+    running_max = np.maximum.accumulate(cumulative, axis=1)
+    drawdown = np.where(valid, (cumulative - running_max) / running_max, np.inf)
+    max_drawdown = drawdown.min(axis=1)
+    max_drawdown = np.where(np.isfinite(max_drawdown), max_drawdown, np.nan)
+
+    # 回撤為負，所以是加法
+    return sharpe + 2 * max_drawdown
+
+
+# ─── 進程池適應度評估（不可向量化的策略） ───
+
+_worker_fitness: Callable[[dict[str, int], pd.DataFrame], float] | None = None
+_worker_data: pd.DataFrame | None = None
+
+
+def _init_fitness_worker(fitness_func: Callable[[dict[str, int], pd.DataFrame], float], data: pd.DataFrame) -> None:
+    global _worker_fitness, _worker_data
+    _worker_fitness = fitness_func
+    _worker_data = data
+
+
+def _score_params(params: dict[str, int]) -> float:
+    return float(_worker_fitness(params, _worker_data))
+
+
 class GeneticOptimization(BaseStrategy):
     """
     遺傳演算法策略優化
@@ -48,6 +123,10 @@ class GeneticOptimization(BaseStrategy):
         generations: int = 10,
         mutation_rate: float = 0.1,
         crossover_rate: float = 0.8,
+        fitness_func: Callable[[dict[str, int], pd.DataFrame], float] | None = None,
+        n_jobs: int = 1,
+        patience: int | None = None,
+        tol: float = 1e-6,
     ):
         """
         初始化遺傳演算法策略
@@ -59,6 +138,10 @@ class GeneticOptimization(BaseStrategy):
             generations: 進化代數
             mutation_rate: 變異率
             crossover_rate: 交叉率
+            fitness_func: 自訂適應度 (params, data) -> float；None 時使用向量化 SMA Cross
+            n_jobs: 自訂適應度的進程數（>1 時使用進程池，fitness_func 需可 pickle）
+            patience: 連續多少代最佳適應度沒有提升就提前停止（None 表示跑滿）
+            tol: 判定「有提升」的最小幅度
         """
         if param_ranges is None:
             param_ranges = {"short": (5, 20), "long": (20, 100)}
@@ -76,8 +159,19 @@ class GeneticOptimization(BaseStrategy):
             category="ai_ml",
         )
 
+        self.fitness_func = fitness_func
+        self.n_jobs = n_jobs
+        self.patience = patience
+        self.tol = tol
+
         self.best_params = None
         self.best_fitness = None
+        self.fitness_history: list[float] = []
+        self.n_evaluations = 0
+        self._fitness_cache: dict[tuple[int, ...], float] = {}
+        self._sma_cache: dict[int, np.ndarray] = {}
+        self._cache_data_key: str | None = None
+        self._executor: ProcessPoolExecutor | None = None
 
     def generate_signals(self, data: pd.DataFrame) -> pd.Series:
         """
@@ -127,28 +221,55 @@ class GeneticOptimization(BaseStrategy):
         """
         np.random.seed(42)
 
+        # 適應度快取以解碼後的參數為 key，只在同一份數據內有效
+        self._reset_cache(data)
+        self.fitness_history = []
+        self.n_evaluations = 0
+
         # 初始化種群
         population = self._initialize_population()
-
-        for generation in range(self.params["generations"]):
-            # 計算適應度
-            fitness_scores = [self._calculate_fitness(ind, data) for ind in population]
-
-            # 選擇最優個體
-            best_idx = np.argmax(fitness_scores)
-            best_fitness = fitness_scores[best_idx]
-            best_individual = population[best_idx]
-
-            print(f"Generation {generation}: Best Fitness = {best_fitness:.4f}")
-
-            # 選擇（錦標賽選擇）
-            selected = self._tournament_selection(population, fitness_scores)
-
-            # 交叉
-            offspring = self._crossover(selected)
-
-            # 變異
-            population = self._mutate(offspring)
+        best_fitness = -np.inf
+        best_individual = population[0]
+        stale = 0
+
+        if self.fitness_func is not None and self.n_jobs > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=min(self.n_jobs, os.cpu_count() or 1),
+                initializer=_init_fitness_worker,
+                initargs=(self.fitness_func, data),
+            )
+        try:
+            for generation in range(self.params["generations"]):
+                # 整個種群批次計算適應度
+                fitness_scores = self._batch_fitness(population, data).tolist()
+
+                # 選擇最優個體（保留歷代最佳）
+                gen_idx = int(np.nanargmax(fitness_scores)) if not np.all(np.isnan(fitness_scores)) else 0
+                gen_best = fitness_scores[gen_idx]
+                stale = 0 if gen_best > best_fitness + self.tol else stale + 1
+                if gen_best > best_fitness:
+                    best_fitness = gen_best
+                    best_individual = population[gen_idx]
+                self.fitness_history.append(best_fitness)
+
+                logger.info("Generation %d: Best Fitness = %.4f", generation, gen_best)
+
+                if self.patience is not None and stale >= self.patience:
+                    logger.info("Early stopping: %d generations without improvement", self.patience)
+                    break
+
+                # 選擇（錦標賽選擇）
+                selected = self._tournament_selection(population, fitness_scores)
+
+                # 交叉
+                offspring = self._crossover(selected)
+
+                # 變異
+                population = self._mutate(offspring)
+        finally:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
 
         # 保存最優結果
         self.best_params = self._decode_individual(best_individual)
@@ -186,6 +307,17 @@ class GeneticOptimization(BaseStrategy):
 
         return params
 
+    @staticmethod
+    def _data_key(data: pd.DataFrame) -> str:
+        """數據內容指紋（含索引與所有欄位），用來判斷適應度快取是否仍有效."""
+        hashed = pd.util.hash_pandas_object(data, index=True).to_numpy()
+        return hashlib.blake2b(hashed.tobytes(), digest_size=16).hexdigest()
+
+    def _reset_cache(self, data: pd.DataFrame, key: str | None = None) -> None:
+        self._fitness_cache = {}
+        self._sma_cache = {}
+        self._cache_data_key = key or self._data_key(data)
+
     def _calculate_fitness(self, individual: list[float], data: pd.DataFrame) -> float:
         """
         計算適應度（Sharpe Ratio - 最大回撤懲罰）
@@ -197,39 +329,51 @@ class GeneticOptimization(BaseStrategy):
         Returns:
             適應度分數
         """
-        params = self._decode_individual(individual)
-
-        # 計算策略收益（簡化版 SMA Cross）
-        short = params.get("short", 10)
-        long_period = params.get("long", 30)
-
-        sma_short = data["close"].rolling(window=short).mean()
-        sma_long = data["close"].rolling(window=long_period).mean()
-
-        # 生成信號
-        signals = pd.Series(0, index=data.index)
-        signals[(sma_short > sma_long)] = 1
-        signals[(sma_short < sma_long)] = -1
+        return float(self._batch_fitness([individual], data)[0])
 
-        # 計算收益
-        returns = data["close"].pct_change() * signals.shift(1)
+    def _batch_fitness(self, population: list[list[float]], data: pd.DataFrame) -> np.ndarray:
+        """
+        批次計算整個種群的適應度
 
-        # 計算 Sharpe Ratio
-        if returns.std() > 0:
-            sharpe = returns.mean() / returns.std() * np.sqrt(252)
-        else:
-            sharpe = 0
+        重複的個體（解碼後參數相同）只評估一次，已評估過的參數直接取快取；
+        data 與快取建立時的內容不同時（如直接以另一份數據呼叫）先清空快取。
 
-        # 計算最大回撤
-        cumulative = (1 + returns).cumprod()
-        running_max = cumulative.cummax()
-        drawdown = (cumulative - running_max) / running_max
-        max_drawdown = drawdown.min()
+        Args:
+            population: 種群
+            data: 歷史數據
 
-        # 適應度 = Sharpe + 回撤懲罰
-        fitness = sharpe + 2 * max_drawdown  # 回撤為負，所以是加法
+        Returns:
+            每個個體的適應度
+        """
+        data_key = self._data_key(data)
+        if data_key != self._cache_data_key:
+            self._reset_cache(data, data_key)
+        decoded = [self._decode_individual(ind) for ind in population]
+        keys = [tuple(params.values()) for params in decoded]
+
+        pending: dict[tuple[int, ...], dict[str, int]] = {}
+        for key, params in zip(keys, decoded):
+            if key not in self._fitness_cache and key not in pending:
+                pending[key] = params
+
+        if pending:
+            params_list = list(pending.values())
+            if self.fitness_func is None:
+                scores = sma_cross_fitness(
+                    data["close"].to_numpy(dtype=np.float64),
+                    np.array([p.get("short", 10) for p in params_list]),
+                    np.array([p.get("long", 30) for p in params_list]),
+                    self._sma_cache,
+                )
+            elif self._executor is not None:
+                chunksize = max(1, len(params_list) // (4 * self.n_jobs))
+                scores = list(self._executor.map(_score_params, params_list, chunksize=chunksize))
+            else:
+                scores = [self.fitness_func(p, data) for p in params_list]
+            self._fitness_cache.update(zip(pending, (float(x) for x in scores)))
+            self.n_evaluations += len(pending)
 
-        return fitness
+        return np.array([self._fitness_cache[key] for key in keys])
 
     def _tournament_selection(
         self, population: list[list[float]], fitness_scores: list[float], tournament_size: int = 3
@@ -3,10 +3,16 @@ StocksX 策略基類
 所有策略必須繼承自這些基類
 """
 
-import pandas as pd
-from typing import Any
+from __future__ import annotations
+
+import numpy as np
+from collections.abc import Mapping
+from typing import TYPE_CHECKING, Any
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:  # pandas 只在實際產生信號時載入，避免 import src.strategies 拖慢啟動
+    import pandas as pd
+
 
 class BaseStrategy(ABC):
     """策略基類"""
@@ -102,3 +108,120 @@ class RiskManagementStrategy(BaseStrategy):
 
     def __init__(self, name: str, params: dict[str, Any]):
         super().__init__(name, params, category="risk")
+
+
+class VectorizedStrategy(ABC):
+    """
+    向量化策略契約（與 BaseStrategy 一起繼承的 mixin）
+
+    子類實作 compute_signals：輸入欄位名 → 1-D float64 陣列，輸出等長信號陣列（1=買入，-1=賣出，0=持有），
+    不得逐 bar 走訪 DataFrame。另需宣告：
+    - required_columns：需要的 OHLCV 欄位
+    - indicators：依賴的指標名稱（供批次評分時共用計算）
+    - warmup：前多少根的信號因指標尚未暖身而不可靠
+
+    generate_signals 由本類提供（DataFrame → 陣列 → Series），舊介面行為不變；
+    與舊實作的一致性以 src.strategies.conformance 驗證。
+    """
+
+    required_columns: tuple[str, ...] = ("close",)
+    indicators: tuple[str, ...] = ()
+
+    @property
+    def warmup(self) -> int:
+        """指標暖身所需 K 線數"""
+        return 0
+
+    @abstractmethod
+    def compute_signals(self, arrays: Mapping[str, np.ndarray]) -> np.ndarray:
+        """
+        由欄位陣列計算信號
+
+        Args:
+            arrays: 欄位名 → 等長 float64 陣列（至少包含 required_columns）
+
+        Returns:
+            信號陣列（長度與輸入相同）
+        """
+        pass
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        import pandas as pd
+
+        signals = self.compute_signals(frame_to_arrays(data, self.required_columns))
+        return pd.Series(np.asarray(signals, dtype=np.int64), index=data.index)
+
+
+def frame_to_arrays(data: pd.DataFrame, columns: tuple[str, ...]) -> dict[str, np.ndarray]:
+    """取出指定欄位為 float64 陣列（缺少的欄位拋出 KeyError）"""
+    return {col: data[col].to_numpy(dtype=np.float64) for col in columns}
+
+
+def simulate_long_only(signals: np.ndarray, close: np.ndarray, cost: float) -> tuple[np.ndarray, int]:
+    """
+    全倉做多狀態機的向量化版本：信號 1 且空倉時買入、-1 且持倉時賣出，其餘維持。
+
+    Args:
+        signals: 信號陣列（第 0 根不交易）
+        close: 收盤價
+        cost: 單邊成本比例（手續費 + 滑點）
+
+    Returns:
+        (第 1 根起的淨值倍數（相對初始資金，期末持倉以收盤價平倉）, 賣出次數)
+    """
+    n = len(close)
+    if n < 2:
+        return np.ones(max(n - 1, 0)), 0
+    signals = np.asarray(signals, dtype=np.float64)
+    event = np.full(n, np.nan)
+    event[signals == 1] = 1.0
+    event[signals == -1] = 0.0
+    event[0] = 0.0
+    last = np.where(np.isnan(event), 0, np.arange(n))
+    np.maximum.accumulate(last, out=last)
+    held = event[last].astype(bool)
+    prev = np.concatenate(([False], held[:-1]))
+
+    keep = 1.0 - cost
+    growth = np.ones(n)
+    growth[1:] = np.where(prev[1:], close[1:] / close[:-1], 1.0)
+    exits = prev & ~held
+    growth[(held & ~prev) | exits] *= keep
+    values = np.cumprod(growth[1:])
+    if held[-1]:
+        values[-1] *= keep
+    return values, int(exits.sum())
+
+
+def supertrend_direction(close: np.ndarray, upper_band: np.ndarray, lower_band: np.ndarray) -> np.ndarray:
+    """
+    Supertrend 趨勢方向（向量化）
+
+    原逐 bar 規則為 close[i] > supertrend[i-1] 則為 1（supertrend 取下軌）、否則為 -1（取上軌），
+    且 supertrend[0] = 0。由於前一根 supertrend 只取決於前一根方向，可改寫為事件：
+    收盤高於前一根上軌必為 1、不高於前一根下軌必為 -1，介於兩者之間沿用前一根方向（前向填充）。
+
+    上軌低於下軌（負倍數）時事件改寫不成立，退回逐 bar 計算。
+
+    Returns:
+        方向陣列（1=上升趨勢，-1=下降趨勢）
+    """
+    n = len(close)
+    trend = np.ones(n, dtype=np.int64)
+    if n < 2:
+        return trend
+    if np.any(upper_band < lower_band):
+        prev = 0.0
+        for i in range(1, n):
+            trend[i] = 1 if close[i] > prev else -1
+            prev = lower_band[i] if trend[i] == 1 else upper_band[i]
+        return trend
+    event = np.full(n, np.nan)
+    event[1] = 1.0 if close[1] > 0.0 else -1.0
+    c, up, lo = close[2:], upper_band[1:-1], lower_band[1:-1]
+    event[2:] = np.where(c > up, 1.0, np.where(c > lo, np.nan, -1.0))
+    event[0] = 1.0
+    last = np.where(np.isnan(event), 0, np.arange(n))
+    np.maximum.accumulate(last, out=last)
+    trend[:] = event[last]
+    return trend
@@ -0,0 +1,158 @@
+"""
+向量化策略一致性檢查
+
+比對 VectorizedStrategy 的陣列信號與舊版（逐 bar）實作的輸出，確認移植沒有改變交易行為，
+並順帶量測兩者的耗時。
+
+用法：
+    result = check_conformance(SupertrendOptimized(), legacy.generate_signals)
+    assert result.ok, result.describe()
+"""
+
+from __future__ import annotations
+
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+_OHLCV = ("open", "high", "low", "close", "volume")
+
+
+@dataclass(slots=True)
+class ConformanceResult:
+    """一致性檢查結果（warmup 之前的 K 線不計入比對）"""
+
+    name: str
+    n_bars: int
+    warmup: int
+    mismatches: int
+    first_mismatch: int | None
+    legacy_seconds: float
+    vectorized_seconds: float
+
+    @property
+    def ok(self) -> bool:
+        return self.mismatches == 0
+
+    @property
+    def speedup(self) -> float:
+        return self.legacy_seconds / self.vectorized_seconds if self.vectorized_seconds > 0 else float("inf")
+
+    def describe(self) -> str:
+        status = "一致" if self.ok else f"{self.mismatches} 根不一致（首個位置 {self.first_mismatch}）"
+        return f"{self.name}: {self.n_bars} 根 K 線、warmup {self.warmup}，{status}，加速 {self.speedup:.1f}x"
+
+
+def synthetic_ohlcv(
+    n: int = 1000,
+    seed: int = 0,
+    volatility: float = 0.02,
+    *,
+    wave: float = 0.0,
+    period: float = 30.0,
+    spread: float | None = None,
+    start: Any = "2020-01-01",
+    freq: Any = "D",
+) -> pd.DataFrame:
+    """
+    產生隨機漫步 OHLCV（預設日線），供一致性檢查、測試與基準測試共用
+
+    Args:
+        n: K 線數量
+        seed: 隨機種子
+        volatility: 每根 K 線對數報酬的標準差
+        wave: 疊加在對數價格上的正弦振幅（讓均線策略有趨勢可抓）
+        period: 正弦週期（以 2π 根 K 線為單位）
+        spread: high / low 相對實體的固定偏移；None 表示隨機影線
+        start: 第一根 K 線時間
+        freq: K 線間隔（pandas 頻率字串或 Timedelta）
+
+    Returns:
+        含 open/high/low/close/volume 的 DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, volatility, n)) + wave * np.sin(np.arange(n) / period))
+    open_ = np.concatenate(([close[0]], close[:-1])) * (1 + rng.normal(0, volatility / 4, n))
+    if spread is None:
+        shadow = np.abs(rng.normal(0, volatility / 2, n)) * close
+        high, low = np.maximum(open_, close) + shadow, np.minimum(open_, close) - shadow
+    else:
+        high, low = np.maximum(open_, close) * (1 + spread), np.minimum(open_, close) * (1 - spread)
+    return pd.DataFrame(
+        {
+            "open": open_,
+            "high": high,
+            "low": low,
+            "close": close,
+            "volume": rng.integers(1_000_000, 10_000_000, n).astype(np.float64),
+        },
+        index=pd.date_range(start, periods=n, freq=freq, name="date"),
+    )
+
+
+def synthetic_rows(n: int = 1000, seed: int = 0, volatility: float = 0.02, **kwargs: Any) -> list[dict[str, Any]]:
+    """
+    synthetic_ohlcv 的 rows 形式（回測引擎使用的 K 線格式，timestamp 為毫秒）
+
+    Args:
+        n / seed / volatility / kwargs: 同 synthetic_ohlcv
+
+    Returns:
+        [{timestamp, open, high, low, close, volume}, ...]
+    """
+    frame = synthetic_ohlcv(n, seed, volatility, **kwargs)
+    columns = [frame.index.as_unit("ms").asi8.tolist()] + [frame[c].tolist() for c in _OHLCV]
+    return [dict(zip(("timestamp", *_OHLCV), values)) for values in zip(*columns)]
+
+
+def check_conformance(
+    strategy: Any,
+    legacy: Callable[[pd.DataFrame], pd.Series],
+    data: pd.DataFrame | None = None,
+    skip_warmup: bool = False,
+) -> ConformanceResult:
+    """
+    比對向量化信號與舊版信號
+
+    Args:
+        strategy: 實作 compute_signals 的策略實例
+        legacy: 舊版信號函式（DataFrame → 信號 Series）
+        data: OHLCV 數據（預設 synthetic_ohlcv()）
+        skip_warmup: 是否略過 strategy.warmup 之前的 K 線
+
+    Returns:
+        ConformanceResult
+    """
+    if not hasattr(strategy, "compute_signals"):
+        raise TypeError(f"{type(strategy).__name__} 未實作 VectorizedStrategy 契約（compute_signals）")
+    if data is None:
+        data = synthetic_ohlcv()
+
+    arrays = {col: data[col].to_numpy(dtype=np.float64) for col in strategy.required_columns}
+    start = time.perf_counter()
+    vectorized = np.asarray(strategy.compute_signals(arrays))
+    vectorized_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    expected = np.asarray(legacy(data))
+    legacy_seconds = time.perf_counter() - start
+
+    if vectorized.shape != expected.shape:
+        raise ValueError(f"信號長度不一致: 向量化 {vectorized.shape}，舊版 {expected.shape}")
+
+    warmup = int(strategy.warmup)
+    offset = min(warmup, len(data)) if skip_warmup else 0
+    diff = np.flatnonzero(vectorized[offset:] != expected[offset:])
+    return ConformanceResult(
+        name=getattr(strategy, "name", type(strategy).__name__),
+        n_bars=len(data),
+        warmup=warmup,
+        mismatches=len(diff),
+        first_mismatch=int(diff[0]) + offset if len(diff) else None,
+        legacy_seconds=legacy_seconds,
+        vectorized_seconds=vectorized_seconds,
+    )
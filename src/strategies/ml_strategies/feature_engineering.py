@@ -14,137 +14,52 @@ from sklearn.decomposition import PCA
 from sklearn.feature_selection import SelectKBest, f_classif, mutual_info_classif
 from sklearn.preprocessing import StandardScaler
 
+from .feature_store import FeatureStore, get_feature_store, technical_features
+
 warnings.filterwarnings("ignore")
 
 
 class FeatureEngineer:
     """特征工程器"""
 
-    def __init__(self):
+    def __init__(self, store: FeatureStore | None = None):
+        self.store = store or get_feature_store()
         self.scaler = StandardScaler()
         self.selected_features = []
         self.pca = None
 
-    def create_technical_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def create_technical_features(
+        self,
+        df: pd.DataFrame,
+        features: list[str] | None = None,
+        symbol: str | None = None,
+        timeframe: str = "1d",
+    ) -> pd.DataFrame:
         """
         创建技术指标特征
 
+        只计算请求的列及其依赖；提供 symbol 时结果按 (symbol, timeframe, 数据区间, 特征集)
+        缓存在 FeatureStore 中，数据延伸时只计算新增 K 线。
+
         Args:
             df: 包含 OHLCV 的 DataFrame
+            features: 需要的特征列，None 表示全部默认技术指标
+            symbol: 交易对（提供时启用特征缓存）
+            timeframe: K 线周期
 
         Returns:
-            包含所有技术指标的 DataFrame
+            原始列 + 请求的技术指标列的 DataFrame
         """
-        df = df.copy()
-
-        # ===== 趋势指标 =====
-        # 移动平均线
-        for window in [5, 10, 20, 50, 60, 200]:
-            df[f"ma_{window}"] = df["close"].rolling(window=window).mean()
-            df[f"ema_{window}"] = df["close"].ewm(span=window).mean()
-
-        # MA 斜率
-        df["ma20_slope"] = df["ma_20"].diff() / df["ma_20"].shift(1)
-        df["ma60_slope"] = df["ma_60"].diff() / df["ma_60"].shift(1)
-
-        # 价格与 MA 的距离
-        df["price_ma20_dist"] = (df["close"] - df["ma_20"]) / df["ma_20"]
-        df["price_ma60_dist"] = (df["close"] - df["ma_60"]) / df["ma_60"]
-
-        # 金叉/死叉信号
-        df["golden_cross"] = (df["ma_5"] > df["ma_20"]).astype(int)
-        df["death_cross"] = (df["ma_5"] < df["ma_20"]).astype(int)
-
-        # ===== 动量指标 =====
-        # RSI
-        for window in [7, 14, 21]:
-            delta = df["close"].diff()
-            gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
-            loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
-            rs = gain / loss
-            df[f"rsi_{window}"] = 100 - (100 / (1 + rs))
-
-        # 随机指标 (Stochastic)
-        for window in [9, 14]:
-            low_min = df["low"].rolling(window=window).min()
-            high_max = df["high"].rolling(window=window).max()
-            df[f"stoch_k_{window}"] = 100 * (df["close"] - low_min) / (high_max - low_min + 1e-10)
-            df[f"stoch_d_{window}"] = df[f"stoch_k_{window}"].rolling(window=3).mean()
-
-        # 价格动量
-        for period in [5, 10, 20]:
-            df[f"momentum_{period}"] = df["close"].pct_change(periods=period)
-
-        # ROC (Rate of Change)
-        df["roc_10"] = (df["close"] - df["close"].shift(10)) / df["close"].shift(10)
-
-        # ===== 波动率指标 =====
-        # 历史波动率
-        for window in [10, 20, 30]:
-            df[f"volatility_{window}"] = df["close"].pct_change().rolling(window=window).std()
-
-        # 真实波动幅度 (ATR)
-        high_low = df["high"] - df["low"]
-        high_close = np.abs(df["high"] - df["close"].shift())
-        low_close = np.abs(df["low"] - df["close"].shift())
-        ranges = pd.concat([high_low, high_close, low_close], axis=1)
-        true_range = ranges.max(axis=1)
-        df["atr_14"] = true_range.rolling(14).mean()
-        df["atr_ratio"] = df["atr_14"] / df["close"]
-
-        # ===== 布林带 =====
-        for window in [20]:
-            df[f"bb_middle_{window}"] = df["close"].rolling(window=window).mean()
-            bb_std = df["close"].rolling(window=window).std()
-            df[f"bb_upper_{window}"] = df[f"bb_middle_{window}"] + (bb_std * 2)
-            df[f"bb_lower_{window}"] = df[f"bb_middle_{window}"] - (bb_std * 2)
-            df[f"bb_width_{window}"] = (df[f"bb_upper_{window}"] - df[f"bb_lower_{window}"]) / df[f"bb_middle_{window}"]
-            df["bb_position"] = (df["close"] - df[f"bb_lower_{window}"]) / (
-                df[f"bb_upper_{window}"] - df[f"bb_lower_{window}"] + 1e-10
-            )
-
-        # ===== MACD =====
-        exp12 = df["close"].ewm(span=12).mean()
-        exp26 = df["close"].ewm(span=26).mean()
-        df["macd"] = exp12 - exp26
-        df["macd_signal"] = df["macd"].ewm(span=9).mean()
-        df["macd_hist"] = df["macd"] - df["macd_signal"]
-        df["macd_cross"] = (df["macd"] > df["macd_signal"]).astype(int)
-
-        # ===== 成交量指标 =====
-        # 成交量 MA
-        for window in [5, 10, 20]:
-            df[f"volume_ma_{window}"] = df["volume"].rolling(window=window).mean()
-
-        # 成交量变化率
-        df["volume_change"] = df["volume"].pct_change()
-        df["volume_ratio"] = df["volume"] / df["volume_ma_20"]
-
-        # OBV (On-Balance Volume)
-        df["obv"] = (np.sign(df["close"].diff()) * df["volume"]).fillna(0).cumsum()
-        df["obv_ma"] = df["obv"].rolling(window=20).mean()
-
-        # ===== 价格形态特征 =====
-        # 蜡烛图实体大小
-        df["body_size"] = np.abs(df["close"] - df["open"]) / df["open"]
-        df["upper_shadow"] = (df["high"] - df[["open", "close"]].max(axis=1)) / df["open"]
-        df["lower_shadow"] = (df[["open", "close"]].min(axis=1) - df["low"]) / df["open"]
-
-        # 价格缺口
-        df["gap"] = (df["open"] - df["close"].shift()) / df["close"].shift()
-
-        # ===== 周期性特征 =====
-        if isinstance(df.index, pd.DatetimeIndex):
-            df["day_of_week"] = df.index.dayofweek
-            df["month"] = df.index.month
-            df["quarter"] = df.index.quarter
-            df["is_month_start"] = df.index.is_month_start.astype(int)
-            df["is_month_end"] = df.index.is_month_end.astype(int)
-
-        # ===== 滞后特征 =====
-        for lag in [1, 2, 3, 5]:
-            df[f"return_lag_{lag}"] = df["close"].pct_change().shift(lag)
+        if features is None:
+            features = technical_features(df.index)
+        if symbol is None:
+            computed = self.store.compute(df, features)
+        else:
+            computed = self.store.materialize(df, symbol, timeframe, features)
 
+        df = df.copy()
+        for name in features:
+            df[name] = computed[name]
         return df
 
     def create_target(
@@ -0,0 +1,556 @@
+"""
+特征仓库（Feature Store）
+
+把技术指标声明为一张依赖图（DAG），只计算模型真正请求的列及其依赖：
+- FeatureSpec：特征名 + 依赖 + 回看长度（lookback），lookback=None 表示依赖全部历史（ewm / cumsum）
+- FeatureStore.compute：按拓扑序计算请求的特征，不做缓存
+- FeatureStore.materialize：按 (symbol, timeframe, 数据区间, 特征集) 缓存列式特征矩阵，
+  数据是已缓存区间的延伸时只计算新增 K 线
+- FeatureStore.append：向已物化的矩阵追加新 K 线
+
+训练与推理共用同一个 FeatureStore 即可共享一次物化结果。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+BASE_COLUMNS: tuple[str, ...] = ("open", "high", "low", "close", "volume")
+
+FeatureFunc = Callable[..., pd.Series]
+
+
+@dataclass(frozen=True, slots=True)
+class FeatureSpec:
+    """
+    单个特征的声明
+
+    Args:
+        name: 特征列名
+        func: 计算函数，参数依次为 deps 对应的 Series，返回与输入等长的 Series
+        deps: 依赖的列（基础 OHLCV 列或其他特征）
+        lookback: 计算一行结果需要向前看的行数；None 表示依赖全部历史
+    """
+
+    name: str
+    func: FeatureFunc
+    deps: tuple[str, ...]
+    lookback: int | None = 0
+
+
+class FeatureRegistry:
+    """特征声明表（DAG）"""
+
+    def __init__(self, specs: Iterable[FeatureSpec] = ()):
+        self._specs: dict[str, FeatureSpec] = {}
+        for spec in specs:
+            self.register(spec)
+
+    def register(self, spec: FeatureSpec) -> None:
+        for dep in spec.deps:
+            if dep not in BASE_COLUMNS and dep not in self._specs:
+                raise ValueError(f"特征 {spec.name} 依赖未注册的列 {dep}")
+        self._specs[spec.name] = spec
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def __getitem__(self, name: str) -> FeatureSpec:
+        try:
+            return self._specs[name]
+        except KeyError:
+            raise KeyError(f"未注册的特征: {name}") from None
+
+    @property
+    def names(self) -> list[str]:
+        return list(self._specs)
+
+    def resolve(self, features: Iterable[str]) -> list[str]:
+        """返回请求特征及其全部依赖的拓扑序（不含基础列）"""
+        order: list[str] = []
+        seen: set[str] = set()
+
+        def visit(name: str) -> None:
+            if name in seen or name in BASE_COLUMNS:
+                return
+            spec = self[name]
+            for dep in spec.deps:
+                visit(dep)
+            seen.add(name)
+            order.append(name)
+
+        for name in features:
+            visit(name)
+        return order
+
+
+# ════════════════════════════════════════════════════════════
+# 内置技术指标
+# ════════════════════════════════════════════════════════════
+
+
+def _rsi(delta: pd.Series, window: int) -> pd.Series:
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    rs = gain / loss
+    return 100 - (100 / (1 + rs))
+
+
+def _true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    high_low = high - low
+    high_close = np.abs(high - close.shift())
+    low_close = np.abs(low - close.shift())
+    return pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
+
+
+def _technical_specs() -> list[FeatureSpec]:
+    specs: list[FeatureSpec] = [
+        FeatureSpec("close_diff", lambda c: c.diff(), ("close",), 1),
+        FeatureSpec("returns", lambda c: c.pct_change(), ("close",), 1),
+    ]
+
+    # ─── 趋势 ───
+    for w in (5, 10, 12, 20, 26, 50, 60, 200):
+        specs.append(FeatureSpec(f"ma_{w}", lambda c, w=w: c.rolling(window=w).mean(), ("close",), w - 1))
+        specs.append(FeatureSpec(f"ema_{w}", lambda c, w=w: c.ewm(span=w).mean(), ("close",), None))
+    for w in (20, 60):
+        specs.append(FeatureSpec(f"ma{w}_slope", lambda m: m.diff() / m.shift(1), (f"ma_{w}",), 1))
+        specs.append(FeatureSpec(f"price_ma{w}_dist", lambda c, m: (c - m) / m, ("close", f"ma_{w}")))
+    specs.append(FeatureSpec("golden_cross", lambda f, s: (f > s).astype(int), ("ma_5", "ma_20")))
+    specs.append(FeatureSpec("death_cross", lambda f, s: (f < s).astype(int), ("ma_5", "ma_20")))
+
+    # ─── 动量 ───
+    for w in (7, 14, 21):
+        specs.append(FeatureSpec(f"rsi_{w}", lambda d, w=w: _rsi(d, w), ("close_diff",), w - 1))
+    for w in (9, 14):
+        specs.append(
+            FeatureSpec(
+                f"stoch_k_{w}",
+                lambda c, lo, hi, w=w: 100
+                * (c - lo.rolling(window=w).min())
+                / (hi.rolling(window=w).max() - lo.rolling(window=w).min() + 1e-10),
+                ("close", "low", "high"),
+                w - 1,
+            )
+        )
+        specs.append(FeatureSpec(f"stoch_d_{w}", lambda k: k.rolling(window=3).mean(), (f"stoch_k_{w}",), 2))
+    for p in (5, 10, 20):
+        specs.append(FeatureSpec(f"momentum_{p}", lambda c, p=p: c.pct_change(periods=p), ("close",), p))
+    specs.append(FeatureSpec("roc_10", lambda c: (c - c.shift(10)) / c.shift(10), ("close",), 10))
+
+    # ─── 波动率 ───
+    for w in (10, 20, 30):
+        specs.append(FeatureSpec(f"volatility_{w}", lambda r, w=w: r.rolling(window=w).std(), ("returns",), w - 1))
+    specs.append(FeatureSpec("true_range", _true_range, ("high", "low", "close"), 1))
+    specs.append(FeatureSpec("atr_14", lambda tr: tr.rolling(14).mean(), ("true_range",), 13))
+    specs.append(FeatureSpec("atr_ratio", lambda a, c: a / c, ("atr_14", "close")))
+
+    # ─── 布林带 ───
+    specs += [
+        FeatureSpec("bb_middle_20", lambda c: c.rolling(window=20).mean(), ("close",), 19),
+        FeatureSpec("bb_std_20", lambda c: c.rolling(window=20).std(), ("close",), 19),
+        FeatureSpec("bb_upper_20", lambda m, s: m + (s * 2), ("bb_middle_20", "bb_std_20")),
+        FeatureSpec("bb_lower_20", lambda m, s: m - (s * 2), ("bb_middle_20", "bb_std_20")),
+        FeatureSpec("bb_width_20", lambda u, lo, m: (u - lo) / m, ("bb_upper_20", "bb_lower_20", "bb_middle_20")),
+        FeatureSpec(
+            "bb_position", lambda c, u, lo: (c - lo) / (u - lo + 1e-10), ("close", "bb_upper_20", "bb_lower_20")
+        ),
+    ]
+
+    # ─── MACD ───
+    specs += [
+        FeatureSpec("macd", lambda f, s: f - s, ("ema_12", "ema_26")),
+        FeatureSpec("macd_signal", lambda m: m.ewm(span=9).mean(), ("macd",), None),
+        FeatureSpec("macd_hist", lambda m, s: m - s, ("macd", "macd_signal")),
+        FeatureSpec("macd_cross", lambda m, s: (m > s).astype(int), ("macd", "macd_signal")),
+    ]
+
+    # ─── 成交量 ───
+    for w in (5, 10, 20):
+        specs.append(FeatureSpec(f"volume_ma_{w}", lambda v, w=w: v.rolling(window=w).mean(), ("volume",), w - 1))
+    specs += [
+        FeatureSpec("volume_change", lambda v: v.pct_change(), ("volume",), 1),
+        FeatureSpec("volume_ratio", lambda v, m: v / m, ("volume", "volume_ma_20")),
+        FeatureSpec("obv", lambda d, v: (np.sign(d) * v).fillna(0).cumsum(), ("close_diff", "volume"), None),
+        FeatureSpec("obv_ma", lambda o: o.rolling(window=20).mean(), ("obv",), 19),
+    ]
+
+    # ─── 价格形态 ───
+    specs += [
+        FeatureSpec("body_size", lambda o, c: np.abs(c - o) / o, ("open", "close")),
+        FeatureSpec(
+            "upper_shadow", lambda o, h, c: (h - pd.concat([o, c], axis=1).max(axis=1)) / o, ("open", "high", "close")
+        ),
+        FeatureSpec(
+            "lower_shadow", lambda o, lo, c: (pd.concat([o, c], axis=1).min(axis=1) - lo) / o, ("open", "low", "close")
+        ),
+        FeatureSpec("gap", lambda o, c: (o - c.shift()) / c.shift(), ("open", "close"), 1),
+    ]
+
+    # ─── 周期性（需要 DatetimeIndex） ───
+    specs += [
+        FeatureSpec("day_of_week", lambda c: _calendar(c, "dayofweek"), ("close",)),
+        FeatureSpec("month", lambda c: _calendar(c, "month"), ("close",)),
+        FeatureSpec("quarter", lambda c: _calendar(c, "quarter"), ("close",)),
+        FeatureSpec("is_month_start", lambda c: _calendar(c, "is_month_start").astype(int), ("close",)),
+        FeatureSpec("is_month_end", lambda c: _calendar(c, "is_month_end").astype(int), ("close",)),
+    ]
+
+    # ─── 滞后收益 ───
+    for lag in (1, 2, 3, 5):
+        specs.append(FeatureSpec(f"return_lag_{lag}", lambda r, lag=lag: r.shift(lag), ("returns",), lag))
+    return specs
+
+
+def _calendar(series: pd.Series, attr: str) -> pd.Series:
+    if not isinstance(series.index, pd.DatetimeIndex):
+        raise ValueError("周期性特征需要 DatetimeIndex")
+    return pd.Series(getattr(series.index, attr), index=series.index)
+
+
+CALENDAR_FEATURES: tuple[str, ...] = ("day_of_week", "month", "quarter", "is_month_start", "is_month_end")
+
+# FeatureEngineer.create_technical_features 的默认输出列（保持原有顺序）
+TECHNICAL_FEATURES: tuple[str, ...] = (
+    *(f"{kind}_{w}" for w in (5, 10, 20, 50, 60, 200) for kind in ("ma", "ema")),
+    "ma20_slope",
+    "ma60_slope",
+    "price_ma20_dist",
+    "price_ma60_dist",
+    "golden_cross",
+    "death_cross",
+    "rsi_7",
+    "rsi_14",
+    "rsi_21",
+    "stoch_k_9",
+    "stoch_d_9",
+    "stoch_k_14",
+    "stoch_d_14",
+    "momentum_5",
+    "momentum_10",
+    "momentum_20",
+    "roc_10",
+    "volatility_10",
+    "volatility_20",
+    "volatility_30",
+    "atr_14",
+    "atr_ratio",
+    "bb_middle_20",
+    "bb_upper_20",
+    "bb_lower_20",
+    "bb_width_20",
+    "bb_position",
+    "macd",
+    "macd_signal",
+    "macd_hist",
+    "macd_cross",
+    "volume_ma_5",
+    "volume_ma_10",
+    "volume_ma_20",
+    "volume_change",
+    "volume_ratio",
+    "obv",
+    "obv_ma",
+    "body_size",
+    "upper_shadow",
+    "lower_shadow",
+    "gap",
+    *CALENDAR_FEATURES,
+    "return_lag_1",
+    "return_lag_2",
+    "return_lag_3",
+    "return_lag_5",
+)
+
+
+def default_registry() -> FeatureRegistry:
+    """内置技术指标的特征表"""
+    return FeatureRegistry(_technical_specs())
+
+
+def technical_features(index: pd.Index) -> list[str]:
+    """默认技术特征列表；非 DatetimeIndex 时去掉周期性特征"""
+    if isinstance(index, pd.DatetimeIndex):
+        return list(TECHNICAL_FEATURES)
+    return [f for f in TECHNICAL_FEATURES if f not in CALENDAR_FEATURES]
+
+
+# ════════════════════════════════════════════════════════════
+# 列式特征矩阵
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class FeatureMatrix:
+    """一段 K 线上已物化的特征（列式存储：每列一个 ndarray）"""
+
+    symbol: str
+    timeframe: str
+    features: tuple[str, ...]
+    index: pd.Index
+    columns: dict[str, np.ndarray]
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.index)
+
+    @property
+    def data_range(self) -> tuple[object, object]:
+        if not self.n_rows:
+            return (None, None)
+        return (self.index[0], self.index[-1])
+
+    def frame(self, features: Sequence[str] | None = None, n_rows: int | None = None) -> pd.DataFrame:
+        names = list(features) if features is not None else list(self.features)
+        n = self.n_rows if n_rows is None else n_rows
+        return pd.DataFrame({name: self.columns[name][:n] for name in names}, index=self.index[:n])
+
+    def save(self, path: Path) -> None:
+        arrays = {f"col:{name}": values for name, values in self.columns.items()}
+        if isinstance(self.index, pd.DatetimeIndex):
+            arrays["index"] = self.index.asi8
+            tz = str(self.index.tz) if self.index.tz is not None else ""
+            meta = ["datetime", tz, self.index.unit]
+        else:
+            arrays["index"] = np.asarray(self.index)
+            meta = ["plain", "", ""]
+        arrays["meta"] = np.array([self.symbol, self.timeframe, *meta])
+        arrays["features"] = np.array(self.features, dtype=str)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, **arrays)
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path) -> FeatureMatrix:
+        with np.load(path, allow_pickle=False) as data:
+            symbol, timeframe, kind, tz, unit = (str(x) for x in data["meta"])
+            if kind == "datetime":
+                index: pd.Index = pd.DatetimeIndex(data["index"].astype(f"datetime64[{unit}]"))
+                if tz:
+                    index = index.tz_localize("UTC").tz_convert(tz)
+            else:
+                index = pd.Index(data["index"])
+            columns = {key[4:]: data[key] for key in data.files if key.startswith("col:")}
+            features = tuple(str(f) for f in data["features"])
+        return cls(symbol, timeframe, features, index, columns)
+
+
+# ════════════════════════════════════════════════════════════
+# Feature Store
+# ════════════════════════════════════════════════════════════
+
+
+class FeatureStore:
+    """
+    按需计算、可增量追加的特征仓库
+
+    缓存按 (symbol, timeframe, 特征集) 保存最新一段物化矩阵，数据区间记录在矩阵上：
+    请求区间等于或是缓存区间的前缀时直接切片返回；请求区间延伸了缓存区间时只计算新增行。
+    """
+
+    def __init__(
+        self,
+        registry: FeatureRegistry | None = None,
+        cache_dir: str | Path | None = None,
+        max_entries: int = 64,
+    ):
+        """
+        Args:
+            registry: 特征表，默认使用内置技术指标
+            cache_dir: 持久化目录（.npz 列式文件），None 表示仅内存缓存
+            max_entries: 内存中保留的矩阵数量
+        """
+        self.registry = registry or default_registry()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._cache = LRUCache(max_entries)
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "appends": 0, "misses": 0, "rows_computed": 0}
+
+    # ─── 无缓存计算 ───
+
+    def compute(self, df: pd.DataFrame, features: Sequence[str]) -> pd.DataFrame:
+        """
+        只计算请求的特征及其依赖
+
+        Args:
+            df: 包含 OHLCV 的 DataFrame
+            features: 请求的特征名
+
+        Returns:
+            仅包含请求特征列的 DataFrame（与 df 同索引）
+        """
+        features = list(features)
+        cols = self._evaluate(df, self.registry.resolve(features))
+        return pd.DataFrame({name: cols[name] for name in features}, index=df.index)
+
+    def _evaluate(self, df: pd.DataFrame, order: Sequence[str]) -> dict[str, pd.Series]:
+        cols: dict[str, pd.Series] = {}
+        for name in order:
+            spec = self.registry[name]
+            args = [df[d] if d in BASE_COLUMNS else cols[d] for d in spec.deps]
+            cols[name] = spec.func(*args)
+        self.stats["rows_computed"] += len(df)
+        return cols
+
+    # ─── 带缓存的物化 ───
+
+    def materialize(
+        self, df: pd.DataFrame, symbol: str, timeframe: str, features: Sequence[str]
+    ) -> pd.DataFrame:
+        """
+        物化并缓存特征矩阵
+
+        Args:
+            df: OHLCV DataFrame（按时间升序）
+            symbol: 交易对
+            timeframe: K 线周期
+            features: 请求的特征名
+
+        Returns:
+            仅包含请求特征列的 DataFrame（与 df 同索引）
+        """
+        features = list(features)
+        with self._lock:
+            key = self._key(symbol, timeframe, features)
+            matrix = self._lookup(key)
+            if matrix is not None:
+                overlap = min(matrix.n_rows, len(df))
+                if self._same_prefix(matrix, df, overlap):
+                    if overlap == len(df):
+                        self.stats["hits"] += 1
+                        return matrix.frame(features, len(df))
+                    matrix = self._extend(matrix, df)
+                    self.stats["appends"] += 1
+                    self._store(key, matrix)
+                    return matrix.frame(features)
+
+            self.stats["misses"] += 1
+            order = self.registry.resolve(features)
+            cols = self._evaluate(df, order)
+            columns = {name: np.asarray(df[name]) for name in BASE_COLUMNS if name in df.columns}
+            columns.update({name: cols[name].to_numpy() for name in order})
+            matrix = FeatureMatrix(symbol, timeframe, tuple(features), df.index, columns)
+            self._store(key, matrix)
+            return matrix.frame(features)
+
+    def append(self, symbol: str, timeframe: str, features: Sequence[str], new_bars: pd.DataFrame) -> pd.DataFrame:
+        """
+        向已物化的矩阵追加新 K 线，只计算新增行
+
+        Args:
+            symbol: 交易对
+            timeframe: K 线周期
+            features: 特征集（需与物化时一致）
+            new_bars: 新增 OHLCV 行，索引须晚于已缓存的最后一行
+
+        Returns:
+            追加后完整区间的特征 DataFrame
+        """
+        features = list(features)
+        with self._lock:
+            key = self._key(symbol, timeframe, features)
+            matrix = self._lookup(key)
+            if matrix is None:
+                raise KeyError(f"{symbol} {timeframe} 尚未物化该特征集")
+            if matrix.n_rows and len(new_bars) and not new_bars.index[0] > matrix.index[-1]:
+                raise ValueError("新增 K 线必须晚于已缓存的最后一行")
+            raw = pd.DataFrame(
+                {name: matrix.columns[name] for name in BASE_COLUMNS if name in matrix.columns}, index=matrix.index
+            )
+            df = pd.concat([raw, new_bars[list(raw.columns)]])
+            matrix = self._extend(matrix, df)
+            self.stats["appends"] += 1
+            self._store(key, matrix)
+            return matrix.frame(features)
+
+    def clear(self) -> None:
+        """清除内存缓存（磁盘文件保留）"""
+        with self._lock:
+            self._cache.clear()
+
+    # ─── 内部 ───
+
+    def _extend(self, matrix: FeatureMatrix, df: pd.DataFrame) -> FeatureMatrix:
+        """用已缓存的前 n_old 行作为依赖输入，只计算 [n_old, n) 的新增行"""
+        n_old, n = matrix.n_rows, len(df)
+        full: dict[str, np.ndarray] = {name: np.asarray(df[name]) for name in BASE_COLUMNS if name in df.columns}
+        for name in self.registry.resolve(matrix.features):
+            spec = self.registry[name]
+            start = 0 if spec.lookback is None else max(n_old - spec.lookback, 0)
+            index = df.index[start:]
+            args = [pd.Series(full[d][start:], index=index) for d in spec.deps]
+            tail = spec.func(*args).to_numpy()[n_old - start :]
+            old = matrix.columns[name]
+            full[name] = np.concatenate([old, tail.astype(old.dtype, copy=False)])
+        self.stats["rows_computed"] += n - n_old
+        return FeatureMatrix(matrix.symbol, matrix.timeframe, matrix.features, df.index, full)
+
+    @staticmethod
+    def _same_prefix(matrix: FeatureMatrix, df: pd.DataFrame, n: int) -> bool:
+        if n == 0 or not matrix.index[:n].equals(df.index[:n]):
+            return False
+        for name in BASE_COLUMNS:
+            if name in df.columns and name in matrix.columns:
+                if not np.array_equal(matrix.columns[name][:n], np.asarray(df[name])[:n], equal_nan=True):
+                    return False
+        return True
+
+    @staticmethod
+    def _key(symbol: str, timeframe: str, features: Sequence[str]) -> str:
+        digest = hashlib.blake2b(",".join(sorted(features)).encode(), digest_size=8).hexdigest()
+        return f"{symbol}|{timeframe}|{digest}"
+
+    def _path(self, key: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / (re.sub(r"[^\w.-]", "_", key) + ".npz")
+
+    def _lookup(self, key: str) -> FeatureMatrix | None:
+        matrix = self._cache.get(key)
+        if matrix is not None:
+            return matrix
+        path = self._path(key)
+        if path is None or not path.exists():
+            return None
+        try:
+            matrix = FeatureMatrix.load(path)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning("特征缓存读取失败 %s: %s", path, e)
+            return None
+        self._cache.set(key, matrix)
+        return matrix
+
+    def _store(self, key: str, matrix: FeatureMatrix) -> None:
+        self._cache.set(key, matrix)
+        path = self._path(key)
+        if path is not None:
+            try:
+                matrix.save(path)
+            except OSError as e:
+                logger.warning("特征缓存写入失败 %s: %s", path, e)
+
+
+_store: FeatureStore | None = None
+
+
+def get_feature_store() -> FeatureStore:
+    """进程内共享的 FeatureStore（训练与推理共用同一份物化结果）"""
+    global _store
+    if _store is None:
+        _store = FeatureStore()
+    return _store
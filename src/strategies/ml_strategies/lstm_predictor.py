@@ -13,6 +13,8 @@ from datetime import datetime
 import numpy as np
 import pandas as pd
 
+from .feature_store import FeatureStore, get_feature_store
+
 try:
     import tensorflow as tf  # noqa: F401
     from tensorflow import keras
@@ -28,7 +30,35 @@ except ImportError:
 class LSTMPredictor:
     """LSTM 价格预测器"""
 
-    def __init__(self, lookback: int = 60, forecast_horizon: int = 5, lstm_units: int = 50, dropout_rate: float = 0.2):
+    # 模型列名 -> FeatureStore 特征名
+    STORE_FEATURES = {
+        "ma5": "ma_5",
+        "ma10": "ma_10",
+        "ma20": "ma_20",
+        "ma60": "ma_60",
+        "ema5": "ema_5",
+        "ema10": "ema_10",
+        "rsi": "rsi_14",
+        "macd": "macd",
+        "macd_signal": "macd_signal",
+        "macd_hist": "macd_hist",
+        "bb_middle": "bb_middle_20",
+        "bb_upper": "bb_upper_20",
+        "bb_lower": "bb_lower_20",
+        "bb_width": "bb_width_20",
+        "volatility": "volatility_20",
+        "volume_change": "volume_change",
+        "momentum": "momentum_10",
+    }
+
+    def __init__(
+        self,
+        lookback: int = 60,
+        forecast_horizon: int = 5,
+        lstm_units: int = 50,
+        dropout_rate: float = 0.2,
+        store: FeatureStore | None = None,
+    ):
         """
         初始化 LSTM 预测器
 
@@ -37,7 +67,9 @@ class LSTMPredictor:
             forecast_horizon: 预测 horizon（预测未来多少天）
             lstm_units: LSTM 单元数
             dropout_rate: Dropout 比例
+            store: 特征仓库，默认使用进程内共享实例
         """
+        self.store = store or get_feature_store()
         self.lookback = lookback
         self.forecast_horizon = forecast_horizon
         self.lstm_units = lstm_units
@@ -46,9 +78,9 @@ class LSTMPredictor:
         self.scaler = None
         self.feature_columns = []
 
-    def create_features(self, df: pd.DataFrame) -> pd.DataFrame:
+    def create_features(self, df: pd.DataFrame, symbol: str | None = None, timeframe: str = "1d") -> pd.DataFrame:
         """
-        创建技术指标特征
+        创建技术指标特征（由 FeatureStore 计算，提供 symbol 时训练与推理共享缓存）
 
         包括：
         - 移动平均线（MA5, MA10, MA20, MA60）
@@ -59,47 +91,14 @@ class LSTMPredictor:
         - 波动率
         - 成交量变化
         """
-        df = df.copy()
+        if symbol is None:
+            computed = self.store.compute(df, list(self.STORE_FEATURES.values()))
+        else:
+            computed = self.store.materialize(df, symbol, timeframe, list(self.STORE_FEATURES.values()))
 
-        # 移动平均线
-        df["ma5"] = df["close"].rolling(window=5).mean()
-        df["ma10"] = df["close"].rolling(window=10).mean()
-        df["ma20"] = df["close"].rolling(window=20).mean()
-        df["ma60"] = df["close"].rolling(window=60).mean()
-
-        # EMA
-        df["ema5"] = df["close"].ewm(span=5).mean()
-        df["ema10"] = df["close"].ewm(span=10).mean()
-
-        # RSI
-        delta = df["close"].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-        rs = gain / loss
-        df["rsi"] = 100 - (100 / (1 + rs))
-
-        # MACD
-        exp1 = df["close"].ewm(span=12).mean()
-        exp2 = df["close"].ewm(span=26).mean()
-        df["macd"] = exp1 - exp2
-        df["macd_signal"] = df["macd"].ewm(span=9).mean()
-        df["macd_hist"] = df["macd"] - df["macd_signal"]
-
-        # 布林带
-        df["bb_middle"] = df["close"].rolling(window=20).mean()
-        bb_std = df["close"].rolling(window=20).std()
-        df["bb_upper"] = df["bb_middle"] + (bb_std * 2)
-        df["bb_lower"] = df["bb_middle"] - (bb_std * 2)
-        df["bb_width"] = (df["bb_upper"] - df["bb_lower"]) / df["bb_middle"]
-
-        # 波动率
-        df["volatility"] = df["close"].pct_change().rolling(window=20).std()
-
-        # 成交量变化
-        df["volume_change"] = df["volume"].pct_change()
-
-        # 价格动量
-        df["momentum"] = df["close"].pct_change(periods=10)
+        df = df.copy()
+        for name, source in self.STORE_FEATURES.items():
+            df[name] = computed[source]
 
         # 归一化特征
         self.feature_columns = [
@@ -121,16 +120,24 @@ class LSTMPredictor:
 
         return df
 
-    def prepare_data(self, df: pd.DataFrame, target_col: str = "close") -> tuple[np.ndarray, np.ndarray]:
+    def prepare_data(
+        self, df: pd.DataFrame, target_col: str = "close", symbol: str | None = None, timeframe: str = "1d"
+    ) -> tuple[np.ndarray, np.ndarray]:
         """
         准备训练数据
 
+        Args:
+            df: OHLCV 数据
+            target_col: 目标列
+            symbol: 交易对（提供时特征走 FeatureStore 缓存）
+            timeframe: K 线周期
+
         Returns:
             X: 形状为 (samples, lookback, features) 的输入数据
             y: 形状为 (samples,) 的目标标签（涨跌）
         """
         # 创建特征
-        df = self.create_features(df)
+        df = self.create_features(df, symbol=symbol, timeframe=timeframe)
 
         # 删除 NaN
         df = df.dropna()
@@ -194,6 +201,7 @@ class LSTMPredictor:
         batch_size: int = 32,
         validation_split: float = 0.2,
         model_path: str | None = None,
+        symbol: str | None = None,
     ) -> keras.callbacks.History:
         """
         训练模型
@@ -204,12 +212,13 @@ class LSTMPredictor:
             batch_size: 批次大小
             validation_split: 验证集比例
             model_path: 模型保存路径
+            symbol: 交易对（提供时与推理共享特征缓存）
 
         Returns:
             训练历史
         """
         # 准备数据
-        X, y = self.prepare_data(df)
+        X, y = self.prepare_data(df, symbol=symbol)
 
         # 构建模型
         input_shape = (X.shape[1], X.shape[2])
@@ -240,7 +249,7 @@ class LSTMPredictor:
 
         return history
 
-    def predict(self, df: pd.DataFrame) -> float:
+    def predict(self, df: pd.DataFrame, symbol: str | None = None) -> float:
         """
         预测未来价格方向
 
@@ -251,7 +260,7 @@ class LSTMPredictor:
             raise ValueError("模型未训练或未加载")
 
         # 准备数据
-        X, _ = self.prepare_data(df)
+        X, _ = self.prepare_data(df, symbol=symbol)
 
         # 使用最后一条数据进行预测
         last_sequence = X[-1:].reshape(1, self.lookback, -1)
@@ -259,18 +268,19 @@ class LSTMPredictor:
 
         return float(probability)
 
-    def predict_signal(self, df: pd.DataFrame, threshold: float = 0.6) -> dict:
+    def predict_signal(self, df: pd.DataFrame, threshold: float = 0.6, symbol: str | None = None) -> dict:
         """
         生成交易信号
 
         Args:
             df: OHLCV 数据
             threshold: 信号阈值
+            symbol: 交易对（提供时与训练共享特征缓存）
 
         Returns:
             信号字典
         """
-        probability = self.predict(df)
+        probability = self.predict(df, symbol=symbol)
 
         if probability >= threshold:
             signal = 1  # 买入
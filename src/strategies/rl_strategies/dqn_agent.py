@@ -26,6 +26,7 @@ except ImportError:
     TORCH_AVAILABLE = False
 
 from .trading_env import TradingEnv
+from .vec_env import VecTradingEnv
 
 
 class DQNNetwork(nn.Module):
@@ -70,6 +71,11 @@ class ReplayBuffer:
     def push(self, state: np.ndarray, action: int, reward: float, next_state: np.ndarray, done: bool):
         self.buffer.append((state, action, reward, next_state, done))
 
+    def push_batch(
+        self, states: np.ndarray, actions: np.ndarray, rewards: np.ndarray, next_states: np.ndarray, dones: np.ndarray
+    ):
+        self.buffer.extend(zip(states, actions.tolist(), rewards.tolist(), next_states, dones.tolist()))
+
     def sample(self, batch_size: int) -> tuple:
         batch = random.sample(self.buffer, batch_size)
         states, actions, rewards, next_states, dones = zip(*batch)
@@ -163,6 +169,26 @@ class DQNAgent:
             q_values = self.policy_net(state_tensor)
             return q_values.max(1)[1].item()
 
+    def select_actions(self, states: np.ndarray, training: bool = True) -> np.ndarray:
+        """
+        批量选择动作（ε-greedy，一次前向计算 N 个状态）
+
+        Args:
+            states: (N, input_dim) 状态
+            training: 是否训练模式
+
+        Returns:
+            (N,) 动作
+        """
+        state_tensor = torch.from_numpy(np.ascontiguousarray(states, dtype=np.float32)).to(self.device)
+        with torch.no_grad():
+            q_values = self.policy_net(state_tensor)
+            actions = q_values.argmax(dim=1).cpu().numpy()
+        if training:
+            explore = np.random.random(len(actions)) < self.epsilon
+            actions[explore] = np.random.randint(0, self.output_dim, explore.sum())
+        return actions
+
     def optimize_model(self):
         """优化模型（训练一步）"""
         if len(self.memory) < self.batch_size:
@@ -288,6 +314,60 @@ class DQNAgent:
             "total_steps": self.steps_done,
         }
 
+    def train_vectorized(self, vec_env: VecTradingEnv, total_steps: int = 10000, verbose: bool = True) -> dict:
+        """
+        在向量化环境上训练：每次同步推进 N 个环境，批量选动作、批量写入回放缓冲区
+
+        Args:
+            vec_env: 向量化交易环境（需 auto_reset=True）
+            total_steps: 同步步数（总转移数 = total_steps * n_envs）
+            verbose: 是否打印进度
+
+        Returns:
+            训练统计
+        """
+        states, _ = vec_env.reset()
+        episode_returns: list[float] = []
+        episode_rewards: list[float] = []
+        running_reward = np.zeros(vec_env.n_envs)
+
+        for step in range(total_steps):
+            actions = self.select_actions(states, training=True)
+            next_states, rewards, terminated, truncated, info = vec_env.step(actions)
+            dones = terminated | truncated
+
+            # 自动重置后 next_states 是新回合的观察；终止转移的目标 Q 值不使用 next_state
+            self.memory.push_batch(states, actions, rewards, next_states, dones)
+            _loss = self.optimize_model()
+            if self.steps_done % self.target_update == 0:
+                self.update_target_network()
+
+            running_reward += rewards
+            if dones.any():
+                episode_rewards.extend(running_reward[dones].tolist())
+                episode_returns.extend(info["episode_return"][dones].tolist())
+                running_reward[dones] = 0
+                self.decay_epsilon()
+            states = next_states
+
+            if verbose and (step + 1) % 1000 == 0 and episode_returns:
+                print(
+                    f"Step {step + 1}/{total_steps}, "
+                    f"Episodes: {len(episode_returns)}, "
+                    f"Avg Return: {np.mean(episode_returns[-10:]):.2%}, "
+                    f"Epsilon: {self.epsilon:.3f}"
+                )
+
+        self.episode_rewards = episode_rewards
+        return {
+            "total_episodes": len(episode_returns),
+            "final_epsilon": self.epsilon,
+            "avg_reward": float(np.mean(episode_rewards[-10:])) if episode_rewards else 0.0,
+            "avg_return": float(np.mean(episode_returns[-10:])) if episode_returns else 0.0,
+            "best_return": max(episode_returns) if episode_returns else 0.0,
+            "total_steps": self.steps_done,
+        }
+
     def save(self, path: str):
         """保存模型"""
         torch.save(
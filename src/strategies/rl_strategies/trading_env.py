@@ -16,6 +16,8 @@ import numpy as np
 import pandas as pd
 from gymnasium import spaces
 
+from .vec_env import FeatureTensor, feature_columns
+
 warnings.filterwarnings("ignore")
 
 
@@ -63,11 +65,8 @@ class TradingEnv(gym.Env):
         self.discrete_actions = discrete_actions
         self.reward_type = reward_type
 
-        # 特征列
-        self.feature_cols = [c for c in df.columns if c not in ["open", "high", "low", "close", "volume"]]
-        if not self.feature_cols:
-            # 如果没有技术指标，使用价格衍生特征
-            self.feature_cols = ["open", "high", "low", "close", "volume"]
+        # 特征列（没有技术指标时使用价格衍生特征）
+        self.feature_cols = feature_columns(df)
 
         self.n_features = len(self.feature_cols)
 
@@ -85,7 +84,7 @@ class TradingEnv(gym.Env):
         self.observation_space = spaces.Box(
             low=-np.inf,
             high=np.inf,
-            shape=(lookback_window * (len(self.feature_cols) + 3),),  # +3 for position info
+            shape=(lookback_window * len(self.feature_cols) + 3,),  # +3 for position info
             dtype=np.float32,
         )
 
@@ -104,10 +103,11 @@ class TradingEnv(gym.Env):
         self._init_normalizer()
 
     def _init_normalizer(self):
-        """初始化价格归一化器"""
-        close_prices = self.df["close"].values
-        self.price_mean = np.mean(close_prices)
-        self.price_std = np.std(close_prices) + 1e-10
+        """预计算归一化特征矩阵（观察窗口直接在其上切片）"""
+        self._tensor = FeatureTensor.from_frame(self.df, self.feature_cols, self.lookback_window)
+        self._close = self._tensor.close
+        self.price_mean = self._tensor.price_mean
+        self.price_std = self._tensor.price_std
 
     def _normalize_price(self, price: float) -> float:
         """归一化价格"""
@@ -133,25 +133,7 @@ class TradingEnv(gym.Env):
 
     def _get_observation(self) -> np.ndarray:
         """获取当前观察"""
-        # 获取 lookback 窗口的数据
-        start_idx = self.current_step - self.lookback_window
-        end_idx = self.current_step
-
-        window_data = self.df.iloc[start_idx:end_idx].copy()
-
-        # 归一化特征
-        obs_features = []
-        for col in self.feature_cols:
-            if col in ["open", "high", "low", "close"]:
-                obs_features.append(self._normalize_price(window_data[col].values))
-            elif col == "volume":
-                obs_features.append(np.log1p(window_data[col].values) / 10)
-            else:
-                # 技术指标，直接归一化
-                vals = window_data[col].values
-                obs_features.append((vals - np.mean(vals)) / (np.std(vals) + 1e-10))
-
-        obs_array = np.stack(obs_features, axis=1).flatten()
+        obs_array = self._tensor.window(self.current_step).ravel()
 
         # 添加持仓信息
         position_info = np.array(
@@ -173,7 +155,7 @@ class TradingEnv(gym.Env):
             "balance": self.balance,
             "shares": self.shares,
             "total_value": self.total_value,
-            "current_price": self.df["close"].iloc[self.current_step],
+            "current_price": self._close[min(self.current_step, len(self._close) - 1)],
             "pnl": self.total_value - self.initial_balance,
             "pnl_pct": (self.total_value - self.initial_balance) / self.initial_balance,
             "num_trades": len(self.trades),
@@ -190,7 +172,7 @@ class TradingEnv(gym.Env):
             (observation, reward, terminated, truncated, info)
         """
         # 获取当前价格
-        current_price = self.df["close"].iloc[self.current_step]
+        current_price = self._close[self.current_step]
 
         # 解析动作
         if self.discrete_actions:
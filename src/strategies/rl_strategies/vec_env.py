@@ -0,0 +1,356 @@
+"""
+向量化交易环境
+
+- FeatureTensor：一次性预计算归一化特征矩阵，观察窗口直接切片（零拷贝视图）
+- VecTradingEnv：N 个环境（不同起点 / 不同标的）同步推进，交易与奖励全部批量计算
+
+单环境语义与 TradingEnv 一致（成交规则、奖励、终止条件），不依赖 gymnasium。
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+# 离散动作：0=持有，1-4=买入 10%/25%/50%/100%，5-8=卖出 10%/25%/50%/100%
+ACTION_SIDES = np.array([0, 1, 1, 1, 1, -1, -1, -1, -1], dtype=np.int8)
+ACTION_SIZES = np.array([0.0, 0.1, 0.25, 0.5, 1.0, 0.1, 0.25, 0.5, 1.0])
+
+REWARD_WINDOW = 20  # sharpe / sortino 使用的收益窗口
+TRADE_WINDOW = 50  # 过度交易惩罚的统计窗口
+MAX_RECENT_TRADES = 10
+
+
+def feature_columns(df: pd.DataFrame) -> list[str]:
+    """观察使用的特征列：优先技术指标，没有时退回 OHLCV"""
+    cols = [c for c in df.columns if c not in ["open", "high", "low", "close", "volume"]]
+    return cols or ["open", "high", "low", "close", "volume"]
+
+
+class FeatureTensor:
+    """
+    预计算的观察特征
+
+    价格列按全局 close 均值/标准差归一化，成交量取 log1p/10，这两类与窗口无关；
+    技术指标按窗口做 z-score，窗口均值/标准差用 sliding_window_view 一次算好。
+    窗口 [end - lookback, end) 的观察 = (values[s:end] - shift[s]) / scale[s]，s = end - lookback。
+    """
+
+    def __init__(
+        self,
+        values: np.ndarray,
+        shift: np.ndarray,
+        scale: np.ndarray,
+        close: np.ndarray,
+        lookback: int,
+        price_mean: float = 0.0,
+        price_std: float = 1.0,
+    ):
+        self.values = values
+        self.shift = shift
+        self.scale = scale
+        self.close = close
+        self.lookback = lookback
+        self.price_mean = price_mean
+        self.price_std = price_std
+        self._windows = sliding_window_view(values, lookback, axis=0)  # (T - L + 1, F, L)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, columns: Sequence[str], lookback: int) -> FeatureTensor:
+        """
+        Args:
+            df: 包含 OHLCV（及技术指标）的 DataFrame
+            columns: 观察特征列
+            lookback: 观察窗口大小
+        """
+        close = df["close"].to_numpy(dtype=np.float64)
+        if len(close) < lookback:
+            raise ValueError(f"数据长度 {len(close)} 小于观察窗口 {lookback}")
+        price_mean = float(np.mean(close))
+        price_std = float(np.std(close)) + 1e-10
+
+        n, f = len(df), len(columns)
+        values = np.empty((n, f), dtype=np.float64)
+        shift = np.zeros((n, f), dtype=np.float64)
+        scale = np.ones((n, f), dtype=np.float64)
+        for j, col in enumerate(columns):
+            raw = df[col].to_numpy(dtype=np.float64)
+            if col in PRICE_COLUMNS:
+                values[:, j] = (raw - price_mean) / price_std
+            elif col == "volume":
+                values[:, j] = np.log1p(raw) / 10
+            else:
+                values[:, j] = raw
+                win = sliding_window_view(raw, lookback)
+                shift[: len(win), j] = win.mean(axis=1)
+                scale[: len(win), j] = win.std(axis=1) + 1e-10
+
+        return cls(values, shift, scale, close, lookback, price_mean, price_std)
+
+    @classmethod
+    def concat(cls, tensors: Sequence[FeatureTensor]) -> tuple[FeatureTensor, np.ndarray]:
+        """
+        拼接多个标的的特征（窗口不会跨标的，调用方按偏移量索引）
+
+        Returns:
+            (拼接后的 FeatureTensor，每个标的的起始行偏移)
+        """
+        lookbacks = {t.lookback for t in tensors}
+        widths = {t.values.shape[1] for t in tensors}
+        if len(lookbacks) != 1 or len(widths) != 1:
+            raise ValueError("所有标的必须使用相同的观察窗口与特征数量")
+        offsets = np.cumsum([0] + [len(t.close) for t in tensors[:-1]])
+        tensor = cls(
+            np.concatenate([t.values for t in tensors]),
+            np.concatenate([t.shift for t in tensors]),
+            np.concatenate([t.scale for t in tensors]),
+            np.concatenate([t.close for t in tensors]),
+            tensors[0].lookback,
+        )
+        return tensor, offsets
+
+    @property
+    def n_features(self) -> int:
+        return self.values.shape[1]
+
+    def window(self, end: int) -> np.ndarray:
+        """单个窗口 (lookback, n_features)，输入为零拷贝切片"""
+        start = end - self.lookback
+        return (self.values[start:end] - self.shift[start]) / self.scale[start]
+
+    def windows(self, ends: np.ndarray) -> np.ndarray:
+        """批量窗口 (N, lookback, n_features)"""
+        starts = np.asarray(ends) - self.lookback
+        stacked = self._windows[starts].transpose(0, 2, 1)
+        return (stacked - self.shift[starts, None, :]) / self.scale[starts, None, :]
+
+
+class VecTradingEnv:
+    """
+    向量化交易环境：N 个环境同步 step，返回批量 (obs, reward, terminated, truncated, info)
+
+    结束的环境自动重置到各自的起点（info["episode_return"] 记录刚结束回合的收益，未结束为 NaN）。
+    """
+
+    def __init__(
+        self,
+        data: pd.DataFrame | Sequence[pd.DataFrame],
+        n_envs: int | None = None,
+        start_offsets: Sequence[int] | None = None,
+        initial_balance: float = 100000,
+        commission: float = 0.001,
+        slippage: float = 0.0005,
+        lookback_window: int = 20,
+        episode_length: int | None = None,
+        discrete_actions: bool = True,
+        reward_type: str = "pnl",
+        auto_reset: bool = True,
+    ):
+        """
+        初始化向量化环境
+
+        Args:
+            data: 单个或多个标的的 DataFrame（特征列需一致）
+            n_envs: 环境数量，默认等于标的数量；环境 i 使用第 i % len(data) 个标的
+            start_offsets: 每个环境相对 lookback_window 的起始偏移
+            initial_balance: 初始资金
+            commission: 交易手续费
+            slippage: 滑点
+            lookback_window: 观察窗口大小
+            episode_length: 每回合最大步数（None 表示到数据末尾）
+            discrete_actions: 是否使用离散动作空间
+            reward_type: 奖励类型 ('pnl', 'sharpe', 'sortino')
+            auto_reset: 回合结束后是否自动重置
+        """
+        frames = [data] if isinstance(data, pd.DataFrame) else list(data)
+        if not frames:
+            raise ValueError("至少需要一个标的的数据")
+        self.n_envs = n_envs or len(frames)
+        self.feature_cols = feature_columns(frames[0])
+        tensors = [
+            FeatureTensor.from_frame(df.reset_index(drop=True), self.feature_cols, lookback_window) for df in frames
+        ]
+        self.tensor, offsets = FeatureTensor.concat(tensors)
+
+        asset = np.arange(self.n_envs) % len(frames)
+        self._offset = offsets[asset]
+        self._length = np.array([len(t.close) for t in tensors])[asset]
+        self._price_mean = np.array([t.price_mean for t in tensors])[asset]
+
+        starts = np.zeros(self.n_envs, dtype=np.int64) if start_offsets is None else np.asarray(start_offsets)
+        if len(starts) != self.n_envs:
+            raise ValueError("start_offsets 数量必须等于 n_envs")
+        self._start = lookback_window + starts.astype(np.int64)
+        if np.any(self._start >= self._length):
+            raise ValueError("起始偏移超出数据范围")
+
+        self.initial_balance = float(initial_balance)
+        self.commission = commission
+        self.slippage = slippage
+        self.lookback_window = lookback_window
+        self.episode_length = episode_length
+        self.discrete_actions = discrete_actions
+        self.reward_type = reward_type
+        self.auto_reset = auto_reset
+        self.observation_dim = lookback_window * self.tensor.n_features + 3
+
+        n = self.n_envs
+        self.current_step = self._start.copy()
+        self.balance = np.full(n, self.initial_balance)
+        self.shares = np.zeros(n)
+        self.total_value = np.full(n, self.initial_balance)
+        self.num_trades = np.zeros(n, dtype=np.int64)
+        self._returns = np.zeros((n, REWARD_WINDOW))
+        self._n_returns = np.zeros(n, dtype=np.int64)
+        self._traded = np.zeros((n, TRADE_WINDOW), dtype=bool)
+        self._rows = np.arange(n)
+
+    # ─── Gym 风格接口 ───
+
+    def reset(self, seed: int | None = None) -> tuple[np.ndarray, dict]:
+        """重置全部环境"""
+        self._reset_envs(np.ones(self.n_envs, dtype=bool))
+        return self._observations(), self._info()
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, dict]:
+        """
+        所有环境同步执行一步
+
+        Args:
+            actions: (N,) 离散动作或 (N,) / (N, 1) 连续动作
+
+        Returns:
+            (observations (N, D) float32, rewards (N,), terminated (N,), truncated (N,), info)
+        """
+        price = self.tensor.close[self._offset + np.minimum(self.current_step, self._length - 1)]
+        side, size = self._decode(actions)
+        traded = self._execute(side, size, price)
+
+        prev_value = self.total_value
+        self.total_value = self.balance + self.shares * price
+        slot = self._n_returns % REWARD_WINDOW
+        self._returns[self._rows, slot] = (self.total_value - prev_value) / prev_value
+        self._n_returns += 1
+
+        trade_slot = self.current_step % TRADE_WINDOW
+        self._traded[self._rows, trade_slot] = traded
+        rewards = self._rewards()
+
+        terminated = (self.balance <= 0) | (self.total_value <= self.initial_balance * 0.5)
+        truncated = self.current_step >= self._length - 1
+        if self.episode_length is not None:
+            truncated |= self.current_step - self._start + 1 >= self.episode_length
+        self.current_step = self.current_step + 1
+
+        done = terminated | truncated
+        episode_return = np.where(done, (self.total_value - self.initial_balance) / self.initial_balance, np.nan)
+        if self.auto_reset and done.any():
+            self._reset_envs(done)
+        else:
+            np.minimum(self.current_step, self._length, out=self.current_step)
+
+        info = self._info()
+        info["episode_return"] = episode_return
+        return self._observations(), rewards, terminated, truncated, info
+
+    # ─── 批量计算 ───
+
+    def _reset_envs(self, mask: np.ndarray) -> None:
+        self.current_step[mask] = self._start[mask]
+        self.balance[mask] = self.initial_balance
+        self.shares[mask] = 0
+        self.total_value[mask] = self.initial_balance
+        self.num_trades[mask] = 0
+        self._returns[mask] = 0
+        self._n_returns[mask] = 0
+        self._traded[mask] = False
+
+    def _decode(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        actions = np.asarray(actions)
+        if self.discrete_actions:
+            idx = actions.astype(np.int64).reshape(self.n_envs)
+            valid = (idx >= 0) & (idx < len(ACTION_SIDES))
+            idx = np.where(valid, idx, 0)
+            return ACTION_SIDES[idx], ACTION_SIZES[idx]
+        a = actions.astype(np.float64).reshape(self.n_envs)
+        side = np.where(a > 0.1, 1, np.where(a < -0.1, -1, 0)).astype(np.int8)
+        return side, np.minimum(np.abs(a), 1.0) * (side != 0)
+
+    def _execute(self, side: np.ndarray, size: np.ndarray, price: np.ndarray) -> np.ndarray:
+        """按 TradingEnv 的规则批量成交，返回本步是否有成交"""
+        buy_price = price * (1 + self.slippage)
+        max_buy = np.trunc(self.balance / (buy_price * (1 + self.commission)))
+        target_buy = np.trunc(self.initial_balance * size / buy_price)
+        buy_qty = np.where(side == 1, np.minimum(target_buy, max_buy), 0.0)
+        buy_qty = np.maximum(buy_qty, 0.0)
+
+        sell_price = price * (1 - self.slippage)
+        sell_qty = np.where(side == -1, np.minimum(np.trunc(self.shares * size), self.shares), 0.0)
+        sell_qty = np.maximum(sell_qty, 0.0)
+
+        self.balance = (
+            self.balance
+            - buy_qty * buy_price * (1 + self.commission)
+            + sell_qty * sell_price * (1 - self.commission)
+        )
+        self.shares = self.shares + buy_qty - sell_qty
+        traded = (buy_qty > 0) | (sell_qty > 0)
+        self.num_trades += traded
+        return traded
+
+    def _rewards(self) -> np.ndarray:
+        count = np.minimum(self._n_returns, REWARD_WINDOW)
+        last = self._returns[self._rows, (self._n_returns - 1) % REWARD_WINDOW]
+
+        if self.reward_type in ("sharpe", "sortino"):
+            valid = np.arange(REWARD_WINDOW)[None, :] < count[:, None]
+            n = np.maximum(count, 1)
+            mean = np.where(valid, self._returns, 0).sum(axis=1) / n
+            if self.reward_type == "sharpe":
+                var = np.where(valid, (self._returns - mean[:, None]) ** 2, 0).sum(axis=1) / n
+                reward = mean / (np.sqrt(var) + 1e-10) * np.sqrt(252)
+            else:
+                neg = valid & (self._returns < 0)
+                n_neg = neg.sum(axis=1)
+                neg_mean = np.where(neg, self._returns, 0).sum(axis=1) / np.maximum(n_neg, 1)
+                neg_var = np.where(neg, (self._returns - neg_mean[:, None]) ** 2, 0).sum(axis=1) / np.maximum(n_neg, 1)
+                downside = np.where(n_neg > 0, np.sqrt(neg_var) + 1e-10, 1e-10)
+                reward = mean / downside * np.sqrt(252)
+        else:
+            reward = last.copy()
+
+        recent = self._traded.sum(axis=1)
+        reward -= np.where(recent > MAX_RECENT_TRADES, 0.01 * (recent - MAX_RECENT_TRADES), 0.0)
+        reward -= np.where(self.total_value < self.initial_balance * 0.5, 1.0, 0.0)
+        return np.where(count >= 2, reward, 0.0)
+
+    def _observations(self) -> np.ndarray:
+        step = np.minimum(self.current_step, self._length)
+        windows = self.tensor.windows(self._offset + step).reshape(self.n_envs, -1)
+        position = np.stack(
+            [
+                self.shares / (self.initial_balance / self._price_mean),
+                self.balance / self.initial_balance,
+                step / self._length,
+            ],
+            axis=1,
+        )
+        return np.concatenate([windows, position], axis=1).astype(np.float32)
+
+    def _info(self) -> dict:
+        price = self.tensor.close[self._offset + np.minimum(self.current_step, self._length - 1)]
+        return {
+            "step": self.current_step.copy(),
+            "balance": self.balance.copy(),
+            "shares": self.shares.copy(),
+            "total_value": self.total_value.copy(),
+            "current_price": price,
+            "pnl": self.total_value - self.initial_balance,
+            "pnl_pct": (self.total_value - self.initial_balance) / self.initial_balance,
+            "num_trades": self.num_trades.copy(),
+        }
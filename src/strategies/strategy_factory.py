@@ -2,10 +2,15 @@
 StocksX 策略工廠
 統一管理所有 130+ 策略的創建和註冊
 
-優化：使用延遲加載（Lazy Loading），避免 import 時載入全部策略模組。
+延遲加載（Lazy Loading）：策略名稱 → 類別路徑記錄在 _manifest.py（由
+scripts/gen_strategy_manifest.py 產生），import 時不載入任何分類模組，
+第一次 create / get_strategy 時才 import 對應的分類。
 """
 
+import importlib
 from typing import Optional
+
+from ._manifest import STRATEGY_MANIFEST
 from .base_strategy import BaseStrategy
 
 
@@ -23,8 +28,24 @@ _CATEGORY_MODULES = {
     "execution": ".execution",
 }
 
-# 策略鍵名 → 分類映射（動態填充）
-_name_to_category: dict[str, str] = {}
+# 分類 → 套件內匯總字典名稱
+_CATEGORY_EXPORTS = {
+    "trend": "ALL_TREND_STRATEGIES",
+    "oscillator": "ALL_OSCILLATOR_STRATEGIES",
+    "breakout": "ALL_BREAKOUT_STRATEGIES",
+    "ai_ml": "ALL_AI_ML_STRATEGIES",
+    "risk_management": "ALL_RISK_STRATEGIES",
+    "microstructure": "ALL_MICRO_STRATEGIES",
+    "macro": "ALL_MACRO_STRATEGIES",
+    "statistical": "ALL_STAT_STRATEGIES",
+    "pattern": "ALL_PATTERN_STRATEGIES",
+    "execution": "ALL_EXECUTION_STRATEGIES",
+}
+
+# 策略鍵名 → 分類映射（由 manifest 的模組路徑推得）
+_name_to_category: dict[str, str] = {
+    name: path.split(":")[0].split(".")[2] for name, path in STRATEGY_MANIFEST.items()
+}
 
 
 class StrategyFactory:
@@ -37,26 +58,46 @@ class StrategyFactory:
         """註冊策略"""
         cls._strategies[name.lower()] = strategy_class
 
+    @classmethod
+    def resolve(cls, name: str) -> Optional[type[BaseStrategy]]:
+        """取得策略類別；尚未載入時依 manifest import 所屬模組"""
+        name_lower = name.lower()
+        strategy_class = cls._strategies.get(name_lower)
+        if strategy_class is None and name_lower in STRATEGY_MANIFEST:
+            module, _, attr = STRATEGY_MANIFEST[name_lower].partition(":")
+            strategy_class = getattr(importlib.import_module(module), attr)
+            cls.register(name_lower, strategy_class)
+        return strategy_class
+
     @classmethod
     def create(cls, name: str, params: Optional[dict] = None) -> BaseStrategy:
         """創建策略實例"""
-        strategy_class = cls._strategies.get(name.lower())
+        strategy_class = cls.resolve(name)
         if not strategy_class:
             raise ValueError(f"未知策略：{name}")
-        return strategy_class(params=params)
+        return strategy_class(**(params or {}))
+
+    @classmethod
+    def names(cls) -> list[str]:
+        """所有可用策略名稱（不觸發載入）"""
+        return sorted(set(STRATEGY_MANIFEST) | set(cls._strategies))
 
     @classmethod
     def list_strategies(cls) -> dict[str, type[BaseStrategy]]:
-        """列出所有已註冊策略"""
+        """列出所有已註冊策略（會載入全部分類）"""
+        cls._ensure_all_loaded()
         return cls._strategies.copy()
 
+    @classmethod
+    def _ensure_all_loaded(cls) -> None:
+        for name in STRATEGY_MANIFEST:
+            if name not in cls._strategies:
+                cls.resolve(name)
+
     @classmethod
     def get_strategy_info(cls, name: str) -> Optional[dict]:
         """獲取策略信息"""
-        name_lower = name.lower()
-        if name_lower not in cls._strategies:
-            cls._ensure_all_loaded()
-        strategy_class = cls._strategies.get(name_lower)
+        strategy_class = cls.resolve(name)
         if not strategy_class:
             return None
 
@@ -73,39 +114,19 @@ class StrategyFactory:
             return {"name": name, "category": "unknown", "params": {}, "class": strategy_class.__name__}
 
 
+def build_manifest() -> dict[str, str]:
+    """從各分類套件的匯總字典產生 名稱 → "模組:類別" 映射（會載入全部分類）"""
+    manifest: dict[str, str] = {}
+    for category, module in _CATEGORY_MODULES.items():
+        package = importlib.import_module(module, __package__)
+        for name, strategy_class in getattr(package, _CATEGORY_EXPORTS[category]).items():
+            manifest[name.lower()] = f"{strategy_class.__module__}:{strategy_class.__qualname__}"
+    return dict(sorted(manifest.items()))
+
+
 def load_all_strategies():
     """加載所有策略"""
-    from .trend import ALL_TREND_STRATEGIES
-    from .oscillator import ALL_OSCILLATOR_STRATEGIES
-    from .breakout import ALL_BREAKOUT_STRATEGIES
-    from .ai_ml import ALL_AI_ML_STRATEGIES
-    from .risk_management import ALL_RISK_STRATEGIES
-    from .microstructure import ALL_MICRO_STRATEGIES
-    from .macro import ALL_MACRO_STRATEGIES
-    from .statistical import ALL_STAT_STRATEGIES
-    from .pattern import ALL_PATTERN_STRATEGIES
-    from .execution import ALL_EXECUTION_STRATEGIES
-
-    # 註冊所有策略
-    all_strategies = {
-        **ALL_TREND_STRATEGIES,
-        **ALL_OSCILLATOR_STRATEGIES,
-        **ALL_BREAKOUT_STRATEGIES,
-        **ALL_AI_ML_STRATEGIES,
-        **ALL_RISK_STRATEGIES,
-        **ALL_MICRO_STRATEGIES,
-        **ALL_MACRO_STRATEGIES,
-        **ALL_STAT_STRATEGIES,
-        **ALL_PATTERN_STRATEGIES,
-        **ALL_EXECUTION_STRATEGIES,
-    }
-
-    for name, cls in all_strategies.items():
-        StrategyFactory.register(name, cls)
-
-
-# 自動加載策略
-load_all_strategies()
+    StrategyFactory._ensure_all_loaded()
 
 
 def get_strategy(name: str, params: Optional[dict] = None) -> BaseStrategy:
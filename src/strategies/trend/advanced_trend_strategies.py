@@ -14,7 +14,8 @@
 
 import pandas as pd
 import numpy as np
-from ..base_strategy import TrendFollowingStrategy
+from collections.abc import Mapping
+from ..base_strategy import TrendFollowingStrategy, VectorizedStrategy
 
 
 # ============================================================================
@@ -342,7 +343,7 @@ class CCI(TrendFollowingStrategy):
 # ============================================================================
 
 
-class KAMA(TrendFollowingStrategy):
+class KAMA(VectorizedStrategy, TrendFollowingStrategy):
     """
     KAMA（Kaufman Adaptive Moving Average）自适应均线
 
@@ -351,6 +352,8 @@ class KAMA(TrendFollowingStrategy):
     - 高噪音（震荡）→ 慢速响应
     """
 
+    indicators = ("kama",)
+
     def __init__(self, period: int = 10, fast_period: int = 2, slow_period: int = 30):
         """
         初始化 KAMA 策略
@@ -362,72 +365,73 @@ class KAMA(TrendFollowingStrategy):
         """
         super().__init__("KAMA 自适应均线", {"period": period, "fast_period": fast_period, "slow_period": slow_period})
 
-    def calculate_kama(self, data: pd.DataFrame) -> pd.Series:
+    @property
+    def warmup(self) -> int:
+        return self.params["period"]
+
+    def kama_values(self, close: np.ndarray) -> np.ndarray:
         """
-        计算 KAMA
+        计算 KAMA（数组版）
 
         步骤：
         1. 计算效率比率 ER
         2. 计算平滑常数 SC
-        3. 计算 KAMA
+        3. 计算 KAMA（系数随时间变化的递推，用纯浮点循环代替逐个 iloc 读写）
         """
         period = self.params["period"]
         fast_period = self.params["fast_period"]
         slow_period = self.params["slow_period"]
 
-        close = data["close"]
-
-        # 计算价格变化
-        price_change = abs(close - close.shift(period))
-
-        # 计算波动率
-        volatility = abs(close - close.shift()).rolling(window=period).sum()
-
-        # 计算效率比率 ER
-        er = price_change / volatility
-        er.fillna(0, inplace=True)
-
-        # 计算平滑常数 SC
+        n = len(close)
+        kama = np.zeros(n)
+        if n < period:
+            return kama
+
+        # 效率比率 ER = |N 期价格变化| / N 期逐根变化之和
+        change = np.full(n, np.nan)
+        change[period:] = np.abs(close[period:] - close[:-period])
+        step = np.full(n, np.nan)
+        step[1:] = np.abs(np.diff(close))
+        volatility = pd.Series(step).rolling(window=period).sum().to_numpy()
+        with np.errstate(divide="ignore", invalid="ignore"):
+            er = change / volatility
+        er[np.isnan(er)] = 0.0
+
+        # 平滑常数 SC
         fast_sc = 2 / (fast_period + 1)
         slow_sc = 2 / (slow_period + 1)
-        sc = (er * (fast_sc - slow_sc) + slow_sc) ** 2
-
-        # 计算 KAMA
-        kama = pd.Series(0.0, index=close.index)
-        kama.iloc[period - 1] = close.iloc[period - 1]  # 初始值为价格
-
-        for i in range(period, len(close)):
-            kama.iloc[i] = kama.iloc[i - 1] + sc.iloc[i] * (close.iloc[i] - kama.iloc[i - 1])
-
+        sc = ((er * (fast_sc - slow_sc) + slow_sc) ** 2).tolist()
+
+        values = close.tolist()
+        prev = values[period - 1]  # 初始值为价格
+        out = [prev]
+        for i in range(period, n):
+            prev = prev + sc[i] * (values[i] - prev)
+            out.append(prev)
+        kama[period - 1 :] = out
         return kama
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+    def calculate_kama(self, data: pd.DataFrame) -> pd.Series:
+        """计算 KAMA"""
+        return pd.Series(self.kama_values(data["close"].to_numpy(dtype=np.float64)), index=data.index)
+
+    def compute_signals(self, arrays: Mapping[str, np.ndarray]) -> np.ndarray:
         """
         生成交易信号
 
         信号规则：
         - 价格上穿 KAMA → 买入
         - 价格下穿 KAMA → 卖出
-
-        Args:
-            data: 包含 OHLCV 数据的 DataFrame
-
-        Returns:
-            信号 Series
         """
-        kama = self.calculate_kama(data)
-        close = data["close"]
-
-        signals = pd.Series(0, index=data.index)
-
-        # 上穿买入
-        cross_above = (close > kama) & (close.shift(1) < kama.shift(1))
-        signals[cross_above] = 1
-
-        # 下穿卖出
-        cross_below = (close < kama) & (close.shift(1) > kama.shift(1))
-        signals[cross_below] = -1
+        close = arrays["close"]
+        kama = self.kama_values(close)
+        signals = np.zeros(len(close), dtype=np.int64)
+        if len(close) < 2:
+            return signals
 
+        cur, prev = close[1:] - kama[1:], close[:-1] - kama[:-1]
+        signals[1:][(cur > 0) & (prev < 0)] = 1
+        signals[1:][(cur < 0) & (prev > 0)] = -1
         return signals
 
     def calculate_position_size(self, signal: int, capital: float, price: float, volatility: float) -> float:
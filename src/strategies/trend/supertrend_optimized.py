@@ -24,13 +24,15 @@ import warnings
 warnings.filterwarnings("ignore")
 
 # 導入策略基類
+import os
 import sys
+from collections.abc import Mapping
 
-sys.path.append("..")
-from base_strategy import TrendFollowingStrategy
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from base_strategy import TrendFollowingStrategy, VectorizedStrategy, supertrend_direction
 
 
-class SupertrendOptimized(TrendFollowingStrategy):
+class SupertrendOptimized(VectorizedStrategy, TrendFollowingStrategy):
     """
     優化的 Supertrend 策略
 
@@ -39,8 +41,11 @@ class SupertrendOptimized(TrendFollowingStrategy):
     2. 添加自適應 ATR 倍數（基於波動率）
     3. 添加趨勢強度過濾
     4. 添加成交量確認
+    5. 向量化信號（VectorizedStrategy 契約）
     """
 
+    indicators = ("atr", "supertrend", "sma", "volume_ma")
+
     def __init__(
         self,
         period: int = 10,
@@ -169,17 +174,15 @@ class SupertrendOptimized(TrendFollowingStrategy):
             upper_band = hl2 + multiplier * atr
             lower_band = hl2 - multiplier * atr
 
-        # Supertrend 值和趨勢方向
-        supertrend = pd.Series(0.0, index=data.index)
-        trend = pd.Series(1, index=data.index)  # 1=上升趨勢，-1=下降趨勢
-
-        for i in range(1, len(data)):
-            if close.iloc[i] > (supertrend.iloc[i - 1] if i > 0 else lower_band.iloc[i]):
-                trend.iloc[i] = 1
-                supertrend.iloc[i] = lower_band.iloc[i]
-            else:
-                trend.iloc[i] = -1
-                supertrend.iloc[i] = upper_band.iloc[i]
+        # Supertrend 值和趨勢方向（1=上升趨勢，-1=下降趨勢）
+        direction = supertrend_direction(
+            close.to_numpy(dtype=np.float64),
+            upper_band.to_numpy(dtype=np.float64),
+            lower_band.to_numpy(dtype=np.float64),
+        )
+        trend = pd.Series(direction, index=data.index)
+        supertrend = pd.Series(np.where(direction == 1, lower_band, upper_band), index=data.index)
+        supertrend.iloc[:1] = 0.0
 
         return {
             "supertrend": supertrend,
@@ -189,7 +192,27 @@ class SupertrendOptimized(TrendFollowingStrategy):
             "atr": atr,
         }
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+    @property
+    def required_columns(self) -> tuple[str, ...]:
+        if self.params["use_volume_filter"]:
+            return ("high", "low", "close", "volume")
+        return ("high", "low", "close")
+
+    @property
+    def warmup(self) -> int:
+        periods = [self.params["period"]]
+        if self.params["use_adaptive_multiplier"]:
+            periods.append(self.params["vol_lookback"] * 2)
+        if self.params["use_trend_filter"]:
+            periods.append(self.params["trend_period"])
+        if self.params["use_volume_filter"]:
+            periods.append(self.params["volume_period"])
+        return max(periods)
+
+    def compute_signals(self, arrays: Mapping[str, np.ndarray]) -> np.ndarray:
+        return self._signals(pd.DataFrame(dict(arrays))).to_numpy()
+
+    def _signals(self, data: pd.DataFrame) -> pd.Series:
         """
         生成交易信號（多條件確認）
 
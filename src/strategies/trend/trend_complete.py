@@ -19,12 +19,13 @@
 import pandas as pd
 import numpy as np
 import sys
+from collections.abc import Mapping
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from base_strategy import TrendFollowingStrategy
 
-from src.strategies.base_strategy import TrendFollowingStrategy
+from src.strategies.base_strategy import TrendFollowingStrategy, VectorizedStrategy, supertrend_direction
 
 # ============================================================================
 # 1. SMA Cross 均線交叉策略
@@ -234,7 +235,7 @@ class ADXStrategy(TrendFollowingStrategy):
 # ============================================================================
 
 
-class Supertrend(TrendFollowingStrategy):
+class Supertrend(VectorizedStrategy, TrendFollowingStrategy):
     """
     Supertrend 超級趨勢策略
 
@@ -243,51 +244,36 @@ class Supertrend(TrendFollowingStrategy):
     - 價格下穿 Supertrend 線 → 賣出
     """
 
+    required_columns = ("high", "low", "close")
+    indicators = ("atr", "supertrend")
+
     def __init__(self, period: int = 10, multiplier: float = 3.0):
         super().__init__("Supertrend", {"period": period, "multiplier": multiplier})
 
-    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+    @property
+    def warmup(self) -> int:
+        return self.params["period"]
+
+    def compute_signals(self, arrays: Mapping[str, np.ndarray]) -> np.ndarray:
         period = self.params["period"]
         mult = self.params["multiplier"]
 
-        high = data["high"]
-        low = data["low"]
-        close = data["close"]
-
-        # 計算 ATR
-        tr1 = high - low
-        tr2 = abs(high - close.shift(1))
-        tr3 = abs(low - close.shift(1))
-        tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
-        atr = tr.ewm(span=period, adjust=False).mean()
+        high = arrays["high"]
+        low = arrays["low"]
+        close = arrays["close"]
 
-        # 基本中軌
-        hl2 = (high + low) / 2
+        # 計算 ATR（EMA 與 pandas ewm(adjust=False) 相同）
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+        tr = np.fmax(np.fmax(high - low, np.abs(high - prev_close)), np.abs(low - prev_close))
+        atr = pd.Series(tr).ewm(span=period, adjust=False).mean().to_numpy()
 
         # 上軌和下軌
-        upper_band = hl2 + mult * atr
-        lower_band = hl2 - mult * atr
-
-        # Supertrend 值
-        supertrend = pd.Series(0.0, index=data.index)
-        trend = pd.Series(1, index=data.index)  # 1=上升趨勢，-1=下降趨勢
-
-        for i in range(1, len(data)):
-            if close.iloc[i] > supertrend.iloc[i - 1] if i > 0 else lower_band.iloc[i]:
-                trend.iloc[i] = 1
-                supertrend.iloc[i] = lower_band.iloc[i]
-            else:
-                trend.iloc[i] = -1
-                supertrend.iloc[i] = upper_band.iloc[i]
-
-        signals = pd.Series(0, index=data.index)
-
-        # 趨勢轉換
-        trend_change = trend.diff()
-        signals[trend_change == 2] = 1  # -1 → 1
-        signals[trend_change == -2] = -1  # 1 → -1
+        hl2 = (high + low) / 2
+        trend = supertrend_direction(close, hl2 + mult * atr, hl2 - mult * atr)
 
-        return signals
+        # 趨勢轉換：-1 → 1 買入，1 → -1 賣出
+        change = np.diff(trend, prepend=trend[:1])
+        return np.where(change == 2, 1, np.where(change == -2, -1, 0))
 
     def calculate_position_size(self, signal: int, capital: float, price: float, volatility: float) -> float:
         if signal == 0:
@@ -2,12 +2,29 @@
 from __future__ import annotations
 
 import time
+import uuid
 from typing import Any
 
-from celery import Task
+from celery import Task, chord, group
 
 from src.backtest.engine import run_backtest as sync_run_backtest
-from src.backtest.optimizer import find_optimal
+from src.backtest.optimizer import evaluate_param_sets, grid_param_sets
+from src.core import scheduler
+from src.core.scheduler import Priority
+from src.core.tasks import TaskCancelled, cancellation
+from src.tasks import fanout
+from src.tasks.celery_app import app
+from src.utils import profiler
+
+# 任務參數的 metric 名稱 → 回測指標
+METRIC_TO_OBJECTIVE = {
+    "sharpe": "sharpe_ratio",
+    "total_return": "total_return_pct",
+    "annual_return": "annual_return_pct",
+    "calmar": "calmar_ratio",
+    "sortino": "sortino_ratio",
+    "max_drawdown": "max_drawdown_pct",
+}
 
 
 class BacktestTask(Task):
@@ -19,10 +36,14 @@ class BacktestTask(Task):
 
         logger = get_logger("stocksx.celery")
         logger.error(
-            f"Backtest task {task_id} failed", exc_info=True, extra={"task_id": task_id, "args": args, "kwargs": kwargs}
+            f"Backtest task {task_id} failed",
+            exc_info=True,
+            extra={"task_id": task_id, "task_args": args, "task_kwargs": kwargs},
         )
 
 
+@app.task(base=BacktestTask, name="src.tasks.backtest_tasks.run_backtest")
+@profiler.profiled()
 def run_backtest(
     symbol: str,
     exchange: str,
@@ -35,6 +56,7 @@ def run_backtest(
     leverage: float = 1.0,
     fee_rate: float = 0.001,
     user_id: int | None = None,
+    profile: bool | None = None,
 ) -> dict[str, Any]:
     """
     執行回測任務（非同步）
@@ -51,6 +73,7 @@ def run_backtest(
         leverage: 槓桿
         fee_rate: 手續費率
         user_id: 用戶 ID（可選）
+        profile: 取樣剖析（None 時依 STOCKSX_PROFILE），熱點函式與摺疊堆疊放在結果的 "profile"
 
     Returns:
         回測結果字典
@@ -88,18 +111,23 @@ def run_backtest(
     start_time = time.time()
 
     try:
-        # 執行回測
+        from datetime import datetime
+
+        since_ms = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp() * 1000)
+        until_ms = int(datetime.strptime(end_date, "%Y-%m-%d").timestamp() * 1000)
+
+        # 執行回測（經回測結果快取，相同數據 + 參數的重複請求直接命中）
         result = sync_run_backtest(
+            exchange_id=exchange,
             symbol=symbol,
-            exchange=exchange,
             timeframe=timeframe,
+            since_ms=since_ms,
+            until_ms=until_ms,
             strategy=strategy,
-            params=params,
-            start_date=start_date,
-            end_date=end_date,
+            strategy_params=params,
             initial_equity=initial_equity,
             leverage=leverage,
-            fee_rate=fee_rate,
+            fee_rate=fee_rate * 100,  # 任務參數為比率（0.001），引擎為百分比
         )
 
         duration_ms = (time.time() - start_time) * 1000
@@ -150,7 +178,10 @@ def run_backtest(
         raise
 
 
+@app.task(bind=True, base=BacktestTask, name="src.tasks.backtest_tasks.run_param_optimizer")
+@profiler.profiled()
 def run_param_optimizer(
+    self,
     symbol: str,
     exchange: str,
     timeframe: str,
@@ -164,10 +195,16 @@ def run_param_optimizer(
     metric: str = "total_return_pct",
     n_best: int = 10,
     user_id: int | None = None,
+    profile: bool | None = None,
 ) -> dict[str, Any]:
     """
     執行參數優化任務（非同步）
 
+    抓一次 K 線存入 Redis（src.tasks.fanout），參數網格切成 OPTIMIZER_CHUNK_SIZE 組一塊，
+    以 chord 分派 optimize_chunk 到 "optimizer.chunks" 佇列，再由 reduce_optimizer 歸併前 N 名；
+    本任務被 chord 取代，AsyncResult 最終得到歸併結果。執行中可用 fanout.get_progress(task_id) 查進度、
+    fanout.cancel(task_id) 協作取消（結果的 cancelled 為 True，只含已完成的組合）。
+
     Args:
         symbol: 交易對
         exchange: 交易所
@@ -182,9 +219,10 @@ def run_param_optimizer(
         metric: 優化指標
         n_best: 回傳前 N 個最佳結果
         user_id: 用戶 ID
+        profile: 取樣剖析（None 時依 STOCKSX_PROFILE），熱點函式與摺疊堆疊放在結果的 "profile"
 
     Returns:
-        優化結果字典
+        優化結果字典（success, results, best_params, best_result, total_runs, duration_ms, config, job_id）
 
     Example:
         ```python
@@ -199,6 +237,7 @@ def run_param_optimizer(
             metric="sharpe",
             n_best=5
         )
+        progress = fanout.get_progress(result.id)
         ```
     """
     from src.utils.logger import get_logger, log_backtest
@@ -217,6 +256,13 @@ def run_param_optimizer(
     )
 
     start_time = time.time()
+    config = {
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "strategy": strategy,
+        "param_grid": param_grid,
+        "metric": metric,
+    }
 
     try:
         # 將日期字串轉換為時間戳
@@ -224,76 +270,50 @@ def run_param_optimizer(
 
         since_ms = int(datetime.strptime(start_date, "%Y-%m-%d").timestamp() * 1000)
         until_ms = int(datetime.strptime(end_date, "%Y-%m-%d").timestamp() * 1000)
-
-        # 將 metric 映射到 objective
-        metric_to_objective = {
-            "sharpe": "sharpe_ratio",
-            "total_return": "total_return_pct",
-            "annual_return": "annual_return_pct",
-            "calmar": "calmar_ratio",
-            "sortino": "sortino_ratio",
-            "max_drawdown": "max_drawdown_pct",
+        objective = METRIC_TO_OBJECTIVE.get(metric, "sharpe_ratio")
+
+        # 預先抓一次 K 線，所有分塊共用（經 Redis 傳遞，不放進任務參數）
+        from src.data.crypto import CryptoDataFetcher
+
+        rows = CryptoDataFetcher(exchange).get_ohlcv(symbol, timeframe, since_ms, until_ms, fill_gaps=True)
+        if not rows:
+            return {
+                "success": False,
+                "error": "無 K 線資料，請先拉取數據或調整時間範圍。",
+                "results": [],
+                "best_params": None,
+                "best_result": None,
+                "total_runs": 0,
+                "duration_ms": (time.time() - start_time) * 1000,
+                "config": config,
+            }
+
+        param_sets = grid_param_sets(strategy, param_grid)
+        job_id = self.request.id or uuid.uuid4().hex
+        data_key = fanout.publish_rows(rows)
+        chunks = list(fanout.chunked(param_sets, fanout.OPTIMIZER_CHUNK_SIZE))
+        fanout.start_progress(job_id, len(param_sets), len(chunks))
+        settings = {
+            "exchange_id": exchange,
+            "symbol": symbol,
+            "timeframe": timeframe,
+            "since_ms": since_ms,
+            "until_ms": until_ms,
+            "initial_equity": initial_equity,
+            "leverage": leverage,
+            "fee_rate": fee_rate * 100,  # 任務參數為比率（0.001），引擎為百分比
         }
-        objective = metric_to_objective.get(metric, "sharpe_ratio")
-
-        # 執行參數優化
-        best_result, results_list = find_optimal(
-            exchange_id=exchange,
-            symbol=symbol,
-            timeframe=timeframe,
-            since_ms=since_ms,
-            until_ms=until_ms,
-            strategy=strategy,
-            param_grid=param_grid,
-            objective=objective,
-            initial_equity=initial_equity,
-            leverage=leverage,
-            max_combos=999,  # 不限制組合數量
-        )
-
-        duration_ms = (time.time() - start_time) * 1000
-
-        # 轉換結果格式
-        results = []
-        for item in results_list:
-            if item.get("result"):
-                results.append(
-                    {
-                        "params": item.get("params", {}),
-                        "metrics": item.get("metrics", {}),
-                        "score": item.get("score", 0),
-                    }
+        # 分塊依序降低 broker 優先級：後到的小工作可以排在大工作的尾段之前（src.core.scheduler）
+        workflow = chord(
+            group(
+                optimize_chunk.s(job_id, data_key, strategy, chunk, settings, objective, n_best).set(
+                    priority=scheduler.celery_priority(Priority.BATCH, position=index)
                 )
-
-        # 按分數排序
-        results.sort(key=lambda x: x.get("score", 0), reverse=True)
-
-        log_backtest(
-            logger,
-            symbol=symbol,
-            strategy=f"{strategy}_optimizer",
-            timeframe=timeframe,
-            duration_ms=duration_ms,
-            user_id=user_id,
-            status="completed",
-            total_runs=len(results),
+                for index, chunk in enumerate(chunks)
+            ),
+            reduce_optimizer.s(job_id, objective, n_best, config, start_time, user_id),
         )
 
-        return {
-            "success": True,
-            "results": results[:n_best],  # 回傳前 N 個最佳結果
-            "best_params": results[0].get("params") if results else None,
-            "best_result": best_result,
-            "total_runs": len(results),
-            "duration_ms": duration_ms,
-            "config": {
-                "symbol": symbol,
-                "strategy": strategy,
-                "param_grid": param_grid,
-                "metric": metric,
-            },
-        }
-
     except Exception as e:
         duration_ms = (time.time() - start_time) * 1000
         log_backtest(
@@ -308,7 +328,96 @@ def run_param_optimizer(
         )
         raise
 
+    if self.request.called_directly:
+        # 直接呼叫（非經 worker）時就地執行整個 chord
+        return workflow.apply().get()
+    return self.replace(workflow)
+
+
+@app.task(base=BacktestTask, name="src.tasks.backtest_tasks.optimize_chunk")
+def optimize_chunk(
+    job_id: str,
+    data_key: str,
+    strategy: str,
+    param_sets: list[dict[str, Any]],
+    settings: dict[str, Any],
+    objective: str,
+    n_best: int,
+) -> dict[str, Any]:
+    """
+    回測一塊參數組（已驗證），進度與本塊前 N 名寫入 Redis。
+
+    Returns:
+        {"runs": 組數, "errors": 失敗數, "top": 本塊前 N 名 [{params, metrics, score}, ...]}
+    """
+    entries: list[dict[str, Any]] = []
+    if fanout.is_cancelled(job_id):
+        return {"runs": 0, "errors": 0, "top": []}
+    rows = fanout.load_rows(data_key)
+    try:
+        # fanout.cancel(job_id) 之後在下一組參數前結束，已完成的組合照常回報
+        with cancellation(fanout.CancelFlag(job_id)):
+            evaluated = evaluate_param_sets(rows, strategy, param_sets, **settings)
+            for params, (res, _, _) in zip(param_sets, evaluated):
+                if res.error:
+                    entries.append({"params": params, "error": res.error})
+                else:
+                    entries.append({"params": params, "metrics": res.metrics, "score": res.metrics.get(objective)})
+    except TaskCancelled:
+        pass
+    fanout.record_chunk(job_id, entries, objective, n_best)
+    return {
+        "runs": len(entries),
+        "errors": sum(1 for e in entries if e.get("error")),
+        "top": fanout.top_n(entries, objective, n_best),
+    }
+
+
+@app.task(base=BacktestTask, name="src.tasks.backtest_tasks.reduce_optimizer")
+def reduce_optimizer(
+    chunk_results: list[dict[str, Any]],
+    job_id: str,
+    objective: str,
+    n_best: int,
+    config: dict[str, Any],
+    started: float,
+    user_id: int | None = None,
+) -> dict[str, Any]:
+    """chord 回呼：歸併各塊前 N 名為最終結果（格式同 run_param_optimizer 的回傳值）."""
+    from src.utils.logger import get_logger, log_backtest
+
+    results = fanout.top_n([e for chunk in chunk_results for e in chunk["top"]], objective, n_best)
+    total_runs = sum(chunk["runs"] - chunk["errors"] for chunk in chunk_results)
+    duration_ms = (time.time() - started) * 1000
+    cancelled = fanout.is_cancelled(job_id)
+    fanout.finish_progress(job_id, "cancelled" if cancelled else "done")
+
+    log_backtest(
+        get_logger("stocksx.celery"),
+        symbol=config["symbol"],
+        strategy=f"{config['strategy']}_optimizer",
+        timeframe=config["timeframe"],
+        duration_ms=duration_ms,
+        user_id=user_id,
+        status="cancelled" if cancelled else "completed",
+        total_runs=total_runs,
+    )
 
+    return {
+        "success": not cancelled,
+        "cancelled": cancelled,
+        "results": results,
+        "best_params": results[0]["params"] if results else None,
+        "best_result": results[0] if results else None,
+        "total_runs": total_runs,
+        "duration_ms": duration_ms,
+        "config": config,
+        "job_id": job_id,
+    }
+
+
+@app.task(base=BacktestTask, name="src.tasks.backtest_tasks.run_walk_forward_analysis")
+@profiler.profiled()
 def run_walk_forward_analysis(
     symbol: str,
     exchange: str,
@@ -321,6 +430,7 @@ def run_walk_forward_analysis(
     end_date: str = None,
     initial_equity: float = 10000,
     user_id: int | None = None,
+    profile: bool | None = None,
 ) -> dict[str, Any]:
     """
     執行向前分析（Walk-Forward Analysis）
@@ -337,6 +447,7 @@ def run_walk_forward_analysis(
         end_date: 結束日期
         initial_equity: 初始資金
         user_id: 用戶 ID
+        profile: 取樣剖析（None 時依 STOCKSX_PROFILE），熱點函式與摺疊堆疊放在結果的 "profile"
 
     Returns:
         向前分析結果
@@ -6,9 +6,76 @@ import os
 from celery import Celery
 from celery.schedules import crontab
 
+from src.core import scheduler
+from src.core.scheduler import Priority
+from src.utils import report_codec
+
 # Redis 配置
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# 任務結果以列式二進位編碼回傳（權益曲線、交易明細比 JSON 小一個數量級）；
+# 列在這裡的浮點欄位（逗號分隔，如 "equity"）無法無損縮成小數時降為 float32
+RESULT_FLOAT32 = tuple(f for f in os.getenv("CELERY_RESULT_FLOAT32", "").split(",") if f)
+report_codec.register_celery_serializer(RESULT_FLOAT32)
+
+# 任務佇列（參數優化的分塊獨立成 optimizer.chunks 佇列，可在多台機器上各自擴充 worker：
+#   celery -A src.tasks.celery_app worker -Q optimizer.chunks）
+TASK_QUEUES = {
+    "src.tasks.backtest_tasks.run_backtest": "backtest",
+    "src.tasks.backtest_tasks.run_param_optimizer": "optimizer",
+    "src.tasks.backtest_tasks.optimize_chunk": "optimizer.chunks",
+    "src.tasks.backtest_tasks.reduce_optimizer": "optimizer",
+    "src.tasks.backtest_tasks.run_walk_forward_analysis": "backtest",
+}
+
+# 任務排程類別（與進程內 ThreadTaskQueue 同一套策略；interactive 成本過高時降為 batch）
+TASK_PRIORITIES = {
+    "src.tasks.backtest_tasks.run_backtest": Priority.INTERACTIVE,
+    "src.tasks.backtest_tasks.run_param_optimizer": Priority.BATCH,
+    "src.tasks.backtest_tasks.optimize_chunk": Priority.BATCH,
+    "src.tasks.backtest_tasks.reduce_optimizer": Priority.BATCH,
+    "src.tasks.backtest_tasks.run_walk_forward_analysis": Priority.BATCH,
+    "src.tasks.cleanup.cleanup_old_results": Priority.MAINTENANCE,
+    "src.tasks.cache_tasks.refresh_market_cache": Priority.MAINTENANCE,
+}
+
+# 回測類任務前幾個位置參數（估計成本用）
+_COST_ARGS = ("symbol", "exchange", "timeframe", "strategy", "params", "start_date", "end_date")
+
+
+def task_cost(name: str, args: tuple = (), kwargs: dict | None = None) -> int:
+    """依任務參數估計成本（K 線數 × 參數組合數）；無法估計時為 1."""
+    from datetime import datetime
+
+    bound = {**dict(zip(_COST_ARGS, args or ())), **(kwargs or {})}
+    try:
+        since_ms, until_ms = (
+            int(datetime.strptime(bound[k], "%Y-%m-%d").timestamp() * 1000) for k in ("start_date", "end_date")
+        )
+        bars = scheduler.estimate_bars(bound["timeframe"], since_ms, until_ms)
+    except (KeyError, TypeError, ValueError):
+        return 1
+    grid = bound.get("param_grid")
+    if grid is None and name.endswith(".run_param_optimizer"):
+        grid = bound.get("params")
+    combos = 1
+    for values in (grid or {}).values():
+        combos *= max(1, len(values)) if isinstance(values, (list, tuple)) else 1
+    return scheduler.estimate_cost(bars, combos)
+
+
+def route_task(name, args, kwargs, options, task=None, **kw):
+    """佇列 + broker 優先級；呼叫端明確指定的 queue / priority 優先."""
+    queue = TASK_QUEUES.get(name)
+    priority = TASK_PRIORITIES.get(name)
+    if queue is None and priority is None:
+        return None
+    route = {"queue": queue} if queue else {}
+    if priority is not None:
+        route["priority"] = scheduler.celery_priority(scheduler.classify(priority, task_cost(name, args, kwargs)))
+    return route
+
+
 # Celery 配置
 app = Celery("stocksx", broker=REDIS_URL, backend=REDIS_URL, include=["src.tasks.backtest_tasks"])
 
@@ -17,10 +84,11 @@ app = Celery("stocksx", broker=REDIS_URL, backend=REDIS_URL, include=["src.tasks
 celery_app = app
 
 app.conf.update(
-    # 任務序列化
+    # 任務序列化（參數用 JSON；結果用列式編碼，仍接受舊的 JSON 結果）
     task_serializer="json",
     accept_content=["json"],
-    result_serializer="json",
+    result_serializer=report_codec.SERIALIZER_NAME,
+    result_accept_content=["json", report_codec.SERIALIZER_NAME],
     # 時區
     timezone="Asia/Taipei",
     enable_utc=True,
@@ -42,13 +110,13 @@ app.conf.update(
     broker_transport_options={
         "visibility_timeout": 3600,  # 1 小時
         "confirm_publish": True,
+        # 每個佇列內依訊息優先級分桶，worker 先取數字小的（0 最高）；
+        # 多個佇列之間維持預設輪詢，避免前面的佇列餓死其他佇列
+        "priority_steps": scheduler.CELERY_PRIORITY_STEPS,
     },
-    # 任務路由
-    task_routes={
-        "src.tasks.backtest_tasks.run_backtest": {"queue": "backtest"},
-        "src.tasks.backtest_tasks.run_param_optimizer": {"queue": "optimizer"},
-        "src.tasks.backtest_tasks.run_walk_forward_analysis": {"queue": "backtest"},
-    },
+    task_default_priority=scheduler.celery_priority(Priority.BATCH),
+    # 任務路由：佇列見 TASK_QUEUES，優先級依 src.core.scheduler 策略（route_task）
+    task_routes=(route_task,),
     # 定時任務
     beat_schedule={
         "cleanup-old-results": {
@@ -68,19 +136,31 @@ import logging
 import time
 
 from celery.signals import (
+    before_task_publish,
     task_failure,
     task_postrun,
     task_prerun,
     worker_process_init,
 )
 
+from src.utils import tracing
+
 logger = logging.getLogger("stocksx.celery")
 
 
+@before_task_publish.connect
+def on_before_publish(headers=None, **kwargs):
+    """發送任務時附上目前 span 的 traceparent，worker 端的 span 接在呼叫端之下"""
+    if headers is not None:
+        headers.update(tracing.inject())
+
+
 @task_prerun.connect
 def on_task_prerun(task_id, task, *args, **kwargs):
     """任務開始前記錄"""
     task.start_time = time.time()
+    carrier = {tracing.TRACEPARENT: getattr(task.request, tracing.TRACEPARENT, None) or ""}
+    task._trace_span = tracing.start_span(f"celery.{task.name}", carrier=carrier, task_id=task_id)
     logger.info(
         f"Task started: {task.name}[{task_id}]",
         extra={
@@ -94,6 +174,10 @@ def on_task_prerun(task_id, task, *args, **kwargs):
 def on_task_postrun(task_id, task, retval=None, *args, **kwargs):
     """任務完成後記錄"""
     duration = time.time() - getattr(task, "start_time", time.time())
+    span = getattr(task, "_trace_span", None)
+    if span is not None:
+        span.end()
+        task._trace_span = None
     logger.info(
         f"Task completed: {task.name}[{task_id}] in {duration:.2f}s",
         extra={
@@ -108,6 +192,9 @@ def on_task_postrun(task_id, task, retval=None, *args, **kwargs):
 @task_failure.connect
 def on_task_failure(task_id, task, *args, exception=None, **kwargs):
     """任務失敗記錄"""
+    span = getattr(task, "_trace_span", None)
+    if span is not None and isinstance(exception, BaseException):
+        span.end(exception)
     logger.error(
         f"Task failed: {task.name}[{task_id}]",
         extra={
@@ -125,4 +212,10 @@ def on_worker_init(*args, **kwargs):
     from src.utils.logger import setup_logger
 
     setup_logger(name="stocksx.celery", level=logging.INFO, log_dir=os.getenv("LOG_DIR", "logs"))
+
+    # 設定 METRICS_PORT 時每個 worker 進程各自綁定 port, port+1, ...（prefork 下指標不跨進程共享）
+    if os.getenv("METRICS_PORT"):
+        from src.utils import metrics
+
+        metrics.start_metrics_server(max_tries=int(os.getenv("METRICS_PORT_RANGE", "16")))
     logger.info("Worker process initialized")
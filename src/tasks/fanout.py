@@ -0,0 +1,259 @@
+# 參數優化分塊扇出 — 共享 K 線、進度串流到 Redis、前 N 名歸併
+#
+# run_param_optimizer 抓一次 K 線、以 report_codec 列式編碼存進 Redis（內容定址，同一份數據的任務共用），
+# 再把參數網格切成 OPTIMIZER_CHUNK_SIZE 組一塊，以 chord(group(optimize_chunk...), reduce_optimizer)
+# 分散到 "optimizer.chunks" 佇列。任務參數只帶數據鍵與該塊的參數，不帶 K 線。
+#
+# Redis 鍵（TTL = PROGRESS_TTL 秒）：
+#   stocksx:optimizer:data:<hash>   K 線（report_codec 編碼）
+#   stocksx:optimizer:<job>         進度 hash：total / done / errors / chunks / chunks_done / status
+#   stocksx:optimizer:<job>:top     目前前 N 名 zset（比較分數 → JSON {params, metrics, score}）
+#
+# UI 以 get_progress(job_id) 輪詢；chord 完成時 reduce_optimizer 把各塊的前 N 名歸併為最終結果。
+# cancel(job_id) 把狀態設為 cancelled：尚未開始的分塊直接略過，執行中的分塊在下一組參數前結束（CancelFlag）。
+# 未設定 Redis（單元測試、eager 模式）時改用進程內的 LocalStore。
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Iterator, Sequence
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+OPTIMIZER_CHUNK_SIZE = int(os.getenv("OPTIMIZER_CHUNK_SIZE", "16"))
+PROGRESS_TTL = int(os.getenv("OPTIMIZER_PROGRESS_TTL", "3600"))
+
+_PREFIX = "stocksx:optimizer"
+
+# 每個 worker 進程保留最近幾份解碼後的 K 線，同一任務的多個分塊不必重複下載與解碼
+_ROWS_CACHE_SIZE = 4
+
+
+class LocalStore:
+    """進程內替身，實作本模組用到的 Redis 指令（無 Redis 時的 fallback）."""
+
+    def __init__(self) -> None:
+        self._data: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        return self._data.get(key)
+
+    def setex(self, key: str, ttl: int, value: bytes) -> None:
+        self._data[key] = value
+
+    def expire(self, key: str, ttl: int) -> None:
+        pass
+
+    def exists(self, key: str) -> int:
+        return int(key in self._data)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._data.pop(key, None)
+
+    def hset(self, key: str, mapping: dict[str, Any]) -> None:
+        with self._lock:
+            self._data.setdefault(key, {}).update({k: str(v).encode() for k, v in mapping.items()})
+
+    def hincrby(self, key: str, field: str, amount: int = 1) -> int:
+        with self._lock:
+            bucket = self._data.setdefault(key, {})
+            value = int(bucket.get(field, b"0")) + amount
+            bucket[field] = str(value).encode()
+            return value
+
+    def hget(self, key: str, field: str) -> bytes | None:
+        return self._data.get(key, {}).get(field)
+
+    def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return {k.encode(): v for k, v in self._data.get(key, {}).items()}
+
+    def zadd(self, key: str, mapping: dict[str, float]) -> None:
+        with self._lock:
+            self._data.setdefault(key, {}).update(mapping)
+
+    def zremrangebyrank(self, key: str, start: int, stop: int) -> None:
+        with self._lock:
+            ranked = sorted(self._data.get(key, {}).items(), key=lambda item: item[1])
+            stop = len(ranked) + stop if stop < 0 else stop
+            for member, _ in ranked[start : stop + 1]:
+                del self._data[key][member]
+
+    def zrevrange(self, key: str, start: int, stop: int) -> list[bytes]:
+        ranked = sorted(self._data.get(key, {}).items(), key=lambda item: item[1], reverse=True)
+        stop = len(ranked) if stop < 0 else stop + 1
+        return [member.encode() for member, _ in ranked[start:stop]]
+
+
+_client: Any = None
+_rows_cache: OrderedDict[str, list[dict[str, Any]]] = OrderedDict()
+
+
+def get_client() -> Any:
+    """與 Celery broker 相同的 Redis（不解碼回應）；連不上時為 LocalStore."""
+    global _client
+    if _client is None:
+        try:
+            import redis
+
+            from src.tasks.celery_app import REDIS_URL
+
+            client = redis.from_url(REDIS_URL, decode_responses=False)
+            client.ping()
+            _client = client
+        except Exception as e:
+            logger.warning("參數優化進度改用進程內儲存（Redis 無法使用: %s）", e)
+            _client = LocalStore()
+    return _client
+
+
+# ════════════════════════════════════════════════════════════
+# 共享 K 線
+# ════════════════════════════════════════════════════════════
+
+
+def publish_rows(rows: list[dict[str, Any]]) -> str:
+    """以內容雜湊為鍵存入 K 線（已存在時只延長 TTL），回傳給分塊任務的鍵."""
+    from src.data.integrity import compute_data_hash
+    from src.utils import report_codec
+
+    key = f"{_PREFIX}:data:{compute_data_hash(rows)}"
+    client = get_client()
+    if client.exists(key):
+        client.expire(key, PROGRESS_TTL)
+    else:
+        client.setex(key, PROGRESS_TTL, report_codec.dumps(rows))
+    return key
+
+
+def load_rows(key: str) -> list[dict[str, Any]]:
+    """取回 publish_rows 存入的 K 線；已過期時拋出 LookupError."""
+    rows = _rows_cache.get(key)
+    if rows is not None:
+        _rows_cache.move_to_end(key)
+        return rows
+    blob = get_client().get(key)
+    if blob is None:
+        raise LookupError(f"共享 K 線已過期: {key}")
+    from src.utils import report_codec
+
+    data = report_codec.loads(blob)
+    # 少於 MIN_TABLE_ROWS 根時編碼器不建欄式表，解回的是普通 list
+    rows = data.tolist() if isinstance(data, report_codec.LazyRows) else list(data)
+    _rows_cache[key] = rows
+    while len(_rows_cache) > _ROWS_CACHE_SIZE:
+        _rows_cache.popitem(last=False)
+    return rows
+
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[list[Any]]:
+    size = max(1, size)
+    for start in range(0, len(items), size):
+        yield list(items[start : start + size])
+
+
+# ════════════════════════════════════════════════════════════
+# 進度與前 N 名
+# ════════════════════════════════════════════════════════════
+
+
+def rank_score(entry: dict[str, Any], objective: str) -> float | None:
+    """越大越好的比較分數（max_drawdown_pct 取負）；失敗或缺指標時為 None."""
+    score = entry.get("score")
+    if entry.get("error") or score is None:
+        return None
+    return -score if objective == "max_drawdown_pct" else score
+
+
+def top_n(entries: Sequence[dict[str, Any]], objective: str, n: int) -> list[dict[str, Any]]:
+    ranked = [(rank_score(e, objective), e) for e in entries]
+    ranked = [(score, e) for score, e in ranked if score is not None]
+    ranked.sort(key=lambda item: item[0], reverse=True)
+    return [e for _, e in ranked[:n]]
+
+
+def start_progress(job_id: str, total: int, chunks: int) -> None:
+    client = get_client()
+    key = f"{_PREFIX}:{job_id}"
+    client.delete(key, f"{key}:top")
+    client.hset(
+        key, mapping={"total": total, "done": 0, "errors": 0, "chunks": chunks, "chunks_done": 0, "status": "running"}
+    )
+    client.hset(key, mapping={"started": time.time()})
+    client.expire(key, PROGRESS_TTL)
+
+
+def record_chunk(job_id: str, entries: Sequence[dict[str, Any]], objective: str, n_best: int) -> None:
+    """分塊完成時累加進度，並把該塊的前 N 名併入 zset（只保留全域前 N 名）."""
+    client = get_client()
+    key = f"{_PREFIX}:{job_id}"
+    errors = sum(1 for e in entries if e.get("error"))
+    client.hincrby(key, "done", len(entries))
+    client.hincrby(key, "errors", errors)
+    client.hincrby(key, "chunks_done", 1)
+    best = top_n(entries, objective, n_best)
+    if best:
+        members = {json.dumps(e, sort_keys=True, default=str): rank_score(e, objective) for e in best}
+        client.zadd(f"{key}:top", mapping=members)
+        client.zremrangebyrank(f"{key}:top", 0, -n_best - 1)
+        client.expire(f"{key}:top", PROGRESS_TTL)
+
+
+def finish_progress(job_id: str, status: str = "done") -> None:
+    get_client().hset(f"{_PREFIX}:{job_id}", mapping={"status": status, "finished": time.time()})
+
+
+def cancel(job_id: str) -> bool:
+    """要求取消參數優化（協作式）；任務不存在或已結束時回傳 False."""
+    client = get_client()
+    key = f"{_PREFIX}:{job_id}"
+    status = client.hget(key, "status")
+    if status != b"running":
+        return False
+    client.hset(key, mapping={"status": "cancelled"})
+    return True
+
+
+def is_cancelled(job_id: str) -> bool:
+    return get_client().hget(f"{_PREFIX}:{job_id}", "status") == b"cancelled"
+
+
+class CancelFlag:
+    """以 Redis 進度狀態作為 src.core.tasks.cancellation 的取消來源."""
+
+    __slots__ = ("job_id",)
+
+    def __init__(self, job_id: str) -> None:
+        self.job_id = job_id
+
+    def is_set(self) -> bool:
+        return is_cancelled(self.job_id)
+
+
+def get_progress(job_id: str, n_best: int = 10) -> dict[str, Any] | None:
+    """
+    參數優化進度（UI 輪詢用）。
+
+    Returns:
+        {"status", "total", "done", "errors", "chunks", "chunks_done", "top": [{params, metrics, score}, ...]}；
+        任務不存在或已過期時為 None
+    """
+    client = get_client()
+    key = f"{_PREFIX}:{job_id}"
+    raw = client.hgetall(key)
+    if not raw:
+        return None
+    state: dict[str, Any] = {k.decode(): v.decode() for k, v in raw.items()}
+    for field in ("total", "done", "errors", "chunks", "chunks_done"):
+        state[field] = int(state.get(field, 0))
+    for field in ("started", "finished"):
+        if field in state:
+            state[field] = float(state[field])
+    state["top"] = [json.loads(m) for m in client.zrevrange(f"{key}:top", 0, n_best - 1)]
+    return state
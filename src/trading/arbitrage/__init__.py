@@ -3,7 +3,7 @@ StocksX 套利策略模块
 ====================
 
 提供多种套利策略：
-- 跨交易所套利（现货价差）
+- 跨交易所套利（现货价差，向量化价格矩阵）
 - 三角套利（循环交易）
 - 统计套利（配对交易）
 - 资金费率套利（现货 vs 永续）
@@ -15,6 +15,8 @@ from .cross_exchange import (
     ArbitrageOpportunity,
 )
 
+from .price_matrix import PriceMatrix, SpreadCandidate
+
 from .statistical import (
     StatisticalArbitrage,
     FundingRateArbitrage,
@@ -26,6 +28,8 @@ __all__ = [
     "CrossExchangeArbitrage",
     "TriangularArbitrage",
     "ArbitrageOpportunity",
+    "PriceMatrix",
+    "SpreadCandidate",
     "StatisticalArbitrage",
     "FundingRateArbitrage",
     "PairSignal",
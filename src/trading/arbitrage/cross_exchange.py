@@ -33,6 +33,8 @@ from typing import Optional, Any
 from dataclasses import dataclass
 from datetime import datetime
 
+from .price_matrix import PriceMatrix
+
 logger = logging.getLogger(__name__)
 
 
@@ -94,6 +96,9 @@ class CrossExchangeArbitrage:
         # 手续费率（默认 0.1%）
         self.fee_rate = 0.001
 
+        # 价格矩阵（延迟创建）
+        self._price_matrix: Optional[PriceMatrix] = None
+
         # 初始化交易所
         for exchange_id in exchanges:
             try:
@@ -142,79 +147,71 @@ class CrossExchangeArbitrage:
             logger.error(f"获取 {exchange_id} 价格失败：{e}")
             return None
 
-    def scan_opportunities(self, symbols: list[str], min_spread_pct: float = 0.3) -> list[ArbitrageOpportunity]:
+    @property
+    def price_matrix(self) -> PriceMatrix:
+        """价格矩阵（首次访问时创建）"""
+        if self._price_matrix is None:
+            self._price_matrix = PriceMatrix(self.exchanges)
+        return self._price_matrix
+
+    def scan_opportunities(
+        self,
+        symbols: list[str],
+        min_spread_pct: float = 0.3,
+        max_age_ms: Optional[int] = 5000,
+        refresh: bool = True,
+    ) -> list[ArbitrageOpportunity]:
         """
         扫描套利机会
 
+        每个交易所一次批量请求（交易所间并发），
+        价差、手续费与过期过滤在价格矩阵上一次向量化完成。
+
         Args:
             symbols: 交易对列表
             min_spread_pct: 最小价差（百分比）
+            max_age_ms: 报价最大年龄（毫秒），None 表示不过滤
+            refresh: 是否先拉取最新行情（ticker 流已在写入矩阵时可设为 False）
 
         Returns:
             套利机会列表
         """
+        matrix = self.price_matrix
+        matrix.set_symbols(symbols)
+        if refresh:
+            matrix.refresh()
+
+        candidates = matrix.find_opportunities(
+            min_spread_pct=min_spread_pct,
+            min_profit_pct=self.min_profit_pct,
+            fee_rates=self.fee_rate,
+            max_age_ms=max_age_ms,
+        )
+
+        now = datetime.now()
         opportunities = []
-
-        for symbol in symbols:
-            # 获取所有交易所的价格
-            prices = {}
-            for exchange_id in self.exchanges.keys():
-                price = self.get_price(exchange_id, symbol)
-                if price:
-                    prices[exchange_id] = price
-
-            # 至少需要 2 个交易所的价格
-            if len(prices) < 2:
-                continue
-
-            # 找出最低价和最高价
-            min_exchange = min(prices, key=prices.get)
-            max_exchange = max(prices, key=prices.get)
-
-            buy_price = prices[min_exchange]
-            sell_price = prices[max_exchange]
-
-            # 计算价差
-            spread_pct = (sell_price - buy_price) / buy_price * 100
-
-            # 检查是否超过最小价差
-            if spread_pct < min_spread_pct:
-                continue
-
-            # 计算利润率（扣除双边手续费）
-            total_fee = self.fee_rate * 2 * 100  # 双边手续费（百分比）
-            profit_pct = spread_pct - total_fee
-
-            # 检查是否有利润
-            if profit_pct < self.min_profit_pct:
-                continue
-
-            # 创建套利机会
+        for c in candidates:
             opp = ArbitrageOpportunity(
-                symbol=symbol,
-                buy_exchange=min_exchange,
-                sell_exchange=max_exchange,
-                buy_price=buy_price,
-                sell_price=sell_price,
-                spread=spread_pct,
-                spread_usd=sell_price - buy_price,
-                profit_pct=profit_pct,
+                symbol=c.symbol,
+                buy_exchange=c.buy_exchange,
+                sell_exchange=c.sell_exchange,
+                buy_price=c.buy_price,
+                sell_price=c.sell_price,
+                spread=c.spread_pct,
+                spread_usd=c.sell_price - c.buy_price,
+                profit_pct=c.profit_pct,
                 volume_usd=self.max_position_usd,
-                timestamp=datetime.now(),
+                timestamp=now,
             )
-
             opportunities.append(opp)
 
             logger.info(
-                f"发现套利机会：{symbol} | "
-                f"买：{min_exchange}@{buy_price} | "
-                f"卖：{max_exchange}@{sell_price} | "
-                f"利润：{profit_pct:.2f}%"
+                f"发现套利机会：{c.symbol} | "
+                f"买：{c.buy_exchange}@{c.buy_price} | "
+                f"卖：{c.sell_exchange}@{c.sell_price} | "
+                f"利润：{c.profit_pct:.2f}%"
             )
 
-        # 按利润率排序
-        opportunities.sort(key=lambda x: x.profit_pct, reverse=True)
-
         return opportunities
 
     def execute_arbitrage(self, opportunity: ArbitrageOpportunity, amount: Optional[float] = None) -> dict[str, Any]:
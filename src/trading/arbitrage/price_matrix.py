@@ -0,0 +1,299 @@
+"""
+跨交易所价格矩阵
+
+功能：
+- 每个交易所一次 fetch_tickers 批量拉取，交易所之间并发
+- 维护 symbols × exchanges 的 NumPy 价格矩阵（bid / ask / last + 时间戳）
+- 一次向量化计算所有交易对的价差、手续费与过期过滤
+
+行情来源：
+- refresh()：REST 批量轮询（默认）
+- update()：供 WebSocket ticker 流直接写入，无需轮询
+
+用法：
+    matrix = PriceMatrix(exchanges, symbols=["BTC/USDT", "ETH/USDT"])
+    matrix.refresh()
+    rows = matrix.find_opportunities(min_spread_pct=0.3, fee_rates=0.001)
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SpreadCandidate:
+    """向量化扫描得到的价差候选"""
+
+    symbol: str
+    buy_exchange: str
+    sell_exchange: str
+    buy_price: float
+    sell_price: float
+    spread_pct: float
+    profit_pct: float
+    age_ms: int
+
+
+class PriceMatrix:
+    """
+    symbols × exchanges 价格矩阵
+
+    矩阵中缺失或过期的报价为 NaN，扫描时统一过滤。
+    写入与读取由一把锁保护，可同时被轮询线程与 ticker 流回调更新。
+    """
+
+    def __init__(
+        self,
+        exchanges: dict[str, Any],
+        symbols: Optional[list[str]] = None,
+        max_workers: Optional[int] = None,
+    ):
+        """
+        初始化
+
+        Args:
+            exchanges: 交易所 ID → ccxt 交易所实例
+            symbols: 初始交易对列表
+            max_workers: 并发线程数（默认每个交易所一个线程）
+        """
+        self.exchanges = exchanges
+        self.exchange_ids: list[str] = list(exchanges.keys())
+        self._exchange_index = {ex: j for j, ex in enumerate(self.exchange_ids)}
+        self._max_workers = max_workers or max(1, len(self.exchange_ids))
+        self._lock = threading.Lock()
+
+        self.symbols: list[str] = []
+        self._symbol_index: dict[str, int] = {}
+        n_ex = len(self.exchange_ids)
+        self.bid = np.full((0, n_ex), np.nan)
+        self.ask = np.full((0, n_ex), np.nan)
+        self.last = np.full((0, n_ex), np.nan)
+        self.timestamps = np.zeros((0, n_ex), dtype=np.int64)
+
+        if symbols:
+            self.set_symbols(symbols)
+
+    # ─── 矩阵维护 ───
+
+    def set_symbols(self, symbols: list[str]) -> None:
+        """设置交易对列表，保留已有报价"""
+        symbols = list(dict.fromkeys(symbols))
+        if symbols == self.symbols:
+            return
+
+        n_ex = len(self.exchange_ids)
+        bid = np.full((len(symbols), n_ex), np.nan)
+        ask = np.full((len(symbols), n_ex), np.nan)
+        last = np.full((len(symbols), n_ex), np.nan)
+        timestamps = np.zeros((len(symbols), n_ex), dtype=np.int64)
+
+        with self._lock:
+            for i, symbol in enumerate(symbols):
+                old = self._symbol_index.get(symbol)
+                if old is not None:
+                    bid[i] = self.bid[old]
+                    ask[i] = self.ask[old]
+                    last[i] = self.last[old]
+                    timestamps[i] = self.timestamps[old]
+            self.symbols = symbols
+            self._symbol_index = {s: i for i, s in enumerate(symbols)}
+            self.bid, self.ask, self.last, self.timestamps = bid, ask, last, timestamps
+
+    def update(self, exchange_id: str, tickers: dict[str, dict[str, Any]], received_ms: Optional[int] = None) -> int:
+        """
+        写入一个交易所的行情（REST 批量结果或 ticker 流推送）
+
+        Args:
+            exchange_id: 交易所 ID
+            tickers: 交易对 → ccxt ticker 字典
+            received_ms: 接收时间（ticker 无 timestamp 时使用）
+
+        Returns:
+            写入的交易对数量
+        """
+        col = self._exchange_index.get(exchange_id)
+        if col is None:
+            return 0
+
+        received_ms = received_ms or int(time.time() * 1000)
+        written = 0
+
+        with self._lock:
+            for symbol, ticker in tickers.items():
+                row = self._symbol_index.get(symbol)
+                if row is None or not ticker:
+                    continue
+                self.bid[row, col] = _as_price(ticker.get("bid"))
+                self.ask[row, col] = _as_price(ticker.get("ask"))
+                self.last[row, col] = _as_price(ticker.get("last"))
+                self.timestamps[row, col] = int(ticker.get("timestamp") or received_ms)
+                written += 1
+
+        return written
+
+    def _fetch_exchange(self, exchange_id: str) -> dict[str, dict[str, Any]]:
+        """拉取单个交易所的全部目标交易对"""
+        exchange = self.exchanges[exchange_id]
+        symbols = self.symbols
+        has = getattr(exchange, "has", None) or {}
+
+        if has.get("fetchTickers", True):
+            try:
+                tickers = exchange.fetch_tickers(symbols)
+                return {s: tickers[s] for s in symbols if s in tickers}
+            except Exception as e:
+                logger.warning(f"{exchange_id} 批量获取行情失败，回退逐个获取：{e}")
+
+        tickers = {}
+        for symbol in symbols:
+            try:
+                tickers[symbol] = exchange.fetch_ticker(symbol)
+            except Exception as e:
+                logger.debug(f"获取 {exchange_id} {symbol} 价格失败：{e}")
+        return tickers
+
+    def refresh(self, timeout: Optional[float] = None) -> dict[str, int]:
+        """
+        并发刷新所有交易所
+
+        Args:
+            timeout: 整体等待上限（秒）；逾时仍未返回的交易所记为 0，
+                不等待其线程结束（卡住的交易所不会拖住调用方）
+
+        Returns:
+            交易所 ID → 写入的交易对数量（失败或逾时为 0）
+        """
+        if not self.symbols or not self.exchange_ids:
+            return {}
+
+        updated: dict[str, int] = {}
+        pool = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="price-matrix")
+        try:
+            futures = {ex: pool.submit(self._fetch_exchange, ex) for ex in self.exchange_ids}
+            done, _ = wait(futures.values(), timeout=timeout)
+            for exchange_id, future in futures.items():
+                if future not in done:
+                    logger.error(f"刷新 {exchange_id} 行情逾时（{timeout}s），略过")
+                    updated[exchange_id] = 0
+                    continue
+                try:
+                    updated[exchange_id] = self.update(exchange_id, future.result())
+                except Exception as e:
+                    logger.error(f"刷新 {exchange_id} 行情失败：{e}")
+                    updated[exchange_id] = 0
+        finally:
+            # 不等待逾时的请求；尚未开始的直接取消
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return updated
+
+    # ─── 向量化扫描 ───
+
+    def snapshot(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        取得可成交价格快照
+
+        Returns:
+            (买入价矩阵, 卖出价矩阵, 时间戳矩阵)；
+            买入用 ask、卖出用 bid，缺失时回退 last
+        """
+        with self._lock:
+            buy = np.where(np.isnan(self.ask), self.last, self.ask)
+            sell = np.where(np.isnan(self.bid), self.last, self.bid)
+            timestamps = self.timestamps.copy()
+        return buy, sell, timestamps
+
+    def find_opportunities(
+        self,
+        min_spread_pct: float = 0.3,
+        min_profit_pct: float = 0.0,
+        fee_rates: float | dict[str, float] = 0.001,
+        max_age_ms: Optional[int] = 5000,
+        now_ms: Optional[int] = None,
+    ) -> list[SpreadCandidate]:
+        """
+        一次向量化计算所有交易对的最优跨所价差
+
+        Args:
+            min_spread_pct: 最小价差（百分比）
+            min_profit_pct: 扣除双边手续费后的最小利润率（百分比）
+            fee_rates: 单边手续费率，标量或按交易所的字典
+            max_age_ms: 报价最大年龄（毫秒），None 表示不过滤
+            now_ms: 当前时间（测试用）
+
+        Returns:
+            价差候选列表（按利润率降序）
+        """
+        n_ex = len(self.exchange_ids)
+        if not self.symbols or n_ex < 2:
+            return []
+
+        buy, sell, timestamps = self.snapshot()
+        now_ms = now_ms or int(time.time() * 1000)
+        age = now_ms - timestamps
+
+        valid = (timestamps > 0) & (buy > 0) & (sell > 0)
+        if max_age_ms is not None:
+            valid &= age <= max_age_ms
+        buy = np.where(valid, buy, np.nan)
+        sell = np.where(valid, sell, np.nan)
+
+        if isinstance(fee_rates, dict):
+            fees = np.array([fee_rates.get(ex, 0.001) for ex in self.exchange_ids], dtype=float)
+        else:
+            fees = np.full(n_ex, float(fee_rates))
+
+        # spread[s, i, j]：在交易所 i 买入、交易所 j 卖出
+        with np.errstate(invalid="ignore", divide="ignore"):
+            spread = (sell[:, None, :] - buy[:, :, None]) / buy[:, :, None] * 100
+        spread[:, np.arange(n_ex), np.arange(n_ex)] = np.nan
+        profit = spread - (fees[:, None] + fees[None, :]) * 100
+
+        flat = profit.reshape(len(self.symbols), -1)
+        has_pair = ~np.all(np.isnan(flat), axis=1)
+        if not has_pair.any():
+            return []
+
+        rows = np.flatnonzero(has_pair)
+        best = np.nanargmax(flat[rows], axis=1)
+        buy_idx, sell_idx = np.divmod(best, n_ex)
+        best_spread = spread[rows, buy_idx, sell_idx]
+        best_profit = profit[rows, buy_idx, sell_idx]
+
+        keep = (best_spread >= min_spread_pct) & (best_profit >= min_profit_pct)
+        candidates = [
+            SpreadCandidate(
+                symbol=self.symbols[s],
+                buy_exchange=self.exchange_ids[i],
+                sell_exchange=self.exchange_ids[j],
+                buy_price=float(buy[s, i]),
+                sell_price=float(sell[s, j]),
+                spread_pct=float(sp),
+                profit_pct=float(pf),
+                age_ms=int(max(age[s, i], age[s, j])),
+            )
+            for s, i, j, sp, pf in zip(
+                rows[keep], buy_idx[keep], sell_idx[keep], best_spread[keep], best_profit[keep]
+            )
+        ]
+        candidates.sort(key=lambda c: c.profit_pct, reverse=True)
+        return candidates
+
+
+def _as_price(value: Any) -> float:
+    """ticker 字段转为价格，缺失返回 NaN"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return np.nan
+    return price if price > 0 else np.nan
@@ -15,8 +15,9 @@ import logging
 import time
 
 from src.auth.user_db import UserDB
-from src.backtest.strategies import get_signal
+from src.core.registry import registry
 from src.data.service import data_service
+from src.utils import metrics
 
 from .executor import TradeExecutor, create_executor_from_config
 from .risk_manager import RiskManager, create_risk_manager_from_config
@@ -55,6 +56,7 @@ class AutoTrader:
         self.risk_manager: RiskManager | None = None
         self._running = False
         self._check_interval = 5  # 信號檢查間隔（秒）
+        self._signal_at: float | None = None  # 最近一次信號計算完成的時間（monotonic）
 
     def load_config(self, strategy_id: int) -> dict:
         """
@@ -166,6 +168,7 @@ class AutoTrader:
 
             # 計算策略信號
             signal = self._calculate_signal(symbol, strategy, strategy_params, timeframe)
+            self._signal_at = time.monotonic()
 
             if signal is None:
                 continue
@@ -231,11 +234,8 @@ class AutoTrader:
                     }
                 )
 
-            # 計算信號
-            signals = get_signal(ohlcv, strategy, params)
-            current_signal = signals[-1] if signals else 0
-
-            return current_signal
+            # 計算信號（registry 即時分派：有 streaming 實作時只算最新一根）
+            return registry.latest_signal(strategy, ohlcv, **registry.validate(strategy, params))
 
         except Exception as e:
             logger.error(f"計算信號失敗 {symbol}: {e}")
@@ -319,6 +319,7 @@ class AutoTrader:
         result = self.executor.create_market_order(symbol, side, position_size)
 
         if result.success:
+            self._observe_signal_to_order(strategy, "open")
             # 更新持倉記錄
             self._update_position(
                 symbol=symbol,
@@ -345,6 +346,11 @@ class AutoTrader:
         else:
             logger.error(f"❌ 開倉失敗 {symbol}: {result.error}")
 
+    def _observe_signal_to_order(self, strategy: str, action: str) -> None:
+        """記錄信號計算完成到訂單成交回報的延遲"""
+        if self._signal_at is not None:
+            metrics.observe_signal_to_order(strategy, action, time.monotonic() - self._signal_at)
+
     def _close_position(
         self,
         symbol: str,
@@ -380,6 +386,7 @@ class AutoTrader:
         result = self.executor.create_market_order(symbol, side, estimated_size)
 
         if result.success:
+            self._observe_signal_to_order(strategy, "close")
             # 更新持倉記錄
             self._update_position(
                 symbol=symbol,
@@ -27,6 +27,8 @@ from scipy.optimize import minimize
 from typing import Optional, Any
 import logging
 
+from src.utils.frontier import FrontierEngine
+
 logger = logging.getLogger(__name__)
 
 
@@ -59,6 +61,7 @@ class MarkowitzOptimizer:
         # 资产数量
         self.n_assets = len(returns.columns)
         self.assets = returns.columns.tolist()
+        self._engine: Optional[FrontierEngine] = None
 
     def portfolio_return(self, weights: np.ndarray) -> float:
         """
@@ -242,44 +245,39 @@ class MarkowitzOptimizer:
             "message": result.message,
         }
 
+    def frontier_engine(self) -> FrontierEngine:
+        """
+        前沿引擎（懒加载，预先分解协方差矩阵）
+
+        Returns:
+            FrontierEngine（权重约束 0 <= w <= 1）
+        """
+        if self._engine is None:
+            self._engine = FrontierEngine(
+                self.mean_returns.to_numpy(),
+                self.cov_matrix.to_numpy(),
+                asset_names=self.assets,
+                risk_free_rate=self.risk_free_rate,
+            )
+        return self._engine
+
     def efficient_frontier(self, n_points: int = 50) -> pd.DataFrame:
         """
         计算有效前沿
 
+        目标收益从最小波动率组合到最大夏普组合等距取点；
+        解析解不触及边界时直接采用，否则 SLSQP（解析梯度）自相邻点热启动。
+
         Args:
             n_points: 前沿上的点数
 
         Returns:
             有效前沿数据
         """
-        # 获取最小和最大可能收益
-        min_vol_result = self.optimize_min_volatility()
-        max_sharpe_result = self.optimize_max_sharpe()
-
-        min_return = min_vol_result["annual_return"]
-        max_return = max_sharpe_result["annual_return"]
-
-        # 生成一系列目标收益
-        target_returns = np.linspace(min_return, max_return, n_points)
-
-        frontier_data = []
-
-        for target in target_returns:
-            try:
-                result = self.optimize_target_return(target)
-                if result["success"]:
-                    frontier_data.append(
-                        {
-                            "return": result["annual_return"],
-                            "volatility": result["annual_volatility"],
-                            "sharpe": result["sharpe_ratio"],
-                            "weights": result["weights"],
-                        }
-                    )
-            except (ValueError, KeyError):
-                continue
-
-        return pd.DataFrame(frontier_data)
+        engine = self.frontier_engine()
+        max_sharpe = engine.max_sharpe()
+        frontier = engine.frontier(n_points, max_return=max_sharpe.expected_return)
+        return pd.DataFrame(frontier.to_records())
 
     def plot_efficient_frontier(self):
         """
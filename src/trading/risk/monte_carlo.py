@@ -0,0 +1,350 @@
+"""
+批量蒙特卡洛风险模拟引擎
+
+功能：
+- 多资产相关路径：Cholesky（多元正态）或历史自助法（按日整行重采样，保留相关结构）
+- 分块生成：每块张量大小受 max_chunk_bytes 限制，内存占用与路径数无关
+- 组合 VaR / CVaR：所有路径一次向量化计算
+- 压力测试：整个场景库在同一遍模拟中以一次矩阵乘法完成
+- 可复现：相同 seed（及相同分块）得到相同结果
+
+用法：
+    engine = MonteCarloEngine.from_returns(returns, method="bootstrap", seed=42)
+    res = engine.var_cvar(weights, n_paths=100_000, horizon=10)
+    grid = engine.stress_test(weights, {"crash": -0.3, "rates": {"TLT": -0.1}})
+"""
+
+from __future__ import annotations
+
+import logging
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import dataclass, field
+from typing import Any, Optional, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ShockSpec = Union[float, Sequence[float], np.ndarray, Mapping[str, float]]
+
+
+@dataclass
+class MonteCarloVaR:
+    """组合 VaR/CVaR 模拟结果（收益率口径，负数表示损失）"""
+
+    var: dict[float, float]
+    cvar: dict[float, float]
+    mean: float
+    std: float
+    n_paths: int
+    horizon: int
+    portfolio_value: float = 1.0
+    percentiles: dict[str, float] = field(default_factory=dict)
+
+    def loss_amount(self, confidence: float = 0.95) -> float:
+        """VaR 对应的损失金额（正数）"""
+        return max(0.0, -self.var[confidence] * self.portfolio_value)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "var": {f"{c:.0%}": round(v, 6) for c, v in self.var.items()},
+            "cvar": {f"{c:.0%}": round(v, 6) for c, v in self.cvar.items()},
+            "mean": round(self.mean, 6),
+            "std": round(self.std, 6),
+            "n_paths": self.n_paths,
+            "horizon": self.horizon,
+            "portfolio_value": self.portfolio_value,
+            "percentiles": {k: round(v, 6) for k, v in self.percentiles.items()},
+        }
+
+
+class MonteCarloEngine:
+    """
+    多资产蒙特卡洛引擎
+
+    以单期（如日）资产收益率的均值/协方差或历史样本为输入，
+    模拟 horizon 期复利后的资产收益率，再按权重聚合为组合收益率。
+    """
+
+    def __init__(
+        self,
+        mean: np.ndarray,
+        cov: Optional[np.ndarray] = None,
+        history: Optional[np.ndarray] = None,
+        method: str = "cholesky",
+        asset_names: Optional[list[str]] = None,
+        seed: Optional[int] = None,
+        max_chunk_bytes: int = 64 * 1024 * 1024,
+    ):
+        """
+        初始化
+
+        Args:
+            mean: 单期资产收益率均值 (N,)
+            cov: 单期协方差矩阵 (N, N)，cholesky 方法必需
+            history: 历史收益率 (T, N)，bootstrap 方法必需
+            method: cholesky / bootstrap
+            asset_names: 资产名称（压力场景按名称指定冲击时使用）
+            seed: 随机种子
+            max_chunk_bytes: 单块模拟张量的内存上限
+        """
+        self.mean = np.atleast_1d(np.asarray(mean, dtype=float))
+        self.n_assets = len(self.mean)
+        self.method = method
+        self.asset_names = list(asset_names) if asset_names else [f"asset_{i}" for i in range(self.n_assets)]
+        self.seed = seed
+        self.max_chunk_bytes = max_chunk_bytes
+
+        if method == "cholesky":
+            if cov is None:
+                raise ValueError("cholesky 方法需要协方差矩阵")
+            self.cov = np.atleast_2d(np.asarray(cov, dtype=float))
+            self._chol = _safe_cholesky(self.cov)
+            self.history = None
+        elif method == "bootstrap":
+            if history is None or len(history) == 0:
+                raise ValueError("bootstrap 方法需要历史收益率")
+            self.history = np.asarray(history, dtype=float).reshape(len(history), -1)
+            self.cov = np.atleast_2d(np.cov(self.history, rowvar=False))
+            self._chol = None
+        else:
+            raise ValueError(f"未知的模拟方法：{method}")
+
+    @classmethod
+    def from_returns(
+        cls,
+        returns: np.ndarray,
+        method: str = "cholesky",
+        asset_names: Optional[list[str]] = None,
+        **kwargs: Any,
+    ) -> MonteCarloEngine:
+        """
+        由历史收益率 (T, N) 构建引擎
+
+        Args:
+            returns: 历史收益率，单资产可传一维
+            method: cholesky / bootstrap
+            asset_names: 资产名称
+        """
+        history = np.asarray(returns, dtype=float)
+        if history.ndim == 1:
+            history = history[:, None]
+        mean = history.mean(axis=0)
+        cov = np.atleast_2d(np.cov(history, rowvar=False)) if len(history) > 1 else np.zeros((1, 1))
+        return cls(mean, cov=cov, history=history, method=method, asset_names=asset_names, **kwargs)
+
+    @classmethod
+    def from_moments(cls, mean: float | np.ndarray, std_or_cov: float | np.ndarray, **kwargs: Any) -> MonteCarloEngine:
+        """由均值与标准差（单资产）或协方差矩阵构建 Cholesky 引擎"""
+        cov = np.asarray(std_or_cov, dtype=float)
+        if cov.ndim == 0:
+            cov = np.array([[float(cov) ** 2]])
+        return cls(np.atleast_1d(mean), cov=cov, method="cholesky", **kwargs)
+
+    # ─── 路径生成 ───
+
+    def chunk_size(self, horizon: int) -> int:
+        """单块路径数（受内存上限约束，随机数与收益张量各占一份）"""
+        per_path = max(1, horizon * self.n_assets * 8 * 2)
+        return max(1, self.max_chunk_bytes // per_path)
+
+    def _rng(self) -> np.random.Generator:
+        return np.random.default_rng(self.seed)
+
+    def simulate_asset_returns(
+        self, n_paths: int, horizon: int = 1, rng: Optional[np.random.Generator] = None
+    ) -> Iterator[np.ndarray]:
+        """
+        分块生成 horizon 期复利资产收益率
+
+        Args:
+            n_paths: 路径总数
+            horizon: 持有期（单期数）
+            rng: 随机数生成器（默认按 seed 新建）
+
+        Yields:
+            (块内路径数, N) 的资产收益率
+        """
+        rng = rng or self._rng()
+        chunk = self.chunk_size(horizon)
+        done = 0
+        while done < n_paths:
+            m = min(chunk, n_paths - done)
+            if self.method == "cholesky":
+                z = rng.standard_normal((m * horizon, self.n_assets))
+                period = (z @ self._chol.T + self.mean).reshape(m, horizon, self.n_assets)
+            else:
+                idx = rng.integers(0, len(self.history), size=(m, horizon))
+                period = self.history[idx]
+
+            if horizon == 1:
+                yield period[:, 0, :]
+            else:
+                yield np.prod(1.0 + period, axis=1) - 1.0
+            done += m
+
+    def portfolio_returns(
+        self, weights: Optional[np.ndarray] = None, n_paths: int = 10_000, horizon: int = 1
+    ) -> np.ndarray:
+        """
+        模拟组合收益率
+
+        Args:
+            weights: 资产权重 (N,)，默认等权
+            n_paths: 路径数
+            horizon: 持有期
+
+        Returns:
+            (n_paths,) 组合收益率
+        """
+        w = self._weights(weights)
+        out = np.empty(n_paths)
+        pos = 0
+        for asset_returns in self.simulate_asset_returns(n_paths, horizon):
+            out[pos : pos + len(asset_returns)] = asset_returns @ w
+            pos += len(asset_returns)
+        return out
+
+    # ─── 风险指标 ───
+
+    def var_cvar(
+        self,
+        weights: Optional[np.ndarray] = None,
+        n_paths: int = 100_000,
+        horizon: int = 1,
+        confidence: float | Sequence[float] = (0.95, 0.99),
+        portfolio_value: float = 1.0,
+    ) -> MonteCarloVaR:
+        """
+        组合 VaR / CVaR
+
+        Args:
+            weights: 资产权重，默认等权
+            n_paths: 路径数
+            horizon: 持有期
+            confidence: 置信水平（可多个）
+            portfolio_value: 组合价值（用于换算金额）
+        """
+        levels = [confidence] if isinstance(confidence, (int, float)) else list(confidence)
+        pnl = self.portfolio_returns(weights, n_paths, horizon)
+        var, cvar = _tail_stats(pnl[:, None], levels)
+        return MonteCarloVaR(
+            var={c: float(var[i, 0]) for i, c in enumerate(levels)},
+            cvar={c: float(cvar[i, 0]) for i, c in enumerate(levels)},
+            mean=float(pnl.mean()),
+            std=float(pnl.std()),
+            n_paths=n_paths,
+            horizon=horizon,
+            portfolio_value=portfolio_value,
+            percentiles={f"p{p}": float(v) for p, v in zip((5, 25, 50, 75, 95), np.percentile(pnl, [5, 25, 50, 75, 95]))},
+        )
+
+    def scenario_matrix(self, scenarios: Mapping[str, ShockSpec]) -> np.ndarray:
+        """
+        场景库 → (K, N) 冲击矩阵
+
+        每个场景可为：标量（所有资产同幅冲击）、长度 N 的序列、或 资产名 → 冲击 的字典
+        """
+        rows = []
+        for name, spec in scenarios.items():
+            if isinstance(spec, Mapping):
+                row = np.zeros(self.n_assets)
+                for asset, shock in spec.items():
+                    if asset not in self.asset_names:
+                        raise ValueError(f"场景 {name} 包含未知资产：{asset}")
+                    row[self.asset_names.index(asset)] = shock
+            else:
+                row = np.broadcast_to(np.asarray(spec, dtype=float), (self.n_assets,)).copy()
+            rows.append(row)
+        return np.array(rows).reshape(len(rows), self.n_assets)
+
+    def stress_test(
+        self,
+        weights: Optional[np.ndarray] = None,
+        scenarios: Optional[Mapping[str, ShockSpec]] = None,
+        n_paths: int = 10_000,
+        horizon: int = 1,
+        confidence: float | Sequence[float] = (0.95, 0.99),
+        portfolio_value: float = 1.0,
+    ) -> dict[str, Any]:
+        """
+        在同一批模拟路径上一次性施加整个场景库
+
+        冲击在持有期开始时作用于资产价格，随后叠加模拟收益：
+            (1 + shock) * (1 + r) - 1 = r + shock + r * shock
+        对组合聚合即 A·w + S·w + A·(S∘w)ᵀ，每块只需一次矩阵乘法。
+
+        Returns:
+            {"scenarios", "shock_return", "mean", "var", "cvar", "loss"}，
+            var/cvar 为 {置信水平: (K,) 数组}，loss 为 VaR 对应的金额
+        """
+        scenarios = scenarios or {"base": 0.0}
+        names = list(scenarios.keys())
+        levels = [confidence] if isinstance(confidence, (int, float)) else list(confidence)
+        w = self._weights(weights)
+        shocks = self.scenario_matrix(scenarios)
+        shock_return = shocks @ w
+        cross = (shocks * w).T  # (N, K)
+
+        pnl = np.empty((n_paths, len(names)))
+        pos = 0
+        for asset_returns in self.simulate_asset_returns(n_paths, horizon):
+            m = len(asset_returns)
+            pnl[pos : pos + m] = (asset_returns @ w)[:, None] + shock_return[None, :] + asset_returns @ cross
+            pos += m
+
+        var, cvar = _tail_stats(pnl, levels)
+        return {
+            "scenarios": names,
+            "shock_return": shock_return,
+            "mean": pnl.mean(axis=0),
+            "var": {c: var[i] for i, c in enumerate(levels)},
+            "cvar": {c: cvar[i] for i, c in enumerate(levels)},
+            "loss": {c: np.maximum(0.0, -var[i]) * portfolio_value for i, c in enumerate(levels)},
+        }
+
+    def shock_grid(
+        self,
+        weights: Optional[np.ndarray] = None,
+        shocks: Sequence[float] = tuple(np.linspace(-0.5, 0.5, 11)),
+        **kwargs: Any,
+    ) -> dict[str, Any]:
+        """整体冲击网格（敏感性分析），所有冲击级别共享同一批路径"""
+        return self.stress_test(weights, {f"{s:+.0%}": float(s) for s in shocks}, **kwargs)
+
+    def _weights(self, weights: Optional[np.ndarray]) -> np.ndarray:
+        if weights is None:
+            return np.full(self.n_assets, 1.0 / self.n_assets)
+        w = np.asarray(weights, dtype=float).reshape(-1)
+        if len(w) != self.n_assets:
+            raise ValueError(f"权重数量 {len(w)} 与资产数量 {self.n_assets} 不一致")
+        return w
+
+
+def _safe_cholesky(cov: np.ndarray) -> np.ndarray:
+    """Cholesky 分解；非正定时逐步加对角抖动，退化为特征值截断"""
+    jitter = 0.0
+    scale = float(np.mean(np.diag(cov))) or 1.0
+    for _ in range(6):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = scale * 1e-10 if jitter == 0 else jitter * 100
+    vals, vecs = np.linalg.eigh(cov)
+    logger.warning("协方差矩阵非正定，使用特征值截断")
+    return vecs * np.sqrt(np.clip(vals, 0, None))
+
+
+def _tail_stats(pnl: np.ndarray, levels: list[float]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    按列计算 VaR（分位数）与 CVaR（不高于 VaR 的均值）
+
+    Returns:
+        (len(levels), K) 的 var 与 cvar
+    """
+    var = np.percentile(pnl, [(1 - c) * 100 for c in levels], axis=0).reshape(len(levels), -1)
+    cvar = np.empty_like(var)
+    for i in range(len(levels)):
+        mask = pnl <= var[i][None, :]
+        cvar[i] = np.where(mask, pnl, 0.0).sum(axis=0) / np.maximum(mask.sum(axis=0), 1)
+    return var, cvar
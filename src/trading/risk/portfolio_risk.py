@@ -27,6 +27,9 @@ from dataclasses import dataclass
 from datetime import datetime
 import logging
 
+from .monte_carlo import MonteCarloEngine
+from .streaming import RingBuffer, RollingStats, RunningDrawdown
+
 logger = logging.getLogger(__name__)
 
 
@@ -52,27 +55,52 @@ class RiskMonitor:
     实时监控组合的各项风险指标
     """
 
-    def __init__(self, portfolio_value: float, confidence_levels: list[float] = [0.95, 0.99]):
+    def __init__(
+        self,
+        portfolio_value: float,
+        confidence_levels: list[float] = [0.95, 0.99],
+        window: int = 10_000,
+        seed: Optional[int] = None,
+    ):
         """
         初始化
 
         Args:
             portfolio_value: 组合价值
             confidence_levels: 置信水平列表
+            window: 收益率滚动窗口长度（环形缓冲区容量）
+            seed: 蒙特卡洛 VaR 的随机种子（None 表示不固定）
         """
         self.portfolio_value = portfolio_value
         self.confidence_levels = confidence_levels
+        self.window = window
+        self.seed = seed
 
-        # 历史数据
-        self.returns_history: list[float] = []
-        self.value_history: list[float] = [portfolio_value]
-        self.peak_value = portfolio_value
+        # 历史数据（环形缓冲区 + 增量统计，每次更新 O(1)）
+        self._returns = RollingStats(window)
+        self._values = RingBuffer(window + 1)
+        self._values.append(portfolio_value)
+        self._drawdown = RunningDrawdown(portfolio_value)
 
         # 风险限额
         self.var_limit: Optional[float] = None
         self.drawdown_limit: Optional[float] = None
         self.volatility_limit: Optional[float] = None
 
+    @property
+    def returns_history(self) -> list[float]:
+        """窗口内的收益率（旧 → 新）"""
+        return self._returns.values().tolist()
+
+    @property
+    def value_history(self) -> list[float]:
+        """窗口内的组合价值（旧 → 新）"""
+        return self._values.values().tolist()
+
+    @property
+    def peak_value(self) -> float:
+        return self._drawdown.peak
+
     def add_return(self, return_pct: float):
         """
         添加收益率数据
@@ -80,16 +108,12 @@ class RiskMonitor:
         Args:
             return_pct: 收益率（小数）
         """
-        self.returns_history.append(return_pct)
-
-        # 更新组合价值
-        if len(self.value_history) > 0:
-            new_value = self.value_history[-1] * (1 + return_pct)
-            self.value_history.append(new_value)
+        self._returns.push(return_pct)
 
-            # 更新峰值
-            if new_value > self.peak_value:
-                self.peak_value = new_value
+        # 更新组合价值与回撤
+        new_value = self._values.last * (1 + return_pct)
+        self._values.append(new_value)
+        self._drawdown.update(new_value)
 
     def calculate_var(self, confidence: float = 0.95, method: str = "historical") -> float:
         """
@@ -105,27 +129,24 @@ class RiskMonitor:
         Returns:
             VaR 值（百分比）
         """
-        if len(self.returns_history) < 10:
+        if self._returns.count < 10:
             logger.warning("数据不足，无法计算 VaR")
             return 0.0
 
-        returns = np.array(self.returns_history)
-
         if method == "historical":
-            # 历史模拟法
-            var = np.percentile(returns, (1 - confidence) * 100)
+            # 历史模拟法（有序窗口，无需每次排序）
+            var = self._returns.quantile(1 - confidence)
 
         elif method == "parametric":
             # 参数法（假设正态分布）
-            mu = np.mean(returns)
-            sigma = np.std(returns)
+            mu = self._returns.mean
+            sigma = self._returns.std()
             var = mu - sigma * stats.norm.ppf(confidence)
 
         elif method == "monte_carlo":
             # 蒙特卡洛模拟
-            mu = np.mean(returns)
-            sigma = np.std(returns)
-            simulated = np.random.normal(mu, sigma, 10000)
+            engine = MonteCarloEngine.from_moments(self._returns.mean, self._returns.std(), seed=self.seed)
+            simulated = engine.portfolio_returns(n_paths=10000)
             var = np.percentile(simulated, (1 - confidence) * 100)
 
         else:
@@ -143,15 +164,14 @@ class RiskMonitor:
         Returns:
             CVaR 值（百分比）
         """
-        if len(self.returns_history) < 10:
+        if self._returns.count < 10:
             logger.warning("数据不足，无法计算 CVaR")
             return 0.0
 
-        returns = np.array(self.returns_history)
         var = self.calculate_var(confidence)
 
         # CVaR 是超过 VaR 的损失的期望值
-        cvar = np.mean(returns[returns <= var])
+        cvar = self._returns.tail_mean(var)
 
         return cvar
 
@@ -162,14 +182,7 @@ class RiskMonitor:
         Returns:
             最大回撤（百分比）
         """
-        if len(self.value_history) < 2:
-            return 0.0
-
-        values = np.array(self.value_history)
-        peak = np.maximum.accumulate(values)
-        drawdown = (values - peak) / peak
-
-        return np.min(drawdown)
+        return self._drawdown.max_drawdown
 
     def calculate_current_drawdown(self) -> float:
         """
@@ -178,13 +191,7 @@ class RiskMonitor:
         Returns:
             当前回撤（百分比）
         """
-        if len(self.value_history) < 2:
-            return 0.0
-
-        current_value = self.value_history[-1]
-        drawdown = (current_value - self.peak_value) / self.peak_value
-
-        return drawdown
+        return self._drawdown.current
 
     def calculate_volatility(self, annualize: bool = True) -> float:
         """
@@ -196,10 +203,10 @@ class RiskMonitor:
         Returns:
             波动率
         """
-        if len(self.returns_history) < 2:
+        if self._returns.count < 2:
             return 0.0
 
-        volatility = np.std(self.returns_history)
+        volatility = self._returns.std()
 
         if annualize:
             # 年化（假设日收益率）
@@ -217,17 +224,18 @@ class RiskMonitor:
         Returns:
             夏普比率
         """
-        if len(self.returns_history) < 2:
+        if self._returns.count < 2:
             return 0.0
 
-        returns = np.array(self.returns_history)
-        excess_returns = returns - risk_free_rate / 252  # 日化
+        # 超额收益只平移均值，标准差不变
+        excess_mean = self._returns.mean - risk_free_rate / 252  # 日化
+        std = self._returns.std()
 
-        if np.std(excess_returns) == 0:
+        if std == 0:
             return 0.0
 
         # 年化夏普比率
-        sharpe = np.mean(excess_returns) / np.std(excess_returns) * np.sqrt(252)
+        sharpe = excess_mean / std * np.sqrt(252)
 
         return sharpe
 
@@ -360,22 +368,73 @@ class StressTester:
             敏感性分析表
         """
         shocks = np.linspace(shock_range[0], shock_range[1], steps)
+        negative = shocks < 0
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            recovery = np.where(negative, -shocks / (1 + shocks), 0.0)
+
+        return pd.DataFrame(
+            {
+                "冲击": [f"{shock:.0%}" for shock in shocks],
+                "损失": np.where(negative, self.portfolio_value * np.abs(shocks), 0.0),
+                "剩余价值": self.portfolio_value * (1 + shocks),
+                "恢复所需": recovery,
+            }
+        )
 
-        results = []
-        for shock in shocks:
-            loss = self.portfolio_value * abs(shock) if shock < 0 else 0
-            remaining = self.portfolio_value * (1 + shock)
+    def simulate_scenarios(
+        self,
+        returns: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        asset_names: Optional[list[str]] = None,
+        scenarios: Optional[dict[str, Any]] = None,
+        n_paths: int = 10_000,
+        horizon: int = 1,
+        confidence: float = 0.95,
+        method: str = "bootstrap",
+        seed: Optional[int] = None,
+    ) -> pd.DataFrame:
+        """
+        蒙特卡洛压力测试：在同一批模拟路径上一次性施加所有场景
+
+        Args:
+            returns: 历史资产收益率 (T, N)
+            weights: 资产权重，默认等权
+            asset_names: 资产名称（场景按资产指定冲击时需要）
+            scenarios: 场景名 → 冲击（标量 / 序列 / 资产字典），默认使用预定义场景
+            n_paths: 模拟路径数
+            horizon: 持有期
+            confidence: VaR 置信水平
+            method: cholesky / bootstrap
+            seed: 随机种子
 
-            results.append(
-                {
-                    "冲击": f"{shock:.0%}",
-                    "损失": loss,
-                    "剩余价值": remaining,
-                    "恢复所需": -shock / (1 + shock) if shock < 0 else 0,
-                }
-            )
+        Returns:
+            场景结果表（按 VaR 损失降序）
+        """
+        if scenarios is None:
+            scenarios = {info["name"]: info["shock"] for info in self.SCENARIOS.values()}
+
+        engine = MonteCarloEngine.from_returns(returns, method=method, asset_names=asset_names, seed=seed)
+        grid = engine.stress_test(
+            weights,
+            scenarios,
+            n_paths=n_paths,
+            horizon=horizon,
+            confidence=confidence,
+            portfolio_value=self.portfolio_value,
+        )
 
-        return pd.DataFrame(results)
+        table = pd.DataFrame(
+            {
+                "scenario": grid["scenarios"],
+                "shock_return": grid["shock_return"],
+                "mean_return": grid["mean"],
+                "var": grid["var"][confidence],
+                "cvar": grid["cvar"][confidence],
+                "var_loss": grid["loss"][confidence],
+            }
+        )
+        return table.sort_values("var_loss", ascending=False, ignore_index=True)
 
 
 class BlackSwanDetector:
@@ -393,8 +452,25 @@ class BlackSwanDetector:
             lookback_days: 回溯天数
         """
         self.lookback_days = lookback_days
-        self.price_history: list[float] = []
-        self.volatility_history: list[float] = []
+        self._prices = RingBuffer(lookback_days)
+        # 最近 lookback_days 个价格对应的对数收益率窗口
+        self._log_returns = RollingStats(max(lookback_days - 1, 1), track_quantiles=False)
+        self._volatility = RingBuffer(max(lookback_days * 10, 2))
+        # 除最新一个以外的全部波动率的累计均值/方差（Welford）
+        self._vol_count = 0
+        self._vol_mean = 0.0
+        self._vol_m2 = 0.0
+        self._n_prices = 0
+
+    @property
+    def price_history(self) -> list[float]:
+        """最近 lookback_days 个价格"""
+        return self._prices.values().tolist()
+
+    @property
+    def volatility_history(self) -> list[float]:
+        """最近的波动率序列"""
+        return self._volatility.values().tolist()
 
     def add_price(self, price: float):
         """
@@ -403,13 +479,22 @@ class BlackSwanDetector:
         Args:
             price: 当前价格
         """
-        self.price_history.append(price)
-
-        # 计算波动率
-        if len(self.price_history) >= self.lookback_days:
-            returns = np.diff(np.log(self.price_history[-self.lookback_days :]))
-            volatility = np.std(returns) * np.sqrt(252)
-            self.volatility_history.append(volatility)
+        prev = self._prices.last
+        self._prices.append(price)
+        self._n_prices += 1
+        if prev is not None:
+            self._log_returns.push(np.log(price / prev))
+
+        # 计算波动率（滚动窗口，O(1)）
+        if self._n_prices >= self.lookback_days:
+            volatility = self._log_returns.std() * np.sqrt(252)
+            latest = self._volatility.last
+            if self._n_prices > self.lookback_days and latest is not None:
+                self._vol_count += 1
+                delta = latest - self._vol_mean
+                self._vol_mean += delta / self._vol_count
+                self._vol_m2 += delta * (latest - self._vol_mean)
+            self._volatility.append(volatility)
 
     def detect_volatility_spike(self, threshold: float = 3.0) -> bool:
         """
@@ -421,12 +506,12 @@ class BlackSwanDetector:
         Returns:
             是否检测到突增
         """
-        if len(self.volatility_history) < self.lookback_days:
+        if self._vol_count == 0 or self._vol_count + 1 < self.lookback_days:
             return False
 
-        recent_vol = self.volatility_history[-1]
-        historical_mean = np.mean(self.volatility_history[:-1])
-        historical_std = np.std(self.volatility_history[:-1])
+        recent_vol = self._volatility.last
+        historical_mean = self._vol_mean
+        historical_std = np.sqrt(max(self._vol_m2, 0.0) / self._vol_count)
 
         if historical_std == 0:
             return False
@@ -498,7 +583,7 @@ class BlackSwanDetector:
         Returns:
             风险等级（low/medium/high/critical）
         """
-        if len(self.volatility_history) < self.lookback_days:
+        if self._vol_count + 1 < self.lookback_days:
             return "unknown"
 
         # 检查波动率突增
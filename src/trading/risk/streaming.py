@@ -0,0 +1,454 @@
+"""
+流式风险计算组件
+
+功能：
+- RingBuffer：定长环形缓冲区，O(1) 追加
+- RollingStats：滑动窗口均值/方差 O(1) 更新 + 有序窗口精确分位数（VaR/CVaR）
+- RunningDrawdown：运行中的峰值与最大回撤
+- RiskBook：多组合/多用户风险簿，每个 tick 向量化更新并检查限额（波动率与 VaR/CVaR 同一滑动窗口）
+
+使用场景：
+- RiskMonitor / BlackSwanDetector 的底层统计
+- 每个 tick 对成百上千个组合重新检查风险限额
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from typing import Any, Optional
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    定长环形缓冲区
+
+    追加为 O(1)，写满后覆盖最旧的值并返回被挤出的值。
+    """
+
+    def __init__(self, capacity: int, dtype: Any = np.float64):
+        """
+        初始化
+
+        Args:
+            capacity: 容量
+            dtype: 元素类型
+        """
+        if capacity <= 0:
+            raise ValueError("capacity 必须为正数")
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=dtype)
+        self._head = 0  # 下一个写入位置
+        self._size = 0
+
+    def append(self, value: float) -> Optional[float]:
+        """
+        追加一个值
+
+        Returns:
+            被挤出的最旧值（未写满时为 None）
+        """
+        evicted = None
+        if self._size == self.capacity:
+            evicted = self._data[self._head].item()
+        else:
+            self._size += 1
+        self._data[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        return evicted
+
+    def values(self) -> np.ndarray:
+        """按时间顺序（旧 → 新）返回副本"""
+        if self._size < self.capacity:
+            return self._data[: self._size].copy()
+        return np.concatenate((self._data[self._head :], self._data[: self._head]))
+
+    @property
+    def last(self) -> Optional[float]:
+        """最新值"""
+        if self._size == 0:
+            return None
+        return self._data[(self._head - 1) % self.capacity].item()
+
+    @property
+    def full(self) -> bool:
+        return self._size == self.capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class RollingStats:
+    """
+    滑动窗口统计
+
+    - 均值/方差：滑动 Welford 更新，O(1)
+    - 分位数/尾部均值：有序窗口（二分查找插入/删除），结果与 np.percentile 一致
+    - 每滚动一整个窗口用缓冲区精确重算一次，消除浮点累积误差（均摊 O(1)）
+    """
+
+    def __init__(self, window: int, track_quantiles: bool = True):
+        """
+        初始化
+
+        Args:
+            window: 窗口长度
+            track_quantiles: 是否维护有序窗口（VaR/CVaR 需要）
+        """
+        self.window = window
+        self._buffer = RingBuffer(window)
+        self._sorted: Optional[list[float]] = [] if track_quantiles else None
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._since_resync = 0
+
+    def push(self, value: float) -> Optional[float]:
+        """
+        加入一个观测值
+
+        Returns:
+            被挤出窗口的值（未写满时为 None）
+        """
+        value = float(value)
+        evicted = self._buffer.append(value)
+        n = len(self._buffer)
+
+        if evicted is None:
+            delta = value - self._mean
+            self._mean += delta / n
+            self._m2 += delta * (value - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (value - evicted) / n
+            self._m2 += (value - evicted) * (value - self._mean + evicted - old_mean)
+            self._since_resync += 1
+            if self._since_resync >= self.window:
+                self._resync()
+
+        if self._sorted is not None:
+            if evicted is not None:
+                del self._sorted[bisect.bisect_left(self._sorted, evicted)]
+            bisect.insort(self._sorted, value)
+
+        return evicted
+
+    def _resync(self) -> None:
+        """用缓冲区精确重算均值与二阶矩"""
+        values = self._buffer.values()
+        self._mean = float(values.mean())
+        self._m2 = float(((values - self._mean) ** 2).sum())
+        self._since_resync = 0
+
+    @property
+    def count(self) -> int:
+        return len(self._buffer)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count else 0.0
+
+    def variance(self, ddof: int = 0) -> float:
+        n = self.count
+        if n - ddof <= 0:
+            return 0.0
+        return max(self._m2, 0.0) / (n - ddof)
+
+    def std(self, ddof: int = 0) -> float:
+        return math.sqrt(self.variance(ddof))
+
+    @property
+    def last(self) -> Optional[float]:
+        return self._buffer.last
+
+    def values(self) -> np.ndarray:
+        """窗口内的值（旧 → 新）"""
+        return self._buffer.values()
+
+    def quantile(self, q: float) -> float:
+        """
+        窗口分位数（线性插值，与 np.percentile 一致）
+
+        Args:
+            q: 分位（0~1）
+        """
+        data = self._sorted if self._sorted is not None else sorted(self._buffer.values().tolist())
+        if not data:
+            return 0.0
+        pos = q * (len(data) - 1)
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, len(data) - 1)
+        return data[lo] + (data[hi] - data[lo]) * (pos - lo)
+
+    def tail_mean(self, threshold: float) -> float:
+        """不高于阈值的观测值均值（CVaR）"""
+        data = self._sorted if self._sorted is not None else sorted(self._buffer.values().tolist())
+        k = bisect.bisect_right(data, threshold)
+        if k == 0:
+            return float("nan")
+        return math.fsum(data[:k]) / k
+
+
+class RunningDrawdown:
+    """运行中的峰值、当前回撤与最大回撤（回撤为负数）"""
+
+    def __init__(self, initial_value: float):
+        self.peak = initial_value
+        self.current = 0.0
+        self.max_drawdown = 0.0
+
+    def update(self, value: float) -> float:
+        """更新净值，返回当前回撤"""
+        if value > self.peak:
+            self.peak = value
+        self.current = (value - self.peak) / self.peak if self.peak else 0.0
+        if self.current < self.max_drawdown:
+            self.max_drawdown = self.current
+        return self.current
+
+
+class RiskBook:
+    """
+    多组合风险簿
+
+    每个组合一行，所有状态为 (组合数, 窗口) 的数组：
+    - 滚动均值/波动率：滑动 Welford，O(1) 每组合
+    - VaR/CVaR：与波动率同一窗口的有序窗口（每行升序，未满部分为 +inf），
+      update 时对收到报价的行向量化删除/插入（O(窗口) 每组合）；
+      VaR 直接按下标插值（与 np.percentile 一致），CVaR 只扫描尾部 (1 - confidence) 的列
+    - 回撤：运行峰值与最大回撤（全历史）
+    一次 update 向量化处理所有收到报价的组合，限额可逐 tick 检查。
+    """
+
+    def __init__(
+        self,
+        window: int = 252,
+        confidence: float = 0.95,
+        periods_per_year: int = 252,
+        var_limit: Optional[float] = None,
+        drawdown_limit: Optional[float] = None,
+        volatility_limit: Optional[float] = None,
+        capacity: int = 16,
+    ):
+        """
+        初始化
+
+        Args:
+            window: 滚动窗口长度
+            confidence: VaR 置信水平
+            periods_per_year: 年化周期数
+            var_limit: VaR 限额（绝对值，小数）
+            drawdown_limit: 回撤限额（绝对值，小数）
+            volatility_limit: 年化波动率限额
+            capacity: 初始组合容量（不足时自动翻倍）
+        """
+        self.window = window
+        self.confidence = confidence
+        self.periods_per_year = periods_per_year
+        self.var_limit = var_limit
+        self.drawdown_limit = drawdown_limit
+        self.volatility_limit = volatility_limit
+
+        self.keys: list[str] = []
+        self._index: dict[str, int] = {}
+        self._buf = np.zeros((capacity, window))
+        self._head = np.zeros(capacity, dtype=np.int64)
+        self._count = np.zeros(capacity, dtype=np.int64)
+        self._mean = np.zeros(capacity)
+        self._m2 = np.zeros(capacity)
+        self._since_resync = np.zeros(capacity, dtype=np.int64)
+        self._value = np.zeros(capacity)
+        self._peak = np.zeros(capacity)
+        self._max_dd = np.zeros(capacity)
+        self._sorted = np.full((capacity, window), np.inf)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._index
+
+    def _grow(self) -> None:
+        cap = len(self._head) * 2
+
+        def pad(arr: np.ndarray) -> np.ndarray:
+            shape = (cap - arr.shape[0],) + arr.shape[1:]
+            return np.concatenate((arr, np.zeros(shape, dtype=arr.dtype)))
+
+        self._buf = pad(self._buf)
+        self._sorted = np.vstack((self._sorted, np.full_like(self._sorted, np.inf)))
+        for name in ("_head", "_count", "_mean", "_m2", "_since_resync", "_value", "_peak", "_max_dd"):
+            setattr(self, name, pad(getattr(self, name)))
+
+    def add_portfolio(self, key: str, portfolio_value: float = 1.0) -> int:
+        """
+        注册组合
+
+        Args:
+            key: 组合标识（如 "user_id:portfolio_id"）
+            portfolio_value: 初始净值
+
+        Returns:
+            行号
+        """
+        if key in self._index:
+            return self._index[key]
+        row = len(self.keys)
+        if row >= len(self._head):
+            self._grow()
+        self.keys.append(key)
+        self._index[key] = row
+        self._value[row] = portfolio_value
+        self._peak[row] = portfolio_value
+        return row
+
+    def update(self, returns: dict[str, float]) -> None:
+        """
+        写入一个 tick 的收益率（未注册的组合自动注册，初始净值 1）
+
+        Args:
+            returns: 组合标识 → 收益率（小数）
+        """
+        if not returns:
+            return
+        rows = np.fromiter((self.add_portfolio(k) for k in returns), dtype=np.int64, count=len(returns))
+        self.update_rows(rows, np.fromiter(returns.values(), dtype=float, count=len(returns)))
+
+    def update_rows(self, rows: np.ndarray, returns: np.ndarray) -> None:
+        """
+        按行号向量化写入收益率（行号不可重复）
+
+        Args:
+            rows: 行号数组
+            returns: 对应的收益率数组
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        x = np.asarray(returns, dtype=float)
+        w = self.window
+
+        head = self._head[rows]
+        full = self._count[rows] >= w
+        evicted = self._buf[rows, head]
+        self._buf[rows, head] = x
+        self._head[rows] = (head + 1) % w
+        self._count[rows] = np.minimum(self._count[rows] + 1, w)
+        n = self._count[rows].astype(float)
+
+        # 滑动 Welford：未写满为普通追加，写满为替换最旧值
+        old_mean = self._mean[rows]
+        out = np.where(full, evicted, old_mean)
+        new_mean = old_mean + np.where(full, x - evicted, x - old_mean) / n
+        self._m2[rows] += np.where(
+            full,
+            (x - out) * (x - new_mean + out - old_mean),
+            (x - old_mean) * (x - new_mean),
+        )
+        self._mean[rows] = new_mean
+
+        # 有序窗口：删除被挤出的值（未写满时删除末尾的一个 +inf），再把新值插入到位
+        srt = self._sorted[rows]
+        out_val = np.where(full, evicted, np.inf)
+        drop = (srt < out_val[:, None]).sum(axis=1)
+        ins = (srt < x[:, None]).sum(axis=1) - (out_val < x)
+        j = np.arange(w)[None, :]
+        kept = j - (j > ins[:, None])
+        src = kept + (kept >= drop[:, None])
+        shifted = np.take_along_axis(srt, np.minimum(src, w - 1), axis=1)
+        self._sorted[rows] = np.where(j == ins[:, None], x[:, None], shifted)
+
+        # 每滚动一整个窗口精确重算一次，消除累积误差
+        self._since_resync[rows] += full
+        stale = rows[self._since_resync[rows] >= w]
+        if len(stale):
+            data = self._buf[stale]
+            self._mean[stale] = data.mean(axis=1)
+            self._m2[stale] = ((data - self._mean[stale, None]) ** 2).sum(axis=1)
+            self._since_resync[stale] = 0
+
+        # 净值与回撤
+        value = self._value[rows] * (1 + x)
+        peak = np.maximum(self._peak[rows], value)
+        dd = np.where(peak > 0, (value - peak) / peak, 0.0)
+        self._value[rows] = value
+        self._peak[rows] = peak
+        self._max_dd[rows] = np.minimum(self._max_dd[rows], dd)
+
+    def metrics(self) -> dict[str, np.ndarray]:
+        """
+        所有组合的风险指标（数组与 keys 顺序对齐）
+
+        Returns:
+            {"mean", "volatility", "var", "cvar", "current_drawdown", "max_drawdown", "value"}
+        """
+        p = len(self.keys)
+        n = self._count[:p].astype(float)
+        var, cvar = self.window_var()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            variance = np.where(n > 0, np.maximum(self._m2[:p], 0.0) / n, 0.0)
+            current_dd = np.where(self._peak[:p] > 0, (self._value[:p] - self._peak[:p]) / self._peak[:p], 0.0)
+        return {
+            "mean": self._mean[:p].copy(),
+            "volatility": np.sqrt(variance) * math.sqrt(self.periods_per_year),
+            "var": var,
+            "cvar": cvar,
+            "current_drawdown": current_dd,
+            "max_drawdown": self._max_dd[:p].copy(),
+            "value": self._value[:p].copy(),
+        }
+
+    def window_var(self, confidence: Optional[float] = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        窗口内精确的历史 VaR / CVaR（读有序窗口）
+
+        VaR 为 (1 - confidence) 分位数（线性插值），CVaR 为窗口内不高于 VaR 的收益均值；
+        无数据的组合为 NaN。
+
+        Returns:
+            (var, cvar) 数组
+        """
+        confidence = confidence or self.confidence
+        p = len(self.keys)
+        srt = self._sorted[:p]
+        n = self._count[:p]
+        has = n > 0
+        pos = (1 - confidence) * np.maximum(n - 1, 0)
+        lo = np.floor(pos).astype(np.int64)
+        hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+        rows = np.arange(p)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            var = np.where(has, srt[rows, lo] + (srt[rows, hi] - srt[rows, lo]) * (pos - lo), np.nan)
+
+            # 不高于 VaR 的值都在 hi 之前（与 VaR 相等的并列值除外，按需向后多扫）
+            k = int(hi.max()) + 1 if p else 0
+            while k < self.window and np.any(srt[:, k - 1] <= var):
+                k = min(2 * k, self.window)
+            tail = srt[:, :k]
+            mask = tail <= var[:, None]
+            cvar = np.where(mask, tail, 0.0).sum(axis=1) / mask.sum(axis=1)
+        return var, cvar
+
+    def check_limits(self) -> dict[str, np.ndarray]:
+        """
+        检查所有组合的风险限额
+
+        Returns:
+            {"var_ok", "drawdown_ok", "volatility_ok", "ok"} 布尔数组
+        """
+        m = self.metrics()
+        p = len(self.keys)
+        var_ok = np.ones(p, dtype=bool)
+        dd_ok = np.ones(p, dtype=bool)
+        vol_ok = np.ones(p, dtype=bool)
+        if self.var_limit is not None:
+            var_ok = ~(np.abs(m["var"]) > self.var_limit)
+        if self.drawdown_limit is not None:
+            dd_ok = np.abs(m["current_drawdown"]) <= self.drawdown_limit
+        if self.volatility_limit is not None:
+            vol_ok = m["volatility"] <= self.volatility_limit
+        return {"var_ok": var_ok, "drawdown_ok": dd_ok, "volatility_ok": vol_ok, "ok": var_ok & dd_ok & vol_ok}
+
+    def breaches(self) -> list[str]:
+        """超出任一限额的组合标识"""
+        ok = self.check_limits()["ok"]
+        return [self.keys[i] for i in np.flatnonzero(~ok)]
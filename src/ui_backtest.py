@@ -1,8 +1,10 @@
 # 回測結果渲染 — 專業級圖表
 from __future__ import annotations
 
+from datetime import datetime, timezone
 from io import BytesIO
 
+import numpy as np
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
@@ -11,6 +13,7 @@ from plotly.subplots import make_subplots
 from src.compat import BacktestResult
 from src.chart_theme import apply_dark_theme
 from src.config import STRATEGY_COLORS, STRATEGY_LABELS
+from src.core.chart_lod import get_chart_lod
 from src.core.registry import registry
 
 ALL_STRATEGIES = registry.names or list(STRATEGY_LABELS.keys())
@@ -22,6 +25,10 @@ _GRID = "rgba(50,50,90,0.2)"
 _VOL_UP = "rgba(38,166,154,0.35)"
 _VOL_DOWN = "rgba(239,83,80,0.35)"
 
+# 圖表降採樣：權益曲線約每像素一點；K 線超過此根數時合併顯示
+CHART_WIDTH = 1400
+KLINE_MAX_BARS = 600
+
 
 # run_all_strategies 已遷移至 src.compat.run_all_strategies_new
 # 保留此處僅做向後兼容（舊頁面可繼續導入）
@@ -93,19 +100,86 @@ def render_summary_line(results: dict[str, BacktestResult]):
     return best, valid
 
 
-def render_kline_chart(ohlcv_rows, best_strategy_result=None):
-    """專業 K 線圖：漲跌色成交量 + MA + 買賣標記"""
-    real_bars = [r for r in ohlcv_rows if not r.get("filled")]
-    if not real_bars:
+def _kline_indicators(columns: dict[str, np.ndarray]) -> dict[str, np.ndarray]:
+    """K 線疊加指標（MA20 / MA60 / RSI14），在完整數據上計算後才隨金字塔合併."""
+    close = pd.Series(columns["close"])
+    out = {}
+    for p in (20, 60):
+        if len(close) >= p:
+            out[f"MA{p}"] = close.rolling(p).mean().to_numpy()
+    if len(close) > 14:
+        delta = close.diff()
+        gain = delta.clip(lower=0).rolling(14).mean()
+        loss = (-delta.clip(upper=0)).rolling(14).mean()
+        out["RSI"] = (100 - (100 / (1 + gain / loss))).to_numpy()
+    return out
+
+
+def _in_window(ts: int, window: tuple[int | None, int | None] | None) -> bool:
+    if window is None:
+        return True
+    start, end = window
+    return (start is None or ts >= start) and (end is None or ts <= end)
+
+
+def session_results(results: dict[str, BacktestResult]) -> dict[str, BacktestResult]:
+    """
+    放進 session_state 的精簡結果：權益曲線登記到 ChartLOD 只留鍵，
+    不帶 equity_curve / raw_ohlcv，session 大小與回測長度無關。
+    """
+    lod = get_chart_lod()
+    slim = {}
+    for strategy, res in results.items():
+        if res.error:
+            slim[strategy] = BacktestResult(metrics=res.metrics, error=res.error)
+            continue
+        slim[strategy] = BacktestResult(
+            trades=[t.to_dict() if hasattr(t, "to_dict") else t for t in res.trades],
+            metrics=res.metrics,
+            chart_key=lod.equity(res).key,
+        )
+    return slim
+
+
+def session_chart_key(ohlcv_rows) -> str:
+    """登記 K 線（含疊加指標）到 ChartLOD，回傳存入 session_state 的鍵."""
+    return get_chart_lod().ohlcv(ohlcv_rows, indicators=_kline_indicators).key
+
+
+def chart_window(chart_key: str, state_key: str) -> tuple[int, int] | None:
+    """圖表時間區間滑桿；K 線不多時不顯示。改變區間只重取視窗內的降採樣點."""
+    pyramid = get_chart_lod().get(chart_key)
+    if pyramid is None or len(pyramid) <= KLINE_MAX_BARS:
+        return None
+    lo, hi = (datetime.fromtimestamp(ts / 1000, tz=timezone.utc) for ts in pyramid.span)
+    start, end = st.slider(
+        "🔍 圖表區間", min_value=lo, max_value=hi, value=(lo, hi), key=state_key, format="YYYY-MM-DD HH:mm"
+    )
+    return int(start.timestamp() * 1000), int(end.timestamp() * 1000)
+
+
+def render_kline_chart(ohlcv_rows, best_strategy_result=None, window=None):
+    """
+    專業 K 線圖：漲跌色成交量 + MA + 買賣標記
+
+    ohlcv_rows 可為 K 線列表或 session_chart_key 的鍵；視窗內超過 KLINE_MAX_BARS 根時合併顯示。
+    """
+    lod = get_chart_lod()
+    if isinstance(ohlcv_rows, str):
+        pyramid = lod.get(ohlcv_rows)
+    else:
+        pyramid = lod.ohlcv(ohlcv_rows, indicators=_kline_indicators)
+    if pyramid is None:
+        st.info("圖表資料已過期，請重新執行回測")
+        return
+    bars, factor = pyramid.view(KLINE_MAX_BARS, *(window or (None, None)))
+    if not len(bars["timestamp"]):
         return
-    df = pd.DataFrame(real_bars)
+    df = pd.DataFrame(bars)
     df["time"] = pd.to_datetime(df["timestamp"], unit="ms", utc=True)
-    df["color"] = df.apply(lambda r: _VOL_UP if r["close"] >= r["open"] else _VOL_DOWN, axis=1)
-
-    # 計算 MA
-    for p in [20, 60]:
-        if len(df) >= p:
-            df[f"MA{p}"] = df["close"].rolling(p).mean()
+    df["color"] = np.where(df["close"] >= df["open"], _VOL_UP, _VOL_DOWN)
+    if factor > 1:
+        st.caption(f"共 {len(pyramid):,} 根 K 線，每根顯示合併 {factor} 根")
 
     fig = make_subplots(
         rows=3,
@@ -166,6 +240,8 @@ def render_kline_chart(ohlcv_rows, best_strategy_result=None):
     if best_strategy_result and best_strategy_result[1].trades:
         entries_long, entries_short, exits = [], [], []
         for t in best_strategy_result[1].trades:
+            if not _in_window(t["entry_ts"], window):
+                continue
             et = pd.to_datetime(t["entry_ts"], unit="ms", utc=True)
             xt = pd.to_datetime(t["exit_ts"], unit="ms", utc=True)
             if t["side"] == 1:
@@ -218,14 +294,9 @@ def render_kline_chart(ohlcv_rows, best_strategy_result=None):
             )
 
     # RSI 副圖（簡化）
-    if len(df) > 14:
-        delta = df["close"].diff()
-        gain = delta.clip(lower=0).rolling(14).mean()
-        loss = (-delta.clip(upper=0)).rolling(14).mean()
-        rs = gain / loss
-        rsi = 100 - (100 / (1 + rs))
+    if "RSI" in df.columns:
         fig.add_trace(
-            go.Scatter(x=df["time"], y=rsi, mode="lines", name="RSI(14)", line=dict(color="#7B68EE", width=1.2)),
+            go.Scatter(x=df["time"], y=df["RSI"], mode="lines", name="RSI(14)", line=dict(color="#7B68EE", width=1.2)),
             row=3,
             col=1,
         )
@@ -249,18 +320,28 @@ def render_kline_chart(ohlcv_rows, best_strategy_result=None):
     st.plotly_chart(apply_dark_theme(fig), use_container_width=True)
 
 
-def render_equity_curves(results: dict[str, BacktestResult], initial_equity: float):
-    """專業權益曲線 + 回撤副圖"""
-    curves = [(s, r) for s, r in results.items() if r.equity_curve and not r.error]
+def render_equity_curves(results: dict[str, BacktestResult], initial_equity: float, window=None):
+    """專業權益曲線 + 回撤副圖（回撤在完整曲線上計算，畫圖時依 CHART_WIDTH 降採樣）"""
+    lod = get_chart_lod()
+    curves = []
+    for strategy, res in results.items():
+        if res.error:
+            continue
+        chart_key = getattr(res, "chart_key", None)
+        pyramid = lod.get(chart_key) if chart_key else lod.equity(res)
+        if pyramid is None:
+            st.info("圖表資料已過期，請重新執行回測")
+            return
+        if len(pyramid):
+            curves.append((strategy, pyramid.view(CHART_WIDTH, *(window or (None, None)))))
     if not curves:
         return
 
     fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.7, 0.3], vertical_spacing=0.03)
 
-    for strategy, res in curves:
-        curve = res.equity_curve
-        idx = pd.to_datetime([e["timestamp"] for e in curve], unit="ms", utc=True)
-        eq = [e["equity"] for e in curve]
+    for strategy, view in curves:
+        idx = pd.to_datetime(view["timestamp"], unit="ms", utc=True)
+        eq = view["equity"]
         label = STRATEGY_LABELS.get(strategy, strategy)
         color = STRATEGY_COLORS.get(strategy, "#888")
 
@@ -278,16 +359,10 @@ def render_equity_curves(results: dict[str, BacktestResult], initial_equity: flo
         )
 
         # 回撤
-        peak = eq[0]
-        dd = []
-        for e in eq:
-            if e > peak:
-                peak = e
-            dd.append(-(peak - e) / peak * 100 if peak else 0)
         fig.add_trace(
             go.Scatter(
                 x=idx,
-                y=dd,
+                y=view["drawdown_pct"],
                 mode="lines",
                 name=f"{label} DD",
                 showlegend=False,
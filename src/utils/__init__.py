@@ -2,49 +2,65 @@
 Utils — 工具模組
 
 日誌、限流、健康檢查、裝飾器、風險分析、配置驗證、投資組合、報告匯出
+
+所有匯出皆延遲載入（PEP 562）：`from src.utils import metrics, tracing` 這類輕量
+匯入不會連帶載入 redis / requests / 健康檢查等重型依賴。
 """
 
-from .cache import LRUCache, TTLCache
-from .health_check import (
-    HealthStatus,
-    SystemHealth,
-    check_database,
-    check_redis,
-    check_disk_usage,
-    check_memory,
-    get_system_health,
-)
-from .rate_limiter import TokenBucket
+from __future__ import annotations
+
+import importlib
+from typing import Any
 
-try:
-    from .logging_config import get_logger, setup_logging, JSONFormatter
-except ImportError:
-    pass
+# 匯出名稱 → 所屬子模組
+_EXPORTS: dict[str, tuple[str, ...]] = {
+    ".cache": ("LRUCache", "TTLCache"),
+    ".health_check": (
+        "HealthStatus",
+        "SystemHealth",
+        "check_database",
+        "check_redis",
+        "check_disk_usage",
+        "check_memory",
+        "get_system_health",
+    ),
+    ".rate_limiter": ("TokenBucket",),
+    ".logging_config": ("get_logger", "setup_logging", "JSONFormatter"),
+    ".decorators": ("retry", "timed", "cached", "rate_limit", "suppress_errors"),
+    ".risk": (
+        "RiskAnalyzer",
+        "RiskMetrics",
+        "MonteCarloResult",
+        "batch_compute_all",
+        "batch_risk_metrics",
+        "batch_risk_metrics_from_equity",
+        "compute_correlation",
+        "correlation_matrix",
+    ),
+    ".config_validator": ("validate_config", "ConfigReport", "ConfigIssue"),
+    ".portfolio": ("PortfolioAnalyzer", "PortfolioWeights", "PortfolioMetrics", "batch_portfolio_metrics"),
+    ".frontier": ("FrontierEngine", "EfficientFrontier", "estimate_moments", "rolling_optimize"),
+    ".report": ("BacktestReportGenerator", "StrategyComparisonGenerator"),
+}
+_LAZY = {name: module for module, names in _EXPORTS.items() for name in names}
 
-try:
-    from .decorators import retry, timed, cached, rate_limit, suppress_errors
-except ImportError:
-    pass
 
-try:
-    from .risk import RiskAnalyzer, RiskMetrics, MonteCarloResult, compute_correlation
-except ImportError:
-    pass
+def __getattr__(name: str) -> Any:
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(module, __name__), name)
+    except ImportError as e:
+        # 可選依賴缺失時與舊版 try/except 行為一致：視為沒有這個名稱
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r} ({e})") from e
+    globals()[name] = value
+    return value
 
-try:
-    from .config_validator import validate_config, ConfigReport, ConfigIssue
-except ImportError:
-    pass
 
-try:
-    from .portfolio import PortfolioAnalyzer, PortfolioWeights, PortfolioMetrics
-except ImportError:
-    pass
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY))
 
-try:
-    from .report import BacktestReportGenerator, StrategyComparisonGenerator
-except ImportError:
-    pass
 
 __all__ = [
     "LRUCache",
@@ -72,6 +88,10 @@ __all__ = [
     "RiskMetrics",
     "MonteCarloResult",
     "compute_correlation",
+    "correlation_matrix",
+    "batch_risk_metrics",
+    "batch_risk_metrics_from_equity",
+    "batch_compute_all",
     # Config validation
     "validate_config",
     "ConfigReport",
@@ -80,6 +100,12 @@ __all__ = [
     "PortfolioAnalyzer",
     "PortfolioWeights",
     "PortfolioMetrics",
+    "batch_portfolio_metrics",
+    # Frontier
+    "FrontierEngine",
+    "EfficientFrontier",
+    "estimate_moments",
+    "rolling_optimize",
     # Report
     "BacktestReportGenerator",
     "StrategyComparisonGenerator",
@@ -0,0 +1,306 @@
+"""
+基準測試框架 — 計時、峰值記憶體、基準檔與回歸比對
+
+每個 BenchmarkCase 以 setup(size) 準備輸入（不計時），再以 run(state) 重複量測：
+先跑 warmup 次暖身，之後以 time.perf_counter 計時 repeat 次；峰值記憶體另以 tracemalloc 單獨跑一次量測，
+避免追蹤開銷污染計時。結果寫成 JSON 基準檔，下次執行時與之比對，中位數變慢超過門檻即標記為回歸。
+
+用法：
+    results = run_suite(cases, sizes=(1_000, 100_000))
+    regressions = compare(results, load_baseline(path), threshold=0.2)
+    save_baseline(results, path)
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+import tracemalloc
+from collections.abc import Callable, Iterable
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+
+DEFAULT_THRESHOLD = 0.2
+
+BASELINE_VERSION = 1
+
+
+@dataclass(slots=True)
+class BenchmarkCase:
+    """
+    一個基準測試項目
+
+    Args:
+        name: 名稱（同一組內唯一，建議 "group.name" 形式）
+        group: 分組（signals / engine / metrics / storage / data / optimizer / websocket 等）
+        setup: size → 量測用狀態（不計時）
+        run: 被量測的函式（接收 setup 的回傳值）
+        sizes: 固定的規模列表（None 表示使用套件的 sizes）
+        max_size: 超過此規模時略過（如逐 bar 迴圈在 1M 根上過慢）
+        teardown: 量測結束後清理狀態（可選）
+    """
+
+    name: str
+    group: str
+    setup: Callable[[int], Any]
+    run: Callable[[Any], Any]
+    sizes: tuple[int, ...] | None = None
+    max_size: int | None = None
+    teardown: Callable[[Any], None] | None = None
+
+    def sizes_for(self, suite_sizes: Iterable[int]) -> list[int]:
+        sizes = self.sizes if self.sizes is not None else tuple(suite_sizes)
+        return [s for s in sizes if self.max_size is None or s <= self.max_size]
+
+
+@dataclass(slots=True)
+class BenchmarkResult:
+    """單一 (項目, 規模) 的量測結果（秒 / 位元組）"""
+
+    name: str
+    group: str
+    size: int
+    repeat: int
+    min_s: float
+    median_s: float
+    mean_s: float
+    peak_bytes: int
+    error: str | None = None
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}@{self.size}"
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass(slots=True)
+class Regression:
+    """相對基準變慢（或記憶體增加）超過門檻的項目"""
+
+    key: str
+    metric: str  # median_s / peak_bytes
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float("inf")
+
+    def describe(self) -> str:
+        if self.metric == "peak_bytes":
+            return f"{self.key}: 峰值記憶體 {self.baseline / 1e6:.1f}MB → {self.current / 1e6:.1f}MB（{self.ratio:.2f}x）"
+        return f"{self.key}: 中位數 {self.baseline * 1e3:.2f}ms → {self.current * 1e3:.2f}ms（{self.ratio:.2f}x）"
+
+
+@dataclass(slots=True)
+class BenchmarkRun:
+    """一次完整執行（結果 + 環境資訊）"""
+
+    results: list[BenchmarkResult]
+    created_at: str = ""
+    environment: dict[str, Any] = field(default_factory=dict)
+
+    def by_key(self) -> dict[str, BenchmarkResult]:
+        return {r.key: r for r in self.results}
+
+
+# ════════════════════════════════════════════════════════════
+# 量測
+# ════════════════════════════════════════════════════════════
+
+
+def measure(fn: Callable[[], Any], repeat: int = 5, warmup: int = 1) -> tuple[list[float], int]:
+    """
+    量測函式耗時與峰值記憶體
+
+    Args:
+        fn: 無參數函式
+        repeat: 計時次數
+        warmup: 暖身次數（不計時，讓快取、JIT 式的延遲初始化先發生）
+
+    Returns:
+        (每次耗時秒數列表, tracemalloc 峰值位元組)
+    """
+    for _ in range(warmup):
+        fn()
+
+    times: list[float] = []
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+    return times, max(0, peak - base)
+
+
+def run_case(case: BenchmarkCase, size: int, repeat: int = 5, warmup: int = 1) -> BenchmarkResult:
+    """執行單一 (項目, 規模)；setup / run 拋出的例外記錄於 error，不中斷整個套件"""
+    state = None
+    try:
+        state = case.setup(size)
+        times, peak = measure(lambda: case.run(state), repeat=repeat, warmup=warmup)
+    except Exception as e:
+        logger.warning("基準測試 %s@%d 失敗: %s", case.name, size, e)
+        return BenchmarkResult(case.name, case.group, size, 0, 0.0, 0.0, 0.0, 0, error=f"{type(e).__name__}: {e}")
+    finally:
+        if case.teardown is not None and state is not None:
+            case.teardown(state)
+    return BenchmarkResult(
+        name=case.name,
+        group=case.group,
+        size=size,
+        repeat=len(times),
+        min_s=min(times),
+        median_s=statistics.median(times),
+        mean_s=statistics.fmean(times),
+        peak_bytes=peak,
+    )
+
+
+def run_suite(
+    cases: Iterable[BenchmarkCase],
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    repeat: int = 5,
+    warmup: int = 1,
+    on_result: Callable[[BenchmarkResult], None] | None = None,
+) -> BenchmarkRun:
+    """
+    依序執行所有項目與規模
+
+    Args:
+        cases: 基準測試項目
+        sizes: 預設規模（項目可自帶 sizes / max_size）
+        repeat: 每項計時次數
+        warmup: 每項暖身次數
+        on_result: 每完成一項即回呼（供 CLI 即時輸出）
+    """
+    sizes = tuple(sizes)
+    results: list[BenchmarkResult] = []
+    for case in cases:
+        for size in case.sizes_for(sizes):
+            result = run_case(case, size, repeat=repeat, warmup=warmup)
+            results.append(result)
+            if on_result:
+                on_result(result)
+    return BenchmarkRun(
+        results=results,
+        created_at=datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        environment=environment_info(),
+    )
+
+
+def environment_info() -> dict[str, Any]:
+    """記錄影響量測結果的環境資訊（比對不同機器的基準時僅供參考）"""
+    info: dict[str, Any] = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+    for mod in ("numpy", "pandas"):
+        try:
+            info[mod] = __import__(mod).__version__
+        except ImportError:
+            pass
+    return info
+
+
+# ════════════════════════════════════════════════════════════
+# 基準檔與回歸比對
+# ════════════════════════════════════════════════════════════
+
+
+def save_baseline(run: BenchmarkRun, path: str) -> None:
+    """寫入 JSON 基準檔（失敗的項目不寫入，避免下次比對時被當成 0 秒）"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    payload = {
+        "version": BASELINE_VERSION,
+        "created_at": run.created_at,
+        "environment": run.environment,
+        "results": [r.to_dict() for r in run.results if r.error is None],
+    }
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def load_baseline(path: str) -> BenchmarkRun | None:
+    """讀取基準檔；不存在或版本不符時回傳 None"""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        payload = json.load(f)
+    if payload.get("version") != BASELINE_VERSION:
+        logger.warning("基準檔 %s 版本不符（%s），略過比對", path, payload.get("version"))
+        return None
+    return BenchmarkRun(
+        results=[BenchmarkResult(**r) for r in payload.get("results", [])],
+        created_at=payload.get("created_at", ""),
+        environment=payload.get("environment", {}),
+    )
+
+
+def compare(
+    current: BenchmarkRun,
+    baseline: BenchmarkRun | None,
+    threshold: float = DEFAULT_THRESHOLD,
+    memory_threshold: float | None = None,
+    min_seconds: float = 1e-4,
+) -> list[Regression]:
+    """
+    比對本次與基準，回傳超過門檻的回歸
+
+    Args:
+        current: 本次結果
+        baseline: 基準（None 時回傳空列表）
+        threshold: 中位數耗時允許的相對增幅（0.2 = 慢 20% 以上才標記）
+        memory_threshold: 峰值記憶體允許的相對增幅（None 表示不比對記憶體）
+        min_seconds: 基準耗時低於此值的項目不比對（計時雜訊大於差異）
+    """
+    if baseline is None:
+        return []
+    base = baseline.by_key()
+    regressions: list[Regression] = []
+    for result in current.results:
+        prev = base.get(result.key)
+        if prev is None or result.error is not None:
+            continue
+        if prev.median_s >= min_seconds and result.median_s > prev.median_s * (1 + threshold):
+            regressions.append(Regression(result.key, "median_s", prev.median_s, result.median_s))
+        if (
+            memory_threshold is not None
+            and prev.peak_bytes > 0
+            and result.peak_bytes > prev.peak_bytes * (1 + memory_threshold)
+        ):
+            regressions.append(Regression(result.key, "peak_bytes", prev.peak_bytes, result.peak_bytes))
+    return regressions
@@ -0,0 +1,308 @@
+"""
+圖表降採樣 — LTTB、min-max 與多解析度金字塔
+
+多年 1m 回測的權益曲線 / K 線有上百萬點，整包交給 Plotly 會讓瀏覽器卡死。螢幕寬度只有
+一、兩千像素，每個像素多於幾個點都看不出差別，因此：
+
+  minmax_indices   每個桶保留最小與最大值 — 極值（最大回撤、插針）一定留下，O(n) 全向量化
+  lttb_indices     Largest-Triangle-Three-Buckets — 視覺上最接近原曲線的 n 點
+  aggregate_ohlcv  K 線按桶合併（開=首、高=最大、低=最小、收=末、量=總和）
+
+金字塔在建立時把序列逐層縮小 factor 倍（預設 4），查詢時依視窗內點數挑最細但不超過預算的
+那層，再降到目標寬度，所以每次查詢的成本只與像素寬度有關，與回測長度無關。
+
+用法：
+    pyramid = SeriesPyramid(ts, {"equity": eq, "drawdown_pct": dd})
+    view = pyramid.view(1200, start_ms, end_ms)   # {"timestamp": ..., "equity": ..., "drawdown_pct": ...}
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping, Sequence
+from typing import Any
+
+import numpy as np
+
+# 金字塔每層縮小倍數；最粗一層的點數下限
+PYRAMID_FACTOR = 4
+PYRAMID_MIN_POINTS = 2048
+
+# 查詢時挑選的層級在視窗內最多有 width × 此倍數個點，再以 LTTB 降到 width
+LEVEL_OVERSAMPLE = 4
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+
+# ════════════════════════════════════════════════════════════
+# 演算法
+# ════════════════════════════════════════════════════════════
+
+
+def minmax_indices(y: np.ndarray, buckets: int) -> np.ndarray:
+    """
+    把 y 均分為 buckets 個桶，每桶保留最小與最大值的索引（含首尾點）。
+
+    Args:
+        y: 一維數值序列
+        buckets: 桶數；輸出最多 2 × buckets + 2 點
+
+    Returns:
+        遞增、不重複的索引陣列
+    """
+    n = len(y)
+    if buckets <= 0 or n <= 2 * buckets + 2:
+        return np.arange(n)
+    size = -(-n // buckets)
+    padded = np.empty(size * buckets, dtype=np.float64)
+    padded[:n] = y
+    padded[n:] = y[-1]
+    blocks = padded.reshape(buckets, size)
+    nan = np.isnan(blocks)
+    if nan.any():  # NaN 不參與比較，否則 argmin / argmax 會落在 NaN 上
+        lows, highs = np.where(nan, np.inf, blocks).argmin(axis=1), np.where(nan, -np.inf, blocks).argmax(axis=1)
+    else:
+        lows, highs = blocks.argmin(axis=1), blocks.argmax(axis=1)
+    offsets = np.arange(buckets) * size
+    keep = np.zeros(n, dtype=bool)
+    keep[[0, n - 1]] = True
+    keep[np.minimum(offsets + lows, n - 1)] = True
+    keep[np.minimum(offsets + highs, n - 1)] = True
+    return np.flatnonzero(keep)
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets：保留首尾點，中間每桶選出與「前一選點、下一桶平均」
+    構成三角形面積最大的點。
+
+    Args:
+        x: 遞增的一維座標（時間戳）
+        y: 與 x 等長的數值
+        n_out: 輸出點數（≥ 3 才降採樣）
+
+    Returns:
+        遞增的索引陣列，長度 min(n_out, len(x))
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    xf = np.asarray(x, dtype=np.float64)
+    yf = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    # 每桶平均（給前一桶當第三點），以 cumsum 一次算完
+    cx = np.concatenate(([0.0], np.cumsum(xf)))
+    cy = np.concatenate(([0.0], np.cumsum(yf)))
+    counts = np.maximum(edges[1:] - edges[:-1], 1)
+    avg_x = (cx[edges[1:]] - cx[edges[:-1]]) / counts
+    avg_y = (cy[edges[1:]] - cy[edges[:-1]]) / counts
+
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi = edges[b], edges[b + 1]
+        if b + 1 < len(avg_x):
+            nx, ny = avg_x[b + 1], avg_y[b + 1]
+        else:
+            nx, ny = xf[-1], yf[-1]
+        bx, by = xf[lo:hi], yf[lo:hi]
+        area = np.abs((xf[a] - nx) * (by - yf[a]) - (xf[a] - bx) * (ny - yf[a]))
+        a = lo + int(area.argmax()) if len(area) else lo
+        out[b + 1] = a
+    return out
+
+
+def aggregate_ohlcv(columns: Mapping[str, np.ndarray], starts: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    依桶起點合併 K 線：timestamp / open 取首、high 取最大、low 取最小、volume 加總，
+    其餘欄位（close 與疊加指標）取末值。
+
+    Args:
+        columns: 等長欄位，至少含 timestamp 與 OHLCV_COLUMNS
+        starts: 各桶起點索引（遞增，首元素為 0）
+
+    Returns:
+        合併後的欄位
+    """
+    n = len(columns["timestamp"])
+    ends = np.append(starts[1:], n) - 1
+    out: dict[str, np.ndarray] = {}
+    for name, values in columns.items():
+        if name in ("timestamp", "open"):
+            out[name] = values[starts]
+        elif name == "high":
+            out[name] = np.maximum.reduceat(values, starts)
+        elif name == "low":
+            out[name] = np.minimum.reduceat(values, starts)
+        elif name == "volume":
+            out[name] = np.add.reduceat(values, starts)
+        else:
+            out[name] = values[ends]
+    return out
+
+
+# ════════════════════════════════════════════════════════════
+# 金字塔
+# ════════════════════════════════════════════════════════════
+
+
+def _window(x: np.ndarray, start_ms: int | None, end_ms: int | None) -> tuple[int, int]:
+    lo = 0 if start_ms is None else int(np.searchsorted(x, start_ms, side="left"))
+    hi = len(x) if end_ms is None else int(np.searchsorted(x, end_ms, side="right"))
+    return lo, hi
+
+
+class SeriesPyramid:
+    """
+    折線（權益、回撤）的多解析度索引金字塔。
+
+    level 0 為原始序列；之後每層存回指 level 0 的索引（與該層時間戳），由上一層以 min-max
+    每桶保留 2 點、縮小約 factor 倍，select 欄位的極值在每一層都會留下。
+    """
+
+    def __init__(
+        self,
+        x: np.ndarray,
+        columns: Mapping[str, np.ndarray],
+        *,
+        select: Sequence[str] | None = None,
+        factor: int = PYRAMID_FACTOR,
+        min_points: int = PYRAMID_MIN_POINTS,
+    ) -> None:
+        self.key: str | None = None  # 由 ChartLOD 設定
+        self.x = np.asarray(x, dtype=np.int64)
+        self.columns = {name: np.asarray(values) for name, values in columns.items()}
+        self.select = tuple(select or self.columns)
+        # (索引, 時間戳)；level 0 索引為 None（即 arange）
+        self.levels: list[tuple[np.ndarray | None, np.ndarray]] = [(None, self.x)]
+        while len(self.levels[-1][1]) > max(min_points, 1) * factor:
+            base = self.levels[-1][0]
+            size = len(self.levels[-1][1])
+            keep = np.zeros(size, dtype=bool)
+            for name in self.select:
+                values = self.columns[name] if base is None else self.columns[name][base]
+                keep[minmax_indices(values, size // (2 * factor))] = True
+            index = np.flatnonzero(keep) if base is None else base[keep]
+            self.levels.append((index, self.x[index]))
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    @property
+    def span(self) -> tuple[int, int] | None:
+        return (int(self.x[0]), int(self.x[-1])) if len(self.x) else None
+
+    @property
+    def nbytes(self) -> int:
+        levels = sum(index.nbytes + xs.nbytes for index, xs in self.levels[1:])
+        return self.x.nbytes + sum(v.nbytes for v in self.columns.values()) + levels
+
+    def view(self, width: int, start_ms: int | None = None, end_ms: int | None = None) -> dict[str, np.ndarray]:
+        """
+        視窗 [start_ms, end_ms] 內約 width 點的序列。
+
+        Args:
+            width: 圖表寬度（像素，約每像素一點；另含其餘 select 欄位的極值點）
+            start_ms: 視窗起點；None 為不限
+            end_ms: 視窗終點；None 為不限
+
+        Returns:
+            {"timestamp": ..., <各欄位>: ...}
+        """
+        budget = max(width, 3) * LEVEL_OVERSAMPLE
+        for index, xs in self.levels:
+            lo, hi = _window(xs, start_ms, end_ms)
+            if hi - lo <= budget:
+                break
+        # 最粗一層仍超過預算時直接在該層上做 LTTB（最多 min_points × factor 點）
+        picked = np.arange(lo, hi) if index is None else index[lo:hi]
+        # LTTB 依第一個 select 欄位取點；其餘 select 欄位（如回撤）在視窗內的極值另外補上
+        primary = self.columns[self.select[0]]
+        keep = [lttb_indices(self.x[picked], primary[picked], width)]
+        if len(picked):
+            for name in self.select[1:]:
+                values = self.columns[name][picked]
+                keep.append([np.nanargmin(values), np.nanargmax(values)])
+        picked = picked[np.union1d(keep[0], np.concatenate(keep[1:])) if len(keep) > 1 else keep[0]]
+        return {"timestamp": self.x[picked], **{name: values[picked] for name, values in self.columns.items()}}
+
+
+class OhlcvPyramid:
+    """
+    K 線的多解析度金字塔：每層把上一層每 factor 根合併為一根。
+
+    columns 須含 OHLCV_COLUMNS；其他欄位（MA、RSI 等已在完整數據上算好的疊加指標）取桶內末值。
+    """
+
+    def __init__(
+        self,
+        columns: Mapping[str, np.ndarray],
+        *,
+        factor: int = PYRAMID_FACTOR,
+        min_points: int = PYRAMID_MIN_POINTS,
+    ) -> None:
+        self.key: str | None = None  # 由 ChartLOD 設定
+        base = {name: np.asarray(values) for name, values in columns.items()}
+        base["timestamp"] = base["timestamp"].astype(np.int64)
+        self.levels: list[dict[str, np.ndarray]] = [base]
+        self.factors: list[int] = [1]
+        while len(self.levels[-1]["timestamp"]) > max(min_points, 1) * factor:
+            prev = self.levels[-1]
+            starts = np.arange(0, len(prev["timestamp"]), factor)
+            self.levels.append(aggregate_ohlcv(prev, starts))
+            self.factors.append(self.factors[-1] * factor)
+
+    def __len__(self) -> int:
+        return len(self.levels[0]["timestamp"])
+
+    @property
+    def span(self) -> tuple[int, int] | None:
+        ts = self.levels[0]["timestamp"]
+        return (int(ts[0]), int(ts[-1])) if len(ts) else None
+
+    @property
+    def nbytes(self) -> int:
+        return sum(v.nbytes for level in self.levels for v in level.values())
+
+    def view(
+        self,
+        max_bars: int,
+        start_ms: int | None = None,
+        end_ms: int | None = None,
+    ) -> tuple[dict[str, np.ndarray], int]:
+        """
+        視窗內不超過 max_bars 根的 K 線。
+
+        Returns:
+            (欄位, 每根合併的原始 K 線數)；視窗內原始根數不多時倍數為 1
+        """
+        for level, factor in zip(self.levels, self.factors):
+            lo, hi = _window(level["timestamp"], start_ms, end_ms)
+            if hi - lo <= max_bars:
+                return {name: values[lo:hi] for name, values in level.items()}, factor
+        # 最粗一層仍超過：就地再合併一次
+        level, factor = self.levels[-1], self.factors[-1]
+        lo, hi = _window(level["timestamp"], start_ms, end_ms)
+        window = {name: values[lo:hi] for name, values in level.items()}
+        step = -(-(hi - lo) // max(max_bars, 1))
+        return aggregate_ohlcv(window, np.arange(0, hi - lo, step)), factor * step
+
+
+# ════════════════════════════════════════════════════════════
+# 由回測結果取欄位
+# ════════════════════════════════════════════════════════════
+
+
+def column(rows: Sequence[Mapping[str, Any]], name: str, dtype: Any = np.float64, default: Any = 0) -> np.ndarray:
+    """list[dict] 或 LazyRows 的單一欄位；LazyRows 直接取解碼後的陣列，不建立 dict."""
+    if hasattr(rows, "column") and name in getattr(rows, "columns", ()):
+        return np.asarray(rows.column(name), dtype=dtype)
+    return np.fromiter((r.get(name, default) for r in rows), dtype=dtype, count=len(rows))
+
+
+def drawdown_pct(equity: np.ndarray) -> np.ndarray:
+    """相對歷史高點的回撤（%，≤ 0）."""
+    peak = np.maximum.accumulate(equity)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, (equity - peak) / peak * 100, 0.0)
+    return dd
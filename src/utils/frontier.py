@@ -0,0 +1,657 @@
+"""
+有效前沿引擎 — 快取矩估計、解析解優先、熱啟動 SLSQP
+
+功能：
+- 依報酬視窗雜湊快取年化均值 / 共變異數（可選 Ledoit-Wolf 收縮）
+- 無約束生效時直接使用解析解（最小方差、目標報酬、切線組合）
+- 約束生效時以 SLSQP + 解析梯度求解，前沿各點自鄰點熱啟動
+- 風險平價（循環座標下降，可熱啟動）
+- 批次滾動視窗重新優化（再平衡回測用），視窗分塊並行
+
+用法：
+    from src.utils.frontier import FrontierEngine, rolling_optimize
+
+    engine = FrontierEngine.from_returns(returns, asset_names=names, max_weight=0.4)
+    frontier = engine.frontier(n_points=50)
+    rolling = rolling_optimize(returns, window=252, step=21, objective="max_sharpe")
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from .cache import LRUCache
+
+# 矩估計快取：鍵為 (報酬雜湊, 年化期數, 收縮設定)
+_MOMENT_CACHE = LRUCache(maxsize=256)
+
+_BOUND_TOL = 1e-9
+
+
+# ════════════════════════════════════════════════════════════
+# 矩估計（快取）
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(frozen=True, slots=True)
+class Moments:
+    """年化均值與共變異數（唯讀陣列，可安全共用）."""
+
+    mean: np.ndarray
+    cov: np.ndarray
+    shrinkage: float = 0.0
+    key: str = ""
+
+
+def _as_returns_array(returns: Any) -> tuple[np.ndarray, list[str] | None]:
+    """報酬輸入 → (T, N) 陣列與資產名稱；字典輸入截斷到最短序列."""
+    if isinstance(returns, dict):
+        names = list(returns.keys())
+        n_periods = min((len(v) for v in returns.values()), default=0)
+        arr = np.column_stack([np.asarray(returns[a][:n_periods], dtype=np.float64) for a in names])
+        return arr.reshape(n_periods, len(names)), names
+    if hasattr(returns, "columns") and hasattr(returns, "to_numpy"):
+        return returns.to_numpy(dtype=np.float64), [str(c) for c in returns.columns]
+    arr = np.asarray(returns, dtype=np.float64)
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    return arr, None
+
+
+def returns_key(returns: np.ndarray) -> str:
+    """報酬視窗的內容雜湊."""
+    arr = np.ascontiguousarray(returns, dtype=np.float64)
+    h = hashlib.blake2b(arr.tobytes(), digest_size=16)
+    h.update(repr(arr.shape).encode())
+    return h.hexdigest()
+
+
+def _ledoit_wolf(centered: np.ndarray) -> tuple[np.ndarray, float]:
+    """Ledoit-Wolf 收縮（目標為等方差對角陣），回傳 (共變異數, 收縮強度)."""
+    n_periods, n_assets = centered.shape
+    sample = centered.T @ centered / n_periods
+    mu = np.trace(sample) / n_assets
+    target = mu * np.eye(n_assets)
+    delta = float(((sample - target) ** 2).sum()) / n_assets
+    if delta <= 0:
+        return sample, 0.0
+    # Σ_t ||x_t x_tᵀ - S||² = Σ_t |x_t|⁴ - T·||S||²
+    row_sq = (centered**2).sum(axis=1)
+    beta = (float((row_sq**2).sum()) - n_periods * float((sample**2).sum())) / (n_periods**2 * n_assets)
+    shrink = min(max(beta, 0.0), delta) / delta
+    return shrink * target + (1 - shrink) * sample, shrink
+
+
+def estimate_moments(
+    returns: Any,
+    periods_per_year: int = 252,
+    shrinkage: str | float | None = None,
+    use_cache: bool = True,
+) -> Moments:
+    """
+    估計年化均值與共變異數，依報酬內容雜湊快取.
+
+    Args:
+        returns: (T, N) 報酬陣列 / DataFrame / {資產: 報酬序列}
+        periods_per_year: 年化期數
+        shrinkage: None（樣本共變異數，ddof=1）、"ledoit_wolf" 或固定收縮強度 0~1
+        use_cache: 是否使用快取
+
+    Returns:
+        Moments
+    """
+    arr, _ = _as_returns_array(returns)
+    key = f"{returns_key(arr)}|{periods_per_year}|{shrinkage}"
+    if use_cache:
+        hit = _MOMENT_CACHE.get(key)
+        if hit is not None:
+            return hit
+
+    n_periods, n_assets = arr.shape
+    mean = arr.mean(axis=0) * periods_per_year if n_periods else np.zeros(n_assets)
+    centered = arr - arr.mean(axis=0) if n_periods else arr
+    shrink = 0.0
+    if shrinkage is None:
+        cov = centered.T @ centered / max(n_periods - 1, 1)
+    elif shrinkage == "ledoit_wolf":
+        cov, shrink = _ledoit_wolf(centered)
+    else:
+        shrink = float(shrinkage)
+        sample = centered.T @ centered / max(n_periods - 1, 1)
+        target = np.trace(sample) / max(n_assets, 1) * np.eye(n_assets)
+        cov = shrink * target + (1 - shrink) * sample
+    cov = np.atleast_2d(cov * periods_per_year)
+
+    mean.setflags(write=False)
+    cov.setflags(write=False)
+    moments = Moments(mean=mean, cov=cov, shrinkage=shrink, key=key)
+    if use_cache:
+        _MOMENT_CACHE.set(key, moments)
+    return moments
+
+
+def clear_moment_cache() -> None:
+    """清空矩估計快取."""
+    _MOMENT_CACHE.clear()
+
+
+# ════════════════════════════════════════════════════════════
+# 結果結構
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class FrontierPoint:
+    """單一最優組合."""
+
+    weights: np.ndarray
+    expected_return: float
+    volatility: float
+    sharpe_ratio: float
+    success: bool = True
+    method: str = "closed_form"  # closed_form | slsqp | ccd
+    n_iter: int = 0
+
+    def weight_dict(self, asset_names: list[str]) -> dict[str, float]:
+        return dict(zip(asset_names, self.weights.tolist()))
+
+
+@dataclass(slots=True)
+class EfficientFrontier:
+    """有效前沿（按目標報酬遞增）."""
+
+    asset_names: list[str]
+    returns: np.ndarray
+    volatilities: np.ndarray
+    sharpes: np.ndarray
+    weights: np.ndarray  # (K, N)
+    iterations: int = 0  # SLSQP 總迭代次數
+
+    def __len__(self) -> int:
+        return len(self.returns)
+
+    def to_records(self) -> list[dict[str, Any]]:
+        """[{"return", "volatility", "sharpe", "weights": {...}}, ...]"""
+        return [
+            {
+                "return": float(self.returns[k]),
+                "volatility": float(self.volatilities[k]),
+                "sharpe": float(self.sharpes[k]),
+                "weights": dict(zip(self.asset_names, self.weights[k].tolist())),
+            }
+            for k in range(len(self.returns))
+        ]
+
+
+@dataclass(slots=True)
+class RollingWeights:
+    """滾動視窗優化結果."""
+
+    asset_names: list[str]
+    ends: np.ndarray  # 每個視窗的結束索引（不含）
+    weights: np.ndarray  # (視窗數, N)
+    success: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+
+
+# ════════════════════════════════════════════════════════════
+# 前沿引擎
+# ════════════════════════════════════════════════════════════
+
+
+class FrontierEngine:
+    """
+    均值-方差優化引擎.
+
+    權重約束為 Σw = 1 與 min_weight <= w <= max_weight。
+    解析解不觸及邊界時直接採用（凸問題下即為最優），否則以 SLSQP 求解。
+    """
+
+    def __init__(
+        self,
+        mean: Any,
+        cov: Any,
+        asset_names: list[str] | None = None,
+        min_weight: float = 0.0,
+        max_weight: float = 1.0,
+        risk_free_rate: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            mean: 年化預期報酬 (N,)
+            cov: 年化共變異數 (N, N)
+            asset_names: 資產名稱
+            min_weight: 單一資產最小權重（負值允許放空）
+            max_weight: 單一資產最大權重
+            risk_free_rate: 無風險利率（年化）
+        """
+        self.mean = np.asarray(mean, dtype=np.float64).reshape(-1)
+        self.cov = np.atleast_2d(np.asarray(cov, dtype=np.float64))
+        self.n_assets = len(self.mean)
+        if self.cov.shape != (self.n_assets, self.n_assets):
+            raise ValueError(f"共變異數維度 {self.cov.shape} 與資產數 {self.n_assets} 不符")
+        if self.n_assets == 0:
+            raise ValueError("至少需要 1 個資產")
+        if self.n_assets * min_weight > 1 + _BOUND_TOL or self.n_assets * max_weight < 1 - _BOUND_TOL:
+            raise ValueError(f"權重上下限 [{min_weight}, {max_weight}] 無法滿足 Σw = 1")
+
+        self.asset_names = list(asset_names) if asset_names else [f"asset_{i}" for i in range(self.n_assets)]
+        self.min_weight = float(min_weight)
+        self.max_weight = float(max_weight)
+        self.risk_free_rate = float(risk_free_rate)
+        self._bounds = [(self.min_weight, self.max_weight)] * self.n_assets
+        self._closed = self._closed_form_terms()
+
+    @classmethod
+    def from_returns(
+        cls,
+        returns: Any,
+        asset_names: list[str] | None = None,
+        periods_per_year: int = 252,
+        shrinkage: str | float | None = None,
+        **kwargs: Any,
+    ) -> FrontierEngine:
+        """由報酬資料建立（矩估計走快取）."""
+        arr, names = _as_returns_array(returns)
+        moments = estimate_moments(arr, periods_per_year=periods_per_year, shrinkage=shrinkage)
+        return cls(moments.mean, moments.cov, asset_names=asset_names or names, **kwargs)
+
+    # ─── 解析解 ───
+
+    def _closed_form_terms(self) -> dict[str, Any] | None:
+        """預先求解 Σ⁻¹1 與 Σ⁻¹μ；共變異數奇異時回傳 None."""
+        try:
+            solved = np.linalg.solve(self.cov, np.column_stack([np.ones(self.n_assets), self.mean]))
+        except np.linalg.LinAlgError:
+            return None
+        if not np.all(np.isfinite(solved)):
+            return None
+        inv_ones, inv_mu = solved[:, 0], solved[:, 1]
+        a = float(inv_ones.sum())
+        b = float(inv_mu.sum())
+        c = float(self.mean @ inv_mu)
+        if a <= 0:
+            return None
+        return {"inv_ones": inv_ones, "inv_mu": inv_mu, "a": a, "b": b, "c": c, "d": a * c - b * b}
+
+    def _within_bounds(self, w: np.ndarray) -> np.ndarray:
+        """逐列檢查是否落在權重上下限內."""
+        w = np.atleast_2d(w)
+        return np.all((w >= self.min_weight - _BOUND_TOL) & (w <= self.max_weight + _BOUND_TOL), axis=1)
+
+    def _closed_target(self, targets: np.ndarray) -> np.ndarray | None:
+        """兩基金定理：目標報酬 → 最小方差權重 (K, N)."""
+        cf = self._closed
+        if cf is None or abs(cf["d"]) < 1e-12 * max(1.0, cf["a"] * cf["c"]):
+            return None
+        lam = (cf["c"] - cf["b"] * targets) / cf["d"]
+        gam = (cf["a"] * targets - cf["b"]) / cf["d"]
+        return lam[:, None] * cf["inv_ones"] + gam[:, None] * cf["inv_mu"]
+
+    # ─── 評估 ───
+
+    def evaluate(self, weights: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """批次評估 (K, N) 權重 → (報酬, 波動率, 夏普)."""
+        w = np.atleast_2d(weights)
+        ret = w @ self.mean
+        vol = np.sqrt(np.maximum(np.einsum("ki,ij,kj->k", w, self.cov, w), 0.0))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sharpe = np.where(vol > 0, (ret - self.risk_free_rate) / vol, 0.0)
+        return ret, vol, sharpe
+
+    def _point(self, w: np.ndarray, success: bool, method: str, n_iter: int = 0) -> FrontierPoint:
+        ret, vol, sharpe = self.evaluate(w)
+        return FrontierPoint(
+            weights=w,
+            expected_return=float(ret[0]),
+            volatility=float(vol[0]),
+            sharpe_ratio=float(sharpe[0]),
+            success=success,
+            method=method,
+            n_iter=n_iter,
+        )
+
+    def _start(self, x0: np.ndarray | None) -> np.ndarray:
+        """熱啟動初值：裁切到上下限（等權重為預設）."""
+        if x0 is None:
+            return np.full(self.n_assets, 1.0 / self.n_assets)
+        return np.clip(np.asarray(x0, dtype=np.float64), self.min_weight, self.max_weight)
+
+    def return_range(self) -> tuple[float, float]:
+        """約束下可達的最低 / 最高組合報酬（貪婪線性規劃）."""
+        budget = 1.0 - self.n_assets * self.min_weight
+        room = self.max_weight - self.min_weight
+        base = self.min_weight * self.mean.sum()
+
+        def fill(order: np.ndarray) -> float:
+            extra = np.minimum(room, np.maximum(budget - room * np.arange(self.n_assets), 0.0))
+            return base + float((self.mean[order] * extra).sum())
+
+        return fill(np.argsort(self.mean)), fill(np.argsort(self.mean)[::-1])
+
+    # ─── SLSQP（解析梯度） ───
+
+    def _variance_fun(self, w: np.ndarray) -> tuple[float, np.ndarray]:
+        cov_w = self.cov @ w
+        return float(w @ cov_w), 2.0 * cov_w
+
+    def _slsqp(self, x0: np.ndarray, target: float | None = None) -> tuple[np.ndarray, bool, int]:
+        """最小化 wᵀΣw，約束 Σw = 1（及 μᵀw = target）."""
+        from scipy.optimize import minimize
+
+        ones = np.ones(self.n_assets)
+        constraints = [{"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: ones}]
+        if target is not None:
+            constraints.append({"type": "eq", "fun": lambda w: w @ self.mean - target, "jac": lambda w: self.mean})
+        result = minimize(
+            self._variance_fun,
+            x0,
+            jac=True,
+            method="SLSQP",
+            bounds=self._bounds,
+            constraints=constraints,
+            options={"ftol": 1e-12, "maxiter": 500},
+        )
+        return result.x, bool(result.success), int(result.nit)
+
+    # ─── 最優組合 ───
+
+    def min_variance(self, x0: np.ndarray | None = None) -> FrontierPoint:
+        """全域最小方差組合."""
+        if self.n_assets == 1:
+            return self._point(np.ones(1), True, "closed_form")
+        cf = self._closed
+        if cf is not None:
+            w = cf["inv_ones"] / cf["a"]
+            if self._within_bounds(w)[0]:
+                return self._point(w, True, "closed_form")
+        w, ok, nit = self._slsqp(self._start(x0))
+        return self._point(w, ok, "slsqp", nit)
+
+    def target_return(self, target: float, x0: np.ndarray | None = None) -> FrontierPoint:
+        """給定目標年化報酬的最小方差組合."""
+        w = self._closed_target(np.array([float(target)]))
+        if w is not None and self._within_bounds(w)[0]:
+            return self._point(w[0], True, "closed_form")
+        w, ok, nit = self._slsqp(self._start(x0), target=float(target))
+        return self._point(w, ok, "slsqp", nit)
+
+    def max_sharpe(self, x0: np.ndarray | None = None) -> FrontierPoint:
+        """
+        最大夏普（切線）組合.
+
+        先嘗試解析解 Σ⁻¹(μ - rf)；觸及邊界時改解凸二次規劃：
+        min yᵀΣy，s.t. (μ - rf)ᵀy = 1、min_w·Σy <= y <= max_w·Σy，w = y / Σy。
+        """
+        if self.n_assets == 1:
+            return self._point(np.ones(1), True, "closed_form")
+        excess = self.mean - self.risk_free_rate
+        cf = self._closed
+        if cf is not None:
+            z = cf["inv_mu"] - self.risk_free_rate * cf["inv_ones"]
+            total = z.sum()
+            if total > 1e-12:
+                w = z / total
+                if self._within_bounds(w)[0]:
+                    return self._point(w, True, "closed_form")
+
+        if self.min_weight >= 0 and np.any(excess > 0):
+            w, ok, nit = self._tangency_qp(excess, x0)
+            if ok:
+                return self._point(w, ok, "slsqp", nit)
+        w, ok, nit = self._sharpe_slsqp(self._start(x0))
+        return self._point(w, ok, "slsqp", nit)
+
+    def _tangency_qp(self, excess: np.ndarray, x0: np.ndarray | None) -> tuple[np.ndarray, bool, int]:
+        from scipy.optimize import minimize
+
+        n = self.n_assets
+        ones = np.ones(n)
+        constraints: list[dict[str, Any]] = [
+            {"type": "eq", "fun": lambda y: y @ excess - 1.0, "jac": lambda y: excess},
+        ]
+        if self.max_weight < 1.0:
+            upper = self.max_weight * np.ones((n, n)) - np.eye(n)
+            constraints.append({"type": "ineq", "fun": lambda y: upper @ y, "jac": lambda y: upper})
+        if self.min_weight > 0:
+            lower = np.eye(n) - self.min_weight * np.ones((n, n))
+            constraints.append({"type": "ineq", "fun": lambda y: lower @ y, "jac": lambda y: lower})
+
+        start = self._start(x0)
+        scale = start @ excess
+        y0 = start / scale if scale > 0 else np.where(excess > 0, 1.0, 0.0) / max(excess[excess > 0].sum(), 1e-12)
+        result = minimize(
+            self._variance_fun,
+            y0,
+            jac=True,
+            method="SLSQP",
+            bounds=[(0.0, None)] * n,
+            constraints=constraints,
+            options={"ftol": 1e-14, "maxiter": 500},
+        )
+        y = np.maximum(result.x, 0.0)
+        total = y @ ones
+        if not result.success or total <= 0:
+            return start, False, int(result.nit)
+        return y / total, True, int(result.nit)
+
+    def _sharpe_slsqp(self, x0: np.ndarray) -> tuple[np.ndarray, bool, int]:
+        """直接最大化夏普（所有資產超額報酬為負等退化情況）."""
+        from scipy.optimize import minimize
+
+        rf = self.risk_free_rate
+        ones = np.ones(self.n_assets)
+
+        def neg_sharpe(w: np.ndarray) -> tuple[float, np.ndarray]:
+            cov_w = self.cov @ w
+            vol = math.sqrt(max(float(w @ cov_w), 1e-18))
+            excess = float(w @ self.mean) - rf
+            grad = self.mean / vol - excess * cov_w / vol**3
+            return -excess / vol, -grad
+
+        result = minimize(
+            neg_sharpe,
+            x0,
+            jac=True,
+            method="SLSQP",
+            bounds=self._bounds,
+            constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: ones}],
+            options={"ftol": 1e-12, "maxiter": 500},
+        )
+        return result.x, bool(result.success), int(result.nit)
+
+    def risk_parity(
+        self,
+        budget: np.ndarray | None = None,
+        x0: np.ndarray | None = None,
+        tol: float = 1e-10,
+        max_iter: int = 500,
+    ) -> FrontierPoint:
+        """
+        風險預算組合（預設等風險貢獻），循環座標下降求解.
+
+        不套用權重上下限（風險平價解恆為正權重）。
+        """
+        n = self.n_assets
+        b = np.full(n, 1.0 / n) if budget is None else np.asarray(budget, dtype=np.float64) / np.sum(budget)
+        diag = np.diag(self.cov)
+        if np.any(diag <= 0):
+            return self._point(np.full(n, 1.0 / n), False, "ccd")
+
+        w = np.full(n, 1.0 / n) if x0 is None else np.maximum(np.asarray(x0, dtype=np.float64), 1e-12)
+        w = w / np.sqrt(w @ self.cov @ w)
+        it = 0
+        for it in range(1, max_iter + 1):
+            prev = w.copy()
+            for i in range(n):
+                c = self.cov[i] @ w - diag[i] * w[i]
+                vol = math.sqrt(max(float(w @ self.cov @ w), 1e-18))
+                w[i] = (-c + math.sqrt(c * c + 4 * diag[i] * b[i] * vol)) / (2 * diag[i])
+            if np.abs(w - prev).max() < tol * max(1.0, np.abs(w).max()):
+                break
+        w = w / w.sum()
+        return self._point(w, True, "ccd", it)
+
+    # ─── 有效前沿 ───
+
+    def frontier(
+        self,
+        n_points: int = 50,
+        min_return: float | None = None,
+        max_return: float | None = None,
+        warm_start: bool = True,
+    ) -> EfficientFrontier:
+        """
+        計算有效前沿.
+
+        解析解落在上下限內的點一次向量化求出，其餘點依目標報酬遞增
+        以 SLSQP 逐點求解，每點以相鄰點的解熱啟動。
+
+        Args:
+            n_points: 前沿點數
+            min_return: 最低目標報酬（預設為最小方差組合報酬）
+            max_return: 最高目標報酬（預設為約束下可達最高報酬）
+            warm_start: 是否自鄰點熱啟動
+
+        Returns:
+            EfficientFrontier（僅含成功求解的點）
+        """
+        mvp = self.min_variance()
+        if self.n_assets == 1:
+            ret, vol, sharpe = self.evaluate(mvp.weights)
+            return EfficientFrontier(self.asset_names, ret, vol, sharpe, mvp.weights.reshape(1, 1))
+
+        lo_feasible, hi_feasible = self.return_range()
+        lo = mvp.expected_return if min_return is None else max(float(min_return), lo_feasible)
+        hi = hi_feasible if max_return is None else min(float(max_return), hi_feasible)
+        if n_points <= 0 or hi < lo:
+            empty = np.empty(0)
+            return EfficientFrontier(self.asset_names, empty, empty, empty, np.empty((0, self.n_assets)))
+
+        targets = np.linspace(lo, hi, n_points) if n_points > 1 else np.array([lo])
+        weights = np.full((len(targets), self.n_assets), np.nan)
+        ok = np.zeros(len(targets), dtype=bool)
+
+        closed = self._closed_target(targets)
+        if closed is not None:
+            inside = self._within_bounds(closed)
+            weights[inside] = closed[inside]
+            ok |= inside
+
+        iterations = 0
+        prev = mvp.weights
+        for k in range(len(targets)):
+            if ok[k]:
+                prev = weights[k]
+                continue
+            w, success, nit = self._slsqp(self._start(prev if warm_start else None), target=float(targets[k]))
+            iterations += nit
+            if success:
+                weights[k], ok[k] = w, True
+                prev = w
+
+        weights = weights[ok]
+        ret, vol, sharpe = self.evaluate(weights) if len(weights) else (np.empty(0),) * 3
+        return EfficientFrontier(self.asset_names, ret, vol, sharpe, weights, iterations)
+
+
+# ════════════════════════════════════════════════════════════
+# 批次滾動視窗
+# ════════════════════════════════════════════════════════════
+
+_OBJECTIVES = ("min_variance", "max_sharpe", "risk_parity", "target_return")
+
+
+def _solve_window(engine: FrontierEngine, objective: str, x0: np.ndarray | None, target: float | None) -> FrontierPoint:
+    if objective == "min_variance":
+        return engine.min_variance(x0)
+    if objective == "max_sharpe":
+        return engine.max_sharpe(x0)
+    if objective == "risk_parity":
+        return engine.risk_parity(x0=x0)
+    lo, hi = engine.return_range()
+    return engine.target_return(min(max(float(target), lo), hi), x0)
+
+
+def rolling_optimize(
+    returns: Any,
+    window: int,
+    step: int = 1,
+    objective: str = "min_variance",
+    target_return: float | None = None,
+    asset_names: list[str] | None = None,
+    periods_per_year: int = 252,
+    shrinkage: str | float | None = None,
+    min_weight: float = 0.0,
+    max_weight: float = 1.0,
+    risk_free_rate: float = 0.0,
+    max_workers: int | None = None,
+) -> RollingWeights:
+    """
+    滾動視窗重新優化（再平衡回測用）.
+
+    視窗切為連續區塊分派到執行緒池；區塊內依序求解，每個視窗以前一視窗的
+    權重熱啟動。矩估計依視窗雜湊快取，重複回測同一區間時免重算。
+
+    Args:
+        returns: (T, N) 報酬陣列 / DataFrame / {資產: 報酬序列}
+        window: 視窗長度（期數）
+        step: 再平衡間隔（期數）
+        objective: "min_variance" | "max_sharpe" | "risk_parity" | "target_return"
+        target_return: objective="target_return" 時的年化目標報酬
+        max_workers: 執行緒數（None = 依區塊數）
+
+    Returns:
+        RollingWeights，ends[k] 為第 k 個視窗的結束索引（不含），
+        weights[k] 即該時點之後使用的權重
+    """
+    if objective not in _OBJECTIVES:
+        raise ValueError(f"未知的優化目標：{objective}，可選 {_OBJECTIVES}")
+    if objective == "target_return" and target_return is None:
+        raise ValueError("objective='target_return' 需要提供 target_return")
+    if window < 2 or step < 1:
+        raise ValueError("window 需 >= 2，step 需 >= 1")
+
+    arr, names = _as_returns_array(returns)
+    names = asset_names or names or [f"asset_{i}" for i in range(arr.shape[1])]
+    ends = np.arange(window, arr.shape[0] + 1, step)
+    n_windows = len(ends)
+    weights = np.full((n_windows, arr.shape[1]), np.nan)
+    success = np.zeros(n_windows, dtype=bool)
+    if n_windows == 0:
+        return RollingWeights(names, ends, weights, success)
+
+    def run_chunk(indices: np.ndarray) -> None:
+        prev: np.ndarray | None = None
+        for k in indices:
+            end = int(ends[k])
+            moments = estimate_moments(arr[end - window : end], periods_per_year, shrinkage)
+            engine = FrontierEngine(
+                moments.mean,
+                moments.cov,
+                asset_names=names,
+                min_weight=min_weight,
+                max_weight=max_weight,
+                risk_free_rate=risk_free_rate,
+            )
+            point = _solve_window(engine, objective, prev, target_return)
+            weights[k] = point.weights
+            success[k] = point.success
+            prev = point.weights
+
+    workers = max(1, min(max_workers or os.cpu_count() or 1, n_windows))
+    chunks = np.array_split(np.arange(n_windows), workers)
+    if workers == 1:
+        run_chunk(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="frontier") as pool:
+            for future in [pool.submit(run_chunk, c) for c in chunks]:
+                future.result()
+
+    return RollingWeights(names, ends, weights, success)
@@ -0,0 +1,338 @@
+"""
+Prometheus 指標 — 回測引擎、數據源、快取、WebSocket 與自動交易的效能觀測
+
+所有指標註冊在獨立的 REGISTRY，由 FastAPI 的 /metrics 路由（render_latest）或
+獨立 HTTP 埠（start_metrics_server）輸出。
+
+停用方式：環境變數 STOCKSX_METRICS=0，或未安裝 prometheus_client。
+停用時所有 record / observe 函式只做一次布林判斷就返回，計時器為共用的空物件。
+
+用法：
+    from src.utils import metrics
+
+    with metrics.provider_timer("ccxt:binance", "fetch_ohlcv"):
+        rows = exchange.fetch_ohlcv(...)
+    metrics.record_backtest("loop", bars=len(rows), seconds=elapsed)
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import time
+from collections.abc import Callable, Iterator
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram
+    from prometheus_client import generate_latest, start_http_server
+    from prometheus_client.core import GaugeMetricFamily
+
+    _HAS_PROMETHEUS = True
+except ImportError:  # pragma: no cover - prometheus_client 為選配依賴
+    _HAS_PROMETHEUS = False
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+_ENABLED = _HAS_PROMETHEUS and os.getenv("STOCKSX_METRICS", "1").lower() not in ("0", "false", "no")
+
+# 延遲型 bucket：數據源 / API 呼叫（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# 計算型 bucket：回測 / 優化任務（秒）
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+# ════════════════════════════════════════════════════════════
+# 指標定義
+# ════════════════════════════════════════════════════════════
+
+if _HAS_PROMETHEUS:
+    REGISTRY = CollectorRegistry(auto_describe=True)
+
+    PROVIDER_LATENCY = Histogram(
+        "stocksx_provider_call_seconds",
+        "Latency of market data provider calls",
+        ["provider", "method", "status"],
+        buckets=LATENCY_BUCKETS,
+        registry=REGISTRY,
+    )
+    BACKTEST_SECONDS = Histogram(
+        "stocksx_backtest_seconds",
+        "Backtest wall time",
+        ["engine"],
+        buckets=DURATION_BUCKETS,
+        registry=REGISTRY,
+    )
+    BACKTEST_BARS = Counter(
+        "stocksx_backtest_bars", "Bars processed by backtest engines", ["engine"], registry=REGISTRY
+    )
+    BACKTEST_BARS_PER_SECOND = Gauge(
+        "stocksx_backtest_bars_per_second", "Throughput of the most recent backtest", ["engine"], registry=REGISTRY
+    )
+    OPTIMIZER_TASKS = Counter(
+        "stocksx_optimizer_tasks", "Optimizer evaluations completed", ["search", "status"], registry=REGISTRY
+    )
+    OPTIMIZER_TASK_SECONDS = Histogram(
+        "stocksx_optimizer_task_seconds",
+        "Wall time of a single optimizer evaluation",
+        ["search"],
+        buckets=DURATION_BUCKETS,
+        registry=REGISTRY,
+    )
+    WS_CONNECTIONS = Gauge("stocksx_ws_connections", "Active websocket subscriptions", registry=REGISTRY)
+    WS_QUEUE_DEPTH = Gauge(
+        "stocksx_ws_queue_depth", "Websocket messages queued but not yet sent in the current fan-out", registry=REGISTRY
+    )
+    WS_MESSAGES = Counter("stocksx_ws_messages", "Websocket messages sent", ["type", "status"], registry=REGISTRY)
+    WS_FANOUT_SECONDS = Histogram(
+        "stocksx_ws_fanout_seconds",
+        "Time to deliver one message to all subscribers",
+        ["type"],
+        buckets=LATENCY_BUCKETS,
+        registry=REGISTRY,
+    )
+    SIGNAL_TO_ORDER = Histogram(
+        "stocksx_signal_to_order_seconds",
+        "Latency from signal computed to order acknowledged",
+        ["strategy", "action"],
+        buckets=LATENCY_BUCKETS,
+        registry=REGISTRY,
+    )
+    MIDDLEWARE_SECONDS = Histogram(
+        "stocksx_middleware_call_seconds",
+        "Latency of calls executed through MiddlewarePipeline",
+        ["name"],
+        buckets=LATENCY_BUCKETS,
+        registry=REGISTRY,
+    )
+
+
+def metrics_enabled() -> bool:
+    return _ENABLED
+
+
+def set_enabled(enabled: bool) -> None:
+    """開關指標記錄（prometheus_client 未安裝時永遠停用）"""
+    global _ENABLED
+    _ENABLED = bool(enabled) and _HAS_PROMETHEUS
+
+
+# ════════════════════════════════════════════════════════════
+# 計時器
+# ════════════════════════════════════════════════════════════
+
+
+class _NullTimer:
+    """停用時的共用計時器，進出與 sent 都不做任何事"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _NullTimer:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+    def sent(self, ok: bool = True) -> None:
+        return None
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _Timer:
+    __slots__ = ("_observe", "_start")
+
+    def __init__(self, observe: Callable[[float, bool], None]) -> None:
+        self._observe = observe
+        self._start = 0.0
+
+    def __enter__(self) -> _Timer:
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, *exc: Any) -> None:
+        self._observe(time.perf_counter() - self._start, exc_type is None)
+
+
+def provider_timer(provider: str, method: str) -> _Timer | _NullTimer:
+    """數據源呼叫計時（例外時 status=error，例外照常拋出）"""
+    if not _ENABLED:
+        return _NULL_TIMER
+
+    def observe(seconds: float, ok: bool) -> None:
+        PROVIDER_LATENCY.labels(provider, method, "ok" if ok else "error").observe(seconds)
+
+    return _Timer(observe)
+
+
+# ════════════════════════════════════════════════════════════
+# 記錄函式
+# ════════════════════════════════════════════════════════════
+
+
+def record_backtest(engine: str, bars: int, seconds: float) -> None:
+    """回測完成：耗時、處理的 K 線數與吞吐量（bars/sec）"""
+    if not _ENABLED:
+        return
+    BACKTEST_SECONDS.labels(engine).observe(seconds)
+    BACKTEST_BARS.labels(engine).inc(bars)
+    if seconds > 0:
+        BACKTEST_BARS_PER_SECOND.labels(engine).set(bars / seconds)
+
+
+def record_optimizer_task(search: str, seconds: float, ok: bool = True) -> None:
+    """單次優化評估完成（tasks/sec 以 rate(stocksx_optimizer_tasks_total[1m]) 取得）"""
+    if not _ENABLED:
+        return
+    OPTIMIZER_TASKS.labels(search, "ok" if ok else "error").inc()
+    OPTIMIZER_TASK_SECONDS.labels(search).observe(seconds)
+
+
+def set_ws_connections(count: int) -> None:
+    if _ENABLED:
+        WS_CONNECTIONS.set(count)
+
+
+class _Fanout(_Timer):
+    """WebSocket 廣播計時器：每送出一則扣一格佇列深度，離開時扣回未送出的部分"""
+
+    __slots__ = ("_message_type", "_pending")
+
+    def __init__(self, message_type: str, targets: int) -> None:
+        super().__init__(self._finish)
+        self._message_type = message_type
+        self._pending = targets
+        WS_QUEUE_DEPTH.inc(targets)
+
+    def sent(self, ok: bool = True) -> None:
+        """記錄單筆送出結果（成功或失敗都已離開佇列）"""
+        record_ws_send(self._message_type, ok)
+        if self._pending > 0:
+            self._pending -= 1
+            WS_QUEUE_DEPTH.dec()
+
+    def _finish(self, seconds: float, ok: bool) -> None:
+        WS_QUEUE_DEPTH.dec(self._pending)
+        self._pending = 0
+        WS_FANOUT_SECONDS.labels(self._message_type).observe(seconds)
+
+
+def ws_fanout(message_type: str, targets: int) -> _Fanout | _NullTimer:
+    """
+    WebSocket 廣播計時：進入時佇列深度增加 targets，每筆 sent() 扣一格，
+    離開時扣回略過的目標並記錄整批送達耗時。
+    """
+    if not _ENABLED:
+        return _NULL_TIMER
+    return _Fanout(message_type, targets)
+
+
+def record_ws_send(message_type: str, ok: bool) -> None:
+    if _ENABLED:
+        WS_MESSAGES.labels(message_type, "ok" if ok else "error").inc()
+
+
+def observe_signal_to_order(strategy: str, action: str, seconds: float) -> None:
+    """信號計算完成 → 訂單回報成功的延遲"""
+    if _ENABLED:
+        SIGNAL_TO_ORDER.labels(strategy, action).observe(seconds)
+
+
+def observe_middleware(name: str, seconds: float) -> None:
+    if _ENABLED:
+        MIDDLEWARE_SECONDS.labels(name).observe(seconds)
+
+
+# ════════════════════════════════════════════════════════════
+# 快取統計（抓取時讀取 CacheManager.all_stats）
+# ════════════════════════════════════════════════════════════
+
+
+class _CacheStatsCollector:
+    def __init__(self, stats_fn: Callable[[], dict[str, dict[str, Any]]]) -> None:
+        self._stats_fn = stats_fn
+
+    def describe(self) -> list:
+        return []
+
+    def collect(self) -> Iterator[Any]:
+        if not _ENABLED:
+            return
+        try:
+            stats = self._stats_fn()
+        except Exception as e:
+            logger.warning("讀取快取統計失敗: %s", e)
+            return
+        for name, help_text in (
+            ("hit_rate", "Cache hit ratio per namespace"),
+            ("hits", "Cache hits per namespace"),
+            ("misses", "Cache misses per namespace"),
+            ("evictions", "Cache evictions per namespace"),
+        ):
+            family = GaugeMetricFamily(f"stocksx_cache_{name}", help_text, labels=["namespace"])
+            for namespace, values in stats.items():
+                family.add_metric([namespace], float(values.get(name, 0)))
+            yield family
+
+
+_cache_collector: _CacheStatsCollector | None = None
+
+
+def register_cache_stats(stats_fn: Callable[[], dict[str, dict[str, Any]]]) -> None:
+    """
+    註冊快取統計來源（如 CacheManager.all_stats）；重複註冊時以最後一個為準。
+    命中率在 Prometheus 抓取時才計算，快取熱路徑無額外開銷。
+    """
+    global _cache_collector
+    if not _HAS_PROMETHEUS:
+        return
+    if _cache_collector is None:
+        _cache_collector = _CacheStatsCollector(stats_fn)
+        REGISTRY.register(_cache_collector)
+    else:
+        _cache_collector._stats_fn = stats_fn
+
+
+# ════════════════════════════════════════════════════════════
+# 輸出
+# ════════════════════════════════════════════════════════════
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Prometheus 文字格式（body, content_type），供 FastAPI /metrics 路由使用"""
+    if not _HAS_PROMETHEUS:
+        return b"# prometheus_client not installed\n", CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def start_metrics_server(port: int | None = None, addr: str = "0.0.0.0", max_tries: int = 1) -> int | None:
+    """
+    在獨立埠啟動 /metrics HTTP 服務（背景執行緒）
+
+    Args:
+        port: 埠號（預設讀 METRICS_PORT，未設定則不啟動）
+        addr: 綁定位址
+        max_tries: 埠被占用時依序嘗試的埠數（多進程 worker 各自綁定 port, port+1, ...）
+
+    Returns:
+        實際綁定的埠；未啟動時回傳 None
+    """
+    if not _ENABLED:
+        return None
+    if port is None:
+        env_port = os.getenv("METRICS_PORT")
+        if not env_port:
+            return None
+        port = int(env_port)
+    for candidate in range(port, port + max(1, max_tries)):
+        try:
+            start_http_server(candidate, addr=addr, registry=REGISTRY)
+        except OSError:
+            continue
+        logger.info("Prometheus 指標服務已啟動: http://%s:%d/metrics", addr, candidate)
+        return candidate
+    logger.warning("Prometheus 指標服務啟動失敗：埠 %d-%d 皆被占用", port, port + max(1, max_tries) - 1)
+    return None
@@ -7,6 +7,7 @@
 - 資產間相關性分析
 - 風險貢獻分解
 - 有效前沿計算
+- 批次 API：一次計算 (組合數 × 資產數) 權重矩陣的績效
 
 用法：
     from src.utils.portfolio import PortfolioAnalyzer
@@ -22,6 +23,8 @@ import math
 from dataclasses import dataclass, field
 from typing import Any
 
+import numpy as np
+
 
 @dataclass(slots=True)
 class PortfolioWeights:
@@ -60,75 +63,97 @@ class PortfolioMetrics:
         }
 
 
+def _returns_matrix(returns: dict[str, list[float]]) -> np.ndarray:
+    """資產報酬字典 → (N, T) 矩陣，截斷到最短序列長度."""
+    assets = list(returns.keys())
+    if not assets:
+        return np.empty((0, 0))
+    n_periods = min(len(returns[a]) for a in assets)
+    return np.array([np.asarray(returns[a][:n_periods], dtype=np.float64) for a in assets]).reshape(
+        len(assets), n_periods
+    )
+
+
+def _covariance_array(matrix: np.ndarray) -> np.ndarray:
+    """(N, T) 報酬矩陣 → (N, N) 樣本共變異數（ddof=1）."""
+    n_periods = matrix.shape[1]
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (centered @ centered.T) / (n_periods - 1)
+
+
 def _covariance_matrix(returns: dict[str, list[float]]) -> dict[str, dict[str, float]]:
     """計算共變異數矩陣."""
     assets = list(returns.keys())
-    n_periods = min(len(returns[a]) for a in assets)
-    n_assets = len(assets)
+    return _to_nested_dict(assets, _covariance_array(_returns_matrix(returns)))
+
 
-    means = {}
-    for a in assets:
-        r = returns[a][:n_periods]
-        means[a] = sum(r) / n_periods
+def _to_nested_dict(assets: list[str], matrix: np.ndarray) -> dict[str, dict[str, float]]:
+    """(N, N) 陣列 → 巢狀字典."""
+    rows = matrix.tolist()
+    return {a: dict(zip(assets, rows[i])) for i, a in enumerate(assets)}
 
-    cov = {}
-    for a in assets:
-        cov[a] = {}
-        for b in assets:
-            ra = returns[a][:n_periods]
-            rb = returns[b][:n_periods]
-            c = sum((ra[i] - means[a]) * (rb[i] - means[b]) for i in range(n_periods)) / (n_periods - 1)
-            cov[a][b] = c
 
-    return cov
+def _matrix_multiply_vector(matrix: np.ndarray, vector: np.ndarray) -> np.ndarray:
+    """矩陣乘向量（支援 (K, N) 批次權重）."""
+    return vector @ matrix.T
 
 
-def _matrix_multiply_vector(matrix: dict[str, dict[str, float]], vector: dict[str, float]) -> dict[str, float]:
-    """矩陣乘向量."""
-    result = {}
-    for row in matrix:
-        result[row] = sum(matrix[row][col] * vector.get(col, 0) for col in matrix[row])
-    return result
+def _dot_product(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """內積（最後一軸）."""
+    return np.einsum("...i,...i->...", a, b)
 
 
-def _dot_product(a: dict[str, float], b: dict[str, float]) -> float:
-    """內積."""
-    return sum(a.get(k, 0) * b.get(k, 0) for k in set(a) | set(b))
+def _max_drawdown(returns: np.ndarray) -> np.ndarray:
+    """(K, T) 報酬 → 每列最大回撤（正數，權益與峰值從 1.0 起算）."""
+    if returns.shape[-1] == 0:
+        return np.zeros(returns.shape[:-1])
+    equity = np.cumprod(1.0 + returns, axis=-1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=-1)
+    return ((peak - equity) / peak).max(axis=-1)
 
 
 class PortfolioAnalyzer:
-    """投資組合分析器."""
+    """投資組合分析器（NumPy 陣列實作）."""
 
     def __init__(self, asset_returns: dict[str, list[float]], risk_free_rate: float = 0.0) -> None:
         self._returns = asset_returns
         self._assets = list(asset_returns.keys())
         self._rf = risk_free_rate / 252  # 日化
-        self._cov = _covariance_matrix(asset_returns)
+        self._matrix = _returns_matrix(asset_returns)
+        self._cov_arr = _covariance_array(self._matrix)
+        self._cov: dict[str, dict[str, float]] | None = None
+
+    @property
+    def returns_matrix(self) -> np.ndarray:
+        """(資產數, 期數) 報酬矩陣（截斷到最短序列）."""
+        return self._matrix
+
+    @property
+    def covariance_array(self) -> np.ndarray:
+        """(資產數, 資產數) 共變異數陣列."""
+        return self._cov_arr
 
     @property
     def covariance_matrix(self) -> dict[str, dict[str, float]]:
+        if self._cov is None:
+            self._cov = _to_nested_dict(self._assets, self._cov_arr)
         return self._cov
 
     @property
     def correlation_matrix(self) -> dict[str, dict[str, float]]:
         """相關係數矩陣."""
-        corr = {}
-        for a in self._assets:
-            corr[a] = {}
-            std_a = math.sqrt(self._cov[a][a]) if self._cov[a][a] > 0 else 1e-10
-            for b in self._assets:
-                std_b = math.sqrt(self._cov[b][b]) if self._cov[b][b] > 0 else 1e-10
-                corr[a][b] = self._cov[a][b] / (std_a * std_b)
-        return corr
+        diag = np.diag(self._cov_arr)
+        std = np.where(diag > 0, np.sqrt(np.maximum(diag, 0.0)), 1e-10)
+        return _to_nested_dict(self._assets, self._cov_arr / np.outer(std, std))
 
     @property
     def mean_returns(self) -> dict[str, float]:
         """日均報酬."""
-        means = {}
-        for a in self._assets:
-            r = self._returns[a]
-            means[a] = sum(r) / len(r) if r else 0.0
-        return means
+        return {a: float(np.mean(r)) if len(r) else 0.0 for a, r in self._returns.items()}
+
+    def _weights(self, w: np.ndarray) -> PortfolioWeights:
+        return PortfolioWeights(assets=self._assets, weights=w.tolist())
 
     def equal_weight(self) -> PortfolioWeights:
         """等權重配置."""
@@ -137,65 +162,48 @@ class PortfolioAnalyzer:
 
     def inverse_volatility_weight(self) -> PortfolioWeights:
         """反波動率加權 — 波動率越低，權重越高."""
-        inv_vols = {}
-        total = 0.0
-        for a in self._assets:
-            vol = math.sqrt(self._cov[a][a])
-            inv_vols[a] = 1.0 / vol if vol > 1e-10 else 1.0
-            total += inv_vols[a]
-
-        weights = [inv_vols[a] / total for a in self._assets]
-        return PortfolioWeights(assets=self._assets, weights=weights)
+        vol = np.sqrt(np.diag(self._cov_arr))
+        inv_vols = np.where(vol > 1e-10, 1.0 / np.where(vol > 1e-10, vol, 1.0), 1.0)
+        return self._weights(inv_vols / inv_vols.sum())
 
     def risk_parity_weight(self, max_iter: int = 100, tol: float = 1e-8) -> PortfolioWeights:
         """
         風險平價 — 每個資產對總風險的貢獻相等.
-        使用迭代法求解.
+        使用迭代法求解：相鄰兩次權重的 L1 差 < tol 即停止，否則回傳第 max_iter 次迭代的權重.
+
+        資產間存在強負相關時比例調整可能不收斂而持續振盪，此時回傳的權重對浮點捨入極為敏感，
+        與求和順序不同的實作（包括舊版以 set 順序求和的純 Python 版）在 max_iter 次後可能相差甚遠；
+        停止條件與每一步的更新公式相同.
         """
         n = len(self._assets)
         if n == 0:
             return PortfolioWeights(assets=[], weights=[])
 
         # 初始權重：等權重
-        w = {a: 1.0 / n for a in self._assets}
+        w = np.full(n, 1.0 / n)
 
         for _ in range(max_iter):
             # 計算各資產邊際風險貢獻
-            cov_w = _matrix_multiply_vector(self._cov, w)
-            port_vol = math.sqrt(_dot_product(w, cov_w))
+            cov_w = _matrix_multiply_vector(self._cov_arr, w)
+            port_vol = math.sqrt(float(_dot_product(w, cov_w)))
             if port_vol < 1e-10:
                 break
 
-            # 風險貢獻
-            rc = {}
-            for a in self._assets:
-                rc[a] = w[a] * cov_w[a] / port_vol
-
-            # 目標：每個資產風險貢獻 = 總風險 / N
+            # 風險貢獻；目標：每個資產風險貢獻 = 總風險 / N
+            rc = w * cov_w / port_vol
             target_rc = port_vol / n
 
-            # 更新權重（比例調整）
-            new_w = {}
-            total_w = 0.0
-            for a in self._assets:
-                if rc[a] > 1e-10:
-                    new_w[a] = w[a] * (target_rc / rc[a])
-                else:
-                    new_w[a] = w[a]
-                total_w += new_w[a]
-
-            # 正規化
-            for a in self._assets:
-                new_w[a] /= total_w
+            # 更新權重（比例調整）並正規化
+            new_w = np.where(rc > 1e-10, w * target_rc / np.where(rc > 1e-10, rc, 1.0), w)
+            new_w /= new_w.sum()
 
             # 收斂檢查
-            diff = sum(abs(new_w[a] - w[a]) for a in self._assets)
+            diff = float(np.abs(new_w - w).sum())
             w = new_w
             if diff < tol:
                 break
 
-        weights = [w[a] for a in self._assets]
-        return PortfolioWeights(assets=self._assets, weights=weights)
+        return self._weights(w)
 
     def min_variance_weight(self, max_iter: int = 200, learning_rate: float = 0.01) -> PortfolioWeights:
         """
@@ -206,89 +214,81 @@ class PortfolioAnalyzer:
         if n == 0:
             return PortfolioWeights(assets=[], weights=[])
 
-        w = {a: 1.0 / n for a in self._assets}
+        w = np.full(n, 1.0 / n)
 
         for _ in range(max_iter):
-            cov_w = _matrix_multiply_vector(self._cov, w)
-
             # 梯度 = 2 * Σw
-            grad = {a: 2 * cov_w[a] for a in self._assets}
-
-            # 梯度下降
-            new_w = {a: w[a] - learning_rate * grad[a] for a in self._assets}
+            grad = 2 * _matrix_multiply_vector(self._cov_arr, w)
 
-            # 投影到 simplex（非負 + 和為1）
-            new_w = {a: max(0.001, new_w[a]) for a in self._assets}
-            total = sum(new_w.values())
-            new_w = {a: new_w[a] / total for a in self._assets}
+            # 梯度下降後投影到 simplex（非負 + 和為1）
+            new_w = np.maximum(0.001, w - learning_rate * grad)
+            new_w /= new_w.sum()
 
             # 收斂檢查
-            diff = sum(abs(new_w[a] - w[a]) for a in self._assets)
+            diff = float(np.abs(new_w - w).sum())
             w = new_w
             if diff < 1e-8:
                 break
 
-        weights = [w[a] for a in self._assets]
-        return PortfolioWeights(assets=self._assets, weights=weights)
+        return self._weights(w)
 
     def portfolio_variance(self, weights: list[float]) -> float:
         """計算投資組合變異數."""
-        w = {a: weights[i] for i, a in enumerate(self._assets)}
-        cov_w = _matrix_multiply_vector(self._cov, w)
-        return _dot_product(w, cov_w)
+        w = np.asarray(weights, dtype=np.float64)
+        return float(_dot_product(w, _matrix_multiply_vector(self._cov_arr, w)))
 
-    def portfolio_metrics(self, weights: list[float]) -> PortfolioMetrics:
-        """計算投資組合績效指標."""
-        w = {a: weights[i] for i, a in enumerate(self._assets)}
-        n_periods = min(len(self._returns[a]) for a in self._assets)
+    def batch_portfolio_metrics(self, weights: Any) -> dict[str, np.ndarray]:
+        """
+        批次計算多組權重的績效指標.
+
+        Args:
+            weights: (K, N) 權重矩陣，欄順序與資產順序一致
+
+        Returns:
+            {"annual_return", "annual_volatility", "sharpe_ratio", "max_drawdown",
+             "diversification_ratio", "risk_contributions"}；前五項為 (K,)，
+            風險貢獻為 (K, N)
+        """
+        w = np.atleast_2d(np.asarray(weights, dtype=np.float64))
+        port_returns = w @ self._matrix  # (K, T)
+        n_periods = port_returns.shape[1]
 
-        # 投資組合日報酬
-        port_returns = []
-        for t in range(n_periods):
-            r = sum(w[a] * self._returns[a][t] for a in self._assets)
-            port_returns.append(r)
+        mean_r = port_returns.mean(axis=1) if n_periods else np.zeros(len(w))
+        std_r = port_returns.std(axis=1, ddof=1) if n_periods > 1 else np.zeros(len(w))
+        safe_std = np.where(std_r > 0, std_r, 1.0)
 
-        if not port_returns:
+        cov_w = _matrix_multiply_vector(self._cov_arr, w)
+        port_vol = np.sqrt(np.maximum(_dot_product(w, cov_w), 0.0))
+        safe_vol = np.where(port_vol > 1e-10, port_vol, 1.0)
+        risk_contributions = np.where((port_vol > 1e-10)[:, None], w * cov_w / safe_vol[:, None], np.nan)
+
+        weighted_vols = w @ np.sqrt(np.diag(self._cov_arr))
+        div_ratio = np.where(port_vol > 0, weighted_vols / np.where(port_vol > 0, port_vol, 1.0), 1.0)
+
+        return {
+            "annual_return": mean_r * 252,
+            "annual_volatility": std_r * math.sqrt(252),
+            "sharpe_ratio": np.where(std_r > 0, (mean_r - self._rf) / safe_std * math.sqrt(252), 0.0),
+            "max_drawdown": _max_drawdown(port_returns),
+            "diversification_ratio": div_ratio,
+            "risk_contributions": risk_contributions,
+        }
+
+    def portfolio_metrics(self, weights: list[float]) -> PortfolioMetrics:
+        """計算投資組合績效指標."""
+        if not self._assets or self._matrix.shape[1] == 0:
             return PortfolioMetrics()
 
-        mean_r = sum(port_returns) / len(port_returns)
-        var_r = sum((r - mean_r) ** 2 for r in port_returns) / (len(port_returns) - 1)
-        std_r = math.sqrt(var_r)
-
-        annual_return = mean_r * 252
-        annual_vol = std_r * math.sqrt(252)
-        sharpe = (mean_r - self._rf) / std_r * math.sqrt(252) if std_r > 0 else 0.0
-
-        # 最大回撤
-        equity = 1.0
-        peak = 1.0
-        max_dd = 0.0
-        for r in port_returns:
-            equity *= 1 + r
-            if equity > peak:
-                peak = equity
-            dd = (peak - equity) / peak
-            if dd > max_dd:
-                max_dd = dd
-
-        # 風險貢獻
-        cov_w = _matrix_multiply_vector(self._cov, w)
-        port_vol = math.sqrt(_dot_product(w, cov_w))
-        risk_contributions = {}
-        if port_vol > 1e-10:
-            for a in self._assets:
-                risk_contributions[a] = (w[a] * cov_w[a]) / port_vol
-
-        # 分散化比率
-        weighted_vols = sum(w[a] * math.sqrt(self._cov[a][a]) for a in self._assets)
-        div_ratio = weighted_vols / port_vol if port_vol > 0 else 1.0
+        m = self.batch_portfolio_metrics([weights])
+        rc = m["risk_contributions"][0]
+        risk_contributions = {} if np.isnan(rc).all() else dict(zip(self._assets, rc.tolist()))
 
         return PortfolioMetrics(
-            annual_return=annual_return,
-            annual_volatility=annual_vol,
-            sharpe_ratio=sharpe,
-            max_drawdown=max_dd,
-            diversification_ratio=div_ratio,
+            annual_return=float(m["annual_return"][0]),
+            annual_volatility=float(m["annual_volatility"][0]),
+            sharpe_ratio=float(m["sharpe_ratio"][0]),
+            max_drawdown=float(m["max_drawdown"][0]),
+            diversification_ratio=float(m["diversification_ratio"][0]),
             risk_contributions=risk_contributions,
         )
 
@@ -297,35 +297,34 @@ class PortfolioAnalyzer:
         計算有效前沿 — 簡化版（僅兩個資產時精確，多資產時近似）.
         Returns: [{"return": r, "volatility": v, "weights": {...}}, ...]
         """
-        results = []
-
         # 使用最小方差和最大報酬的兩個極端
-        mv = self.min_variance_weight()
-        mv_metrics = self.portfolio_metrics(mv.weights)
+        mv = np.asarray(self.min_variance_weight().weights)
 
         # 最大報酬（全部配置到最高報酬資產）
         means = self.mean_returns
         best_asset = max(means, key=means.get)
-        max_r_weights = [1.0 if a == best_asset else 0.0 for a in self._assets]
-        max_r_metrics = self.portfolio_metrics(max_r_weights)
-
-        # 在兩個極端之間插值
-        for i in range(n_points):
-            t = i / (n_points - 1) if n_points > 1 else 0
-            interp_weights = [(1 - t) * mv.weights[j] + t * max_r_weights[j] for j in range(len(self._assets))]
-            # 正規化
-            total = sum(interp_weights)
-            if total > 0:
-                interp_weights = [w / total for w in interp_weights]
-
-            m = self.portfolio_metrics(interp_weights)
-            results.append(
-                {
-                    "return": m.annual_return,
-                    "volatility": m.annual_volatility,
-                    "sharpe": m.sharpe_ratio,
-                    "weights": dict(zip(self._assets, interp_weights)),
-                }
-            )
-
-        return results
+        max_r = np.array([1.0 if a == best_asset else 0.0 for a in self._assets])
+
+        # 在兩個極端之間插值，一次批次計算
+        t = np.linspace(0.0, 1.0, n_points) if n_points > 1 else np.zeros(1)
+        grid = (1 - t)[:, None] * mv + t[:, None] * max_r
+        totals = grid.sum(axis=1, keepdims=True)
+        grid = np.where(totals > 0, grid / np.where(totals > 0, totals, 1.0), grid)
+
+        m = self.batch_portfolio_metrics(grid)
+        return [
+            {
+                "return": float(m["annual_return"][k]),
+                "volatility": float(m["annual_volatility"][k]),
+                "sharpe": float(m["sharpe_ratio"][k]),
+                "weights": dict(zip(self._assets, grid[k].tolist())),
+            }
+            for k in range(len(grid))
+        ]
+
+
+def batch_portfolio_metrics(
+    asset_returns: dict[str, list[float]], weights: Any, risk_free_rate: float = 0.0
+) -> dict[str, np.ndarray]:
+    """批次計算多組權重的投資組合指標（PortfolioAnalyzer.batch_portfolio_metrics 的便捷入口）."""
+    return PortfolioAnalyzer(asset_returns, risk_free_rate).batch_portfolio_metrics(weights)
@@ -4,15 +4,18 @@
 支援：Markowitz 均值-方差、風險平價、Black-Litterman、有效前沿
 
 v6.0 新增功能
+前沿、最小方差與最大夏普由 src.utils.frontier 引擎求解（矩估計快取、解析解優先、熱啟動）
 """
 
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Any
 
 import numpy as np
 
+from .frontier import FrontierEngine, estimate_moments
+
 
 @dataclass
 class PortfolioResult:
@@ -22,7 +25,18 @@ class PortfolioResult:
     expected_return: float
     volatility: float
     sharpe_ratio: float
-    allocation: dict[str, float]  # 每個資產的金額分配
+    allocation: dict[str, float] = field(default_factory=dict)  # 每個資產的金額分配
+    risk_contributions: dict[str, float] = field(default_factory=dict)  # 風險貢獻占比
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "weights": {k: round(v, 4) for k, v in self.weights.items()},
+            "expected_return_pct": round(self.expected_return * 100, 2),
+            "volatility_pct": round(self.volatility * 100, 2),
+            "sharpe_ratio": round(self.sharpe_ratio, 4),
+            "risk_contributions_pct": {k: round(v * 100, 2) for k, v in self.risk_contributions.items()},
+            "allocation": self.allocation,
+        }
 
 
 def _annualize_return(returns: np.ndarray, periods_per_year: int = 252) -> float:
@@ -69,7 +83,7 @@ def mean_variance_optimize(
 
     # 年化統計量
     mean_returns = np.array([_annualize_return(ret_matrix[:, i]) for i in range(n)])
-    cov_matrix = np.cov(ret_matrix, rowvar=False) * 252  # 年化協方差
+    cov_matrix = estimate_moments(ret_matrix).cov  # 年化協方差（快取）
 
     # 簡化版優化：使用解析解（最大夏普）
     daily_rf = risk_free_rate / 252
@@ -122,7 +136,7 @@ def risk_parity(
     min_len = min(len(r) for r in ret_arrays)
     ret_matrix = np.column_stack([r[:min_len] for r in ret_arrays])
     mean_returns = np.array([_annualize_return(ret_matrix[:, i]) for i in range(n)])
-    cov_matrix = np.cov(ret_matrix, rowvar=False) * 252
+    cov_matrix = estimate_moments(ret_matrix).cov
 
     # 風險平價迭代求解
     w = np.ones(n) / n
@@ -170,33 +184,97 @@ def efficient_frontier(
     min_len = min(len(r) for r in ret_arrays)
     ret_matrix = np.column_stack([r[:min_len] for r in ret_arrays])
     mean_returns = np.array([_annualize_return(ret_matrix[:, i]) for i in range(n)])
-    cov_matrix = np.cov(ret_matrix, rowvar=False) * 252
-
-    # 隨機權重組合生成有效前沿近似
-    results = []
-    rng = np.random.default_rng(42)
-    for _ in range(n_points * 100):
-        w = rng.dirichlet(np.ones(n))
-        if w.max() > max_weight:
-            continue
-        port_ret = float(w @ mean_returns)
-        port_vol = float(np.sqrt(w @ cov_matrix @ w))
-        sharpe = (port_ret - risk_free_rate) / port_vol if port_vol > 0 else 0
-        results.append(
-            {
-                "return": round(port_ret, 4),
-                "volatility": round(port_vol, 4),
-                "sharpe": round(sharpe, 4),
-                "weights": {assets[i]: round(float(w[i]), 4) for i in range(n)},
-            }
+    cov_matrix = estimate_moments(ret_matrix).cov
+
+    # 約束下逐點求解（解析解優先，SLSQP 自鄰點熱啟動）
+    try:
+        engine = FrontierEngine(
+            mean_returns, cov_matrix, asset_names=assets, max_weight=max_weight, risk_free_rate=risk_free_rate
         )
+    except ValueError:
+        return []  # 權重上限無法滿足 Σw = 1
+
+    return [
+        {
+            "return": round(p["return"], 4),
+            "volatility": round(p["volatility"], 4),
+            "sharpe": round(p["sharpe"], 4),
+            "weights": {a: round(w, 4) for a, w in p["weights"].items()},
+        }
+        for p in engine.frontier(n_points).to_records()
+    ]
+
+
+class PortfolioOptimizer:
+    """
+    投資組合優化器（陣列輸入）。
+
+    預期報酬為算術平均年化，共變異數依報酬內容快取；
+    權重約束為 Σw = 1、0 <= w <= max_weight。
+    """
+
+    def __init__(
+        self,
+        returns: Any,
+        asset_names: list[str] | None = None,
+        risk_free_rate: float = 0.04,
+        max_weight: float = 1.0,
+        periods_per_year: int = 252,
+        shrinkage: str | float | None = None,
+    ) -> None:
+        """
+        Args:
+            returns: (T, N) 報酬陣列（單一資產可為 1-D）、DataFrame 或 {資產: 報酬序列}
+            asset_names: 資產名稱
+            risk_free_rate: 無風險利率（年化）
+            max_weight: 單一資產最大權重
+            periods_per_year: 年化期數
+            shrinkage: 共變異數收縮（None / "ledoit_wolf" / 0~1）
+        """
+        self.engine = FrontierEngine.from_returns(
+            returns,
+            asset_names=asset_names,
+            periods_per_year=periods_per_year,
+            shrinkage=shrinkage,
+            max_weight=max_weight,
+            risk_free_rate=risk_free_rate,
+        )
+        self.assets = self.engine.asset_names
+
+    def _result(self, weights: np.ndarray) -> PortfolioResult:
+        engine = self.engine
+        ret, vol, sharpe = engine.evaluate(weights)
+        variance = float(weights @ engine.cov @ weights)
+        contrib = weights * (engine.cov @ weights) / variance if variance > 0 else np.zeros_like(weights)
+        return PortfolioResult(
+            weights=dict(zip(self.assets, weights.tolist())),
+            expected_return=float(ret[0]),
+            volatility=float(vol[0]),
+            sharpe_ratio=float(sharpe[0]),
+            risk_contributions=dict(zip(self.assets, contrib.tolist())),
+        )
+
+    def equal_weight(self) -> PortfolioResult:
+        """等權重配置。"""
+        n = self.engine.n_assets
+        return self._result(np.full(n, 1.0 / n))
+
+    def min_variance(self) -> PortfolioResult:
+        """最小方差組合。"""
+        return self._result(self.engine.min_variance().weights)
+
+    def max_sharpe(self) -> PortfolioResult:
+        """最大夏普組合。"""
+        return self._result(self.engine.max_sharpe().weights)
+
+    def risk_parity(self) -> PortfolioResult:
+        """等風險貢獻組合。"""
+        return self._result(self.engine.risk_parity().weights)
 
-    # 按波動率排序並取 n_points 個均勻分佈的點
-    results.sort(key=lambda x: x["volatility"])
-    if len(results) <= n_points:
-        return results
-    step = len(results) // n_points
-    return results[::step][:n_points]
+    def efficient_frontier(self, n_points: int = 50) -> list[PortfolioResult]:
+        """有效前沿（由最小方差組合到最高可達報酬，波動率遞增）。"""
+        frontier = self.engine.frontier(n_points)
+        return [self._result(w) for w in frontier.weights]
 
 
 def calculate_var(
@@ -0,0 +1,448 @@
+"""
+取樣剖析器 — 找出慢回測 / 優化任務中佔用時間的策略函式與引擎行
+
+背景執行緒每隔 interval 秒以 sys._current_frames() 擷取所有執行緒的呼叫堆疊並計數，
+不使用 sys.setprofile，因此被剖析的程式幾乎不受影響（預設 5ms 取樣，開銷約 1–3%）。
+執行緒池的 worker 一併取樣；進程池的每個任務以 sampled() 包裝，在子進程內各自取樣後由 collect() 合併。
+
+啟用方式：函式參數 profile=True，或環境變數 STOCKSX_PROFILE=1（profile=None 時讀取）。
+輸出：Profile.summary() 含前 N 熱點函式與摺疊堆疊，附在 BacktestResult.profile / 任務結果 / BacktestRecord；
+Profile.save(path) 寫出 speedscope（.json）或 flamegraph.pl 摺疊堆疊（其他副檔名）。
+
+用法：
+    with profiling(True) as prof:
+        find_optimal_global(...)
+    print(prof.profile.hot_functions(10))
+"""
+
+from __future__ import annotations
+
+import functools
+import inspect
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+DEFAULT_INTERVAL = 0.005
+
+DEFAULT_TOP = 20
+
+# 葉節點落在這些模組時視為等待（執行緒池閒置、鎖、佇列），不計入熱點
+_IDLE_MODULES = frozenset(
+    {
+        "threading",
+        "queue",
+        "selectors",
+        "concurrent.futures._base",
+        "concurrent.futures.thread",
+        "concurrent.futures.process",
+        "multiprocessing.connection",
+        "multiprocessing.queues",
+        "multiprocessing.pool",
+    }
+)
+
+
+def profiling_requested(profile: bool | None = None) -> bool:
+    """profile 為 None 時依環境變數 STOCKSX_PROFILE 決定"""
+    if profile is not None:
+        return bool(profile)
+    return os.getenv("STOCKSX_PROFILE", "").lower() in ("1", "true", "yes")
+
+
+# ════════════════════════════════════════════════════════════
+# 剖析結果
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class Profile:
+    """
+    取樣結果（可跨進程合併）
+
+    stacks 的 key 為以 ";" 串接的呼叫堆疊（根 → 葉），葉節點附行號（如 "src.backtest.engine._run_backtest_on_rows:233"）。
+    """
+
+    stacks: dict[str, int] = field(default_factory=dict)
+    interval: float = DEFAULT_INTERVAL
+    duration: float = 0.0
+    idle_samples: int = 0
+    pids: list[int] = field(default_factory=list)
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def merge(self, other: Profile) -> Profile:
+        """合併另一份結果（就地），回傳自己；duration 取最大值（各 worker 並行執行）"""
+        for stack, count in other.stacks.items():
+            self.stacks[stack] = self.stacks.get(stack, 0) + count
+        self.idle_samples += other.idle_samples
+        self.duration = max(self.duration, other.duration)
+        self.pids = sorted(set(self.pids) | set(other.pids))
+        return self
+
+    def hot_functions(self, n: int = DEFAULT_TOP) -> list[dict[str, Any]]:
+        """
+        前 n 個熱點，依自身樣本數排序
+
+        Returns:
+            [{function, line, self, total, self_pct, total_pct}, ...]；
+            self 以葉節點所在行計，total 為函式出現在堆疊中的樣本數（遞迴只計一次）
+        """
+        total_samples = self.samples
+        if not total_samples:
+            return []
+        self_counts: dict[str, int] = defaultdict(int)
+        total_counts: dict[str, int] = defaultdict(int)
+        for stack, count in self.stacks.items():
+            frames = stack.split(";")
+            self_counts[frames[-1]] += count
+            for func in {_strip_line(f) for f in frames}:
+                total_counts[func] += count
+        ranked = sorted(self_counts.items(), key=lambda kv: kv[1], reverse=True)[:n]
+        out = []
+        for leaf, count in ranked:
+            func = _strip_line(leaf)
+            out.append(
+                {
+                    "function": func,
+                    "line": leaf[len(func) + 1 :] or None,
+                    "self": count,
+                    "total": total_counts[func],
+                    "self_pct": round(100 * count / total_samples, 2),
+                    "total_pct": round(100 * total_counts[func] / total_samples, 2),
+                }
+            )
+        return out
+
+    def to_collapsed(self) -> str:
+        """flamegraph.pl / speedscope 可讀的摺疊堆疊（每行 "a;b;c 樣本數"）"""
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(self.stacks.items()))
+
+    def to_speedscope(self, name: str = "stocksx") -> dict[str, Any]:
+        """speedscope 的 sampled profile 格式（權重單位為秒）"""
+        frames: list[dict[str, str]] = []
+        index: dict[str, int] = {}
+        samples: list[list[int]] = []
+        weights: list[float] = []
+        for stack, count in sorted(self.stacks.items()):
+            ids = []
+            for frame in stack.split(";"):
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame})
+                ids.append(index[frame])
+            samples.append(ids)
+            weights.append(round(count * self.interval, 6))
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": name,
+                    "unit": "seconds",
+                    "startValue": 0,
+                    "endValue": round(sum(weights), 6),
+                    "samples": samples,
+                    "weights": weights,
+                }
+            ],
+            "name": name,
+            "exporter": "stocksx.profiler",
+        }
+
+    def save(self, path: str) -> None:
+        """副檔名 .json 寫 speedscope，其餘寫摺疊堆疊"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".json"):
+                json.dump(self.to_speedscope(os.path.basename(path)), f)
+            else:
+                f.write(self.to_collapsed())
+
+    def summary(self, top: int = DEFAULT_TOP) -> dict[str, Any]:
+        """附在任務結果上的摘要（可 JSON 序列化）"""
+        return {
+            "samples": self.samples,
+            "idle_samples": self.idle_samples,
+            "interval_s": self.interval,
+            "duration_s": round(self.duration, 4),
+            "workers": len(self.pids),
+            "hot_functions": self.hot_functions(top),
+            "collapsed": self.to_collapsed(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "stacks": self.stacks,
+            "interval": self.interval,
+            "duration": self.duration,
+            "idle_samples": self.idle_samples,
+            "pids": self.pids,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Profile:
+        return cls(
+            stacks=dict(d.get("stacks", {})),
+            interval=d.get("interval", DEFAULT_INTERVAL),
+            duration=d.get("duration", 0.0),
+            idle_samples=d.get("idle_samples", 0),
+            pids=list(d.get("pids", [])),
+        )
+
+
+def _strip_line(frame: str) -> str:
+    head, sep, tail = frame.rpartition(":")
+    return head if sep and tail.isdigit() else frame
+
+
+# ════════════════════════════════════════════════════════════
+# 取樣器
+# ════════════════════════════════════════════════════════════
+
+
+def _frame_label(frame: Any) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", "?")
+    return f"{module}.{getattr(code, 'co_qualname', code.co_name)}"
+
+
+class SamplingProfiler:
+    """
+    背景執行緒取樣器
+
+    Args:
+        interval: 取樣間隔（秒）
+        max_depth: 每個堆疊保留的最深層數（超過時截掉根端）
+        linger: 超過此秒數未 drain() 時自行停止（進程池 worker 用，避免任務結束後持續取樣）
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_depth: int = 64, linger: float | None = None) -> None:
+        self.interval = interval
+        self.max_depth = max_depth
+        self.linger = linger
+        self.profile = Profile(interval=interval, pids=[os.getpid()])
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._started = 0.0
+        self._drained = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> SamplingProfiler:
+        self._started = self._drained = time.perf_counter()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stocksx-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Profile:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self.profile.duration = time.perf_counter() - self._started
+        return self.profile
+
+    def drain(self) -> Profile:
+        """取出目前累積的結果並從零重新累積（取樣不中斷）"""
+        now = time.perf_counter()
+        fresh = Profile(interval=self.interval, pids=[os.getpid()])
+        with self._lock:
+            drained, self.profile = self.profile, fresh
+        drained.duration = now - self._drained
+        self._drained = now
+        return drained
+
+    def merge(self, other: Profile) -> None:
+        """併入其他進程的結果（與取樣執行緒互斥）"""
+        with self._lock:
+            self.profile.merge(other)
+
+    def __enter__(self) -> SamplingProfiler:
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.linger is not None and time.perf_counter() - self._drained > self.linger:
+                break
+            frames = sys._current_frames()
+            with self._lock:
+                profile = self.profile
+                for tid, frame in frames.items():
+                    if tid == own:
+                        continue
+                    if frame.f_globals.get("__name__") in _IDLE_MODULES:
+                        profile.idle_samples += 1
+                        continue
+                    key = self._stack_key(frame)
+                    profile.stacks[key] = profile.stacks.get(key, 0) + 1
+            del frames
+
+    def _stack_key(self, frame: Any) -> str:
+        leaf = f"{_frame_label(frame)}:{frame.f_lineno}"
+        labels = [leaf]
+        frame = frame.f_back
+        while frame is not None and len(labels) < self.max_depth:
+            labels.append(_frame_label(frame))
+            frame = frame.f_back
+        labels.reverse()
+        return ";".join(labels)
+
+
+# ════════════════════════════════════════════════════════════
+# 啟用 / 跨進程合併
+# ════════════════════════════════════════════════════════════
+
+# 目前進程內正在執行的取樣器（巢狀呼叫不重複取樣）
+_active: SamplingProfiler | None = None
+
+
+@contextmanager
+def profiling(profile: bool | None = None, interval: float = DEFAULT_INTERVAL) -> Iterator[SamplingProfiler | None]:
+    """
+    依 profile（或 STOCKSX_PROFILE）啟用取樣；未啟用或外層已在取樣時 yield None
+    """
+    global _active
+    if _active is not None or not profiling_requested(profile):
+        yield None
+        return
+    sampler = SamplingProfiler(interval=interval)
+    _active = sampler
+    sampler.start()
+    try:
+        yield sampler
+    finally:
+        sampler.stop()
+        _active = None
+
+
+def attach_summary(result: Any, summary: dict[str, Any]) -> None:
+    """預設附加方式：dict 設 "profile" 鍵，具 profile 屬性的物件（BacktestResult）設屬性；tuple 取第一個元素"""
+    target = result[0] if isinstance(result, tuple) and result else result
+    if isinstance(target, dict):
+        target["profile"] = summary
+    elif target is not None and hasattr(target, "profile"):
+        target.profile = summary
+
+
+def profiled(attach: Callable[[Any, dict[str, Any]], None] = attach_summary) -> Callable[[F], F]:
+    """
+    裝飾器：依呼叫端的 profile 參數（關鍵字或位置皆可，或 STOCKSX_PROFILE）取樣整個函式，
+    結束後以 attach(結果, 摘要) 附加
+
+    被裝飾函式需在簽名中宣告 profile: bool | None = None 以供文件與型別檢查，函式本體不需使用。
+    """
+
+    def decorator(func: F) -> F:
+        signature = inspect.signature(func)
+
+        def requested(args: tuple, kwargs: dict[str, Any]) -> bool | None:
+            if "profile" not in signature.parameters:
+                return kwargs.get("profile")
+            try:
+                return signature.bind_partial(*args, **kwargs).arguments.get("profile")
+            except TypeError:
+                return None  # 參數不合法，交由 func 本身拋出
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with profiling(requested(args, kwargs)) as sampler:
+                result = func(*args, **kwargs)
+            if sampler is not None and result is not None:
+                try:
+                    attach(result, sampler.profile.summary())
+                except Exception as e:
+                    logger.warning("附加剖析結果失敗: %s", e)
+            return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+# 進程池 worker 內常駐的取樣器：跨任務持續取樣，每個任務結束時 drain 出增量
+# （逐任務啟停會漏掉短於取樣間隔的任務）
+_worker_sampler: SamplingProfiler | None = None
+
+WORKER_LINGER = 30.0
+
+
+def _worker_profiler(interval: float) -> SamplingProfiler:
+    global _worker_sampler
+    sampler = _worker_sampler
+    if sampler is None or not sampler.running or sampler.profile.pids != [os.getpid()]:
+        sampler = SamplingProfiler(interval=interval, linger=WORKER_LINGER).start()
+        _worker_sampler = sampler
+    return sampler
+
+
+class _SampledCall:
+    """可 pickle 的包裝：在 worker 進程內執行任務，回傳 (結果, 該 worker 自上次回傳後的 Profile.to_dict())"""
+
+    __slots__ = ("fn", "interval")
+
+    def __init__(self, fn: Callable[..., Any], interval: float) -> None:
+        self.fn = fn
+        self.interval = interval
+
+    def __getstate__(self) -> tuple:
+        return self.fn, self.interval
+
+    def __setstate__(self, state: tuple) -> None:
+        self.fn, self.interval = state
+
+    def __call__(self, *args: Any, **kwargs: Any) -> tuple[Any, dict[str, Any]]:
+        global _active
+        outer = _active
+        sampler = _worker_profiler(self.interval)
+        _active = sampler
+        try:
+            result = self.fn(*args, **kwargs)
+        finally:
+            _active = outer
+        return result, sampler.drain().to_dict()
+
+
+def sampled(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    包裝要送進進程池的函式：目前有取樣器時在子進程內各自取樣，否則原樣回傳 fn
+
+    回傳值需交給 collect() 拆回原結果並合併剖析資料。
+    """
+    if _active is None:
+        return fn
+    return _SampledCall(fn, _active.interval)
+
+
+def collect(results: Iterable[Any]) -> list[Any]:
+    """拆開 sampled() 任務的回傳值並合併至目前取樣器；未取樣時原樣轉為 list"""
+    if _active is None:
+        return list(results)
+    out = []
+    for result, profile in results:
+        _active.merge(Profile.from_dict(profile))
+        out.append(result)
+    return out
@@ -7,6 +7,7 @@
 - 規則引擎（基於波動率 + 動量組合）
 - 狀態轉移概率矩陣
 - 狀態持續時間統計
+- O(n) 滾動特徵（累積和），線上追蹤（增量特徵 / HMM 前向濾波）
 
 狀態分類：
 - Bull Market (牛市): 高動量、低波動
@@ -20,11 +21,15 @@
     detector = RegimeDetector(returns)
     regimes = detector.detect()
     current = detector.current_regime()
+
+    tracker = detector.online("kmeans")  # 沿用擬合結果
+    regime = tracker.update(new_return)
 """
 
 from __future__ import annotations
 
 import math
+from collections import deque
 from dataclasses import dataclass
 from enum import IntEnum
 from typing import Any
@@ -97,6 +102,317 @@ class RegimeResult:
         }
 
 
+# ════════════════════════════════════════════════════════════
+# 滾動特徵（O(n) 累積和）
+# ════════════════════════════════════════════════════════════
+
+
+def _window_sums(values: np.ndarray, lookback: int) -> np.ndarray:
+    """values[i - lookback : i] 的和，i = lookback..n-1."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    n = len(values)
+    return csum[lookback:n] - csum[: n - lookback]
+
+
+def rolling_features(returns: np.ndarray, lookback: int = 20, ann_factor: int = 252) -> tuple[np.ndarray, np.ndarray]:
+    """
+    滾動動量與年化波動率（第 i 根 K 線使用 returns[i - lookback : i]）.
+
+    動量以 log|1 + r| 累積和計算（另計零值與負值個數保留正負號），
+    波動率以去均值後的一、二階累積和計算滑動樣本方差（ddof=1），整體 O(n)。
+
+    Returns:
+        (momentum, volatility)，前 lookback 個值為 NaN
+    """
+    r = np.asarray(returns, dtype=np.float64).ravel()
+    n = len(r)
+    momentum = np.full(n, np.nan)
+    volatility = np.full(n, np.nan)
+    if lookback < 1 or n <= lookback:
+        return momentum, volatility
+
+    growth = 1.0 + r
+    is_zero = growth == 0
+    with np.errstate(divide="ignore"):
+        log_abs = np.where(is_zero, 0.0, np.log(np.abs(growth)))
+    log_sum = _window_sums(log_abs, lookback)
+    n_zero = _window_sums(is_zero.astype(np.float64), lookback)
+    n_neg = _window_sums((growth < 0).astype(np.float64), lookback)
+    negative = np.rint(n_neg) % 2 == 1
+    momentum[lookback:] = np.where(
+        n_zero > 0.5, -1.0, np.where(negative, -np.exp(log_sum) - 1.0, np.expm1(log_sum))
+    )
+
+    if lookback >= 2:
+        centered = r - r.mean()
+        s1 = _window_sums(centered, lookback)
+        s2 = _window_sums(centered * centered, lookback)
+        var = np.maximum((s2 - s1 * s1 / lookback) / (lookback - 1), 0.0)
+        volatility[lookback:] = np.sqrt(var) * math.sqrt(ann_factor)
+
+    return momentum, volatility
+
+
+# ════════════════════════════════════════════════════════════
+# 已擬合模型（可重複用於批次預測與線上更新）
+# ════════════════════════════════════════════════════════════
+
+
+def _assign_regimes(trend: np.ndarray, spread: np.ndarray) -> np.ndarray:
+    """
+    聚類 / 隱狀態 → Regime：最低波動為 LOW_VOL、最高為 HIGH_VOL，
+    其餘兩個按趨勢高低分為 BULL / BEAR.
+    """
+    k = len(trend)
+    sorted_by_spread = np.argsort(spread)
+    low, high = int(sorted_by_spread[0]), int(sorted_by_spread[-1])
+    remaining = [c for c in range(k) if c not in (low, high)]
+    if len(remaining) >= 2:
+        bull = remaining[0] if trend[remaining[0]] > trend[remaining[1]] else remaining[1]
+        bear = remaining[1] if bull == remaining[0] else remaining[0]
+    elif len(remaining) == 1:
+        bull = bear = remaining[0]
+    else:
+        bull, bear = 0, 1
+
+    mapping = np.full(k, Regime.LOW_VOL.value, dtype=int)
+    for cluster, regime in ((bull, Regime.BULL), (bear, Regime.BEAR), (high, Regime.HIGH_VOL), (low, Regime.LOW_VOL)):
+        if cluster < k:
+            mapping[cluster] = regime.value
+    return mapping
+
+
+@dataclass(slots=True)
+class RuleRegimeModel:
+    """規則引擎閾值（動量中位數、波動率 75 分位）."""
+
+    med_momentum: float
+    p75_volatility: float
+
+    def classify(self, momentum: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        mom = np.asarray(momentum, dtype=np.float64)
+        vol = np.asarray(volatility, dtype=np.float64)
+        regimes = np.select(
+            [vol > self.p75_volatility, mom > self.med_momentum, mom < -self.med_momentum],
+            [Regime.HIGH_VOL.value, Regime.BULL.value, Regime.BEAR.value],
+            default=Regime.LOW_VOL.value,
+        )
+        regimes[np.isnan(mom) | np.isnan(vol)] = Regime.LOW_VOL.value
+        return regimes
+
+
+@dataclass(slots=True)
+class KMeansRegimeModel:
+    """KMeans 質心（標準化空間）與聚類 → 狀態映射."""
+
+    mean: np.ndarray
+    std: np.ndarray
+    centroids: np.ndarray
+    cluster_to_regime: np.ndarray
+
+    def labels(self, momentum: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        x = (np.column_stack([momentum, volatility]) - self.mean) / self.std
+        dist = ((x[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return np.argmin(dist, axis=1)
+
+    def classify_one(self, momentum: float, volatility: float) -> int:
+        x = (np.array((momentum, volatility)) - self.mean) / self.std
+        return int(self.cluster_to_regime[int(np.argmin(((self.centroids - x) ** 2).sum(axis=1)))])
+
+    def classify(self, momentum: np.ndarray, volatility: np.ndarray) -> np.ndarray:
+        mom = np.atleast_1d(np.asarray(momentum, dtype=np.float64))
+        vol = np.atleast_1d(np.asarray(volatility, dtype=np.float64))
+        regimes = self.cluster_to_regime[self.labels(mom, vol)]
+        regimes[np.isnan(mom) | np.isnan(vol)] = Regime.LOW_VOL.value
+        return regimes
+
+
+def fit_kmeans(features: np.ndarray, k: int = 4, max_iter: int = 50, seed: int = 42) -> KMeansRegimeModel:
+    """
+    擬合 KMeans（特徵先標準化）.
+
+    Args:
+        features: (n, 2) [動量, 波動率]，不含 NaN
+    """
+    mean_f = np.mean(features, axis=0)
+    std_f = np.std(features, axis=0)
+    std_f[std_f == 0] = 1
+    x = (features - mean_f) / std_f
+
+    rng = np.random.default_rng(seed)
+    centroids = x[rng.choice(len(x), k, replace=False)]
+    for _ in range(max_iter):
+        labels = np.argmin(((x[:, None, :] - centroids[None, :, :]) ** 2).sum(axis=2), axis=1)
+        counts = np.bincount(labels, minlength=k)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, labels, x)
+        new_centroids = np.where(counts[:, None] > 0, sums / np.maximum(counts, 1)[:, None], centroids)
+        if np.allclose(centroids, new_centroids, atol=1e-6):
+            break
+        centroids = new_centroids
+
+    original = centroids * std_f + mean_f
+    return KMeansRegimeModel(
+        mean=mean_f,
+        std=std_f,
+        centroids=centroids,
+        cluster_to_regime=_assign_regimes(original[:, 0], original[:, 1]),
+    )
+
+
+class GaussianHMM:
+    """
+    一維高斯隱馬可夫模型（NumPy 實作）.
+
+    - fit：Baum-Welch（縮放前向-後向）
+    - predict：Viterbi 解碼
+    - filter / filter_step：前向濾波，線上每根 K 線 O(狀態數²)
+    """
+
+    def __init__(self, n_states: int = 4, n_iter: int = 100, tol: float = 1e-2, seed: int = 42) -> None:
+        self.n_states = n_states
+        self.n_iter = n_iter
+        self.tol = tol
+        self.seed = seed
+        self.startprob = np.full(n_states, 1.0 / n_states)
+        self.transmat = np.full((n_states, n_states), 1.0 / n_states)
+        self.means = np.zeros(n_states)
+        self.variances = np.ones(n_states)
+        self.log_likelihood = -np.inf
+        self.n_iter_run = 0
+        self._prepare()
+
+    @classmethod
+    def from_params(
+        cls, startprob: np.ndarray, transmat: np.ndarray, means: np.ndarray, variances: np.ndarray
+    ) -> GaussianHMM:
+        """由已知參數建立（例如 hmmlearn 擬合結果）."""
+        model = cls(n_states=len(means))
+        model.startprob = np.asarray(startprob, dtype=np.float64).ravel()
+        model.transmat = np.asarray(transmat, dtype=np.float64)
+        model.means = np.asarray(means, dtype=np.float64).ravel()
+        model.variances = np.asarray(variances, dtype=np.float64).ravel()
+        model._prepare()
+        return model
+
+    def _log_emission(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float64).reshape(-1, 1)
+        return -0.5 * (np.log(2 * np.pi * self.variances) + (x - self.means) ** 2 / self.variances)
+
+    def _prepare(self) -> None:
+        """預先計算單步濾波用的發射常數項（參數變更後呼叫）."""
+        self._log_norm = -0.5 * np.log(2 * np.pi * self.variances)
+        self._half_inv_var = 0.5 / self.variances
+
+    def _init_params(self, x: np.ndarray) -> None:
+        k = self.n_states
+        order = np.sort(x)
+        groups = np.array_split(order, k)
+        floor = max(float(np.var(x)) * 1e-3, 1e-12)
+        self.means = np.array([g.mean() if len(g) else 0.0 for g in groups])
+        self.variances = np.array([max(float(g.var()), floor) if len(g) > 1 else floor for g in groups])
+        rng = np.random.default_rng(self.seed)
+        self.means = self.means + rng.normal(0, 1e-6 * (np.std(x) + 1e-12), k)
+        self.transmat = np.full((k, k), 0.1 / max(k - 1, 1))
+        np.fill_diagonal(self.transmat, 0.9 if k > 1 else 1.0)
+        self.startprob = np.full(k, 1.0 / k)
+
+    def _forward(self, log_b: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, float]:
+        """縮放前向演算法 → (alpha, 縮放後發射機率, 縮放係數, 對數似然)."""
+        shift = log_b.max(axis=1, keepdims=True)
+        b = np.exp(log_b - shift)
+        n = len(b)
+        alpha = np.empty_like(b)
+        scale = np.empty(n)
+        a = self.startprob * b[0]
+        scale[0] = a.sum()
+        alpha[0] = a / scale[0]
+        transmat = self.transmat
+        for t in range(1, n):
+            a = (alpha[t - 1] @ transmat) * b[t]
+            scale[t] = a.sum()
+            alpha[t] = a / scale[t]
+        loglik = float(np.log(scale).sum() + shift.sum())
+        return alpha, b, scale, loglik
+
+    def fit(self, x: np.ndarray) -> GaussianHMM:
+        """Baum-Welch 擬合."""
+        x = np.asarray(x, dtype=np.float64).ravel()
+        self._init_params(x)
+        floor = max(float(np.var(x)) * 1e-3, 1e-12)
+        prev = -np.inf
+        for it in range(1, self.n_iter + 1):
+            alpha, b, scale, loglik = self._forward(self._log_emission(x))
+
+            beta = np.empty_like(alpha)
+            beta[-1] = 1.0
+            for t in range(len(x) - 2, -1, -1):
+                beta[t] = self.transmat @ (b[t + 1] * beta[t + 1]) / scale[t + 1]
+
+            gamma = alpha * beta
+            gamma /= gamma.sum(axis=1, keepdims=True)
+            xi = self.transmat * (alpha[:-1].T @ (b[1:] * beta[1:] / scale[1:, None]))
+
+            self.startprob = gamma[0] / gamma[0].sum()
+            self.transmat = xi / np.maximum(xi.sum(axis=1, keepdims=True), 1e-300)
+            weight = np.maximum(gamma.sum(axis=0), 1e-300)
+            self.means = gamma.T @ x / weight
+            self.variances = np.maximum((gamma * (x[:, None] - self.means) ** 2).sum(axis=0) / weight, floor)
+
+            self.log_likelihood = loglik
+            self.n_iter_run = it
+            if loglik - prev < self.tol:
+                break
+            prev = loglik
+        self._prepare()
+        return self
+
+    def filter(self, x: np.ndarray) -> np.ndarray:
+        """前向濾波機率 P(s_t | x_1..t)，形狀 (T, 狀態數)."""
+        return self._forward(self._log_emission(x))[0]
+
+    def filter_step(self, prob: np.ndarray | None, x: float) -> np.ndarray:
+        """單步前向濾波：prob 為上一根的濾波機率（None 表示序列起點）."""
+        prior = self.startprob if prob is None else prob @ self.transmat
+        diff = x - self.means
+        log_b = self._log_norm - diff * diff * self._half_inv_var
+        post = prior * np.exp(log_b - log_b.max())
+        total = post.sum()
+        return post / total if total > 0 else np.full(self.n_states, 1.0 / self.n_states)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """Viterbi 最可能狀態序列."""
+        log_b = self._log_emission(x)
+        n, k = log_b.shape
+        with np.errstate(divide="ignore"):
+            log_a = np.log(self.transmat)
+            delta = np.log(self.startprob) + log_b[0]
+        back = np.empty((n, k), dtype=np.int64)
+        for t in range(1, n):
+            scores = delta[:, None] + log_a
+            back[t] = np.argmax(scores, axis=0)
+            delta = scores[back[t], np.arange(k)] + log_b[t]
+        states = np.empty(n, dtype=np.int64)
+        states[-1] = int(np.argmax(delta))
+        for t in range(n - 1, 0, -1):
+            states[t - 1] = back[t, states[t]]
+        return states
+
+
+@dataclass(slots=True)
+class HMMRegimeModel:
+    """HMM 參數與隱狀態 → 狀態映射."""
+
+    hmm: GaussianHMM
+    state_to_regime: np.ndarray
+
+    def classify_returns(self, returns: np.ndarray) -> np.ndarray:
+        return self.state_to_regime[self.hmm.predict(returns)]
+
+
+RegimeModel = RuleRegimeModel | KMeansRegimeModel | HMMRegimeModel
+
+
 class RegimeDetector:
     """
     市場狀態檢測器.
@@ -116,6 +432,8 @@ class RegimeDetector:
         self._returns = np.asarray(returns, dtype=np.float64).flatten()
         self._lookback = lookback
         self._ann = ann_factor
+        self._features: tuple[np.ndarray, np.ndarray] | None = None
+        self._models: dict[str, RegimeModel | None] = {}
 
     def detect(self, method: str = "rule") -> RegimeResult:
         """
@@ -132,253 +450,157 @@ class RegimeDetector:
             return self._detect_rule()
 
     def _compute_features(self) -> tuple[np.ndarray, np.ndarray]:
-        """計算動量和波動率特徵."""
-        n = len(self._returns)
-        momentum = np.full(n, np.nan)
-        volatility = np.full(n, np.nan)
+        """計算動量和波動率特徵（O(n)，結果快取）."""
+        if self._features is None:
+            self._features = rolling_features(self._returns, self._lookback, self._ann)
+        return self._features
 
-        for i in range(self._lookback, n):
-            window = self._returns[i - self._lookback : i]
-            momentum[i] = np.prod(1 + window) - 1
-            volatility[i] = np.std(window, ddof=1) * math.sqrt(self._ann)
+    # ─── 擬合 ───
 
-        return momentum, volatility
+    def fit(self, method: str = "rule") -> RegimeModel | None:
+        """
+        擬合並快取狀態模型；資料不足時回退規則引擎（仍不足則為 None）.
 
-    def _detect_rule(self) -> RegimeResult:
-        """規則引擎檢測."""
-        momentum, volatility = self._compute_features()
-        n = len(self._returns)
+        Args:
+            method: "rule" | "kmeans" | "hmm"
+        """
+        if method not in self._models:
+            if method == "kmeans":
+                model = self._fit_kmeans()
+            elif method == "hmm":
+                model = self._fit_hmm()
+            else:
+                model = self._fit_rule()
+            self._models[method] = model
+        return self._models[method]
 
-        # 計算中位數閾值
+    def _fit_rule(self) -> RuleRegimeModel | None:
+        momentum, volatility = self._compute_features()
         valid_mom = momentum[~np.isnan(momentum)]
         valid_vol = volatility[~np.isnan(volatility)]
-
         if len(valid_mom) < self._lookback * 2:
-            # 數據不足，返回默認
-            return RegimeResult(
-                regimes=[Regime.LOW_VOL] * n,
-                transition_matrix={},
-                stats=[],
-                current_regime=Regime.LOW_VOL,
-                confidence=0.0,
-            )
-
-        med_mom = np.median(valid_mom)
-        med_vol = np.median(valid_vol)
-        p75_vol = np.percentile(valid_vol, 75)
-
-        regimes = np.full(n, Regime.LOW_VOL.value, dtype=int)
-
-        for i in range(n):
-            if np.isnan(momentum[i]) or np.isnan(volatility[i]):
-                regimes[i] = Regime.LOW_VOL.value
-                continue
-
-            mom = momentum[i]
-            vol = volatility[i]
-
-            if vol > p75_vol:
-                regimes[i] = Regime.HIGH_VOL.value
-            elif mom > med_mom:
-                regimes[i] = Regime.BULL.value
-            elif mom < -med_mom:
-                regimes[i] = Regime.BEAR.value
-            else:
-                regimes[i] = Regime.LOW_VOL.value
-
-        return self._build_result(regimes)
+            return None
+        return RuleRegimeModel(
+            med_momentum=float(np.median(valid_mom)),
+            p75_volatility=float(np.percentile(valid_vol, 75)),
+        )
 
-    def _detect_kmeans(self) -> RegimeResult:
-        """KMeans 聚類檢測."""
+    def _fit_kmeans(self) -> RegimeModel | None:
         momentum, volatility = self._compute_features()
-        n = len(self._returns)
-
-        # 準備特徵
         valid_mask = ~np.isnan(momentum) & ~np.isnan(volatility)
         if np.sum(valid_mask) < 10:
-            return self._detect_rule()
+            return self.fit("rule")
+        return fit_kmeans(np.column_stack([momentum[valid_mask], volatility[valid_mask]]))
 
-        features = np.column_stack(
-            [
-                momentum[valid_mask],
-                volatility[valid_mask],
-            ]
-        )
+    def _fit_hmm(self) -> RegimeModel | None:
+        """hmmlearn 可用時以其擬合，否則使用內建 Baum-Welch."""
+        if len(self._returns) < 40:
+            return self.fit("rule")
+        try:
+            from hmmlearn.hmm import GaussianHMM as _HMMLearn
 
-        # 標準化
-        mean_f = np.mean(features, axis=0)
-        std_f = np.std(features, axis=0)
-        std_f[std_f == 0] = 1
-        features_norm = (features - mean_f) / std_f
-
-        # 簡易 KMeans (k=4)
-        k = 4
-        rng = np.random.default_rng(42)
-        centroids = features_norm[rng.choice(len(features_norm), k, replace=False)]
-
-        for _ in range(50):
-            distances = np.array([np.linalg.norm(features_norm - c, axis=1) for c in centroids])
-            labels = np.argmin(distances, axis=0)
-            new_centroids = np.array(
-                [features_norm[labels == i].mean(axis=0) if np.any(labels == i) else centroids[i] for i in range(k)]
-            )
-            if np.allclose(centroids, new_centroids, atol=1e-6):
-                break
-            centroids = new_centroids
-
-        # 映射聚類到狀態（基於質心特徵）
-        centroids_original = centroids * std_f + mean_f
-        centroid_momentum = centroids_original[:, 0]
-        centroid_vol = centroids_original[:, 1]
-
-        # 排序：按動量和波動率映射到 BULL/BEAR/HIGH_VOL/LOW_VOL
-        sorted_by_vol = np.argsort(centroid_vol)
-        low_vol_cluster = sorted_by_vol[0]
-        high_vol_cluster = sorted_by_vol[-1]
-
-        remaining = [c for c in range(k) if c not in [low_vol_cluster, high_vol_cluster]]
-        if len(remaining) >= 2:
-            bull_cluster = (
-                remaining[0] if centroid_momentum[remaining[0]] > centroid_momentum[remaining[1]] else remaining[1]
+            fitted = _HMMLearn(n_components=4, covariance_type="full", n_iter=100, random_state=42)
+            fitted.fit(self._returns.reshape(-1, 1))
+            hmm = GaussianHMM.from_params(
+                fitted.startprob_, fitted.transmat_, fitted.means_.flatten(), fitted.covars_.flatten()
             )
-            bear_cluster = remaining[1] if bull_cluster == remaining[0] else remaining[0]
-        elif len(remaining) == 1:
-            bull_cluster = remaining[0]
-            bear_cluster = remaining[0]
-        else:
-            bull_cluster = 0
-            bear_cluster = 1
-
-        cluster_to_regime = {
-            bull_cluster: Regime.BULL.value,
-            bear_cluster: Regime.BEAR.value,
-            high_vol_cluster: Regime.HIGH_VOL.value,
-            low_vol_cluster: Regime.LOW_VOL.value,
-        }
+        except ImportError:
+            hmm = GaussianHMM(n_states=4).fit(self._returns)
+        return HMMRegimeModel(hmm=hmm, state_to_regime=_assign_regimes(hmm.means, hmm.variances))
 
-        # 預測所有點
-        all_distances = np.array(
-            [
-                np.linalg.norm(((np.column_stack([momentum, volatility]) - mean_f) / std_f) - c, axis=1)
-                for c in centroids
-            ]
-        )
-        all_labels = np.argmin(all_distances, axis=0)
+    # ─── 批次檢測 ───
 
-        regimes = np.array([cluster_to_regime.get(l, Regime.LOW_VOL.value) for l in all_labels])
+    def _insufficient(self) -> RegimeResult:
+        n = len(self._returns)
+        return RegimeResult(
+            regimes=[Regime.LOW_VOL] * n,
+            transition_matrix={},
+            stats=[],
+            current_regime=Regime.LOW_VOL,
+            confidence=0.0,
+        )
 
-        # NaN 區域填 LOW_VOL
-        regimes[~valid_mask] = Regime.LOW_VOL.value
+    def _detect_rule(self) -> RegimeResult:
+        """規則引擎檢測."""
+        model = self.fit("rule")
+        if model is None:
+            # 數據不足，返回默認
+            return self._insufficient()
+        return self._build_result(model.classify(*self._compute_features()))
 
-        return self._build_result(regimes)
+    def _detect_kmeans(self) -> RegimeResult:
+        """KMeans 聚類檢測."""
+        model = self.fit("kmeans")
+        if not isinstance(model, KMeansRegimeModel):
+            return self._detect_rule()
+        return self._build_result(model.classify(*self._compute_features()))
 
     def _detect_hmm(self) -> RegimeResult:
+        """HMM 檢測（Viterbi 解碼）."""
+        model = self.fit("hmm")
+        if not isinstance(model, HMMRegimeModel):
+            return self._detect_rule()
+        return self._build_result(model.classify_returns(self._returns))
+
+    def online(self, method: str = "rule") -> OnlineRegimeTracker:
         """
-        HMM 檢測（簡化版 Baum-Welch）.
-        如果沒有 hmmlearn，回退到規則引擎.
-        """
-        try:
-            from hmmlearn.hmm import GaussianHMM
-
-            returns = self._returns.reshape(-1, 1)
-            model = GaussianHMM(n_components=4, covariance_type="full", n_iter=100, random_state=42)
-            model.fit(returns)
-            regimes = model.predict(returns)
-
-            # 映射隱狀態到 Regime
-            state_means = model.means_.flatten()
-            state_vars = model.covars_.flatten()
-
-            # 簡單映射：按均值和方差
-            sorted_by_var = np.argsort(state_vars)
-            cluster_map = {
-                sorted_by_var[0]: Regime.LOW_VOL.value,
-                sorted_by_var[-1]: Regime.HIGH_VOL.value,
-            }
-            remaining = [i for i in range(4) if i not in cluster_map]
-            if len(remaining) >= 2:
-                if state_means[remaining[0]] > state_means[remaining[1]]:
-                    cluster_map[remaining[0]] = Regime.BULL.value
-                    cluster_map[remaining[1]] = Regime.BEAR.value
-                else:
-                    cluster_map[remaining[0]] = Regime.BEAR.value
-                    cluster_map[remaining[1]] = Regime.BULL.value
-
-            regimes = np.array([cluster_map.get(r, Regime.LOW_VOL.value) for r in regimes])
-            return self._build_result(regimes)
+        建立線上追蹤器：沿用本序列擬合的模型，後續每根 K 線只做增量特徵 / 前向濾波.
 
-        except ImportError:
-            return self._detect_rule()
+        Args:
+            method: "rule" | "kmeans" | "hmm"
+        """
+        model = self.fit(method)
+        tracker = OnlineRegimeTracker(model, lookback=self._lookback, ann_factor=self._ann)
+        tracker.warm_up(self._returns)
+        return tracker
 
     def _build_result(self, regimes: np.ndarray) -> RegimeResult:
         """構建 RegimeResult."""
+        regimes = np.asarray(regimes, dtype=int)
         n = len(regimes)
+        n_regimes = len(Regime)
+
+        # 連續區段（run-length）
+        if n:
+            starts = np.concatenate(([0], np.flatnonzero(np.diff(regimes)) + 1))
+            run_lengths = np.diff(np.append(starts, n))
+            run_regimes = regimes[starts]
+        else:
+            run_lengths = run_regimes = np.empty(0, dtype=int)
 
         # 狀態統計
+        counts = np.bincount(regimes, minlength=n_regimes) if n else np.zeros(n_regimes, dtype=int)
         stats: list[RegimeStats] = []
-        for regime_val in [r.value for r in Regime]:
-            mask = regimes == regime_val
-            count = int(np.sum(mask))
+        for regime in Regime:
+            count = int(counts[regime.value])
             if count == 0:
-                stats.append(
-                    RegimeStats(
-                        regime=Regime(regime_val),
-                        name=REGIME_NAMES[Regime(regime_val)],
-                        count=0,
-                        pct=0.0,
-                        avg_duration=0.0,
-                        avg_return=0.0,
-                        avg_volatility=0.0,
-                    )
-                )
+                stats.append(RegimeStats(regime, REGIME_NAMES[regime], 0, 0.0, 0.0, 0.0, 0.0))
                 continue
-
-            pct = count / n
-            returns_in = self._returns[mask]
-            avg_ret = float(np.mean(returns_in)) if len(returns_in) > 0 else 0
-            avg_vol = float(np.std(returns_in, ddof=1)) if len(returns_in) > 1 else 0
-
-            # 平均持續時間
-            durations = []
-            cur_dur = 1
-            for i in range(1, n):
-                if regimes[i] == regimes[i - 1]:
-                    cur_dur += 1
-                else:
-                    if regimes[i - 1] == regime_val:
-                        durations.append(cur_dur)
-                    cur_dur = 1
-            if regimes[-1] == regime_val:
-                durations.append(cur_dur)
-            avg_dur = float(np.mean(durations)) if durations else 0
-
+            returns_in = self._returns[regimes == regime.value]
+            durations = run_lengths[run_regimes == regime.value]
             stats.append(
                 RegimeStats(
-                    regime=Regime(regime_val),
-                    name=REGIME_NAMES[Regime(regime_val)],
+                    regime=regime,
+                    name=REGIME_NAMES[regime],
                     count=count,
-                    pct=pct,
-                    avg_duration=avg_dur,
-                    avg_return=avg_ret,
-                    avg_volatility=avg_vol,
+                    pct=count / n,
+                    avg_duration=float(durations.mean()) if len(durations) else 0,
+                    avg_return=float(np.mean(returns_in)),
+                    avg_volatility=float(np.std(returns_in, ddof=1)) if count > 1 else 0,
                 )
             )
 
         # 轉移概率矩陣
-        transition_counts: dict[int, dict[int, int]] = {r.value: {} for r in Regime}
-        for i in range(1, n):
-            from_r = int(regimes[i - 1])
-            to_r = int(regimes[i])
-            transition_counts[from_r][to_r] = transition_counts[from_r].get(to_r, 0) + 1
-
+        transitions = np.zeros((n_regimes, n_regimes), dtype=np.int64)
+        if n > 1:
+            np.add.at(transitions, (regimes[:-1], regimes[1:]), 1)
         transition_matrix: dict[str, dict[str, float]] = {}
-        for from_r, tos in transition_counts.items():
-            total = sum(tos.values())
-            from_name = REGIME_NAMES[Regime(from_r)]
-            transition_matrix[from_name] = {}
-            for to_r, count in tos.items():
-                to_name = REGIME_NAMES[Regime(to_r)]
-                transition_matrix[from_name][to_name] = round(count / total, 3) if total > 0 else 0
+        for from_r in Regime:
+            row = transitions[from_r.value]
+            total = int(row.sum())
+            transition_matrix[REGIME_NAMES[from_r]] = {
+                REGIME_NAMES[to_r]: round(int(row[to_r.value]) / total, 3) for to_r in Regime if row[to_r.value] > 0
+            }
 
         # 當前狀態
         current = Regime(int(regimes[-1])) if n > 0 else Regime.LOW_VOL
@@ -399,3 +621,137 @@ class RegimeDetector:
         """取得當前市場狀態."""
         result = self.detect(method)
         return result.current_regime
+
+
+# ════════════════════════════════════════════════════════════
+# 線上追蹤
+# ════════════════════════════════════════════════════════════
+
+
+class OnlineRegimeTracker:
+    """
+    線上市場狀態追蹤器.
+
+    沿用已擬合模型（規則閾值 / KMeans 質心 / HMM 參數），每根新 K 線：
+    - 規則、KMeans：以增量視窗和更新動量與波動率後分類，O(1)
+    - HMM：單步前向濾波，O(狀態數²)
+
+    規則 / KMeans：第 t 根 K 線的狀態與批次檢測一致（同樣使用 t 之前的 lookback 根報酬）。
+    HMM：取濾波機率 P(s_t | x_1..t) 最大的隱狀態，等同 GaussianHMM.filter 的逐根 argmax；
+    批次 detect(method="hmm") 用 Viterbi 解整段最可能路徑（會參考之後的數據），兩者可能不同。
+    """
+
+    _RESYNC_EVERY = 4096  # 定期以視窗重算累積和，避免浮點漂移
+
+    def __init__(self, model: RegimeModel | None, lookback: int = 20, ann_factor: int = 252) -> None:
+        self.model = model
+        self._lookback = lookback
+        self._ann_sqrt = math.sqrt(ann_factor)
+        self._window: deque[float] = deque(maxlen=lookback)
+        self._log_sum = 0.0
+        self._n_zero = 0
+        self._n_neg = 0
+        self._sum = 0.0
+        self._sum_sq = 0.0
+        self._updates = 0
+        self._prob: np.ndarray | None = None
+        self.current: Regime = Regime.LOW_VOL
+        self.n_updates = 0
+
+    @property
+    def probabilities(self) -> np.ndarray | None:
+        """HMM 隱狀態濾波機率（其他模型為 None）."""
+        return self._prob
+
+    def features(self) -> tuple[float, float]:
+        """目前視窗的 (動量, 年化波動率)；視窗未滿為 NaN."""
+        n = len(self._window)
+        if n < self._lookback or n == 0:
+            return math.nan, math.nan
+        if self._n_zero:
+            momentum = -1.0
+        elif self._n_neg % 2:
+            momentum = -math.exp(self._log_sum) - 1.0
+        else:
+            momentum = math.expm1(self._log_sum)
+        if n < 2:
+            return momentum, math.nan
+        var = max((self._sum_sq - self._sum * self._sum / n) / (n - 1), 0.0)
+        return momentum, math.sqrt(var) * self._ann_sqrt
+
+    def _push(self, r: float) -> None:
+        window = self._window
+        if len(window) == window.maxlen:
+            self._remove(window[0])
+        window.append(r)
+        self._add(r)
+        self._updates += 1
+        if self._updates % self._RESYNC_EVERY == 0:
+            self._resync()
+
+    def _add(self, r: float, sign: int = 1) -> None:
+        growth = 1.0 + r
+        if growth == 0:
+            self._n_zero += sign
+        else:
+            self._log_sum += sign * math.log(abs(growth))
+            if growth < 0:
+                self._n_neg += sign
+        self._sum += sign * r
+        self._sum_sq += sign * r * r
+
+    def _remove(self, r: float) -> None:
+        self._add(r, sign=-1)
+
+    def _resync(self) -> None:
+        self._log_sum = self._sum = self._sum_sq = 0.0
+        self._n_zero = self._n_neg = 0
+        for r in self._window:
+            self._add(r)
+
+    def warm_up(self, history: np.ndarray) -> None:
+        """以歷史報酬填滿視窗（HMM 同時推進濾波機率），不逐根分類."""
+        history = np.asarray(history, dtype=np.float64).ravel()
+        for r in history[-self._lookback :]:
+            self._push(float(r))
+        if isinstance(self.model, HMMRegimeModel) and len(history):
+            self._prob = self.model.hmm.filter(history)[-1]
+            self.current = Regime(int(self.model.state_to_regime[int(np.argmax(self._prob))]))
+        elif len(history):
+            self.current = self._classify_window()
+
+    def _classify_window(self) -> Regime:
+        model = self.model
+        if model is None or isinstance(model, HMMRegimeModel):
+            return Regime.LOW_VOL
+        momentum, volatility = self.features()
+        if math.isnan(momentum) or math.isnan(volatility):
+            return Regime.LOW_VOL
+        if isinstance(model, RuleRegimeModel):
+            if volatility > model.p75_volatility:
+                return Regime.HIGH_VOL
+            if momentum > model.med_momentum:
+                return Regime.BULL
+            if momentum < -model.med_momentum:
+                return Regime.BEAR
+            return Regime.LOW_VOL
+        return Regime(model.classify_one(momentum, volatility))
+
+    def update(self, ret: float) -> Regime:
+        """
+        推入一根新 K 線的報酬並回傳該根的市場狀態.
+
+        Args:
+            ret: 該根 K 線的報酬率
+        """
+        ret = float(ret)
+        if isinstance(self.model, HMMRegimeModel):
+            self._prob = self.model.hmm.filter_step(self._prob, ret)
+            regime = Regime(int(self.model.state_to_regime[int(np.argmax(self._prob))]))
+            self._push(ret)
+        else:
+            regime = self._classify_window()
+            self._push(ret)
+        self.current = regime
+        self.n_updates += 1
+        return regime
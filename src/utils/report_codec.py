@@ -0,0 +1,399 @@
+"""
+回測報告二進位編碼 — 列式、差分、壓縮，大欄位延遲解碼
+
+BacktestResult / Celery 任務結果 / 快取值裡最大的是「同鍵 dict 的長列表」（權益曲線、交易明細、K 線）。
+逐筆 JSON 每根 K 線要重複寫一次欄位名與十進位數字，50 萬根就是數百 MB。這裡把任意 JSON 樹中
+這類列表（≥ min_rows 筆）轉成列式表格，其餘部分仍是 JSON：
+
+  整數欄（timestamp、position…）  → 首值 + 差分，依範圍縮成 int8/16/32/64（等距時間戳差分全相同，幾乎不佔空間）
+  可精確還原的小數（權益 round 到 2 位）→ 乘以 10^k 轉整數後同上，無損
+  其他浮點                        → float64，或指定欄位（float32=("equity",)）降為 float32
+  布林 / 字串                     → uint8 / 字典編碼
+  混合型別、None、巢狀值          → 原樣放在 JSON 標頭
+
+每欄各自 zlib 壓縮；loads 只解 JSON 標頭，表格成為 LazyRows，第一次讀取列時才解壓、組回 dict。
+
+格式：MAGIC(4) | 標頭長度 uint32 LE | zlib(JSON 標頭) | 各欄緩衝區
+
+用法：
+    blob = dumps({"metrics": m, "equity_curve": curve})
+    out = loads(blob)
+    out["equity_curve"].column("equity")   # np.ndarray，不建立 dict
+    out["equity_curve"][0]                 # {"timestamp": ..., "equity": ..., "position": ...}
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import struct
+import zlib
+from collections.abc import Iterable, Iterator, Sequence
+from typing import Any
+
+import numpy as np
+
+MAGIC = b"SXB1"
+CONTENT_TYPE = "application/x-stocksx-report"
+SERIALIZER_NAME = "stocksx"
+
+# 少於此筆數的列表直接放 JSON（列式的固定開銷不划算）
+MIN_TABLE_ROWS = 16
+
+# 嘗試的小數位數：值 × 10^k 為整數且能精確還原時，以整數差分儲存
+_DECIMAL_PLACES = (0, 2, 4, 6, 8)
+
+# 標頭中代表二進位內容的佔位鍵（JSON 允許 \u0000，一般資料不會出現）
+_TABLE = "\x00t"
+_BYTES = "\x00b"
+_ARRAY = "\x00a"
+_HEADER = struct.Struct("<4sI")
+
+
+# ════════════════════════════════════════════════════════════
+# 編碼
+# ════════════════════════════════════════════════════════════
+
+
+def _int_dtype(values: np.ndarray) -> np.dtype:
+    if values.size == 0:
+        return np.dtype(np.int8)
+    lo, hi = int(values.min()), int(values.max())
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _decimal_places(values: np.ndarray) -> int | None:
+    """值 × 10^k 皆為整數且除回去與原值逐位相同時回傳 k."""
+    if values.size == 0 or not np.all(np.isfinite(values)):
+        return None
+    for places in _DECIMAL_PLACES:
+        scale = 10.0**places
+        scaled = np.round(values * scale)
+        if np.abs(scaled).max() >= 2**53:
+            return None
+        if np.array_equal(scaled / scale, values):
+            return places
+    return None
+
+
+class _Encoder:
+    def __init__(self, float32: Iterable[str], level: int, min_rows: int) -> None:
+        self.float32 = frozenset(float32)
+        self.level = level
+        self.min_rows = min_rows
+        self.tables: list[dict[str, Any]] = []
+        self.arrays: list[dict[str, Any]] = []
+        self.blobs: list[dict[str, int]] = []
+        self.chunks: list[bytes] = []
+        self.offset = 0
+
+    def _append(self, data: bytes) -> dict[str, int]:
+        ref = {"off": self.offset, "len": len(data)}
+        self.chunks.append(data)
+        self.offset += len(data)
+        return ref
+
+    def _compress(self, array: np.ndarray) -> dict[str, int]:
+        return self._append(zlib.compress(np.ascontiguousarray(array).tobytes(), self.level))
+
+    # ─── 樹 ───
+
+    def walk(self, obj: Any) -> Any:
+        if obj is None or isinstance(obj, (str, bool, int, float)):
+            return obj
+        if isinstance(obj, dict):
+            return {str(k): self.walk(v) for k, v in obj.items()}
+        if isinstance(obj, LazyRows):
+            return {_TABLE: self._reuse(obj)}
+        if isinstance(obj, (list, tuple)):
+            items = [_plain(v) for v in obj] if obj and dataclasses.is_dataclass(obj[0]) else obj
+            keys = self._table_keys(items)
+            if keys is not None:
+                return {_TABLE: self._table(items, keys)}
+            return [self.walk(v) for v in items]
+        if isinstance(obj, (bytes, bytearray, memoryview)):
+            self.blobs.append(self._append(bytes(obj)))
+            return {_BYTES: len(self.blobs) - 1}
+        if isinstance(obj, np.ndarray):
+            spec = {"dtype": obj.dtype.str, "shape": list(obj.shape), **self._compress(obj)}
+            self.arrays.append(spec)
+            return {_ARRAY: len(self.arrays) - 1}
+        if isinstance(obj, np.generic):
+            return obj.item()
+        if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+            return self.walk(_plain(obj))
+        if hasattr(obj, "isoformat"):  # datetime / date，與 Celery JSON 一致
+            return obj.isoformat()
+        # set / Decimal / DataFrame 等無法原樣還原，不轉成字串以免呼叫端拿回錯誤的值
+        raise TypeError(f"report_codec 不支援的型別: {type(obj).__name__}")
+
+    def _table_keys(self, items: list[Any]) -> list[str] | None:
+        if len(items) < self.min_rows or not isinstance(items[0], dict) or not items[0]:
+            return None
+        first = items[0].keys()
+        size = len(first)
+        if not all(isinstance(k, str) for k in first):
+            return None
+        if all(type(r) is dict and len(r) == size and r.keys() == first for r in items):
+            return list(first)
+        return None
+
+    # ─── 表格 ───
+
+    def _table(self, rows: list[dict[str, Any]], keys: list[str]) -> int:
+        columns = [self._column(name, [r[name] for r in rows]) for name in keys]
+        self.tables.append({"rows": len(rows), "cols": columns})
+        return len(self.tables) - 1
+
+    def _reuse(self, rows: LazyRows) -> int:
+        """已編碼的表格直接搬移壓縮後的緩衝區，不解碼."""
+        columns = []
+        for spec in rows._spec["cols"]:
+            spec = dict(spec)
+            if spec["kind"] == "json":
+                spec["values"] = [self.walk(v) for v in rows._values(spec)]
+            else:
+                spec.update(self._append(bytes(rows._payload[spec["off"] : spec["off"] + spec["len"]])))
+            columns.append(spec)
+        self.tables.append({"rows": len(rows), "cols": columns})
+        return len(self.tables) - 1
+
+    def _column(self, name: str, values: list[Any]) -> dict[str, Any]:
+        kinds = {_kind(t) for t in set(map(type, values))}
+        if len(kinds) == 1:
+            kind = kinds.pop()
+            if kind == "int":
+                try:
+                    return {"name": name, "kind": "int", **self._ints(np.array(values, dtype=np.int64))}
+                except OverflowError:
+                    pass
+            elif kind == "float":
+                return self._floats(name, np.array(values, dtype=np.float64))
+            elif kind == "bool":
+                return {"name": name, "kind": "bool", **self._compress(np.array(values, dtype=np.uint8))}
+            elif kind == "str":
+                labels, codes = np.unique(np.array(values, dtype=object).astype(str), return_inverse=True)
+                spec = {"name": name, "kind": "str", "values": labels.tolist()}
+                codes = codes.astype(_int_dtype(codes))
+                return {**spec, "dtype": codes.dtype.str, **self._compress(codes)}
+        elif kinds == {"int", "float"}:
+            return self._floats(name, np.array(values, dtype=np.float64))
+        return {"name": name, "kind": "json", "values": [self.walk(v) for v in values]}
+
+    def _ints(self, values: np.ndarray) -> dict[str, Any]:
+        first = int(values[0]) if values.size else 0
+        deltas = np.diff(values)
+        dtype = _int_dtype(deltas)
+        return {"first": first, "dtype": dtype.str, **self._compress(deltas.astype(dtype))}
+
+    def _floats(self, name: str, values: np.ndarray) -> dict[str, Any]:
+        places = _decimal_places(values)
+        if places is not None:
+            scaled = np.round(values * 10.0**places).astype(np.int64)
+            return {"name": name, "kind": "dec", "places": places, **self._ints(scaled)}
+        dtype = np.float32 if name in self.float32 else np.float64
+        return {"name": name, "kind": "float", "dtype": np.dtype(dtype).str, **self._compress(values.astype(dtype))}
+
+    def finish(self, root: Any) -> bytes:
+        header = {"v": 1, "root": root, "tables": self.tables, "arrays": self.arrays, "blobs": self.blobs}
+        packed = zlib.compress(json.dumps(header, separators=(",", ":"), allow_nan=True).encode(), self.level)
+        return b"".join([_HEADER.pack(MAGIC, len(packed)), packed, *self.chunks])
+
+
+def _kind(t: type) -> str:
+    if issubclass(t, (bool, np.bool_)):
+        return "bool"
+    if issubclass(t, (int, np.integer)):
+        return "int"
+    if issubclass(t, (float, np.floating)):
+        return "float"
+    if issubclass(t, str):
+        return "str"
+    return "json"
+
+
+def _plain(obj: Any) -> Any:
+    """dataclass（如 TradeRecord）淺層轉 dict，避免 dataclasses.asdict 深拷貝整個列表."""
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in dataclasses.fields(obj)}
+    return obj
+
+
+def dumps(
+    obj: Any,
+    *,
+    float32: Iterable[str] = (),
+    level: int = 6,
+    min_rows: int = MIN_TABLE_ROWS,
+) -> bytes:
+    """
+    編碼任意 JSON 相容的樹（dict / list / 純量，另支援 dataclass、NumPy 陣列與 bytes）。
+
+    Args:
+        obj: 要編碼的物件，如 Celery 任務結果或 {"equity_curve": ..., "trades": ...}
+        float32: 降為 float32 的欄位名（如 ("equity",)）；無法精確還原為小數的值才會用到
+        level: zlib 壓縮等級
+        min_rows: 列表至少幾筆才轉為列式表格
+
+    Returns:
+        以 MAGIC 開頭的位元組
+
+    Raises:
+        TypeError: 樹中含不支援的型別（與 json.dumps 相同，呼叫端據此略過快取）
+    """
+    encoder = _Encoder(float32, level, min_rows)
+    root = encoder.walk(_plain(obj))
+    return encoder.finish(root)
+
+
+# ════════════════════════════════════════════════════════════
+# 解碼
+# ════════════════════════════════════════════════════════════
+
+
+class LazyRows(Sequence):
+    """
+    列式表格的唯讀序列：len() 不解碼，column() 只解壓單欄，第一次取列時才組回 list[dict]。
+
+    行為同 list[dict]（索引、切片、迭代、與 list 比較相等、pandas.DataFrame(rows)），
+    但不是 list 子類：json.dumps 需先 tolist()。
+    """
+
+    __slots__ = ("_spec", "_payload", "_header", "_arrays", "_rows")
+
+    def __init__(self, spec: dict[str, Any], payload: memoryview, header: dict[str, Any]) -> None:
+        self._spec = spec
+        self._payload = payload
+        self._header = header
+        self._arrays: dict[str, np.ndarray] = {}
+        self._rows: list[dict[str, Any]] | None = None
+
+    @property
+    def columns(self) -> list[str]:
+        return [c["name"] for c in self._spec["cols"]]
+
+    @property
+    def decoded(self) -> bool:
+        return self._rows is not None
+
+    def column(self, name: str) -> np.ndarray:
+        """單欄 NumPy 陣列（畫圖 / 指標計算用，不建立逐筆 dict）."""
+        if name not in self._arrays:
+            spec = next((c for c in self._spec["cols"] if c["name"] == name), None)
+            if spec is None:
+                raise KeyError(name)
+            self._arrays[name] = self._decode(spec)
+        return self._arrays[name]
+
+    def _buffer(self, spec: dict[str, Any]) -> np.ndarray:
+        raw = zlib.decompress(self._payload[spec["off"] : spec["off"] + spec["len"]])
+        return np.frombuffer(raw, dtype=np.dtype(spec["dtype"]))
+
+    def _decode(self, spec: dict[str, Any]) -> np.ndarray:
+        kind = spec["kind"]
+        n = self._spec["rows"]
+        if kind in ("int", "dec"):
+            values = np.empty(n, dtype=np.int64)
+            if n:
+                values[0] = spec["first"]
+                np.cumsum(self._buffer(spec), dtype=np.int64, out=values[1:])
+                values[1:] += spec["first"]
+            return values / 10.0 ** spec["places"] if kind == "dec" else values
+        if kind == "float":
+            return self._buffer(spec)
+        if kind == "bool":
+            return self._buffer({**spec, "dtype": "|u1"}).astype(bool)
+        if kind == "str":
+            return np.array(spec["values"], dtype=object)[self._buffer(spec)]
+        values = np.empty(n, dtype=object)
+        values[:] = self._values(spec)
+        return values
+
+    def _values(self, spec: dict[str, Any]) -> list[Any]:
+        if spec["kind"] == "json":
+            return _restore(spec["values"], self._payload, self._header)
+        return self.column(spec["name"]).tolist()
+
+    def tolist(self) -> list[dict[str, Any]]:
+        if self._rows is None:
+            names = self.columns
+            columns = [self._values(spec) for spec in self._spec["cols"]]
+            self._rows = [dict(zip(names, values)) for values in zip(*columns)]
+        return self._rows
+
+    def __len__(self) -> int:
+        return self._spec["rows"]
+
+    def __getitem__(self, index: Any) -> Any:
+        return self.tolist()[index]
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return iter(self.tolist())
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (LazyRows, list, tuple)):
+            return len(self) == len(other) and self.tolist() == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        state = "decoded" if self._rows is not None else "lazy"
+        return f"LazyRows({len(self)} rows, columns={self.columns}, {state})"
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (list, (self.tolist(),))
+
+
+def _restore(node: Any, payload: memoryview, header: dict[str, Any]) -> Any:
+    if isinstance(node, list):
+        return [_restore(v, payload, header) for v in node]
+    if not isinstance(node, dict):
+        return node
+    if len(node) == 1:
+        if _TABLE in node:
+            return LazyRows(header["tables"][node[_TABLE]], payload, header)
+        if _BYTES in node:
+            ref = header["blobs"][node[_BYTES]]
+            return bytes(payload[ref["off"] : ref["off"] + ref["len"]])
+        if _ARRAY in node:
+            spec = header["arrays"][node[_ARRAY]]
+            raw = zlib.decompress(payload[spec["off"] : spec["off"] + spec["len"]])
+            return np.frombuffer(raw, dtype=np.dtype(spec["dtype"])).reshape(spec["shape"]).copy()
+    return {k: _restore(v, payload, header) for k, v in node.items()}
+
+
+def is_encoded(data: Any) -> bool:
+    return isinstance(data, (bytes, bytearray, memoryview)) and bytes(data[:4]) == MAGIC
+
+
+def loads(data: bytes | bytearray | memoryview) -> Any:
+    """解碼 dumps 的輸出；表格成為 LazyRows，其餘為一般 dict / list / 純量."""
+    view = memoryview(data)
+    magic, size = _HEADER.unpack_from(view)
+    if magic != MAGIC:
+        raise ValueError("不是 report_codec 編碼的資料")
+    start = _HEADER.size
+    header = json.loads(zlib.decompress(view[start : start + size]))
+    return _restore(header["root"], view[start + size :], header)
+
+
+# ════════════════════════════════════════════════════════════
+# Celery
+# ════════════════════════════════════════════════════════════
+
+
+def register_celery_serializer(float32: Iterable[str] = ()) -> None:
+    """向 kombu 註冊 "stocksx" 序列化器（結果後端用；任務參數仍走 JSON）."""
+    from kombu.serialization import register
+
+    fields = tuple(float32)
+    register(
+        SERIALIZER_NAME,
+        lambda obj: dumps(obj, float32=fields),
+        loads,
+        content_type=CONTENT_TYPE,
+        content_encoding="binary",
+    )
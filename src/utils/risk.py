@@ -8,6 +8,7 @@
 - 蒙特卡羅模擬未來回撤分佈
 - 相關性矩陣
 - 波動率錐
+- 批次 API：一次計算 (策略數 × 期數) 的報酬或權益矩陣
 
 用法：
     from src.utils.risk import RiskAnalyzer
@@ -16,6 +17,8 @@
     var_95 = analyzer.var(0.95)
     cvar_95 = analyzer.cvar(0.95)
     sim = analyzer.monte_carlo(n_simulations=10000, horizon=30)
+
+    metrics = batch_risk_metrics(returns_matrix)  # {"max_drawdown": (S,), ...}
 """
 
 from __future__ import annotations
@@ -79,124 +82,223 @@ class MonteCarloResult:
         }
 
 
+# ════════════════════════════════════════════════════════════
+# 批次計算核心（S 條序列 × T 期，NaN 補齊不等長序列）
+# ════════════════════════════════════════════════════════════
+
+
+def _as_matrix(series: Any) -> np.ndarray:
+    """序列集合 → (S, T) float 矩陣；不等長序列尾部以 NaN 補齊."""
+    if isinstance(series, np.ndarray):
+        arr = series.astype(np.float64, copy=False)
+        return arr.reshape(1, -1) if arr.ndim == 1 else arr
+    rows = [np.asarray(s, dtype=np.float64).reshape(-1) for s in series]
+    if not rows:
+        return np.empty((0, 0))
+    width = max(len(r) for r in rows)
+    out = np.full((len(rows), width), np.nan)
+    for i, r in enumerate(rows):
+        out[i, : len(r)] = r
+    return out
+
+
+def _drawdown_matrix(returns: np.ndarray, mask: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    回撤矩陣（正數）與創新高旗標.
+
+    權益從 1.0 起算，峰值初始為 1.0；補齊位置的回撤為 0。
+    """
+    equity = np.cumprod(1.0 + np.where(mask, returns, 0.0), axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 1.0), axis=1)
+    drawdown = np.where(mask, (peak - equity) / peak, 0.0)
+    prev_peak = np.concatenate((np.ones((len(peak), 1)), peak[:, :-1]), axis=1)
+    new_high = (equity > prev_peak) & mask
+    return drawdown, new_high
+
+
+def _drawdown_duration(new_high: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """最長未創新高期數（每列）."""
+    if new_high.size == 0:
+        return np.zeros(len(new_high), dtype=np.int64)
+    idx = np.arange(new_high.shape[1])
+    last_high = np.maximum.accumulate(np.where(new_high, idx, -1), axis=1)
+    duration = np.where(mask, idx - last_high, 0)
+    return duration.max(axis=1)
+
+
+def batch_risk_metrics(returns: Any) -> dict[str, np.ndarray]:
+    """
+    批次風險指標：一次計算多條報酬序列.
+
+    Args:
+        returns: (S, T) 陣列或 S 條報酬序列（可不等長，尾部補 NaN）
+
+    Returns:
+        與 RiskMetrics 欄位同名的 (S,) 陣列字典
+    """
+    r = _as_matrix(returns)
+    s = len(r)
+    mask = ~np.isnan(r)
+    n = mask.sum(axis=1)
+    filled = np.where(mask, r, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.where(n > 0, filled.sum(axis=1) / np.maximum(n, 1), 0.0)
+        centered = np.where(mask, r - mean[:, None], 0.0)
+        std = np.where(n >= 2, np.sqrt((centered**2).sum(axis=1) / np.maximum(n - 1, 1)), 0.0)
+
+        # VaR / CVaR：排序後取 int(n * (1 - c)) 位置
+        ordered = np.sort(r, axis=1)  # NaN 排在最後
+        prefix = np.cumsum(np.where(np.isnan(ordered), 0.0, ordered), axis=1)
+        rows = np.arange(s)
+        tail: dict[float, tuple[np.ndarray, np.ndarray]] = {}
+        for c in (0.95, 0.99):
+            k = np.clip((n * (1 - c)).astype(np.int64), 0, np.maximum(n - 1, 0))
+            if r.shape[1] == 0:
+                tail[c] = (np.zeros(s), np.zeros(s))
+                continue
+            var = np.where(n > 0, ordered[rows, k], 0.0)
+            cvar = np.where(n > 0, prefix[rows, k] / (k + 1), 0.0)
+            tail[c] = (var, cvar)
+
+        # 下行波動率：負報酬相對其均值的母體標準差
+        neg = mask & (filled < 0)
+        n_neg = neg.sum(axis=1)
+        mean_neg = np.where(n_neg > 0, np.where(neg, filled, 0.0).sum(axis=1) / np.maximum(n_neg, 1), 0.0)
+        var_neg = np.where(neg, (filled - mean_neg[:, None]) ** 2, 0.0).sum(axis=1) / np.maximum(n_neg, 1)
+        downside = np.where((n >= 2) & (n_neg > 0), np.sqrt(var_neg), 0.0)
+
+        drawdown, new_high = _drawdown_matrix(r, mask)
+        has = n > 0
+        max_dd = np.where(has, drawdown.max(axis=1, initial=0.0), 0.0)
+        ulcer = np.where(has, np.sqrt(((drawdown * 100) ** 2).sum(axis=1) / np.maximum(n, 1)), 0.0)
+        pain = np.where(has, drawdown.sum(axis=1) / np.maximum(n, 1), 0.0)
+
+    return {
+        "var_95": tail[0.95][0],
+        "var_99": tail[0.99][0],
+        "cvar_95": tail[0.95][1],
+        "cvar_99": tail[0.99][1],
+        "max_drawdown": max_dd,
+        "max_dd_duration": _drawdown_duration(new_high, mask),
+        "volatility": std,
+        "annualized_vol": std * math.sqrt(252),
+        "downside_vol": downside,
+        "ulcer_index": ulcer,
+        "pain_index": pain,
+        "mean": mean,
+        "n_periods": n,
+    }
+
+
+def batch_risk_metrics_from_equity(equity_curves: Any) -> dict[str, np.ndarray]:
+    """
+    批次風險指標（輸入權益曲線）.
+
+    Args:
+        equity_curves: (S, T) 權益陣列或 S 條權益序列（可不等長）
+    """
+    eq = _as_matrix(equity_curves)
+    if eq.shape[1] < 2:
+        return batch_risk_metrics(np.empty((len(eq), 0)))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        prev = eq[:, :-1]
+        returns = np.where(prev != 0, (eq[:, 1:] - prev) / prev, 0.0)
+    returns[np.isnan(eq[:, 1:])] = np.nan
+    return batch_risk_metrics(returns)
+
+
+def batch_compute_all(returns: Any) -> list[RiskMetrics]:
+    """批次計算並轉為 RiskMetrics 列表（順序與輸入一致）."""
+    m = batch_risk_metrics(returns)
+    fields = RiskMetrics.__slots__
+    return [
+        RiskMetrics(**{f: (int(m[f][i]) if f == "max_dd_duration" else float(m[f][i])) for f in fields})
+        for i in range(len(m["mean"]))
+    ]
+
+
 class RiskAnalyzer:
-    """風險分析器."""
+    """風險分析器（NumPy 陣列實作）."""
 
     def __init__(self, returns: list[float]) -> None:
         self._returns = returns
-        self._n = len(returns)
-        self._sorted = sorted(returns) if returns else []
+        self._arr = np.asarray(returns, dtype=np.float64).reshape(-1)
+        self._n = len(self._arr)
+        self._sorted_arr = np.sort(self._arr)
+        self._metrics: dict[str, np.ndarray] | None = None
+
+    def _batch(self) -> dict[str, np.ndarray]:
+        if self._metrics is None:
+            self._metrics = batch_risk_metrics(self._arr.reshape(1, -1))
+        return self._metrics
+
+    @property
+    def _sorted(self) -> list[float]:
+        return self._sorted_arr.tolist()
 
     @property
     def mean(self) -> float:
         if not self._n:
             return 0.0
-        return sum(self._returns) / self._n
+        return float(self._arr.mean())
 
     @property
     def std(self) -> float:
         if self._n < 2:
             return 0.0
-        m = self.mean
-        var = sum((r - m) ** 2 for r in self._returns) / (self._n - 1)
-        return math.sqrt(var)
+        return float(self._arr.std(ddof=1))
+
+    def _tail_index(self, confidence: float) -> int:
+        idx = int(self._n * (1 - confidence))
+        return max(0, min(idx, self._n - 1))
 
     def var(self, confidence: float = 0.95) -> float:
         """歷史 VaR（負值表示損失）."""
-        if not self._sorted:
+        if not self._n:
             return 0.0
-        idx = int(len(self._sorted) * (1 - confidence))
-        idx = max(0, min(idx, len(self._sorted) - 1))
-        return self._sorted[idx]
+        return float(self._sorted_arr[self._tail_index(confidence)])
 
     def cvar(self, confidence: float = 0.95) -> float:
         """CVaR / Expected Shortfall."""
-        if not self._sorted:
+        if not self._n:
             return 0.0
-        idx = int(len(self._sorted) * (1 - confidence))
-        idx = max(0, min(idx, len(self._sorted) - 1))
-        tail = self._sorted[: idx + 1]
-        return sum(tail) / len(tail) if tail else 0.0
+        return float(self._sorted_arr[: self._tail_index(confidence) + 1].mean())
 
     @property
     def max_drawdown(self) -> float:
         """最大回撤（正數）."""
-        if not self._returns:
+        if not self._n:
             return 0.0
-        peak = 1.0
-        equity = 1.0
-        max_dd = 0.0
-        for r in self._returns:
-            equity *= 1 + r
-            if equity > peak:
-                peak = equity
-            dd = (peak - equity) / peak
-            if dd > max_dd:
-                max_dd = dd
-        return max_dd
+        return float(self._batch()["max_drawdown"][0])
 
     @property
     def max_drawdown_duration(self) -> int:
         """最大回撤持續期數."""
-        if not self._returns:
+        if not self._n:
             return 0
-        peak = 1.0
-        equity = 1.0
-        max_dur = 0
-        cur_dur = 0
-        for r in self._returns:
-            equity *= 1 + r
-            if equity > peak:
-                peak = equity
-                cur_dur = 0
-            else:
-                cur_dur += 1
-                max_dur = max(max_dur, cur_dur)
-        return max_dur
+        return int(self._batch()["max_dd_duration"][0])
 
     @property
     def downside_volatility(self) -> float:
         """下行波動率."""
         if self._n < 2:
             return 0.0
-        neg = [r for r in self._returns if r < 0]
-        if not neg:
-            return 0.0
-        mean_neg = sum(neg) / len(neg)
-        var = sum((r - mean_neg) ** 2 for r in neg) / len(neg)
-        return math.sqrt(var)
+        return float(self._batch()["downside_vol"][0])
 
     @property
     def ulcer_index(self) -> float:
         """Ulcer Index — 回撤的 RMS."""
-        if not self._returns:
+        if not self._n:
             return 0.0
-        peak = 1.0
-        equity = 1.0
-        dd_squares: list[float] = []
-        for r in self._returns:
-            equity *= 1 + r
-            if equity > peak:
-                peak = equity
-            dd_pct = ((peak - equity) / peak) * 100 if peak else 0
-            dd_squares.append(dd_pct**2)
-        return math.sqrt(sum(dd_squares) / len(dd_squares)) if dd_squares else 0.0
+        return float(self._batch()["ulcer_index"][0])
 
     @property
     def pain_index(self) -> float:
         """Pain Index — 平均回撤百分比."""
-        if not self._returns:
+        if not self._n:
             return 0.0
-        peak = 1.0
-        equity = 1.0
-        total_dd = 0.0
-        for r in self._returns:
-            equity *= 1 + r
-            if equity > peak:
-                peak = equity
-            dd = (peak - equity) / peak if peak else 0
-            total_dd += dd
-        return total_dd / len(self._returns)
+        return float(self._batch()["pain_index"][0])
 
     def compute_all(self) -> RiskMetrics:
         """計算全部風險指標."""
@@ -228,10 +330,10 @@ class RiskAnalyzer:
             horizon: 預測天數
             initial_equity: 初始資金
         """
-        if not self._returns:
+        if not self._n:
             return MonteCarloResult()
 
-        returns_arr = np.array(self._returns, dtype=np.float64)
+        returns_arr = self._arr
 
         # 向量化: 一次性生成全部隨機路徑
         rng = np.random.default_rng(42)
@@ -278,12 +380,23 @@ def compute_correlation(returns_a: list[float], returns_b: list[float]) -> float
     n = min(len(returns_a), len(returns_b))
     if n < 2:
         return 0.0
-    a, b = returns_a[:n], returns_b[:n]
-    mean_a = sum(a) / n
-    mean_b = sum(b) / n
-    cov = sum((a[i] - mean_a) * (b[i] - mean_b) for i in range(n)) / (n - 1)
-    std_a = math.sqrt(sum((x - mean_a) ** 2 for x in a) / (n - 1))
-    std_b = math.sqrt(sum((x - mean_b) ** 2 for x in b) / (n - 1))
+    a = np.asarray(returns_a[:n], dtype=np.float64)
+    b = np.asarray(returns_b[:n], dtype=np.float64)
+    std_a = a.std(ddof=1)
+    std_b = b.std(ddof=1)
     if std_a == 0 or std_b == 0:
         return 0.0
+    cov = float(((a - a.mean()) * (b - b.mean())).sum() / (n - 1))
     return cov / (std_a * std_b)
+
+
+def correlation_matrix(returns: Any) -> np.ndarray:
+    """批次相關係數矩陣：(S, T) 報酬 → (S, S)，零波動序列的相關係數記為 0."""
+    r = _as_matrix(returns)
+    if r.shape[1] < 2:
+        return np.zeros((len(r), len(r)))
+    std = r.std(axis=1, ddof=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.cov(r) / np.outer(std, std)
+    corr[~np.isfinite(corr)] = 0.0
+    return np.atleast_2d(corr)
@@ -0,0 +1,159 @@
+"""
+共享記憶體 DataFrame — 多進程零拷貝分發 OHLCV
+
+發佈端把數值欄位一次寫入 multiprocessing.shared_memory；worker 以可 pickle 的
+SharedFrameHandle 附加，直接在共享緩衝區上建立唯讀 DataFrame，不再為每個任務 pickle 整份數據。
+字串、布林、分類等非數值欄位（如 akshare 的 code / name）原樣隨 handle pickle，不轉為 float，
+"000001" 這類代碼的前導零與 dtype 都保留。
+
+用法：
+    with SharedFrame(df) as shared:
+        pool = Pool(initializer=init, initargs=(shared.handle,))
+
+    # worker
+    df, shm = attach_frame(handle)   # shm 需與 df 同生命週期
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True, slots=True)
+class SharedFrameHandle:
+    """附加共享 DataFrame 所需的中繼資料（可 pickle；只有非數值欄位的大小隨數據量成長）"""
+
+    name: str
+    n_rows: int
+    columns: tuple[str, ...]
+    index_name: Any = None
+    index_kind: str = "range"  # range / datetime / int / object
+    index_tz: str | None = None
+    index_unit: str | None = None
+    index_values: tuple | None = None  # 僅 object 索引（無法放入 int64 區塊）時使用
+    # 非數值欄位：(在 columns 中的位置, 欄位名, 原始 array)，隨 handle pickle
+    extra_columns: tuple[tuple[int, str, Any], ...] = ()
+
+    @property
+    def shared_columns(self) -> tuple[str, ...]:
+        """放在共享區塊中的數值欄位（依原順序）."""
+        extra = {pos for pos, _, _ in self.extra_columns}
+        return tuple(c for i, c in enumerate(self.columns) if i not in extra)
+
+
+def _is_shared(values: pd.Series) -> bool:
+    """可無損放入 float64 區塊的數值欄位（布林與非數值欄位另外攜帶）."""
+    dtype = values.dtype
+    return pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+
+
+def _index_meta(index: pd.Index) -> dict[str, Any]:
+    if isinstance(index, pd.RangeIndex) and index.start == 0 and index.step == 1:
+        return {"index_kind": "range"}
+    if isinstance(index, pd.DatetimeIndex):
+        return {
+            "index_kind": "datetime",
+            "index_tz": str(index.tz) if index.tz is not None else None,
+            "index_unit": getattr(index, "unit", "ns"),
+        }
+    if pd.api.types.is_integer_dtype(index.dtype):
+        return {"index_kind": "int"}
+    return {"index_kind": "object", "index_values": tuple(index.tolist())}
+
+
+class SharedFrame:
+    """
+    發佈端：持有共享記憶體區塊，close() 時釋放並 unlink。
+
+    佈局為 (數值欄位數 + 1, 列數) 的 float64/int64 區塊：每個數值欄位連續存放，最後一列為 int64 索引。
+    數值欄位轉為 float64；非數值欄位不進共享區塊，原樣放在 handle.extra_columns。
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        n = len(df)
+        meta = _index_meta(df.index)
+        extra = tuple(
+            (pos, str(col), df[col].array) for pos, col in enumerate(df.columns) if not _is_shared(df[col])
+        )
+        shared = [col for col in df.columns if _is_shared(df[col])]
+        k = len(shared)
+        self._shm = shared_memory.SharedMemory(create=True, size=max(8, (k + 1) * n * 8))
+        values = np.ndarray((k, n), dtype=np.float64, buffer=self._shm.buf)
+        for j, col in enumerate(shared):
+            values[j] = df[col].to_numpy(dtype=np.float64)
+        index = np.ndarray((n,), dtype=np.int64, buffer=self._shm.buf, offset=k * n * 8)
+        if meta["index_kind"] == "datetime":
+            index[:] = df.index.asi8
+        elif meta["index_kind"] == "int":
+            index[:] = df.index.to_numpy(dtype=np.int64)
+        del values, index  # 釋放對 buffer 的引用，close() 才不會失敗
+
+        self.handle = SharedFrameHandle(
+            name=self._shm.name,
+            n_rows=n,
+            columns=tuple(str(c) for c in df.columns),
+            index_name=df.index.name,
+            extra_columns=extra,
+            **meta,
+        )
+
+    @property
+    def nbytes(self) -> int:
+        return self._shm.size
+
+    def close(self) -> None:
+        if self._shm is None:
+            return
+        self._shm.close()
+        self._shm.unlink()
+        self._shm = None
+
+    def __enter__(self) -> SharedFrame:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def attach_frame(handle: SharedFrameHandle) -> tuple[pd.DataFrame, shared_memory.SharedMemory]:
+    """
+    附加共享區塊並建立唯讀 DataFrame（零拷貝）。
+
+    回傳的 SharedMemory 必須比 DataFrame 活得久；對 DataFrame 的寫入會觸發 copy-on-write
+    （先 df.copy(deep=False) 再修改），直接原地寫入共享欄位會拋出 ValueError。
+    """
+    shm = shared_memory.SharedMemory(name=handle.name)
+    shared = handle.shared_columns
+    n, k = handle.n_rows, len(shared)
+    values = np.ndarray((k, n), dtype=np.float64, buffer=shm.buf)
+    values.flags.writeable = False
+    raw_index = np.ndarray((n,), dtype=np.int64, buffer=shm.buf, offset=k * n * 8)
+
+    if handle.index_kind == "datetime":
+        dtype = f"datetime64[{handle.index_unit or 'ns'}]"
+        index = pd.DatetimeIndex(raw_index.view(dtype), name=handle.index_name)
+        if handle.index_tz:
+            index = index.tz_localize("UTC").tz_convert(handle.index_tz)
+    elif handle.index_kind == "int":
+        index = pd.Index(raw_index.copy(), name=handle.index_name)
+    elif handle.index_kind == "object":
+        index = pd.Index(list(handle.index_values or ()), name=handle.index_name)
+    else:
+        index = pd.RangeIndex(n, name=handle.index_name)
+
+    df = pd.DataFrame(values.T, index=index, columns=list(shared), copy=False)
+    # 依原位置插回非數值欄位（insert 只新增區塊，不複製共享欄位）
+    for pos, name, array in handle.extra_columns:
+        df.insert(pos, name, array)
+    return df, shm
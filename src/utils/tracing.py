@@ -0,0 +1,472 @@
+"""
+輕量追蹤 — Orchestrator → Provider → Pipeline → Engine → SignalBus 的延遲分解
+
+預設為空操作：span() 只做一次判斷就回傳共用的空物件。啟用方式：
+  - STOCKSX_TRACE_FILE=/tmp/trace.jsonl   每個 span 結束時寫一行 JSON（多進程可同時附加）
+  - STOCKSX_TRACE=otel                     轉交 opentelemetry API（由應用安裝的 SDK 決定匯出目標）
+  - 程式內 configure(FileExporter(path)) / configure(MemoryExporter())
+
+trace_id / span_id 與 W3C traceparent 格式相容；inject / attach 在 Celery 任務間傳遞，
+propagate(fn) 包裝後可送進 ThreadPoolExecutor / ProcessPoolExecutor，子進程的 span 會接在父 span 之下。
+離線分析：collapse_stacks(load_spans(path)) 輸出 flamegraph.pl / speedscope 可讀的摺疊堆疊。
+
+用法：
+    from src.utils import tracing
+
+    with tracing.span("engine.run", bars=len(rows)) as sp:
+        ...
+        sp.set_attribute("trades", n)
+"""
+
+from __future__ import annotations
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+TRACEPARENT = "traceparent"
+
+# 目前所在 span 的 (trace_id, span_id)；跨執行緒 / 進程時由 attach 還原
+_current: contextvars.ContextVar[tuple[str, str] | None] = contextvars.ContextVar("stocksx_span", default=None)
+
+
+# ════════════════════════════════════════════════════════════
+# 匯出器
+# ════════════════════════════════════════════════════════════
+
+
+class MemoryExporter:
+    """保留在記憶體（測試 / 互動分析用）"""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+
+class FileExporter:
+    """
+    JSON Lines 檔案：每個 span 一行，以 O_APPEND 單次寫入，fork 出的子進程可共用同一檔案
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        line = json.dumps(span.to_dict(), ensure_ascii=False, default=str) + "\n"
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+
+_exporter: MemoryExporter | FileExporter | Any | None = None
+_otel_tracer: Any = None
+
+
+def configure(exporter: Any | None = None, otel: bool = False) -> None:
+    """
+    啟用追蹤
+
+    Args:
+        exporter: 具 export(span) 方法的物件（FileExporter / MemoryExporter / 自訂）
+        otel: 改用 opentelemetry API（需安裝 opentelemetry-api；exporter 被忽略）
+    """
+    global _exporter, _otel_tracer
+    _exporter, _otel_tracer = None, None
+    if otel:
+        try:
+            from opentelemetry import trace
+        except ImportError:
+            logger.warning("opentelemetry 未安裝，追蹤維持停用")
+            return
+        _otel_tracer = trace.get_tracer("stocksx")
+        return
+    _exporter = exporter
+
+
+def disable() -> None:
+    configure(None)
+
+
+def tracing_enabled() -> bool:
+    return _exporter is not None or _otel_tracer is not None
+
+
+def _configure_from_env() -> None:
+    if os.getenv("STOCKSX_TRACE", "").lower() == "otel":
+        configure(otel=True)
+    elif os.getenv("STOCKSX_TRACE_FILE"):
+        configure(FileExporter(os.environ["STOCKSX_TRACE_FILE"]))
+
+
+# ════════════════════════════════════════════════════════════
+# Span
+# ════════════════════════════════════════════════════════════
+
+
+@dataclass(slots=True)
+class Span:
+    """一段計時區間（時間為 epoch 奈秒，與 OpenTelemetry 相同）"""
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None = None
+    attributes: dict[str, Any] = field(default_factory=dict)
+    start_ns: int = 0
+    end_ns: int = 0
+    status: str = "ok"
+    pid: int = 0
+    thread: str = ""
+    _token: contextvars.Token | None = None
+
+    @property
+    def duration_ns(self) -> int:
+        return max(0, self.end_ns - self.start_ns)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def __enter__(self) -> Span:
+        self.start_ns = time.time_ns()
+        self.pid = os.getpid()
+        self.thread = threading.current_thread().name
+        self._token = _current.set((self.trace_id, self.span_id))
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> None:
+        self.end(exc)
+
+    def end(self, error: BaseException | None = None) -> None:
+        """結束並匯出（重複呼叫無效）"""
+        if self.end_ns:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.status = "error"
+            self.attributes["error"] = f"{type(error).__name__}: {error}"
+        if self._token is not None:
+            try:
+                _current.reset(self._token)
+            except ValueError:  # 在其他 context 結束（如 Celery postrun），直接清除
+                _current.set(None)
+            self._token = None
+        exporter = _exporter
+        if exporter is not None:
+            try:
+                exporter.export(self)
+            except Exception as e:
+                logger.warning("span 匯出失敗: %s", e)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "status": self.status,
+            "pid": self.pid,
+            "thread": self.thread,
+            "attributes": self.attributes,
+        }
+
+    @classmethod
+    def from_dict(cls, d: dict[str, Any]) -> Span:
+        return cls(**{k: d[k] for k in d if k in cls.__dataclass_fields__ and not k.startswith("_")})
+
+
+class _NullSpan:
+    """停用時的共用 span"""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def end(self, error: BaseException | None = None) -> None:
+        pass
+
+    def __enter__(self) -> _NullSpan:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _OtelSpan:
+    """包裝 opentelemetry span，提供與 Span 相同的 set_attribute / end / context manager 介面"""
+
+    __slots__ = ("_cm", "_span")
+
+    def __init__(self, name: str, attributes: dict[str, Any], context: Any = None) -> None:
+        self._cm = _otel_tracer.start_as_current_span(name, context=context, attributes=_otel_attributes(attributes))
+        self._span = None
+
+    def __enter__(self) -> _OtelSpan:
+        self._span = self._cm.__enter__()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        if self._cm is not None:
+            self._cm.__exit__(*exc)
+            self._cm = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        if self._span is not None:
+            self._span.set_attribute(key, _otel_value(value))
+
+    def end(self, error: BaseException | None = None) -> None:
+        if error is None:
+            self.__exit__(None, None, None)
+        else:
+            self.__exit__(type(error), error, error.__traceback__)
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (str, bool, int, float)) else str(value)
+
+
+def _otel_attributes(attributes: dict[str, Any]) -> dict[str, Any]:
+    return {k: _otel_value(v) for k, v in attributes.items()}
+
+
+def _new_id(bits: int) -> str:
+    return f"{random.getrandbits(bits):0{bits // 4}x}"
+
+
+def span(name: str, **attributes: Any) -> Span | _OtelSpan | _NullSpan:
+    """
+    建立子 span（需以 with 使用）；停用時回傳共用空物件
+
+    Args:
+        name: 名稱，建議 "元件.操作"（如 provider.fetch_ohlcv、engine.core）
+        **attributes: 附加屬性（symbol、bars 等）
+    """
+    if _exporter is None:
+        if _otel_tracer is None:
+            return _NULL_SPAN
+        return _OtelSpan(name, attributes)
+    return _native_span(name, attributes, _current.get())
+
+
+def _native_span(name: str, attributes: dict[str, Any], parent: tuple[str, str] | None) -> Span:
+    if parent is None:
+        return Span(name, _new_id(128), _new_id(64), None, attributes)
+    return Span(name, parent[0], _new_id(64), parent[1], attributes)
+
+
+def start_span(name: str, carrier: dict[str, str] | None = None, **attributes: Any) -> Span | _OtelSpan | _NullSpan:
+    """
+    手動開始 span 並設為目前 span（無法用 with 包住的流程，如 Celery prerun / postrun），以 span.end() 結束
+
+    Args:
+        carrier: inject() 產生的 traceparent（接續遠端父 span；None 時接在目前 span 之下）
+    """
+    if _exporter is None:
+        if _otel_tracer is None:
+            return _NULL_SPAN
+        context = None
+        if carrier:
+            from opentelemetry import propagate as otel_propagate
+
+            context = otel_propagate.extract(carrier)
+        return _OtelSpan(name, attributes, context=context).__enter__()
+    parent = _parse_traceparent(carrier) if carrier else None
+    return _native_span(name, attributes, parent or _current.get()).__enter__()
+
+
+def traced(name: str | None = None) -> Callable[[F], F]:
+    """裝飾器：整個函式包成一個 span（名稱預設為 module.qualname）"""
+
+    def decorator(func: F) -> F:
+        span_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not tracing_enabled():
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+# ════════════════════════════════════════════════════════════
+# 跨執行緒 / 進程 / 任務傳遞
+# ════════════════════════════════════════════════════════════
+
+
+def inject() -> dict[str, str]:
+    """目前 span 的 W3C traceparent（無 span 或停用時為空 dict）"""
+    if _otel_tracer is not None:
+        from opentelemetry import propagate as otel_propagate
+
+        carrier: dict[str, str] = {}
+        otel_propagate.inject(carrier)
+        return carrier
+    current = _current.get()
+    if _exporter is None or current is None:
+        return {}
+    return {TRACEPARENT: f"00-{current[0]}-{current[1]}-01"}
+
+
+@contextmanager
+def attach(carrier: dict[str, str] | None) -> Iterator[None]:
+    """在 with 區塊內以 carrier 的 span 作為父 span"""
+    if not carrier:
+        yield
+        return
+    if _otel_tracer is not None:
+        from opentelemetry import context as otel_context
+        from opentelemetry import propagate as otel_propagate
+
+        token = otel_context.attach(otel_propagate.extract(carrier))
+        try:
+            yield
+        finally:
+            otel_context.detach(token)
+        return
+    parent = _parse_traceparent(carrier)
+    if parent is None:
+        yield
+        return
+    token = _current.set(parent)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def _parse_traceparent(carrier: dict[str, str]) -> tuple[str, str] | None:
+    parts = carrier.get(TRACEPARENT, "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class _Propagated:
+    """可 pickle 的包裝：在執行端還原父 span 與匯出設定後呼叫 fn"""
+
+    __slots__ = ("carrier", "fn", "trace_file")
+
+    def __init__(self, fn: Callable[..., Any], carrier: dict[str, str], trace_file: str | None) -> None:
+        self.fn = fn
+        self.carrier = carrier
+        self.trace_file = trace_file
+
+    def __getstate__(self) -> tuple:
+        return self.fn, self.carrier, self.trace_file
+
+    def __setstate__(self, state: tuple) -> None:
+        self.fn, self.carrier, self.trace_file = state
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        # spawn 啟動的子進程沒有父進程的設定，依 carrier 附帶的檔案路徑啟用
+        if self.trace_file and not tracing_enabled():
+            configure(FileExporter(self.trace_file))
+        with attach(self.carrier):
+            return self.fn(*args, **kwargs)
+
+
+def propagate(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    包裝要送進執行緒池 / 進程池的函式，使其 span 接在目前 span 之下
+
+    停用或不在 span 內時直接回傳 fn（零開銷）；fn 需可 pickle 才能送進進程池。
+    """
+    carrier = inject()
+    if not carrier:
+        return fn
+    trace_file = _exporter.path if isinstance(_exporter, FileExporter) else None
+    return _Propagated(fn, carrier, trace_file)
+
+
+# ════════════════════════════════════════════════════════════
+# 離線分析
+# ════════════════════════════════════════════════════════════
+
+
+def load_spans(path: str) -> list[Span]:
+    """讀取 FileExporter 輸出（略過毀損行）"""
+    spans: list[Span] = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                spans.append(Span.from_dict(json.loads(line)))
+            except (ValueError, TypeError):
+                continue
+    return spans
+
+
+def collapse_stacks(spans: Iterable[Span]) -> dict[str, int]:
+    """
+    摺疊堆疊：{"root;child;leaf": 自身耗時微秒}
+
+    自身耗時 = span 耗時 − 子 span 耗時總和（子 span 在其他進程並行時可能超過父 span，取 0 下限）。
+    父 span 不在資料中（如只收集到子進程）時，該 span 視為根。
+    """
+    spans = list(spans)
+    by_id = {s.span_id: s for s in spans}
+    child_ns: dict[str, int] = defaultdict(int)
+    for s in spans:
+        if s.parent_id in by_id:
+            child_ns[s.parent_id] += s.duration_ns
+
+    paths: dict[str, str] = {}
+
+    def path_of(s: Span) -> str:
+        cached = paths.get(s.span_id)
+        if cached is not None:
+            return cached
+        chain = [s.name]
+        seen = {s.span_id}
+        parent = by_id.get(s.parent_id) if s.parent_id else None
+        while parent is not None and parent.span_id not in seen:
+            seen.add(parent.span_id)
+            chain.append(parent.name)
+            parent = by_id.get(parent.parent_id) if parent.parent_id else None
+        paths[s.span_id] = ";".join(reversed(chain))
+        return paths[s.span_id]
+
+    stacks: dict[str, int] = defaultdict(int)
+    for s in spans:
+        self_us = max(0, s.duration_ns - child_ns.get(s.span_id, 0)) // 1000
+        stacks[path_of(s)] += self_us
+    return dict(stacks)
+
+
+def write_collapsed(spans: Iterable[Span], path: str) -> None:
+    """寫出 flamegraph.pl / speedscope 格式（每行 "a;b;c 微秒"）"""
+    with open(path, "w", encoding="utf-8") as f:
+        for stack, us in sorted(collapse_stacks(spans).items()):
+            f.write(f"{stack} {us}\n")
+
+
+_configure_from_env()
@@ -15,6 +15,9 @@ import ccxt
 import jwt
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+
+from src.utils import metrics
 
 # 嘗試導入結構化日誌
 try:
@@ -99,6 +102,7 @@ class ConnectionManager:
             "last_pong": time.time(),
         }
         self._total_connections += 1
+        metrics.set_ws_connections(self.connection_count)
         logger.info("ws_connect", extra={"user_id": user_id, "symbol": symbol, "total": self.connection_count})
 
     def disconnect(self, user_id: int, symbol: str) -> None:
@@ -106,6 +110,7 @@ class ConnectionManager:
             self.active_connections[user_id].pop(symbol, None)
             if not self.active_connections[user_id]:
                 del self.active_connections[user_id]
+        metrics.set_ws_connections(self.connection_count)
         logger.info("ws_disconnect", extra={"user_id": user_id, "symbol": symbol, "total": self.connection_count})
 
     async def send_to_user(self, message: dict, user_id: int, symbol: str | None = None) -> bool:
@@ -135,17 +140,21 @@ class ConnectionManager:
     async def broadcast(self, message: dict) -> int:
         """廣播消息給所有連接，返回成功發送數."""
         sent = 0
-        for user_id in list(self.active_connections):
-            for symbol in list(self.active_connections.get(user_id, {})):
-                entry = self.active_connections[user_id].get(symbol)
-                if not entry:
-                    continue
-                try:
-                    await entry["ws"].send_json(message)
-                    self._total_messages += 1
-                    sent += 1
-                except Exception:
-                    self.disconnect(user_id, symbol)
+        msg_type = message.get("type", "")
+        with metrics.ws_fanout(msg_type, self.connection_count) as fanout:
+            for user_id in list(self.active_connections):
+                for symbol in list(self.active_connections.get(user_id, {})):
+                    entry = self.active_connections[user_id].get(symbol)
+                    if not entry:
+                        continue
+                    try:
+                        await entry["ws"].send_json(message)
+                        self._total_messages += 1
+                        sent += 1
+                        fanout.sent(True)
+                    except Exception:
+                        fanout.sent(False)
+                        self.disconnect(user_id, symbol)
         return sent
 
     async def cleanup_stale(self, timeout: float = 90.0) -> int:
@@ -208,7 +217,8 @@ async def fetch_price(symbol: str) -> dict[str, Any] | None:
         if not exchange:
             return None
 
-        ticker = await asyncio.to_thread(exchange.fetch_ticker, symbol)
+        with metrics.provider_timer("ccxt:binance", "fetch_ticker"):
+            ticker = await asyncio.to_thread(exchange.fetch_ticker, symbol)
         last_price = ticker.get("last", 0)
 
         if last_price and last_price > 0:
@@ -254,13 +264,15 @@ async def price_push_loop() -> None:
                 if not price_data:
                     continue
                 msg = {"type": "price_update", "data": price_data}
-                for user_id, conns in list(manager.active_connections.items()):
-                    entry = conns.get(symbol)
-                    if entry:
+                targets = [(uid, conns[symbol]) for uid, conns in manager.active_connections.items() if symbol in conns]
+                with metrics.ws_fanout("price_update", len(targets)) as fanout:
+                    for user_id, entry in targets:
                         try:
                             await entry["ws"].send_json(msg)
                             manager._total_messages += 1
+                            fanout.sent(True)
                         except Exception:
+                            fanout.sent(False)
                             manager.disconnect(user_id, symbol)
         except Exception as e:
             logger.error("price_push_error", extra={"error": str(e)})
@@ -379,6 +391,7 @@ async def websocket_endpoint(
                         "ws": websocket,
                         "last_pong": time.time(),
                     }
+                metrics.set_ws_connections(manager.connection_count)
                 await websocket.send_json({"type": "subscribed", "symbols": list(subscribed)})
                 logger.info("ws_subscribe", extra={"user_id": user_id, "symbols": list(subscribed)})
 
@@ -387,6 +400,7 @@ async def websocket_endpoint(
                     subscribed.discard(s)
                     if user_id in manager.active_connections:
                         manager.active_connections[user_id].pop(s, None)
+                metrics.set_ws_connections(manager.connection_count)
                 await websocket.send_json({"type": "unsubscribed", "symbols": list(subscribed)})
 
             elif action == "pong":
@@ -436,6 +450,13 @@ async def health_detailed() -> dict:
     }
 
 
+@app.get("/metrics")
+async def prometheus_metrics() -> Response:
+    """Prometheus 指標（回測、數據源延遲、快取命中率、WebSocket 佇列深度等）."""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/subscriptions/{user_id}")
 async def subscriptions(user_id: int) -> dict:
     """查看用戶訂閱."""
@@ -8,6 +8,25 @@ import os
 
 import pytest
 
+# 測試不讀寫 cache/backtests 的持久回測結果快取；需要快取的測試自行建立 BacktestResultCache
+os.environ.setdefault("BT_CACHE", "0")
+
+
+@pytest.fixture(autouse=True)
+def isolated_result_cache(monkeypatch, tmp_path):
+    """
+    每個測試各自的全域回測結果快取：L3 磁碟層寫在 tmp_path，
+    經 Orchestrator.run_backtest / optimizer 的測試即使開啟 BT_CACHE 也不會在 checkout 的 cache/ 留下檔案。
+    """
+    from src.core import result_cache
+    from src.core.config import get_settings
+
+    cache = result_cache.BacktestResultCache(
+        disk_dir=tmp_path / "backtests", enabled=get_settings().cache.result_cache
+    )
+    monkeypatch.setattr(result_cache, "_result_cache", cache)
+    return cache
+
 
 @pytest.fixture(scope="session")
 def test_env():
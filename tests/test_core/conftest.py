@@ -3,8 +3,14 @@
 import os
 import tempfile
 
+import pandas as pd
 import pytest
 
+from src.strategies import conformance
+
+SINCE = 1_700_000_000_000
+HOUR_MS = 3_600_000
+
 
 @pytest.fixture
 def tmp_db():
@@ -13,3 +19,54 @@ def tmp_db():
     os.close(fd)
     yield path
     os.unlink(path)
+
+
+def synthetic_rows(
+    n: int = 600,
+    seed: int = 0,
+    *,
+    vol: float = 0.01,
+    wave: float = 0.0,
+    period: float = 30.0,
+    spread: float = 0.003,
+    step_ms: int = HOUR_MS,
+    since: int = SINCE,
+) -> list[dict]:
+    """
+    測試預設形狀的合成 K 線（小時線、固定影線），數據由 conformance.synthetic_rows 產生。
+
+    Args:
+        n: K 線數
+        seed: 亂數種子
+        vol: 每根 K 線對數報酬的標準差
+        wave: 疊加在對數價格上的正弦振幅（讓均線策略有趨勢可抓）
+        period: 正弦週期（以 2π 根 K 線為單位）
+        spread: high / low 相對實體的偏移
+        step_ms: K 線間隔（毫秒）
+        since: 第一根 K 線時間戳
+    """
+    return conformance.synthetic_rows(
+        n,
+        seed,
+        vol,
+        wave=wave,
+        period=period,
+        spread=spread,
+        start=pd.Timestamp(since, unit="ms"),
+        freq=pd.Timedelta(step_ms, unit="ms"),
+    )
+
+
+@pytest.fixture
+def make_rows():
+    """合成 K 線工廠（見 synthetic_rows），測試內自訂長度、種子與走勢."""
+    return synthetic_rows
+
+
+@pytest.fixture
+def ohlcv_rows(request):
+    """
+    預設形狀的合成 K 線；長度以 indirect 參數化：
+        @pytest.mark.parametrize("ohlcv_rows", [1200], indirect=True)
+    """
+    return synthetic_rows(getattr(request, "param", 600))
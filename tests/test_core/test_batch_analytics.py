@@ -0,0 +1,93 @@
+"""
+測試批次風險 / 投資組合分析 — 陣列批次結果須與逐條計算一致
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def return_series():
+    rng = np.random.default_rng(7)
+    series = [rng.normal(0.0005, 0.02, n).tolist() for n in (250, 120, 3)]
+    series.append([-0.01, -0.02, -0.03])
+    series.append([0.01])
+    return series
+
+
+class TestBatchRiskMetrics:
+    def test_matches_risk_analyzer_for_ragged_input(self, return_series):
+        from src.utils.risk import RiskAnalyzer, batch_compute_all
+
+        batch = batch_compute_all(return_series)
+        assert len(batch) == len(return_series)
+        for series, got in zip(return_series, batch):
+            expected = RiskAnalyzer(series).compute_all()
+            for name in expected.__slots__:
+                assert getattr(got, name) == pytest.approx(getattr(expected, name), rel=1e-9, abs=1e-12), name
+
+    def test_matrix_input_shapes(self):
+        from src.utils.risk import batch_risk_metrics
+
+        returns = np.random.default_rng(0).normal(0, 0.01, (300, 500))
+        m = batch_risk_metrics(returns)
+        assert m["max_drawdown"].shape == (300,)
+        assert np.all(m["max_drawdown"] >= 0)
+        assert np.all(m["var_99"] <= m["var_95"])
+        assert np.all(m["n_periods"] == 500)
+
+    def test_drawdown_duration(self):
+        from src.utils.risk import batch_risk_metrics
+
+        # 創新高 → 連續 3 期未創新高 → 再創新高
+        m = batch_risk_metrics([[0.1, -0.05, 0.01, 0.01, 0.2]])
+        assert m["max_dd_duration"][0] == 3
+
+    def test_from_equity_curves(self):
+        from src.utils.risk import RiskAnalyzer, batch_risk_metrics_from_equity
+
+        equity = [[100, 110, 99, 120], [100, 90, 95]]
+        m = batch_risk_metrics_from_equity(equity)
+        assert m["max_drawdown"][0] == pytest.approx(0.1)
+        assert m["max_drawdown"][1] == pytest.approx(RiskAnalyzer([-0.1, 95 / 90 - 1]).max_drawdown)
+
+    def test_correlation_matrix(self):
+        from src.utils.risk import compute_correlation, correlation_matrix
+
+        rng = np.random.default_rng(3)
+        a, b = rng.normal(size=50), rng.normal(size=50)
+        corr = correlation_matrix(np.vstack([a, b, np.zeros(50)]))
+        assert corr[0, 1] == pytest.approx(compute_correlation(a.tolist(), b.tolist()))
+        assert corr[0, 2] == 0.0
+
+
+class TestBatchPortfolioMetrics:
+    def test_matches_single_portfolio(self):
+        from src.utils.portfolio import PortfolioAnalyzer
+
+        rng = np.random.default_rng(11)
+        returns = {f"A{i}": rng.normal(0.001, 0.01 * (i + 1), 200).tolist() for i in range(4)}
+        pa = PortfolioAnalyzer(returns, risk_free_rate=0.02)
+        weights = rng.dirichlet(np.ones(4), size=64)
+
+        batch = pa.batch_portfolio_metrics(weights)
+        for k in (0, 31, 63):
+            single = pa.portfolio_metrics(weights[k].tolist())
+            assert batch["annual_return"][k] == pytest.approx(single.annual_return)
+            assert batch["sharpe_ratio"][k] == pytest.approx(single.sharpe_ratio)
+            assert batch["max_drawdown"][k] == pytest.approx(single.max_drawdown)
+            assert batch["diversification_ratio"][k] == pytest.approx(single.diversification_ratio)
+        # 風險貢獻加總 = 組合波動率
+        port_vol = np.sqrt(np.einsum("ki,ij,kj->k", weights, pa.covariance_array, weights))
+        assert np.allclose(batch["risk_contributions"].sum(axis=1), port_vol)
+
+    def test_covariance_dict_matches_numpy(self):
+        from src.utils.portfolio import PortfolioAnalyzer
+
+        returns = {"A": [0.01, 0.02, -0.01, 0.0], "B": [0.0, 0.01, 0.02, -0.02, 0.05]}
+        pa = PortfolioAnalyzer(returns)
+        expected = np.cov(np.array([returns["A"], returns["B"][:4]]))
+        assert pa.covariance_matrix["A"]["B"] == pytest.approx(expected[0, 1])
+        assert pa.covariance_matrix["B"]["B"] == pytest.approx(expected[1, 1])
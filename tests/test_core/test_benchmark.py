@@ -0,0 +1,107 @@
+"""
+測試基準測試框架 — 計時、峰值記憶體、基準檔讀寫與回歸比對
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def _result(name="engine.loop", size=1000, median=0.01, peak=1_000_000, error=None):
+    from src.utils.benchmark import BenchmarkResult
+
+    return BenchmarkResult(name, "engine", size, 5, median, median, median, peak, error=error)
+
+
+class TestMeasure:
+    def test_warmup_repeat_and_peak_memory(self):
+        from src.utils.benchmark import measure
+
+        calls = []
+
+        def allocate():
+            calls.append(1)
+            return np.ones(1_000_000)
+
+        times, peak = measure(allocate, repeat=3, warmup=2)
+        assert len(times) == 3 and all(t >= 0 for t in times)
+        # 暖身 2 次 + 計時 3 次 + 記憶體量測 1 次
+        assert len(calls) == 6
+        assert peak >= 8_000_000
+
+    def test_run_suite_sizes_and_errors(self):
+        from src.utils.benchmark import BenchmarkCase, run_suite
+
+        def boom(n):
+            raise RuntimeError("no data")
+
+        cases = [
+            BenchmarkCase("ok.sum", "ok", lambda n: np.arange(n), lambda a: a.sum(), max_size=100),
+            BenchmarkCase("ok.fixed", "ok", lambda n: n, lambda n: n, sizes=(7,)),
+            BenchmarkCase("bad.setup", "bad", boom, lambda s: s),
+        ]
+        seen = []
+        run = run_suite(cases, sizes=(10, 1000), repeat=2, warmup=0, on_result=seen.append)
+        assert [r.key for r in run.results] == ["ok.sum@10", "ok.fixed@7", "bad.setup@10", "bad.setup@1000"]
+        assert len(seen) == 4 and run.results[0].repeat == 2
+        assert run.results[2].error == "RuntimeError: no data"
+        assert "python" in run.environment and run.created_at
+
+
+class TestBaseline:
+    def test_roundtrip_skips_failed_results(self, tmp_path):
+        from src.utils.benchmark import BenchmarkRun, load_baseline, save_baseline
+
+        path = str(tmp_path / "bench" / "baseline.json")
+        assert load_baseline(path) is None
+        run = BenchmarkRun([_result(), _result("engine.vec", error="boom")], created_at="t0", environment={"a": 1})
+        save_baseline(run, path)
+        loaded = load_baseline(path)
+        assert [r.key for r in loaded.results] == ["engine.loop@1000"]
+        assert loaded.results[0] == run.results[0] and loaded.created_at == "t0"
+
+    def test_compare_flags_slowdowns_past_threshold(self):
+        from src.utils.benchmark import BenchmarkRun, compare
+
+        baseline = BenchmarkRun(
+            [_result(median=0.010), _result(size=100_000, median=0.5), _result("tiny", median=1e-6)]
+        )
+        current = BenchmarkRun(
+            [
+                _result(median=0.011),
+                _result(size=100_000, median=0.8, peak=3_000_000),
+                _result("tiny", median=1e-3),
+                _result("new.case", median=9.0),
+            ]
+        )
+        regressions = compare(current, baseline, threshold=0.2)
+        assert [(r.key, r.metric) for r in regressions] == [("engine.loop@100000", "median_s")]
+        assert regressions[0].ratio == 1.6 and "500.00ms" in regressions[0].describe()
+        with_memory = compare(current, baseline, threshold=0.2, memory_threshold=0.5)
+        assert ("engine.loop@100000", "peak_bytes") in [(r.key, r.metric) for r in with_memory]
+        assert compare(current, None) == []
+
+
+class TestSuiteScript:
+    def test_regressed_run_does_not_replace_baseline(self, monkeypatch, tmp_path):
+        import importlib.util
+        from pathlib import Path
+
+        from src.utils.benchmark import BenchmarkRun, load_baseline
+
+        path = Path(__file__).resolve().parents[2] / "scripts" / "benchmark_suite.py"
+        spec = importlib.util.spec_from_file_location("benchmark_suite", path)
+        suite = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(suite)
+
+        timings = iter([0.010, 0.050, 0.050])
+        monkeypatch.setattr(suite, "build_cases", lambda groups, only: [])
+        monkeypatch.setattr(suite, "run_suite", lambda *a, **k: BenchmarkRun([_result(median=next(timings))]))
+        baseline = str(tmp_path / "baseline.json")
+        argv = ["--baseline", baseline, "--sizes", "1000"]
+
+        assert suite.main(argv) == 0
+        assert suite.main(argv) == 1
+        assert load_baseline(baseline).results[0].median_s == 0.010
+        assert suite.main(argv + ["--update-baseline"]) == 1
+        assert load_baseline(baseline).results[0].median_s == 0.050
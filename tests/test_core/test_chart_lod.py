@@ -0,0 +1,135 @@
+"""
+測試圖表降採樣 — min-max / LTTB 保留極值、多解析度金字塔的視窗查詢、ChartLOD 鍵與容量逐出
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from .conftest import SINCE
+
+
+def _series(n: int, seed: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    x = SINCE + np.arange(n, dtype=np.int64) * 60_000
+    y = 10_000 * np.exp(np.cumsum(rng.normal(0, 0.001, n)))
+    return x, y
+
+
+def _bars(n: int) -> list[dict]:
+    x, close = _series(n, seed=1)
+    return [
+        {"timestamp": int(t), "open": c, "high": c * 1.01, "low": c * 0.99, "close": c, "volume": 1.0}
+        for t, c in zip(x, close.tolist())
+    ]
+
+
+class TestAlgorithms:
+    def test_minmax_and_lttb(self):
+        from src.utils.downsample import lttb_indices, minmax_indices
+
+        x, y = _series(100_000)
+        y[54_321] = 1.0  # 插針
+        y[777] = np.nan
+        idx = minmax_indices(y, 500)
+        assert len(idx) <= 1002 and idx[0] == 0 and idx[-1] == len(y) - 1
+        assert np.all(np.diff(idx) > 0) and 54_321 in idx and np.nanmax(y) in y[idx]
+
+        idx = lttb_indices(x, y, 800)
+        assert len(idx) == 800 and idx[0] == 0 and idx[-1] == len(y) - 1 and np.all(np.diff(idx) > 0)
+        assert 54_321 in idx  # 面積最大的點就是插針
+        assert lttb_indices(x[:10], y[:10], 800).tolist() == list(range(10))
+
+    def test_aggregate_ohlcv(self):
+        from src.utils.downsample import aggregate_ohlcv
+
+        cols = {
+            "timestamp": np.arange(6),
+            "open": np.array([1.0, 2, 3, 4, 5, 6]),
+            "high": np.array([5.0, 9, 1, 2, 8, 3]),
+            "low": np.array([0.5, 1, 0.1, 2, 3, 1]),
+            "close": np.array([1.5, 2.5, 3.5, 4.5, 5.5, 6.5]),
+            "volume": np.ones(6),
+            "MA20": np.arange(6.0),
+        }
+        out = aggregate_ohlcv(cols, np.array([0, 4]))
+        assert out["timestamp"].tolist() == [0, 4] and out["open"].tolist() == [1, 5]
+        assert out["high"].tolist() == [9, 8] and out["low"].tolist() == [0.1, 1]
+        assert out["close"].tolist() == [4.5, 6.5] and out["volume"].tolist() == [4, 2]
+        assert out["MA20"].tolist() == [3, 5]
+
+
+class TestPyramids:
+    def test_series_view_is_bounded_and_zoomable(self):
+        from src.utils.downsample import SeriesPyramid, drawdown_pct
+
+        x, y = _series(300_000)
+        dd = drawdown_pct(y)
+        pyramid = SeriesPyramid(x, {"equity": y, "drawdown_pct": dd})
+        assert len(pyramid.levels) > 2 and pyramid.span == (int(x[0]), int(x[-1]))
+
+        full = pyramid.view(1000)
+        assert 1000 <= len(full["timestamp"]) <= 1002
+        assert full["equity"].max() == y.max() and full["drawdown_pct"].min() == dd.min()
+
+        # 放大後從較細的層取點，視窗內仍保留區間極值
+        lo, hi = 100_000, 101_500
+        zoom = pyramid.view(1000, int(x[lo]), int(x[hi]))
+        assert len(zoom["timestamp"]) <= 1002 and x[lo] <= zoom["timestamp"][0] and zoom["timestamp"][-1] <= x[hi]
+        assert zoom["equity"].max() == y[lo : hi + 1].max()
+        tiny = pyramid.view(1000, int(x[lo]), int(x[lo + 99]))
+        assert tiny["equity"].tolist() == y[lo : lo + 100].tolist()
+
+    def test_ohlcv_view_merges_bars(self):
+        from src.utils.downsample import OhlcvPyramid
+
+        n = 50_000
+        x, close = _series(n)
+        cols = {"timestamp": x, "open": close, "high": close + 1, "low": close - 1, "close": close}
+        cols["volume"] = np.ones(n)
+        pyramid = OhlcvPyramid(cols)
+        bars, factor = pyramid.view(600)
+        assert len(bars["timestamp"]) <= 600 and factor > 1
+        assert bars["volume"].sum() == n and bars["high"].max() == cols["high"].max()
+        bars, factor = pyramid.view(600, int(x[10]), int(x[209]))
+        assert factor == 1 and bars["close"].tolist() == close[10:210].tolist()
+
+
+class TestChartLOD:
+    def test_keys_and_eviction(self):
+        from src.core.chart_lod import ChartLOD
+        from src.utils import report_codec
+
+        x, y = _series(20_000)
+        curve = [{"timestamp": int(t), "equity": e, "position": 0} for t, e in zip(x, y.tolist())]
+        lod = ChartLOD()
+        pyramid = lod.equity(curve)
+        # 同內容（含解碼後的 LazyRows）共用同一座金字塔
+        assert lod.equity(report_codec.loads(report_codec.dumps(curve))) is pyramid
+        assert lod.get(pyramid.key) is pyramid and lod.get("missing") is None
+
+        bars = _bars(5_000)
+        bars[3]["filled"] = True
+        kline = lod.ohlcv(bars, indicators=lambda cols: {"MA20": cols["close"]})
+        assert len(kline) == 4_999 and "MA20" in kline.levels[0] and lod.ohlcv(bars) is not kline
+
+        small = ChartLOD(memory_bytes=pyramid.nbytes + 1)
+        first = small.equity(curve)
+        small.equity(curve[:10_000])
+        assert small.get(first.key) is None and small.stats.evictions == 1
+        assert small.stats_dict()["entries"] == 1
+
+    def test_cached_backtest_key(self):
+        from src.core.backtest import BacktestEngine
+        from src.core.chart_lod import ChartLOD
+        from src.core.result_cache import BacktestResultCache
+
+        rows = _bars(300)
+        signals = [1 if i % 50 < 25 else -1 for i in range(300)]
+        report = BacktestEngine().run(rows, signals, SINCE, rows[-1]["timestamp"])
+        cache = BacktestResultCache()
+        cache.put("abc", report)
+        hit = cache.get("abc")
+        pyramid = ChartLOD().equity(hit)
+        assert pyramid.key == "equity:abc" and len(pyramid) == len(report.equity_curve)
+        assert pyramid.view(100)["equity"].max() == max(e["equity"] for e in report.equity_curve)
@@ -0,0 +1,113 @@
+"""
+測試特徵倉庫 — 按需計算、快取命中與增量追加須與全量計算一致
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def ohlcv():
+    rng = np.random.default_rng(5)
+    n = 400
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    return pd.DataFrame(
+        {
+            "open": close + rng.normal(0, 0.3, n),
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.integers(1000, 5000, n).astype(float),
+        },
+        index=pd.date_range("2023-01-01", periods=n, freq="D"),
+    )
+
+
+class TestFeatureRegistry:
+    def test_resolve_is_topological_and_pruned(self):
+        from src.strategies.ml_strategies.feature_store import default_registry
+
+        order = default_registry().resolve(["macd_hist"])
+        assert set(order) == {"ema_12", "ema_26", "macd", "macd_signal", "macd_hist"}
+        assert order.index("macd") < order.index("macd_signal") < order.index("macd_hist")
+
+    def test_unknown_dependency_rejected(self):
+        from src.strategies.ml_strategies.feature_store import FeatureRegistry, FeatureSpec
+
+        with pytest.raises(ValueError):
+            FeatureRegistry([FeatureSpec("x", lambda s: s, ("missing",))])
+
+
+class TestFeatureStore:
+    def test_compute_only_requested_columns(self, ohlcv):
+        from src.strategies.ml_strategies.feature_store import FeatureStore
+
+        out = FeatureStore().compute(ohlcv, ["rsi_14", "ma_20"])
+        assert list(out.columns) == ["rsi_14", "ma_20"]
+        expected = ohlcv["close"].rolling(20).mean()
+        pd.testing.assert_series_equal(out["ma_20"], expected, check_names=False)
+
+    def test_engineer_default_columns(self, ohlcv):
+        from src.strategies.ml_strategies.feature_engineering import FeatureEngineer
+        from src.strategies.ml_strategies.feature_store import FeatureStore, TECHNICAL_FEATURES
+
+        out = FeatureEngineer(FeatureStore()).create_technical_features(ohlcv)
+        assert list(out.columns) == [*ohlcv.columns, *TECHNICAL_FEATURES]
+        plain = FeatureEngineer(FeatureStore()).create_technical_features(ohlcv.reset_index(drop=True))
+        assert "day_of_week" not in plain.columns
+
+    def test_materialize_hit(self, ohlcv):
+        from src.strategies.ml_strategies.feature_store import FeatureStore
+
+        store = FeatureStore()
+        first = store.materialize(ohlcv, "BTC/USDT", "1d", ["rsi_14", "bb_width_20"])
+        again = store.materialize(ohlcv, "BTC/USDT", "1d", ["bb_width_20", "rsi_14"])
+        prefix = store.materialize(ohlcv.iloc[:100], "BTC/USDT", "1d", ["rsi_14", "bb_width_20"])
+        assert store.stats["misses"] == 1 and store.stats["hits"] == 2
+        pd.testing.assert_frame_equal(first, again[first.columns])
+        pd.testing.assert_frame_equal(prefix, first.iloc[:100], check_freq=False)
+
+    def test_incremental_append_matches_full(self, ohlcv):
+        from src.strategies.ml_strategies.feature_store import FeatureStore, TECHNICAL_FEATURES
+
+        store = FeatureStore()
+        full = store.compute(ohlcv, TECHNICAL_FEATURES)
+        store.materialize(ohlcv.iloc[:300], "ETH/USDT", "1d", TECHNICAL_FEATURES)
+        appended = store.append("ETH/USDT", "1d", TECHNICAL_FEATURES, ohlcv.iloc[300:350])
+        extended = store.materialize(ohlcv, "ETH/USDT", "1d", TECHNICAL_FEATURES)
+        assert store.stats["appends"] == 2
+        pd.testing.assert_frame_equal(appended, full.iloc[:350], check_freq=False, rtol=1e-9)
+        pd.testing.assert_frame_equal(extended, full, check_freq=False, rtol=1e-9)
+
+    def test_append_rejects_stale_bars(self, ohlcv):
+        from src.strategies.ml_strategies.feature_store import FeatureStore
+
+        store = FeatureStore()
+        store.materialize(ohlcv.iloc[:100], "X", "1d", ["ma_5"])
+        with pytest.raises(ValueError):
+            store.append("X", "1d", ["ma_5"], ohlcv.iloc[50:60])
+        with pytest.raises(KeyError):
+            store.append("Y", "1d", ["ma_5"], ohlcv.iloc[100:])
+
+    def test_revised_history_recomputes(self, ohlcv):
+        from src.strategies.ml_strategies.feature_store import FeatureStore
+
+        store = FeatureStore()
+        store.materialize(ohlcv, "X", "1d", ["ma_5"])
+        revised = ohlcv.copy()
+        revised.iloc[10, revised.columns.get_loc("close")] += 5
+        out = store.materialize(revised, "X", "1d", ["ma_5"])
+        assert store.stats["misses"] == 2
+        assert out["ma_5"].iloc[12] == pytest.approx(revised["close"].iloc[8:13].mean())
+
+    def test_disk_cache_roundtrip(self, ohlcv, tmp_path):
+        from src.strategies.ml_strategies.feature_store import FeatureStore
+
+        first = FeatureStore(cache_dir=tmp_path).materialize(ohlcv, "BTC/USDT", "4h", ["obv", "day_of_week"])
+        store = FeatureStore(cache_dir=tmp_path)
+        again = store.materialize(ohlcv, "BTC/USDT", "4h", ["obv", "day_of_week"])
+        assert store.stats["hits"] == 1
+        pd.testing.assert_frame_equal(first, again, check_freq=False)
@@ -0,0 +1,118 @@
+"""
+測試有效前沿引擎 — 矩估計快取、解析解、熱啟動 SLSQP、滾動視窗批次優化
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(0)
+    market = rng.normal(0, 0.01, (500, 1))
+    return rng.normal(0.0005, 0.02, (500, 8)) + market
+
+
+class TestMoments:
+    def test_cache_hit_returns_same_object(self, returns):
+        from src.utils.frontier import estimate_moments
+
+        first = estimate_moments(returns)
+        again = estimate_moments(returns.copy())
+        assert again is first
+        assert not first.cov.flags.writeable
+        assert np.allclose(first.cov, np.cov(returns, rowvar=False) * 252)
+
+    def test_ledoit_wolf_matches_sklearn(self, returns):
+        pytest.importorskip("sklearn")
+        from sklearn.covariance import LedoitWolf
+
+        from src.utils.frontier import estimate_moments
+
+        moments = estimate_moments(returns, shrinkage="ledoit_wolf")
+        lw = LedoitWolf().fit(returns)
+        assert moments.shrinkage == pytest.approx(lw.shrinkage_)
+        assert np.allclose(moments.cov / 252, lw.covariance_)
+
+
+class TestFrontierEngine:
+    def test_unconstrained_uses_closed_form(self, returns):
+        from src.utils.frontier import FrontierEngine
+
+        engine = FrontierEngine.from_returns(returns, min_weight=-10, max_weight=10)
+        mvp = engine.min_variance()
+        assert mvp.method == "closed_form"
+        inv_ones = np.linalg.solve(engine.cov, np.ones(engine.n_assets))
+        assert np.allclose(mvp.weights, inv_ones / inv_ones.sum())
+
+        frontier = engine.frontier(20, max_return=mvp.expected_return + 0.2)
+        assert len(frontier) == 20
+        assert frontier.iterations == 0
+
+    def test_constrained_frontier_matches_cold_start(self, returns):
+        from src.utils.frontier import FrontierEngine
+
+        engine = FrontierEngine.from_returns(returns, max_weight=0.3)
+        warm = engine.frontier(30)
+        cold = engine.frontier(30, warm_start=False)
+
+        assert len(warm) == len(cold) == 30
+        assert warm.iterations < cold.iterations
+        assert np.allclose(warm.volatilities, cold.volatilities, atol=1e-6)
+        assert np.all(np.diff(warm.volatilities) >= -1e-9)
+        assert np.allclose(warm.weights.sum(axis=1), 1.0)
+        assert warm.weights.max() <= 0.3 + 1e-6
+
+    def test_max_sharpe_matches_direct_optimization(self, returns):
+        from scipy.optimize import minimize
+
+        from src.utils.frontier import FrontierEngine
+
+        engine = FrontierEngine.from_returns(returns, max_weight=0.3, risk_free_rate=0.02)
+        best = engine.max_sharpe()
+
+        n = engine.n_assets
+        direct = minimize(
+            lambda w: -(w @ engine.mean - 0.02) / np.sqrt(w @ engine.cov @ w),
+            np.full(n, 1 / n),
+            method="SLSQP",
+            bounds=[(0, 0.3)] * n,
+            constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1}],
+        )
+        assert best.sharpe_ratio >= -direct.fun - 1e-6
+
+    def test_risk_parity_equalizes_contributions(self, returns):
+        from src.utils.frontier import FrontierEngine
+
+        engine = FrontierEngine.from_returns(returns)
+        w = engine.risk_parity().weights
+        contrib = w * (engine.cov @ w)
+        assert np.allclose(contrib / contrib.sum(), 1 / engine.n_assets, atol=1e-8)
+
+    def test_infeasible_bounds_raise(self, returns):
+        from src.utils.frontier import FrontierEngine
+
+        with pytest.raises(ValueError):
+            FrontierEngine.from_returns(returns, max_weight=0.1)
+
+
+class TestRollingOptimize:
+    def test_parallel_matches_sequential(self, returns):
+        from src.utils.frontier import rolling_optimize
+
+        kwargs = dict(window=120, step=20, objective="max_sharpe", max_weight=0.4)
+        parallel = rolling_optimize(returns, max_workers=4, **kwargs)
+        sequential = rolling_optimize(returns, max_workers=1, **kwargs)
+
+        assert parallel.weights.shape == (len(range(120, 501, 20)), 8)
+        assert parallel.ends[0] == 120 and parallel.ends[-1] == 500
+        assert parallel.success.all()
+        assert np.allclose(parallel.weights, sequential.weights, atol=1e-6)
+
+    def test_unknown_objective(self, returns):
+        from src.utils.frontier import rolling_optimize
+
+        with pytest.raises(ValueError):
+            rolling_optimize(returns, window=50, objective="max_return")
@@ -0,0 +1,100 @@
+"""
+測試遺傳演算法批次適應度 — 向量化結果須與逐個體計算一致
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({"close": 100 * np.exp(rng.normal(0, 0.01, 600).cumsum())})
+
+
+def _reference_fitness(close: pd.Series, short: int, long_period: int) -> float:
+    sma_short = close.rolling(window=short).mean()
+    sma_long = close.rolling(window=long_period).mean()
+    signals = pd.Series(0, index=close.index)
+    signals[sma_short > sma_long] = 1
+    signals[sma_short < sma_long] = -1
+    returns = close.pct_change() * signals.shift(1)
+    sharpe = returns.mean() / returns.std() * np.sqrt(252) if returns.std() > 0 else 0
+    cumulative = (1 + returns).cumprod()
+    drawdown = (cumulative - cumulative.cummax()) / cumulative.cummax()
+    return sharpe + 2 * drawdown.min()
+
+
+def _momentum_fitness(params: dict[str, int], data: pd.DataFrame) -> float:
+    return float(data["close"].pct_change(params["short"]).mean())
+
+
+class TestSmaCrossFitness:
+    def test_matches_reference(self, prices):
+        from src.strategies.ai_ml.ai_strategies import sma_cross_fitness
+
+        shorts = np.array([5, 7, 12, 20])
+        longs = np.array([20, 45, 30, 21])
+        got = sma_cross_fitness(prices["close"].to_numpy(), shorts, longs)
+        for k in range(len(shorts)):
+            assert got[k] == pytest.approx(_reference_fitness(prices["close"], shorts[k], longs[k]), rel=1e-10)
+
+    def test_sma_cache_reused(self, prices):
+        from src.strategies.ai_ml.ai_strategies import sma_cross_fitness
+
+        cache: dict[int, np.ndarray] = {}
+        sma_cross_fitness(prices["close"].to_numpy(), np.array([5, 5]), np.array([30, 40]), cache)
+        assert set(cache) == {5, 30, 40}
+
+
+class TestGeneticOptimization:
+    def test_duplicate_genomes_scored_once(self, prices):
+        from src.strategies.ai_ml.ai_strategies import GeneticOptimization
+
+        ga = GeneticOptimization()
+        population = [[0.5, 0.5], [0.501, 0.5], [0.5, 0.5], [0.1, 0.9]]
+        scores = ga._batch_fitness(population, prices)
+        assert ga.n_evaluations == 2
+        assert scores[0] == scores[1] == scores[2]
+        ga._batch_fitness(population, prices)
+        assert ga.n_evaluations == 2
+
+    def test_cache_invalidated_on_new_data(self, prices):
+        from src.strategies.ai_ml.ai_strategies import GeneticOptimization
+
+        ga = GeneticOptimization()
+        other = pd.DataFrame({"close": prices["close"].to_numpy()[::-1].copy()})
+        first = ga._calculate_fitness([0.3, 0.4], prices)
+        second = ga._calculate_fitness([0.3, 0.4], other)
+        params = ga._decode_individual([0.3, 0.4])
+        assert first == pytest.approx(_reference_fitness(prices["close"], params["short"], params["long"]))
+        assert second == pytest.approx(_reference_fitness(other["close"], params["short"], params["long"]))
+        assert first != second and ga.n_evaluations == 2
+
+    def test_optimize_tracks_best_and_history(self, prices, capsys):
+        from src.strategies.ai_ml.ai_strategies import GeneticOptimization
+
+        ga = GeneticOptimization(population_size=30, generations=8)
+        params = ga.optimize(prices)
+        assert 5 <= params["short"] <= 20 and 20 <= params["long"] <= 100
+        assert len(ga.fitness_history) == 8
+        assert np.all(np.diff(ga.fitness_history) >= 0)
+        assert ga.best_fitness == pytest.approx(_reference_fitness(prices["close"], params["short"], params["long"]))
+
+    def test_early_stopping(self, prices, capsys):
+        from src.strategies.ai_ml.ai_strategies import GeneticOptimization
+
+        ga = GeneticOptimization(population_size=20, generations=50, patience=3, tol=1e9)
+        ga.optimize(prices)
+        assert len(ga.fitness_history) == 4
+
+    def test_custom_fitness_serial_and_process_pool(self, prices, capsys):
+        from src.strategies.ai_ml.ai_strategies import GeneticOptimization
+
+        serial = GeneticOptimization(population_size=12, generations=3, fitness_func=_momentum_fitness)
+        pooled = GeneticOptimization(population_size=12, generations=3, fitness_func=_momentum_fitness, n_jobs=2)
+        assert serial.optimize(prices) == pooled.optimize(prices)
+        assert serial.best_fitness == pytest.approx(pooled.best_fitness)
@@ -0,0 +1,135 @@
+"""
+測試延遲載入與啟動 import 預算 — 策略 manifest、Registry 首次查詢才橋接、
+`python -m src --version` / Celery worker / Streamlit 首次渲染的 import 耗時與禁止模組
+"""
+
+from __future__ import annotations
+
+import json
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# 預算為 -X importtime 自身耗時總和（ms），約為目前實測的 3-4 倍以容納 CI 噪音
+VERSION_BUDGET_MS = 150
+WORKER_BUDGET_MS = 1500
+CORE_BUDGET_MS = 1000
+STREAMLIT_APP_BUDGET_MS = 1500
+
+CATEGORY_PACKAGES = {f"src.strategies.{c}" for c in ("trend", "oscillator", "breakout", "ai_ml", "macro")}
+HEAVY_MODULES = {"pandas", "ccxt", "scipy", "sklearn", "torch", "src.core.strategies_bridge"} | CATEGORY_PACKAGES
+
+_LINE = re.compile(r"import time:\s+(\d+)\s*\|\s*(\d+)\s*\|(\s*)(\S.*)$")
+
+
+def _import_report(*args: str) -> tuple[float, set[str], dict[str, float], str]:
+    """以 -X importtime 執行，回傳（自身耗時總和 ms、載入模組、頂層模組累計 ms、stdout）"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=PROJECT_ROOT, capture_output=True, text=True, timeout=300
+    )
+    assert proc.returncode == 0, proc.stderr[-2000:]
+    total, modules, top_level = 0, set(), {}
+    for line in proc.stderr.splitlines():
+        m = _LINE.match(line)
+        if not m:
+            continue
+        total += int(m.group(1))
+        name = m.group(4).strip()
+        modules.add(name)
+        if len(m.group(3)) <= 1:
+            top_level[name] = top_level.get(name, 0) + int(m.group(2)) / 1000
+    return total / 1000, modules, top_level, proc.stdout
+
+
+class TestStrategyFactory:
+    def test_manifest_in_sync(self):
+        from src.strategies._manifest import STRATEGY_MANIFEST
+        from src.strategies.strategy_factory import build_manifest
+
+        # 不同步時執行 python scripts/gen_strategy_manifest.py
+        assert build_manifest() == STRATEGY_MANIFEST
+        assert len(STRATEGY_MANIFEST) >= 130
+
+    def test_first_create_loads_single_category(self):
+        code = (
+            "import json, sys\n"
+            "from src.strategies import StrategyFactory, get_strategy\n"
+            "def packages():\n"
+            "    return sorted(m for m in sys.modules if m.startswith('src.strategies.') and m.count('.') == 2)\n"
+            "before, names = packages(), StrategyFactory.names()\n"
+            "strategy = get_strategy('ZLEMA', {'period': 20})\n"
+            "print(json.dumps([before, len(names), strategy.params['period'], packages()]))\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        before, count, period, after = json.loads(out)
+        assert before == ["src.strategies._manifest", "src.strategies.base_strategy", "src.strategies.strategy_factory"]
+        assert count >= 130 and period == 20
+        assert "src.strategies.trend" in after and "src.strategies.macro" not in after
+
+
+class TestRegistry:
+    def test_loader_runs_on_first_lookup(self, monkeypatch):
+        from src.core.registry import StrategyRegistry
+
+        calls = []
+        reg = StrategyRegistry()
+        reg.add_loader("json")
+        reg.add_loader("json")
+        reg.add_loader("src.no_such_module")
+        monkeypatch.setattr("importlib.import_module", lambda name: calls.append(name))
+        assert calls == []
+        assert reg.names == [] and reg.get("x") is None
+        assert calls == ["json", "src.no_such_module"]
+
+    def test_global_registry_bridges_lazily(self):
+        code = (
+            "import sys\n"
+            "from src.core import registry\n"
+            "before = 'src.core.strategies_bridge' in sys.modules\n"
+            "print(before, 'sma_cross' in registry.names, 'src.core.strategies_bridge' in sys.modules)\n"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout
+        assert out.split() == ["False", "True", "True"]
+
+
+class TestImportBudget:
+    def test_version_command(self):
+        total, modules, _, out = _import_report("-m", "src", "--version")
+        assert out.startswith("StocksX v")
+        assert not modules & (HEAVY_MODULES | {"numpy", "src.core", "src.strategies"})
+        assert total < VERSION_BUDGET_MS, f"python -m src --version import 耗時 {total:.0f}ms"
+
+    def test_core_and_strategies(self):
+        total, modules, _, _ = _import_report("-c", "import src.core, src.strategies, src.backtest")
+        assert not modules & HEAVY_MODULES, sorted(modules & HEAVY_MODULES)
+        assert total < CORE_BUDGET_MS, f"src.core + src.strategies import 耗時 {total:.0f}ms"
+
+    def test_celery_worker_boot(self):
+        pytest.importorskip("celery")
+        # worker 啟動時載入 celery_app 與 include 的任務模組
+        code = "from src.tasks.celery_app import app; app.loader.import_default_modules()"
+        total, modules, _, _ = _import_report("-c", code)
+        assert not modules & (HEAVY_MODULES | {"src.data.crypto"}), sorted(modules & HEAVY_MODULES)
+        assert total < WORKER_BUDGET_MS, f"Celery worker 啟動 import 耗時 {total:.0f}ms"
+
+    def test_streamlit_first_render(self):
+        pytest.importorskip("streamlit")
+        code = (
+            "import sys\n"
+            "from streamlit.testing.v1 import AppTest\n"
+            "AppTest.from_file(sys.argv[1], default_timeout=120).run()\n"
+        )
+        _, modules, top_level, _ = _import_report("-c", code, str(PROJECT_ROOT / "app.py"))
+        # 只計 app.py 自己拉進來的 src.* 模組（含其依賴），不計 streamlit 本身
+        app_cost = sum(ms for name, ms in top_level.items() if name.startswith("src"))
+        assert not modules & (HEAVY_MODULES - {"pandas"}), sorted(modules & HEAVY_MODULES)
+        assert app_cost < STREAMLIT_APP_BUDGET_MS, f"app.py 首次渲染 import 耗時 {app_cost:.0f}ms"
@@ -0,0 +1,114 @@
+"""
+測試 Prometheus 指標 — 回測吞吐量、優化任務、數據源延遲、快取命中率與停用時的空操作
+"""
+
+from __future__ import annotations
+
+import pytest
+
+pytest.importorskip("prometheus_client")
+
+
+def _sample(name, labels=None):
+    from src.utils import metrics
+
+    return metrics.REGISTRY.get_sample_value(name, labels or {}) or 0.0
+
+
+@pytest.fixture
+def enabled():
+    from src.utils import metrics
+
+    previous = metrics.metrics_enabled()
+    metrics.set_enabled(True)
+    yield metrics
+    metrics.set_enabled(previous)
+
+
+class TestRecording:
+    def test_backtest_bars_and_throughput(self, enabled):
+        before = _sample("stocksx_backtest_bars_total", {"engine": "test"})
+        enabled.record_backtest("test", bars=5_000, seconds=0.5)
+        assert _sample("stocksx_backtest_bars_total", {"engine": "test"}) - before == 5_000
+        assert _sample("stocksx_backtest_bars_per_second", {"engine": "test"}) == 10_000
+
+    def test_engine_records_bars(self, enabled):
+        import numpy as np
+
+        from src.backtest.engine import _run_backtest_on_rows
+
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        since = 1_700_000_000_000
+        rows = [
+            {"timestamp": since + i * 3_600_000, "open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 1.0}
+            for i, c in enumerate(close)
+        ]
+        before = _sample("stocksx_backtest_bars_total", {"engine": "loop"})
+        _run_backtest_on_rows(
+            rows=rows,
+            exchange_id="binance",
+            symbol="BTC/USDT",
+            timeframe="1h",
+            since_ms=since,
+            until_ms=rows[-1]["timestamp"],
+            strategy="sma_cross",
+            strategy_params={"fast": 5, "slow": 20},
+            initial_equity=10000.0,
+            leverage=1.0,
+            take_profit_pct=None,
+            stop_loss_pct=None,
+        )
+        assert _sample("stocksx_backtest_bars_total", {"engine": "loop"}) - before == 300
+
+    def test_optimizer_tasks(self, enabled):
+        labels = {"search": "test", "status": "error"}
+        before = _sample("stocksx_optimizer_tasks_total", labels)
+        enabled.record_optimizer_task("test", 0.01, ok=False)
+        assert _sample("stocksx_optimizer_tasks_total", labels) - before == 1
+
+    def test_provider_timer_marks_errors(self, enabled):
+        labels = {"provider": "test", "method": "fetch_ohlcv", "status": "error"}
+        before = _sample("stocksx_provider_call_seconds_count", labels)
+        with pytest.raises(RuntimeError):
+            with enabled.provider_timer("test", "fetch_ohlcv"):
+                raise RuntimeError("timeout")
+        assert _sample("stocksx_provider_call_seconds_count", labels) - before == 1
+
+    def test_ws_fanout_restores_queue_depth(self, enabled):
+        base = _sample("stocksx_ws_queue_depth")
+        sent = {"type": "price_update", "status": "error"}
+        errors = _sample("stocksx_ws_messages_total", sent)
+        with enabled.ws_fanout("price_update", 7) as fanout:
+            assert _sample("stocksx_ws_queue_depth") - base == 7
+            fanout.sent(True)
+            fanout.sent(False)
+            # 每送出一則就離開佇列，不等整批結束
+            assert _sample("stocksx_ws_queue_depth") - base == 5
+        assert _sample("stocksx_ws_queue_depth") == base
+        assert _sample("stocksx_ws_messages_total", sent) - errors == 1
+
+
+class TestDisabled:
+    def test_disabled_is_noop(self, enabled):
+        labels = {"engine": "disabled"}
+        enabled.set_enabled(False)
+        enabled.record_backtest("disabled", bars=10, seconds=0.1)
+        assert enabled.provider_timer("x", "y") is enabled.ws_fanout("x", 3)
+        assert _sample("stocksx_backtest_bars_total", labels) == 0
+
+
+class TestExposition:
+    def test_cache_stats_rendered_at_scrape(self, enabled):
+        from src.core.cache_manager import CacheManager
+
+        cm = CacheManager()
+        cm.price.set("BTC/USDT", 1.0)
+        cm.price.get("BTC/USDT")
+        cm.price.get("ETH/USDT")
+        enabled.register_cache_stats(cm.all_stats)
+        body, content_type = enabled.render_latest()
+        text = body.decode()
+        assert content_type.startswith("text/plain")
+        assert 'stocksx_cache_hit_rate{namespace="price"} 0.5' in text
+        assert 'stocksx_cache_misses{namespace="price"} 1.0' in text
@@ -0,0 +1,123 @@
+"""
+測試路徑級蒙特卡羅回測 — 區塊重抽樣、交易順序打亂、參數擾動與分塊計算
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from .conftest import SINCE
+
+DAY_MS = 86_400_000
+
+
+def _backtest(rows, params=None):
+    from src.backtest.engine import _run_backtest_on_rows
+
+    return _run_backtest_on_rows(
+        rows,
+        "binance",
+        "BTC/USDT",
+        "1d",
+        SINCE,
+        rows[-1]["timestamp"],
+        "sma_cross",
+        params or {"fast": 10, "slow": 30},
+        10000.0,
+        1.0,
+        None,
+        None,
+    )
+
+
+class TestPathStatistics:
+    def test_matches_per_path_loop(self):
+        from src.backtest.monte_carlo import path_statistics
+
+        returns = np.random.default_rng(1).normal(0, 0.05, (6, 80))
+        stats = path_statistics(returns.copy(), ruin_threshold=0.3)
+        for i in range(6):
+            equity = np.cumprod(1 + returns[i])
+            peak = np.maximum.accumulate(np.maximum(equity, 1.0))
+            assert stats["final_return"][i] == pytest.approx(equity[-1] - 1)
+            assert stats["max_drawdown"][i] == pytest.approx(np.max(1 - equity / peak))
+            assert stats["ruined"][i] == (equity.min() <= 0.7)
+
+    def test_block_bootstrap_keeps_contiguous_blocks(self):
+        from src.backtest.monte_carlo import block_bootstrap_indices
+
+        idx = block_bootstrap_indices(np.random.default_rng(0), 50, 100, 37, block_size=10)
+        assert idx.shape == (50, 37)
+        assert idx.min() >= 0 and idx.max() < 100
+        assert np.all(np.diff(idx[:, :10], axis=1) == 1)
+
+
+class TestSimulatePaths:
+    def test_chunking_does_not_change_distribution_shape(self):
+        from src.backtest.monte_carlo import simulate_paths
+
+        returns = np.random.default_rng(2).normal(0.0005, 0.02, 756)
+        whole = simulate_paths(returns, n_paths=4000, seed=7)
+        chunked = simulate_paths(returns, n_paths=4000, seed=7, max_chunk_bytes=756 * 8 * 4 * 300)
+        assert len(chunked.final_returns) == len(whole.final_returns) == 4000
+        assert chunked.final_returns.mean() == pytest.approx(whole.final_returns.mean(), abs=0.05)
+        assert simulate_paths(returns, n_paths=100, seed=7).final_returns.tolist() == (
+            simulate_paths(returns, n_paths=100, seed=7).final_returns.tolist()
+        )
+
+    def test_shuffle_preserves_final_return(self):
+        from src.backtest.monte_carlo import simulate_paths
+
+        trades = np.array([0.1, -0.2, 0.05, -0.3, 0.25, 0.02])
+        report = simulate_paths(trades, n_paths=500, method="shuffle")
+        assert np.allclose(report.final_returns, np.prod(1 + trades) - 1)
+        assert report.max_drawdowns.min() < report.max_drawdowns.max()
+
+    def test_invalid_input(self):
+        from src.backtest.monte_carlo import simulate_paths
+
+        with pytest.raises(ValueError):
+            simulate_paths(np.zeros(10), method="garch")
+        with pytest.raises(ValueError):
+            simulate_paths(np.zeros(0))
+
+
+class TestMonteCarloBacktest:
+    def test_from_backtest_result(self, make_rows):
+        from src.backtest.monte_carlo import monte_carlo_backtest, trade_returns
+
+        res = _backtest(make_rows(800, step_ms=DAY_MS))
+        boot = monte_carlo_backtest(res, n_paths=2000, horizon=756, ruin_threshold=0.2)
+        shuffled = monte_carlo_backtest(res, method="shuffle", n_paths=500)
+        assert boot.horizon == 756 and 0.0 <= boot.risk_of_ruin <= 1.0
+        assert set(boot.to_dict()["return_pct_quantiles"]) == {"p5", "p25", "p50", "p75", "p95"}
+        assert shuffled.horizon == len(res.trades)
+        final = np.prod(1 + trade_returns(res.trades)) - 1
+        assert res.metrics["total_return_pct"] == pytest.approx(final * 100, abs=0.05)
+
+    def test_parameter_jitter_runs_one_backtest_per_variant(self, make_rows):
+        from src.backtest.monte_carlo import jitter_params, parameter_jitter
+
+        variants = jitter_params({"fast": 10, "slow": 30, "mode": "x"}, n_variants=8, jitter=0.3)
+        assert variants[0] == {"fast": 10, "slow": 30, "mode": "x"}
+        assert len({tuple(sorted(v.items())) for v in variants}) == len(variants) == 8
+
+        calls = []
+
+        def counting_backtest(**kwargs):
+            calls.append(kwargs["strategy_params"])
+            from src.backtest.engine import _run_backtest_on_rows
+
+            return _run_backtest_on_rows(**kwargs)
+
+        report = parameter_jitter(
+            make_rows(800, step_ms=DAY_MS),
+            "sma_cross",
+            {"fast": 10, "slow": 30},
+            n_variants=6,
+            n_paths=1000,
+            run_backtest=counting_backtest,
+        )
+        assert len(calls) == 6 and len(report.variants) == 6
+        assert report.n_paths == 1000 and len(report.max_drawdowns) == 1000
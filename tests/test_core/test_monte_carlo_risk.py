@@ -0,0 +1,100 @@
+"""
+測試批量蒙特卡洛風險引擎 — 相關路徑、分塊生成、可復現、場景庫壓力測試
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def asset_returns():
+    rng = np.random.default_rng(7)
+    market = rng.normal(0.0003, 0.01, (750, 1))
+    return market + rng.normal(0, 0.005, (750, 4))
+
+
+class TestMonteCarloEngine:
+    def test_cholesky_reproduces_covariance(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        engine = MonteCarloEngine.from_returns(asset_returns, seed=1)
+        sims = np.vstack(list(engine.simulate_asset_returns(50_000)))
+        assert sims.shape == (50_000, 4)
+        assert np.allclose(np.cov(sims, rowvar=False), engine.cov, atol=2e-5)
+
+    def test_seed_is_reproducible(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        for method in ("cholesky", "bootstrap"):
+            a = MonteCarloEngine.from_returns(asset_returns, method=method, seed=3).var_cvar(n_paths=5_000)
+            b = MonteCarloEngine.from_returns(asset_returns, method=method, seed=3).var_cvar(n_paths=5_000)
+            assert a.var == b.var
+            assert a.cvar[0.95] <= a.var[0.95]
+
+    def test_chunking_bounds_memory(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        engine = MonteCarloEngine.from_returns(asset_returns, method="bootstrap", seed=0, max_chunk_bytes=4096)
+        chunks = list(engine.simulate_asset_returns(1_000, horizon=5))
+        assert engine.chunk_size(5) == 4096 // (5 * 4 * 8 * 2)
+        assert max(len(c) for c in chunks) == engine.chunk_size(5)
+        assert sum(len(c) for c in chunks) == 1_000
+
+    def test_bootstrap_draws_historical_rows(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        engine = MonteCarloEngine.from_returns(asset_returns, method="bootstrap", seed=0)
+        sims = next(engine.simulate_asset_returns(100))
+        rows = {tuple(r) for r in asset_returns}
+        assert all(tuple(r) in rows for r in sims)
+
+    def test_stress_test_single_pass_matches_per_scenario(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        names = ["A", "B", "C", "D"]
+        weights = np.array([0.4, 0.3, 0.2, 0.1])
+        scenarios = {"crash": -0.3, "tilt": [-0.1, 0.0, 0.05, 0.1], "single": {"B": -0.5}}
+        engine = MonteCarloEngine.from_returns(asset_returns, method="bootstrap", asset_names=names, seed=5)
+        grid = engine.stress_test(weights, scenarios, n_paths=2_000, horizon=3, confidence=0.95)
+
+        paths = np.vstack(list(engine.simulate_asset_returns(2_000, horizon=3)))
+        shocks = engine.scenario_matrix(scenarios)
+        for k in range(len(scenarios)):
+            pnl = ((1 + paths) * (1 + shocks[k]) - 1) @ weights
+            assert grid["var"][0.95][k] == pytest.approx(np.percentile(pnl, 5))
+        assert grid["shock_return"][2] == pytest.approx(-0.15)
+
+    def test_unknown_asset_in_scenario(self, asset_returns):
+        from src.trading.risk.monte_carlo import MonteCarloEngine
+
+        engine = MonteCarloEngine.from_returns(asset_returns)
+        with pytest.raises(ValueError):
+            engine.scenario_matrix({"bad": {"ZZZ": -0.1}})
+
+
+class TestRiskIntegration:
+    def test_monitor_monte_carlo_var_is_seeded(self):
+        from src.trading.risk.portfolio_risk import RiskMonitor
+
+        rng = np.random.default_rng(0)
+        monitors = [RiskMonitor(100_000, seed=11) for _ in range(2)]
+        for r in rng.normal(0, 0.02, 200):
+            for m in monitors:
+                m.add_return(r)
+        a, b = (m.calculate_var(0.95, method="monte_carlo") for m in monitors)
+        assert a == b < 0
+
+    def test_stress_tester_scenarios(self, asset_returns):
+        from src.trading.risk.portfolio_risk import StressTester
+
+        tester = StressTester(portfolio_value=100_000)
+        table = tester.simulate_scenarios(asset_returns, n_paths=2_000, seed=1)
+        assert len(table) == len(StressTester.SCENARIOS)
+        assert table.iloc[0]["scenario"] == "加密寒冬"
+        assert table["var_loss"].is_monotonic_decreasing
+
+        sens = tester.sensitivity_analysis(steps=5)
+        assert sens["损失"].tolist() == [50_000.0, 25_000.0, 0.0, 0.0, 0.0]
+        assert sens["恢复所需"].iloc[0] == pytest.approx(1.0)
@@ -0,0 +1,121 @@
+"""
+測試參數優化分塊扇出 — 共享 K 線、chord 分塊與進度串流、前 N 名歸併與單任務 find_optimal 一致、佇列路由
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+
+import pytest
+
+from .conftest import SINCE
+
+pytest.importorskip("celery")
+
+
+@pytest.fixture
+def store(monkeypatch):
+    from src.core import result_cache
+    from src.core.result_cache import BacktestResultCache
+    from src.tasks import fanout
+
+    local = fanout.LocalStore()
+    monkeypatch.setattr(fanout, "_client", local)
+    monkeypatch.setattr(fanout, "_rows_cache", fanout.OrderedDict())
+    monkeypatch.setattr(result_cache, "_result_cache", BacktestResultCache())
+    return local
+
+
+class TestFanoutStore:
+    def test_shared_rows_and_progress(self, store, make_rows):
+        from src.tasks import fanout
+
+        rows = make_rows(50)
+        key = fanout.publish_rows(rows)
+        assert key == fanout.publish_rows(list(rows)) and fanout.load_rows(key) == rows
+        with pytest.raises(LookupError):
+            fanout.load_rows("stocksx:optimizer:data:missing")
+        # 短區間（如日線兩週）不足以建欄式表，解碼後仍是 rows
+        short = make_rows(10)
+        assert fanout.load_rows(fanout.publish_rows(short)) == short
+        assert [len(c) for c in fanout.chunked(list(range(7)), 3)] == [3, 3, 1]
+
+        fanout.start_progress("job", total=4, chunks=2)
+        entries = [{"params": {"a": i}, "metrics": {}, "score": float(i)} for i in range(3)]
+        fanout.record_chunk("job", entries + [{"params": {"a": 9}, "error": "boom"}], "max_drawdown_pct", n_best=2)
+        state = fanout.get_progress("job")
+        assert (state["status"], state["done"], state["errors"], state["chunks_done"]) == ("running", 4, 1, 1)
+        # 回撤越小越好
+        assert [e["params"]["a"] for e in state["top"]] == [0, 1]
+        fanout.finish_progress("job")
+        assert fanout.get_progress("job")["status"] == "done" and fanout.get_progress("other") is None
+
+    def test_cancel_skips_remaining_chunks(self, store, make_rows):
+        from src.tasks import fanout
+        from src.tasks.backtest_tasks import optimize_chunk, reduce_optimizer
+
+        key = fanout.publish_rows(make_rows(300))
+        fanout.start_progress("job", total=4, chunks=2)
+        args = ("job", key, "sma_cross", [{"fast": 5, "slow": 20}, {"fast": 8, "slow": 30}])
+        settings = {"exchange_id": "binance", "symbol": "BTC/USDT", "timeframe": "1h"}
+        settings.update(since_ms=SINCE, until_ms=SINCE + 299 * 3_600_000)
+        first = optimize_chunk(*args, settings, "sharpe_ratio", 3)
+        assert first["runs"] == 2 and fanout.cancel("job") and fanout.is_cancelled("job")
+        assert optimize_chunk(*args, settings, "sharpe_ratio", 3) == {"runs": 0, "errors": 0, "top": []}
+        config = {"symbol": "BTC/USDT", "strategy": "sma_cross", "timeframe": "1h"}
+        out = reduce_optimizer([first], "job", "sharpe_ratio", 3, config, 0.0)
+        assert out["cancelled"] and not out["success"] and out["total_runs"] == 2
+        assert fanout.get_progress("job")["status"] == "cancelled" and not fanout.cancel("job")
+
+
+class TestChunkedOptimizer:
+    def test_matches_single_task_search(self, store, monkeypatch, make_rows):
+        import src.data.crypto as crypto
+        from src.backtest.optimizer import find_optimal
+        from src.tasks import fanout
+        from src.tasks.backtest_tasks import run_param_optimizer
+
+        # 帶趨勢的走勢，前幾名分數不並列
+        rows = make_rows(vol=0.004, wave=0.1, spread=0.002)
+
+        class FakeFetcher:
+            def __init__(self, exchange_id):
+                pass
+
+            def get_ohlcv(self, symbol, timeframe, since_ms, until_ms, fill_gaps=True, exclude_outliers=False):
+                return rows
+
+        monkeypatch.setattr(crypto, "CryptoDataFetcher", FakeFetcher)
+        monkeypatch.setattr(fanout, "OPTIMIZER_CHUNK_SIZE", 4)
+        grid = {"fast": [5, 8, 10], "slow": [20, 30, 40, 50]}
+        out = run_param_optimizer(
+            "BTC/USDT", "binance", "1h", "sma_cross", grid, "2023-11-14", "2023-12-10",
+            fee_rate=0.0, metric="sharpe", n_best=3,
+        )  # fmt: skip
+
+        assert out["success"] and out["total_runs"] == 12 and len(out["results"]) == 3
+        progress = fanout.get_progress(out["job_id"])
+        assert (progress["status"], progress["done"], progress["chunks"], progress["chunks_done"]) == ("done", 12, 3, 3)
+        assert progress["top"] == out["results"]
+        # K 線只存一份，任務參數不帶 K 線
+        assert sum(k.startswith("stocksx:optimizer:data:") for k in store._data) == 1
+
+        since_ms, until_ms = (
+            int(datetime.strptime(d, "%Y-%m-%d").timestamp() * 1000) for d in ("2023-11-14", "2023-12-10")
+        )
+        best, results = find_optimal("binance", "BTC/USDT", "1h", since_ms, until_ms, "sma_cross", grid, "sharpe_ratio")
+        ranked = sorted((r for r in results if r.get("score") is not None), key=lambda r: r["score"], reverse=True)
+        assert [r["params"] for r in out["results"]] == [r["params"] for r in ranked[:3]]
+        assert out["best_params"] == ranked[0]["params"] and out["best_result"]["metrics"] == best.metrics
+
+    def test_routes(self):
+        import src.tasks.backtest_tasks  # noqa: F401  # 登記任務
+        from src.tasks.celery_app import app
+
+        for name, queue in [
+            ("run_param_optimizer", "optimizer"),
+            ("optimize_chunk", "optimizer.chunks"),
+            ("reduce_optimizer", "optimizer"),
+        ]:
+            task = f"src.tasks.backtest_tasks.{name}"
+            assert task in app.tasks and app.amqp.router.route({}, task)["queue"].name == queue
@@ -0,0 +1,182 @@
+"""
+測試自適應參數搜尋 — successive halving / 貝氏最佳化與 optimizer 整合
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from .conftest import SINCE
+
+UNTIL = SINCE + 600 * 3_600_000
+
+
+@pytest.fixture
+def fake_fetcher(monkeypatch, make_rows):
+    import src.data.crypto as crypto
+
+    calls: list[str] = []
+
+    class FakeFetcher:
+        def __init__(self, exchange_id):
+            pass
+
+        def get_ohlcv(self, symbol, timeframe, since_ms, until_ms, fill_gaps=True, exclude_outliers=False):
+            calls.append(timeframe)
+            return make_rows(seed=len(timeframe), vol=0.003, wave=0.2, period=40, spread=0.002)
+
+    monkeypatch.setattr(crypto, "CryptoDataFetcher", FakeFetcher)
+    return calls
+
+
+class TestSearchPrimitives:
+    def test_halving_schedule(self):
+        from src.backtest.search import halving_schedule
+
+        assert halving_schedule(27, eta=3) == [(27, 1 / 27), (9, 1 / 9), (3, 1 / 3), (1, 1.0)]
+        assert halving_schedule(1) == [(1, 1.0)]
+        assert halving_schedule(16, eta=3)[-1] == (2, 1.0)
+
+    def test_successive_halving_keeps_best(self):
+        from src.backtest.search import successive_halving
+
+        target = 37
+        trials = successive_halving(81, lambda i, f: (-abs(i - target) + 0.1 * np.sin(i), None))
+        full = [t for t in trials if t.fraction == 1.0]
+        assert len(full) == 1 and full[0].index == target
+        assert len(trials) == 81 + 27 + 9 + 3 + 1
+
+    def test_halving_sampling_is_reproducible(self):
+        from src.backtest.search import successive_halving
+
+        def run(seed):
+            trials = successive_halving(500, lambda i, f: (float(i % 17), None), max_candidates=30, seed=seed)
+            return [t.index for t in trials]
+
+        assert run(1) == run(1)
+        assert run(1) != run(2)
+
+    def test_executor_matches_serial(self):
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        from src.backtest.search import bayes_search, encode_candidates, successive_halving
+
+        threads = set()
+
+        def evaluate(i, fraction):
+            threads.add(threading.get_ident())
+            return float((i * 7) % 23) + fraction, None
+
+        grid = [{"a": a, "b": b} for a in range(8) for b in range(8)]
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for search in (
+                lambda **kw: successive_halving(81, evaluate, **kw),
+                lambda **kw: bayes_search(encode_candidates(grid), evaluate, n_trials=12, seed=3, **kw),
+            ):
+                threads.clear()
+                serial = [(t.index, t.fraction, t.score) for t in search()]
+                assert threads == {threading.get_ident()}
+                threads.clear()
+                pooled = [(t.index, t.fraction, t.score) for t in search(executor=pool)]
+                # bayes 只有隨機初始化並行，EI 階段仍在呼叫端線程
+                assert pooled == serial and threads - {threading.get_ident()}
+
+    def test_encode_candidates(self):
+        from src.backtest.search import encode_candidates
+
+        x = encode_candidates([{"s": "a", "p": 5}, {"s": "b", "p": 10}, {"s": "a"}])
+        assert x.shape == (3, 3)
+        assert x[:, 2].tolist() == [0.0, 1.0, 0.0]
+        assert x[0, 0] == 1.0 and x[1, 1] == 1.0
+
+    def test_bayes_finds_optimum_with_few_trials(self):
+        from src.backtest.search import bayes_search, encode_candidates
+
+        grid = [{"a": a, "b": b} for a in range(20) for b in range(20)]
+        x = encode_candidates(grid)
+
+        def evaluate(i, fraction):
+            g = grid[i]
+            return -((g["a"] - 13) ** 2 + (g["b"] - 6) ** 2), None
+
+        trials = bayes_search(x, evaluate, n_trials=30, seed=0)
+        assert len(trials) == 30 and len({t.index for t in trials}) == 30
+        best = max(t.score for t in trials)
+        assert best >= -2  # 400 組中只評估 30 組即接近最優
+        assert [t.index for t in bayes_search(x, evaluate, n_trials=30, seed=0)] == [t.index for t in trials]
+
+
+class TestOptimizerSearchModes:
+    def test_halving_mode_uses_fewer_full_backtests(self, fake_fetcher):
+        from src.backtest.optimizer import find_optimal
+
+        grid = {"fast": [3, 5, 8, 10, 12, 15], "slow": [20, 30, 40, 50, 60]}
+        progress = []
+        best, results = find_optimal(
+            "binance",
+            "BTC/USDT",
+            "1h",
+            SINCE,
+            UNTIL,
+            "sma_cross",
+            param_grid=grid,
+            search="halving",
+            on_progress=lambda done, total, *rest: progress.append((done, total)),
+        )
+        _, grid_results = find_optimal("binance", "BTC/USDT", "1h", SINCE, UNTIL, "sma_cross", param_grid=grid)
+        assert len(grid_results) == 30
+        assert 0 < len(results) <= 3
+        assert best is not None
+        assert progress[-1][0] == progress[-1][1]
+        # 只做 ≤3 次全量回測，結果仍落在窮舉排名的前 1/3
+        ranked = sorted((r["score"] for r in grid_results), reverse=True)
+        assert max(r["score"] for r in results) >= ranked[len(ranked) // 3]
+
+    def test_bayes_mode_and_unknown_mode(self, fake_fetcher):
+        from src.backtest.optimizer import find_optimal
+
+        best, results = find_optimal("binance", "BTC/USDT", "1h", SINCE, UNTIL, "sma_cross", search="bayes", n_trials=6)
+        assert len(results) == 6 and best is not None
+        with pytest.raises(ValueError):
+            find_optimal("binance", "BTC/USDT", "1h", SINCE, UNTIL, "sma_cross", search="random")
+
+    def test_global_halving_fetches_each_timeframe_once(self, fake_fetcher):
+        from src.backtest.optimizer import find_optimal_global
+
+        best, strategy, timeframe, params, by_combo = find_optimal_global(
+            "binance",
+            "BTC/USDT",
+            SINCE,
+            UNTIL,
+            strategies=["sma_cross", "rsi_signal"],
+            timeframes=["1h", "4h"],
+            search="halving",
+        )
+        assert best is not None and strategy in ("sma_cross", "rsi_signal") and timeframe in ("1h", "4h")
+        assert sorted(fake_fetcher) == ["1h", "4h"]
+        assert by_combo
+
+    def test_global_halving_honours_use_async(self, fake_fetcher, monkeypatch):
+        import threading
+
+        from src.backtest import optimizer
+
+        threads = set()
+        original = optimizer._run_backtest_on_rows
+
+        def recording(**kwargs):
+            threads.add(threading.current_thread().name)
+            return original(**kwargs)
+
+        monkeypatch.setattr(optimizer, "_run_backtest_on_rows", recording)
+        kwargs = {"strategies": ["sma_cross", "rsi_signal"], "timeframes": ["1h", "4h"], "search": "halving"}
+        serial = optimizer.find_optimal_global("binance", "BTC/USDT", SINCE, UNTIL, use_async=False, **kwargs)
+        assert threads == {threading.current_thread().name}
+        threads.clear()
+        pooled = optimizer.find_optimal_global("binance", "BTC/USDT", SINCE, UNTIL, max_workers=4, **kwargs)
+        assert threads and all(name.startswith("optimizer") for name in threads)
+        assert pooled[1:4] == serial[1:4] and pooled[0].metrics == serial[0].metrics
+        # 並行評估時每個週期仍只拉取一次
+        assert sorted(fake_fetcher) == ["1h", "1h", "4h", "4h"]
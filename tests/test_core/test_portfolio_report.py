@@ -48,6 +48,46 @@ class TestPortfolioAnalyzer:
         rp = pa.risk_parity_weight()
         assert abs(sum(rp.weights) - 1.0) < 1e-3  # 收斂精度
 
+    def test_risk_parity_non_convergent(self):
+        """強負相關時迭代振盪：逐步結果與逐元素參考實作一致，停止在 max_iter 且結果可重現."""
+        import random
+
+        from src.utils.portfolio import PortfolioAnalyzer
+
+        random.seed(7)
+        f = [random.gauss(0, 0.03) for _ in range(60)]
+        returns = {
+            "BTC": [x + random.gauss(0, 0.005) for x in f],
+            "ETH": [1.2 * x + random.gauss(0, 0.01) for x in f],
+            "HEDGE": [-0.8 * x + random.gauss(0, 0.004) for x in f],
+        }
+        pa = PortfolioAnalyzer(returns)
+        cov, assets = pa.covariance_matrix, list(returns)
+
+        def reference(max_iter, tol=1e-8):
+            w, diff = {a: 1 / 3 for a in assets}, None
+            for _ in range(max_iter):
+                cov_w = {a: sum(cov[a][b] * w[b] for b in assets) for a in assets}
+                port_vol = math.sqrt(sum(w[a] * cov_w[a] for a in assets))
+                rc = {a: w[a] * cov_w[a] / port_vol for a in assets}
+                new_w = {a: w[a] * (port_vol / 3 / rc[a]) if rc[a] > 1e-10 else w[a] for a in assets}
+                total = sum(new_w.values())
+                new_w = {a: v / total for a, v in new_w.items()}
+                diff, w = sum(abs(new_w[a] - w[a]) for a in assets), new_w
+                if diff < tol:
+                    break
+            return [w[a] for a in assets], diff
+
+        _, last_diff = reference(100)
+        assert last_diff > 0.1  # 100 次仍未收斂
+        for max_iter in (1, 5, 10):
+            expected, _ = reference(max_iter)
+            got = pa.risk_parity_weight(max_iter=max_iter).weights
+            assert max(abs(a - b) for a, b in zip(expected, got)) < 1e-12
+        rp = pa.risk_parity_weight()
+        assert rp.weights == PortfolioAnalyzer(returns).risk_parity_weight().weights
+        assert abs(sum(rp.weights) - 1.0) < 1e-9 and all(w > 0 for w in rp.weights)
+
     def test_min_variance(self):
         from src.utils.portfolio import PortfolioAnalyzer
 
@@ -0,0 +1,143 @@
+"""
+測試跨交易所價格矩陣 — 批量並發拉取、向量化價差掃描
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+class FakeExchange:
+    """模擬 ccxt 交易所：記錄呼叫次數."""
+
+    def __init__(self, prices: dict[str, float], has_tickers: bool = True, ts: int | None = None):
+        self._prices = prices
+        self.has = {"fetchTickers": has_tickers}
+        self._ts = ts
+        self.tickers_calls = 0
+        self.ticker_calls = 0
+
+    def _ticker(self, symbol: str) -> dict:
+        p = self._prices[symbol]
+        return {"symbol": symbol, "last": p, "bid": p * 0.9999, "ask": p * 1.0001, "timestamp": self._ts}
+
+    def fetch_tickers(self, symbols=None):
+        self.tickers_calls += 1
+        return {s: self._ticker(s) for s in (symbols or self._prices) if s in self._prices}
+
+    def fetch_ticker(self, symbol):
+        self.ticker_calls += 1
+        return self._ticker(symbol)
+
+
+@pytest.fixture
+def exchanges():
+    return {
+        "binance": FakeExchange({"BTC/USDT": 100.0, "ETH/USDT": 10.0}),
+        "okx": FakeExchange({"BTC/USDT": 101.0, "ETH/USDT": 10.0}),
+        "bybit": FakeExchange({"BTC/USDT": 100.5}, has_tickers=False),
+    }
+
+
+class TestPriceMatrix:
+    def test_refresh_uses_one_bulk_call_per_exchange(self, exchanges):
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        matrix = PriceMatrix(exchanges, symbols=["BTC/USDT", "ETH/USDT"])
+        updated = matrix.refresh()
+
+        assert exchanges["binance"].tickers_calls == 1
+        assert exchanges["binance"].ticker_calls == 0
+        assert exchanges["bybit"].ticker_calls == 2  # 不支持批量：逐個回退，失敗的交易對跳過
+        assert updated == {"binance": 2, "okx": 2, "bybit": 1}
+        assert matrix.last.shape == (2, 3)
+        assert np.isnan(matrix.last[1, 2])
+
+    def test_refresh_does_not_wait_for_hung_exchange(self, exchanges):
+        import threading
+        import time
+
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        release = threading.Event()
+
+        class HungExchange(FakeExchange):
+            def fetch_tickers(self, symbols=None):
+                release.wait(5)
+                return super().fetch_tickers(symbols)
+
+        exchanges["kraken"] = HungExchange({"BTC/USDT": 99.0})
+        matrix = PriceMatrix(exchanges, symbols=["BTC/USDT", "ETH/USDT"])
+        try:
+            started = time.perf_counter()
+            updated = matrix.refresh(timeout=0.2)
+            assert time.perf_counter() - started < 1
+        finally:
+            release.set()
+        assert updated == {"binance": 2, "okx": 2, "bybit": 1, "kraken": 0}
+        assert np.isnan(matrix.last[0, 3])
+
+    def test_finds_best_pair_per_symbol(self, exchanges):
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        matrix = PriceMatrix(exchanges, symbols=["BTC/USDT", "ETH/USDT"])
+        matrix.refresh()
+        found = matrix.find_opportunities(min_spread_pct=0.3, fee_rates=0.001)
+
+        assert len(found) == 1
+        best = found[0]
+        assert best.symbol == "BTC/USDT"
+        assert best.buy_exchange == "binance"
+        assert best.sell_exchange == "okx"
+        assert best.buy_price == pytest.approx(100.01)
+        assert best.sell_price == pytest.approx(100.9899)
+        assert best.profit_pct == pytest.approx(best.spread_pct - 0.2)
+
+    def test_stale_quotes_are_filtered(self):
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        matrix = PriceMatrix({"a": None, "b": None}, symbols=["BTC/USDT"])
+        matrix.update("a", {"BTC/USDT": {"last": 100.0, "timestamp": 1_000}})
+        matrix.update("b", {"BTC/USDT": {"last": 105.0, "timestamp": 9_000}})
+
+        assert matrix.find_opportunities(max_age_ms=5_000, now_ms=10_000) == []
+        found = matrix.find_opportunities(max_age_ms=None, now_ms=10_000)
+        assert len(found) == 1
+        assert found[0].age_ms == 9_000
+
+    def test_per_exchange_fees(self):
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        matrix = PriceMatrix({"a": None, "b": None}, symbols=["X/USDT"])
+        matrix.update("a", {"X/USDT": {"last": 100.0}})
+        matrix.update("b", {"X/USDT": {"last": 101.0}})
+
+        found = matrix.find_opportunities(min_spread_pct=0.0, fee_rates={"a": 0.002, "b": 0.003})
+        assert found[0].profit_pct == pytest.approx(1.0 - 0.5)
+
+    def test_set_symbols_keeps_existing_quotes(self):
+        from src.trading.arbitrage.price_matrix import PriceMatrix
+
+        matrix = PriceMatrix({"a": None}, symbols=["BTC/USDT"])
+        matrix.update("a", {"BTC/USDT": {"last": 100.0}})
+        matrix.set_symbols(["ETH/USDT", "BTC/USDT"])
+
+        assert np.isnan(matrix.last[0, 0])
+        assert matrix.last[1, 0] == 100.0
+
+    def test_scan_opportunities_builds_arbitrage_opportunities(self, exchanges):
+        from src.trading.arbitrage import ArbitrageOpportunity, CrossExchangeArbitrage
+
+        arb = CrossExchangeArbitrage.__new__(CrossExchangeArbitrage)
+        arb.exchanges = exchanges
+        arb.api_keys = {}
+        arb.min_profit_pct = 0.5
+        arb.max_position_usd = 1000
+        arb.fee_rate = 0.001
+        arb._price_matrix = None
+
+        opps = arb.scan_opportunities(["BTC/USDT", "ETH/USDT"], min_spread_pct=0.3)
+        assert len(opps) == 1
+        assert isinstance(opps[0], ArbitrageOpportunity)
+        assert opps[0].spread_usd == pytest.approx(opps[0].sell_price - opps[0].buy_price)
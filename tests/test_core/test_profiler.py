@@ -0,0 +1,148 @@
+"""
+測試取樣剖析器 — 熱點定位、閒置過濾、跨進程合併、輸出格式與回測記錄
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+from .conftest import SINCE
+
+
+def _busy(seconds: float) -> float:
+    import time
+
+    total, end = 0.0, time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        total += sum(i * i for i in range(200))
+    return total
+
+
+def _walk_forward(rows, **kwargs):
+    from src.backtest.walk_forward import walk_forward_analysis
+
+    until = rows[-1]["timestamp"]
+    return walk_forward_analysis(rows, "binance", "BTC/USDT", "1h", SINCE, until, "sma_cross", n_splits=3, **kwargs)
+
+
+_OLD_SCHEMA = """
+CREATE TABLE backtest_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, symbol TEXT, strategy TEXT, timeframe TEXT,
+    initial_equity REAL, final_equity REAL, total_return_pct REAL, max_drawdown_pct REAL, sharpe_ratio REAL,
+    num_trades INTEGER, win_rate_pct REAL, metrics_json TEXT, created_at TEXT DEFAULT (datetime('now'))
+)
+"""
+
+
+class TestSampling:
+    def test_hot_function_and_idle_threads(self):
+        from src.utils.profiler import SamplingProfiler
+
+        stop = threading.Event()
+        waiter = threading.Thread(target=stop.wait, args=(5,))
+        waiter.start()
+        try:
+            with SamplingProfiler(interval=0.002) as sampler:
+                _busy(0.3)
+        finally:
+            stop.set()
+            waiter.join()
+        profile = sampler.profile
+        assert profile.samples > 20 and profile.idle_samples > 0
+        hot = profile.hot_functions(3)
+        assert any("_busy" in h["function"] for h in hot)
+        assert hot[0]["self_pct"] <= hot[0]["total_pct"] <= 100
+        assert all(";" not in h["function"] for h in hot)
+
+    def test_profiling_env_and_nesting(self, monkeypatch):
+        from src.utils.profiler import profiling
+
+        with profiling(False) as off:
+            assert off is None
+        monkeypatch.setenv("STOCKSX_PROFILE", "1")
+        with profiling() as outer:
+            with profiling(True) as inner:
+                assert inner is None
+            _busy(0.05)
+        assert outer is not None and outer.profile.duration > 0
+
+    def test_profiled_accepts_positional_profile(self, monkeypatch):
+        from src.utils.profiler import profiled
+
+        @profiled()
+        def work(seconds, profile=None):
+            _busy(seconds)
+            return {}
+
+        monkeypatch.delenv("STOCKSX_PROFILE", raising=False)
+        assert "profile" in work(0.02, True)
+        assert "profile" in work(0.02, profile=True)
+        assert "profile" not in work(0.02) and "profile" not in work(0.02, False)
+
+    def test_collect_merges_while_sampling(self):
+        from src.utils.profiler import Profile, collect, profiling
+
+        payload = Profile(stacks={"worker.task:1": 1}).to_dict()
+        with profiling(True, interval=0.001) as sampler:
+            results = collect((i, payload) for i in range(500))
+        assert results == list(range(500))
+        # 合併與取樣執行緒寫入同一份 stacks，不能遺失任何一筆
+        assert sampler.profile.stacks["worker.task:1"] == 500
+
+
+class TestProfile:
+    def test_merge_and_formats(self, tmp_path):
+        from src.utils.profiler import Profile
+
+        a = Profile({"main;engine.run:10": 3, "main;engine.run;strategy.sma:42": 5}, interval=0.01, pids=[1])
+        b = Profile({"main;engine.run;strategy.sma:42": 2}, interval=0.01, duration=0.5, idle_samples=4, pids=[2])
+        merged = Profile.from_dict(json.loads(json.dumps(a.to_dict()))).merge(b)
+        assert merged.samples == 10 and merged.idle_samples == 4 and merged.pids == [1, 2]
+        top = merged.hot_functions(1)[0]
+        assert (top["function"], top["line"], top["self"], top["total"]) == ("strategy.sma", "42", 7, 7)
+        assert merged.hot_functions()[1]["total"] == 10
+        assert merged.to_collapsed().splitlines() == ["main;engine.run:10 3", "main;engine.run;strategy.sma:42 7"]
+
+        speedscope = merged.to_speedscope()
+        profile = speedscope["profiles"][0]
+        names = [f["name"] for f in speedscope["shared"]["frames"]]
+        assert profile["weights"] == [0.03, 0.07] and [names[i] for i in profile["samples"][1]][-1] == "strategy.sma:42"
+
+        merged.save(str(tmp_path / "p.json"))
+        merged.save(str(tmp_path / "p.folded"))
+        assert json.load(open(tmp_path / "p.json"))["profiles"][0]["type"] == "sampled"
+        assert open(tmp_path / "p.folded").read() == merged.to_collapsed()
+
+
+class TestIntegration:
+    @pytest.mark.parametrize("ohlcv_rows", [800], indirect=True)
+    def test_walk_forward_merges_worker_profiles(self, ohlcv_rows):
+        rows = ohlcv_rows
+        summary = _walk_forward(rows, n_jobs=2, profile=True)["profile"]
+        # 父進程 + 至少一個 worker 進程
+        assert summary["workers"] >= 2 and summary["samples"] > 0
+        assert "src.backtest.walk_forward" in summary["collapsed"]
+        assert "profile" not in _walk_forward(rows)
+
+    def test_record_stores_profile(self, tmp_path):
+        import sqlite3
+
+        from src.core.repository import BacktestRecord, SqliteBacktestRepository
+
+        db = str(tmp_path / "old.db")
+        conn = sqlite3.connect(db)
+        conn.execute(_OLD_SCHEMA)
+        conn.commit()
+        conn.close()
+
+        # 舊資料庫自動補上 profile_json 欄位
+        repo = SqliteBacktestRepository(db)
+        summary = json.dumps({"samples": 3, "hot_functions": []})
+        record = BacktestRecord(None, 1, "BTC/USDT", "sma_cross", "1h", 1e4, 1.1e4, 10, 5, 1.2, 4, 50)
+        record.profile_json = summary
+        rid = repo.save(record)
+        assert repo.find_by_id(rid).profile_json == summary
+        assert repo.find_by_id(rid).to_dict()["profile"] == summary
@@ -0,0 +1,105 @@
+"""
+測試市場狀態 O(n) 滾動特徵、內建 HMM 與線上追蹤
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def regime_returns():
+    rng = np.random.default_rng(5)
+    return np.concatenate(
+        [rng.normal(0.002, 0.005, 300), rng.normal(-0.003, 0.03, 300), rng.normal(0.0005, 0.01, 300)]
+    )
+
+
+class TestRollingFeatures:
+    def test_matches_window_loop(self, regime_returns):
+        from src.utils.regime_detection import rolling_features
+
+        returns = regime_returns.copy()
+        returns[50] = -1.0  # 歸零
+        returns[80] = -1.5  # 負成長因子
+        lookback = 20
+        momentum, volatility = rolling_features(returns, lookback)
+
+        for i in (lookback, 55, 85, 99, 400, len(returns) - 1):
+            window = returns[i - lookback : i]
+            assert momentum[i] == pytest.approx(np.prod(1 + window) - 1, rel=1e-9, abs=1e-12)
+            assert volatility[i] == pytest.approx(np.std(window, ddof=1) * math.sqrt(252), rel=1e-8)
+        assert np.isnan(momentum[:lookback]).all()
+
+    def test_short_series_all_nan(self):
+        from src.utils.regime_detection import rolling_features
+
+        momentum, volatility = rolling_features(np.zeros(5), 20)
+        assert np.isnan(momentum).all() and np.isnan(volatility).all()
+
+
+class TestGaussianHMM:
+    def test_fit_separates_volatility_states(self, regime_returns):
+        from src.utils.regime_detection import GaussianHMM
+
+        hmm = GaussianHMM(n_states=2).fit(regime_returns)
+        states = hmm.predict(regime_returns)
+        high = int(np.argmax(hmm.variances))
+        assert np.mean(states[300:600] == high) > 0.9
+        assert np.allclose(hmm.transmat.sum(axis=1), 1.0)
+
+    def test_filter_step_matches_batch_filter(self, regime_returns):
+        from src.utils.regime_detection import GaussianHMM
+
+        hmm = GaussianHMM().fit(regime_returns[:500])
+        prob = None
+        for x in regime_returns:
+            prob = hmm.filter_step(prob, x)
+        assert np.allclose(prob, hmm.filter(regime_returns)[-1])
+
+    def test_detect_hmm_without_hmmlearn(self, regime_returns):
+        from src.utils.regime_detection import RegimeDetector
+
+        result = RegimeDetector(regime_returns).detect(method="hmm")
+        assert len(result.regimes) == len(regime_returns)
+        assert abs(sum(s.pct for s in result.stats) - 1.0) < 1e-9
+
+
+class TestOnlineRegimeTracker:
+    @pytest.mark.parametrize("method", ["rule", "kmeans"])
+    def test_online_labels_match_batch(self, regime_returns, method):
+        from src.utils.regime_detection import RegimeDetector, rolling_features
+
+        history, live = regime_returns[:600], regime_returns[600:]
+        detector = RegimeDetector(history)
+        tracker = detector.online(method)
+
+        online = np.array([tracker.update(r).value for r in live])
+        batch = detector.fit(method).classify(*rolling_features(regime_returns, 20))[600:]
+        assert np.array_equal(online, batch)
+        assert tracker.n_updates == len(live)
+
+    def test_hmm_tracker_filters_forward(self, regime_returns):
+        from src.utils.regime_detection import HMMRegimeModel, RegimeDetector
+
+        history, live = regime_returns[:600], regime_returns[600:]
+        detector = RegimeDetector(history)
+        tracker = detector.online("hmm")
+        online = [tracker.update(r).value for r in live]
+
+        model = detector.fit("hmm")
+        assert isinstance(model, HMMRegimeModel)
+        filtered = model.hmm.filter(regime_returns)
+        assert np.allclose(tracker.probabilities, filtered[-1])
+        # 逐根與批次濾波 argmax 一致；批次 detect 用 Viterbi（參考未來數據），不在比對範圍
+        expected = [model.state_to_regime[int(s)] for s in np.argmax(filtered[600:], axis=1)]
+        assert online == expected
+
+    def test_insufficient_history_defaults_low_vol(self):
+        from src.utils.regime_detection import Regime, RegimeDetector
+
+        tracker = RegimeDetector(np.zeros(10)).online("rule")
+        assert tracker.update(0.01) == Regime.LOW_VOL
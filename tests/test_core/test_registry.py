@@ -128,7 +128,7 @@ class TestStrategyRegistry:
         """註冊時可傳入完整 metadata."""
         reg = _make_reg()
         reg.register(
-            func=lambda r: [],
+            func=lambda r, window=20: [],
             name="adv",
             label="Advanced",
             category="breakout",
@@ -183,3 +183,116 @@ class TestRegisterStrategyDecorator:
 
         result = passthrough([{"v": 1}, {"v": 2}])
         assert result == [1, 2]
+
+# ─── 統一分派與參數驗證 ───
+
+
+class TestUnifiedDispatch:
+    """測試 ParamSpec 驗證、各場景的實作選擇與自動退回."""
+
+    def test_signature_validated_at_registration(self):
+        """宣告參數須被簽名接受；defaults / grid 在註冊時檢查型別."""
+        reg = _make_reg()
+
+        def strat(rows, period: int = 14, threshold: float = 2.0):
+            return [0] * len(rows)
+
+        with pytest.raises(TypeError):
+            reg.register(func=strat, name="bad", label="B", category="trend", params=["period", "window"])
+        with pytest.raises(ValueError):
+            reg.register(func=strat, name="bad", label="B", category="trend", param_grid={"period": [10, 2.5]})
+        with pytest.raises(TypeError):
+            reg.register(func=lambda rows, period: [], name="bad", label="B", category="trend", params=[])
+
+        reg.register(func=strat, name="ok", label="OK", category="trend", param_grid={"threshold": [1, 2]})
+        meta = reg.get("ok").meta
+        assert meta.params == ["period", "threshold"] and meta.defaults == {"period": 14, "threshold": 2.0}
+        assert meta.param_grid == {"threshold": [1.0, 2.0]}
+        assert reg.validate("ok", {"period": 20.0, "threshold_period": 3}) == {"period": 20, "threshold": 3.0}
+        with pytest.raises(ValueError):
+            reg.validate("ok", {"window": 5})
+        with pytest.raises(ValueError):
+            reg.validate("ok", {"period": "14"})
+        with pytest.raises(TypeError):
+            reg.register_impl("ok", "vectorized", lambda rows, period=14: [])
+
+    def test_dispatch_prefers_fastest_and_falls_back(self):
+        """batch → vectorized → scalar、streaming → vectorized → scalar 依序退回."""
+        reg = _make_reg()
+        calls = []
+
+        def scalar(rows, fast=10):
+            calls.append(("scalar", fast))
+            return [fast] * len(rows)
+
+        reg.register(func=scalar, name="s", label="S", category="trend")
+        rows = [{"close": 1.0}] * 3
+        assert reg.get_signal("s", rows, fast=2) == [2, 2, 2]
+        assert [list(x) for x in reg.get_signals_batch("s", rows, [{"fast": 3}, {}])] == [[3, 3, 3], [10, 10, 10]]
+        assert reg.latest_signal("s", rows, fast=4) == 4
+
+        reg.register_impl("s", "vectorized", lambda rows, fast=10: [-fast] * len(rows))
+        reg.register_impl("s", "batch", lambda rows, plist: (["batch", p["fast"]] for p in plist))
+        reg.register_impl("s", "streaming", lambda rows, fast=10: fast + 100)
+        calls.clear()
+        assert reg.get_signal("s", rows, fast=2) == [-2, -2, -2]
+        # batch 實作收到已補上預設值的參數
+        assert list(reg.get_signals_batch("s", rows, [{"fast": 3}, {}])) == [["batch", 3], ["batch", 10]]
+        assert reg.latest_signal("s", rows) == 110
+        assert calls == []
+        assert {mode: kind for mode, (kind, _) in reg.get("s").dispatch.items()} == {
+            "single": "vectorized",
+            "batch": "batch",
+            "live": "streaming",
+        }
+        assert reg.latest_signal("nope", rows) == 0
+
+    @pytest.mark.parametrize("ohlcv_rows", [300], indirect=True)
+    def test_global_registry_indexes_all_implementations(self, ohlcv_rows):
+        """回測函式、批次版與類別策略都經同一個 registry."""
+        from src.backtest import strategies
+
+        rows = ohlcv_rows
+        grid = [{"fast": f, "slow": s} for f in (5, 10) for s in (20, 30)]
+        for name in ("sma_cross", "ema_cross"):
+            assert registry.get(name).dispatch["batch"][0] == "batch"
+            batch = list(registry.get_signals_batch(name, rows, grid))
+            assert batch == [strategies._STRATEGY_FUNCS[name](rows, **p) for p in grid]
+        assert strategies.get_signal("rsi_signal", rows) == registry.get_signal("rsi_signal", rows)
+        assert registry.validate("macd_cross", {"fast_period": 8}) == {"fast": 8, "slow": 26, "signal": 9}
+
+        # 類別策略按需載入，參數表取自建構子
+        zlema = registry.get("zlema")
+        assert zlema is not None and zlema.meta.category == "trend" and "period" in zlema.meta.schema
+        signals = registry.get_signal("zlema", rows, period=20)
+        assert len(signals) == len(rows) and set(signals) <= {-1, 0, 1}
+
+    @pytest.mark.parametrize("ohlcv_rows", [300], indirect=True)
+    def test_live_monitor_uses_registry(self, monkeypatch, ohlcv_rows):
+        """即時監控走 registry，舊版參數名（fast_period）也能對應；只在交叉當根發出買賣信號."""
+        import pandas as pd
+
+        from src.data import live_monitor
+
+        bars = {}
+        monkeypatch.setattr(live_monitor.data_service, "get_kline", lambda *a, **k: pd.DataFrame(bars["rows"]))
+
+        def monitor(rows, strategy="sma_cross", params=None):
+            bars["rows"] = rows
+            return live_monitor.calculate_signal_for_symbol("BTC/USDT", strategy, params or {})
+
+        rows = ohlcv_rows
+        state = registry.get_signal("sma_cross", rows, fast=5, slow=20)
+        flip = next(i for i in range(60, len(rows) - 1) if state[i] != state[i - 1] and state[i + 1] == state[i])
+        out = monitor(rows[: flip + 1], params={"fast_period": 5, "slow_period": 20})
+        assert out["signal"] == state[flip] and out["action"] == ("BUY" if state[flip] == 1 else "SELL")
+        assert 0 <= out["confidence"] <= 95
+        # 持倉狀態不變的下一根不再重複發信號
+        assert monitor(rows[: flip + 2], params={"fast_period": 5, "slow_period": 20})["action"] == "HOLD"
+
+        assert {"macd", "signal_line"} <= monitor(rows, "macd_cross").keys()
+        assert 0 <= monitor(rows, "rsi_signal")["rsi"] <= 100
+        out = monitor(rows, "bollinger_signal")
+        assert out["lower_band"] < out["upper_band"]
+        assert monitor(rows, params={"bogus": 1}) is None
+        assert monitor(rows, "no_such")["action"] == "HOLD"
@@ -0,0 +1,141 @@
+"""
+測試回測報告二進位編碼 — 列式表格往返、延遲解碼與單欄存取、體積、Celery 結果序列化器、RedisCache
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+
+import numpy as np
+
+from .conftest import SINCE
+
+
+def _curve(n: int, seed: int = 0) -> list[dict]:
+    rng = np.random.default_rng(seed)
+    equity = np.round(10_000 * np.exp(np.cumsum(rng.normal(0, 0.001, n))), 2).tolist()
+    position = rng.integers(-1, 2, n).tolist()
+    return [
+        {"timestamp": SINCE + i * 60_000, "equity": e, "position": p} for i, (e, p) in enumerate(zip(equity, position))
+    ]
+
+
+def _trades(n: int = 40) -> list[dict]:
+    return [
+        {
+            "entry_ts": SINCE + i * 600_000,
+            "side": "long" if i % 2 else "short",
+            "pnl": 0.1 * i - 1.234567891,
+            "closed": i % 3 != 0,
+            "reason": None if i % 4 else "take_profit",
+        }
+        for i in range(n)
+    ]
+
+
+class TestRoundTrip:
+    def test_tree_and_tables(self):
+        from src.core.backtest import TradeRecord
+        from src.utils import report_codec
+
+        curve, trades = _curve(500), _trades()
+        record = TradeRecord(SINCE, SINCE + 60_000, 1, 1.5, 2.0, 33.3, 0.5, 0.01)
+        obj = {
+            "metrics": {"sharpe_ratio": 1.25, "num_trades": 40, "name": "sma", "nan": None},
+            "equity_curve": curve,
+            "trades": trades,
+            "records": [record] * 20,
+            "small": [{"a": 1}, {"a": 2}],
+            "raw": b"\x00\xff",
+            "array": np.arange(6, dtype=np.float32).reshape(2, 3),
+            "scalar": np.float64(2.5),
+        }
+        out = report_codec.loads(report_codec.dumps(obj))
+
+        assert out["metrics"] == obj["metrics"] and out["small"] == obj["small"]
+        assert out["equity_curve"] == curve and out["trades"] == trades
+        assert out["records"] == [dataclasses.asdict(record)] * 20
+        assert out["raw"] == b"\x00\xff" and out["scalar"] == 2.5
+        assert out["array"].dtype == np.float32 and out["array"].tolist() == obj["array"].tolist()
+        # 型別完整還原（int 不變 float、bool 不變 int）
+        row = out["trades"][3]
+        assert [type(v) for v in row.values()] == [int, str, float, bool, type(None)]
+
+    def test_lazy_rows(self):
+        import pickle
+
+        import pandas as pd
+
+        from src.utils import report_codec
+
+        curve = _curve(1000)
+        rows = report_codec.loads(report_codec.dumps({"curve": curve}))["curve"]
+        assert isinstance(rows, report_codec.LazyRows) and len(rows) == 1000 and not rows.decoded
+        assert rows.columns == ["timestamp", "equity", "position"]
+        np.testing.assert_array_equal(rows.column("equity"), [r["equity"] for r in curve])
+        assert rows.column("timestamp")[-1] == curve[-1]["timestamp"] and not rows.decoded
+
+        assert rows[10] == curve[10] and rows[-2:] == curve[-2:] and rows.decoded
+        assert pd.DataFrame(rows)["equity"].tolist() == [r["equity"] for r in curve]
+        assert json.loads(json.dumps(rows.tolist())) == curve
+        assert pickle.loads(pickle.dumps(rows)) == curve
+
+        # 再次編碼直接搬移壓縮後的欄位
+        again = report_codec.loads(report_codec.dumps({"curve": report_codec.loads(report_codec.dumps(curve))}))
+        assert again["curve"] == curve
+
+    def test_float32_and_lossy_columns(self):
+        from src.utils import report_codec
+
+        noisy = [{"t": SINCE + i, "equity": 10_000 + np.pi * i} for i in range(1000)]
+        exact = report_codec.dumps(noisy)
+        small = report_codec.dumps(noisy, float32=("equity",))
+        assert report_codec.loads(exact) == noisy and len(small) < len(exact)
+        np.testing.assert_allclose(report_codec.loads(small).column("equity"), [r["equity"] for r in noisy], rtol=1e-6)
+
+    def test_much_smaller_than_json(self):
+        from src.utils import report_codec
+
+        curve = _curve(50_000)
+        blob = report_codec.dumps({"equity_curve": curve, "trades": _trades(500)})
+        assert report_codec.is_encoded(blob) and not report_codec.is_encoded(b"{}")
+        assert len(json.dumps({"equity_curve": curve, "trades": _trades(500)})) > 10 * len(blob)
+
+
+class TestTransports:
+    def test_celery_result_serializer(self):
+        from kombu.serialization import dumps, loads, prepare_accept_content
+
+        from src.tasks.celery_app import app
+        from src.utils import report_codec
+
+        assert app.conf.result_serializer == report_codec.SERIALIZER_NAME
+        assert app.conf.task_serializer == "json"
+        meta = {"status": "SUCCESS", "result": {"equity_curve": _curve(100)}, "traceback": None, "children": []}
+        content_type, encoding, payload = dumps(meta, serializer=report_codec.SERIALIZER_NAME)
+        assert content_type == report_codec.CONTENT_TYPE and encoding == "binary"
+        out = loads(payload, content_type, encoding, accept=prepare_accept_content(app.conf.result_accept_content))
+        assert out == meta
+
+    def test_redis_cache_encoding(self):
+        from src.core.provider import RedisCache
+
+        class FakeRedis(dict):
+            def setex(self, key, ttl, value):
+                self[key] = value
+
+        cache = RedisCache("redis://localhost:1/0")
+        cache._client, cache._available = FakeRedis(), True
+        rows = _curve(200)
+        cache.set("ohlcv", rows)
+        assert isinstance(cache._client["ohlcv"], bytes) and cache.get("ohlcv") == rows
+        # 升級前寫入的 JSON 值仍可讀
+        cache._client["legacy"] = json.dumps({"last": 1.5}).encode()
+        assert cache.get("legacy") == {"last": 1.5}
+        # 不支援的型別不寫入（不會以字串形式取回）
+        from decimal import Decimal
+
+        for value in ({1, 2}, {"price": Decimal("1.5")}):
+            cache.set("bad", value)
+            assert "bad" not in cache._client
@@ -0,0 +1,233 @@
+"""
+測試回測結果快取 — 內容定址鍵、L1/L2/L3 分層與容量逐出、延遲載入明細、Orchestrator 與 optimizer 整合
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from .conftest import SINCE
+
+
+def _until(rows: list[dict]) -> int:
+    return rows[-1]["timestamp"]
+
+
+def _report(rows: list[dict], fast: int = 5):
+    from src.backtest.strategies import sma_cross
+    from src.core.backtest import BacktestEngine
+
+    return BacktestEngine().run(rows, sma_cross(rows, fast=fast, slow=20), SINCE, _until(rows))
+
+
+class FakeProvider:
+    def __init__(self, rows: list[dict]) -> None:
+        self.rows = rows
+        self.calls = 0
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        from src.core.provider import OHLCV
+
+        self.calls += 1
+        return [OHLCV.from_dict(r) for r in self.rows]
+
+
+@pytest.mark.parametrize("ohlcv_rows", [400], indirect=True)
+class TestCacheKey:
+    def test_content_addressed(self, ohlcv_rows):
+        from src.core.backtest import BacktestConfig
+        from src.core.result_cache import backtest_cache_key
+        from src.data.integrity import compute_data_hash
+
+        rows = ohlcv_rows
+        data = compute_data_hash(rows)
+        key = backtest_cache_key(data, "sma_cross", {"fast": 5, "slow": 20}, BacktestConfig())
+        # 參數補預設值、統一型別後同鍵
+        assert backtest_cache_key(data, "sma_cross", {"fast": 5.0}, BacktestConfig()) == backtest_cache_key(
+            data, "sma_cross", {"fast": 5}, BacktestConfig()
+        )
+        assert key == backtest_cache_key(data, "sma_cross", {"slow": 20, "fast": 5}, BacktestConfig())
+
+        edited = [dict(r) for r in rows]
+        edited[200]["close"] *= 1.01
+        variants = {
+            backtest_cache_key(compute_data_hash(edited), "sma_cross", {"fast": 5, "slow": 20}, BacktestConfig()),
+            backtest_cache_key(data, "sma_cross", {"fast": 6, "slow": 20}, BacktestConfig()),
+            backtest_cache_key(data, "sma_cross", {"fast": 5, "slow": 20}, BacktestConfig(leverage=2.0)),
+            backtest_cache_key(data, "sma_cross", {"fast": 5, "slow": 20}, BacktestConfig(), engine="loop"),
+            backtest_cache_key(data, "sma_cross", {"fast": 5, "slow": 20}, BacktestConfig(), until_ms=1),
+        }
+        assert key not in variants and len(variants) == 5
+
+    def test_engine_code_in_key(self, monkeypatch, ohlcv_rows):
+        """修正引擎或指標函式後，磁碟層的舊結果不再命中."""
+        from src.backtest import engine
+        from src.core import result_cache
+        from src.core.backtest import BacktestConfig
+        from src.data.integrity import compute_data_hash
+
+        data = compute_data_hash(ohlcv_rows)
+
+        def key(name):
+            result_cache._engine_fingerprint.cache_clear()
+            return result_cache.backtest_cache_key(data, "sma_cross", {}, BacktestConfig(), engine=name)
+
+        before = {name: key(name) for name in ("core", "loop")}
+        try:
+            monkeypatch.setattr(engine, "_compute_metrics", lambda *a, **k: {})
+            assert key("loop") != before["loop"] and key("core") == before["core"]
+            monkeypatch.undo()
+            assert key("loop") == before["loop"]
+        finally:
+            result_cache._engine_fingerprint.cache_clear()
+
+
+@pytest.mark.parametrize("ohlcv_rows", [400], indirect=True)
+class TestTiers:
+    def test_lazy_detail_and_rerun(self, ohlcv_rows):
+        from src.core.backtest import TradeRecord
+        from src.core.result_cache import BacktestResultCache
+
+        rows = ohlcv_rows
+        report = _report(rows)
+        cache = BacktestResultCache(memory_bytes=1 << 20)
+        cache.put("k", report, meta={"last_signal": 1})
+        hit = cache.get("k", trade_factory=lambda t: TradeRecord(**t))
+        assert hit.metrics == report.metrics and hit.meta == {"last_signal": 1}
+        assert not hit.detail_loaded
+        assert hit.equity_curve == report.equity_curve and hit.trades == report.trades
+        assert hit.to_dict() == report.to_dict()
+
+        # 只存摘要時，明細由 rerun 重算
+        calls = []
+        cache.put("summary", report, detail=False)
+        hit = cache.get("summary", rerun=lambda: calls.append(1) or report)
+        assert hit.metrics == report.metrics and calls == []
+        assert len(hit.equity_curve) == len(rows) and calls == [1]
+
+        report.error = "boom"
+        cache.put("failed", report)
+        assert cache.get("failed") is None
+        assert cache.stats.hits == 2 and cache.stats.misses == 1
+
+    def test_memory_eviction_by_size(self, ohlcv_rows):
+        from src.core.result_cache import BacktestResultCache
+
+        rows = ohlcv_rows
+        cache = BacktestResultCache(memory_bytes=5_000)
+        for fast in (3, 4, 5, 6):
+            cache.put(f"k{fast}", _report(rows, fast))
+        assert cache.stats_dict()["memory_bytes"] <= 5_000 and cache.stats.evictions > 0
+        assert cache.get("k3") is None and cache.get("k6") is not None
+
+    def test_disk_persistence_and_eviction(self, tmp_path, ohlcv_rows):
+        from src.core.result_cache import BacktestResultCache
+
+        rows = ohlcv_rows
+        report = _report(rows)
+        BacktestResultCache(disk_dir=tmp_path).put("a" * 64, report)
+
+        # 新進程（新實例）從磁碟命中並回填 L1
+        cache = BacktestResultCache(disk_dir=tmp_path)
+        hit = cache.get("a" * 64)
+        assert hit.equity_curve == report.equity_curve
+        assert cache.tier_hits["disk"] == 2 and cache.get("a" * 64) is not None and cache.tier_hits["memory"] == 1
+
+        small = BacktestResultCache(disk_dir=tmp_path, disk_bytes=5_000)
+        for fast in (3, 4, 5, 6):
+            small.put(f"{fast}" * 64, _report(rows, fast))
+        assert sum(p.stat().st_size for p in tmp_path.glob("*/*.z")) <= 5_000 and small.stats.evictions > 0
+        assert BacktestResultCache(disk_dir=tmp_path).get("6" * 64) is not None
+
+    def test_remote_tier(self, ohlcv_rows):
+        from src.core.cache_manager import CacheManager, CacheNamespace
+        from src.core.provider import DictCache
+        from src.core.result_cache import BacktestResultCache
+
+        shared = CacheNamespace("backtest", DictCache())
+        report = _report(ohlcv_rows)
+        BacktestResultCache(remote=shared).put("k", report)
+        other = BacktestResultCache(remote=shared)
+        assert other.get("k").equity_curve == report.equity_curve
+        assert other.tier_hits["redis"] == 2
+        assert CacheManager().remote("backtest") is None  # 未設定 Redis
+
+
+class TestIntegration:
+    @pytest.mark.parametrize("ohlcv_rows", [400], indirect=True)
+    def test_orchestrator_hits_cache(self, monkeypatch, ohlcv_rows):
+        from src.core.backtest import TradeRecord
+        from src.core.orchestrator import Orchestrator
+        from src.core.registry import registry
+        from src.core.result_cache import BacktestResultCache, CachedBacktest
+
+        rows = ohlcv_rows
+        orch = Orchestrator(provider=FakeProvider(rows), result_cache=BacktestResultCache())
+        published = []
+        monkeypatch.setattr(orch._signal_bus, "publish", published.append)
+        args = ("BTC/USDT", "1h", "sma_cross")
+        kwargs = {"since_ms": SINCE, "until_ms": _until(rows), "clean": False, "fast": 5, "slow": 20}
+        first = orch.run_backtest(*args, **kwargs)
+
+        calls = []
+        get_signal = registry.get_signal
+        monkeypatch.setattr(registry, "get_signal", lambda *a, **k: calls.append(a) or get_signal(*a, **k))
+        second = orch.run_backtest(*args, **kwargs)
+        assert isinstance(second, CachedBacktest) and calls == []
+        assert second.metrics == first.metrics and second.raw_ohlcv == rows
+        assert [p.direction for p in published] == [published[0].direction] * 2
+        assert all(isinstance(t, TradeRecord) for t in second.trades) and second.trades == first.trades
+
+    def test_optimizer_reuses_grid(self, monkeypatch, ohlcv_rows):
+        import src.data.crypto as crypto
+        from src.backtest.optimizer import find_optimal
+        from src.core import result_cache
+        from src.core.result_cache import BacktestResultCache, CachedBacktest
+
+        rows = ohlcv_rows
+
+        class FakeFetcher:
+            def __init__(self, exchange_id):
+                pass
+
+            def get_ohlcv(self, symbol, timeframe, since_ms, until_ms, fill_gaps=True, exclude_outliers=False):
+                return rows
+
+        monkeypatch.setattr(crypto, "CryptoDataFetcher", FakeFetcher)
+        monkeypatch.setattr(result_cache, "_result_cache", BacktestResultCache())
+        grid = {"fast": [5, 10], "slow": [20, 30, 40]}
+        args = ("binance", "BTC/USDT", "1h", SINCE, _until(rows), "sma_cross", grid)
+
+        best, results = find_optimal(*args)
+        best_again, again = find_optimal(*args)
+        assert all(isinstance(r["result"], CachedBacktest) for r in again)
+        assert [r["metrics"] for r in again] == [r["metrics"] for r in results]
+        # 最優組合存了完整明細，其餘組合畫圖時重算
+        assert best_again.equity_curve == best.equity_curve
+        assert again[0]["result"].equity_curve == results[0]["result"].equity_curve
+        assert find_optimal(*args, use_cache=False)[0].metrics == best.metrics
+
+
+    def test_engine_run_backtest_keeps_rows_on_hit(self, monkeypatch, ohlcv_rows):
+        import src.data.crypto as crypto
+        from src.backtest.engine import run_backtest
+        from src.core import result_cache
+        from src.core.result_cache import BacktestResultCache, CachedBacktest
+
+        rows = ohlcv_rows
+
+        class FakeFetcher:
+            def __init__(self, exchange_id):
+                pass
+
+            def get_ohlcv(self, symbol, timeframe, since_ms, until_ms, fill_gaps=True, exclude_outliers=False):
+                return rows
+
+        monkeypatch.setattr(crypto, "CryptoDataFetcher", FakeFetcher)
+        monkeypatch.setattr(result_cache, "_result_cache", BacktestResultCache())
+        args = ("binance", "BTC/USDT", "1h", SINCE, _until(rows), "sma_cross", {"fast": 5, "slow": 20})
+
+        first = run_backtest(*args)
+        again = run_backtest(*args)
+        assert isinstance(again, CachedBacktest) and again.metrics == first.metrics
+        assert again.raw_ohlcv == first.raw_ohlcv == rows
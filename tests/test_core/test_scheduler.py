@@ -0,0 +1,127 @@
+"""
+測試任務排程策略 — 成本分類、每使用者公平排隊、保留 interactive 線程、協作取消、任務資訊保留上限、Celery 優先級路由
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+
+def _drain(scheduler) -> list[str]:
+    order = []
+    while (job := scheduler.pop()) is not None:
+        order.append(job.task_id)
+    return order
+
+
+class TestPolicy:
+    def test_cost_and_classify(self):
+        from src.core.scheduler import INTERACTIVE_MAX_COST, Priority, celery_priority, classify, estimate_bars
+        from src.core.scheduler import estimate_cost
+
+        assert estimate_bars("1h", 0, 24 * 3_600_000) == 25 and estimate_cost(0, 0) == 1
+        assert classify(None, 100) is Priority.INTERACTIVE
+        assert classify("interactive", INTERACTIVE_MAX_COST + 1) is Priority.BATCH
+        assert classify("maintenance", 10**12) is Priority.MAINTENANCE
+        assert celery_priority("interactive") < celery_priority("batch") < celery_priority("maintenance")
+        # 同一工作越後面的分塊越後取，但不落到 maintenance 區段
+        steps = [celery_priority(Priority.BATCH, position=i) for i in range(0, 200, 8)]
+        assert steps == sorted(steps) and steps[0] < steps[-1] < celery_priority("maintenance")
+
+    def test_fair_queue_across_users(self):
+        from src.core.scheduler import FairScheduler, Job, Priority
+
+        scheduler = FairScheduler()
+        # alice 先排了 3 個大工作，bob 之後才來的小工作不必等 alice 全部跑完
+        for i in range(3):
+            scheduler.push(Job(f"a{i}", "alice", Priority.BATCH, cost=1_000))
+        for i in range(3):
+            scheduler.push(Job(f"b{i}", "bob", Priority.BATCH, cost=10))
+        scheduler.push(Job("m", "carol", Priority.MAINTENANCE, cost=1))
+        scheduler.push(Job("i", "carol", Priority.INTERACTIVE, cost=1))
+        assert scheduler.pending() == 8 and scheduler.pending(Priority.BATCH) == 6
+        assert _drain(scheduler) == ["i", "a0", "b0", "b1", "b2", "a1", "a2", "m"]
+
+        # alice 已超前的用量延續；新使用者從系統虛擬時間起算，不會因從未排隊而囤積額度
+        scheduler.push(Job("a3", "alice", Priority.BATCH, cost=1))
+        scheduler.push(Job("d0", "dave", Priority.BATCH, cost=1))
+        scheduler.push(Job("d1", "dave", Priority.BATCH, cost=1))
+        assert scheduler.remove("d1").user == "dave" and scheduler.remove("nope") is None
+        assert _drain(scheduler) == ["d0", "a3"]
+
+
+class TestThreadTaskQueue:
+    def test_interactive_not_blocked_by_batch(self):
+        from src.core.tasks import ThreadTaskQueue
+
+        queue = ThreadTaskQueue(max_workers=2)
+        release = threading.Event()
+        try:
+            batch = [queue.submit(f"opt{i}", release.wait, user="alice", bars=50_000, combos=500) for i in range(4)]
+            assert queue.status(batch[0]).priority.value == "batch"
+            started = time.perf_counter()
+            quick = queue.submit("bt", lambda: "ok", user="bob", bars=1_000)
+            assert queue.result(quick, timeout=2) == "ok" and time.perf_counter() - started < 1
+            # batch 只佔一個線程，其餘仍在排隊
+            assert queue.pending()["batch"] == 3
+        finally:
+            release.set()
+            queue.shutdown(wait=True)
+        assert all(queue.status(t).status.value == "success" for t in batch)
+
+    def test_cooperative_cancel_and_retention(self):
+        from concurrent.futures import CancelledError
+
+        from src.core.tasks import TaskStatus, ThreadTaskQueue, check_cancelled
+
+        queue = ThreadTaskQueue(max_workers=1, max_retained=3)
+        started, steps = threading.Event(), []
+
+        def long_job():
+            started.set()
+            for i in range(1_000):
+                check_cancelled()
+                steps.append(i)
+                time.sleep(0.005)
+
+        running = queue.submit("long", long_job)
+        waiting = queue.submit("waiting", lambda: 1)
+        assert started.wait(2)
+        assert queue.cancel(waiting) and queue.status(waiting).status is TaskStatus.CANCELLED
+        assert queue.cancel(running)
+        with pytest.raises(CancelledError):
+            queue.result(running, timeout=2)
+        assert queue.status(running).status is TaskStatus.CANCELLED and len(steps) < 1_000
+        assert not queue.cancel(running)
+
+        ids = [queue.submit(f"t{i}", lambda i=i: i) for i in range(5)]
+        queue.shutdown(wait=True)
+        assert queue.status(running) is None and queue.status(ids[0]) is None
+        assert [queue.status(t).result for t in ids[-3:]] == [2, 3, 4] and len(queue.list_tasks()) == 3
+        with pytest.raises(RuntimeError):
+            queue.submit("late", lambda: 1)
+
+
+class TestCeleryRouting:
+    def test_priorities_follow_policy(self):
+        pytest.importorskip("celery")
+        from src.core import scheduler
+        from src.core.scheduler import Priority, celery_priority
+        from src.tasks.celery_app import app
+
+        route = app.amqp.router.route
+        quick = ("BTC/USDT", "binance", "1h", "sma_cross", {"fast": 5}, "2024-01-01", "2024-02-01")
+        assert route({}, "src.tasks.backtest_tasks.run_backtest", quick)["priority"] == celery_priority("interactive")
+        # 1m K 線跑數年已超過 interactive 成本上限
+        huge = {"timeframe": "1m", "start_date": "2018-01-01", "end_date": "2024-01-01"}
+        options = route({}, "src.tasks.backtest_tasks.run_backtest", (), huge)
+        assert options["priority"] == celery_priority(Priority.BATCH) and options["queue"].name == "backtest"
+        assert route({"priority": 0}, "src.tasks.backtest_tasks.run_param_optimizer", quick)["priority"] == 0
+        assert route({}, "src.tasks.cleanup.cleanup_old_results")["priority"] == celery_priority("maintenance")
+        transport = app.conf.broker_transport_options
+        assert transport["priority_steps"] == scheduler.CELERY_PRIORITY_STEPS
+        # 跨佇列維持輪詢，不讓前面的佇列餓死後面的
+        assert "queue_order_strategy" not in transport
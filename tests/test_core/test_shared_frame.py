@@ -0,0 +1,150 @@
+"""
+測試共享記憶體 DataFrame 與自動化回測 Pipeline 的向量化 / 多進程路徑
+"""
+
+from __future__ import annotations
+
+import pickle
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _ohlcv(n: int = 300, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 + np.cumsum(rng.normal(0, 0.2, n))
+    return pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 0.3,
+            "low": close - 0.3,
+            "close": close,
+            "volume": rng.integers(1_000_000, 10_000_000, n),
+        },
+        index=pd.date_range("2021-01-01", periods=n, freq="B", name="date"),
+    )
+
+
+class MomentumStrategy:
+    """測試用策略：close 高於 N 日均線買入、低於賣出"""
+
+    def __init__(self, period: int = 10):
+        self.period = period
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        ma = data["close"].rolling(self.period).mean()
+        return pd.Series(np.where(data["close"] > ma, 1, np.where(data["close"] < ma, -1, 0)), index=data.index)
+
+
+class MutatingStrategy(MomentumStrategy):
+    """會原地改寫 close 欄位的策略，不得影響其他任務"""
+
+    def generate_signals(self, data: pd.DataFrame) -> pd.Series:
+        data.loc[data.index[0], "close"] = -1.0
+        return super().generate_signals(data)
+
+
+def _pipeline_module():
+    from pipeline import automated_backtest_pipeline
+
+    return automated_backtest_pipeline
+
+
+class TestSharedFrame:
+    def test_roundtrip_zero_copy(self):
+        from src.utils.shared_frame import SharedFrame, attach_frame
+
+        df = _ohlcv()
+        df.index = df.index.tz_localize("Asia/Taipei")
+        with SharedFrame(df) as shared:
+            handle = pickle.loads(pickle.dumps(shared.handle))
+            attached, shm = attach_frame(handle)
+            pd.testing.assert_frame_equal(attached, df.astype(float))
+            assert len(pickle.dumps(handle)) < 1024
+            assert np.shares_memory(attached["close"].to_numpy(), np.ndarray((shm.size,), np.uint8, shm.buf))
+            del attached
+            shm.close()
+
+    def test_read_only_with_copy_on_write(self):
+        from src.utils.shared_frame import SharedFrame, attach_frame
+
+        df = pd.DataFrame({"close": [1.0, 2.0, 3.0]})
+        with SharedFrame(df) as shared:
+            attached, shm = attach_frame(shared.handle)
+            assert isinstance(attached.index, pd.RangeIndex)
+            with pytest.raises(ValueError):
+                attached.loc[0, "close"] = 9.0
+            view = attached.copy(deep=False)
+            view.loc[0, "close"] = 9.0
+            assert attached.loc[0, "close"] == 1.0 and view.loc[0, "close"] == 9.0
+            del attached, view
+            shm.close()
+
+
+    def test_string_columns_kept_alongside(self):
+        from src.utils.shared_frame import SharedFrame, attach_frame
+
+        df = _ohlcv(50)
+        df.insert(0, "code", "000001")
+        df["name"] = "平安銀行"
+        df["halted"] = False
+        with SharedFrame(df) as shared:
+            handle = pickle.loads(pickle.dumps(shared.handle))
+            assert handle.shared_columns == ("open", "high", "low", "close", "volume")
+            attached, shm = attach_frame(handle)
+            assert list(attached.columns) == list(df.columns)
+            # 代碼保留前導零與原 dtype，數值欄位仍為零拷貝
+            assert attached["code"].iloc[0] == "000001" and attached["code"].dtype == df["code"].dtype
+            assert attached["halted"].dtype == bool
+            pd.testing.assert_frame_equal(attached, df.astype({"volume": float}), check_freq=False)
+            assert np.shares_memory(attached["close"].to_numpy(), np.ndarray((shm.size,), np.uint8, shm.buf))
+            del attached
+            shm.close()
+
+
+class TestPipelineBacktest:
+    def test_vectorized_matches_bar_loop(self):
+        mod = _pipeline_module()
+        rng = np.random.default_rng(3)
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, 200)))
+        signals = rng.choice([-1, 0, 0, 1], 200)
+
+        capital, position, expected = 1.0, 0.0, []
+        for i in range(1, len(close)):
+            if signals[i] == 1 and position == 0:
+                position, capital = capital / close[i] * 0.998, 0.0
+            elif signals[i] == -1 and position > 0:
+                capital, position = position * close[i] * 0.998, 0.0
+            expected.append(capital + position * close[i])
+        if position > 0:
+            expected[-1] = position * close[-1] * 0.998
+
+        values, _ = mod.simulate_long_only(signals, close, 0.002)
+        assert np.allclose(values, expected, rtol=1e-10)
+
+    def test_pool_matches_serial_and_isolates_writes(self):
+        mod = _pipeline_module()
+        df = _ohlcv()
+        strategies = {"mutating": MutatingStrategy, "momentum": MomentumStrategy}
+        params = {"momentum": {"period": 15}}
+
+        serial = mod.AutomatedBacktestPipeline(n_workers=1).run_backtest(df, strategies, params)
+        streamed = []
+        pooled = mod.AutomatedBacktestPipeline(n_workers=2).run_backtest(
+            df, strategies, params, on_result=lambda name, r: streamed.append(name)
+        )
+        assert serial == pooled
+        assert list(pooled) == ["mutating", "momentum"] and sorted(streamed) == ["momentum", "mutating"]
+        assert all(r["status"] == "success" for r in pooled.values())
+        assert pooled["momentum"]["monthly_returns"]
+        assert df["close"].iloc[0] != -1.0
+
+    def test_pool_accepts_string_columns(self):
+        mod = _pipeline_module()
+        df = _ohlcv()
+        df["code"] = "000001"
+        strategies = {"momentum": MomentumStrategy}
+        serial = mod.AutomatedBacktestPipeline(n_workers=1).run_backtest(df, strategies)
+        pooled = mod.AutomatedBacktestPipeline(n_workers=2).run_backtest(df, {**strategies, "m2": MomentumStrategy})
+        assert pooled["momentum"] == serial["momentum"] and pooled["momentum"]["status"] == "success"
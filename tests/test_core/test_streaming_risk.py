@@ -0,0 +1,165 @@
+"""
+測試流式風險組件 — 環形緩衝、滾動統計、多組合風險簿
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def returns():
+    rng = np.random.default_rng(42)
+    return rng.normal(0.0005, 0.02, 600)
+
+
+class TestRollingStats:
+    def test_ring_buffer_evicts_oldest(self):
+        from src.trading.risk.streaming import RingBuffer
+
+        buf = RingBuffer(3)
+        assert [buf.append(x) for x in (1, 2, 3, 4)] == [None, None, None, 1.0]
+        assert buf.values().tolist() == [2.0, 3.0, 4.0]
+        assert buf.last == 4.0
+
+    def test_matches_numpy_on_window(self, returns):
+        from src.trading.risk.streaming import RollingStats
+
+        stats = RollingStats(window=100)
+        for r in returns:
+            stats.push(r)
+        window = returns[-100:]
+
+        assert stats.mean == pytest.approx(window.mean(), abs=1e-12)
+        assert stats.std() == pytest.approx(window.std(), rel=1e-9)
+        assert stats.quantile(0.05) == pytest.approx(np.percentile(window, 5), abs=1e-12)
+        var = stats.quantile(0.05)
+        assert stats.tail_mean(var) == pytest.approx(window[window <= var].mean(), abs=1e-12)
+
+
+class TestRiskMonitor:
+    def test_metrics_match_full_recompute(self, returns):
+        from src.trading.risk.portfolio_risk import RiskMonitor
+
+        monitor = RiskMonitor(portfolio_value=100_000)
+        for r in returns:
+            monitor.add_return(r)
+
+        values = 100_000 * np.cumprod(np.concatenate(([1.0], 1 + returns)))
+        peak = np.maximum.accumulate(values)
+
+        assert monitor.calculate_var(0.95) == pytest.approx(np.percentile(returns, 5), abs=1e-12)
+        var = np.percentile(returns, 5)
+        assert monitor.calculate_cvar(0.95) == pytest.approx(returns[returns <= var].mean(), abs=1e-12)
+        assert monitor.calculate_volatility() == pytest.approx(returns.std() * np.sqrt(252), rel=1e-9)
+        assert monitor.calculate_max_drawdown() == pytest.approx(((values - peak) / peak).min())
+        assert monitor.calculate_current_drawdown() == pytest.approx((values[-1] - peak[-1]) / peak[-1])
+        assert len(monitor.value_history) == len(returns) + 1
+
+    def test_window_bounds_history(self, returns):
+        from src.trading.risk.portfolio_risk import RiskMonitor
+
+        monitor = RiskMonitor(portfolio_value=1.0, window=50)
+        for r in returns:
+            monitor.add_return(r)
+        assert len(monitor.returns_history) == 50
+        assert monitor.calculate_volatility(annualize=False) == pytest.approx(returns[-50:].std(), rel=1e-9)
+
+
+class TestBlackSwanDetector:
+    def test_volatility_spike_matches_reference(self):
+        from src.trading.risk.portfolio_risk import BlackSwanDetector
+
+        rng = np.random.default_rng(1)
+        prices = 100 * np.cumprod(1 + np.concatenate((rng.normal(0, 0.02, 100), rng.normal(0, 0.1, 10))))
+        detector = BlackSwanDetector(lookback_days=30)
+        for p in prices:
+            detector.add_price(p)
+
+        ref = [
+            np.std(np.diff(np.log(prices[i - 30 : i]))) * np.sqrt(252) for i in range(30, len(prices) + 1)
+        ]
+        assert detector.volatility_history == pytest.approx(ref, rel=1e-9)
+        z = (ref[-1] - np.mean(ref[:-1])) / np.std(ref[:-1])
+        assert detector.detect_volatility_spike(threshold=3.0) == (z > 3.0)
+
+
+class TestRiskBook:
+    def test_many_portfolios_vectorized(self, returns):
+        from src.trading.risk.streaming import RiskBook
+
+        book = RiskBook(window=100, capacity=2, drawdown_limit=0.05)
+        series = {f"user{i}:main": returns * (i + 1) for i in range(5)}
+        for t in range(len(returns)):
+            book.update({k: v[t] for k, v in series.items()})
+
+        assert len(book) == 5
+        m = book.metrics()
+        for i, s in enumerate(series.values()):
+            assert m["volatility"][i] == pytest.approx(s[-100:].std() * np.sqrt(252), rel=1e-9)
+            values = np.cumprod(1 + s)
+            peak = np.maximum.accumulate(np.concatenate(([1.0], values)))
+            assert m["max_drawdown"][i] == pytest.approx(((values - peak[1:]) / peak[1:]).min())
+
+        var, cvar = book.window_var()
+        assert var[0] == pytest.approx(np.percentile(returns[-100:], 5))
+        assert np.all(cvar <= var)
+
+        limits = book.check_limits()
+        assert limits["ok"].shape == (5,)
+        assert set(book.breaches()) == {k for k, ok in zip(book.keys, limits["ok"]) if not ok}
+
+    def test_var_cvar_share_volatility_window(self, returns):
+        from src.trading.risk.streaming import RiskBook
+
+        book = RiskBook(window=50, confidence=0.9)
+        # 前段大跌只在全歷史內，窗口滑過後不再影響 VaR/CVaR
+        crash = np.concatenate((np.full(20, -0.2), returns))
+        for t, x in enumerate(crash):
+            book.update({"a": x} if t % 3 else {"a": x, "b": -x})
+
+        m = book.metrics()
+        for i, s in enumerate((crash, -crash[::3])):
+            tail = s[-50:]
+            var = np.percentile(tail, 10)
+            assert m["var"][i] == pytest.approx(var, rel=1e-12)
+            assert m["cvar"][i] == pytest.approx(tail[tail <= var].mean(), rel=1e-12)
+            assert m["volatility"][i] == pytest.approx(tail.std() * np.sqrt(252), rel=1e-9)
+        assert m["cvar"][0] > -0.2
+
+        # 有序窗口隨每次 update 滑動；其他置信水平同樣精確
+        book.update({"a": -0.5})
+        tail = np.concatenate((crash[-49:], [-0.5]))
+        var, cvar = book.window_var(0.97)
+        assert var[0] == pytest.approx(np.percentile(tail, 3), rel=1e-12)
+        assert cvar[0] == pytest.approx(tail[tail <= var[0]].mean(), rel=1e-12)
+        assert book.metrics()["var"][0] == pytest.approx(np.percentile(tail, 10), rel=1e-12)
+        fresh = RiskBook()
+        fresh.add_portfolio("x")
+        assert np.isnan(fresh.metrics()["var"][0]) and np.isnan(fresh.metrics()["cvar"][0])
+
+    def test_var_with_ties(self):
+        from src.trading.risk.streaming import RiskBook
+
+        book = RiskBook(window=20, confidence=0.8, capacity=1)
+        series = [0.01, -0.02, -0.02, -0.02, 0.0] * 8
+        for x in series:
+            book.update({"a": x, "b": -x})
+        for i, s in enumerate((np.array(series[-20:]), -np.array(series[-20:]))):
+            var, cvar = book.window_var()
+            assert var[i] == pytest.approx(np.percentile(s, 20))
+            assert cvar[i] == pytest.approx(s[s <= var[i]].mean())
+
+    def test_partial_updates(self):
+        from src.trading.risk.streaming import RiskBook
+
+        book = RiskBook(window=10)
+        book.add_portfolio("a", 100.0)
+        book.add_portfolio("b", 100.0)
+        book.update({"a": 0.1})
+        book.update({"a": -0.1, "b": 0.05})
+
+        m = book.metrics()
+        assert m["value"].tolist() == pytest.approx([99.0, 105.0])
+        assert m["current_drawdown"][0] == pytest.approx(-0.1)
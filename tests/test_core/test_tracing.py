@@ -0,0 +1,132 @@
+"""
+測試追蹤層 — 預設空操作、父子關係、跨執行緒 / 進程傳遞與離線摺疊堆疊
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from .conftest import SINCE
+
+
+@pytest.fixture
+def exporter():
+    from src.utils import tracing
+
+    mem = tracing.MemoryExporter()
+    tracing.configure(mem)
+    yield mem
+    tracing.disable()
+
+
+def _child_span(name):
+    from src.utils import tracing
+
+    with tracing.span(name):
+        return tracing.inject()
+
+
+class _FakeProvider:
+    name = "fake"
+
+    def supports(self, symbol):
+        return True
+
+    def fetch_ohlcv(self, symbol, timeframe, since=None, limit=500):
+        from src.core.provider import OHLCV
+
+        rng = np.random.default_rng(0)
+        close = 100 + np.cumsum(rng.normal(0, 1, 300))
+        return [
+            OHLCV.from_dict(
+                {"timestamp": SINCE + i * 3_600_000, "open": c, "high": c + 1, "low": c - 1, "close": c, "volume": 1.0}
+            )
+            for i, c in enumerate(close)
+        ]
+
+
+class TestSpans:
+    def test_disabled_is_noop(self):
+        from src.utils import tracing
+
+        assert not tracing.tracing_enabled()
+        with tracing.span("x", a=1) as sp:
+            sp.set_attribute("b", 2)
+        assert sp is tracing.span("y")
+        assert tracing.inject() == {}
+        assert tracing.propagate(_child_span) is _child_span
+
+    def test_parent_child_and_error_status(self, exporter):
+        from src.utils import tracing
+
+        with tracing.span("root", symbol="BTC/USDT") as root:
+            with tracing.span("child"):
+                pass
+            with pytest.raises(ValueError):
+                with tracing.span("boom"):
+                    raise ValueError("bad")
+        child, boom, outer = exporter.spans
+        assert outer is root and root.parent_id is None and len(root.trace_id) == 32
+        assert child.parent_id == boom.parent_id == root.span_id
+        assert {child.trace_id, boom.trace_id} == {root.trace_id}
+        assert boom.status == "error" and "ValueError" in boom.attributes["error"]
+        assert root.attributes == {"symbol": "BTC/USDT"} and root.end_ns >= child.end_ns
+
+    def test_propagates_into_thread_pool_and_carrier(self, exporter):
+        from src.utils import tracing
+
+        with tracing.span("submit") as parent:
+            task = tracing.propagate(_child_span)
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                carrier = pool.submit(task, "worker").result()
+        worker = next(s for s in exporter.spans if s.name == "worker")
+        assert worker.parent_id == parent.span_id and worker.trace_id == parent.trace_id
+        assert carrier[tracing.TRACEPARENT] == f"00-{parent.trace_id}-{worker.span_id}-01"
+
+        remote = tracing.start_span("celery.task", carrier=carrier)
+        remote.end()
+        assert remote.parent_id == worker.span_id and tracing.inject() == {}
+
+
+class TestIntegration:
+    def test_orchestrator_breakdown(self, exporter):
+        from src.core.orchestrator import Orchestrator
+        from src.core.provider import DictCache
+
+        orch = Orchestrator(provider=_FakeProvider(), cache=DictCache())
+        orch.run_backtest("BTC/USDT", "1h", "sma_cross", since_ms=SINCE, until_ms=SINCE + 300 * 3_600_000)
+        names = [s.name for s in exporter.spans]
+        root = exporter.spans[-1]
+        assert root.name == "orchestrator.run_backtest"
+        for expected in ("provider.fetch_ohlcv", "pipeline.ohlcv_clean", "registry.get_signal", "engine.core"):
+            assert expected in names
+        assert {s.trace_id for s in exporter.spans} == {root.trace_id}
+
+
+class TestOffline:
+    def test_file_export_and_collapse(self, tmp_path):
+        from src.utils import tracing
+
+        path = str(tmp_path / "trace.jsonl")
+        tracing.configure(tracing.FileExporter(path))
+        try:
+            with tracing.span("root"):
+                with tracing.span("leaf"):
+                    pass
+        finally:
+            tracing.disable()
+        with open(path, "a") as f:
+            f.write("{broken\n")
+        spans = tracing.load_spans(path)
+        assert [s.name for s in spans] == ["leaf", "root"]
+        stacks = tracing.collapse_stacks(spans)
+        assert set(stacks) == {"root", "root;leaf"}
+        leaf, root = spans
+        assert stacks["root"] == (root.duration_ns - leaf.duration_ns) // 1000
+
+        out = str(tmp_path / "trace.folded")
+        tracing.write_collapsed(spans, out)
+        assert open(out).read().splitlines()[1].startswith("root;leaf ")
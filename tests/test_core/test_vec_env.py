@@ -0,0 +1,124 @@
+"""
+測試向量化交易環境 — 預計算觀察張量與批量步進
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _frame(seed: int, n: int = 200, indicators: bool = True) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + rng.normal(0, 1, n).cumsum()
+    df = pd.DataFrame(
+        {
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "close": close,
+            "volume": rng.integers(1000, 5000, n),
+        }
+    )
+    if indicators:
+        df["rsi"] = 50 + rng.normal(0, 10, n)
+        df["macd"] = rng.normal(size=n)
+    return df
+
+
+class TestFeatureTensor:
+    def test_window_matches_per_window_normalization(self):
+        from src.strategies.rl_strategies.vec_env import FeatureTensor
+
+        df = _frame(0)
+        tensor = FeatureTensor.from_frame(df, ["close", "volume", "rsi"], lookback=20)
+        obs = tensor.window(50)
+        close = df["close"].to_numpy()
+        rsi = df["rsi"].to_numpy()[30:50]
+        assert obs.shape == (20, 3)
+        assert np.allclose(obs[:, 0], (close[30:50] - close.mean()) / (close.std() + 1e-10))
+        assert np.allclose(obs[:, 1], np.log1p(df["volume"].to_numpy()[30:50]) / 10)
+        assert np.allclose(obs[:, 2], (rsi - rsi.mean()) / (rsi.std() + 1e-10))
+
+    def test_batched_windows_match_single(self):
+        from src.strategies.rl_strategies.vec_env import FeatureTensor
+
+        tensor = FeatureTensor.from_frame(_frame(1), ["rsi", "macd"], lookback=10)
+        ends = np.array([10, 57, 200])
+        batch = tensor.windows(ends)
+        for k, end in enumerate(ends):
+            assert np.allclose(batch[k], tensor.window(end))
+
+    def test_concat_rejects_mismatched_lookback(self):
+        from src.strategies.rl_strategies.vec_env import FeatureTensor
+
+        a = FeatureTensor.from_frame(_frame(0), ["rsi"], lookback=10)
+        b = FeatureTensor.from_frame(_frame(1), ["rsi"], lookback=20)
+        with pytest.raises(ValueError):
+            FeatureTensor.concat([a, b])
+
+
+class TestVecTradingEnv:
+    def test_shapes_and_identical_envs_in_lockstep(self):
+        from src.strategies.rl_strategies.vec_env import VecTradingEnv
+
+        df = _frame(2)
+        env = VecTradingEnv(df, n_envs=4)
+        obs, info = env.reset()
+        assert obs.shape == (4, env.observation_dim) and obs.dtype == np.float32
+        actions = np.array([4, 4, 4, 4])
+        for _ in range(5):
+            obs, rewards, terminated, truncated, info = env.step(actions)
+        assert np.allclose(obs, obs[0])
+        assert np.all(info["total_value"] == info["total_value"][0])
+        assert np.all(info["num_trades"] > 0)
+
+    def test_trade_accounting(self):
+        from src.strategies.rl_strategies.vec_env import VecTradingEnv
+
+        df = _frame(3)
+        env = VecTradingEnv(df, commission=0.001, slippage=0.0005, lookback_window=20)
+        env.reset()
+        _, _, _, _, info = env.step(np.array([4]))  # 买入 100%
+        price = df["close"].iloc[20]
+        exec_price = price * 1.0005
+        shares = min(int(100000 / exec_price), int(100000 / (exec_price * 1.001)))
+        assert info["shares"][0] == shares
+        assert info["balance"][0] == pytest.approx(100000 - shares * exec_price * 1.001)
+        assert info["total_value"][0] == pytest.approx(info["balance"][0] + shares * price)
+
+    def test_multi_symbol_offsets_and_auto_reset(self):
+        from src.strategies.rl_strategies.vec_env import VecTradingEnv
+
+        env = VecTradingEnv([_frame(4, n=60), _frame(5, n=80)], start_offsets=[0, 30], lookback_window=20)
+        env.reset()
+        assert list(env.current_step) == [20, 50]
+        finished = np.zeros(2, dtype=bool)
+        for _ in range(40):
+            _, _, terminated, truncated, info = env.step(np.zeros(2, dtype=int))
+            done = terminated | truncated
+            assert np.all(np.isnan(info["episode_return"][~done]))
+            finished |= done
+        assert finished.all()
+        assert np.all(env.current_step <= np.array([60, 80]))
+
+    def test_episode_length_truncates(self):
+        from src.strategies.rl_strategies.vec_env import VecTradingEnv
+
+        env = VecTradingEnv(_frame(6), n_envs=3, start_offsets=[0, 10, 20], episode_length=5)
+        env.reset()
+        for _ in range(4):
+            assert not env.step(np.zeros(3, dtype=int))[3].any()
+        assert env.step(np.zeros(3, dtype=int))[3].all()
+        assert list(env.current_step) == [20, 30, 40]
+
+    def test_continuous_actions_and_rewards(self):
+        from src.strategies.rl_strategies.vec_env import VecTradingEnv
+
+        env = VecTradingEnv(_frame(7), n_envs=2, discrete_actions=False, reward_type="sharpe")
+        env.reset()
+        rewards = [env.step(np.array([[0.5], [0.0]]))[1] for _ in range(10)]
+        assert rewards[0][0] == 0.0  # 少于两期收益时奖励为 0
+        assert env.num_trades[1] == 0
+        assert np.isfinite(np.array(rewards)).all()
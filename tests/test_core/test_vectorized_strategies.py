@@ -0,0 +1,177 @@
+"""
+測試向量化策略契約 — 移植後的信號必須與舊版逐 bar 實作逐根一致
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+
+# ─── 舊版實作（移植前的逐 bar 迴圈，凍結作為對照） ───
+
+
+def _legacy_supertrend_trend(close: pd.Series, upper_band: pd.Series, lower_band: pd.Series) -> pd.Series:
+    supertrend = pd.Series(0.0, index=close.index)
+    trend = pd.Series(1, index=close.index)
+    for i in range(1, len(close)):
+        if close.iloc[i] > supertrend.iloc[i - 1]:
+            trend.iloc[i] = 1
+            supertrend.iloc[i] = lower_band.iloc[i]
+        else:
+            trend.iloc[i] = -1
+            supertrend.iloc[i] = upper_band.iloc[i]
+    return trend
+
+
+def _legacy_supertrend(data: pd.DataFrame, period: int, mult: float) -> pd.Series:
+    high, low, close = data["high"], data["low"], data["close"]
+    tr = pd.concat([high - low, abs(high - close.shift(1)), abs(low - close.shift(1))], axis=1).max(axis=1)
+    atr = tr.ewm(span=period, adjust=False).mean()
+    hl2 = (high + low) / 2
+    trend = _legacy_supertrend_trend(close, hl2 + mult * atr, hl2 - mult * atr)
+    signals = pd.Series(0, index=data.index)
+    change = trend.diff()
+    signals[change == 2] = 1
+    signals[change == -2] = -1
+    return signals
+
+
+def _legacy_kama(data: pd.DataFrame, period: int, fast_period: int, slow_period: int) -> pd.Series:
+    close = data["close"]
+    er = abs(close - close.shift(period)) / abs(close - close.shift()).rolling(window=period).sum()
+    er = er.fillna(0)
+    fast_sc, slow_sc = 2 / (fast_period + 1), 2 / (slow_period + 1)
+    sc = (er * (fast_sc - slow_sc) + slow_sc) ** 2
+    kama = pd.Series(0.0, index=close.index)
+    kama.iloc[period - 1] = close.iloc[period - 1]
+    for i in range(period, len(close)):
+        kama.iloc[i] = kama.iloc[i - 1] + sc.iloc[i] * (close.iloc[i] - kama.iloc[i - 1])
+    signals = pd.Series(0, index=data.index)
+    signals[(close > kama) & (close.shift(1) < kama.shift(1))] = 1
+    signals[(close < kama) & (close.shift(1) > kama.shift(1))] = -1
+    return signals
+
+
+def _optimized_module():
+    from src.strategies.trend import supertrend_optimized
+
+    return supertrend_optimized
+
+
+class TestVectorizedContract:
+    def test_generate_signals_wraps_compute_signals(self):
+        from src.strategies import TrendFollowingStrategy, VectorizedStrategy
+        from src.strategies.conformance import synthetic_ohlcv
+
+        class Momentum(VectorizedStrategy, TrendFollowingStrategy):
+            indicators = ("momentum",)
+
+            def __init__(self):
+                super().__init__("Momentum", {"lookback": 5})
+
+            @property
+            def warmup(self):
+                return self.params["lookback"]
+
+            def compute_signals(self, arrays):
+                close = arrays["close"]
+                out = np.zeros(len(close), dtype=np.int8)
+                out[5:] = np.sign(close[5:] - close[:-5])
+                return out
+
+            def calculate_position_size(self, signal, capital, price, volatility):
+                return 0.0
+
+        data = synthetic_ohlcv(50)
+        strategy = Momentum()
+        signals = strategy.generate_signals(data)
+        assert signals.index.equals(data.index) and signals.dtype == np.int64
+        assert strategy.category == "trend" and strategy.warmup == 5
+        with pytest.raises(KeyError):
+            strategy.generate_signals(data.drop(columns="close"))
+
+    def test_supertrend_direction_matches_loop(self):
+        from src.strategies.base_strategy import supertrend_direction
+
+        rng = np.random.default_rng(4)
+        close = pd.Series(100 + np.cumsum(rng.normal(0, 1, 400)))
+        width = np.abs(rng.normal(2, 1, 400))
+        upper, lower = close + width, close - width
+        upper.iloc[:3] = lower.iloc[:3] = np.nan
+        expected = _legacy_supertrend_trend(close, upper, lower).to_numpy()
+        assert np.array_equal(supertrend_direction(close.to_numpy(), upper.to_numpy(), lower.to_numpy()), expected)
+        # 上軌低於下軌時退回逐 bar 計算
+        swapped = supertrend_direction(close.to_numpy(), lower.to_numpy(), upper.to_numpy())
+        assert np.array_equal(swapped, _legacy_supertrend_trend(close, lower, upper).to_numpy())
+
+    def test_synthetic_rows_match_frame(self):
+        from src.strategies.conformance import synthetic_ohlcv, synthetic_rows
+
+        kwargs = {"wave": 0.1, "spread": 0.002, "start": pd.Timestamp(1_700_000_000_000, unit="ms"), "freq": "h"}
+        frame = synthetic_ohlcv(20, seed=7, volatility=0.01, **kwargs)
+        rows = synthetic_rows(20, seed=7, volatility=0.01, **kwargs)
+        assert [r["timestamp"] for r in rows] == [1_700_000_000_000 + i * 3_600_000 for i in range(20)]
+        assert [r["close"] for r in rows] == frame["close"].tolist()
+        assert all(r["low"] <= min(r["open"], r["close"]) <= max(r["open"], r["close"]) <= r["high"] for r in rows)
+        # 預設參數（隨機影線）與既有一致性檢查數據相同
+        assert synthetic_ohlcv(50).equals(synthetic_ohlcv(50, wave=0.0, spread=None))
+
+
+class TestConformance:
+    @pytest.mark.parametrize("seed", [0, 1, 2])
+    def test_supertrend(self, seed):
+        from src.strategies.conformance import check_conformance, synthetic_ohlcv
+        from src.strategies.trend.trend_complete import Supertrend
+
+        data = synthetic_ohlcv(600, seed=seed)
+        result = check_conformance(Supertrend(period=7, multiplier=1.0), lambda d: _legacy_supertrend(d, 7, 1.0), data)
+        assert result.ok, result.describe()
+
+    def test_supertrend_optimized_with_filters(self):
+        from src.strategies.conformance import check_conformance, synthetic_ohlcv
+
+        mod = _optimized_module()
+        data = synthetic_ohlcv(800, seed=5)
+        params = {"multiplier": 1.0, "use_adaptive_multiplier": True, "use_trend_filter": True, "trend_period": 50}
+
+        class Legacy(mod.SupertrendOptimized):
+            def calculate_supertrend(self, data):
+                out = super().calculate_supertrend(data)
+                out["trend"] = _legacy_supertrend_trend(data["close"], out["upper_band"], out["lower_band"])
+                return out
+
+        strategy = mod.SupertrendOptimized(**params)
+        result = check_conformance(strategy, lambda d: Legacy(**params)._signals(d), data)
+        assert result.ok, result.describe()
+        assert strategy.warmup == 50 and "volume" not in strategy.required_columns
+        assert (strategy.generate_signals(data) != 0).any()
+
+    def test_kama(self):
+        from src.strategies.conformance import check_conformance, synthetic_ohlcv
+        from src.strategies.trend.advanced_trend_strategies import KAMA
+
+        data = synthetic_ohlcv(1500, seed=3)
+        result = check_conformance(KAMA(period=12, slow_period=20), lambda d: _legacy_kama(d, 12, 2, 20), data)
+        assert result.ok, result.describe()
+        assert result.speedup > 1.0
+
+    def test_reports_mismatch_after_warmup(self):
+        from src.strategies.conformance import check_conformance, synthetic_ohlcv
+        from src.strategies.trend.advanced_trend_strategies import KAMA
+
+        data = synthetic_ohlcv(300)
+        strategy = KAMA()
+
+        def shifted(d):
+            legacy = _legacy_kama(d, 10, 2, 30).to_numpy().copy()
+            legacy[:5] = 9
+            legacy[200] = 9
+            return legacy
+
+        assert check_conformance(strategy, shifted, data).mismatches == 6
+        result = check_conformance(strategy, shifted, data, skip_warmup=True)
+        assert result.mismatches == 1 and result.first_mismatch == 200
+        with pytest.raises(TypeError):
+            check_conformance(object(), shifted, data)
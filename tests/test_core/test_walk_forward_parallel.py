@@ -0,0 +1,112 @@
+"""
+測試 Walk-Forward 分段模式、進程池並行與全序列信號共用
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from .conftest import SINCE
+
+
+def _run(rows, strategy="sma_cross", **kwargs):
+    from src.backtest.walk_forward import walk_forward_analysis
+
+    until = rows[-1]["timestamp"]
+    return walk_forward_analysis(rows, "binance", "BTC/USDT", "1h", SINCE, until, strategy, **kwargs)
+
+
+class TestMakeFolds:
+    def test_fixed_matches_contiguous_chunks(self):
+        from src.backtest.walk_forward import make_folds
+
+        folds = make_folds(1000, 5, train_ratio=0.7)
+        assert [(f.train, f.test) for f in folds][:2] == [([(0, 140)], (140, 200)), ([(200, 340)], (340, 400))]
+
+    def test_anchored_and_rolling_tile_the_tail(self):
+        from src.backtest.walk_forward import make_folds
+
+        anchored = make_folds(1000, 3, train_ratio=0.7, split="anchored", purge=5)
+        rolling = make_folds(1000, 3, train_ratio=0.7, split="rolling")
+        assert [f.test for f in anchored] == [(700, 800), (800, 900), (900, 1000)]
+        assert [f.train for f in anchored] == [[(0, 695)], [(0, 795)], [(0, 895)]]
+        assert [f.train for f in rolling] == [[(0, 700)], [(100, 800)], [(200, 900)]]
+
+    def test_purged_excludes_neighbourhood_of_test_fold(self):
+        from src.backtest.walk_forward import make_folds
+
+        folds = make_folds(1000, 4, split="purged", purge=10, embargo=20)
+        assert folds[1].test == (250, 500)
+        assert folds[1].train == [(0, 240), (520, 1000)]
+        assert folds[0].train == [(270, 1000)]
+        assert folds[-1].test == (750, 1000) and folds[-1].train == [(0, 740)]
+
+    def test_unknown_mode(self, ohlcv_rows):
+        from src.backtest.walk_forward import make_folds
+
+        with pytest.raises(ValueError):
+            make_folds(100, 2, split="random")
+        with pytest.raises(ValueError):
+            _run(ohlcv_rows, split="random")
+
+
+@pytest.mark.parametrize("ohlcv_rows", [1200], indirect=True)
+class TestWalkForwardAnalysis:
+    def test_process_pool_matches_serial(self, ohlcv_rows):
+        rows = ohlcv_rows
+        serial = _run(rows, n_splits=4)
+        pooled = _run(rows, n_splits=4, n_jobs=2)
+        assert serial == pooled
+        assert [s["fold"] for s in serial["splits"]] == [1, 2, 3, 4]
+
+    def test_reuse_signals_computes_each_combo_once(self, monkeypatch, ohlcv_rows):
+        from src.backtest import strategies
+        from src.backtest.optimizer import _param_grid_to_list
+
+        calls = []
+        original = strategies.get_signal
+
+        def counting(name, rows, **kwargs):
+            calls.append(len(rows))
+            return original(name, rows, **kwargs)
+
+        monkeypatch.setattr(strategies, "get_signal", counting)
+        rows = ohlcv_rows
+        result = _run(rows, n_splits=4, reuse_signals=True)
+        n_combos = len(_param_grid_to_list(strategies.STRATEGY_CONFIG["sma_cross"]["param_grid"]))
+        assert set(calls) == {len(rows)}
+        assert len(calls) <= n_combos
+        assert len(result["splits"]) == 4
+
+    def test_split_modes_report_fold_sizes(self, ohlcv_rows):
+        rows = ohlcv_rows
+        for split in ("anchored", "rolling", "purged"):
+            result = _run(rows, n_splits=3, split=split, purge=5, embargo=5)
+            assert result["split"] == split and len(result["splits"]) == 3
+            assert all(s["test_bars"] > 0 and s["train_bars"] > 0 for s in result["splits"])
+            assert len(result["oos_equity_curve"]) == sum(s["test_bars"] for s in result["splits"])
+
+    def test_core_analyzer_split_modes(self, ohlcv_rows):
+        from src.backtest.strategies import sma_cross
+        from src.core.walk_forward import WalkForwardAnalyzer
+
+        rows = ohlcv_rows
+        combos = [{"fast": f, "slow": s} for f in (5, 10) for s in (20, 40)]
+        plain = WalkForwardAnalyzer(rows, sma_cross, combos, n_splits=4).run(SINCE, rows[-1]["timestamp"])
+        reused = WalkForwardAnalyzer(rows, sma_cross, combos, n_splits=4, split="anchored", reuse_signals=True).run(
+            SINCE, rows[-1]["timestamp"]
+        )
+        assert plain.is_valid and reused.is_valid
+        assert [s.test_bars for s in reused.splits] == [90] * 4
+
+    def test_core_analyzer_process_pool_matches_serial(self, ohlcv_rows):
+        from src.backtest.strategies import sma_cross
+        from src.core.walk_forward import WalkForwardAnalyzer
+
+        rows = ohlcv_rows
+        combos = [{"fast": f, "slow": s} for f in (5, 10) for s in (20, 40)]
+        serial = WalkForwardAnalyzer(rows, sma_cross, combos, n_splits=4, split="rolling", reuse_signals=True)
+        pooled = WalkForwardAnalyzer(rows, sma_cross, combos, n_splits=4, split="rolling", reuse_signals=True, n_jobs=2)
+        a, b = serial.run(SINCE, rows[-1]["timestamp"]), pooled.run(SINCE, rows[-1]["timestamp"])
+        assert a.is_valid and a.to_dict() == b.to_dict()
+        assert a.oos_equity_curve == b.oos_equity_curve